@@ -224,7 +224,35 @@ def show_main_app():
                 st.metric("Connections Used", pool_status.get("checked_out", 0))
             with col3:
                 st.metric("Available", pool_status.get("checked_in", 0))
-    
+
+            monitor = pool_status.get("monitor")
+            if monitor:
+                col4, col5, col6, col7 = st.columns(4)
+                with col4:
+                    st.metric("Checkout Wait p95", f"{monitor['wait']['p95_ms']:.0f} ms")
+                with col5:
+                    st.metric("Hold Time p95", f"{monitor['hold']['p95_ms']:.0f} ms")
+                with col6:
+                    st.metric("Pool Timeouts", monitor["timeouts"])
+                with col7:
+                    st.metric("Leaked (held > limit)", len(monitor["leaks"]))
+
+                rec = pool_status.get("recommendation", {})
+                if rec.get("status") == "change":
+                    st.info(f"Pool sizing recommendation: pool_size={rec['pool_size']}, "
+                            f"max_overflow={rec['max_overflow']} — {rec['reason']}")
+                if monitor["sites"]:
+                    st.caption("Connection hold time by call site")
+                    st.dataframe(monitor["sites"], use_container_width=True, hide_index=True)
+
+            replica = pool_status.get("replica", {})
+            if replica.get("status") in ("active", "down"):
+                routes = replica["routes"]
+                st.caption(f"Read replica {replica['host']} ({replica['status']}) — reads: "
+                           f"{routes['replica']} replica, {routes['pinned']} pinned to primary after writes, "
+                           f"{routes['replica_down']} primary while replica down · "
+                           f"{replica['pinned_sessions']} sessions pinned")
+
     # Footer
     st.markdown(f"""
     <div class="footer">
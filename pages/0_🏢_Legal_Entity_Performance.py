@@ -17,8 +17,6 @@ CHANGELOG:
 
 import logging
 from datetime import date
-import time
-from contextlib import contextmanager
 import pandas as pd
 import streamlit as st
 
@@ -36,6 +34,7 @@ st.set_page_config(
 # =============================================================================
 from utils.auth import AuthManager
 from utils.db import check_db_connection
+from utils.perf import perf, PC, render_trace_view
 
 from utils.legal_entity_performance import (
     # Core classes
@@ -54,7 +53,6 @@ from utils.legal_entity_performance import (
     
     # Constants
     DEBUG_TIMING,
-    CACHE_KEY_TIMING,
     CACHE_KEY_FILTERS,
 )
 
@@ -62,48 +60,32 @@ logger = logging.getLogger(__name__)
 
 
 # =============================================================================
-# TIMING UTILITIES (synced with KPI center)
+# TIMING UTILITIES (shared tracer — utils.perf)
 # =============================================================================
 
-def _init_timing():
-    if CACHE_KEY_TIMING not in st.session_state:
-        st.session_state[CACHE_KEY_TIMING] = []
+_PAGE = 'legal_entity_performance'
 
 
 def _reset_timing():
-    st.session_state[CACHE_KEY_TIMING] = []
+    """Start a new trace for this rerun (utils.perf tracer)."""
+    perf.reset(page=_PAGE)
 
 
-@contextmanager
-def timer(name: str):
-    _init_timing()
-    start = time.perf_counter()
-    try:
-        yield
-    finally:
-        elapsed = time.perf_counter() - start
-        if DEBUG_TIMING:
-            print(f"⏱️ [{name}] {elapsed:.3f}s")
-        st.session_state[CACHE_KEY_TIMING].append({'name': name, 'time': elapsed})
+def timer(name: str, category: PC = PC.OTHER):
+    """
+    Span for a code block; SQL executed inside it is traced automatically.
+    
+    Usage:
+        with timer("Load unified raw data"):
+            data = loader.get_unified_data()
+    """
+    return perf.track(name, category)
 
 
 def _print_timing_summary():
-    if not DEBUG_TIMING:
-        return
-    timing_data = st.session_state.get(CACHE_KEY_TIMING, [])
-    if not timing_data:
-        return
-    total_time = sum(t['time'] for t in timing_data)
-    print(f"\n{'='*60}")
-    print(f"📊 LEGAL ENTITY TIMING SUMMARY")
-    print(f"{'='*60}")
-    for item in sorted(timing_data, key=lambda x: x['time'], reverse=True):
-        pct = (item['time'] / total_time * 100) if total_time > 0 else 0
-        bar = '█' * int(pct / 5) + '░' * (20 - int(pct / 5))
-        print(f"{item['name']:<45} {item['time']:>6.3f}s ({pct:>5.1f}%) {bar}")
-    print(f"{'-'*60}")
-    print(f"{'TOTAL':<45} {total_time:>6.3f}s")
-    print(f"{'='*60}\n")
+    """End the trace: summary (DEBUG_TIMING), telemetry store, trace view."""
+    perf.finish(print_summary=DEBUG_TIMING)
+    render_trace_view()
 
 
 # =============================================================================
@@ -305,6 +287,8 @@ def main():
             pipeline_metrics=pipeline_metrics,
             # AR Outstanding (all unpaid/partial, no date filter)
             ar_outstanding_df=unified_cache.get('ar_outstanding_df', pd.DataFrame()),
+            # Pre-aggregated month cube (None when drill-down filters are active)
+            monthly_cube=data.get('monthly_cube'),
         )
     
     # =========================================================================
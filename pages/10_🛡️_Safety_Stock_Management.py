@@ -5,6 +5,7 @@ Version 4.0 - Refactored: @st.fragment + st.form to minimize reruns
 
 Key changes vs v3.4:
 - @st.fragment: render_stats(), render_data_section(), demand_fetch_fragment()
+  (utils.perf.traced_fragment, so fragment-only reruns are traced too)
 - st.form: calculation params (each method), review_dialog, delete confirmation
 - st.rerun(scope="fragment") for in-section refreshes
 - dialog_data stores calc results so Save reads from state (no stale closures)
@@ -19,6 +20,7 @@ from typing import Dict, Optional
 # Import utilities
 from utils.auth import AuthManager
 from utils.db import get_db_engine
+from utils.perf import perf, traced_fragment, render_trace_view
 from utils.safety_stock.crud import (
     get_safety_stock_levels,
     get_safety_stock_by_id,
@@ -41,7 +43,7 @@ from utils.safety_stock.demand_analysis import (
 )
 from utils.safety_stock.validations import (
     validate_safety_stock_data,
-    validate_bulk_data,
+    validate_bulk_frame,
     get_validation_summary
 )
 from utils.safety_stock.export import (
@@ -326,7 +328,7 @@ def fetch_and_store_demand_data(product_id, entity_id, customer_id, fetch_days,
 # Fragment: Stats Dashboard
 # ══════════════════════════════════════════════════════════════════════════════
 
-@st.fragment
+@traced_fragment
 def render_stats():
     """Renders KPI metrics independently – does not rerun when filters change"""
     stats = get_quick_stats()
@@ -376,7 +378,7 @@ def render_stats():
 # Fragment: Demand Fetch (called inside safety_stock_form dialog)
 # ══════════════════════════════════════════════════════════════════════════════
 
-@st.fragment
+@traced_fragment
 def demand_fetch_fragment():
     """
     Independent fragment for demand data analysis.
@@ -451,7 +453,7 @@ def demand_fetch_fragment():
 # Fragment: Main Data Section (filters + actions + table + row actions)
 # ══════════════════════════════════════════════════════════════════════════════
 
-@st.fragment
+@traced_fragment
 def render_data_section():
     """
     Contains the entire interactive data layer.
@@ -1578,19 +1580,32 @@ def bulk_upload_dialog():
         st.dataframe(df.head(10), width="stretch")
 
         with st.spinner("Validating..."):
-            is_valid, validated_df, errors = validate_bulk_data(df)
+            validated_df, error_report = validate_bulk_frame(df)
 
-        if not is_valid:
-            st.error("Validation failed:")
-            for error in errors[:10]:
-                st.write(f"• {error}")
+        if not error_report.empty:
+            st.warning(f"⚠️ {len(error_report)} of {len(df)} rows have errors and will be skipped")
+            st.dataframe(error_report, width="stretch", hide_index=True)
+            st.download_button(
+                label="Download Error Report",
+                data=error_report.to_csv(index=False).encode('utf-8'),
+                file_name=f"safety_stock_upload_errors_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                mime="text/csv"
+            )
+
+        if validated_df.empty:
+            st.error("No valid rows to import")
             return
 
-        st.success(f"✔ Validation passed – {len(validated_df)} valid rows ready to import")
+        st.success(f"✔ {len(validated_df)} valid rows ready to import")
+
+        import_label = (
+            f"Import {len(validated_df)} valid rows, skip {len(error_report)} invalid"
+            if not error_report.empty else "Import Data"
+        )
 
         with st.form("bulk_import_form", border=False):
             st.write("Review the data above, then confirm import:")
-            if st.form_submit_button("Import Data", type="primary", width="stretch"):
+            if st.form_submit_button(import_label, type="primary", width="stretch"):
                 with st.spinner("Importing..."):
                     data_list = validated_df.to_dict('records')
                     success, message, results = bulk_create_safety_stock(
@@ -1608,6 +1623,8 @@ def bulk_upload_dialog():
                     st.rerun()
                 else:
                     st.error(f"Failed: {message}")
+                    for err in results['errors'][:20]:
+                        st.write(f"• {err}")
 
     except Exception as e:
         st.error(f"Error reading file: {e}")
@@ -1617,7 +1634,7 @@ def bulk_upload_dialog():
 # Main
 # ══════════════════════════════════════════════════════════════════════════════
 
-@st.fragment
+@traced_fragment
 def render_analysis_section():
     """Proxy — delegates to utils.safety_stock.analysis (separated for maintainability)"""
     from utils.safety_stock.analysis import render_analysis_section as _render
@@ -1631,6 +1648,8 @@ def render_help_popover():
 
 
 def main():
+    perf.reset(page='safety_stock')
+
     # ── Header ─────────────────────────────────────────────────────────────────
     col_title, col_help, col_user = st.columns([3, 1, 1])
     with col_title:
@@ -1651,6 +1670,9 @@ def main():
     # ── Analysis section (independent fragment) ────────────────────────────────
     render_analysis_section()
 
+    perf.finish(print_summary=False)
+    render_trace_view()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
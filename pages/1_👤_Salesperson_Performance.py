@@ -22,14 +22,17 @@ import time
 from utils.salesperson_performance.setup import setup_tab_fragment
 
 # =============================================================================
-# PERFORMANCE TRACKING (unified via perf_logger)
+# PERFORMANCE TRACKING (shared tracer — utils.perf)
 # =============================================================================
 
-from utils.salesperson_performance.perf_logger import perf, PerfCategory as PC
+from utils.perf import perf, PerfCategory as PC, render_trace_view
 
 # Shared utilities
 from utils.auth import AuthManager
-from utils.db import check_db_connection
+from utils.db import check_db_connection, invalidate_query_cache
+from utils.monthly_cube import MonthlyCube, SALESPERSON_CUBE
+from utils.ar_snapshot import build_ar_snapshot
+from utils.prefetch import get_prefetcher, top_keys
 
 # Page-specific module
 from utils.salesperson_performance import (
@@ -76,6 +79,7 @@ from utils.salesperson_performance.s3_utils import generate_doc_url
 from utils.salesperson_performance.filters import (
     analyze_period,
 )
+from utils.salesperson_performance.client_filter import filter_data_client_side
 from utils.salesperson_performance.metrics import get_full_period_end_date
 
 # NEW v3.6.0: Daily Warning Bulletin
@@ -207,7 +211,7 @@ st.set_page_config(
 )
 
 # Reset performance logger for this page load
-perf.reset()
+perf.reset(page="salesperson_performance")
 
 # =============================================================================
 # AUTHENTICATION CHECK
@@ -457,6 +461,10 @@ def load_data_for_year_range(start_year: int, end_year: int, exclude_internal: b
         
         perf.log_event(f"Sales (year range {start_year}-{end_year}): {len(data['sales']):,} rows", PC.OTHER)
         
+        # Pre-aggregated monthly cube for Overview charts (built once per load)
+        with perf.track("MonthlyCube.build", PC.PANDAS, rows=len(data['sales'])):
+            data['_monthly_cube'] = MonthlyCube.build(data['sales'], SALESPERSON_CUBE)
+        
         # =====================================================================
         # PHASE 2: KPI Targets & Weights
         # =====================================================================
@@ -563,6 +571,12 @@ def load_data_for_year_range(start_year: int, end_year: int, exclude_internal: b
             entity_ids=None
         )
         
+        # AR snapshot: status codes / line keys / aging buckets computed once
+        # here instead of on every Payment tab render
+        if not payment_raw_df.empty:
+            with perf.track("ARSnapshot.build", PC.PANDAS, rows=len(payment_raw_df)):
+                payment_raw_df = build_ar_snapshot(payment_raw_df)
+        
         # Split into AR outstanding vs Period (Pandas — instant)
         if not payment_raw_df.empty:
             # AR outstanding: unpaid + partially paid (all dates)
@@ -617,191 +631,6 @@ def load_data_for_year_range(start_year: int, end_year: int, exclude_internal: b
     return data
 
 
-def filter_data_client_side(raw_data: dict, filter_values: dict) -> dict:
-    """
-    Filter cached data client-side based on ALL filters.
-    This is instant - no DB query needed.
-    
-    UPDATED v1.1.0: Added exclude_internal_revenue handling
-    - Uses customer_type column from unified_sales_by_salesperson_view
-    - When True: Sets revenue to 0 for Internal customers, keeps GP intact
-    - Purpose: Evaluate sales performance with real (external) customers only
-    
-    UPDATED v1.8.0: Extended exclude_internal_revenue to backlog data
-    - Backlog detail still shows internal orders (for display)
-    - Backlog aggregates (total_backlog, in_period_backlog) zero internal revenue
-    
-    UPDATED v2.4.0: Handle empty employee_ids (is_empty_selection)
-    - When employee_ids is empty list [], return empty DataFrames
-    - Allows page to render with $0 values instead of blocking
-    """
-    filter_start = time.perf_counter()
-    start_date = filter_values['start_date']
-    end_date = filter_values['end_date']
-    employee_ids = filter_values['employee_ids']
-    entity_ids = filter_values['entity_ids']
-    year = filter_values['year']
-    exclude_internal_revenue = filter_values.get('exclude_internal_revenue', True)  # NEW
-    is_empty_selection = filter_values.get('is_empty_selection', False)  # NEW v2.4.0
-    
-    filtered = {}
-    
-    # NEW v2.4.0: If empty selection, return empty DataFrames for data tables
-    # This allows page to render with $0 values instead of blocking
-    if is_empty_selection:
-        for key, df in raw_data.items():
-            if key.startswith('_'):
-                continue
-            if isinstance(df, pd.DataFrame):
-                # Return empty DataFrame with same structure
-                filtered[key] = df.head(0)
-            else:
-                filtered[key] = df
-        return filtered
-    
-    # FIXED v2.11.0: Backlog data should NOT be filtered by date range
-    # Backlog represents ALL pending orders - date range only applies to Sales data
-    # In-Period backlog is calculated separately using ETD field in metrics.py
-    # NEW v3.5.0: AR outstanding also NOT filtered by date range
-    backlog_keys = {'total_backlog', 'in_period_backlog', 'backlog_by_month', 'backlog_detail', 'ar_outstanding', 'period_payment'}
-    
-    for key, df in raw_data.items():
-        # Skip metadata
-        if key.startswith('_'):
-            continue
-            
-        if not isinstance(df, pd.DataFrame) or df.empty:
-            filtered[key] = df
-            continue
-        
-        df_filtered = df.copy()
-        
-        # FIXED v2.11.0: Skip date filtering for backlog data
-        # Backlog is future orders - should not be filtered by invoice/OC date range
-        if key not in backlog_keys:
-            # Filter by date range - only for sales and complex KPI data
-            date_cols = [
-                'inv_date',              # sales data
-                'first_invoice_date',    # new_customers
-                'first_sale_date',       # new_products
-                'first_combo_date',      # new_business_detail
-            ]
-            for date_col in date_cols:
-                if date_col in df_filtered.columns:
-                    df_filtered[date_col] = pd.to_datetime(df_filtered[date_col], errors='coerce')
-                    df_filtered = df_filtered[
-                        (df_filtered[date_col] >= pd.Timestamp(start_date)) & 
-                        (df_filtered[date_col] <= pd.Timestamp(end_date))
-                    ]
-                    break
-        
-        # Filter by employee_ids (salesperson)
-        if employee_ids:
-            emp_ids_set = set(employee_ids)
-            if 'sales_id' in df_filtered.columns:
-                # FIX v3.8.0: For AR/Payment data, keep unassigned rows
-                # (sales_id IS NULL) alongside filtered employees.
-                # Unassigned invoices have no split assignment and should
-                # be visible to ALL roles for AR tracking purposes.
-                if key in ('ar_outstanding', 'period_payment'):
-                    _assigned_mask = df_filtered['sales_id'].isin(emp_ids_set)
-                    _unassigned_mask = df_filtered['sales_id'].isna()
-                    if 'is_unassigned' in df_filtered.columns:
-                        _unassigned_mask = _unassigned_mask | (df_filtered['is_unassigned'] == 1)
-                    df_filtered = df_filtered[_assigned_mask | _unassigned_mask]
-                else:
-                    df_filtered = df_filtered[df_filtered['sales_id'].isin(emp_ids_set)]
-            elif 'employee_id' in df_filtered.columns:
-                df_filtered = df_filtered[df_filtered['employee_id'].isin(emp_ids_set)]
-        
-        # Filter by entity_ids
-        if entity_ids:
-            entity_ids_set = set(entity_ids)
-            if 'entity_id' in df_filtered.columns:
-                df_filtered = df_filtered[df_filtered['entity_id'].isin(entity_ids_set)]
-            elif 'legal_entity_id' in df_filtered.columns:
-                df_filtered = df_filtered[df_filtered['legal_entity_id'].isin(entity_ids_set)]
-        
-        # Special handling for targets - filter by year
-        if key == 'targets' and 'year' in df_filtered.columns:
-            df_filtered = df_filtered[df_filtered['year'] == year]
-        
-        # =====================================================================
-        # NEW: Exclude Internal Revenue (but keep GP)
-        # Uses customer_type column from unified_sales_by_salesperson_view
-        # customer_type = 'Internal' for internal companies
-        # =====================================================================
-        if exclude_internal_revenue and key == 'sales':
-            if 'customer_type' in df_filtered.columns and 'sales_by_split_usd' in df_filtered.columns:
-                # Create mask for internal customers
-                is_internal = df_filtered['customer_type'].str.lower() == 'internal'
-                
-                # Log for debugging
-                internal_count = is_internal.sum()
-                if internal_count > 0:
-                    internal_revenue = df_filtered.loc[is_internal, 'sales_by_split_usd'].sum()
-                    logger.info(
-                        f"Excluding internal revenue: {internal_count} rows, "
-                        f"${internal_revenue:,.0f} revenue zeroed (GP kept intact)"
-                    )
-                
-                # Zero out ONLY revenue for internal customers
-                # GP columns (gross_profit_by_split_usd, gp1_by_split_usd) are kept intact
-                # This allows evaluation of sales performance with real customers
-                df_filtered.loc[is_internal, 'sales_by_split_usd'] = 0
-        
-        # =====================================================================
-        # NEW v1.8.0: Exclude Internal Revenue from Backlog (for Pipeline & Forecast)
-        # Backlog detail shows all orders (including internal) for display
-        # But aggregates (total_backlog, in_period_backlog) exclude internal revenue
-        # =====================================================================
-        if exclude_internal_revenue and key == 'backlog_detail':
-            if 'customer_type' in df_filtered.columns and 'backlog_sales_by_split_usd' in df_filtered.columns:
-                # Create mask for internal customers
-                is_internal = df_filtered['customer_type'].str.lower() == 'internal'
-                
-                # Log for debugging
-                internal_count = is_internal.sum()
-                if internal_count > 0:
-                    internal_backlog = df_filtered.loc[is_internal, 'backlog_sales_by_split_usd'].sum()
-                    logger.info(
-                        f"Excluding internal backlog revenue: {internal_count} rows, "
-                        f"${internal_backlog:,.0f} backlog revenue zeroed (GP kept intact)"
-                    )
-                
-                # Zero out ONLY revenue for internal customers
-                # GP columns (backlog_gp_by_split_usd) are kept intact
-                df_filtered.loc[is_internal, 'backlog_sales_by_split_usd'] = 0
-        
-        filtered[key] = df_filtered
-    
-    # =========================================================================
-    # NEW v3.0.0: Recalculate Complex KPIs with Pandas when filters change
-    # This is instant (<0.3s) since data is already in memory
-    # =========================================================================
-    if '_complex_kpi_calculator' in raw_data and raw_data['_complex_kpi_calculator'] is not None:
-        calc = raw_data['_complex_kpi_calculator']
-        
-        with perf.track("Pandas: recalc_complex_kpis", PC.PANDAS):
-            # Recalculate with current filters (employee_ids)
-            complex_kpis_result = calc.calculate_all(
-                start_date=start_date,
-                end_date=end_date,
-                employee_ids=employee_ids if employee_ids else None
-            )
-        
-        # Update filtered data with recalculated Complex KPIs
-        filtered['new_customers'] = complex_kpis_result['new_customers']
-        filtered['new_products'] = complex_kpis_result['new_products']
-        filtered['new_combos_detail'] = complex_kpis_result['new_combos_detail']  # NEW v1.1.0
-        filtered['new_business'] = complex_kpis_result['new_business']
-        filtered['new_business_detail'] = complex_kpis_result['new_business_detail']
-    
-    # Print timing
-    filter_elapsed = time.perf_counter() - filter_start
-    perf.log_event(f"Client-side filter: {filter_elapsed:.3f}s", PC.FILTER)
-    return filtered
-
 # =============================================================================
 # OPTIMIZATION v3.4.0: Extract Previous Year Data from Cache
 # Saves ~5.3s by avoiding duplicate SQL query for YoY comparison.
@@ -1107,6 +936,9 @@ with st.sidebar:
                 if key.startswith(cache_prefixes):
                     del st.session_state[key]
             
+            # Central query result cache (utils.db)
+            invalidate_query_cache()
+            
             st.rerun()
     with col_r2:
         cached_start, cached_end = _get_cached_year_range()
@@ -1162,6 +994,21 @@ data = filter_data_client_side(
     filter_values=active_filters
 )
 
+# Slice the pre-aggregated monthly cube with the same filters (None when the
+# date range is not month-aligned → fragments fall back to invoice lines)
+monthly_cube = None
+if raw_data.get('_monthly_cube') is not None and not active_filters.get('is_empty_selection', False):
+    with perf.track("MonthlyCube.slice", PC.FILTER):
+        monthly_cube = raw_data['_monthly_cube'].slice(
+            start_date=active_filters['start_date'],
+            end_date=active_filters['end_date'],
+            filters={
+                'sales_id': active_filters['employee_ids'],
+                'legal_entity_id': active_filters['entity_ids'],
+            },
+            exclude_internal_revenue=active_filters.get('exclude_internal_revenue', True),
+        )
+
 # =============================================================================
 # EMPTY DATA HANDLING (UPDATED v2.4.0 - Non-blocking)
 # =============================================================================
@@ -2106,7 +1953,8 @@ Backlog GP1 = Backlog GP × (GP1/GP ratio from invoiced data)
     monthly_trend_fragment(
         sales_df=data['sales'],
         targets_df=data['targets'],
-        fragment_key="trend"
+        fragment_key="trend",
+        monthly_cube=monthly_cube
     )
     
     # ==========================================================================
@@ -2127,7 +1975,8 @@ Backlog GP1 = Backlog GP × (GP1/GP ratio from invoiced data)
         filter_values=active_filters,
         raw_cached_sales_df=raw_data.get('sales'),  # OPTIMIZATION v3.4.0
         cached_year_range=_get_cached_year_range(),  # OPTIMIZATION v3.4.0
-        fragment_key="yoy"
+        fragment_key="yoy",
+        monthly_cube=monthly_cube
     )
     
     st.divider()
@@ -2317,6 +2166,34 @@ Backlog GP1 = Backlog GP × (GP1/GP ratio from invoiced data)
         fragment_key="export"
     )
 
+# =============================================================================
+# BACKGROUND PREFETCH — drill-down data for Sales Detail / Backlog / Payment
+# Overview is rendered: warm the rows users most likely click next (largest
+# AR invoices, most recent orders) in one batched query per loader.
+# Loaders below answer from these batches and fall back to a direct query.
+# =============================================================================
+prefetcher = get_prefetcher("salesperson")
+_ar_prefetch_df = data.get('ar_outstanding', pd.DataFrame())
+_recent_invoices = top_keys(data['sales'], 'inv_number', 'inv_date')
+_likely_invoices = list(dict.fromkeys(
+    top_keys(_ar_prefetch_df, 'inv_number', 'outstanding_by_split_usd') + _recent_invoices
+))
+_likely_ocs = list(dict.fromkeys(
+    top_keys(data['sales'], 'oc_number', 'inv_date')
+    + top_keys(data['backlog_detail'], 'oc_number', 'backlog_sales_by_split_usd')
+))
+
+with perf.track("Prefetch: schedule", PC.OTHER):
+    prefetcher.schedule('payment_txn', queries.get_payment_transactions, _likely_invoices, 'sale_invoice_number')
+    prefetcher.schedule('invoice_docs', queries.get_invoice_and_payment_docs, _likely_invoices, 'invoice_number')
+    prefetcher.schedule('order_details', queries.get_order_details, _likely_ocs, 'oc_number')
+    prefetcher.schedule('delivery_details', queries.get_delivery_details, _likely_ocs, 'oc_number')
+
+payment_txn_loader = prefetcher.loader('payment_txn', queries.get_payment_transactions, 'sale_invoice_number')
+doc_loader = prefetcher.loader('invoice_docs', queries.get_invoice_and_payment_docs, 'invoice_number')
+order_detail_loader = prefetcher.loader('order_details', queries.get_order_details, 'oc_number')
+delivery_detail_loader = prefetcher.loader('delivery_details', queries.get_delivery_details, 'oc_number')
+
 # =============================================================================
 # TAB 2: SALES DETAIL
 # UPDATED v3.4.0: Combined fragment with filters ABOVE sub-tabs
@@ -2332,10 +2209,10 @@ with tab2:
         filter_values=active_filters,
         fragment_key="sales_detail_tab",
         # Drill-down loaders (v4.1.0)
-        order_detail_loader=lambda oc_nums: queries.get_order_details(oc_nums),
-        delivery_detail_loader=lambda oc_nums: queries.get_delivery_details(oc_nums),
-        payment_txn_loader=lambda inv_nums: queries.get_payment_transactions(inv_nums),
-        doc_loader=lambda inv_nums: queries.get_invoice_and_payment_docs(inv_nums),
+        order_detail_loader=order_detail_loader,
+        delivery_detail_loader=delivery_detail_loader,
+        payment_txn_loader=payment_txn_loader,
+        doc_loader=doc_loader,
         s3_url_generator=generate_doc_url,
     )
 
@@ -2397,8 +2274,8 @@ Backlog is a snapshot of ALL pending orders **at current time**.
         filter_values=active_filters,
         fragment_key="backlog_tab",
         # Drill-down loaders (v4.1.0) — Order + Delivery only (backlog = uninvoiced)
-        order_detail_loader=lambda oc_nums: queries.get_order_details(oc_nums),
-        delivery_detail_loader=lambda oc_nums: queries.get_delivery_details(oc_nums),
+        order_detail_loader=order_detail_loader,
+        delivery_detail_loader=delivery_detail_loader,
     )
 
 # =============================================================================
@@ -2759,8 +2636,8 @@ with tab5:
         key_prefix="sp_payment",
         ar_outstanding_df=data.get('ar_outstanding', pd.DataFrame()),
         period_payment_df=data.get('period_payment', pd.DataFrame()),
-        payment_txn_loader=lambda inv_nums: queries.get_payment_transactions(inv_nums),
-        doc_loader=lambda inv_nums: queries.get_invoice_and_payment_docs(inv_nums),
+        payment_txn_loader=payment_txn_loader,
+        doc_loader=doc_loader,
         s3_url_generator=generate_doc_url,
     )
 
@@ -2797,8 +2674,9 @@ with tab7:
 # FOOTER
 # =============================================================================
 
-# Print final timing summary for UI rendering
-perf.summary()
+# Print final timing summary, persist it, and show the trace (if enabled)
+perf.finish()
+render_trace_view()
 
 st.divider()
 st.caption(
@@ -6,8 +6,6 @@ KPI Center Performance Dashboard
 
 import logging
 from datetime import date, datetime
-import time
-from contextlib import contextmanager
 import pandas as pd
 import streamlit as st
 
@@ -25,6 +23,8 @@ st.set_page_config(
 # =============================================================================
 from utils.auth import AuthManager
 from utils.db import check_db_connection
+from utils.perf import perf, PC, render_trace_view
+from utils.prefetch import get_prefetcher, top_keys
 
 # Import from refactored module
 from utils.kpi_center_performance import (
@@ -66,75 +66,38 @@ from utils.kpi_center_performance import (
     ALLOWED_ROLES,
     DEBUG_TIMING,
     CACHE_KEY_UNIFIED,
-    CACHE_KEY_TIMING,
     CACHE_KEY_FILTERS,
 )
 
 logger = logging.getLogger(__name__)
 
 # =============================================================================
-# TIMING UTILITIES
+# TIMING UTILITIES (shared tracer — utils.perf)
 # =============================================================================
 
-def _init_timing():
-    """Initialize timing storage in session state."""
-    if CACHE_KEY_TIMING not in st.session_state:
-        st.session_state[CACHE_KEY_TIMING] = []
+_PAGE = 'kpi_center_performance'
 
 
 def _reset_timing():
-    """Reset timing data for new page load."""
-    st.session_state[CACHE_KEY_TIMING] = []
+    """Start a new trace for this rerun (utils.perf tracer)."""
+    perf.reset(page=_PAGE)
 
 
-@contextmanager
-def timer(name: str):
+def timer(name: str, category: PC = PC.OTHER):
     """
-    Context manager to time code blocks.
+    Span for a code block; SQL executed inside it is traced automatically.
     
     Usage:
-        with timer("DB: get_sales_data"):
-            data = queries.get_sales_data(...)
+        with timer("Load unified raw data"):
+            data = loader.get_unified_data()
     """
-    _init_timing()
-    start = time.perf_counter()
-    try:
-        yield
-    finally:
-        elapsed = time.perf_counter() - start
-        if DEBUG_TIMING:
-            print(f"⏱️ [{name}] {elapsed:.3f}s")
-        st.session_state[CACHE_KEY_TIMING].append({
-            'name': name,
-            'time': elapsed
-        })
+    return perf.track(name, category)
 
 
 def _print_timing_summary():
-    """Print formatted timing summary at end of page load."""
-    if not DEBUG_TIMING:
-        return
-    
-    timing_data = st.session_state.get(CACHE_KEY_TIMING, [])
-    if not timing_data:
-        return
-    
-    total_time = sum(t['time'] for t in timing_data)
-    
-    print(f"\n{'='*60}")
-    print(f"📊 TIMING SUMMARY")
-    print(f"{'='*60}")
-    
-    sorted_data = sorted(timing_data, key=lambda x: x['time'], reverse=True)
-    
-    for item in sorted_data:
-        pct = (item['time'] / total_time * 100) if total_time > 0 else 0
-        bar = '█' * int(pct / 5) + '░' * (20 - int(pct / 5))
-        print(f"{item['name']:<45} {item['time']:>6.3f}s ({pct:>5.1f}%) {bar}")
-    
-    print(f"{'-'*60}")
-    print(f"{'TOTAL':<45} {total_time:>6.3f}s")
-    print(f"{'='*60}\n")
+    """End the trace: summary (DEBUG_TIMING), telemetry store, trace view."""
+    perf.finish(print_summary=DEBUG_TIMING)
+    render_trace_view()
 
 
 # =============================================================================
@@ -252,8 +215,7 @@ def main():
     # Check if data loaded successfully
     if unified_cache.get('sales_raw_df') is None or unified_cache['sales_raw_df'].empty:
         st.error("Failed to load data. Please try refreshing the page.")
-        if DEBUG_TIMING:
-            _print_timing_summary()
+        _print_timing_summary()
         st.stop()
     
     # =========================================================================
@@ -366,8 +328,7 @@ def main():
     
     if sales_df.empty and backlog_df.empty:
         st.warning("No data found for the selected filters. Try adjusting your selection.")
-        if DEBUG_TIMING:
-            _print_timing_summary()
+        _print_timing_summary()
         st.stop()
     
     # Info message if no sales but have backlog
@@ -498,7 +459,9 @@ def main():
     # =========================================================================
     
     with timer("Metrics: prepare_monthly_summary"):
-        monthly_df = processor.prepare_monthly_summary(sales_df)
+        monthly_df = processor.prepare_monthly_summary(
+            sales_df, monthly_cube=data.get('monthly_cube')
+        )
     
     with timer("Metrics: aggregate_by_kpi_center"):
         kpi_center_summary_df = processor.aggregate_by_kpi_center(sales_df)
@@ -615,6 +578,17 @@ def main():
             kpi_center_summary_df=kpi_center_summary_df,
         )
     
+    # =========================================================================
+    # BACKGROUND PREFETCH — Payment tab drill-down (largest AR invoices)
+    # Overview is rendered: warm payment transactions / documents in one
+    # batched query each; loaders fall back to a direct query on a miss.
+    # =========================================================================
+    prefetcher = get_prefetcher("kpi_center")
+    if _PAYMENT_AVAILABLE and not ar_outstanding_df.empty:
+        _likely_invoices = top_keys(ar_outstanding_df, 'inv_number', 'outstanding_by_kpi_center_usd')
+        prefetcher.schedule('payment_txn', queries.get_payment_transactions, _likely_invoices, 'inv_number')
+        prefetcher.schedule('invoice_docs', queries.get_invoice_documents, _likely_invoices, 'invoice_number')
+    
     # =========================================================================
     # TAB 2: SALES DETAIL
     # =========================================================================
@@ -680,11 +654,12 @@ def main():
         st.subheader("💰 Payment & Collection")
         
         if not ar_outstanding_df.empty or not period_payment_df.empty:
-            def _load_payment_txns(inv_numbers):
-                return queries.get_payment_transactions(inv_numbers)
-            
-            def _load_invoice_docs(inv_numbers):
-                return queries.get_invoice_documents(inv_numbers)
+            _load_payment_txns = prefetcher.loader(
+                'payment_txn', queries.get_payment_transactions, 'inv_number'
+            )
+            _load_invoice_docs = prefetcher.loader(
+                'invoice_docs', queries.get_invoice_documents, 'invoice_number'
+            )
             
             payment_tab_fragment(
                 sales_df=sales_df,
@@ -1,8 +1,13 @@
 # pages/1_📊_Delivery_Schedule.py
 
+import logging
+import time
+from contextlib import contextmanager
+
 import streamlit as st
 from datetime import datetime
 from utils.auth import AuthManager
+from utils.perf import perf, render_trace_view
 from utils.delivery_schedule import (
     DeliveryDataLoader,
     EmailSender,
@@ -13,10 +18,11 @@ from utils.delivery_schedule import (
     display_email_notifications,
     needs_completed_data,
     apply_client_filters,
-    calculate_fulfillment,
     render_user_guide,
 )
 
+logger = logging.getLogger(__name__)
+
 # ── Page config & auth ───────────────────────────────────────────
 
 st.set_page_config(page_title="Delivery Schedule", page_icon="📊", layout="wide")
@@ -30,15 +36,62 @@ data_loader = DeliveryDataLoader()
 email_sender = EmailSender()
 
 
+# ── Perf log ─────────────────────────────────────────────────────
+
+_PERF_KEY = '_ds_perf_log'
+
+
+@contextmanager
+def _perf(name: str, **detail):
+    """Time a step of this run into the page perf log and the trace (utils.perf)."""
+    start = time.perf_counter()
+    with perf.track(name) as span:
+        try:
+            yield detail
+        finally:
+            span.metadata.update(detail)
+            st.session_state.setdefault(_PERF_KEY, []).append(
+                {'name': name, 'time': time.perf_counter() - start, **detail}
+            )
+
+
+def _log_perf_summary():
+    """End the trace (telemetry, trace view) and log this run's steps, slowest first."""
+    perf.finish(print_summary=False)
+    render_trace_view()
+    records = st.session_state.pop(_PERF_KEY, [])
+    if not records:
+        return
+    total = sum(r['time'] for r in records)
+    lines = [f"[delivery_schedule] run {total:.3f}s"]
+    for r in sorted(records, key=lambda r: r['time'], reverse=True):
+        extra = ', '.join(f"{k}={v}" for k, v in r.items() if k not in ('name', 'time'))
+        lines.append(f"  {r['name']:<28} {r['time']:>7.3f}s" + (f"  ({extra})" if extra else ''))
+    logger.info('\n'.join(lines))
+
+
+def _apply_fulfillment(data_loader, df, include_completed, include_expired, label):
+    """Incremental fulfillment recompute, timed into the perf log."""
+    with _perf(label) as detail:
+        engine = data_loader.get_fulfillment_engine(include_completed, include_expired)
+        df = engine.apply(df)
+        stats = engine.last_stats
+        detail.update(mode=stats.get('mode'), rows=stats.get('rows'),
+                      lines=stats.get('changed_lines'), products=stats.get('changed_products'))
+    return df
+
+
 # ── Smart data loading with progress ─────────────────────────────
 
 def _load_smart(data_loader, filters, progress, status):
     """Two-tier cache + dynamic fulfillment with progress feedback.
 
-    Tier 1 — st.cache_data inside load_base_data (TTL 5 min, keyed by
-             include_completed bool).  Two possible cached DataFrames.
+    Tier 1 — st.cache_resource behind load_base_data (TTL 5 min, keyed by
+             include_completed bool).  Two possible cached DataFrames,
+             patched in place when ETDs are saved.
     Tier 2 — client-side pandas filtering on the cached DataFrame.
-    Tier 3 — fulfillment recalculation on filtered result.
+    Tier 3 — fulfillment on the filtered result (FulfillmentEngine — only
+             products whose lines entered / left the filter are recomputed).
     """
     include_completed = needs_completed_data(filters)
 
@@ -48,7 +101,8 @@ def _load_smart(data_loader, filters, progress, status):
         + ("all deliveries (incl. completed)..." if include_completed else "active deliveries...")
     )
     progress.progress(20, text="Loading from cache...")
-    df_base = data_loader.load_base_data(include_completed)
+    with _perf("load_base_data"):
+        df_base = data_loader.load_base_data(include_completed)
 
     if df_base is None or df_base.empty:
         return None
@@ -56,7 +110,8 @@ def _load_smart(data_loader, filters, progress, status):
     # Step 2 — Apply filters
     status.markdown("🔍 **Applying filters...**")
     progress.progress(50, text="Applying filters...")
-    df = apply_client_filters(df_base, filters)
+    with _perf("apply_client_filters"):
+        df = apply_client_filters(df_base, filters)
 
     if df is None or df.empty:
         return None
@@ -65,7 +120,8 @@ def _load_smart(data_loader, filters, progress, status):
     status.markdown("📊 **Calculating fulfillment...**")
     progress.progress(75, text="Calculating fulfillment...")
     include_expired = filters.get('include_expired', True)
-    df = calculate_fulfillment(df, include_expired=include_expired)
+    df = _apply_fulfillment(data_loader, df, include_completed, include_expired,
+                            "fulfillment (filtered)")
 
     progress.progress(100, text="Done!")
     return df
@@ -75,6 +131,8 @@ def _load_smart(data_loader, filters, progress, status):
 
 def main():
     st.title("📊 Delivery Schedule")
+    st.session_state[_PERF_KEY] = []
+    perf.reset(page='delivery_schedule')
     render_user_guide()
 
     # Step 0 — Load filter options (triggers initial data cache)
@@ -83,7 +141,8 @@ def main():
 
     status.markdown("📦 **Loading delivery data & filter options...**")
     progress.progress(15, text="Loading data...")
-    filter_options = data_loader.get_filter_options()
+    with _perf("get_filter_options"):
+        filter_options = data_loader.get_filter_options()
 
     # Clear progress while user interacts with filters
     progress.empty()
@@ -103,6 +162,7 @@ def main():
         progress.empty()
         status.empty()
         st.info("No delivery data found for the selected filters")
+        _log_perf_summary()
         return
 
     # Step 4 — Load overdue data (cache hit — no extra DB query)
@@ -110,7 +170,8 @@ def main():
     progress.progress(85, text="Loading overdue data...")
     include_expired = filters.get('include_expired', True)
     df_all_active = data_loader.load_base_data(include_completed=False)
-    df_all_active = calculate_fulfillment(df_all_active, include_expired=include_expired)
+    df_all_active = _apply_fulfillment(data_loader, df_all_active, False, include_expired,
+                                       "fulfillment (all active)")
 
     # Step 5 — Rendering
     status.markdown("🎨 **Rendering UI...**")
@@ -150,6 +211,7 @@ def main():
     # Footer
     st.markdown("---")
     st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    _log_perf_summary()
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ from sqlalchemy import text
 # Import utilities
 from utils.auth import AuthManager
 from utils.config import config
+from utils.perf import perf, PC, render_trace_view
 
 # Import data repositories
 from utils.allocation.product_data import ProductData
@@ -540,11 +541,13 @@ def has_active_filters() -> bool:
 def show_product_list():
     """Display product list with demand/supply summary"""
     try:
-        products_df = product_data.get_products_with_demand_supply(
-            filters=st.session_state.filters,
-            page=st.session_state.ui['page_number'],
-            page_size=ITEMS_PER_PAGE
-        )
+        with perf.track("get_products_with_demand_supply", PC.SQL) as t:
+            products_df = product_data.get_products_with_demand_supply(
+                filters=st.session_state.filters,
+                page=st.session_state.ui['page_number'],
+                page_size=ITEMS_PER_PAGE
+            )
+            t.rows = len(products_df)
     except Exception as e:
         st.error(f"Error loading products: {str(e)}")
         logger.error(f"Error in show_product_list: {e}")
@@ -1196,6 +1199,8 @@ def main():
         st.switch_page("app.py")
         st.stop()
     
+    perf.reset(page='allocation_plan')
+    
     # Ensure user data is properly loaded
     if not st.session_state.get('user', {}).get('id'):
         init_session_state()
@@ -1214,15 +1219,18 @@ def main():
     
     # Display main page
     show_header()
-    show_metrics_row()
+    with perf.track("show_metrics_row", PC.SQL):
+        show_metrics_row()
     st.divider()
     
     # NEW: Show dropdown filters instead of quick filter buttons
-    show_filters()
+    with perf.track("show_filters", PC.FILTER):
+        show_filters()
     
     st.divider()
     
-    show_product_list()
+    with perf.track("show_product_list", PC.RENDER):
+        show_product_list()
     
     # Handle modals
     if st.session_state.modals['allocation'] and st.session_state.selections.get('oc_for_allocation'):
@@ -1239,6 +1247,9 @@ def main():
     
     if st.session_state.modals['reverse'] and st.session_state.selections.get('cancellation_for_reverse'):
         show_reverse_cancellation_modal()
+    
+    perf.finish(print_summary=False)
+    render_trace_view()
 
 # Run the main function
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 # pages/1_📉_Net_GAP.py
 
 """
-Net GAP Analysis Page - Enhanced with Expired Inventory Tracking v4.2
+Net GAP Analysis Page - Enhanced with Expired Inventory Tracking v4.3
+- Load-once entity snapshots; filters applied in memory
 """
 
 import streamlit as st
@@ -30,6 +31,7 @@ if str(project_root) not in os.sys.path:
     os.sys.path.insert(0, str(project_root))
 
 from utils.auth import AuthManager
+from utils.perf import perf, PC, render_trace_view
 from utils.net_gap.state import get_state
 from utils.net_gap.data_loader import GAPDataLoader
 from utils.net_gap.calculator import GAPCalculator
@@ -50,7 +52,15 @@ from utils.net_gap.export import export_to_excel
 from utils.net_gap.customer_dialog import show_customer_dialog
 from utils.net_gap.constants import UI_CONFIG
 
-VERSION = "4.2"
+VERSION = "4.3"
+
+_PAGE = 'net_gap'
+
+
+def _finish_trace():
+    """End the trace for this rerun: telemetry store, trace view."""
+    perf.finish(print_summary=False)
+    render_trace_view()
 
 
 def initialize_system():
@@ -73,50 +83,62 @@ def calculate_gap(
     """Load data and calculate GAP with expired inventory tracking"""
     
     with st.spinner("📊 Calculating GAP analysis..."):
-        # Load supply data
-        supply_df = data_loader.load_supply_data(
-            entity_name=filter_values.get('entity'),
-            exclude_entity=filter_values.get('exclude_entity', False),
-            product_ids=filter_values.get('products_tuple'),
-            brands=filter_values.get('brands_tuple'),
-            exclude_products=filter_values.get('exclude_products', False),
-            exclude_brands=filter_values.get('exclude_brands', False),
-            exclude_expired=filter_values.get('exclude_expired', True),
-            po_approval_statuses=tuple(filter_values.get('po_approval_statuses', ['APPROVED'])),
-            po_order_types=tuple(filter_values.get('po_order_types', ['REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER'])),
-        )
+        # Load once per entity scope; product/brand/PO/expiry filters are
+        # applied in memory, so changing them does not re-query the views
+        entity_name = filter_values.get('entity')
+        exclude_entity = filter_values.get('exclude_entity', False)
+        product_ids = filter_values.get('products_tuple')
+        brands = filter_values.get('brands_tuple')
+        exclude_products = filter_values.get('exclude_products', False)
+        exclude_brands = filter_values.get('exclude_brands', False)
         
-        # Load expired inventory details if including expired
+        with perf.track("load_snapshots", PC.SQL):
+            supply_snapshot = data_loader.load_supply_snapshot(entity_name, exclude_entity)
+            demand_snapshot = data_loader.load_demand_snapshot(entity_name, exclude_entity)
+        
+        # Filter supply data
+        with perf.track("filter_supply", PC.FILTER):
+            supply_df = data_loader.filter_supply_data(
+                supply_snapshot,
+                product_ids=product_ids,
+                brands=brands,
+                exclude_products=exclude_products,
+                exclude_brands=exclude_brands,
+                exclude_expired=filter_values.get('exclude_expired', True),
+                po_approval_statuses=tuple(filter_values.get('po_approval_statuses', ['APPROVED'])),
+                po_order_types=tuple(filter_values.get('po_order_types', ['REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER'])),
+            )
+        
+        # Expired inventory details if including expired
         expired_inventory_df = None
         if not filter_values.get('exclude_expired', True):
-            expired_inventory_df = data_loader.load_expired_inventory_details(
-                entity_name=filter_values.get('entity'),
-                exclude_entity=filter_values.get('exclude_entity', False),
-                product_ids=filter_values.get('products_tuple'),
-                brands=filter_values.get('brands_tuple'),
-                exclude_products=filter_values.get('exclude_products', False),
-                exclude_brands=filter_values.get('exclude_brands', False)
+            expired_inventory_df = data_loader.expired_inventory_from_snapshot(
+                supply_snapshot,
+                product_ids=product_ids,
+                brands=brands,
+                exclude_products=exclude_products,
+                exclude_brands=exclude_brands
             )
             logger.info(f"Loaded expired inventory for {len(expired_inventory_df)} products")
         
-        # Load demand data
-        demand_df = data_loader.load_demand_data(
-            entity_name=filter_values.get('entity'),
-            exclude_entity=filter_values.get('exclude_entity', False),
-            product_ids=filter_values.get('products_tuple'),
-            brands=filter_values.get('brands_tuple'),
-            exclude_products=filter_values.get('exclude_products', False),
-            exclude_brands=filter_values.get('exclude_brands', False)
-        )
+        # Filter demand data
+        with perf.track("filter_demand", PC.FILTER):
+            demand_df = data_loader.filter_demand_data(
+                demand_snapshot,
+                product_ids=product_ids,
+                brands=brands,
+                exclude_products=exclude_products,
+                exclude_brands=exclude_brands
+            )
         
         # Load safety stock if needed
         safety_stock_df = None
         if filter_values.get('include_safety', False):
-            safety_stock_df = data_loader.load_safety_stock_data(
-                entity_name=filter_values.get('entity'),
-                exclude_entity=filter_values.get('exclude_entity', False),
-                product_ids=filter_values.get('products_tuple')
-            )
+            with perf.track("load_safety_stock", PC.SQL):
+                safety_stock_df = data_loader.filter_safety_stock_data(
+                    data_loader.load_safety_stock_snapshot(entity_name, exclude_entity),
+                    product_ids=product_ids
+                )
         
         # Validate data
         is_safety_enabled = filter_values.get('include_safety', False)
@@ -128,16 +150,17 @@ def calculate_gap(
             return None
    
         # Calculate GAP with expired inventory
-        result = calculator.calculate_net_gap(
-            supply_df=supply_df,
-            demand_df=demand_df,
-            safety_stock_df=safety_stock_df,
-            expired_inventory_df=expired_inventory_df,
-            group_by=filter_values.get('group_by', 'product'),
-            selected_supply_sources=filter_values.get('supply_sources'),
-            selected_demand_sources=filter_values.get('demand_sources'),
-            include_safety_stock=filter_values.get('include_safety', False)
-        )
+        with perf.track("calculate_net_gap", PC.METRICS):
+            result = calculator.calculate_net_gap(
+                supply_df=supply_df,
+                demand_df=demand_df,
+                safety_stock_df=safety_stock_df,
+                expired_inventory_df=expired_inventory_df,
+                group_by=filter_values.get('group_by', 'product'),
+                selected_supply_sources=filter_values.get('supply_sources'),
+                selected_demand_sources=filter_values.get('demand_sources'),
+                include_safety_stock=filter_values.get('include_safety', False)
+            )
         
         logger.info(f"GAP calculated: {result.get_summary()}")
         return result
@@ -152,6 +175,8 @@ def main():
         st.warning("⚠️ Please login to access this page")
         st.stop()
     
+    perf.reset(page=_PAGE)
+    
     # Initialize
     state, data_loader, calculator, formatter, filters, charts = initialize_system()
     
@@ -177,7 +202,8 @@ def main():
     
     # Filters section
     with st.expander("🔧 **Configuration**", expanded=True):
-        filter_values = filters.render_filters()
+        with perf.track("render_filters", PC.RENDER):
+            filter_values = filters.render_filters()
     
     # Action buttons
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -207,6 +233,7 @@ def main():
             if result:
                 state.set_filters(filter_values)
                 state.set_result(result)
+                perf.finish(print_summary=False)
                 st.rerun()
         except Exception as e:
             logger.error(f"Calculation failed: {e}", exc_info=True)
@@ -218,6 +245,7 @@ def main():
     
     if not result:
         st.info("Configure filters and click 'Calculate GAP' to begin")
+        _finish_trace()
         st.stop()
     
     # Check if expired inventory is included
@@ -251,7 +279,7 @@ def main():
     # Use tabs for better organization and space saving
     tab1, tab2, tab3 = st.tabs(["Overview", "Top Items", "Formula Guide"])
     
-    with tab1:
+    with tab1, perf.track("render_charts", PC.RENDER):
         col1, col2 = st.columns([1, 1])
         
         with col1:
@@ -338,14 +366,15 @@ def main():
                 st.error("Export failed")
     
     # Display enhanced table with expired inventory columns
-    page_info = render_data_table(
-        filtered_df,
-        items_per_page=items_per_page,
-        current_page=state.get_page(),
-        formatter=formatter,
-        include_safety=filter_values.get('include_safety', False),
-        include_expired=include_expired
-    )
+    with perf.track("render_data_table", PC.RENDER, rows=len(filtered_df)):
+        page_info = render_data_table(
+            filtered_df,
+            items_per_page=items_per_page,
+            current_page=state.get_page(),
+            formatter=formatter,
+            include_safety=filter_values.get('include_safety', False),
+            include_expired=include_expired
+        )
     
     # Handle pagination
     if page_info:
@@ -365,6 +394,7 @@ def main():
         f"Last calculated: {result.timestamp.strftime('%Y-%m-%d %H:%M:%S')} | "
         f"Net GAP Analysis v{VERSION}"
     )
+    _finish_trace()
 
 
 if __name__ == "__main__":
@@ -34,6 +34,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Import authentication
 from utils.auth import AuthManager
+from utils.perf import perf, PC, render_trace_view
 
 # Constants
 VERSION = "4.0"  # Redesigned UI with tabs
@@ -41,6 +42,7 @@ MAX_EXPORT_ROWS = 50000
 DEFAULT_PERIOD_TYPE = "Weekly"
 DEFAULT_TRACK_BACKLOG = True
 DEFAULT_OC_DATE_FIELD = "ETA"
+_PAGE = 'period_gap'
 
 
 def initialize_components():
@@ -513,7 +515,8 @@ def export_to_excel(
     display_filters: Dict[str, Any],
     calc_options: Dict[str, Any],
     df_demand_filtered: pd.DataFrame,
-    df_supply_filtered: pd.DataFrame
+    df_supply_filtered: pd.DataFrame,
+    product_summary: Optional[pd.DataFrame] = None
 ) -> bytes:
     """Export GAP analysis to Excel with all sheets"""
     from utils.period_gap.helpers import export_gap_with_metadata
@@ -524,7 +527,8 @@ def export_to_excel(
         display_filters=display_filters,
         calc_options=calc_options,
         df_demand_filtered=df_demand_filtered,
-        df_supply_filtered=df_supply_filtered
+        df_supply_filtered=df_supply_filtered,
+        product_summary=product_summary
     )
 
 
@@ -536,10 +540,13 @@ def main():
         st.warning("⚠️ Please login to access this page")
         st.stop()
     
+    perf.reset(page=_PAGE)
+    
     # Initialize
     data_loader, display_components = initialize_components()
     
     from utils.period_gap.gap_calculator import calculate_gap_with_carry_forward
+    from utils.period_gap.shortage_analyzer import build_product_summary
     from utils.period_gap.tab_components import (
         render_overview_section,
         render_gap_detail_tab,
@@ -571,12 +578,13 @@ def main():
     try:
         # Load filter data
         with st.spinner("Initializing..."):
-            filter_data = initialize_filter_data(data_loader)
-            update_filter_cache(
-                entities=filter_data['entities'],
-                products=filter_data['products'],
-                brands=filter_data['brands']
-            )
+            with perf.track("initialize_filter_data", PC.SQL):
+                filter_data = initialize_filter_data(data_loader)
+                update_filter_cache(
+                    entities=filter_data['entities'],
+                    products=filter_data['products'],
+                    brands=filter_data['brands']
+                )
         
         # Source Selection
         selected_sources = render_source_selection()
@@ -602,37 +610,50 @@ def main():
             
             with st.spinner("Loading data and calculating GAP..."):
                 # Load fresh data with selected sources
-                df_demand = data_loader.get_demand_data(
-                    sources=selected_sources['demand'],
-                    include_converted=selected_sources.get('include_converted', False),
-                    oc_date_field=selected_sources.get('oc_date_field', 'ETA')
-                )
+                with perf.track("get_demand_data", PC.SQL) as t:
+                    df_demand = data_loader.get_demand_data(
+                        sources=selected_sources['demand'],
+                        include_converted=selected_sources.get('include_converted', False),
+                        oc_date_field=selected_sources.get('oc_date_field', 'ETA')
+                    )
+                    t.rows = len(df_demand)
                 
-                df_supply = data_loader.get_supply_data(
-                    sources=selected_sources['supply'],
-                    exclude_expired=selected_sources.get('exclude_expired', True),
-                    po_approval_statuses=selected_sources.get('po_approval_statuses', ('APPROVED',)),
-                    po_order_types=selected_sources.get('po_order_types', ('REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER')),
-                )
+                with perf.track("get_supply_data", PC.SQL) as t:
+                    df_supply = data_loader.get_supply_data(
+                        sources=selected_sources['supply'],
+                        exclude_expired=selected_sources.get('exclude_expired', True),
+                        po_approval_statuses=selected_sources.get('po_approval_statuses', ('APPROVED',)),
+                        po_order_types=selected_sources.get('po_order_types', ('REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER')),
+                    )
+                    t.rows = len(df_supply)
                 
                 # Apply filters
-                df_demand_filtered, df_supply_filtered = apply_filters_to_data(
-                    df_demand,
-                    df_supply,
-                    filters,
-                    selected_sources.get('oc_date_field', 'ETA')
-                )
+                with perf.track("apply_filters_to_data", PC.FILTER):
+                    df_demand_filtered, df_supply_filtered = apply_filters_to_data(
+                        df_demand,
+                        df_supply,
+                        filters,
+                        selected_sources.get('oc_date_field', 'ETA')
+                    )
                 
                 # Calculate GAP
-                gap_df = calculate_gap_with_carry_forward(
-                    df_demand_filtered,
-                    df_supply_filtered,
-                    calc_options['period_type'],
-                    calc_options['track_backlog']
-                )
+                with perf.track("calculate_gap_with_carry_forward", PC.METRICS) as t:
+                    gap_df = calculate_gap_with_carry_forward(
+                        df_demand_filtered,
+                        df_supply_filtered,
+                        calc_options['period_type'],
+                        calc_options['track_backlog']
+                    )
+                    t.rows = len(gap_df)
+                
+                # One product summary per run, shared by every tab and the export
+                with perf.track("build_product_summary", PC.METRICS) as t:
+                    product_summary = build_product_summary(gap_df)
+                    t.rows = len(product_summary)
                 
                 # Save to session state
                 st.session_state['pgap_gap_df'] = gap_df
+                st.session_state['pgap_product_summary'] = product_summary
                 st.session_state['pgap_demand_filtered'] = df_demand_filtered
                 st.session_state['pgap_supply_filtered'] = df_supply_filtered
                 st.session_state['pgap_calc_options'] = calc_options
@@ -655,8 +676,14 @@ def main():
             
             if gap_df.empty:
                 st.warning("No data available for the selected filters and sources.")
+                perf.finish(print_summary=False)
                 st.stop()
             
+            product_summary = st.session_state.get('pgap_product_summary')
+            if product_summary is None:
+                product_summary = build_product_summary(gap_df)
+                st.session_state['pgap_product_summary'] = product_summary
+            
             # Show OC date field info
             if 'OC' in stored_sources.get("demand", []):
                 st.info(f"📊 OC Analysis using: **{stored_sources.get('oc_date_field', 'ETA')}**")
@@ -669,7 +696,8 @@ def main():
                 'track_backlog': stored_calc_options['track_backlog']
             }
             
-            render_overview_section(gap_df, display_options)
+            with perf.track("render_overview_section", PC.RENDER):
+                render_overview_section(gap_df, display_options, product_summary)
             
             st.markdown("---")
             
@@ -682,26 +710,32 @@ def main():
             ])
             
             with tab1:
-                render_gap_detail_tab(
-                    gap_df,
-                    display_options,
-                    df_demand_filtered,
-                    df_supply_filtered
-                )
+                with perf.track("render_gap_detail_tab", PC.RENDER):
+                    render_gap_detail_tab(
+                        gap_df,
+                        display_options,
+                        df_demand_filtered,
+                        df_supply_filtered,
+                        product_summary
+                    )
             
             with tab2:
-                render_product_summary_tab(gap_df, display_options)
+                with perf.track("render_product_summary_tab", PC.RENDER):
+                    render_product_summary_tab(gap_df, display_options, product_summary)
             
             with tab3:
-                render_period_summary_tab(gap_df, display_options)
+                with perf.track("render_period_summary_tab", PC.RENDER):
+                    render_period_summary_tab(gap_df, display_options)
             
             with tab4:
-                render_pivot_view_tab(gap_df, display_options)
+                with perf.track("render_pivot_view_tab", PC.RENDER):
+                    render_pivot_view_tab(gap_df, display_options, product_summary)
             
             st.markdown("---")
             
             # === ACTION ITEMS EXPANDER ===
-            render_action_items_expander(gap_df, df_supply_filtered)
+            with perf.track("render_action_items_expander", PC.RENDER):
+                render_action_items_expander(gap_df, df_supply_filtered, product_summary)
             
             st.markdown("---")
             
@@ -711,14 +745,16 @@ def main():
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                excel_data = export_to_excel(
-                    gap_df,
-                    filters,
-                    display_options,
-                    stored_calc_options,
-                    df_demand_filtered,
-                    df_supply_filtered
-                )
+                with perf.track("export_to_excel", PC.EXPORT):
+                    excel_data = export_to_excel(
+                        gap_df,
+                        filters,
+                        display_options,
+                        stored_calc_options,
+                        df_demand_filtered,
+                        df_supply_filtered,
+                        product_summary
+                    )
                 st.download_button(
                     "📊 Export Full Report",
                     data=excel_data,
@@ -735,6 +771,8 @@ def main():
     # Footer
     st.markdown("---")
     st.caption(f"Period GAP Analysis v{VERSION} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    perf.finish(print_summary=False)
+    render_trace_view()
 
 
 if __name__ == "__main__":
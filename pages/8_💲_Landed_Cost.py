@@ -25,6 +25,7 @@ import pandas as pd
 import streamlit as st
 
 from utils.auth import AuthManager
+from utils.perf import perf, PC, traced_fragment, render_trace_view
 from utils.landed_cost.data import LandedCostData
 from utils.landed_cost.common import (
     LandedCostConstants,
@@ -99,6 +100,7 @@ def render_header():
     with col2:
         if st.button("🔄 Refresh", use_container_width=True):
             st.cache_data.clear()
+            LandedCostData.clear_cache()
             st.session_state["lc_selected_idx"] = None
             st.rerun()
 
@@ -400,7 +402,7 @@ def render_kpi_cards(df: pd.DataFrame, bd_df: pd.DataFrame):
         )
 
 
-@st.fragment
+@traced_fragment
 def render_data_table(df: pd.DataFrame, bd_df: pd.DataFrame):
     """Cost lookup table with single-row checkbox selection and optional breakdown."""
     if df.empty:
@@ -535,7 +537,7 @@ def render_data_table(df: pd.DataFrame, bd_df: pd.DataFrame):
         st.info("💡 Tick checkbox to select a row and perform actions")
 
 
-@st.fragment
+@traced_fragment
 def render_export(df: pd.DataFrame):
     """Export to Excel."""
     if df.empty:
@@ -829,7 +831,7 @@ def _render_source_tabs(product_id: int, entity_id: int, cost_year: int):
             )
 
 
-@st.fragment
+@traced_fragment
 def _render_arrival_detail_selector(arr_df: pd.DataFrame):
     """Selectbox + expander to drill into a single arrival record."""
     st.markdown("---")
@@ -1357,18 +1359,24 @@ def render_tab_analytics(df: pd.DataFrame, bd_df: pd.DataFrame, filters: dict):
 # ============================================================
 
 def main():
+    perf.reset(page='landed_cost')
     try:
         render_header()
         st.markdown("---")
 
         # Inline filters
-        filters = render_filters()
+        with perf.track("render_filters", PC.FILTER):
+            filters = render_filters()
         st.markdown("---")
 
         # Load main data + breakdown data
         with st.spinner("Loading cost data..."):
-            df = data_loader.get_landed_cost_data(**filters)
-            bd_df = data_loader.get_cost_breakdown_data(**filters)
+            with perf.track("get_landed_cost_data", PC.SQL) as t:
+                df = data_loader.get_landed_cost_data(**filters)
+                t.rows = len(df)
+            with perf.track("get_cost_breakdown_data", PC.SQL) as t:
+                bd_df = data_loader.get_cost_breakdown_data(**filters)
+                t.rows = len(bd_df)
 
         # === Three tabs ===
         tab_lookup, tab_yoy, tab_analytics = st.tabs([
@@ -1379,7 +1387,8 @@ def main():
 
         # --- Tab 1: Cost Lookup ---
         with tab_lookup:
-            render_kpi_cards(df, bd_df)
+            with perf.track("render_kpi_cards", PC.RENDER):
+                render_kpi_cards(df, bd_df)
             st.markdown("---")
             render_data_table(df, bd_df)
             if not df.empty:
@@ -1393,11 +1402,13 @@ def main():
 
         # --- Tab 2: YoY ---
         with tab_yoy:
-            render_tab_yoy(filters)
+            with perf.track("render_tab_yoy", PC.RENDER):
+                render_tab_yoy(filters)
 
         # --- Tab 3: Analytics ---
         with tab_analytics:
-            render_tab_analytics(df, bd_df, filters)
+            with perf.track("render_tab_analytics", PC.RENDER):
+                render_tab_analytics(df, bd_df, filters)
 
     except Exception as e:
         st.error(f"Error loading Landed Cost page: {str(e)}")
@@ -1405,12 +1416,15 @@ def main():
 
         if st.button("🔄 Reload"):
             st.cache_data.clear()
+            LandedCostData.clear_cache()
             st.session_state["lc_selected_idx"] = None
             st.rerun()
 
     # Footer
     st.markdown("---")
     st.caption("Landed Cost v3.0")
+    perf.finish(print_summary=False)
+    render_trace_view()
 
 
 main()
\ No newline at end of file
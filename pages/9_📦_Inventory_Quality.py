@@ -28,6 +28,7 @@ import plotly.graph_objects as go
 from datetime import datetime, date, time, timedelta
 
 from utils.auth import AuthManager
+from utils.perf import perf, PC, render_trace_view
 from utils.inventory_quality.common import (
     InventoryQualityConstants,
     format_quantity,
@@ -1501,13 +1502,15 @@ def render_period_summary():
     
     # Load data - pass UTC datetimes
     with st.spinner("Loading inventory summary..."):
-        df = data_loader.get_inventory_period_summary(
-            from_date_utc=from_utc,
-            to_date_utc=to_utc,
-            warehouse_id=warehouse_id,
-            product_search=product_search,
-            entity_ids=entity_ids
-        )
+        with perf.track("get_inventory_period_summary", PC.SQL) as t:
+            df = data_loader.get_inventory_period_summary(
+                from_date_utc=from_utc,
+                to_date_utc=to_utc,
+                warehouse_id=warehouse_id,
+                product_search=product_search,
+                entity_ids=entity_ids
+            )
+            t.rows = len(df)
     
     # Apply movement type filters (client-side)
     if not df.empty and (filter_si or filter_so):
@@ -1967,6 +1970,7 @@ def render_analytics():
 
 def main():
     """Main application entry point"""
+    perf.reset(page='inventory_quality')
     try:
         render_header()
         st.markdown("---")
@@ -1984,12 +1988,14 @@ def main():
             st.markdown("---")
             
             with st.spinner("Loading inventory data..."):
-                df = data_loader.get_unified_inventory(
-                    category=category if category != 'All' else None,
-                    warehouse_id=warehouse_id,
-                    product_search=product_search if product_search else None,
-                    entity_ids=entity_ids
-                )
+                with perf.track("get_unified_inventory", PC.SQL) as t:
+                    df = data_loader.get_unified_inventory(
+                        category=category if category != 'All' else None,
+                        warehouse_id=warehouse_id,
+                        product_search=product_search if product_search else None,
+                        entity_ids=entity_ids
+                    )
+                    t.rows = len(df)
             
             # Apply brand filter client-side
             if brand_filter and not df.empty and 'brand' in df.columns:
@@ -2022,10 +2028,12 @@ def main():
                 elif expiry_filter == 'No Expiry':
                     df = df[expiry_dates.isna()].reset_index(drop=True)
             
-            render_summary_cards(df)
+            with perf.track("render_summary_cards", PC.RENDER):
+                render_summary_cards(df)
             st.markdown("---")
             
-            render_data_table(df)
+            with perf.track("render_data_table", PC.RENDER, rows=len(df)):
+                render_data_table(df)
             
             if not df.empty:
                 st.markdown("---")
@@ -2036,11 +2044,13 @@ def main():
         
         # ---- Tab 2: Tổng hợp tồn kho ----
         with tab_period:
-            render_period_summary()
+            with perf.track("render_period_summary", PC.RENDER):
+                render_period_summary()
         
         # ---- Tab 3: Analytics ----
         with tab_analytics:
-            render_analytics()
+            with perf.track("render_analytics", PC.RENDER):
+                render_analytics()
     
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
@@ -2054,6 +2064,8 @@ def main():
     # Footer
     st.markdown("---")
     st.caption("Inventory Quality Dashboard v1.3")
+    perf.finish(print_summary=False)
+    render_trace_view()
 
 
 if __name__ == "__main__":
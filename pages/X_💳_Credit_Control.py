@@ -26,6 +26,7 @@ import logging
 
 from utils.auth import AuthManager
 from utils.db import check_db_connection
+from utils.perf import perf, render_trace_view
 
 logger = logging.getLogger(__name__)
 
@@ -42,14 +43,16 @@ if '_perf' not in st.session_state:
 def _perf_reset():
     st.session_state['_perf'] = []
     st.session_state['_perf_page_start'] = perf_counter()
+    perf.reset(page='credit_control')
 
 _perf_reset()
 
 @contextmanager
 def _timer(label: str):
-    """Time a block and append to session perf log."""
+    """Time a block (trace span) and append to session perf log."""
     t0 = perf_counter()
-    yield
+    with perf.track(label):
+        yield
     elapsed_ms = (perf_counter() - t0) * 1000
     st.session_state['_perf'].append((label, elapsed_ms))
     if elapsed_ms > 500:
@@ -455,6 +458,8 @@ with tabs[_ti]:
 # FOOTER + TIMING DEBUG
 # ═══════════════════════════════════════════════════════════════
 _t_page_total = (perf_counter() - st.session_state.get('_perf_page_start', _t_page_start)) * 1000
+perf.finish(print_summary=False)
+render_trace_view()
 
 st.divider()
 st.caption(f"Credit Control v1.2 | {st.session_state.get('user_fullname','?')} | {user_role}")
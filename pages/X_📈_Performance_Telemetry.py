@@ -0,0 +1,184 @@
+# pages/X_📈_Performance_Telemetry.py
+"""
+Performance Telemetry
+
+Admin dashboard over the persistent perf store (utils.perf_telemetry).
+- Page run time trend per deploy tag
+- p50 / p95 per SQL query hint
+- Cache hit rate by key and day
+- Slowest steps / renders
+
+VERSION: 1.0.0
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import logging
+
+from utils.auth import AuthManager
+from utils.perf_telemetry import (
+    PERF_TELEMETRY_ENABLED, PERF_TELEMETRY_PATH,
+    load_runs, load_records, load_cache_events,
+)
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# Page Config
+# =====================================================================
+
+st.set_page_config(
+    page_title="Performance Telemetry",
+    page_icon="📈",
+    layout="wide",
+)
+
+# Auth
+auth = AuthManager()
+auth.require_role(["admin"])
+
+
+# =====================================================================
+# Helpers
+# =====================================================================
+
+def percentile_table(df: pd.DataFrame, by: str, min_count: int = 1) -> pd.DataFrame:
+    """count / p50 / p95 / max / total of `duration` per group, slowest p95 first"""
+    if df.empty:
+        return pd.DataFrame()
+    grouped = df.groupby(by)['duration']
+    table = pd.DataFrame({
+        'count': grouped.size(),
+        'p50_s': grouped.quantile(0.5),
+        'p95_s': grouped.quantile(0.95),
+        'max_s': grouped.max(),
+        'total_s': grouped.sum(),
+    })
+    table = table[table['count'] >= min_count]
+    return table.sort_values('p95_s', ascending=False).round(3).reset_index()
+
+
+# =====================================================================
+# Page Header & Filters
+# =====================================================================
+
+st.title("📈 Performance Telemetry")
+st.caption(f"Per-rerun timings persisted by the analytics pages · store: `{PERF_TELEMETRY_PATH}`")
+
+if not PERF_TELEMETRY_ENABLED:
+    st.info("Telemetry recording is disabled (PERF_TELEMETRY_ENABLED=0) — showing stored data only.")
+
+col_f1, col_f2, col_f3 = st.columns([1, 2, 1])
+with col_f1:
+    since_days = st.selectbox("Window", [1, 7, 14, 30], index=1, format_func=lambda d: f"Last {d} day(s)")
+
+runs = load_runs(since_days)
+if runs.empty:
+    st.info("No telemetry recorded in this window yet.")
+    st.stop()
+
+with col_f2:
+    pages = sorted(runs['page'].unique())
+    page = st.selectbox("Page", ["All pages"] + pages)
+page = None if page == "All pages" else page
+with col_f3:
+    min_count = st.number_input("Min samples", min_value=1, value=3, step=1)
+
+if page:
+    runs = runs[runs['page'] == page]
+records = load_records(since_days, page)
+cache_events = load_cache_events(since_days, page)
+
+# Summary metrics row
+col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+col_m1.metric("Runs", f"{len(runs):,}")
+page_s = runs['page_s'].fillna(runs['tracked_s'])
+col_m2.metric("Page p50", f"{page_s.quantile(0.5):.2f}s")
+col_m3.metric("Page p95", f"{page_s.quantile(0.95):.2f}s")
+if not cache_events.empty:
+    col_m4.metric("Cache hit rate", f"{cache_events['hit'].mean():.0%}")
+else:
+    col_m4.metric("Cache hit rate", "—")
+
+st.divider()
+
+tab_trend, tab_sql, tab_cache, tab_steps = st.tabs([
+    "📉 Run time trend", "🗃️ SQL p50/p95", "♻️ Cache hit rate", "🐢 Slowest steps",
+])
+
+# =====================================================================
+# Run time trend per deploy
+# =====================================================================
+
+with tab_trend:
+    trend = runs.assign(page_s=page_s, day=runs['time'].dt.floor('D'))
+    daily = trend.groupby(['day', 'page'])['page_s'].quantile(0.95).reset_index(name='p95_s')
+    fig = px.line(daily, x='day', y='p95_s', color='page', markers=True,
+                  title="Page p95 run time per day (s)")
+    st.plotly_chart(fig, use_container_width=True)
+
+    by_deploy = trend.groupby(['deploy', 'page']).agg(
+        runs=('run_id', 'size'),
+        first_seen=('time', 'min'),
+        p50_s=('page_s', lambda s: s.quantile(0.5)),
+        p95_s=('page_s', lambda s: s.quantile(0.95)),
+        sql_p50_s=('sql_s', lambda s: s.quantile(0.5)),
+    ).round(3).reset_index().sort_values(['page', 'first_seen'])
+    st.markdown("**Per deploy tag**")
+    st.dataframe(by_deploy, use_container_width=True, hide_index=True)
+
+# =====================================================================
+# SQL p50 / p95
+# =====================================================================
+
+with tab_sql:
+    sql = records[records['category'] == 'SQL'] if not records.empty else records
+    if sql.empty:
+        st.info("No SQL timings recorded in this window.")
+    else:
+        sql = sql.assign(query=sql['query_hint'].fillna(sql['label']))
+        st.dataframe(percentile_table(sql, ['page', 'query'], min_count),
+                     use_container_width=True, hide_index=True)
+
+# =====================================================================
+# Cache hit rate
+# =====================================================================
+
+with tab_cache:
+    if cache_events.empty:
+        st.info("No cache events recorded in this window.")
+    else:
+        events = cache_events.assign(day=cache_events['time'].dt.floor('D'))
+        by_key = events.groupby('key').agg(
+            lookups=('hit', 'size'), hit_rate=('hit', 'mean'),
+        ).round(3).reset_index().sort_values('hit_rate')
+        st.dataframe(by_key, use_container_width=True, hide_index=True)
+
+        daily = events.groupby(['day', 'key'])['hit'].mean().reset_index(name='hit_rate')
+        fig = px.line(daily, x='day', y='hit_rate', color='key', markers=True,
+                      title="Cache hit rate per key per day")
+        fig.update_yaxes(tickformat='.0%', range=[0, 1])
+        st.plotly_chart(fig, use_container_width=True)
+
+        misses = events[events['hit'] == 0]
+        if 'reason' in misses and misses['reason'].notna().any():
+            st.markdown("**Miss reasons**")
+            st.dataframe(misses.groupby(['key', 'reason']).size().reset_index(name='misses')
+                         .sort_values('misses', ascending=False),
+                         use_container_width=True, hide_index=True)
+
+# =====================================================================
+# Slowest steps / renders
+# =====================================================================
+
+with tab_steps:
+    steps = records[records['category'] != 'SQL'] if not records.empty else records
+    if steps.empty:
+        st.info("No step timings recorded in this window.")
+    else:
+        categories = sorted(steps['category'].dropna().unique())
+        selected = st.multiselect("Categories", categories, default=categories)
+        steps = steps[steps['category'].isin(selected)]
+        st.dataframe(percentile_table(steps, ['page', 'category', 'label'], min_count).head(50),
+                     use_container_width=True, hide_index=True)
@@ -17,6 +17,7 @@ import logging
 
 from utils.auth import AuthManager
 from utils.materialization import get_mat_manager
+from utils.perf import perf, PC, render_trace_view
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,8 @@ auth.require_role(["admin"])
 # Manager
 mgr = get_mat_manager()
 
+perf.reset(page='materialization_manager')
+
 
 # =====================================================================
 # Helpers
@@ -118,8 +121,9 @@ st.divider()
 # Overview Cards
 # =====================================================================
 
-tables = mgr.list_tables()
-all_freshness = mgr.get_all_freshness()
+with perf.track("load_freshness", PC.SQL):
+    tables = mgr.list_tables()
+    all_freshness = mgr.get_all_freshness()
 
 # Summary metrics row
 col_m1, col_m2, col_m3, col_m4 = st.columns(4)
@@ -144,8 +148,9 @@ for info in tables:
     tn = info.table_name
     fresh = all_freshness.get(tn, {})
     emoji, color, label = freshness_badge(fresh.get("minutes_ago"), fresh.get("total_rows", 0))
-    size = mgr.get_table_size(tn)
-    is_running = mgr.is_refreshing(tn)
+    with perf.track(f"table_status: {tn}", PC.SQL):
+        size = mgr.get_table_size(tn)
+        is_running = mgr.is_refreshing(tn)
 
     with st.container(border=True):
         # Header row
@@ -184,12 +189,14 @@ for info in tables:
             else:
                 if st.button("🔄 Refresh Now", key=f"btn_{tn}", type="primary", use_container_width=True):
                     with st.spinner(f"Refreshing {info.display_name}..."):
-                        result = mgr.refresh(tn)
+                        with perf.track(f"refresh: {tn}", PC.SQL):
+                            result = mgr.refresh(tn)
                     if result.get("refresh_status") == "SUCCESS":
                         st.success(
                             f"✅ Refreshed! {format_rows(result.get('row_count'))} rows "
                             f"in {format_duration(result.get('duration_sec'))}"
                         )
+                        perf.finish(print_summary=False)
                         st.rerun()
                     elif result.get("refresh_status") == "SKIPPED":
                         st.info("⏭️ Skipped — another refresh is already running.")
@@ -466,4 +473,7 @@ with st.expander("🧹 Maintenance", expanded=False):
             if deleted > 0:
                 st.success(f"Deleted {deleted} old log entries.")
             else:
-                st.info("No old logs to clean up.")
\ No newline at end of file
+                st.info("No old logs to clean up.")
+
+perf.finish(print_summary=False)
+render_trace_view()
@@ -57,6 +57,7 @@ from .config import (
 # Database
 from .db import (
     get_db_engine,
+    get_read_engine,
     check_db_connection,
     reset_db_engine,
     get_connection,
@@ -66,6 +67,9 @@ from .db import (
     execute_update,
     execute_many,
     get_connection_pool_status,
+    autotune_pool,
+    get_read_routing_status,
+    mark_session_write,
 )
 
 # S3 - Optional import (may not exist in all deployments)
@@ -122,6 +126,10 @@ __all__ = [
     'execute_update',
     'execute_many',
     'get_connection_pool_status',
+    'autotune_pool',
+    'get_read_engine',
+    'get_read_routing_status',
+    'mark_session_write',
     
     # S3 (optional)
     'S3Manager',
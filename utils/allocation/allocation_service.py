@@ -14,11 +14,25 @@ from threading import local
 
 from ..db import get_db_engine
 from ..config import config
+from ..supply_demand_snapshot import get_snapshot_service
 from .supply_data import SupplyData
 from .uom_converter import UOMConverter
 
 logger = logging.getLogger(__name__)
 
+
+def clear_allocation_caches():
+    """
+    Drop cached planning data after an allocation write.
+
+    st.cache_data holds the per-session loaders; supply/demand (Net GAP
+    is_allocated / allocated_quantity, allocation supply tables) lives in the
+    process-wide snapshot, which st.cache_data.clear() does not reach.
+    """
+    st.cache_data.clear()
+    get_snapshot_service().invalidate()
+
+
 # ==================== CUSTOM EXCEPTIONS ====================
 class AllocationError(Exception):
     """Base exception for allocation errors"""
@@ -280,7 +294,7 @@ class AllocationService:
                     total_allocated += allocated_qty
                 
                 # Clear cache
-                st.cache_data.clear()
+                clear_allocation_caches()
                 
                 logger.info(
                     f"Successfully created allocation {allocation_number} by user {user_info['username']} "
@@ -390,7 +404,7 @@ class AllocationService:
                 cancellation_id = result.lastrowid
                 
                 # Clear cache
-                st.cache_data.clear()
+                clear_allocation_caches()
                 
                 logger.info(
                     f"User {user_info['username']} (ID: {user_id}) cancelled "
@@ -481,7 +495,7 @@ class AllocationService:
                 })
                 
                 # Clear cache
-                st.cache_data.clear()
+                clear_allocation_caches()
                 
                 update_count = (detail.get('etd_update_count', 0) or 0) + 1
                 
@@ -572,7 +586,7 @@ class AllocationService:
                 })
                 
                 # Clear cache
-                st.cache_data.clear()
+                clear_allocation_caches()
                 
                 logger.info(
                     f"User {user_info['username']} (ID: {user_id}) reversed cancellation {cancellation_id}. "
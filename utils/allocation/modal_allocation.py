@@ -14,7 +14,7 @@ import time
 from datetime import datetime
 import pandas as pd
 
-from .allocation_service import AllocationService
+from .allocation_service import AllocationService, clear_allocation_caches
 from .supply_data import SupplyData
 from .formatters import format_number, format_date
 from .validators import AllocationValidator
@@ -510,7 +510,7 @@ def show_allocation_modal():
             reset_modal_state()
             st.session_state.modals['allocation'] = False
             st.session_state.selections['oc_for_allocation'] = None
-            st.cache_data.clear()
+            clear_allocation_caches()
             st.rerun()
     
     # ============================================================
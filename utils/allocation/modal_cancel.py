@@ -13,7 +13,7 @@ import streamlit as st
 import time
 from datetime import datetime
 
-from .allocation_service import AllocationService
+from .allocation_service import AllocationService, clear_allocation_caches
 from .formatters import format_number, format_date
 from .validators import AllocationValidator
 from .uom_converter import UOMConverter
@@ -211,7 +211,7 @@ def show_cancel_allocation_modal():
             st.session_state.modals['cancel'] = False
             st.session_state.selections['allocation_for_cancel'] = None
             return_to_history_if_context()
-            st.cache_data.clear()
+            clear_allocation_caches()
             st.rerun()
     
     # ============================================================
@@ -13,7 +13,7 @@ import streamlit as st
 import time
 from datetime import datetime
 
-from .allocation_service import AllocationService
+from .allocation_service import AllocationService, clear_allocation_caches
 from .formatters import format_number, format_date
 from .validators import AllocationValidator
 from .allocation_email import AllocationEmailService
@@ -190,7 +190,7 @@ def show_reverse_cancellation_modal():
             st.session_state.modals['reverse'] = False
             st.session_state.selections['cancellation_for_reverse'] = None
             return_to_history_if_context()
-            st.cache_data.clear()
+            clear_allocation_caches()
             st.rerun()
     
     # ============================================================
@@ -14,7 +14,7 @@ import pandas as pd
 import time
 from datetime import datetime
 
-from .allocation_service import AllocationService
+from .allocation_service import AllocationService, clear_allocation_caches
 from .formatters import format_number, format_date
 from .validators import AllocationValidator
 from .allocation_email import AllocationEmailService
@@ -166,7 +166,7 @@ def show_update_etd_modal():
             st.session_state.modals['update_etd'] = False
             st.session_state.selections['allocation_for_update'] = None
             return_to_history_if_context()
-            st.cache_data.clear()
+            clear_allocation_caches()
             st.rerun()
     
     # ============================================================
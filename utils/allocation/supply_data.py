@@ -2,6 +2,7 @@
 Supply Data Repository - Handles supply source queries
 REFACTORED: Implemented MIN logic for committed quantity calculation
 to handle data inconsistency during transition period
+Per-source product views read from the shared supply/demand snapshot
 """
 import pandas as pd
 import logging
@@ -11,6 +12,7 @@ from sqlalchemy import text
 
 from ..db import get_db_engine
 from ..config import config
+from ..supply_demand_snapshot import get_snapshot_service, rows_for_product
 
 logger = logging.getLogger(__name__)
 
@@ -308,124 +310,94 @@ class SupplyData:
             return pd.DataFrame()
     
     # ==================== Individual Supply Type Queries ====================
+    # Read-only product views come from the shared supply/demand snapshot
+    # service; availability/commitment checks above and below stay on live SQL.
     
-    @st.cache_data(ttl=300)
-    def get_inventory_summary(_self, product_id: int) -> pd.DataFrame:
+    @staticmethod
+    def _as_dates(df: pd.DataFrame, columns) -> pd.DataFrame:
+        """datetime64 → date / None, as returned by the direct queries"""
+        for col in columns:
+            if col in df.columns:
+                df[col] = df[col].dt.date.astype(object).where(df[col].notna(), None)
+        return df
+    
+    def get_inventory_summary(self, product_id: int) -> pd.DataFrame:
         """Get inventory summary for product view"""
         try:
-            query = """
-                SELECT 
-                    inventory_history_id,
-                    product_id,
-                    product_name,
-                    batch_number,
-                    remaining_quantity as available_quantity,
-                    standard_uom,
-                    expiry_date,
-                    warehouse_name,
-                    location
-                FROM inventory_detailed_view
-                WHERE product_id = :product_id AND remaining_quantity > 0
-                ORDER BY expiry_date ASC
-            """
+            df = rows_for_product(get_snapshot_service().get('inventory'), product_id)
+            df = df[df['remaining_quantity'] > 0]
             
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params={'product_id': product_id})
+            df = df[[
+                'inventory_history_id', 'product_id', 'product_name', 'batch_number',
+                'remaining_quantity', 'standard_uom', 'expiry_date',
+                'warehouse_name', 'location'
+            ]].rename(columns={'remaining_quantity': 'available_quantity'})
             
-            return df
+            df = df.sort_values('expiry_date', kind='stable', na_position='first').reset_index(drop=True)
+            return self._as_dates(df, ['expiry_date'])
             
         except Exception as e:
             logger.error(f"Error loading inventory summary: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=300)
-    def get_can_summary(_self, product_id: int) -> pd.DataFrame:
+    def get_can_summary(self, product_id: int) -> pd.DataFrame:
         """Get CAN summary with buying UOM information"""
         try:
-            query = """
-                SELECT 
-                    can_line_id,
-                    product_id,
-                    product_name,
-                    arrival_note_number,
-                    pending_quantity,
-                    standard_uom,
-                    buying_quantity,
-                    buying_uom,
-                    uom_conversion,
-                    arrival_date,
-                    vendor,
-                    po_number
-                FROM can_pending_stockin_view
-                WHERE product_id = :product_id AND pending_quantity > 0
-                ORDER BY arrival_date ASC
-            """
+            df = rows_for_product(get_snapshot_service().get('pending_can'), product_id)
+            df = df[df['pending_quantity'] > 0]
             
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params={'product_id': product_id})
+            df = df[[
+                'can_line_id', 'product_id', 'product_name', 'arrival_note_number',
+                'pending_quantity', 'standard_uom', 'buying_quantity', 'buying_uom',
+                'uom_conversion', 'arrival_date', 'vendor', 'po_number'
+            ]]
             
-            return df
+            df = df.sort_values('arrival_date', kind='stable', na_position='first').reset_index(drop=True)
+            return self._as_dates(df, ['arrival_date'])
             
         except Exception as e:
             logger.error(f"Error loading CAN summary: {e}")
             return pd.DataFrame()
     
-    @st.cache_data(ttl=300)
-    def get_po_summary(_self, product_id: int) -> pd.DataFrame:
+    def get_po_summary(self, product_id: int) -> pd.DataFrame:
         """Get PO summary with buying UOM information"""
         try:
-            query = """
-                SELECT 
-                    po_line_id,
-                    product_id,
-                    product_name,
-                    po_number,
-                    pending_standard_arrival_quantity as pending_quantity,
-                    standard_uom,
-                    pending_buying_invoiced_quantity as buying_quantity,
-                    buying_uom,
-                    uom_conversion,
-                    etd,
-                    eta,
-                    vendor_name
-                FROM purchase_order_full_view
-                WHERE product_id = :product_id AND pending_standard_arrival_quantity > 0
-                ORDER BY etd ASC
-            """
+            # Snapshot already holds pending_standard_arrival_quantity > 0 only
+            df = rows_for_product(get_snapshot_service().get('purchase_order'), product_id)
             
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params={'product_id': product_id})
+            df = df[[
+                'po_line_id', 'product_id', 'product_name', 'po_number',
+                'pending_standard_arrival_quantity', 'standard_uom',
+                'pending_buying_invoiced_quantity', 'buying_uom', 'uom_conversion',
+                'etd', 'eta', 'vendor_name'
+            ]].rename(columns={
+                'pending_standard_arrival_quantity': 'pending_quantity',
+                'pending_buying_invoiced_quantity': 'buying_quantity',
+            })
             
-            return df
+            df = df.sort_values('etd', kind='stable', na_position='first').reset_index(drop=True)
+            return self._as_dates(df, ['etd', 'eta'])
             
         except Exception as e:
             logger.error(f"Error loading PO summary: {e}")
             return pd.DataFrame()
 
-    @st.cache_data(ttl=300)
-    def get_wht_summary(_self, product_id: int) -> pd.DataFrame:
+    def get_wht_summary(self, product_id: int) -> pd.DataFrame:
         """Get warehouse transfer summary for product view"""
         try:
-            query = """
-                SELECT 
-                    warehouse_transfer_line_id,
-                    product_id,
-                    product_name,
-                    from_warehouse,
-                    to_warehouse,
-                    transfer_quantity,
-                    standard_uom,
-                    transfer_date as etd,
-                    CASE WHEN is_completed = 1 THEN 'Completed' ELSE 'In Progress' END as status
-                FROM warehouse_transfer_details_view
-                WHERE product_id = :product_id AND is_completed = 0 AND transfer_quantity > 0
-                ORDER BY transfer_date DESC
-            """
+            # Snapshot already holds is_completed = 0 only
+            df = rows_for_product(get_snapshot_service().get('wh_transfer'), product_id)
+            df = df[df['transfer_quantity'] > 0]
             
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params={'product_id': product_id})
+            df = df[[
+                'warehouse_transfer_line_id', 'product_id', 'product_name',
+                'from_warehouse', 'to_warehouse', 'transfer_quantity',
+                'standard_uom', 'transfer_date'
+            ]].rename(columns={'transfer_date': 'etd'})
+            df['status'] = 'In Progress'
             
-            return df
+            df = df.sort_values('etd', ascending=False, kind='stable').reset_index(drop=True)
+            return self._as_dates(df, ['etd'])
             
         except Exception as e:
             logger.error(f"Error loading WHT summary: {e}")
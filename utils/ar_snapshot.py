@@ -0,0 +1,335 @@
+# utils/ar_snapshot.py
+"""
+AR Snapshot — payment/aging columns precomputed once per data load.
+
+The Salesperson, KPI Center and Legal Entity payment tabs all re-derive the
+same things from the AR view on every render: a row-wise payment_status
+normalization, multi-split line de-duplication and aging re-bucketing.
+build_ar_snapshot() does that work once, when the raw payment frame is
+loaded, and stores the results as compact columns on the frame itself so
+every downstream filter (salesperson, KPI center, entity, customer...) keeps
+them for free:
+
+    _status        Categorical   fully_paid / partially_paid / unpaid / unknown
+    _line_key      int64         factorized invoice-line id (dedup key)
+    _aging_bucket  Categorical   SQL aging_bucket in display order (int8 codes)
+    _due_day       float64       due_date as days since epoch (NaN = no due date)
+    _inv_day       float64       inv_date as days since epoch
+
+Day numbers are date-independent, so aging for any as-of date is a vector
+subtraction + searchsorted — no need to rebuild the snapshot at midnight.
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.ar_snapshot import build_ar_snapshot, aging_table, status_codes
+
+    payment_raw_df = build_ar_snapshot(payment_raw_df)      # once per load
+    ...
+    aging_df = aging_table(outstanding_df, today)           # per render
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+STATUS_CATEGORIES = ['fully_paid', 'partially_paid', 'unpaid', 'unknown']
+
+# Labels produced by the AR views' aging_bucket column, in display order
+AGING_BUCKETS_PRECALC = {
+    'Not Yet Due': (-999999, -1),
+    'No Due Date': (-999998, -1),
+    '1-30 days overdue': (1, 30),
+    '31-60 days overdue': (31, 60),
+    '61-90 days overdue': (61, 90),
+    '90+ days overdue': (91, 999999),
+}
+
+# Aging buckets based on days PAST DUE (due_date), not invoice date
+AGING_BUCKETS_OVERDUE = [
+    ('Not Yet Due', -999999, -1),
+    ('0-30 days overdue', 0, 30),
+    ('31-60 days overdue', 31, 60),
+    ('61-90 days overdue', 61, 90),
+    ('90+ days overdue', 91, 999999),
+]
+
+# Fallback: aging by invoice age (when due_date not available)
+AGING_BUCKETS_BY_INV_DATE = [
+    ('Current (0-30)', 0, 30),
+    ('31-60 days', 31, 60),
+    ('61-90 days', 61, 90),
+    ('90+ days', 91, 999999),
+]
+
+# Dedup key priority — matches salesperson deduplicate_ar_lines()
+LINE_KEY_COLUMNS = ('unified_line_id', 'si_line_id')
+
+AGING_COLUMNS = ['bucket', 'min_days', 'max_days', 'amount', 'gp', 'count', 'share']
+# Column order of the pre-calculated path (groupby result, as before vectorizing)
+AGING_PRECALC_COLUMNS = ['bucket', 'amount', 'count', 'gp', 'share', 'min_days', 'max_days']
+
+_EPOCH = pd.Timestamp('1970-01-01')
+
+
+# =============================================================================
+# STATUS
+# =============================================================================
+
+def normalize_status(val) -> str:
+    """Normalize one payment_status value to a standard category."""
+    if pd.isna(val):
+        return 'unknown'
+    s = str(val).strip().lower()
+    if 'fully' in s or s == 'paid':
+        return 'fully_paid'
+    elif 'partial' in s:
+        return 'partially_paid'
+    elif 'unpaid' in s or 'open' in s or 'pending' in s:
+        return 'unpaid'
+    return 'unknown'
+
+
+def status_codes(status: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_status: each DISTINCT raw value is normalized once
+    and mapped back through its integer code.
+    """
+    codes, uniques = pd.factorize(status, use_na_sentinel=True)
+    lookup = np.array(
+        [STATUS_CATEGORIES.index(normalize_status(v)) for v in uniques]
+        + [STATUS_CATEGORIES.index('unknown')],          # slot for NaN (-1)
+        dtype=np.int8,
+    )
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[codes], categories=STATUS_CATEGORIES),
+        index=status.index,
+    )
+
+
+# =============================================================================
+# SNAPSHOT BUILD
+# =============================================================================
+
+def _day_number(values: pd.Series) -> pd.Series:
+    ts = pd.to_datetime(values, errors='coerce')
+    return (ts - _EPOCH).dt.days.astype('float64')
+
+
+def line_key(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """Factorized invoice-line id, or None if no usable key columns exist."""
+    for col in LINE_KEY_COLUMNS:
+        if col in df.columns:
+            return pd.factorize(df[col], use_na_sentinel=False)[0].astype(np.int64)
+    if 'inv_number' in df.columns and 'product_pn' in df.columns:
+        # Row-aligned group number of (inv_number, product_pn); no string concat
+        return df.groupby(['inv_number', 'product_pn'], sort=False, dropna=False).ngroup().to_numpy(np.int64)
+    return None
+
+
+def build_ar_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of an AR/payment frame with snapshot columns added.
+
+    Display columns (inv_date, due_date, ...) are left untouched; payment_ratio
+    is coerced to float so per-render pd.to_numeric calls become no-ops.
+    """
+    if df is None or df.empty or 'payment_status' not in df.columns:
+        return df
+
+    out = df.copy()
+
+    if 'inv_date' in out.columns:
+        out['_inv_day'] = _day_number(out['inv_date'])
+    if 'due_date' in out.columns:
+        out['_due_day'] = _day_number(out['due_date'])
+    if 'payment_ratio' in out.columns:
+        out['payment_ratio'] = pd.to_numeric(out['payment_ratio'], errors='coerce')
+
+    out['_status'] = status_codes(out['payment_status'])
+
+    key = line_key(out)
+    if key is not None:
+        out['_line_key'] = key
+
+    if 'aging_bucket' in out.columns:
+        labels = list(AGING_BUCKETS_PRECALC)
+        extra = sorted(set(out['aging_bucket'].dropna().astype(str)) - set(labels))
+        out['_aging_bucket'] = pd.Categorical(
+            out['aging_bucket'], categories=labels + extra
+        )
+
+    return out
+
+
+def has_snapshot(df: pd.DataFrame) -> bool:
+    return '_status' in df.columns and isinstance(df['_status'].dtype, pd.CategoricalDtype)
+
+
+# =============================================================================
+# CONSUMERS
+# =============================================================================
+
+def dedup_lines(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep one row per invoice line (first occurrence), using _line_key if present."""
+    if df.empty:
+        return df
+    if '_line_key' in df.columns:
+        return df.drop_duplicates(subset='_line_key', keep='first')
+    for col in LINE_KEY_COLUMNS:
+        if col in df.columns:
+            return df.drop_duplicates(subset=col, keep='first')
+    if 'inv_number' in df.columns and 'product_pn' in df.columns:
+        return df.drop_duplicates(subset=['inv_number', 'product_pn'], keep='first')
+    return df
+
+
+def _today_day(today: date) -> float:
+    return float((pd.Timestamp(today) - _EPOCH).days)
+
+
+def days_past_due(df: pd.DataFrame, today: date) -> pd.Series:
+    """Days past due_date (negative = not yet due, NaN = no due date)."""
+    if '_due_day' in df.columns:
+        return _today_day(today) - df['_due_day']
+    return (pd.Timestamp(today) - pd.to_datetime(df['due_date'], errors='coerce')).dt.days
+
+
+def days_since_invoice(df: pd.DataFrame, today: date) -> pd.Series:
+    if '_inv_day' in df.columns:
+        return (_today_day(today) - df['_inv_day']).clip(lower=0)
+    return (pd.Timestamp(today) - pd.to_datetime(df['inv_date'], errors='coerce')).dt.days.clip(lower=0)
+
+
+def _empty_aging() -> pd.DataFrame:
+    return pd.DataFrame(columns=['bucket', 'amount', 'gp', 'count', 'share'])
+
+
+def aging_table(
+    outstanding_df: pd.DataFrame,
+    today: date,
+    amount_col: str = '_outstanding_usd',
+    gp_col: str = '_outstanding_gp',
+    use_precalc: bool = True,
+) -> pd.DataFrame:
+    """
+    Aging buckets for outstanding amounts.
+
+    use_precalc=True: if the frame carries the AR view's aging_bucket, group
+    on it (snapshot categorical codes when present). Otherwise bucket by days
+    past due_date, or by invoice age when no row has a due_date.
+
+    Returns:
+        DataFrame with empty buckets removed; attrs['aging_mode'] =
+        'overdue' | 'invoice_age'. Pre-calculated buckets give
+        [bucket, amount, count, gp, share, min_days, max_days] with count =
+        lines with an amount; date buckets give
+        [bucket, min_days, max_days, amount, gp, count, share] with count =
+        lines in the bucket.
+    """
+    if outstanding_df.empty:
+        return _empty_aging()
+
+    df = outstanding_df
+    raw_amount = pd.to_numeric(df[amount_col], errors='coerce')
+    has_amount = raw_amount.notna().to_numpy()
+    amount = raw_amount.fillna(0).to_numpy(float)
+    gp = (
+        pd.to_numeric(df[gp_col], errors='coerce').fillna(0).to_numpy(float)
+        if gp_col in df.columns else np.zeros(len(df))
+    )
+    total_outstanding = amount.sum()
+
+    # -----------------------------------------------------------------
+    # PRE-CALCULATED aging_bucket (AR view)
+    # -----------------------------------------------------------------
+    if use_precalc and 'aging_bucket' in df.columns and df['aging_bucket'].notna().any():
+        if '_aging_bucket' in df.columns:
+            buckets = df['_aging_bucket']
+        else:
+            labels = list(AGING_BUCKETS_PRECALC)
+            extra = sorted(set(df['aging_bucket'].dropna().astype(str)) - set(labels))
+            buckets = pd.Series(pd.Categorical(df['aging_bucket'], categories=labels + extra), index=df.index)
+
+        codes = buckets.cat.codes.to_numpy()
+        valid = codes >= 0
+        n_cat = len(buckets.cat.categories)
+        sums = np.bincount(codes[valid], weights=amount[valid], minlength=n_cat)
+        gps = np.bincount(codes[valid], weights=gp[valid], minlength=n_cat)
+        lines = np.bincount(codes[valid], minlength=n_cat)
+        counts = np.bincount(codes[valid & has_amount], minlength=n_cat)
+
+        rows = [
+            (label, sums[i], int(counts[i]), gps[i],
+             sums[i] / total_outstanding if total_outstanding > 0 else 0.0)
+            + AGING_BUCKETS_PRECALC.get(label, (0, 0))
+            for i, label in enumerate(buckets.cat.categories) if lines[i] > 0
+        ]
+        result = pd.DataFrame(rows, columns=AGING_PRECALC_COLUMNS)
+        result = result[result['amount'] > 0.01].reset_index(drop=True)
+        result.attrs['aging_mode'] = 'overdue'
+        return result
+
+    # -----------------------------------------------------------------
+    # DATE-BASED buckets
+    # -----------------------------------------------------------------
+    has_due = (
+        ('_due_day' in df.columns and df['_due_day'].notna().any())
+        or ('due_date' in df.columns and df['due_date'].notna().any())
+    )
+    if has_due:
+        days = days_past_due(df, today).to_numpy(float)
+        bucket_defs = AGING_BUCKETS_OVERDUE
+        aging_mode = 'overdue'
+    else:
+        days = days_since_invoice(df, today).to_numpy(float)
+        bucket_defs = AGING_BUCKETS_BY_INV_DATE
+        aging_mode = 'invoice_age'
+
+    mins = np.array([b[1] for b in bucket_defs], dtype=float)
+    maxs = np.array([b[2] for b in bucket_defs], dtype=float)
+    idx = np.searchsorted(mins, days, side='right') - 1
+    valid = (~np.isnan(days)) & (idx >= 0)
+    valid[valid] &= days[valid] <= maxs[idx[valid]]
+    n_b = len(bucket_defs)
+    sums = np.bincount(idx[valid], weights=amount[valid], minlength=n_b)
+    gps = np.bincount(idx[valid], weights=gp[valid], minlength=n_b)
+    counts = np.bincount(idx[valid], minlength=n_b)
+
+    rows = [
+        (name, min_d, max_d, sums[i], gps[i], int(counts[i]))
+        for i, (name, min_d, max_d) in enumerate(bucket_defs)
+    ]
+
+    result = pd.DataFrame(rows, columns=AGING_COLUMNS[:-1])
+    result['share'] = result['amount'] / total_outstanding if total_outstanding > 0 else 0.0
+    result = result[result['amount'] > 0.01].reset_index(drop=True)
+    result.attrs['aging_mode'] = aging_mode
+    return result
+
+
+__all__: List[str] = [
+    'STATUS_CATEGORIES',
+    'AGING_BUCKETS_PRECALC',
+    'AGING_BUCKETS_OVERDUE',
+    'AGING_BUCKETS_BY_INV_DATE',
+    'normalize_status',
+    'status_codes',
+    'line_key',
+    'build_ar_snapshot',
+    'has_snapshot',
+    'dedup_lines',
+    'days_past_due',
+    'days_since_invoice',
+    'aging_table',
+]
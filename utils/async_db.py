@@ -0,0 +1,276 @@
+# utils/async_db.py
+"""
+Async Query Layer
+
+Pages issue dozens of small, independent reads (dropdown options, years,
+summary stats) one after another through synchronous pd.read_sql. This module
+lets them run concurrently:
+
+- read_sql_async(query, params)     coroutine returning a DataFrame
+- gather_queries({name: (q, p)})    coroutine: many queries at once
+- gather_calls({name: fn})          coroutine: existing sync loaders
+                                    (e.g. setup_queries.get_brands_for_dropdown)
+                                    run side by side on worker threads
+- fetch_all / call_all              sync shims for Streamlit scripts
+
+Driver:
+    With aiomysql installed, queries go through a SQLAlchemy AsyncEngine
+    (mysql+aiomysql). Without it, each query runs on a worker thread against
+    the regular pooled engine (utils.db) — same API, same concurrency.
+    aiomysql is optional and not in requirements.txt; `pip install aiomysql`
+    on hosts that should use the native driver.
+
+Event loop:
+    Async engines are bound to the loop that created their connections, so all
+    coroutines run on ONE process-wide loop in a daemon thread. The sync shims
+    submit to it and block until the whole batch is done. Calls passed to
+    call_all run off the script thread — they must not touch st.* or
+    st.session_state.
+
+Errors follow the _execute_query convention: logged, and the failed entry
+comes back as an empty DataFrame (queries) or None (calls).
+
+VERSION: 1.0.1
+
+Usage:
+    from utils.async_db import call_all, fetch_all
+
+    data = call_all({
+        'years': setup_queries.get_split_rule_years,
+        'brands': setup_queries.get_brands_for_dropdown,
+        'customers': lambda: setup_queries.get_customers_with_splits(employee_ids=ids),
+    })
+    brands_df = data['brands']
+
+    frames = fetch_all({
+        'entities': ("SELECT id, english_name FROM companies WHERE delete_flag = 0", None),
+        'brands': ("SELECT id, brand_name FROM brands WHERE delete_flag = 0", None),
+    })
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from .config import config, APP_CONFIG
+from .db import get_db_engine
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiomysql  # noqa: F401
+    from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+    _ASYNC_DRIVER_AVAILABLE = True
+except ImportError:
+    AsyncEngine = None
+    create_async_engine = None
+    _ASYNC_DRIVER_AVAILABLE = False
+
+
+# ==================== CONSTANTS ====================
+
+# Max reads in flight per batch — keep below the sync pool (size 5 + overflow 10)
+ASYNC_DB_MAX_CONCURRENCY = int(os.getenv('ASYNC_DB_MAX_CONCURRENCY', '6'))
+# Worker threads shared by all sessions (thread fallback + call_all loaders)
+ASYNC_DB_WORKERS = int(os.getenv('ASYNC_DB_WORKERS', '10'))
+ASYNC_DB_BATCH_TIMEOUT = float(os.getenv('ASYNC_DB_BATCH_TIMEOUT', '120'))
+
+QuerySpec = Tuple[str, Optional[Dict[str, Any]]]
+
+
+# ==================== EVENT LOOP (process-wide) ====================
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop shared by every session (double-checked locking)."""
+    global _loop
+
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(
+                    max_workers=ASYNC_DB_WORKERS, thread_name_prefix="async-db"
+                ))
+                thread = threading.Thread(
+                    target=loop.run_forever, name="async-db-loop", daemon=True
+                )
+                thread.start()
+                _loop = loop
+                logger.info(f"Async DB loop started ({ASYNC_DB_WORKERS} workers)")
+
+    return _loop
+
+
+# ==================== ASYNC ENGINE ====================
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """
+    SQLAlchemy AsyncEngine (mysql+aiomysql), or None when aiomysql is not installed
+
+    Built from the same URL and pool settings as utils.db.get_db_engine
+    (current pool size, DB_POOL_MAX_OVERFLOW / DB_POOL_TIMEOUT /
+    DB_POOL_RECYCLE from APP_CONFIG). Must only be used from the background
+    loop (see _get_loop).
+    """
+    global _async_engine
+
+    if not _ASYNC_DRIVER_AVAILABLE:
+        return None
+
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                sync_engine = get_db_engine()
+                app_config = config.app_config if hasattr(config, 'app_config') else APP_CONFIG
+                url = sync_engine.url.set(drivername="mysql+aiomysql")
+                _async_engine = create_async_engine(
+                    url,
+                    pool_size=sync_engine.pool.size(),
+                    max_overflow=app_config.get("DB_POOL_MAX_OVERFLOW", 10),
+                    pool_timeout=app_config.get("DB_POOL_TIMEOUT", 30),
+                    pool_recycle=app_config.get("DB_POOL_RECYCLE", 3600),
+                    pool_pre_ping=True,
+                    echo=False,
+                )
+                logger.info(f"✅ Async database engine created ({url.drivername})")
+
+    return _async_engine
+
+
+def is_native_async() -> bool:
+    """True when reads use the aiomysql driver rather than worker threads"""
+    return _ASYNC_DRIVER_AVAILABLE
+
+
+# ==================== COROUTINES ====================
+
+def _read_sql_sync(query: str, params: Optional[Dict]) -> pd.DataFrame:
+    return pd.read_sql(text(query), get_db_engine(), params=params or {})
+
+
+async def read_sql_async(query: str, params: Dict = None) -> pd.DataFrame:
+    """
+    Execute SELECT query and return results as DataFrame (awaitable)
+
+    Raises on error — gather_queries turns failures into empty frames.
+    """
+    engine = get_async_engine()
+    if engine is None:
+        return await asyncio.to_thread(_read_sql_sync, query, params)
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text(query), params or {})
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+async def _bounded(name: str, semaphore: asyncio.Semaphore, awaitable_factory: Callable[[], Awaitable], default):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            value = await awaitable_factory()
+            logger.debug(f"{name} finished in {time.perf_counter() - start:.3f}s")
+            return value
+        except Exception as e:
+            logger.error(f"Error executing {name}: {e}")
+            return default()
+
+
+async def gather_queries(queries: Dict[str, QuerySpec]) -> Dict[str, pd.DataFrame]:
+    """
+    Run named (query, params) pairs concurrently
+
+    Returns:
+        {name: DataFrame} in the input order; a failed query gives an empty DataFrame
+    """
+    semaphore = asyncio.Semaphore(ASYNC_DB_MAX_CONCURRENCY)
+    names = list(queries)
+    results = await asyncio.gather(*(
+        _bounded(
+            name, semaphore,
+            lambda q=queries[name]: read_sql_async(q[0], q[1]),
+            pd.DataFrame,
+        )
+        for name in names
+    ))
+    return dict(zip(names, results))
+
+
+async def gather_calls(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run named zero-argument sync loaders concurrently on worker threads
+
+    Returns:
+        {name: result} in the input order; a loader that raises gives None
+    """
+    semaphore = asyncio.Semaphore(ASYNC_DB_MAX_CONCURRENCY)
+    names = list(calls)
+    results = await asyncio.gather(*(
+        _bounded(
+            name, semaphore,
+            lambda fn=calls[name]: asyncio.to_thread(fn),
+            lambda: None,
+        )
+        for name in names
+    ))
+    return dict(zip(names, results))
+
+
+# ==================== SYNC SHIMS (Streamlit) ====================
+
+def run_async(coro: Awaitable, timeout: float = ASYNC_DB_BATCH_TIMEOUT):
+    """Run a coroutine on the shared background loop and wait for its result"""
+    loop = _get_loop()
+    if threading.current_thread().name == "async-db-loop":
+        raise RuntimeError("run_async called from the async DB loop — await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout=timeout)
+
+
+def fetch_all(queries: Dict[str, QuerySpec]) -> Dict[str, pd.DataFrame]:
+    """Sync shim for gather_queries"""
+    if not queries:
+        return {}
+    start = time.perf_counter()
+    results = run_async(gather_queries(queries))
+    logger.debug(f"fetch_all: {len(queries)} queries in {time.perf_counter() - start:.3f}s")
+    return results
+
+
+def call_all(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Sync shim for gather_calls"""
+    if not calls:
+        return {}
+    start = time.perf_counter()
+    results = run_async(gather_calls(calls))
+    logger.debug(f"call_all: {len(calls)} loaders in {time.perf_counter() - start:.3f}s")
+    return results
+
+
+# ==================== EXPORTS ====================
+
+__all__ = [
+    'ASYNC_DB_MAX_CONCURRENCY',
+    'get_async_engine',
+    'is_native_async',
+    'read_sql_async',
+    'gather_queries',
+    'gather_calls',
+    'run_async',
+    'fetch_all',
+    'call_all',
+]
@@ -0,0 +1,48 @@
+# utils/bench/__init__.py
+"""
+Benchmark suite for the pandas engines
+
+Seeded synthetic frames with the production view schemas (sales, backlog,
+AR, supply, demand) at 10k–5M rows, timed cases for the calculators the
+pages run on every rerun, and a regression report between saved runs.
+
+No database connection is made, but importing any utils subpackage runs
+utils/__init__.py, which loads utils.config, and that refuses to load
+without DB_HOST, DB_USER and DB_PASSWORD. Set them (any value works, e.g.
+in .env) before running:
+
+    DB_HOST=x DB_USER=x DB_PASSWORD=x python -m utils.bench run --rows 250k
+    python -m utils.bench compare previous latest
+
+VERSION: 1.0.1
+"""
+
+from .synthetic import SCALES, SOURCES, SyntheticData, parse_rows, format_rows
+from .cases import BenchCase, BenchContext, bench_case, get_cases
+from .runner import run_benchmarks, save_run, load_run, list_runs, compute_stats
+from .report import compare_runs, has_regressions, format_report, format_run
+
+__all__ = [
+    # Synthetic data
+    'SCALES',
+    'SOURCES',
+    'SyntheticData',
+    'parse_rows',
+    'format_rows',
+    # Cases
+    'BenchCase',
+    'BenchContext',
+    'bench_case',
+    'get_cases',
+    # Runner
+    'run_benchmarks',
+    'save_run',
+    'load_run',
+    'list_runs',
+    'compute_stats',
+    # Report
+    'compare_runs',
+    'has_regressions',
+    'format_report',
+    'format_run',
+]
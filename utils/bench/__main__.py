@@ -0,0 +1,136 @@
+# utils/bench/__main__.py
+"""
+Benchmark CLI
+
+DB_HOST, DB_USER and DB_PASSWORD must be set (placeholders are fine, no
+connection is made) because importing the utils package loads utils.config.
+
+    python -m utils.bench run --rows 250k
+    python -m utils.bench run --rows 1m -k complex_kpi -k net_gap --memory
+    python -m utils.bench run --rows 250k --compare latest --fail-on-regression
+    python -m utils.bench compare previous latest --markdown
+    python -m utils.bench list
+    python -m utils.bench generate --rows 100k --source supply --out /tmp/supply.csv
+
+VERSION: 1.0.1
+"""
+
+import argparse
+import logging
+import sys
+
+from .cases import get_cases
+from .report import DEFAULT_THRESHOLD, compare_runs, format_report, format_run, has_regressions
+from .runner import (
+    DEFAULT_ROUNDS, DEFAULT_STORAGE, DEFAULT_WARMUP,
+    list_runs, load_run, run_benchmarks, save_run,
+)
+from .synthetic import DEFAULT_SEED, SOURCES, SyntheticData, parse_rows
+
+logger = logging.getLogger(__name__)
+
+
+def _cmd_run(args) -> int:
+    rows = parse_rows(args.rows)
+    baseline = load_run(args.compare, args.storage) if args.compare else None
+
+    def progress(case, result):
+        if result:
+            print(f"  {case.name:<45} median {result['stats']['median'] * 1000:>10.1f} ms",
+                  file=sys.stderr)
+        else:
+            print(f"  {case.name:<45} FAILED", file=sys.stderr)
+
+    print(f"Running benchmarks at {rows:,} rows (seed {args.seed}, "
+          f"{args.rounds} rounds)...", file=sys.stderr)
+    run = run_benchmarks(rows, seed=args.seed, rounds=args.rounds, warmup=args.warmup,
+                         select=args.select, trace_memory=args.memory, progress=progress)
+    print(format_run(run))
+
+    if args.save:
+        print(f"Saved {save_run(run, args.storage)}")
+
+    if baseline is not None:
+        rows_cmp = compare_runs(baseline, run, args.threshold, current_only=bool(args.select))
+        print(format_report(rows_cmp, baseline, run, args.threshold, markdown=args.markdown))
+        if args.fail_on_regression and has_regressions(rows_cmp):
+            return 1
+    return 1 if run['bench_info']['errors'] else 0
+
+
+def _cmd_compare(args) -> int:
+    base = load_run(args.base, args.storage)
+    current = load_run(args.current, args.storage)
+    rows = compare_runs(base, current, args.threshold)
+    print(format_report(rows, base, current, args.threshold, markdown=args.markdown))
+    return 1 if args.fail_on_regression and has_regressions(rows) else 0
+
+
+def _cmd_list(args) -> int:
+    print("Cases:")
+    for case in get_cases():
+        print(f"  {case.name:<45} {case.description}")
+    runs = list_runs(args.storage)
+    print(f"\nSaved runs in {args.storage}:" if runs else f"\nNo saved runs in {args.storage}")
+    for r in runs:
+        print(f"  {r['file']:<45} rows={r['rows']:<9} cases={r['cases']:<3} {r['datetime']}")
+    return 0
+
+
+def _cmd_generate(args) -> int:
+    data = SyntheticData(seed=args.seed)
+    df = getattr(data, args.source)(parse_rows(args.rows))
+    if args.out.endswith('.parquet'):
+        df.to_parquet(args.out, index=False)
+    else:
+        df.to_csv(args.out, index=False)
+    print(f"Wrote {len(df):,} rows × {len(df.columns)} columns of {args.source} to {args.out}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m utils.bench',
+                                     description="Benchmarks for the pandas engines on synthetic data")
+    parser.add_argument('--storage', default=DEFAULT_STORAGE, help="directory of saved runs")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help="run benchmark cases")
+    p.add_argument('--rows', default='100k', help="sales lines: 10k, 250k, 1m, 5m or a number")
+    p.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    p.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    p.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    p.add_argument('-k', dest='select', action='append',
+                   help="only cases whose name contains this (repeatable)")
+    p.add_argument('--memory', action='store_true', help="record peak traced memory per case")
+    p.add_argument('--no-save', dest='save', action='store_false')
+    p.add_argument('--compare', default=None, metavar='RUN',
+                   help="baseline to compare with: path, run number, latest or previous")
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument('--markdown', action='store_true')
+    p.add_argument('--fail-on-regression', action='store_true')
+    p.set_defaults(func=_cmd_run)
+
+    p = sub.add_parser('compare', help="compare two saved runs")
+    p.add_argument('base', nargs='?', default='previous')
+    p.add_argument('current', nargs='?', default='latest')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument('--markdown', action='store_true')
+    p.add_argument('--fail-on-regression', action='store_true')
+    p.set_defaults(func=_cmd_compare)
+
+    p = sub.add_parser('list', help="list cases and saved runs")
+    p.set_defaults(func=_cmd_list)
+
+    p = sub.add_parser('generate', help="write one synthetic source to CSV / Parquet")
+    p.add_argument('--source', choices=SOURCES, required=True)
+    p.add_argument('--rows', default='10k')
+    p.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    p.add_argument('--out', required=True)
+    p.set_defaults(func=_cmd_generate)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
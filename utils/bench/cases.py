@@ -0,0 +1,304 @@
+# utils/bench/cases.py
+"""
+Benchmark cases for the pandas engines
+
+Each case is registered with @bench_case and receives a BenchContext. The
+case does its setup (building frames, constructing calculators that are
+not under test) and returns a zero-argument callable: only that callable
+is timed. Frames from ctx.frame() are shared between cases, so the timed
+call must not modify them in place (the engines all copy their input).
+
+Sizes scale with --rows (sales lines); the other sources use the ratios
+in SOURCE_SCALE, roughly what production has per sales line.
+
+VERSION: 1.0.0
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .synthetic import SyntheticData
+
+logger = logging.getLogger(__name__)
+
+# Rows per source as a fraction of --rows
+SOURCE_SCALE = {
+    'sales_by_salesperson': 1.0,
+    'sales_by_kpi_center': 1.0,
+    'backlog_by_salesperson': 0.1,
+    'backlog_by_kpi_center': 0.1,
+    'ar_by_salesperson': 0.25,
+    'ar_by_kpi_center': 0.25,
+    'supply': 0.2,
+    'demand': 0.2,
+    'period_supply': 0.05,
+    'period_demand': 0.05,
+}
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+@dataclass
+class BenchCase:
+    name: str
+    group: str
+    setup: Callable[['BenchContext'], Callable[[], object]]
+    description: str = ''
+
+
+_CASES: Dict[str, BenchCase] = {}
+
+
+def bench_case(name: str, group: str, description: str = ''):
+    """Register a benchmark case (setup(ctx) -> timed callable)."""
+    def decorator(setup):
+        if name in _CASES:
+            raise ValueError(f"Duplicate benchmark case: {name}")
+        _CASES[name] = BenchCase(name=name, group=group, setup=setup,
+                                 description=description or (setup.__doc__ or '').strip())
+        return setup
+    return decorator
+
+
+def get_cases(select: Optional[List[str]] = None) -> List[BenchCase]:
+    """Registered cases; select keeps those whose name contains any of the substrings."""
+    cases = list(_CASES.values())
+    if select:
+        cases = [c for c in cases if any(s in c.name for s in select)]
+    return cases
+
+
+class BenchContext:
+    """Synthetic data at one scale, generated lazily and cached per source."""
+
+    def __init__(self, data: SyntheticData, rows: int):
+        self.data = data
+        self.rows = rows
+        self.as_of = data.as_of
+        self.start_date = date(data.as_of.year, 1, 1)
+        self.end_date = data.as_of
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    def rows_for(self, source: str) -> int:
+        return max(100, int(self.rows * SOURCE_SCALE[source]))
+
+    def frame(self, source: str) -> pd.DataFrame:
+        if source not in self._frames:
+            self._frames[source] = getattr(self.data, source)(self.rows_for(source))
+        return self._frames[source]
+
+    def source_rows(self) -> Dict[str, int]:
+        """Rows of every source generated so far (recorded in the run file)."""
+        return {name: len(df) for name, df in self._frames.items()}
+
+
+class _HierarchyLookup:
+    """Stands in for KPICenterQueries where only hierarchy lookups are used."""
+
+    def __init__(self, data: SyntheticData):
+        self._data = data
+
+    def get_leaf_descendants(self, kpi_center_id: int) -> List[int]:
+        return self._data.leaf_descendants(kpi_center_id)
+
+    def get_all_descendants(self, kpi_center_id: int, include_self: bool = False) -> List[int]:
+        kc = self._data.kpi_centers
+        found, frontier = [], [kpi_center_id]
+        while frontier:
+            kids = kc.loc[kc['parent_center_id'] == frontier.pop(), 'kpi_center_id'].tolist()
+            found.extend(kids)
+            frontier.extend(kids)
+        return ([kpi_center_id] if include_self else []) + found
+
+
+# =============================================================================
+# SALESPERSON
+# =============================================================================
+
+@bench_case('salesperson.complex_kpi.build', 'salesperson')
+def _complex_kpi_build(ctx: BenchContext):
+    """ComplexKPICalculator(lookback sales) — first-seen indexes over the 5-year lookback."""
+    from ..salesperson_performance.complex_kpi_calculator import ComplexKPICalculator
+    sales = ctx.frame('sales_by_salesperson')
+    return lambda: ComplexKPICalculator(sales, exclude_internal=True)
+
+
+@bench_case('salesperson.complex_kpi.calculate_all', 'salesperson')
+def _complex_kpi_all(ctx: BenchContext):
+    """ComplexKPICalculator.calculate_all() for the whole company, YTD."""
+    from ..salesperson_performance.complex_kpi_calculator import ComplexKPICalculator
+    calc = ComplexKPICalculator(ctx.frame('sales_by_salesperson'), exclude_internal=True)
+    return lambda: calc.calculate_all(ctx.start_date, ctx.end_date)
+
+
+@bench_case('salesperson.complex_kpi.calculate_all_team', 'salesperson')
+def _complex_kpi_team(ctx: BenchContext):
+    """ComplexKPICalculator.calculate_all() for a 10-person team, YTD."""
+    from ..salesperson_performance.complex_kpi_calculator import ComplexKPICalculator
+    calc = ComplexKPICalculator(ctx.frame('sales_by_salesperson'), exclude_internal=True)
+    team = ctx.data.salespeople['sales_id'].head(10).tolist()
+    return lambda: calc.calculate_all(ctx.start_date, ctx.end_date, employee_ids=team)
+
+
+@bench_case('salesperson.filter_data_client_side', 'salesperson')
+def _filter_client_side(ctx: BenchContext):
+    """filter_data_client_side() for a 10-person team and two entities, incl. Complex KPI refresh."""
+    from ..salesperson_performance.client_filter import filter_data_client_side
+    from ..salesperson_performance.complex_kpi_calculator import ComplexKPICalculator
+
+    sales = ctx.frame('sales_by_salesperson')
+    in_year = pd.to_datetime(sales['inv_date']) >= pd.Timestamp(ctx.start_date)
+    raw_data = {
+        'sales': sales[in_year].reset_index(drop=True),
+        'backlog_detail': ctx.frame('backlog_by_salesperson'),
+        'ar_outstanding': ctx.frame('ar_by_salesperson'),
+        'targets': ctx.data.salesperson_targets(),
+        '_complex_kpi_calculator': ComplexKPICalculator(sales, exclude_internal=True),
+    }
+    filter_values = {
+        'start_date': ctx.start_date,
+        'end_date': ctx.end_date,
+        'employee_ids': ctx.data.salespeople['sales_id'].head(10).tolist(),
+        'entity_ids': ctx.data.entities['legal_entity_id'].head(2).tolist(),
+        'year': ctx.as_of.year,
+        'exclude_internal_revenue': True,
+        'is_empty_selection': False,
+    }
+    return lambda: filter_data_client_side(raw_data, filter_values)
+
+
+@bench_case('salesperson.analyze_payments', 'salesperson')
+def _salesperson_payments(ctx: BenchContext):
+    """Salesperson analyze_payments() over AR lines (dedup, aging, by customer / month)."""
+    from ..salesperson_performance.payment.payment_analysis import analyze_payments
+    ar = ctx.frame('ar_by_salesperson')
+    return lambda: analyze_payments(ar, as_of_date=ctx.as_of)
+
+
+# =============================================================================
+# KPI CENTER
+# =============================================================================
+
+@bench_case('kpi_center.analyze_payments', 'kpi_center')
+def _kpi_center_payments(ctx: BenchContext):
+    """KPI Center analyze_payments() over AR lines."""
+    from ..kpi_center_performance.payment.payment_analysis import analyze_payments
+    ar = ctx.frame('ar_by_kpi_center')
+    return lambda: analyze_payments(ar, as_of_date=ctx.as_of)
+
+
+@bench_case('kpi_center.backlog.build', 'kpi_center')
+def _backlog_build(ctx: BenchContext):
+    """BacklogCalculator(backlog) — construction and internal-revenue handling."""
+    from ..kpi_center_performance.backlog_calculator import BacklogCalculator
+    backlog = ctx.frame('backlog_by_kpi_center')
+    return lambda: BacklogCalculator(backlog, exclude_internal=True)
+
+
+@bench_case('kpi_center.backlog.calculate_all', 'kpi_center')
+def _backlog_all(ctx: BenchContext):
+    """BacklogCalculator.calculate_all() — summary, in-period, by month."""
+    from ..kpi_center_performance.backlog_calculator import BacklogCalculator
+    calc = BacklogCalculator(ctx.frame('backlog_by_kpi_center'), exclude_internal=True)
+    return lambda: calc.calculate_all(ctx.start_date, ctx.end_date)
+
+
+def _kpi_center_metrics(ctx: BenchContext):
+    from ..kpi_center_performance.metrics import KPICenterMetrics
+    sales = ctx.frame('sales_by_kpi_center')
+    in_year = pd.to_datetime(sales['inv_date']) >= pd.Timestamp(ctx.start_date)
+    hierarchy = ctx.data.kpi_center_hierarchy()
+    metrics = KPICenterMetrics(
+        sales[in_year].reset_index(drop=True),
+        ctx.data.kpi_center_targets(),
+        default_weights=ctx.data.kpi_type_weights(),
+        hierarchy_df=hierarchy,
+    )
+    return metrics, hierarchy
+
+
+@bench_case('kpi_center.metrics.overview', 'kpi_center')
+def _metrics_overview(ctx: BenchContext):
+    """KPICenterMetrics.calculate_overview_metrics(), YTD."""
+    metrics, _ = _kpi_center_metrics(ctx)
+    return lambda: metrics.calculate_overview_metrics('YTD', ctx.as_of.year,
+                                                      ctx.start_date, ctx.end_date)
+
+
+@bench_case('kpi_center.metrics.rollup_targets', 'kpi_center')
+def _metrics_rollup(ctx: BenchContext):
+    """KPICenterMetrics.calculate_rollup_targets() over the whole tree."""
+    metrics, hierarchy = _kpi_center_metrics(ctx)
+    lookup = _HierarchyLookup(ctx.data)
+    return lambda: metrics.calculate_rollup_targets(hierarchy, lookup)
+
+
+@bench_case('kpi_center.metrics.per_center_progress', 'kpi_center')
+def _metrics_progress(ctx: BenchContext):
+    """KPICenterMetrics.calculate_per_center_progress(), YTD."""
+    metrics, hierarchy = _kpi_center_metrics(ctx)
+    lookup = _HierarchyLookup(ctx.data)
+    return lambda: metrics.calculate_per_center_progress(
+        hierarchy, lookup, 'YTD', ctx.as_of.year, ctx.start_date, ctx.end_date)
+
+
+@bench_case('kpi_center.metrics.overall_achievement', 'kpi_center')
+def _metrics_overall(ctx: BenchContext):
+    """KPICenterMetrics.calculate_overall_kpi_achievement(), YTD, all centers."""
+    metrics, hierarchy = _kpi_center_metrics(ctx)
+    selected = hierarchy['kpi_center_id'].tolist()
+    return lambda: metrics.calculate_overall_kpi_achievement(
+        'YTD', ctx.as_of.year, ctx.start_date, ctx.end_date, selected_kpi_center_ids=selected)
+
+
+# =============================================================================
+# SUPPLY CHAIN GAP
+# =============================================================================
+
+@bench_case('net_gap.calculate_net_gap', 'gap')
+def _net_gap_product(ctx: BenchContext):
+    """GAPCalculator.calculate_net_gap() grouped by product."""
+    from ..net_gap.calculator import GAPCalculator
+    calculator = GAPCalculator()
+    supply, demand = ctx.frame('supply'), ctx.frame('demand')
+    return lambda: calculator.calculate_net_gap(supply, demand, group_by='product')
+
+
+@bench_case('net_gap.calculate_net_gap_brand', 'gap')
+def _net_gap_brand(ctx: BenchContext):
+    """GAPCalculator.calculate_net_gap() grouped by brand."""
+    from ..net_gap.calculator import GAPCalculator
+    calculator = GAPCalculator()
+    supply, demand = ctx.frame('supply'), ctx.frame('demand')
+    return lambda: calculator.calculate_net_gap(supply, demand, group_by='brand')
+
+
+@bench_case('period_gap.carry_forward_weekly', 'gap')
+def _period_gap_weekly(ctx: BenchContext):
+    """calculate_gap_with_carry_forward(), weekly periods with backlog tracking."""
+    from ..period_gap.gap_calculator import calculate_gap_with_carry_forward
+    demand, supply = ctx.frame('period_demand'), ctx.frame('period_supply')
+    return lambda: calculate_gap_with_carry_forward(demand, supply, period_type='Weekly', track_backlog=True)
+
+
+@bench_case('period_gap.carry_forward_monthly', 'gap')
+def _period_gap_monthly(ctx: BenchContext):
+    """calculate_gap_with_carry_forward(), monthly periods with backlog tracking."""
+    from ..period_gap.gap_calculator import calculate_gap_with_carry_forward
+    demand, supply = ctx.frame('period_demand'), ctx.frame('period_supply')
+    return lambda: calculate_gap_with_carry_forward(demand, supply, period_type='Monthly', track_backlog=True)
+
+
+__all__ = [
+    'SOURCE_SCALE',
+    'BenchCase',
+    'BenchContext',
+    'bench_case',
+    'get_cases',
+]
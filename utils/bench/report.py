@@ -0,0 +1,152 @@
+# utils/bench/report.py
+"""
+Benchmark regression report
+
+Compares two runs case by case on the median round time. A case is a
+regression when the current median is more than --threshold slower than
+the baseline median AND even its fastest round is slower than the
+baseline median (so one noisy round cannot flag it). Improvements use the
+mirrored rule. Cases are only compared at the same row count.
+
+VERSION: 1.0.1
+"""
+
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.10
+
+_STATUS_ICONS = {
+    'regression': '🔴',
+    'improvement': '🟢',
+    'unchanged': '⚪',
+    'new': '🆕',
+    'missing': '⚠️',
+}
+
+
+def _by_name(run: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {(b['name'], b.get('params', {}).get('rows')): b for b in run.get('benchmarks', [])}
+
+
+def compare_runs(base: Dict[str, Any], current: Dict[str, Any],
+                 threshold: float = DEFAULT_THRESHOLD, current_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    One row per case: base / current median (ms), change and status.
+    current_only skips baseline cases the current run did not select (-k runs).
+    """
+    base_cases, current_cases = _by_name(base), _by_name(current)
+    missing = [] if current_only else [k for k in base_cases if k not in current_cases]
+    rows = []
+    for key in list(current_cases) + missing:
+        name, n_rows = key
+        b, c = base_cases.get(key), current_cases.get(key)
+        row = {'name': name, 'rows': n_rows, 'base_ms': None, 'current_ms': None,
+               'change_pct': None, 'status': 'new' if b is None else 'missing'}
+        if b is not None and c is not None:
+            b_median, c_median = b['stats']['median'], c['stats']['median']
+            change = (c_median - b_median) / b_median if b_median else 0.0
+            if change > threshold and c['stats']['min'] > b_median:
+                status = 'regression'
+            elif change < -threshold and c['stats']['max'] < b_median:
+                status = 'improvement'
+            else:
+                status = 'unchanged'
+            row.update({'change_pct': round(change * 100, 1), 'status': status})
+        if b is not None:
+            row['base_ms'] = round(b['stats']['median'] * 1000, 2)
+        if c is not None:
+            row['current_ms'] = round(c['stats']['median'] * 1000, 2)
+            row['peak_mb'] = c.get('extra_info', {}).get('peak_mb')
+        rows.append(row)
+    return rows
+
+
+def has_regressions(rows: List[Dict[str, Any]]) -> bool:
+    return any(r['status'] == 'regression' for r in rows)
+
+
+def _fmt_ms(value) -> str:
+    return '—' if value is None else f"{value:,.1f}"
+
+
+def _fmt_change(value) -> str:
+    return '—' if value is None else f"{value:+.1f}%"
+
+
+def format_report(rows: List[Dict[str, Any]], base: Dict[str, Any], current: Dict[str, Any],
+                  threshold: float = DEFAULT_THRESHOLD, markdown: bool = False) -> str:
+    """Text (terminal) or markdown (PR comment) comparison table."""
+    def label(run):
+        commit = (run.get('commit_info', {}).get('id') or '')[:8] or 'nocommit'
+        return f"{commit} @ {str(run.get('datetime', ''))[:19]}"
+
+    counts = {s: sum(1 for r in rows if r['status'] == s) for s in _STATUS_ICONS}
+    summary = (f"{counts['regression']} regressions, {counts['improvement']} improvements, "
+               f"{counts['unchanged']} unchanged, {counts['new']} new, {counts['missing']} missing "
+               f"(threshold {threshold:.0%} on median)")
+
+    if markdown:
+        lines = [
+            "### Benchmark comparison",
+            f"Base `{label(base)}` → current `{label(current)}`  ",
+            summary,
+            '',
+            '| | Case | Rows | Base ms | Current ms | Change |',
+            '|---|---|---:|---:|---:|---:|',
+        ]
+        for r in rows:
+            lines.append(f"| {_STATUS_ICONS[r['status']]} | `{r['name']}` | {r['rows'] or '—'} | "
+                         f"{_fmt_ms(r['base_ms'])} | {_fmt_ms(r['current_ms'])} | "
+                         f"{_fmt_change(r['change_pct'])} |")
+        return '\n'.join(lines)
+
+    width = max([len(r['name']) for r in rows] + [4])
+    lines = [
+        f"{'='*(width + 60)}",
+        f"BENCHMARK COMPARISON  |  base {label(base)}  →  current {label(current)}",
+        f"{'='*(width + 60)}",
+        f"{'Case':<{width}}  {'Rows':>9}  {'Base ms':>11}  {'Current ms':>11}  {'Change':>8}  Status",
+    ]
+    for r in rows:
+        lines.append(f"{r['name']:<{width}}  {r['rows'] or '—':>9}  {_fmt_ms(r['base_ms']):>11}  "
+                     f"{_fmt_ms(r['current_ms']):>11}  {_fmt_change(r['change_pct']):>8}  "
+                     f"{_STATUS_ICONS[r['status']]} {r['status']}")
+    lines += [f"{'-'*(width + 60)}", summary, f"{'='*(width + 60)}"]
+    return '\n'.join(lines)
+
+
+def format_run(run: Dict[str, Any]) -> str:
+    """Single-run table (what `run` prints when there is no baseline)."""
+    benchmarks = run.get('benchmarks', [])
+    width = max([len(b['name']) for b in benchmarks] + [4])
+    info = run.get('bench_info', {})
+    lines = [
+        f"{'='*(width + 66)}",
+        f"BENCHMARKS  |  rows={info.get('rows')} seed={info.get('seed')}  |  "
+        f"pandas {run['machine_info']['pandas']}  |  {(run['commit_info'].get('id') or '')[:8]}",
+        f"{'='*(width + 66)}",
+        f"{'Case':<{width}}  {'Min ms':>10}  {'Median ms':>10}  {'Mean ms':>10}  {'StdDev':>9}  "
+        f"{'Rounds':>6}  {'Peak MB':>8}",
+    ]
+    for b in benchmarks:
+        s = b['stats']
+        peak = b.get('extra_info', {}).get('peak_mb')
+        lines.append(f"{b['name']:<{width}}  {s['min'] * 1000:>10.1f}  {s['median'] * 1000:>10.1f}  "
+                     f"{s['mean'] * 1000:>10.1f}  {s['stddev'] * 1000:>9.1f}  {s['rounds']:>6}  "
+                     f"{'—' if peak is None else f'{peak:.1f}':>8}")
+    for name, error in info.get('errors', {}).items():
+        lines.append(f"{name:<{width}}  FAILED: {error}")
+    lines.append(f"{'='*(width + 66)}")
+    return '\n'.join(lines)
+
+
+__all__ = [
+    'DEFAULT_THRESHOLD',
+    'compare_runs',
+    'has_regressions',
+    'format_report',
+    'format_run',
+]
@@ -0,0 +1,295 @@
+# utils/bench/runner.py
+"""
+Benchmark runner
+
+Times every selected case at one scale and writes the results in the
+pytest-benchmark JSON layout (machine_info, commit_info, benchmarks[].stats
+with min/max/mean/stddev/median/iqr/q1/q3/ops/rounds), so runs can be
+compared with utils.bench.report or with `pytest-benchmark compare`.
+
+Each case: setup (not timed) → --warmup untimed calls → --rounds timed
+calls with perf_counter. gc is disabled during timed calls, like
+pytest-benchmark's --benchmark-disable-gc. With trace_memory the peak
+traced allocation of one extra call is recorded as extra_info.peak_mb.
+
+Runs are saved to .benchmarks/NNNN_<commit>_<timestamp>.json.
+
+VERSION: 1.0.0
+"""
+
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cases import BenchCase, BenchContext, get_cases
+from .synthetic import DEFAULT_SEED, SyntheticData, format_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORAGE = '.benchmarks'
+DEFAULT_ROUNDS = 5
+DEFAULT_WARMUP = 1
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+def compute_stats(data: List[float]) -> Dict[str, Any]:
+    """pytest-benchmark 'stats' block for a list of round times (seconds)."""
+    ordered = sorted(data)
+    q1, median, q3 = np.percentile(ordered, [25, 50, 75]) if len(ordered) > 1 else (ordered[0],) * 3
+    mean = statistics.fmean(ordered)
+    stddev = statistics.stdev(ordered) if len(ordered) > 1 else 0.0
+    iqr = q3 - q1
+    return {
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': mean,
+        'stddev': stddev,
+        'rounds': len(ordered),
+        'median': float(median),
+        'iqr': float(iqr),
+        'q1': float(q1),
+        'q3': float(q3),
+        'iqr_outliers': sum(1 for t in ordered if t < q1 - 1.5 * iqr or t > q3 + 1.5 * iqr),
+        'stddev_outliers': sum(1 for t in ordered if abs(t - mean) > stddev) if stddev else 0,
+        'outliers': '',
+        'ld15iqr': ordered[0],
+        'hd15iqr': ordered[-1],
+        'ops': 1.0 / mean if mean else 0.0,
+        'total': sum(ordered),
+        'iterations': 1,
+        'data': list(data),
+    }
+
+
+# =============================================================================
+# ENVIRONMENT
+# =============================================================================
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True,
+                              timeout=10, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        'node': platform.node(),
+        'processor': platform.processor(),
+        'machine': platform.machine(),
+        'python_implementation': platform.python_implementation(),
+        'python_version': platform.python_version(),
+        'release': platform.release(),
+        'system': platform.system(),
+        'cpu': {'count': os.cpu_count()},
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def commit_info() -> Dict[str, Any]:
+    return {
+        'id': _git('rev-parse', 'HEAD'),
+        'time': _git('log', '-1', '--format=%cI'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'branch': _git('rev-parse', '--abbrev-ref', 'HEAD'),
+    }
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Engines print debug output and log INFO per call; keep the run readable."""
+    previous = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(previous)
+
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def _time_case(case: BenchCase, ctx: BenchContext, rounds: int, warmup: int,
+               trace_memory: bool) -> Dict[str, Any]:
+    setup_started = time.perf_counter()
+    fn = case.setup(ctx)
+    setup_s = time.perf_counter() - setup_started
+
+    for _ in range(warmup):
+        fn()
+
+    data = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            data.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    extra: Dict[str, Any] = {'setup_s': round(setup_s, 4)}
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            extra['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'group': case.group,
+        'name': case.name,
+        'fullname': f"utils/bench/cases.py::{case.name}",
+        'params': {'rows': ctx.rows},
+        'param': format_rows(ctx.rows),
+        'extra_info': extra,
+        'options': {'disable_gc': True, 'timer': 'perf_counter', 'min_rounds': rounds,
+                    'warmup': warmup},
+        'stats': compute_stats(data),
+    }
+
+
+def run_benchmarks(
+    rows: int,
+    seed: int = DEFAULT_SEED,
+    rounds: int = DEFAULT_ROUNDS,
+    warmup: int = DEFAULT_WARMUP,
+    select: Optional[List[str]] = None,
+    trace_memory: bool = False,
+    progress=None,
+) -> Dict[str, Any]:
+    """Run the selected cases at one scale; returns a pytest-benchmark style document."""
+    cases = get_cases(select)
+    if not cases:
+        raise ValueError(f"No benchmark cases match {select}")
+
+    ctx = BenchContext(SyntheticData(seed=seed), rows)
+    results, errors = [], {}
+    for case in cases:
+        try:
+            with _quiet():
+                result = _time_case(case, ctx, rounds, warmup, trace_memory)
+        except Exception as e:
+            logger.exception(f"Benchmark {case.name} failed")
+            errors[case.name] = f"{type(e).__name__}: {e}"
+            result = None
+        if result:
+            results.append(result)
+        if progress:
+            progress(case, result)
+
+    return {
+        'machine_info': machine_info(),
+        'commit_info': commit_info(),
+        'benchmarks': results,
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'version': '1.0.0',
+        'bench_info': {
+            'rows': rows,
+            'seed': seed,
+            'as_of': ctx.as_of.isoformat(),
+            'source_rows': ctx.source_rows(),
+            'errors': errors,
+        },
+    }
+
+
+# =============================================================================
+# STORAGE
+# =============================================================================
+
+def _stored_runs(storage: str) -> List[str]:
+    if not os.path.isdir(storage):
+        return []
+    return sorted(f for f in os.listdir(storage) if f.endswith('.json') and f[:4].isdigit())
+
+
+def save_run(run: Dict[str, Any], storage: str = DEFAULT_STORAGE) -> str:
+    """Write the run as .benchmarks/NNNN_<commit>_<timestamp>.json; returns the path."""
+    os.makedirs(storage, exist_ok=True)
+    existing = _stored_runs(storage)
+    number = int(existing[-1][:4]) + 1 if existing else 1
+    commit = (run['commit_info'].get('id') or 'nocommit')[:8]
+    if run['commit_info'].get('dirty'):
+        commit += '_dirty'
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(storage, f"{number:04d}_{commit}_{stamp}.json")
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2, default=str)
+    return path
+
+
+def load_run(ref: str, storage: str = DEFAULT_STORAGE) -> Dict[str, Any]:
+    """Load a run by path, by number ('0003') or 'latest' / 'previous'."""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        runs = _stored_runs(storage)
+        if ref in ('latest', 'previous'):
+            needed = 1 if ref == 'latest' else 2
+            if len(runs) < needed:
+                raise FileNotFoundError(f"Not enough saved runs in {storage} for '{ref}'")
+            path = os.path.join(storage, runs[-needed])
+        else:
+            matches = [r for r in runs if r.startswith(ref.zfill(4))]
+            if not matches:
+                raise FileNotFoundError(f"No saved benchmark run '{ref}' in {storage}")
+            path = os.path.join(storage, matches[-1])
+    with open(path) as f:
+        run = json.load(f)
+    run.setdefault('_path', path)
+    return run
+
+
+def list_runs(storage: str = DEFAULT_STORAGE) -> List[Dict[str, Any]]:
+    """Saved runs, oldest first: file, datetime, commit, rows, case count."""
+    listing = []
+    for name in _stored_runs(storage):
+        try:
+            run = load_run(os.path.join(storage, name))
+        except (OSError, ValueError):
+            continue
+        listing.append({
+            'file': name,
+            'datetime': run.get('datetime'),
+            'commit': (run.get('commit_info', {}).get('id') or '')[:8],
+            'rows': run.get('bench_info', {}).get('rows'),
+            'cases': len(run.get('benchmarks', [])),
+        })
+    return listing
+
+
+__all__ = [
+    'DEFAULT_STORAGE',
+    'DEFAULT_ROUNDS',
+    'DEFAULT_WARMUP',
+    'compute_stats',
+    'run_benchmarks',
+    'save_run',
+    'load_run',
+    'list_runs',
+]
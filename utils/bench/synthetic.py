@@ -0,0 +1,889 @@
+# utils/bench/synthetic.py
+"""
+Seeded synthetic data for the pandas engines
+
+Builds frames with the column schemas the loaders read from MySQL, so the
+calculators can be timed without a database:
+
+    sales_by_salesperson     unified_sales_by_salesperson_view (+ products.is_service)
+    sales_by_kpi_center      unified_sales_by_kpi_center_view
+    backlog_by_salesperson   backlog_by_salesperson_looker_view
+    backlog_by_kpi_center    backlog_by_kpi_center_flat_looker_view
+    ar_by_salesperson        customer_ar_by_salesperson_view (_AR_VIEW_SELECT aliases)
+    ar_by_kpi_center         customer_ar_by_kpi_center_view
+    supply / demand          unified_supply_view / unified_demand_view (Net GAP)
+    period_supply / _demand  Period GAP loader output (source_type, date_ref, ...)
+    salesperson_targets      sales_employee_kpi_assignments_view
+    kpi_center_targets       sales_kpi_center_assignments_view
+    kpi_center_hierarchy     KPICenterDataLoader._load_hierarchy()
+
+Dtypes follow what pd.read_sql returns over pymysql: DATE columns are
+object columns of datetime.date, DECIMAL columns are float64, nullable INT
+columns are float64, text columns are the pandas string dtype.
+
+Shapes are skewed like production: customers and products are drawn from
+a Zipf-like distribution, invoices carry ~3 lines, ~3% of customers are
+Internal, ~3% of products are services, ~5% of lines are legacy rows
+without product_id. The same seed always yields the same frames.
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.bench.synthetic import SyntheticData
+
+    data = SyntheticData(seed=7)
+    sales_df = data.sales_by_salesperson(100_000)
+    supply_df, demand_df = data.supply(50_000), data.demand(50_000)
+"""
+
+import logging
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Named scales accepted wherever a row count is (CLI --rows, parse_rows)
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '5m': 5_000_000,
+}
+
+DEFAULT_SEED = 7
+DEFAULT_AS_OF = date(2025, 6, 30)
+LOOKBACK_YEARS = 5
+
+_ROWS_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([km]?)\s*$', re.IGNORECASE)
+_MONTH_ABBR = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                        'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], dtype=object)
+
+
+def parse_rows(value) -> int:
+    """'250k' / '1.5m' / '10000' → int"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    text = str(value).strip().lower()
+    if text in SCALES:
+        return SCALES[text]
+    match = _ROWS_RE.match(text)
+    if not match:
+        raise ValueError(f"Invalid row count: {value!r} (use e.g. 10k, 250k, 1m, 5m)")
+    number, unit = float(match.group(1)), match.group(2)
+    return int(number * {'': 1, 'k': 1_000, 'm': 1_000_000}[unit])
+
+
+def format_rows(rows: int) -> str:
+    """1_000_000 → '1m', 250_000 → '250k'"""
+    if rows >= 1_000_000 and rows % 100_000 == 0:
+        return f"{rows / 1_000_000:g}m"
+    if rows >= 1_000 and rows % 100 == 0:
+        return f"{rows / 1_000:g}k"
+    return str(rows)
+
+
+# =============================================================================
+# GENERATOR
+# =============================================================================
+
+class SyntheticData:
+    """
+    Deterministic generator of view-shaped frames.
+
+    Dimensions (customers, products, salespeople, KPI centers, entities) are
+    built once per instance and shared by all frames, so joins between
+    frames behave like production (same customer in sales, backlog and AR).
+    Each frame method seeds its own stream from (seed, frame name, rows):
+    generation order does not change the output.
+    """
+
+    def __init__(self, seed: int = DEFAULT_SEED, as_of: date = DEFAULT_AS_OF,
+                 customers: int = 4_000, products: int = 12_000, salespeople: int = 60):
+        self.seed = seed
+        self.as_of = as_of
+        self.lookback_start = date(as_of.year - LOOKBACK_YEARS, 1, 1)
+        self._n_customers = customers
+        self._n_products = products
+        self._n_salespeople = salespeople
+        self._build_dimensions()
+
+    # ── Randomness ────────────────────────────────────────────────
+
+    def _rng(self, name: str, rows: int = 0) -> np.random.Generator:
+        key = [self.seed, rows] + [ord(c) for c in name]
+        return np.random.default_rng(key)
+
+    @staticmethod
+    def _zipf(rng: np.random.Generator, n_items: int, size: int, a: float = 1.1) -> np.ndarray:
+        """Skewed indices into [0, n_items): a few items get most rows."""
+        weights = 1.0 / np.arange(1, n_items + 1) ** a
+        weights /= weights.sum()
+        return rng.choice(n_items, size=size, p=weights)
+
+    def _dates(self, ordinals: np.ndarray) -> np.ndarray:
+        """Day ordinals → object array of datetime.date (read_sql DATE dtype)."""
+        lo, hi = int(ordinals.min()), int(ordinals.max())
+        pool = np.array([date.fromordinal(o) for o in range(lo, hi + 1)], dtype=object)
+        return pool[ordinals - lo]
+
+    # ── Dimensions ────────────────────────────────────────────────
+
+    def _build_dimensions(self):
+        rng = self._rng('dimensions')
+
+        # Legal entities
+        self.entities = pd.DataFrame({
+            'legal_entity_id': np.arange(1, 6),
+            'legal_entity': [f"Synthetic Entity {c} Co., Ltd" for c in 'ABCDE'],
+        })
+
+        # KPI center tree: ALL → regions → territories
+        centers = [(1, 'ALL', None, 0)]
+        next_id = 2
+        for r in range(3):
+            region_id = next_id
+            centers.append((region_id, f"REGION-{r + 1}", 1, 1))
+            next_id += 1
+            for t in range(3 + r):
+                centers.append((next_id, f"TERR-{r + 1}{t + 1}", region_id, 2))
+                next_id += 1
+        parents = {c[2] for c in centers if c[2] is not None}
+        self.kpi_centers = pd.DataFrame(centers, columns=['kpi_center_id', 'kpi_center_name',
+                                                          'parent_center_id', 'level'])
+        self.kpi_centers['is_leaf'] = (~self.kpi_centers['kpi_center_id'].isin(parents)).astype(int)
+        leaf_ids = self.kpi_centers.loc[self.kpi_centers['is_leaf'] == 1, 'kpi_center_id'].to_numpy()
+
+        # Salespeople, each homed in a territory
+        n = self._n_salespeople
+        ids = np.arange(1001, 1001 + n)
+        status = np.where(rng.random(n) < 0.9, 'ACTIVE', np.where(rng.random(n) < 0.5, 'INACTIVE', 'TERMINATED'))
+        self.salespeople = pd.DataFrame({
+            'sales_id': ids,
+            'sales_name': [f"Sales Person {i:03d}" for i in range(n)],
+            'sales_email': [f"sales{i:03d}@example.com" for i in range(n)],
+            'employment_status': status,
+            'kpi_center_id': rng.choice(leaf_ids, n),
+        })
+
+        # Customers (Zipf-weighted later), each with a home salesperson and entity
+        n = self._n_customers
+        self.customers = pd.DataFrame({
+            'customer_id': np.arange(1, n + 1),
+            'customer': [f"Customer {i:05d} Co., Ltd" for i in range(n)],
+            'customer_code': [f"C{i:05d}" for i in range(n)],
+            'customer_type': np.where(rng.random(n) < 0.03, 'Internal', 'Customer'),
+            'home_sales_idx': rng.integers(0, self._n_salespeople, n),
+            'home_entity_idx': self._zipf(rng, len(self.entities), n, a=0.8),
+        })
+
+        # Products and brands
+        n = self._n_products
+        n_brands = 80
+        brand_idx = self._zipf(rng, n_brands, n, a=0.9)
+        legacy = rng.random(n) < 0.05
+        self.products = pd.DataFrame({
+            'product_id': np.where(legacy, np.nan, np.arange(1, n + 1)).astype(float),
+            'product_pn': [f"Product {i:05d}" for i in range(n)],
+            'pt_code': [f"PT{i:06d}" for i in range(n)],
+            'package_size': rng.choice(np.array(['1KG', '5KG', '25KG', '200L', '1L', 'EA'], dtype=object), n),
+            'legacy_code': np.array([f"LG{i:05d}" for i in range(n)], dtype=object),
+            'brand': np.array([f"Brand {b:02d}" for b in range(n_brands)], dtype=object)[brand_idx],
+            'standard_uom': rng.choice(np.array(['KG', 'L', 'PCS'], dtype=object), n),
+            'is_service': (rng.random(n) < 0.03).astype(int),
+            'unit_cost_usd': np.round(rng.lognormal(2.5, 1.0, n), 4),
+        })
+        # Legacy rows keep legacy_code only; catalogue rows rarely carry one
+        self.products.loc[~legacy & (rng.random(n) < 0.9), 'legacy_code'] = None
+
+    # ── Shared line generator ─────────────────────────────────────
+
+    def _lines(self, name: str, rows: int, start: date, end: date,
+               lines_per_doc: float = 3.0) -> Tuple[np.random.Generator, Dict[str, np.ndarray]]:
+        """
+        Document lines: doc index, customer, product, salesperson, entity and
+        day ordinal per line (documents share customer / date / entity).
+        """
+        rng = self._rng(name, rows)
+        n_docs = max(1, int(rows / lines_per_doc))
+        doc = np.sort(rng.integers(0, n_docs, rows))
+
+        doc_customer = self._zipf(rng, len(self.customers), n_docs)
+        lo, hi = start.toordinal(), end.toordinal()
+        doc_day = rng.integers(lo, hi + 1, n_docs)
+        home_sales = self.customers['home_sales_idx'].to_numpy()[doc_customer]
+        # 15% of documents are sold by someone other than the home salesperson
+        other = rng.random(n_docs) < 0.15
+        doc_sales = np.where(other, rng.integers(0, len(self.salespeople), n_docs), home_sales)
+        doc_entity = self.customers['home_entity_idx'].to_numpy()[doc_customer]
+
+        return rng, {
+            'doc': doc,
+            'customer': doc_customer[doc],
+            'product': self._zipf(rng, len(self.products), rows),
+            'sales': doc_sales[doc],
+            'entity': doc_entity[doc],
+            'day': doc_day[doc],
+        }
+
+    def _dims(self, idx: Dict[str, np.ndarray], with_sales: bool = True) -> Dict[str, np.ndarray]:
+        """Dimension columns for generated lines."""
+        c, p, e = self.customers, self.products, self.entities
+        out = {
+            'legal_entity_id': e['legal_entity_id'].to_numpy()[idx['entity']],
+            'legal_entity': e['legal_entity'].to_numpy()[idx['entity']],
+            'customer': c['customer'].to_numpy()[idx['customer']],
+            'customer_id': c['customer_id'].to_numpy()[idx['customer']],
+            'customer_code': c['customer_code'].to_numpy()[idx['customer']],
+            'customer_type': c['customer_type'].to_numpy()[idx['customer']],
+            'product_id': p['product_id'].to_numpy()[idx['product']],
+            'product_pn': p['product_pn'].to_numpy()[idx['product']],
+            'pt_code': p['pt_code'].to_numpy()[idx['product']],
+            'package_size': p['package_size'].to_numpy()[idx['product']],
+            'legacy_code': p['legacy_code'].to_numpy()[idx['product']],
+            'brand': p['brand'].to_numpy()[idx['product']],
+        }
+        if with_sales:
+            s = self.salespeople
+            out.update({
+                'sales_id': s['sales_id'].to_numpy()[idx['sales']],
+                'sales_name': s['sales_name'].to_numpy()[idx['sales']],
+                'sales_email': s['sales_email'].to_numpy()[idx['sales']],
+                'employment_status': s['employment_status'].to_numpy()[idx['sales']],
+            })
+        return out
+
+    @staticmethod
+    def _amounts(rng: np.random.Generator, rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(revenue, gp, gp1, broker commission) in USD."""
+        revenue = np.round(rng.lognormal(7.0, 1.2, rows), 2)
+        margin = np.clip(rng.normal(0.22, 0.08, rows), -0.1, 0.6)
+        gp = np.round(revenue * margin, 2)
+        broker = np.round(np.where(rng.random(rows) < 0.1, revenue * 0.02, 0.0), 2)
+        gp1 = np.round(gp * 0.92 - broker, 2)
+        return revenue, gp, gp1, broker
+
+    def _month_year(self, day: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pool = self._dates(np.arange(day.min(), day.max() + 1))
+        offset = day - day.min()
+        return (np.array([d.month for d in pool])[offset],
+                np.array([d.year for d in pool])[offset])
+
+    @staticmethod
+    def _doc_numbers(prefix: str, doc: np.ndarray, day: np.ndarray) -> np.ndarray:
+        years = (day // 365.25 + 1).astype(int)
+        uniq, inverse = np.unique(doc, return_inverse=True)
+        first = np.zeros(len(uniq), dtype=int)
+        first[inverse[::-1]] = np.arange(len(doc))[::-1]
+        labels = np.array([f"{prefix}{years[i] % 100:02d}-{d:07d}" for d, i in zip(uniq, first)], dtype=object)
+        return labels[inverse]
+
+    # =========================================================================
+    # SALES VIEWS
+    # =========================================================================
+
+    def _sales_core(self, name: str, rows: int) -> Tuple[np.random.Generator, Dict[str, np.ndarray], dict]:
+        rng, idx = self._lines(name, rows, self.lookback_start, self.as_of)
+        cols = self._dims(idx, with_sales=not name.endswith('kpi_center'))
+
+        day = idx['day']
+        inv_date = self._dates(day)
+        oc_day = day - rng.integers(3, 60, rows)
+        months, years = self._month_year(day)
+
+        # Lines invoiced in the last ~2 years are REALTIME (carry payment data)
+        realtime = day >= (self.as_of.toordinal() - 730)
+        cols.update({
+            'data_source': np.where(realtime, 'REALTIME', 'HISTORY').astype(object),
+            'unified_line_id': np.array([f"L{i:09d}" for i in range(rows)], dtype=object),
+            'inv_date': inv_date,
+            'inv_number': self._doc_numbers('INV', idx['doc'], day),
+            'vat_number': self._doc_numbers('VAT', idx['doc'], day),
+            'invoice_month': _MONTH_ABBR[months - 1],
+            'invoice_year': years,
+            'customer_po_number': self._doc_numbers('PO', idx['doc'], oc_day),
+            'oc_number': self._doc_numbers('OC', idx['doc'], oc_day),
+            'oc_date': self._dates(oc_day),
+        })
+        meta = {'day': day, 'realtime': realtime, 'idx': idx}
+        return rng, cols, meta
+
+    def _payment_columns(self, rng: np.random.Generator, rows: int, day: np.ndarray,
+                         realtime: np.ndarray, revenue: np.ndarray) -> Dict[str, np.ndarray]:
+        age = self.as_of.toordinal() - day
+        paid_p = np.clip(age / 120, 0.05, 0.97)
+        u = rng.random(rows)
+        status = np.where(u < paid_p, 'Fully Paid', np.where(u < paid_p + 0.08, 'Partially Paid', 'Unpaid'))
+        ratio = np.where(status == 'Fully Paid', 1.0,
+                         np.where(status == 'Partially Paid', np.round(rng.uniform(0.1, 0.9, rows), 4), 0.0))
+        status = np.where(realtime, status, None).astype(object)
+        ratio = np.where(realtime, ratio, np.nan)
+        due_day = day + rng.choice([30, 45, 60, 90], rows)
+        invoice_total = revenue * 3
+        return {
+            'payment_status': status,
+            'payment_ratio': ratio,
+            'due_date': np.where(realtime, self._dates(due_day), None),
+            'outstanding_amount': np.where(realtime, np.round(invoice_total * (1 - np.nan_to_num(ratio)), 2), np.nan),
+            'total_payment_received': np.where(realtime, np.round(invoice_total * np.nan_to_num(ratio), 2), np.nan),
+        }
+
+    def sales_by_salesperson(self, rows: int) -> pd.DataFrame:
+        """unified_sales_by_salesperson_view — SalespersonQueries.get_sales_raw() columns."""
+        rng, cols, meta = self._sales_core('sales_by_salesperson', rows)
+        revenue, gp, gp1, broker = self._amounts(rng, rows)
+        split = np.where(rng.random(rows) < 0.1, 50.0, 100.0)
+        cols.update({
+            'split_rate_percent': split,
+            'sales_by_split_usd': np.round(revenue * split / 100, 2),
+            'gross_profit_by_split_usd': np.round(gp * split / 100, 2),
+            'gp1_by_split_usd': np.round(gp1 * split / 100, 2),
+            'allocated_broker_commission_usd': np.round(broker * split / 100, 2),
+            'is_service': self.products['is_service'].to_numpy()[meta['idx']['product']],
+        })
+        cols.update(self._payment_columns(rng, rows, meta['day'], meta['realtime'], revenue))
+        order = [
+            'data_source', 'unified_line_id', 'sales_id', 'sales_name', 'sales_email',
+            'employment_status', 'split_rate_percent', 'inv_date', 'inv_number', 'vat_number',
+            'invoice_month', 'invoice_year', 'legal_entity_id', 'legal_entity', 'customer',
+            'customer_id', 'customer_code', 'customer_type', 'customer_po_number', 'oc_number',
+            'oc_date', 'product_id', 'product_pn', 'pt_code', 'package_size', 'legacy_code',
+            'brand', 'sales_by_split_usd', 'gross_profit_by_split_usd', 'gp1_by_split_usd',
+            'allocated_broker_commission_usd', 'payment_status', 'payment_ratio', 'due_date',
+            'outstanding_amount', 'total_payment_received', 'is_service',
+        ]
+        return self._frame(cols, order, sort_key=meta['day'])
+
+    def sales_by_kpi_center(self, rows: int) -> pd.DataFrame:
+        """unified_sales_by_kpi_center_view — KPICenterDataLoader._load_sales_raw() columns."""
+        rng, cols, meta = self._sales_core('sales_by_kpi_center', rows)
+        revenue, gp, gp1, broker = self._amounts(rng, rows)
+        center = self._center_for(meta['idx']['sales'])
+        split = np.where(rng.random(rows) < 0.1, 50.0, 100.0)
+        cols.update({
+            'kpi_center_id': center,
+            'kpi_center': self._center_names(center),
+            'kpi_type': np.full(rows, 'TERRITORY', dtype=object),
+            'split_rate_percent': split,
+            'sales_by_kpi_center_usd': np.round(revenue * split / 100, 2),
+            'gross_profit_by_kpi_center_usd': np.round(gp * split / 100, 2),
+            'gp1_by_kpi_center_usd': np.round(gp1 * split / 100, 2),
+            'broker_commission_by_kpi_center_usd': np.round(broker * split / 100, 2),
+        })
+        order = [
+            'data_source', 'unified_line_id', 'kpi_center_id', 'kpi_center', 'kpi_type',
+            'split_rate_percent', 'legal_entity_id', 'legal_entity', 'inv_date', 'inv_number',
+            'vat_number', 'invoice_month', 'invoice_year', 'customer_id', 'customer',
+            'customer_code', 'customer_type', 'product_id', 'product_pn', 'pt_code', 'brand',
+            'legacy_code', 'oc_number', 'oc_date', 'customer_po_number', 'sales_by_kpi_center_usd',
+            'gross_profit_by_kpi_center_usd', 'gp1_by_kpi_center_usd',
+            'broker_commission_by_kpi_center_usd',
+        ]
+        return self._frame(cols, order, sort_key=meta['day'])
+
+    def _center_for(self, sales_idx: np.ndarray) -> np.ndarray:
+        return self.salespeople['kpi_center_id'].to_numpy()[sales_idx]
+
+    def _center_names(self, center_ids: np.ndarray) -> np.ndarray:
+        names = dict(zip(self.kpi_centers['kpi_center_id'], self.kpi_centers['kpi_center_name']))
+        lookup = np.array([names.get(i) for i in range(int(self.kpi_centers['kpi_center_id'].max()) + 1)],
+                          dtype=object)
+        return lookup[center_ids]
+
+    # =========================================================================
+    # BACKLOG VIEWS
+    # =========================================================================
+
+    def _backlog_core(self, name: str, rows: int):
+        today = self.as_of.toordinal()
+        rng, idx = self._lines(name, rows, self.as_of - timedelta(days=240), self.as_of)
+        cols = self._dims(idx)
+        oc_day = idx['day']
+        etd_day = oc_day + rng.integers(7, 150, rows)
+        completion = np.where(rng.random(rows) < 0.8, 0.0, np.round(rng.uniform(1, 99, rows), 1))
+        completion = np.where(rng.random(rows) < 0.03, np.nan, completion)
+        etd = self._dates(etd_day)
+        cols.update({
+            'oc_number': self._doc_numbers('OC', idx['doc'], oc_day),
+            'oc_date': self._dates(oc_day),
+            'etd': etd,
+            'etd_year': np.array([d.year for d in etd]),
+            'etd_month': _MONTH_ABBR[np.array([d.month for d in etd]) - 1],
+            'customer_po_number': self._doc_numbers('PO', idx['doc'], oc_day),
+            'pending_type': rng.choice(np.array(['Both Pending', 'Delivery Pending', 'Invoice Pending'],
+                                                dtype=object), rows, p=[0.7, 0.1, 0.2]),
+            'days_until_etd': etd_day - today,
+            'days_since_order': today - oc_day,
+            'status': rng.choice(np.array(['PENDING', 'PARTIAL', 'CONFIRMED'], dtype=object), rows),
+            'invoice_completion_percent': completion,
+        })
+        revenue, gp, _, _ = self._amounts(rng, rows)
+        remaining = 1 - np.nan_to_num(completion) / 100
+        split = np.where(rng.random(rows) < 0.1, 50.0, 100.0)
+        return rng, cols, idx, np.round(revenue * remaining * split / 100, 2), np.round(gp * remaining * split / 100, 2), split
+
+    def backlog_by_salesperson(self, rows: int) -> pd.DataFrame:
+        """backlog_by_salesperson_looker_view — get_backlog_detail() columns (+ customer_type, entity_id)."""
+        rng, cols, idx, backlog, backlog_gp, split = self._backlog_core('backlog_by_salesperson', rows)
+        cols.update({
+            'backlog_sales_by_split_usd': backlog,
+            'backlog_gp_by_split_usd': backlog_gp,
+            'split_rate_percent': split,
+            'entity_id': cols['legal_entity_id'],
+        })
+        order = [
+            'oc_number', 'oc_date', 'etd', 'customer', 'customer_id', 'customer_type',
+            'customer_po_number', 'product_pn', 'pt_code', 'package_size', 'brand', 'sales_name',
+            'sales_id', 'legal_entity', 'entity_id', 'backlog_sales_by_split_usd',
+            'backlog_gp_by_split_usd', 'split_rate_percent', 'pending_type', 'days_until_etd',
+            'status', 'invoice_completion_percent',
+        ]
+        return self._frame(cols, order, sort_key=backlog)
+
+    def backlog_by_kpi_center(self, rows: int) -> pd.DataFrame:
+        """backlog_by_kpi_center_flat_looker_view — KPICenterDataLoader._load_backlog_raw() columns."""
+        rng, cols, idx, backlog, backlog_gp, split = self._backlog_core('backlog_by_kpi_center', rows)
+        center = self._center_for(idx['sales'])
+        cols.update({
+            'kpi_center': self._center_names(center),
+            'kpi_center_id': center,
+            'kpi_type': np.full(rows, 'TERRITORY', dtype=object),
+            'split_rate_percent': split,
+            'backlog_by_kpi_center_usd': backlog,
+            'backlog_gp_by_kpi_center_usd': backlog_gp,
+        })
+        order = [
+            'oc_number', 'oc_date', 'etd', 'etd_year', 'etd_month', 'customer', 'customer_id',
+            'customer_type', 'customer_po_number', 'product_pn', 'pt_code', 'package_size', 'brand',
+            'kpi_center', 'kpi_center_id', 'kpi_type', 'split_rate_percent', 'legal_entity',
+            'legal_entity_id', 'backlog_by_kpi_center_usd', 'backlog_gp_by_kpi_center_usd',
+            'pending_type', 'days_until_etd', 'days_since_order', 'status', 'invoice_completion_percent',
+        ]
+        return self._frame(cols, order, sort_key=backlog)
+
+    # =========================================================================
+    # AR VIEWS
+    # =========================================================================
+
+    def _ar_core(self, name: str, rows: int):
+        today = self.as_of.toordinal()
+        rng, cols, meta = self._sales_core(name, rows)
+        # AR views only carry real-time invoices; move lines into the last two years
+        day = today - (today - meta['day']) % 730
+        months, years = self._month_year(day)
+        cols.update({'inv_date': self._dates(day), 'invoice_month': _MONTH_ABBR[months - 1],
+                     'invoice_year': years})
+        meta['day'] = day
+        net, gp, gp1, _ = self._amounts(rng, rows)
+        vat = np.round(net * 0.1, 2)
+        gross = net + vat
+        payments = self._payment_columns(rng, rows, day, np.ones(rows, dtype=bool), gross)
+        ratio = payments['payment_ratio']
+        due_day = np.array([d.toordinal() for d in payments['due_date']])
+        overdue = today - due_day
+        bucket = np.select(
+            [overdue < 1, overdue <= 30, overdue <= 60, overdue <= 90],
+            ['Not Yet Due', '1-30 days overdue', '31-60 days overdue', '61-90 days overdue'],
+            '90+ days overdue',
+        ).astype(object)
+        split = np.where(rng.random(rows) < 0.1, 50.0, 100.0)
+        rate = rng.choice([1.0, 25_000.0], rows, p=[0.3, 0.7])
+        cols.update(payments)
+        cols.update({
+            'data_source': np.full(rows, 'REALTIME', dtype=object),
+            'split_rate_percent': split,
+            'invoiced_currency': np.where(rate == 1.0, 'USD', 'VND').astype(object),
+            'oc_currency': np.where(rate == 1.0, 'USD', 'VND').astype(object),
+            'si_usd_rate': rate,
+            'oc_usd_rate': rate,
+            'total_invoiced_amount': np.round(gross * rate * 3, 2),
+            'line_invoiced_amount_lc': np.round(net * rate, 2),
+            'inv_unit_price': np.round(net * rate / rng.integers(1, 50, rows), 4),
+            'line_outstanding_lc': np.round(gross * rate * (1 - ratio), 2),
+            'line_collected_lc': np.round(gross * rate * ratio, 2),
+            'invoice_outstanding_lc': np.round(gross * rate * 3 * (1 - ratio), 2),
+            'line_vat_amount_lc': np.round(vat * rate, 2),
+            'outstanding_by_split_lc': np.round(gross * rate * (1 - ratio) * split / 100, 2),
+            'collected_by_split_lc': np.round(gross * rate * ratio * split / 100, 2),
+            'calculated_invoiced_amount_usd': gross,
+            'line_outstanding_usd': np.round(gross * (1 - ratio), 2),
+            'line_collected_usd': np.round(gross * ratio, 2),
+            'calculated_invoiced_amount_usd_net': net,
+            'line_outstanding_usd_net': np.round(net * (1 - ratio), 2),
+            'line_collected_usd_net': np.round(net * ratio, 2),
+            'days_overdue': np.maximum(overdue, 0),
+            'aging_bucket': bucket,
+            'invoice_age_days': today - day,
+            'cost_source': rng.choice(np.array(['ACTUAL', 'STANDARD'], dtype=object), rows, p=[0.85, 0.15]),
+            'gross_profit_percent': np.round(np.where(net > 0, gp / net * 100, 0), 2),
+        })
+        return rng, cols, meta, {'gross': gross, 'net': net, 'gp': gp, 'gp1': gp1,
+                                 'ratio': ratio, 'split': split}
+
+    def ar_by_salesperson(self, rows: int) -> pd.DataFrame:
+        """customer_ar_by_salesperson_view through _AR_VIEW_SELECT (sales_by_split_usd = GROSS)."""
+        rng, cols, meta, amt = self._ar_core('ar_by_salesperson', rows)
+        split, ratio = amt['split'] / 100, amt['ratio']
+        unassigned = rng.random(rows) < 0.02
+        for col in ('sales_id',):
+            cols[col] = np.where(unassigned, np.nan, cols[col].astype(float))
+        cols['sales_name'] = np.where(unassigned, 'Unassigned', cols['sales_name']).astype(object)
+        cols['sales_email'] = np.where(unassigned, 'unassigned', cols['sales_email']).astype(object)
+        cols.update({
+            'is_unassigned': unassigned.astype(int),
+            'sales_by_split_usd': np.round(amt['gross'] * split, 4),
+            'outstanding_by_split_usd': np.round(amt['gross'] * (1 - ratio) * split, 2),
+            'collected_by_split_usd': np.round(amt['gross'] * ratio * split, 2),
+            'gross_profit_by_split_usd': np.round(amt['gp'] * split, 2),
+            'gp1_by_split_usd': np.round(amt['gp1'] * split, 2),
+            'gp_outstanding_by_split_usd': np.round(amt['gp'] * (1 - ratio) * split, 2),
+            'revenue_by_split_usd_net': np.round(amt['net'] * split, 2),
+        })
+        order = [
+            'data_source', 'unified_line_id', 'sales_name', 'sales_id', 'sales_email',
+            'employment_status', 'split_rate_percent', 'is_unassigned', 'inv_number', 'inv_date',
+            'due_date', 'vat_number', 'legal_entity', 'legal_entity_id', 'customer', 'customer_id',
+            'customer_code', 'customer_type', 'customer_po_number', 'oc_number', 'oc_date',
+            'product_id', 'product_pn', 'pt_code', 'brand', 'package_size', 'invoiced_currency',
+            'oc_currency', 'si_usd_rate', 'oc_usd_rate', 'payment_status', 'payment_ratio',
+            'total_invoiced_amount', 'total_payment_received', 'line_invoiced_amount_lc',
+            'inv_unit_price', 'line_outstanding_lc', 'line_collected_lc', 'invoice_outstanding_lc',
+            'line_vat_amount_lc', 'outstanding_by_split_lc', 'collected_by_split_lc',
+            'calculated_invoiced_amount_usd', 'line_outstanding_usd', 'line_collected_usd',
+            'sales_by_split_usd', 'outstanding_by_split_usd', 'collected_by_split_usd',
+            'gross_profit_by_split_usd', 'gp1_by_split_usd', 'gp_outstanding_by_split_usd',
+            'revenue_by_split_usd_net', 'calculated_invoiced_amount_usd_net',
+            'line_outstanding_usd_net', 'line_collected_usd_net', 'days_overdue', 'aging_bucket',
+            'invoice_age_days', 'cost_source', 'gross_profit_percent', 'invoice_month', 'invoice_year',
+        ]
+        return self._frame(cols, order, sort_key=meta['day'])
+
+    def ar_by_kpi_center(self, rows: int) -> pd.DataFrame:
+        """customer_ar_by_kpi_center_view — split columns named *_by_kpi_center_usd."""
+        rng, cols, meta, amt = self._ar_core('ar_by_kpi_center', rows)
+        split, ratio = amt['split'] / 100, amt['ratio']
+        center = self._center_for(meta['idx']['sales'])
+        cols.update({
+            'kpi_center_id': center,
+            'kpi_center': self._center_names(center),
+            'kpi_type': np.full(rows, 'TERRITORY', dtype=object),
+            'sales_by_kpi_center_usd': np.round(amt['gross'] * split, 4),
+            'outstanding_by_kpi_center_usd': np.round(amt['gross'] * (1 - ratio) * split, 2),
+            'collected_by_kpi_center_usd': np.round(amt['gross'] * ratio * split, 2),
+            'gross_profit_by_kpi_center_usd': np.round(amt['gp'] * split, 2),
+            'gp1_by_kpi_center_usd': np.round(amt['gp1'] * split, 2),
+            'gp_outstanding_by_kpi_center_usd': np.round(amt['gp'] * (1 - ratio) * split, 2),
+        })
+        order = [
+            'data_source', 'unified_line_id', 'kpi_center_id', 'kpi_center', 'kpi_type',
+            'split_rate_percent', 'inv_number', 'inv_date', 'due_date', 'vat_number',
+            'legal_entity', 'legal_entity_id', 'customer', 'customer_id', 'customer_code',
+            'customer_type', 'customer_po_number', 'oc_number', 'oc_date', 'product_id',
+            'product_pn', 'pt_code', 'brand', 'package_size', 'invoiced_currency', 'si_usd_rate',
+            'payment_status', 'payment_ratio', 'total_invoiced_amount', 'total_payment_received',
+            'calculated_invoiced_amount_usd', 'line_outstanding_usd', 'line_collected_usd',
+            'sales_by_kpi_center_usd', 'outstanding_by_kpi_center_usd', 'collected_by_kpi_center_usd',
+            'gross_profit_by_kpi_center_usd', 'gp1_by_kpi_center_usd',
+            'gp_outstanding_by_kpi_center_usd', 'days_overdue', 'aging_bucket', 'invoice_age_days',
+            'invoice_month', 'invoice_year',
+        ]
+        return self._frame(cols, order, sort_key=meta['day'])
+
+    # =========================================================================
+    # SUPPLY & DEMAND (Net GAP)
+    # =========================================================================
+
+    def supply(self, rows: int) -> pd.DataFrame:
+        """unified_supply_view — NetGAP load_supply_data() columns, after _process_supply_dataframe."""
+        rng = self._rng('supply', rows)
+        today = self.as_of.toordinal()
+        p = self.products
+        prod = self._zipf(rng, len(p), rows, a=0.9)
+        source = rng.choice(np.array(['INVENTORY', 'CAN_PENDING', 'WAREHOUSE_TRANSFER', 'PURCHASE_ORDER'],
+                                     dtype=object), rows, p=[0.55, 0.1, 0.05, 0.3])
+        lead = np.select([source == 'INVENTORY', source == 'CAN_PENDING', source == 'WAREHOUSE_TRANSFER'],
+                         [0, rng.integers(1, 4, rows), rng.integers(2, 6, rows)], rng.integers(7, 45, rows))
+        expiry = today + rng.integers(-60, 720, rows)
+        qty = np.round(rng.lognormal(4.0, 1.3, rows), 2)
+        cost = p['unit_cost_usd'].to_numpy()[prod]
+        entity = self._zipf(rng, len(self.entities), rows, a=0.8)
+        cols = {
+            'supply_source': source,
+            'product_id': np.nan_to_num(p['product_id'].to_numpy()[prod], nan=0.0),
+            'product_name': p['product_pn'].to_numpy()[prod],
+            'brand': p['brand'].to_numpy()[prod],
+            'pt_code': p['pt_code'].to_numpy()[prod],
+            'package_size': p['package_size'].to_numpy()[prod],
+            'standard_uom': p['standard_uom'].to_numpy()[prod],
+            'batch_number': np.array([f"B{i:08d}" for i in rng.integers(0, 10**8, rows)], dtype=object),
+            'expiry_date': pd.to_datetime(self._dates(expiry)),
+            'days_to_expiry': (expiry - today).astype(float),
+            'available_quantity': qty,
+            'availability_date': pd.to_datetime(self._dates(today + lead)),
+            'days_to_available': lead.astype(float),
+            'availability_status': np.where(lead == 0, 'Available', 'Incoming').astype(object),
+            'warehouse_name': rng.choice(np.array([f"WH-{i}" for i in range(8)], dtype=object), rows),
+            'to_location': rng.choice(np.array([f"WH-{i}" for i in range(8)], dtype=object), rows),
+            'entity_name': self.entities['legal_entity'].to_numpy()[entity],
+            'unit_cost_usd': cost,
+            'total_value_usd': np.round(cost * qty, 2),
+            'supply_reference_id': rng.integers(1, 10**6, rows),
+            'supplier_name': np.array([f"Supplier {i:03d}" for i in self._zipf(rng, 300, rows)], dtype=object),
+            'completion_percentage': np.where(source == 'PURCHASE_ORDER', rng.uniform(0, 99, rows).round(1), 0.0),
+            'purchase_order_type': np.where(source == 'PURCHASE_ORDER', 'REGULAR_ORDER', None).astype(object),
+            'approval_status': np.where(source == 'PURCHASE_ORDER', 'APPROVED', None).astype(object),
+        }
+        return pd.DataFrame(cols)
+
+    def demand(self, rows: int) -> pd.DataFrame:
+        """unified_demand_view — NetGAP load_demand_data() columns, after _process_demand_dataframe."""
+        rng = self._rng('demand', rows)
+        today = self.as_of.toordinal()
+        p, c = self.products, self.customers
+        prod = self._zipf(rng, len(p), rows, a=0.9)
+        cust = self._zipf(rng, len(c), rows)
+        source = rng.choice(np.array(['OC_PENDING', 'FORECAST'], dtype=object), rows, p=[0.75, 0.25])
+        required = today + rng.integers(-30, 180, rows)
+        days = required - today
+        urgency = np.select([days < 0, days <= 7, days <= 30], ['OVERDUE', 'URGENT', 'UPCOMING'], 'FUTURE').astype(object)
+        qty = np.round(rng.lognormal(3.5, 1.3, rows), 2)
+        price = np.round(p['unit_cost_usd'].to_numpy()[prod] * rng.uniform(1.1, 1.6, rows), 4)
+        allocated = np.round(qty * np.where(rng.random(rows) < 0.4, rng.uniform(0, 1, rows), 0), 2)
+        entity = self._zipf(rng, len(self.entities), rows, a=0.8)
+        cols = {
+            'demand_source': source,
+            'demand_priority': np.where(source == 'OC_PENDING', 1, 2),
+            'product_id': np.nan_to_num(p['product_id'].to_numpy()[prod], nan=0.0),
+            'product_name': p['product_pn'].to_numpy()[prod],
+            'brand': p['brand'].to_numpy()[prod],
+            'pt_code': p['pt_code'].to_numpy()[prod],
+            'package_size': p['package_size'].to_numpy()[prod],
+            'standard_uom': p['standard_uom'].to_numpy()[prod],
+            'customer': c['customer'].to_numpy()[cust],
+            'customer_code': c['customer_code'].to_numpy()[cust],
+            'customer_po_number': np.array([f"PO-{i:07d}" for i in rng.integers(0, 10**7, rows)], dtype=object),
+            'required_quantity': qty,
+            'required_date': pd.to_datetime(self._dates(required)),
+            'days_to_required': days.astype(float),
+            'demand_status': rng.choice(np.array(['PENDING', 'PARTIAL'], dtype=object), rows),
+            'urgency_level': urgency,
+            'is_allocated': allocated > 0,
+            'allocation_count': (allocated > 0).astype(int),
+            'allocation_coverage_percent': np.round(np.where(qty > 0, allocated / qty * 100, 0), 1),
+            'allocated_quantity': allocated,
+            'unallocated_quantity': np.round(qty - allocated, 2),
+            'is_over_committed': np.zeros(rows, dtype=bool),
+            'is_pending_over_allocated': np.zeros(rows, dtype=int),
+            'over_committed_qty_standard': np.zeros(rows),
+            'pending_over_allocated_qty_standard': np.zeros(rows),
+            'selling_unit_price': price,
+            'total_value_usd': np.round(price * qty, 2),
+            'demand_reference_id': rng.integers(1, 10**6, rows),
+            'source_line_id': np.arange(1, rows + 1),
+            'source_document_number': np.array([f"OC-{i:07d}" for i in rng.integers(0, 10**7, rows)], dtype=object),
+            'source_document_date': pd.to_datetime(self._dates(required - rng.integers(7, 90, rows))),
+            'entity_name': self.entities['legal_entity'].to_numpy()[entity],
+            'aging_days': rng.integers(0, 120, rows),
+            'selling_uom': p['standard_uom'].to_numpy()[prod],
+            'uom_conversion': np.ones(rows),
+            'total_delivered_standard_quantity': np.zeros(rows),
+            'original_standard_quantity': qty,
+        }
+        return pd.DataFrame(cols)
+
+    # =========================================================================
+    # SUPPLY & DEMAND (Period GAP)
+    # =========================================================================
+
+    def period_supply(self, rows: int) -> pd.DataFrame:
+        """Period GAP supply: PeriodGAPDataLoader.load_all_supply() standard columns."""
+        rng = self._rng('period_supply', rows)
+        today = self.as_of.toordinal()
+        p = self.products
+        prod = self._zipf(rng, len(p), rows, a=0.9)
+        source = rng.choice(np.array(['Inventory', 'Pending CAN', 'Pending PO', 'Pending WH Transfer'],
+                                     dtype=object), rows, p=[0.55, 0.1, 0.3, 0.05])
+        offset = np.select([source == 'Inventory', source == 'Pending CAN'],
+                           [0, rng.integers(1, 4, rows)], rng.integers(2, 120, rows))
+        ref = pd.to_datetime(self._dates(today + offset))
+        qty = np.round(rng.lognormal(4.0, 1.3, rows), 2)
+        entity = self._zipf(rng, len(self.entities), rows, a=0.8)
+        cols = {
+            'source_type': source,
+            'pt_code': p['pt_code'].to_numpy()[prod],
+            'product_name': p['product_pn'].to_numpy()[prod],
+            'brand': p['brand'].to_numpy()[prod],
+            'package_size': p['package_size'].to_numpy()[prod],
+            'standard_uom': p['standard_uom'].to_numpy()[prod],
+            'legal_entity': self.entities['legal_entity'].to_numpy()[entity],
+            'date_ref': ref,
+            'quantity': qty,
+            'value_in_usd': np.round(qty * p['unit_cost_usd'].to_numpy()[prod], 2),
+        }
+        df = pd.DataFrame(cols)
+        df['arrival_date'] = df['date_ref'].where(df['source_type'] == 'Pending CAN')
+        df['eta'] = df['date_ref'].where(df['source_type'] == 'Pending PO')
+        df['transfer_date'] = df['date_ref'].where(df['source_type'] == 'Pending WH Transfer')
+        return df
+
+    def period_demand(self, rows: int) -> pd.DataFrame:
+        """Period GAP demand: PeriodGAPDataLoader.get_demand_data() standard columns."""
+        rng = self._rng('period_demand', rows)
+        today = self.as_of.toordinal()
+        p, c = self.products, self.customers
+        prod = self._zipf(rng, len(p), rows, a=0.9)
+        cust = self._zipf(rng, len(c), rows)
+        qty = np.round(rng.lognormal(3.5, 1.3, rows), 2)
+        entity = self._zipf(rng, len(self.entities), rows, a=0.8)
+        etd = pd.to_datetime(self._dates(today + rng.integers(-30, 180, rows)))
+        cols = {
+            'source_type': rng.choice(np.array(['OC', 'Forecast'], dtype=object), rows, p=[0.75, 0.25]),
+            'pt_code': p['pt_code'].to_numpy()[prod],
+            'product_name': p['product_pn'].to_numpy()[prod],
+            'brand': p['brand'].to_numpy()[prod],
+            'package_size': p['package_size'].to_numpy()[prod],
+            'standard_uom': p['standard_uom'].to_numpy()[prod],
+            'customer': c['customer'].to_numpy()[cust],
+            'legal_entity': self.entities['legal_entity'].to_numpy()[entity],
+            'etd': etd,
+            'demand_date': etd,
+            'demand_quantity': qty,
+            'value_in_usd': np.round(qty * p['unit_cost_usd'].to_numpy()[prod] * 1.3, 2),
+        }
+        return pd.DataFrame(cols)
+
+    # =========================================================================
+    # TARGETS & HIERARCHY
+    # =========================================================================
+
+    _KPI_TYPES = [
+        (1, 'Revenue', 'USD', 90), (2, 'Gross Profit', 'USD', 95), (3, 'Gross Profit 1', 'USD', 100),
+        (4, 'Num New Customers', 'customer', 60), (5, 'Num New Products', 'product', 50),
+        (6, 'New Business Revenue', 'USD', 75),
+    ]
+
+    def salesperson_targets(self, year: Optional[int] = None) -> pd.DataFrame:
+        """sales_employee_kpi_assignments_view — get_kpi_targets() columns."""
+        year = year or self.as_of.year
+        rng = self._rng('salesperson_targets', year)
+        rows = []
+        for _, person in self.salespeople.iterrows():
+            for kpi_id, kpi_name, uom, weight in self._KPI_TYPES:
+                if rng.random() < 0.3:
+                    continue
+                annual = float(round(rng.lognormal(13 if uom == 'USD' else 2.5, 0.5)))
+                rows.append({
+                    'employee_id': person['sales_id'], 'employee_name': person['sales_name'],
+                    'email': person['sales_email'], 'status': person['employment_status'],
+                    'year': year, 'kpi_type_id': kpi_id, 'kpi_name': kpi_name,
+                    'annual_target_value': f"{annual:,.0f}", 'annual_target_value_numeric': annual,
+                    'unit_of_measure': uom, 'weight_numeric': float(weight),
+                    'monthly_target_value': round(annual / 12, 2),
+                    'quarterly_target_value': round(annual / 4, 2),
+                    'is_current_year': int(year == self.as_of.year),
+                })
+        return pd.DataFrame(rows)
+
+    def kpi_center_targets(self, year: Optional[int] = None) -> pd.DataFrame:
+        """sales_kpi_center_assignments_view — _load_targets_raw() columns."""
+        year = year or self.as_of.year
+        rng = self._rng('kpi_center_targets', year)
+        rows = []
+        for _, center in self.kpi_centers.iterrows():
+            # Leaves always have assignments; parents only some (exercises STOP rollup)
+            if not center['is_leaf'] and rng.random() < 0.6:
+                continue
+            for kpi_id, kpi_name, uom, weight in self._KPI_TYPES:
+                if rng.random() < 0.25:
+                    continue
+                annual = float(round(rng.lognormal(15 if uom == 'USD' else 3.5, 0.5)))
+                rows.append({
+                    'kpi_center_id': center['kpi_center_id'], 'kpi_center_name': center['kpi_center_name'],
+                    'kpi_center_type': 'TERRITORY', 'parent_center_id': center['parent_center_id'],
+                    'year': year, 'kpi_type_id': kpi_id, 'kpi_name': kpi_name,
+                    'unit_of_measure': uom, 'annual_target_value': f"{annual:,.0f}",
+                    'annual_target_value_numeric': annual, 'weight': f"{weight}",
+                    'weight_numeric': float(weight), 'monthly_target_value': round(annual / 12, 2),
+                    'quarterly_target_value': round(annual / 4, 2), 'notes': None,
+                    'is_current_year': int(year == self.as_of.year),
+                })
+        return pd.DataFrame(rows)
+
+    def kpi_center_hierarchy(self) -> pd.DataFrame:
+        """KPICenterDataLoader._load_hierarchy() columns."""
+        kc = self.kpi_centers
+        names = dict(zip(kc['kpi_center_id'], kc['kpi_center_name']))
+        parents = dict(zip(kc['kpi_center_id'], kc['parent_center_id']))
+
+        def path(center_id):
+            parts = []
+            while center_id is not None and not pd.isna(center_id):
+                parts.append(names[center_id])
+                center_id = parents[center_id]
+            return ' > '.join(reversed(parts))
+
+        children = kc['parent_center_id'].value_counts()
+        return pd.DataFrame({
+            'kpi_center_id': kc['kpi_center_id'],
+            'kpi_center_name': kc['kpi_center_name'],
+            'kpi_type': 'TERRITORY',
+            'parent_center_id': kc['parent_center_id'],
+            'description': None,
+            'level': kc['level'],
+            'path': [path(i) for i in kc['kpi_center_id']],
+            'is_leaf': kc['is_leaf'],
+            'has_children': kc['kpi_center_id'].map(children).fillna(0).astype(int).astype(bool),
+        }).sort_values(['level', 'path'], ignore_index=True)
+
+    def kpi_type_weights(self) -> Dict[str, int]:
+        """kpi_types.default_weight keyed by lower-case name (get_kpi_type_weights_cached)."""
+        return {name.lower(): weight for _, name, _, weight in self._KPI_TYPES}
+
+    def leaf_descendants(self, kpi_center_id: int, include_self: bool = True) -> List[int]:
+        """In-memory KPICenterQueries.get_leaf_descendants()."""
+        kc = self.kpi_centers
+        found, frontier = [], [kpi_center_id]
+        while frontier:
+            current = frontier.pop()
+            kids = kc.loc[kc['parent_center_id'] == current, 'kpi_center_id'].tolist()
+            if not kids and (include_self or current != kpi_center_id):
+                found.append(int(current))
+            frontier.extend(kids)
+        return found
+
+    # ── Helpers ───────────────────────────────────────────────────
+
+    @staticmethod
+    def _frame(cols: Dict[str, np.ndarray], order: List[str],
+               sort_key: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Columns in view order, rows descending by sort_key (loaders ORDER BY ... DESC)."""
+        if sort_key is not None:
+            rank = np.argsort(-sort_key, kind='stable')
+            cols = {c: np.asarray(cols[c])[rank] for c in order}
+        return pd.DataFrame({c: cols[c] for c in order})
+
+
+# =============================================================================
+# SOURCES (name → generator method), used by the runner and the CLI
+# =============================================================================
+
+SOURCES = (
+    'sales_by_salesperson', 'sales_by_kpi_center',
+    'backlog_by_salesperson', 'backlog_by_kpi_center',
+    'ar_by_salesperson', 'ar_by_kpi_center',
+    'supply', 'demand', 'period_supply', 'period_demand',
+)
+
+
+__all__ = [
+    'SCALES',
+    'SOURCES',
+    'DEFAULT_SEED',
+    'DEFAULT_AS_OF',
+    'SyntheticData',
+    'parse_rows',
+    'format_rows',
+]
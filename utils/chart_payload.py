@@ -0,0 +1,183 @@
+# utils/chart_payload.py
+"""
+Chart Payload Preparation & Metering
+
+Altair and Plotly serialize every row of the frame handed to them into the
+page as JSON — including columns that are never encoded. This module trims
+chart input to exactly the marks drawn and measures what is shipped.
+
+VERSION: 1.0.1
+
+Helpers:
+- top_n_with_others: Keep top-N categories, fold the tail into one "Others" bar
+- slim: Project to encoded columns and round floats
+- payload_bytes: Serialized JSON size of an Altair chart or Plotly figure
+- record_payload: Measure + log a chart's payload (no-op unless metering enabled)
+
+Metering is off by default because measuring means serializing the chart a
+second time. Enable with env CHART_PAYLOAD_METER=1, DEBUG logging on this
+module, or set_metering(True).
+
+Usage:
+    from utils.chart_payload import top_n_with_others, slim, record_payload
+
+    df = top_n_with_others(customer_df, 'customer', 'revenue', n=20,
+                           sum_cols=['gross_profit', 'gp1'])
+    chart = alt.Chart(slim(df, ['customer', 'revenue'])).mark_bar()...
+    return record_payload('top_customers', chart)
+"""
+
+import json
+import logging
+import os
+from typing import Any, List, Optional, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+DEFAULT_TOP_N = 20                   # bars per ranking chart (incl. "Others")
+OTHERS_LABEL = 'Others'
+PAYLOAD_WARN_BYTES = 250_000         # log a warning above ~250 KB per chart
+
+_metering_override: Optional[bool] = None
+
+
+# =============================================================================
+# DATA PREPARATION
+# =============================================================================
+
+def top_n_with_others(
+    df: pd.DataFrame,
+    label_col: str,
+    value_col: str,
+    n: int = DEFAULT_TOP_N,
+    sum_cols: Sequence[str] = (),
+    others_label: str = OTHERS_LABEL,
+) -> pd.DataFrame:
+    """
+    Aggregate to one row per label, keep the top (n - 1) by value_col and
+    fold the remainder into a single others_label row.
+
+    Args:
+        df: Input frame (line-level or already aggregated)
+        label_col: Category column drawn on the axis
+        value_col: Ranking measure
+        n: Maximum rows returned, including the "Others" row
+        sum_cols: Extra additive columns carried into the result
+        others_label: Label of the tail bucket
+
+    Returns:
+        DataFrame [label_col, value_col, *sum_cols, item_count] sorted by
+        value_col desc with "Others" (if any) last. item_count is the number
+        of original labels in each row.
+    """
+    cols = [value_col] + [c for c in sum_cols if c != value_col and c in df.columns]
+    if df.empty or label_col not in df.columns or value_col not in df.columns:
+        return pd.DataFrame(columns=[label_col] + cols + ['item_count'])
+
+    agg = df.groupby(label_col, sort=False, dropna=False)[cols].sum()
+    agg['item_count'] = 1
+    agg = agg.sort_values(value_col, ascending=False)
+
+    if n is None or len(agg) <= n:
+        return agg.reset_index()
+
+    head = agg.iloc[:max(n - 1, 0)]
+    tail = agg.iloc[max(n - 1, 0):]
+    others = tail[cols].sum().to_frame().T
+    others['item_count'] = len(tail)
+    others.index = pd.Index([others_label], name=label_col)
+
+    return pd.concat([head, others]).reset_index()
+
+
+def slim(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    decimals: Optional[int] = 2,
+) -> pd.DataFrame:
+    """
+    Keep only the columns a chart encodes and round float columns.
+    Missing columns are ignored.
+    """
+    out = df[[c for c in dict.fromkeys(columns) if c in df.columns]].copy()
+    if decimals is not None:
+        float_cols = out.select_dtypes(include='float').columns
+        if len(float_cols):
+            out[float_cols] = out[float_cols].round(decimals)
+    return out
+
+
+# =============================================================================
+# PAYLOAD METERING
+# =============================================================================
+
+def set_metering(enabled: Optional[bool]):
+    """Force metering on/off; None restores env/log-level detection."""
+    global _metering_override
+    _metering_override = enabled
+
+
+def metering_enabled() -> bool:
+    if _metering_override is not None:
+        return _metering_override
+    if os.getenv('CHART_PAYLOAD_METER', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def payload_bytes(chart: Any) -> Optional[int]:
+    """
+    Serialized size (UTF-8 bytes) of an Altair chart or Plotly figure.
+    Returns None for unsupported objects or if serialization fails.
+    """
+    try:
+        if hasattr(chart, 'to_json'):
+            spec = chart.to_json()
+        elif hasattr(chart, 'to_dict'):
+            spec = json.dumps(chart.to_dict(), default=str)
+        else:
+            return None
+        return len(spec.encode('utf-8'))
+    except Exception as e:
+        logger.debug(f"payload_bytes failed for {type(chart).__name__}: {e}")
+        return None
+
+
+def record_payload(name: str, chart: Any) -> Any:
+    """
+    Measure a chart's payload and log it (warning above PAYLOAD_WARN_BYTES).
+    Returns the chart unchanged so builders can `return record_payload(...)`.
+    """
+    if not metering_enabled():
+        return chart
+
+    size = payload_bytes(chart)
+    if size is None:
+        return chart
+
+    if size > PAYLOAD_WARN_BYTES:
+        logger.warning(f"Chart payload '{name}': {size / 1024:,.1f} KB")
+    else:
+        logger.debug(f"Chart payload '{name}': {size / 1024:,.1f} KB")
+
+    return chart
+
+
+__all__: List[str] = [
+    'DEFAULT_TOP_N',
+    'OTHERS_LABEL',
+    'PAYLOAD_WARN_BYTES',
+    'top_n_with_others',
+    'slim',
+    'set_metering',
+    'metering_enabled',
+    'payload_bytes',
+    'record_payload',
+]
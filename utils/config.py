@@ -174,6 +174,16 @@ class Config:
             database=db_secrets.get("database", "prostechvn")
         )
         
+        # Read replica (optional) - unset keys fall back to the primary's
+        replica_secrets = st.secrets.get("DB_REPLICA_CONFIG", {})
+        self._replica_config = self._build_replica_config(
+            host=replica_secrets.get("host", ""),
+            port=replica_secrets.get("port"),
+            user=replica_secrets.get("user"),
+            password=replica_secrets.get("password"),
+            database=replica_secrets.get("database"),
+        )
+        
         # AWS
         aws_secrets = st.secrets.get("AWS", {})
         self._aws_config = AWSConfig(
@@ -254,6 +264,15 @@ class Config:
             logger.error("Missing required database configuration")
             raise ValueError("Missing required database configuration. Please check .env file.")
         
+        # Read replica (optional) - unset keys fall back to the primary's
+        self._replica_config = self._build_replica_config(
+            host=os.getenv("DB_REPLICA_HOST", ""),
+            port=os.getenv("DB_REPLICA_PORT"),
+            user=os.getenv("DB_REPLICA_USER"),
+            password=os.getenv("DB_REPLICA_PASSWORD"),
+            database=os.getenv("DB_REPLICA_NAME"),
+        )
+        
         # AWS
         self._aws_config = AWSConfig(
             access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
@@ -303,6 +322,19 @@ class Config:
         
         logger.info("💻 Running in LOCAL environment")
     
+    def _build_replica_config(self, host, port, user, password, database) -> Optional[DatabaseConfig]:
+        """Replica settings, or None when no replica host is configured"""
+        if not host:
+            return None
+        primary = self._db_config
+        return DatabaseConfig(
+            host=host,
+            port=int(port or primary.port),
+            user=user or primary.user,
+            password=password or primary.password,
+            database=database or primary.database,
+        )
+    
     def _load_app_config(self):
         """Load application-specific settings"""
         self._app_config = {
@@ -317,6 +349,14 @@ class Config:
             # Database pool
             "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "5")),
             "DB_POOL_RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+            "DB_POOL_MAX_OVERFLOW": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+            "DB_POOL_TIMEOUT": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            
+            # Read replica routing (used only when a replica is configured)
+            "DB_READ_ROUTING": os.getenv("DB_READ_ROUTING", "true").lower() == "true",
+            "DB_READ_STICKY_SECONDS": int(os.getenv("DB_READ_STICKY_SECONDS", "15")),
+            "DB_REPLICA_POOL_SIZE": int(os.getenv("DB_REPLICA_POOL_SIZE", os.getenv("DB_POOL_SIZE", "5"))),
+            "DB_REPLICA_MAX_OVERFLOW": int(os.getenv("DB_REPLICA_MAX_OVERFLOW", os.getenv("DB_POOL_MAX_OVERFLOW", "10"))),
             
             # Cache
             "CACHE_TTL_SECONDS": int(os.getenv("CACHE_TTL_SECONDS", "300")),
@@ -370,6 +410,12 @@ class Config:
             logger.error(f"   ❌ Missing: {', '.join(missing)}")
             issues.append(f"Database: missing {', '.join(missing)}")
         
+        replica = self._replica_config
+        if replica:
+            logger.info(f"   ✅ Read replica: {replica.host}:{replica.port}/{replica.database}")
+        else:
+            logger.info("   ℹ️ Read replica: not configured (reads use the primary)")
+        
         # ═══════════════════════════════════════════════════════════════
         # EMAIL
         # ═══════════════════════════════════════════════════════════════
@@ -482,6 +528,10 @@ class Config:
         """Get database configuration as dictionary"""
         return self._db_config.to_dict()
     
+    def get_replica_db_config(self) -> Optional[Dict[str, Any]]:
+        """Read replica configuration as dictionary (None when not configured)"""
+        return self._replica_config.to_dict() if self._replica_config else None
+    
     def get_aws_config(self) -> Dict[str, Any]:
         """Get AWS configuration as dictionary"""
         return self._aws_config.to_dict()
@@ -3,9 +3,10 @@
 SQL Queries — uses utils.db helpers exclusively.
 
 Depends on: utils.db (execute_query_df, execute_query, execute_update)
-No direct engine access.
+No direct engine access. The AR / credit status view reads are marked
+read_only and go to the read replica when one is configured.
 
-VERSION: 1.0.0
+VERSION: 1.2.0
 """
 
 import logging
@@ -15,6 +16,7 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 from utils.db import execute_query_df, execute_query, execute_update, get_connection
+from utils.perf import perf, PC
 from sqlalchemy import text as sa_text
 
 logger = logging.getLogger(__name__)
@@ -24,11 +26,13 @@ logger = logging.getLogger(__name__)
 # TIMING UTILITY
 # ═══════════════════════════════════════════════════════════════
 def _timed_query(label: str, func, *args, **kwargs):
-    """Execute a query function with timing. Logs slow queries (>200ms)."""
+    """Execute a query function as an SQL trace span. Logs slow queries (>200ms)."""
     t0 = perf_counter()
-    result = func(*args, **kwargs)
+    with perf.track(label, PC.SQL) as span:
+        result = func(*args, **kwargs)
+        span.rows = len(result) if hasattr(result, '__len__') else None
     elapsed_ms = (perf_counter() - t0) * 1000
-    rows = len(result) if hasattr(result, '__len__') else '?'
+    rows = span.rows if span.rows is not None else '?'
     if elapsed_ms > 200:
         logger.warning(f"⏱ SLOW query [{label}]: {elapsed_ms:.0f}ms, {rows} rows")
     else:
@@ -43,7 +47,8 @@ def _timed_query(label: str, func, *args, **kwargs):
 def get_all_credit_statuses() -> pd.DataFrame:
     try:
         return _timed_query("get_all_credit_statuses",
-                            execute_query_df, "SELECT * FROM customer_credit_status_view")
+                            execute_query_df, "SELECT * FROM customer_credit_status_view",
+                            read_only=True)
     except Exception as e:
         logger.error(f"get_all_credit_statuses: {e}")
         return pd.DataFrame()
@@ -79,7 +84,7 @@ def get_overdue_invoices(customer_id: int) -> pd.DataFrame:
     """
     try:
         return _timed_query(f"get_overdue_invoices({customer_id})",
-                            execute_query_df, q, {'cid': customer_id})
+                            execute_query_df, q, {'cid': customer_id}, read_only=True)
     except Exception as e:
         logger.error(f"get_overdue_invoices({customer_id}): {e}")
         return pd.DataFrame()
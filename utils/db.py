@@ -2,7 +2,7 @@
 """
 Database Connection Management
 
-Version: 3.0.0 (Combined)
+Version: 3.4.1 (Combined)
 Features:
 - Singleton pattern with thread-safe double-checked locking
 - Connection pooling with auto-reconnect
@@ -10,15 +10,31 @@ Features:
 - Query execution helpers (V1)
 - Context managers for transactions (V1)
 - Pool status with invalidatedcount (V2)
+- Central query result cache: normalized-SQL + params fingerprint,
+  per-table TTL policies, byte-bounded LRU, hit/miss metrics (V3.1)
+- Engine statements traced as utils.perf SQL spans (V3.2)
+- Pool monitor: checkout wait / hold-time histograms, per-call-site hold,
+  leak detection, sizing recommendation and auto-tune (V3.3)
+- Read replica routing: read-only helpers use a replica engine, with
+  read-your-writes stickiness after a session writes (V3.4)
 
 Compatibility:
 - V1: context managers, query helpers (execute_query, execute_update, etc.)
 - V2/V3: direct DB_CONFIG/APP_CONFIG imports, invalidatedcount in pool status
 """
 
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import time
+from collections import OrderedDict
+
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import QueuePool
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.exc import OperationalError, DatabaseError
 from urllib.parse import quote_plus
 import logging
@@ -27,6 +43,9 @@ from typing import Tuple, Optional, Dict, Any, List
 from contextlib import contextmanager
 
 from .config import config, DB_CONFIG, APP_CONFIG
+from .single_flight import run_single_flight
+from .perf.sql import instrument_engine
+from .pool_monitor import MonitoredQueuePool, get_pool_monitor, DB_POOL_AUTOTUNE
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +82,39 @@ def _create_engine():
     db_config = config.get_db_config() if hasattr(config, 'get_db_config') else DB_CONFIG
     app_config = config.app_config if hasattr(config, 'app_config') else APP_CONFIG
     
-    # Build connection URL
+    url, safe_url = _connection_url(db_config)
+    logger.info(f"🔌 Creating database engine: {safe_url}")
+    
+    # Pool settings (auto-tune overrides win over config)
+    pool_size, max_overflow = _pool_sizes(app_config)
+    pool_timeout = app_config.get("DB_POOL_TIMEOUT", 30)
+    pool_recycle = app_config.get("DB_POOL_RECYCLE", 3600)
+    
+    engine = create_engine(
+        url,
+        poolclass=MonitoredQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=True,  # Auto-reconnect on stale connections
+        echo=False
+    )
+    instrument_engine(engine)  # SQL spans for utils.perf tracer
+    get_pool_monitor().attach(engine, resize=_resize_pool)
+    if replica_configured():
+        # Writes pin the session's reads to the primary (read-your-writes)
+        event.listen(engine, 'after_cursor_execute', _on_primary_execute)
+    _pool_settings.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+    
+    logger.info(f"✅ Database engine created (pool_size={pool_size}, max_overflow={max_overflow}, "
+                f"timeout={pool_timeout}s, recycle={pool_recycle}s)")
+    
+    return engine
+
+
+def _connection_url(db_config: Dict[str, Any]) -> Tuple[str, str]:
+    """(connection URL, same URL with the password masked for logs)"""
     user = db_config["user"]
     password = quote_plus(str(db_config["password"]))
     host = db_config["host"]
@@ -71,29 +122,298 @@ def _create_engine():
     database = db_config["database"]
     
     url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
+    return url, f"mysql+pymysql://{user}:***@{host}:{port}/{database}"
+
+
+# ==================== POOL SIZING (V3.3) ====================
+#
+# Sizes come from APP_CONFIG (DB_POOL_SIZE / DB_POOL_MAX_OVERFLOW) unless the
+# pool monitor's auto-tune (DB_POOL_AUTOTUNE=apply) has resized the pool, in
+# which case the engine's pool is swapped in place for one with the override
+# (the engine object itself never changes, so held references see it).
+
+_pool_settings: Dict[str, int] = {}
+_pool_overrides: Dict[str, int] = {}
+
+
+def _app_config() -> Dict[str, Any]:
+    return config.app_config if hasattr(config, 'app_config') else APP_CONFIG
+
+
+def _pool_sizes(app_config: Dict[str, Any]) -> Tuple[int, int]:
+    return (
+        _pool_overrides.get("pool_size", app_config.get("DB_POOL_SIZE", 5)),
+        _pool_overrides.get("max_overflow", app_config.get("DB_POOL_MAX_OVERFLOW", 10)),
+    )
+
+
+def _resize_pool(pool_size: int, max_overflow: int):
+    """
+    Resize the live engine's pool in place
+    
+    The engine object is kept: loaders and st.cache_resource holders keep a
+    reference to get_db_engine(), so rebuilding it would leave them on the
+    old pool at the old sizes. The pool is swapped for a copy with the new
+    sizes (same creator, options and event listeners); the old pool's idle
+    connections are closed and checked-out ones are closed on return.
+    """
+    _pool_overrides.update(pool_size=pool_size, max_overflow=max_overflow)
+    with _engine_lock:
+        engine = _engine
+        if engine is None:
+            return  # next _create_engine() picks up the overrides
+        old_pool = engine.pool
+        engine.pool = old_pool.__class__(
+            old_pool._creator,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pre_ping=old_pool._pre_ping,
+            use_lifo=old_pool._pool.use_lifo,
+            timeout=old_pool._timeout,
+            recycle=old_pool._recycle,
+            echo=old_pool.echo,
+            logging_name=old_pool._orig_logging_name,
+            reset_on_return=old_pool._reset_on_return,
+            _dispatch=old_pool.dispatch,
+            dialect=old_pool._dialect,
+        )
+        if isinstance(old_pool, MonitoredQueuePool):
+            old_pool.retire()
+        else:
+            old_pool.dispose()
+        _pool_settings.update(pool_size=pool_size, max_overflow=max_overflow)
+    logger.info(f"🔧 Connection pool resized in place (pool_size={pool_size}, max_overflow={max_overflow})")
+
+
+def autotune_pool(mode: str = DB_POOL_AUTOTUNE) -> Optional[Dict[str, Any]]:
+    """
+    Size the pool from observed concurrency (see utils.pool_monitor)
     
-    logger.info(f"🔌 Creating database engine: mysql+pymysql://{user}:***@{host}:{port}/{database}")
+    mode 'recommend' logs the recommendation, 'apply' also resizes the pool
+    (never below the configured sizes). Called periodically by the monitor
+    when DB_POOL_AUTOTUNE is set; callable by hand from an admin page.
+    """
+    if _engine is None:
+        return None
+    app_config = _app_config()
+    pool_size, max_overflow = _pool_sizes(app_config)
+    return get_pool_monitor().autotune(
+        pool_size, max_overflow,
+        base_size=app_config.get("DB_POOL_SIZE", 5),
+        base_overflow=app_config.get("DB_POOL_MAX_OVERFLOW", 10),
+        mode=mode,
+    )
+
+
+# ==================== READ REPLICA ROUTING (V3.4) ====================
+#
+# With a replica configured (DB_REPLICA_HOST in .env, [DB_REPLICA_CONFIG] in
+# secrets), helpers marked read-only run on a second engine:
+#
+#     get_read_engine()                          # heavy dashboard loaders
+#     execute_query_df(query, params, read_only=True)
+#     execute_query(query, params, read_only=True)
+#     get_connection(read_only=True)
+#
+# Everything else, and every write, stays on get_db_engine(). Without a
+# replica (or with DB_READ_ROUTING=false) get_read_engine() is the primary.
+#
+# Read-your-writes: each write statement on the primary pins the writing
+# session's reads to the primary for DB_READ_STICKY_SECONDS (set it above
+# the replica's usual lag), and cached results of the written table are not
+# stored again until the window has passed — otherwise another session could
+# refill the cache from a replica that has not caught up. A replica
+# connection error sends all reads to the primary for
+# DB_REPLICA_RETRY_SECONDS.
+
+DB_REPLICA_RETRY_SECONDS = int(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+
+_read_engine = None
+_read_engine_lock = threading.Lock()
+_replica_down_until = 0.0
+
+_write_lock = threading.Lock()
+_session_writes: Dict[str, float] = {}   # session id -> monotonic time of last write
+_table_writes: Dict[str, float] = {}     # table (or '*') -> monotonic time of last write
+_read_routes: Dict[str, int] = {"replica": 0, "pinned": 0, "replica_down": 0}
+
+_SQL_WRITE_VERB_RE = re.compile(
+    r'(?:INSERT|UPDATE|DELETE|REPLACE|CALL|CREATE|DROP|ALTER|TRUNCATE|RENAME|LOAD)\b',
+    re.IGNORECASE
+)
+
+
+def _replica_config() -> Optional[Dict[str, Any]]:
+    return config.get_replica_db_config() if hasattr(config, 'get_replica_db_config') else None
+
+
+def replica_configured() -> bool:
+    """True when a replica is configured and read routing is switched on"""
+    return bool(_replica_config()) and _app_config().get("DB_READ_ROUTING", True)
+
+
+def _sticky_seconds() -> int:
+    return _app_config().get("DB_READ_STICKY_SECONDS", 15)
+
+
+def _session_key() -> str:
+    """Streamlit session id of the calling script thread (thread id elsewhere)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return f"thread-{threading.get_ident()}"
+
+
+def mark_session_write(*tables: str):
+    """
+    Pin this session's reads to the primary for DB_READ_STICKY_SECONDS
     
-    # Pool settings
-    pool_size = app_config.get("DB_POOL_SIZE", 5)
-    pool_recycle = app_config.get("DB_POOL_RECYCLE", 3600)
+    Called automatically for every write statement on the primary engine;
+    call it by hand after writes that bypass utils.db (e.g. another service
+    updating rows the page is about to show).
+    """
+    now = time.monotonic()
+    with _write_lock:
+        _session_writes[_session_key()] = now
+        for table in tables or ('*',):
+            _table_writes[table.lower()] = now
+        if len(_session_writes) > 256:
+            horizon = now - _sticky_seconds()
+            for key in [k for k, t in _session_writes.items() if t < horizon]:
+                del _session_writes[key]
+
+
+def reads_pinned_to_primary() -> bool:
+    """True while the calling session is inside its read-your-writes window"""
+    last = _session_writes.get(_session_key())
+    return last is not None and time.monotonic() - last < _sticky_seconds()
+
+
+def _recently_written(tables: frozenset) -> bool:
+    """True when a write inside the sticky window may have changed a read of tables (views expanded)"""
+    if not _table_writes:
+        return False
+    horizon = time.monotonic() - _sticky_seconds()
+    deps = query_dependencies(tables)
+    if '*' in deps:
+        return any(t > horizon for t in _table_writes.values())
+    return any(_table_writes.get(t, 0.0) > horizon for t in ('*', *deps))
+
+
+def _on_primary_execute(conn, cursor, statement, parameters, context, executemany):
+    head = statement.lstrip()
+    if head.startswith(('--', '/*')):
+        head = _SQL_COMMENT_RE.sub(' ', head).lstrip()
+    if not _SQL_WRITE_VERB_RE.match(head):
+        return
+    match = _SQL_WRITE_TABLE_RE.match(head)
+    if match:
+        mark_session_write(match.group(1))
+    else:
+        mark_session_write()
+
+
+def _on_replica_error(exception_context):
+    global _replica_down_until
+    if exception_context.is_disconnect or isinstance(exception_context.sqlalchemy_exception, OperationalError):
+        _replica_down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+        logger.warning(f"⚠️ Read replica error, routing reads to primary for "
+                       f"{DB_REPLICA_RETRY_SECONDS}s: {exception_context.original_exception}")
+
+
+def get_read_engine():
+    """
+    Engine for read-only queries
     
+    The replica engine (singleton, created on first use) unless no replica is
+    configured, the calling session wrote within DB_READ_STICKY_SECONDS, or
+    the replica failed within DB_REPLICA_RETRY_SECONDS — then the primary.
+    Resolve it per query rather than caching it, so routing follows writes.
+    
+    Returns:
+        SQLAlchemy Engine instance
+    """
+    global _read_engine
+    
+    if not replica_configured():
+        return get_db_engine()
+    if reads_pinned_to_primary():
+        _read_routes["pinned"] += 1
+        return get_db_engine()
+    if time.monotonic() < _replica_down_until:
+        _read_routes["replica_down"] += 1
+        return get_db_engine()
+    
+    if _read_engine is None:
+        with _read_engine_lock:
+            if _read_engine is None:
+                _read_engine = _create_read_engine()
+    _read_routes["replica"] += 1
+    return _read_engine
+
+
+def _create_read_engine():
+    """Create the replica engine (plain QueuePool; the pool monitor tracks the primary)"""
+    app_config = _app_config()
+    url, safe_url = _connection_url(_replica_config())
+    logger.info(f"🔌 Creating read replica engine: {safe_url}")
+    
+    pool_size = app_config.get("DB_REPLICA_POOL_SIZE", app_config.get("DB_POOL_SIZE", 5))
+    max_overflow = app_config.get("DB_REPLICA_MAX_OVERFLOW", app_config.get("DB_POOL_MAX_OVERFLOW", 10))
     engine = create_engine(
         url,
-        poolclass=QueuePool,
         pool_size=pool_size,
-        max_overflow=10,
-        pool_timeout=30,
-        pool_recycle=pool_recycle,
-        pool_pre_ping=True,  # Auto-reconnect on stale connections
+        max_overflow=max_overflow,
+        pool_timeout=app_config.get("DB_POOL_TIMEOUT", 30),
+        pool_recycle=app_config.get("DB_POOL_RECYCLE", 3600),
+        pool_pre_ping=True,
         echo=False
     )
+    instrument_engine(engine)
+    event.listen(engine, 'handle_error', _on_replica_error)
     
-    logger.info(f"✅ Database engine created (pool_size={pool_size}, recycle={pool_recycle}s)")
-    
+    logger.info(f"✅ Read replica engine created (pool_size={pool_size}, max_overflow={max_overflow})")
     return engine
 
 
+def reset_read_engine():
+    """Dispose the replica engine (recreated on the next routed read)"""
+    global _read_engine, _replica_down_until
+    
+    with _read_engine_lock:
+        if _read_engine is not None:
+            try:
+                _read_engine.dispose()
+                logger.info("🔄 Read replica engine disposed")
+            except Exception as e:
+                logger.error(f"Error disposing read replica engine: {e}")
+            _read_engine = None
+    _replica_down_until = 0.0
+
+
+def get_read_routing_status() -> Dict[str, Any]:
+    """Replica pool and routing counters for monitoring"""
+    replica = _replica_config()
+    if not replica_configured():
+        return {"status": "disabled" if replica else "not_configured"}
+    status: Dict[str, Any] = {
+        "status": "down" if time.monotonic() < _replica_down_until else "active",
+        "host": f"{replica['host']}:{replica['port']}",
+        "sticky_seconds": _sticky_seconds(),
+        "pinned_sessions": sum(1 for t in list(_session_writes.values())
+                               if time.monotonic() - t < _sticky_seconds()),
+        "routes": dict(_read_routes),
+    }
+    if _read_engine is not None:
+        pool = _read_engine.pool
+        status.update(pool_size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin())
+    return status
+
+
 # ==================== CONNECTION MANAGEMENT ====================
 
 def check_db_connection() -> Tuple[bool, Optional[str]]:
@@ -161,6 +481,15 @@ def get_connection_pool_status() -> Dict[str, Any]:
         # V2: Add invalidatedcount if available
         if hasattr(pool, 'invalidatedcount'):
             status["invalid"] = pool.invalidatedcount()
+        # V3.3: Configured limits + recorded history (utils.pool_monitor)
+        status["max_overflow"] = _pool_settings.get("max_overflow")
+        status["pool_timeout"] = _pool_settings.get("pool_timeout")
+        monitor = get_pool_monitor()
+        status["monitor"] = monitor.stats()
+        status["recommendation"] = monitor.recommend(
+            _pool_settings.get("pool_size", pool.size()), _pool_settings.get("max_overflow", 0))
+        # V3.4: Read replica
+        status["replica"] = get_read_routing_status()
         return status
     except Exception as e:
         return {"status": "error", "error": str(e)}
@@ -169,15 +498,18 @@ def get_connection_pool_status() -> Dict[str, Any]:
 # ==================== CONTEXT MANAGERS (V1) ====================
 
 @contextmanager
-def get_connection():
+def get_connection(read_only: bool = False):
     """
     Context manager for database connections
     
     Usage:
         with get_connection() as conn:
             result = conn.execute(text("SELECT * FROM table"))
+    
+    Args:
+        read_only: Route to the read replica (see get_read_engine)
     """
-    engine = get_db_engine()
+    engine = get_read_engine() if read_only else get_db_engine()
     conn = engine.connect()
     try:
         yield conn
@@ -215,36 +547,42 @@ def get_transaction():
 
 # ==================== QUERY HELPERS (V1) ====================
 
-def execute_query(query: str, params: Dict = None) -> List[Dict]:
+def execute_query(query: str, params: Dict = None, read_only: bool = False) -> List[Dict]:
     """
     Execute SELECT query and return results as list of dicts
     
     Args:
         query: SQL query string
         params: Query parameters
+        read_only: Route to the read replica (see get_read_engine)
         
     Returns:
         List of dictionaries
     """
-    engine = get_db_engine()
+    engine = get_read_engine() if read_only else get_db_engine()
     
     with engine.connect() as conn:
         result = conn.execute(text(query), params or {})
         return [dict(row._mapping) for row in result]
 
 
-def execute_query_df(query: str, params: Dict = None) -> pd.DataFrame:
+def execute_query_df(query: str, params: Dict = None, cache: bool = False,
+                     read_only: bool = False) -> pd.DataFrame:
     """
     Execute SELECT query and return results as DataFrame
     
     Args:
         query: SQL query string
         params: Query parameters
+        cache: Serve from / store in the central result cache
+        read_only: Route to the read replica (see get_read_engine)
         
     Returns:
         pandas DataFrame
     """
-    engine = get_db_engine()
+    if cache:
+        return _cached_read_sql(query, params, read_only)
+    engine = get_read_engine() if read_only else get_db_engine()
     return pd.read_sql(text(query), engine, params=params or {})
 
 
@@ -264,7 +602,9 @@ def execute_update(query: str, params: Dict = None) -> int:
     with engine.connect() as conn:
         result = conn.execute(text(query), params or {})
         conn.commit()
-        return result.rowcount
+    
+    _invalidate_written_table(query)
+    return result.rowcount
 
 
 def execute_many(query: str, params_list: List[Dict]) -> int:
@@ -287,20 +627,381 @@ def execute_many(query: str, params_list: List[Dict]) -> int:
             total_rows += result.rowcount
         conn.commit()
     
+    _invalidate_written_table(query)
     return total_rows
 
 
+# ==================== RESULT CACHE (V3.1) ====================
+#
+# Process-wide cache of SELECT results keyed on a fingerprint of the
+# normalized SQL text plus bound parameters. Entries expire by the shortest
+# TTL policy among the tables the query reads and are evicted LRU once the
+# cache holds more than QUERY_CACHE_MAX_BYTES. Writes through execute_update /
+# execute_many drop entries that read the written table or a view over it
+# (QUERY_CACHE_VIEW_DEPENDENCIES).
+#
+# Opt in per helper:
+#
+#     @cached_query()
+#     def _execute_query(self, query, params, query_name="query"): ...
+#
+# or per call: execute_query_df(query, params, cache=True)
+
+QUERY_CACHE_ENABLED = os.getenv('QUERY_CACHE_ENABLED', '1') != '0'
+QUERY_CACHE_MAX_BYTES = int(os.getenv('QUERY_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+QUERY_CACHE_DEFAULT_TTL = int(os.getenv('QUERY_CACHE_DEFAULT_TTL', '300'))
+
+# Seconds an entry reading the table stays fresh (shortest wins)
+QUERY_CACHE_TTL_POLICIES: Dict[str, int] = {
+    # Reference data
+    'countries': 86400,
+    'currencies': 86400,
+    'kpi_types': 3600,
+    'brands': 3600,
+    'companies': 1800,
+    'products': 1800,
+    'employees': 1800,
+    'users': 1800,
+    'kpi_centers': 1800,
+    # Operational data
+    'inventory_detailed_view': 120,
+    'unified_supply_view': 120,
+    'unified_demand_view': 120,
+}
+
+# Base tables this app writes, per view it reads. Cached reads are keyed by
+# the FROM / JOIN names (mostly views) while writes name base tables; a write
+# to a table below invalidates — and, during the read-your-writes window,
+# stops re-caching — results of every view listed over it. A *_view missing
+# from this map is treated as depending on every table (any write counts).
+# Tables only the ERP writes need not be listed: TTLs cover those.
+QUERY_CACHE_VIEW_DEPENDENCIES: Dict[str, frozenset] = {
+    view: frozenset(tables) for view, tables in {
+        # Sales / AR / backlog by salesperson (split rules)
+        'unified_sales_by_salesperson_view': ('sales_split_by_customer_product',),
+        'customer_ar_by_salesperson_view': ('sales_split_by_customer_product',),
+        'backlog_by_salesperson_looker_view': ('sales_split_by_customer_product', 'stock_out_delivery'),
+        'sales_split_full_looker_view': ('sales_split_by_customer_product',),
+        'sales_employee_kpi_assignments_view': ('sales_employee_kpi_assignments',),
+        # KPI center (split rules, hierarchy, assignments)
+        'unified_sales_by_kpi_center_view': ('kpi_center_split_by_customer_product', 'kpi_centers'),
+        'customer_ar_by_kpi_center_view': ('kpi_center_split_by_customer_product', 'kpi_centers'),
+        'backlog_by_kpi_center_flat_looker_view': ('kpi_center_split_by_customer_product', 'kpi_centers',
+                                                   'stock_out_delivery'),
+        'kpi_center_split_looker_view': ('kpi_center_split_by_customer_product', 'kpi_centers'),
+        'sales_kpi_center_assignments_view': ('sales_kpi_center_assignments', 'kpi_centers'),
+        # Legal entity (no app writes reach these)
+        'unified_sales_by_legal_entity_view': (),
+        'backlog_by_legal_entity_view': ('stock_out_delivery',),
+        'sales_invoice_full_looker_view': (),
+        'order_confirmation_full_looker_view': ('stock_out_delivery',),
+        # Delivery schedule (ETD adjustments)
+        'delivery_full_view': ('stock_out_delivery',),
+        'outbound_oc_pending_delivery_view': ('stock_out_delivery', 'allocation_details',
+                                              'allocation_cancellations', 'allocation_plans'),
+        # Supply chain planning (allocations, safety stock)
+        'unified_demand_view': ('stock_out_delivery', 'allocation_details',
+                                'allocation_cancellations', 'allocation_plans'),
+        'unified_supply_view': ('stock_out_delivery', 'allocation_details',
+                                'allocation_cancellations', 'allocation_plans'),
+        'inventory_detailed_view': ('stock_out_delivery',),
+        'safety_stock_current_view': ('safety_stock_levels', 'safety_stock_parameters',
+                                      'safety_stock_reviews'),
+        # Credit control
+        'customer_credit_status_view': ('term_and_conditions', 'customer_block_log'),
+        'customer_payment_full_view': (),
+    }.items()
+}
+
+_SQL_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_SQL_SPACE_RE = re.compile(r'\s+')
+_SQL_READ_TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+_SQL_WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\s+`?(\w+)`?',
+    re.IGNORECASE
+)
+
+
+def normalize_sql(query: str) -> str:
+    """Strip comments and collapse whitespace — formatting does not change the key"""
+    return _SQL_SPACE_RE.sub(' ', _SQL_COMMENT_RE.sub(' ', str(query))).strip()
+
+
+def query_tables(query: str) -> frozenset:
+    """Lower-cased table / view names a SELECT reads (FROM / JOIN targets)"""
+    return frozenset(t.lower() for t in _SQL_READ_TABLE_RE.findall(_SQL_COMMENT_RE.sub(' ', str(query))))
+
+
+def query_dependencies(tables: frozenset) -> frozenset:
+    """
+    Read names plus the base tables they depend on (QUERY_CACHE_VIEW_DEPENDENCIES);
+    '*' when an unmapped view is read, i.e. any write may change the result
+    """
+    deps = set(tables)
+    for name in tables:
+        if name in QUERY_CACHE_VIEW_DEPENDENCIES:
+            deps |= QUERY_CACHE_VIEW_DEPENDENCIES[name]
+        elif name.endswith('_view'):
+            deps.add('*')
+    return frozenset(deps)
+
+
+def query_fingerprint(query: str, params: Dict = None) -> str:
+    """Stable key for normalized SQL + bound parameters"""
+    items = sorted((params or {}).items())
+    payload = normalize_sql(query) + '\x00' + repr([(k, _param_key(v)) for k, v in items])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _param_key(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        values = [_param_key(v) for v in value]
+        return tuple(sorted(values, key=repr)) if isinstance(value, (set, frozenset)) else tuple(values)
+    return value
+
+
+def _result_nbytes(result) -> int:
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    try:
+        return len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def _copy_result(result):
+    return result.copy() if isinstance(result, pd.DataFrame) else copy.deepcopy(result)
+
+
+class QueryResultCache:
+    """Size-bounded (bytes) LRU of query results with per-table TTLs"""
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int, float, frozenset]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def ttl_for(tables: frozenset) -> int:
+        ttls = [QUERY_CACHE_TTL_POLICIES[t] for t in tables if t in QUERY_CACHE_TTL_POLICIES]
+        return min(ttls) if ttls else QUERY_CACHE_DEFAULT_TTL
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(hit, copy of result)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            result, nbytes, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self._expirations += 1
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return True, _copy_result(result)
+
+    def put(self, key: str, result, tables: frozenset, ttl: Optional[int] = None):
+        nbytes = _result_nbytes(result)
+        if nbytes > self.max_bytes:
+            return
+        ttl = self.ttl_for(tables) if ttl is None else ttl
+        stored = _copy_result(result)
+        deps = query_dependencies(tables)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stored, nbytes, time.monotonic() + ttl, deps)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def _drop(self, key: str):
+        _, nbytes, _, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def invalidate(self, *tables: str) -> int:
+        """
+        Drop entries reading any of tables (all entries when none given)
+
+        A base table also matches the views built on it, and entries over
+        unmapped views match any table (see QUERY_CACHE_VIEW_DEPENDENCIES).
+        """
+        targets = {t.lower() for t in tables}
+        with self._lock:
+            keys = [k for k, e in self._entries.items()
+                    if not targets or e[3] & targets or '*' in e[3]]
+            for key in keys:
+                self._drop(key)
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+_query_cache = QueryResultCache()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Process-wide result cache"""
+    return _query_cache
+
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Hit / miss / byte counters for monitoring"""
+    return _query_cache.stats()
+
+
+def invalidate_query_cache(*tables: str) -> int:
+    """Drop cached results that read any of tables (everything when none given)"""
+    count = _query_cache.invalidate(*tables)
+    if count:
+        logger.debug(f"Query cache: invalidated {count} entries ({', '.join(tables) or 'all'})")
+    return count
+
+
+def _invalidate_written_table(query: str):
+    match = _SQL_WRITE_TABLE_RE.match(_SQL_COMMENT_RE.sub(' ', str(query)))
+    if match:
+        invalidate_query_cache(match.group(1))
+
+
+def cached_query(
+    ttl: Optional[int] = None,
+    query_arg: str = 'query',
+    params_arg: str = 'params',
+    cache_empty: bool = False
+):
+    """
+    Decorator: serve a query helper's results from the central result cache
+
+    The wrapped function must take the SQL text and its parameters as
+    arguments (names configurable). Only SELECT / WITH statements are cached.
+    Empty DataFrames are not cached by default — the repo's helpers return
+    an empty frame on error, and a transient failure should not stick.
+
+    Args:
+        ttl: Fixed TTL in seconds (default: per-table policy)
+        query_arg / params_arg: Argument names holding SQL and parameters
+        cache_empty: Also cache empty DataFrames
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not QUERY_CACHE_ENABLED:
+                return func(*args, **kwargs)
+
+            bound = signature.bind_partial(*args, **kwargs)
+            query = bound.arguments.get(query_arg)
+            params = bound.arguments.get(params_arg)
+            if not isinstance(query, str) or not normalize_sql(query).upper().startswith(('SELECT', 'WITH')):
+                return func(*args, **kwargs)
+
+            key = query_fingerprint(query, params)
+            hit, result = _query_cache.get(key)
+            if hit:
+                return result
+
+            def load():
+                result = func(*args, **kwargs)
+                tables = query_tables(query)
+                # Inside a read-your-writes window the result may come from a lagging replica
+                if not (isinstance(result, pd.DataFrame) and result.empty and not cache_empty) \
+                        and not _recently_written(tables):
+                    _query_cache.put(key, result, tables, ttl)
+                return result
+
+            # Concurrent misses for the same key share one execution
+            return run_single_flight(('query', key), load)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidates_query_cache(*tables: str):
+    """
+    Decorator for write helpers: drop cached results once the write returns
+
+    With no tables, the whole cache is dropped — use this for writes whose
+    effects reach views (e.g. split rules feed the salesperson views).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate_query_cache(*tables)
+        return wrapper
+
+    return decorator
+
+
+@cached_query(cache_empty=True)
+def _cached_read_sql(query: str, params: Dict = None, read_only: bool = False) -> pd.DataFrame:
+    engine = get_read_engine() if read_only else get_db_engine()
+    return pd.read_sql(text(query), engine, params=params or {})
+
+
 # ==================== EXPORTS ====================
 
 __all__ = [
     'get_db_engine',
+    'get_read_engine',
     'check_db_connection',
     'reset_db_engine',
+    'reset_read_engine',
     'get_connection_pool_status',
+    'get_read_routing_status',
+    'replica_configured',
+    'mark_session_write',
+    'reads_pinned_to_primary',
     'get_connection',
     'get_transaction',
     'execute_query',
     'execute_query_df',
     'execute_update',
     'execute_many',
+    'QUERY_CACHE_TTL_POLICIES',
+    'QUERY_CACHE_VIEW_DEPENDENCIES',
+    'QueryResultCache',
+    'cached_query',
+    'get_query_cache',
+    'get_query_cache_stats',
+    'invalidate_query_cache',
+    'invalidates_query_cache',
+    'normalize_sql',
+    'query_dependencies',
+    'query_fingerprint',
+    'query_tables',
 ]
\ No newline at end of file
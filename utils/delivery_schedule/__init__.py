@@ -6,7 +6,7 @@ from .data_loader import DeliveryDataLoader
 from .email_sender import EmailSender
 from .calendar_utils import CalendarEventGenerator
 from .client_filters import needs_completed_data, apply_client_filters
-from .fulfillment import calculate_fulfillment
+from .fulfillment import calculate_fulfillment, FulfillmentEngine
 
 # UI fragments
 from .filters import create_filter_section
@@ -25,6 +25,7 @@ __all__ = [
     'needs_completed_data',
     'apply_client_filters',
     'calculate_fulfillment',
+    'FulfillmentEngine',
     # UI
     'create_filter_section',
     'display_metrics',
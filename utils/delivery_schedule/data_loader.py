@@ -3,12 +3,48 @@
 import pandas as pd
 import streamlit as st
 from sqlalchemy import text
-from ..db import get_db_engine
+from ..db import get_db_engine, invalidate_query_cache
+from .notification_data import NotificationData, load_employee_directory
+from .fulfillment import FulfillmentEngine
 import logging
-from datetime import datetime, timedelta
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Timeline statuses the view derives from ETD alone (see user guide);
+# In Transit / Ready to Ship / Completed do not depend on ETD.
+ETD_DRIVEN_TIMELINE_STATUSES = ('On Schedule', 'Due Today', 'Overdue', 'No ETD')
+
+_etd_log_table_ready = False
+
+
+@dataclass
+class _BaseStore:
+    """Shared, patchable holder for one cached base dataset.
+
+    `df` is replaced (never mutated) on patch, so readers holding an
+    earlier frame are unaffected. `derived` holds views built from `df`
+    (e.g. NotificationData) and is reset whenever `df` is replaced.
+    """
+    df: pd.DataFrame
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+
+def _timeline_from_etd(etd: pd.Series, today: date) -> Tuple[pd.Series, pd.Series]:
+    """(delivery_timeline_status, days_overdue) for ETD-driven rows."""
+    etd_ts = pd.to_datetime(etd, errors='coerce')
+    days = (pd.Timestamp(today) - etd_ts).dt.days
+    status = pd.Series('On Schedule', index=etd.index, dtype=object)
+    status[days == 0] = 'Due Today'
+    status[days > 0] = 'Overdue'
+    status[etd_ts.isna()] = 'No ETD'
+    days_overdue = days.where(days > 0, 0).fillna(0).astype(int)
+    return status, days_overdue
+
 
 class DeliveryDataLoader:
     """Load and process delivery data from database"""
@@ -16,16 +52,20 @@ class DeliveryDataLoader:
     def __init__(self):
         self.engine = get_db_engine()
 
-    # ── Cached base loader (new) ─────────────────────────────────
+    # ── Cached base loader ───────────────────────────────────────
 
-    @st.cache_data(ttl=300, show_spinner=False)
-    def load_base_data(_self, include_completed: bool = False):
+    # include_completed → live _BaseStore, so ETD patches reach every cached variant
+    _live_base_stores: Dict[bool, _BaseStore] = {}
+
+    @st.cache_resource(ttl=300, show_spinner=False)
+    def _load_base_store(_self, include_completed: bool = False) -> _BaseStore:
         """Load base dataset from DB — only two variants ever cached.
 
         • include_completed=False  →  WHERE delivery_timeline_status != 'Completed'
         • include_completed=True   →  all rows
 
-        Every other filter is applied client-side on this cached result.
+        Held in st.cache_resource (shared, not re-pickled per call) so saved
+        ETD changes can be patched into it instead of reloading the view.
         """
         try:
             query = """
@@ -79,29 +119,155 @@ class DeliveryDataLoader:
                 f"[base_data] Loaded {len(df)} rows "
                 f"(include_completed={include_completed})"
             )
-            return df
 
         except Exception as e:
             logger.error(f"Error loading base data: {e}")
-            return pd.DataFrame()
+            df = pd.DataFrame()
+
+        store = _BaseStore(df)
+        DeliveryDataLoader._live_base_stores[include_completed] = store
+        return store
+
+    def load_base_data(self, include_completed: bool = False):
+        """Cached base dataset (see _load_base_store).
+
+        Every other filter is applied client-side on this cached result.
+        Returns a shallow copy — callers may add / overwrite columns freely.
+        """
+        return self._load_base_store(include_completed).df.copy(deep=False)
+
+    def patch_base_etd(self, new_etds: Dict[int, date], today: date = None) -> int:
+        """Apply saved ETD changes to the cached base datasets in place.
+
+        For rows of the given delivery_ids: sets `etd` and, where the
+        timeline status is ETD-driven (On Schedule / Due Today / Overdue /
+        No ETD), recomputes `delivery_timeline_status` and `days_overdue`.
+        Fulfillment columns do not depend on ETD — the page recomputes them
+        from the patched frame (FulfillmentEngine) on the next run.
+
+        Returns
+        -------
+        int — number of rows patched across cached variants
+        """
+        if not new_etds:
+            return 0
+
+        today = today or date.today()
+        patched = 0
+
+        for include_completed, store in list(DeliveryDataLoader._live_base_stores.items()):
+            with store.lock:
+                df = store.df
+                if df.empty or 'delivery_id' not in df.columns:
+                    continue
+
+                mask = df['delivery_id'].isin(list(new_etds))
+                if not mask.any():
+                    continue
+
+                df = df.copy(deep=False)
+                rows = df.index[mask]
+                new_values = df.loc[rows, 'delivery_id'].map(new_etds)
+                if pd.api.types.is_datetime64_any_dtype(df['etd']):
+                    new_values = pd.to_datetime(new_values)
+                df.loc[rows, 'etd'] = new_values
+
+                if 'delivery_timeline_status' in df.columns:
+                    driven = rows[
+                        df.loc[rows, 'delivery_timeline_status']
+                        .isin(ETD_DRIVEN_TIMELINE_STATUSES).to_numpy()
+                    ]
+                    if len(driven):
+                        status, days_overdue = _timeline_from_etd(df.loc[driven, 'etd'], today)
+                        df.loc[driven, 'delivery_timeline_status'] = status
+                        if 'days_overdue' in df.columns:
+                            df.loc[driven, 'days_overdue'] = days_overdue
+
+                store.df = df
+                store.derived = {}
+                patched += len(rows)
+
+            logger.info(
+                f"[base_data] Patched ETD on {len(rows)} rows "
+                f"(include_completed={include_completed})"
+            )
+
+        return patched
+
+    def get_notification_data(self) -> NotificationData:
+        """Notification lists / slices over the cached non-completed base.
+
+        Built once per base frame and day, then shared by every session until
+        the base is reloaded or ETD-patched — the email tab issues no further
+        delivery_full_view queries.
+        """
+        store = self._load_base_store(False)
+        today = date.today()
+        with store.lock:
+            data = store.derived.get('notifications')
+            if data is None or data.today != today:
+                data = NotificationData(store.df, load_employee_directory(self.engine), today)
+                store.derived['notifications'] = data
+        return data
+
+    def get_fulfillment_engine(self, include_completed: bool = False,
+                               include_expired: bool = True) -> FulfillmentEngine:
+        """Incremental fulfillment engine over the cached base variant.
+
+        Built once per base frame and inventory toggle, shared by every
+        session; rebuilt after a reload or ETD patch.
+        """
+        store = self._load_base_store(include_completed)
+        key = ('fulfillment', include_expired)
+        with store.lock:
+            engine = store.derived.get(key)
+            if engine is None:
+                engine = FulfillmentEngine(store.df, include_expired)
+                store.derived[key] = engine
+        return engine
 
     # ── ETD Update ───────────────────────────────────────────────
 
-    def update_delivery_etd(self, delivery_id, new_etd, updated_by="System", reason=""):
-        """Update ETD for a delivery and log the change.
+    def _ensure_etd_log_table(self):
+        """Create delivery_etd_change_log once per process.
+
+        DDL commits implicitly in MySQL, so it must run outside the
+        update transaction.
+        """
+        global _etd_log_table_ready
+        if _etd_log_table_ready:
+            return
+
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS delivery_etd_change_log (
+                    id              BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    delivery_id     BIGINT NOT NULL,
+                    dn_number       VARCHAR(50),
+                    old_etd         DATE,
+                    new_etd         DATE NOT NULL,
+                    changed_by      VARCHAR(100) NOT NULL,
+                    reason          TEXT,
+                    changed_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_del_etdlog_delivery (delivery_id),
+                    INDEX idx_del_etdlog_changed  (changed_at)
+                )
+            """))
+        _etd_log_table_ready = True
 
-        Updates `stock_out_delivery.adjust_etd_date` — the view uses
-        COALESCE(adjust_etd_date, etd_date) so this takes priority
-        while preserving the original etd_date.
+    def update_delivery_etds(self, new_etds: Dict[int, date], updated_by="System", reason=""):
+        """Update ETD for many deliveries and log the changes — one transaction.
 
-        Also inserts an audit row into `delivery_etd_change_log`.
+        Sets `stock_out_delivery.adjust_etd_date` (the view uses
+        COALESCE(adjust_etd_date, etd_date), original etd_date is kept)
+        with a single multi-row UPDATE, and writes every audit row to
+        `delivery_etd_change_log` with one multi-row INSERT.  Either all
+        found deliveries are updated and logged, or none are.
 
         Parameters
         ----------
-        delivery_id : int
-            The delivery_id (= stock_out_delivery.id).
-        new_etd : date
-            New estimated time of delivery.
+        new_etds : dict
+            {delivery_id: new ETD date}
         updated_by : str
             Name of the user making the change.
         reason : str
@@ -109,66 +275,65 @@ class DeliveryDataLoader:
 
         Returns
         -------
-        (bool, str)  — success flag + message
+        (dict, dict)  — {delivery_id: dn_number} updated,
+                        {delivery_id: error message} failed
         """
+        if not new_etds:
+            return {}, {}
+
+        new_etds = {int(did): etd for did, etd in new_etds.items()}
+        ids = tuple(new_etds)
+
         try:
+            self._ensure_etd_log_table()
+
             with self.engine.begin() as conn:
-                # 1. Fetch current ETD + DN for audit log
-                old_row = conn.execute(
+                # 1. Current ETD + DN for every delivery (audit log)
+                old_rows = conn.execute(
                     text("""
                         SELECT 
+                            id,
                             DATE(COALESCE(adjust_etd_date, etd_date)) AS current_etd,
                             dn_number
                         FROM stock_out_delivery
-                        WHERE id = :did AND delete_flag = 0
-                        LIMIT 1
+                        WHERE id IN :ids AND delete_flag = 0
                     """),
-                    {"did": delivery_id},
-                ).fetchone()
+                    {"ids": ids},
+                ).fetchall()
+                old_map = {row[0]: (row[1], row[2]) for row in old_rows}
 
-                if not old_row:
-                    return False, f"Delivery ID {delivery_id} not found"
+                failed = {
+                    did: f"Delivery ID {did} not found"
+                    for did in ids if did not in old_map
+                }
+                found = [did for did in ids if did in old_map]
+                if not found:
+                    return {}, failed
 
-                old_etd = old_row[0]
-                dn_number = old_row[1]
+                # 2. One UPDATE for all deliveries (CASE per id)
+                params = {"ids": tuple(found)}
+                cases = []
+                for i, did in enumerate(found):
+                    params[f"did_{i}"] = did
+                    params[f"etd_{i}"] = new_etds[did]
+                    cases.append(f"WHEN :did_{i} THEN :etd_{i}")
 
-                # 2. Update adjust_etd_date (keeps original etd_date intact)
                 result = conn.execute(
-                    text("""
+                    text(f"""
                         UPDATE stock_out_delivery
-                        SET adjust_etd_date = :new_etd,
+                        SET adjust_etd_date = CASE id {' '.join(cases)} END,
                             modified_date = NOW(),
                             etd_update_count = IFNULL(etd_update_count, 0) + 1
-                        WHERE id = :did
+                        WHERE id IN :ids
                           AND delete_flag = 0
                     """),
-                    {
-                        "new_etd": new_etd,
-                        "did": delivery_id,
-                    },
+                    params,
                 )
 
-                rows_affected = result.rowcount
-
-                if rows_affected == 0:
-                    return False, f"No rows updated for delivery_id={delivery_id}"
-
-                # 3. Audit log (create table if not exists — idempotent)
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS delivery_etd_change_log (
-                        id              BIGINT AUTO_INCREMENT PRIMARY KEY,
-                        delivery_id     BIGINT NOT NULL,
-                        dn_number       VARCHAR(50),
-                        old_etd         DATE,
-                        new_etd         DATE NOT NULL,
-                        changed_by      VARCHAR(100) NOT NULL,
-                        reason          TEXT,
-                        changed_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                        INDEX idx_del_etdlog_delivery (delivery_id),
-                        INDEX idx_del_etdlog_changed  (changed_at)
-                    )
-                """))
+                if result.rowcount == 0:
+                    return {}, {**failed, **{did: f"No rows updated for delivery_id={did}" for did in found}}
 
+                # 3. Audit log — executemany → one multi-row INSERT
                 conn.execute(
                     text("""
                         INSERT INTO delivery_etd_change_log
@@ -176,25 +341,48 @@ class DeliveryDataLoader:
                         VALUES
                             (:did, :dn, :old_etd, :new_etd, :changed_by, :reason)
                     """),
-                    {
-                        "did": delivery_id,
-                        "dn": dn_number,
-                        "old_etd": old_etd,
-                        "new_etd": new_etd,
-                        "changed_by": updated_by,
-                        "reason": reason or None,
-                    },
+                    [
+                        {
+                            "did": did,
+                            "dn": old_map[did][1],
+                            "old_etd": old_map[did][0],
+                            "new_etd": new_etds[did],
+                            "changed_by": updated_by,
+                            "reason": reason or None,
+                        }
+                        for did in found
+                    ],
                 )
 
+            # Cached drilldowns over delivery_full_view & co. (e.g. salesperson deliveries)
+            invalidate_query_cache('stock_out_delivery')
+
+            updated = {did: old_map[did][1] for did in found}
             logger.info(
-                f"[ETD Update] delivery_id={delivery_id} dn={dn_number} "
-                f"old={old_etd} → new={new_etd} by {updated_by}"
+                f"[ETD Update] {len(updated)} deliveries updated by {updated_by} "
+                f"({len(failed)} not found)"
             )
-            return True, f"Updated DN {dn_number}"
+            return updated, failed
 
         except Exception as e:
-            logger.error(f"ETD update failed for delivery_id={delivery_id}: {e}")
-            return False, str(e)
+            logger.error(f"Bulk ETD update failed for {len(ids)} deliveries: {e}")
+            return {}, {did: str(e) for did in ids}
+
+    def update_delivery_etd(self, delivery_id, new_etd, updated_by="System", reason=""):
+        """Update ETD for a delivery and log the change.
+
+        Single-delivery wrapper around update_delivery_etds().
+
+        Returns
+        -------
+        (bool, str)  — success flag + message
+        """
+        updated, failed = self.update_delivery_etds(
+            {delivery_id: new_etd}, updated_by=updated_by, reason=reason,
+        )
+        if delivery_id in updated:
+            return True, f"Updated DN {updated[delivery_id]}"
+        return False, failed.get(delivery_id, f"No rows updated for delivery_id={delivery_id}")
 
     @st.cache_data(ttl=300)  # Cache for 5 minutes
     def load_delivery_data(_self, filters=None):
@@ -574,175 +762,24 @@ class DeliveryDataLoader:
     def get_sales_delivery_summary(self, creator_name, weeks_ahead=4):
         """Get delivery summary for a specific sales person - with line item details"""
         try:
-            today = datetime.now().date()
-            end_date = today + timedelta(weeks=weeks_ahead)
-            
-            query = text("""
-            SELECT 
-                DATE(etd) as delivery_date,
-                customer,
-                customer_code,
-                recipient_company,
-                recipient_company_code,
-                recipient_contact,
-                recipient_contact_email,
-                recipient_contact_phone,
-                recipient_address,
-                recipient_state_province,
-                recipient_country_name,
-                delivery_id,
-                dn_number,
-                sto_dr_line_id,
-                oc_number,
-                oc_line_id,
-                product_pn,
-                product_id,
-                pt_code,
-                package_size,
-                brand,
-                standard_quantity,
-                selling_quantity,
-                uom_conversion,
-                remaining_quantity_to_deliver,
-                total_instock_at_preferred_warehouse,
-                gap_quantity,
-                product_gap_quantity,
-                product_total_remaining_demand,
-                product_fulfill_rate_percent,
-                delivery_demand_percentage,
-                shipment_status,
-                shipment_status_vn,
-                fulfillment_status,
-                product_fulfillment_status,
-                delivery_timeline_status,
-                days_overdue,
-                preferred_warehouse,
-                is_epe_company,
-                legal_entity,
-                created_by_name,
-                created_date
-            FROM delivery_full_view
-            WHERE created_by_name = :creator_name
-                AND etd >= :today
-                AND etd <= :end_date
-                AND remaining_quantity_to_deliver > 0
-            ORDER BY delivery_date, customer, delivery_id, sto_dr_line_id
-            """)
-            
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={
-                    'creator_name': creator_name,
-                    'today': today,
-                    'end_date': end_date
-                })
-            
-            # Check for duplicate columns
-            if not df.empty:
-                duplicate_cols = df.columns[df.columns.duplicated()].tolist()
-                if duplicate_cols:
-                    logger.warning(f"Duplicate columns found in sales delivery summary: {duplicate_cols}")
-                    # Remove duplicates
-                    df = df.loc[:, ~df.columns.duplicated()]
-                
-                # Add total_quantity as alias for remaining_quantity_to_deliver
-                df['total_quantity'] = df['remaining_quantity_to_deliver']
-            
-            return df
-            
+            return self.get_notification_data().sales_schedule(creator_name, weeks_ahead)
         except Exception as e:
             logger.error(f"Error getting sales delivery summary: {e}")
             return pd.DataFrame()
-    
-    # All other methods remain the same...
+
     def get_sales_urgent_deliveries(self, creator_name):
         """Get overdue and due today deliveries for a specific sales person"""
         try:
-            query = text("""
-            SELECT 
-                DATE(etd) as delivery_date,
-                customer,
-                customer_code,
-                recipient_company,
-                recipient_company_code,
-                recipient_contact,
-                recipient_contact_email,
-                recipient_contact_phone,
-                recipient_address,
-                recipient_state_province,
-                recipient_country_name,
-                delivery_id,
-                dn_number,
-                sto_dr_line_id,
-                oc_number,
-                oc_line_id,
-                product_pn,
-                product_id,
-                pt_code,
-                package_size,
-                brand,
-                standard_quantity,
-                selling_quantity,
-                uom_conversion,
-                remaining_quantity_to_deliver,
-                total_instock_at_preferred_warehouse,
-                total_instock_all_warehouses,
-                gap_quantity,
-                product_gap_quantity,
-                product_total_remaining_demand,
-                product_fulfill_rate_percent,
-                delivery_demand_percentage,
-                shipment_status,
-                shipment_status_vn,
-                fulfillment_status,
-                product_fulfillment_status,
-                delivery_timeline_status,
-                days_overdue,
-                preferred_warehouse,
-                is_epe_company,
-                legal_entity,
-                created_by_name,
-                created_date
-            FROM delivery_full_view
-            WHERE created_by_name = :creator_name
-                AND delivery_timeline_status IN ('Overdue', 'Due Today')
-                AND remaining_quantity_to_deliver > 0
-                AND shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-            ORDER BY 
-                delivery_timeline_status DESC,  -- Overdue first, then Due Today
-                days_overdue DESC,              -- Most overdue first
-                delivery_date,
-                customer,
-                delivery_id,
-                sto_dr_line_id
-            """)
-            
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={
-                    'creator_name': creator_name
-                })
-            
-            # Check for duplicate columns
+            df = self.get_notification_data().sales_urgent(creator_name)
             if not df.empty:
-                duplicate_cols = df.columns[df.columns.duplicated()].tolist()
-                if duplicate_cols:
-                    logger.warning(f"Duplicate columns found in urgent deliveries: {duplicate_cols}")
-                    # Remove duplicates
-                    df = df.loc[:, ~df.columns.duplicated()]
-                
-                # Add total_quantity as alias
-                df['total_quantity'] = df['remaining_quantity_to_deliver']
-                
-                # Log summary
                 overdue_count = df[df['delivery_timeline_status'] == 'Overdue']['delivery_id'].nunique()
                 due_today_count = df[df['delivery_timeline_status'] == 'Due Today']['delivery_id'].nunique()
                 logger.info(f"Loaded {overdue_count} overdue and {due_today_count} due today deliveries for {creator_name}")
-            
             return df
-            
         except Exception as e:
             logger.error(f"Error getting urgent deliveries: {e}")
             return pd.DataFrame()
-    
+
     def get_overdue_deliveries(self):
         """Get overdue deliveries that need attention"""
         try:
@@ -1212,78 +1249,7 @@ class DeliveryDataLoader:
     def get_customer_deliveries(self, customer_name, weeks_ahead=4):
         """Get delivery schedule for a specific customer"""
         try:
-            today = datetime.now().date()
-            end_date = today + timedelta(weeks=weeks_ahead)
-            
-            query = text("""
-            SELECT 
-                DATE(etd) as delivery_date,
-                customer,
-                customer_code,
-                customer_contact,
-                customer_contact_email,
-                customer_contact_phone,
-                recipient_company,
-                recipient_company_code,
-                recipient_contact,
-                recipient_contact_email,
-                recipient_contact_phone,
-                recipient_address,
-                recipient_state_province,
-                recipient_country_name,
-                delivery_id,
-                dn_number,
-                sto_dr_line_id,
-                oc_number,
-                oc_line_id,
-                product_pn,
-                product_id,
-                pt_code,
-                package_size,
-                brand,
-                standard_quantity,
-                selling_quantity,
-                uom_conversion,
-                remaining_quantity_to_deliver,
-                total_instock_at_preferred_warehouse,
-                gap_quantity,
-                product_gap_quantity,
-                product_total_remaining_demand,
-                product_fulfill_rate_percent,
-                delivery_demand_percentage,
-                shipment_status,
-                shipment_status_vn,
-                fulfillment_status,
-                product_fulfillment_status,
-                delivery_timeline_status,
-                days_overdue,
-                preferred_warehouse,
-                is_epe_company,
-                legal_entity,
-                created_by_name,
-                created_date
-            FROM delivery_full_view
-            WHERE customer = :customer_name
-                AND etd >= :today
-                AND etd <= :end_date
-                AND remaining_quantity_to_deliver > 0
-                AND shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-            ORDER BY delivery_date, recipient_company, delivery_id, sto_dr_line_id
-            """)
-            
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={
-                    'customer_name': customer_name,
-                    'today': today,
-                    'end_date': end_date
-                })
-            
-            # Add total_quantity alias
-            if not df.empty:
-                df['total_quantity'] = df['remaining_quantity_to_deliver']
-            
-            return df
-            
+            return self.get_notification_data().customer_schedule(customer_name, weeks_ahead)
         except Exception as e:
             logger.error(f"Error getting customer deliveries: {e}")
             return pd.DataFrame()
@@ -1291,76 +1257,7 @@ class DeliveryDataLoader:
     def get_all_deliveries_summary(self, weeks_ahead=4):
         """Get all deliveries summary for custom recipients"""
         try:
-            today = datetime.now().date()
-            end_date = today + timedelta(weeks=weeks_ahead)
-            
-            query = text("""
-            SELECT 
-                DATE(etd) as delivery_date,
-                customer,
-                customer_code,
-                customer_contact,
-                customer_contact_email,
-                customer_contact_phone,
-                recipient_company,
-                recipient_company_code,
-                recipient_contact,
-                recipient_contact_email,
-                recipient_contact_phone,
-                recipient_address,
-                recipient_state_province,
-                recipient_country_name,
-                delivery_id,
-                dn_number,
-                sto_dr_line_id,
-                oc_number,
-                oc_line_id,
-                product_pn,
-                product_id,
-                pt_code,
-                package_size,
-                brand,
-                standard_quantity,
-                selling_quantity,
-                uom_conversion,
-                remaining_quantity_to_deliver,
-                total_instock_at_preferred_warehouse,
-                gap_quantity,
-                product_gap_quantity,
-                product_total_remaining_demand,
-                product_fulfill_rate_percent,
-                delivery_demand_percentage,
-                shipment_status,
-                shipment_status_vn,
-                fulfillment_status,
-                product_fulfillment_status,
-                delivery_timeline_status,
-                days_overdue,
-                preferred_warehouse,
-                is_epe_company,
-                legal_entity,
-                created_by_name,
-                created_date
-            FROM delivery_full_view
-            WHERE etd >= :today
-                AND etd <= :end_date
-                AND remaining_quantity_to_deliver > 0
-                AND shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-            ORDER BY delivery_date, customer, recipient_company, delivery_id, sto_dr_line_id
-            """)
-            
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={
-                    'today': today,
-                    'end_date': end_date
-                })
-            
-            # Add total_quantity alias
-            if not df.empty:
-                df['total_quantity'] = df['remaining_quantity_to_deliver']
-            
-            return df
-            
+            return self.get_notification_data().all_upcoming(weeks_ahead)
         except Exception as e:
             logger.error(f"Error getting all deliveries summary: {e}")
             return pd.DataFrame()
@@ -1368,80 +1265,12 @@ class DeliveryDataLoader:
     def get_all_urgent_deliveries(self):
         """Get all urgent deliveries (overdue and due today) for custom recipients"""
         try:
-            query = text("""
-            SELECT 
-                DATE(etd) as delivery_date,
-                customer,
-                customer_code,
-                customer_contact,
-                customer_contact_email,
-                customer_contact_phone,
-                recipient_company,
-                recipient_company_code,
-                recipient_contact,
-                recipient_contact_email,
-                recipient_contact_phone,
-                recipient_address,
-                recipient_state_province,
-                recipient_country_name,
-                delivery_id,
-                dn_number,
-                sto_dr_line_id,
-                oc_number,
-                oc_line_id,
-                product_pn,
-                product_id,
-                pt_code,
-                package_size,
-                brand,
-                standard_quantity,
-                selling_quantity,
-                uom_conversion,
-                remaining_quantity_to_deliver,
-                total_instock_at_preferred_warehouse,
-                total_instock_all_warehouses,
-                gap_quantity,
-                product_gap_quantity,
-                product_total_remaining_demand,
-                product_fulfill_rate_percent,
-                delivery_demand_percentage,
-                shipment_status,
-                shipment_status_vn,
-                fulfillment_status,
-                product_fulfillment_status,
-                delivery_timeline_status,
-                days_overdue,
-                preferred_warehouse,
-                is_epe_company,
-                legal_entity,
-                created_by_name,
-                created_date
-            FROM delivery_full_view
-            WHERE delivery_timeline_status IN ('Overdue', 'Due Today')
-                AND remaining_quantity_to_deliver > 0
-                AND shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-            ORDER BY 
-                delivery_timeline_status DESC,
-                days_overdue DESC,
-                delivery_date,
-                customer,
-                delivery_id,
-                sto_dr_line_id
-            """)
-            
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn)
-            
-            # Add total_quantity alias
+            df = self.get_notification_data().all_urgent()
             if not df.empty:
-                df['total_quantity'] = df['remaining_quantity_to_deliver']
-                
                 overdue_count = df[df['delivery_timeline_status'] == 'Overdue']['delivery_id'].nunique()
                 due_today_count = df[df['delivery_timeline_status'] == 'Due Today']['delivery_id'].nunique()
                 logger.info(f"Loaded {overdue_count} overdue and {due_today_count} due today deliveries for all customers")
-            
             return df
-            
         except Exception as e:
             logger.error(f"Error getting all urgent deliveries: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
@@ -11,7 +11,8 @@ Features:
     of the same DN into a staging section below (ETD is header-level).
   • Multiple DNs can be edited with different new ETDs before saving.
   • Bulk ETD update — select multiple DNs, set one new date.
-  • On save → DB update → email notification → cache clear → refresh.
+  • On save → one-transaction DB update → email notification →
+    cached base data patched in place (no view reload) → refresh.
 
 Email notification:
   TO  : creator (created_by_email of each affected DN)
@@ -521,37 +522,35 @@ def _show_changes_preview(changes):
 
 
 def _execute_etd_updates(changes, display_df, data_loader, email_sender, reason=""):
-    """Write ETD changes to DB, send email, clear cache."""
+    """Write ETD changes to DB (one transaction), send email, patch cache."""
     current_user = st.session_state.get('user_fullname', 'System')
     current_email = st.session_state.get('user_email', '')
 
-    success_count = 0
-    errors = []
+    new_etds = {ch['delivery_id']: ch['new_etd'] for ch in changes}
 
     with st.spinner("Updating ETD in database…"):
-        for ch in changes:
-            ok, msg = data_loader.update_delivery_etd(
-                delivery_id=ch['delivery_id'],
-                new_etd=ch['new_etd'],
-                updated_by=current_user,
-                reason=reason,
-            )
-            if ok:
-                success_count += 1
-            else:
-                errors.append(f"{ch['dn_number']}: {msg}")
+        updated, failed = data_loader.update_delivery_etds(
+            new_etds, updated_by=current_user, reason=reason,
+        )
+
+    success_count = len(updated)
+    errors = [
+        f"{ch['dn_number']}: {failed[ch['delivery_id']]}"
+        for ch in changes if ch['delivery_id'] in failed
+    ]
 
     if success_count > 0:
         st.success(f"✅ Updated ETD for {success_count}/{len(changes)} deliveries")
 
         with st.spinner("Sending email notifications…"):
             _send_etd_notifications(
-                changes, display_df, email_sender,
+                [ch for ch in changes if ch['delivery_id'] in updated],
+                display_df, email_sender,
                 current_user, current_email, reason,
             )
 
-        # Clear cache so next load picks up new ETD
-        data_loader.load_base_data.clear()
+        # Patch the cached base data in place — no full view reload
+        data_loader.patch_base_etd({did: new_etds[did] for did in updated})
 
     if errors:
         st.error("Some updates failed:\n" + "\n".join(errors))
@@ -1,10 +1,15 @@
 # utils/delivery_schedule/email_notifications.py
-"""Email notification tab — send delivery schedules, overdue alerts, customs clearance emails"""
+"""Email notification tab — send delivery schedules, overdue alerts, customs clearance emails
+
+Recipient lists and per-recipient frames come from the cached base dataset
+(DeliveryDataLoader.get_notification_data) — no per-list / per-recipient
+delivery_full_view queries. Batch sends render every recipient's HTML, Excel
+and ICS in the render pool and send each as it finishes
+(EmailSender.send_delivery_schedule_batch).
+"""
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from sqlalchemy import text
 import re
 import logging
 
@@ -114,101 +119,6 @@ def display_email_notifications(data_loader, email_sender):
         """)
 
 
-# ═════════════════════════════════════════════════════════════════
-# PRIVATE HELPERS — Data queries
-# ═════════════════════════════════════════════════════════════════
-
-@st.cache_data(ttl=300)
-def _get_sales_list(_engine, weeks_ahead=4):
-    """Sales people with active deliveries"""
-    query = text("""
-    SELECT DISTINCT
-        e.id, CONCAT(e.first_name, ' ', e.last_name) as name, e.email,
-        COUNT(DISTINCT d.delivery_id) as active_deliveries,
-        SUM(d.remaining_quantity_to_deliver) as total_quantity,
-        COUNT(DISTINCT CASE WHEN d.delivery_timeline_status = 'Overdue' THEN d.delivery_id END) as overdue_deliveries,
-        m.email as manager_email
-    FROM employees e
-    LEFT JOIN employees m ON e.manager_id = m.id
-    INNER JOIN delivery_full_view d ON d.created_by_email = e.email
-    WHERE d.etd >= CURDATE() AND d.etd <= DATE_ADD(CURDATE(), INTERVAL :weeks WEEK)
-        AND d.remaining_quantity_to_deliver > 0
-        AND d.shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-    GROUP BY e.id, e.first_name, e.last_name, e.email, m.email
-    ORDER BY name
-    """)
-    with _engine.connect() as conn:
-        return pd.read_sql(query, conn, params={'weeks': weeks_ahead})
-
-
-@st.cache_data(ttl=300)
-def _get_sales_list_overdue(_engine):
-    """Sales with overdue/due-today deliveries"""
-    query = text("""
-    SELECT DISTINCT
-        e.id, CONCAT(e.first_name, ' ', e.last_name) as name, e.email,
-        COUNT(DISTINCT CASE WHEN d.delivery_timeline_status = 'Overdue' THEN d.delivery_id END) as overdue_deliveries,
-        COUNT(DISTINCT CASE WHEN d.delivery_timeline_status = 'Due Today' THEN d.delivery_id END) as due_today_deliveries,
-        MAX(d.days_overdue) as max_days_overdue,
-        m.email as manager_email
-    FROM employees e
-    LEFT JOIN employees m ON e.manager_id = m.id
-    INNER JOIN delivery_full_view d ON d.created_by_email = e.email
-    WHERE d.delivery_timeline_status IN ('Overdue', 'Due Today')
-        AND d.remaining_quantity_to_deliver > 0
-        AND d.shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-    GROUP BY e.id, e.first_name, e.last_name, e.email, m.email
-    HAVING (overdue_deliveries > 0 OR due_today_deliveries > 0)
-    ORDER BY overdue_deliveries DESC, name
-    """)
-    with _engine.connect() as conn:
-        return pd.read_sql(query, conn)
-
-
-@st.cache_data(ttl=300)
-def _get_customers_with_deliveries(_engine, weeks_ahead=4):
-    """Customers with active deliveries"""
-    query = text("""
-    SELECT DISTINCT
-        d.customer, d.customer_code,
-        COUNT(DISTINCT d.delivery_id) as active_deliveries,
-        SUM(d.remaining_quantity_to_deliver) as total_quantity,
-        COUNT(DISTINCT d.recipient_state_province) as provinces_count
-    FROM delivery_full_view d
-    WHERE d.etd >= CURDATE() AND d.etd <= DATE_ADD(CURDATE(), INTERVAL :weeks WEEK)
-        AND d.remaining_quantity_to_deliver > 0
-        AND d.shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-    GROUP BY d.customer, d.customer_code
-    ORDER BY d.customer
-    """)
-    with _engine.connect() as conn:
-        return pd.read_sql(query, conn, params={'weeks': weeks_ahead})
-
-
-@st.cache_data(ttl=300)
-def _get_customer_contacts(_engine, customer_names):
-    """Contacts for selected customers"""
-    if not customer_names:
-        return pd.DataFrame()
-    query = text("""
-    SELECT DISTINCT
-        CONCAT(d.customer, '_', COALESCE(d.customer_contact_email, 'no_email'), '_',
-               COALESCE(d.customer_contact, 'Unknown')) as contact_id,
-        d.customer, COALESCE(d.customer_contact, 'Unknown Contact') as contact_name,
-        d.customer_contact_email as email,
-        COUNT(DISTINCT d.delivery_id) as delivery_count
-    FROM delivery_full_view d
-    WHERE d.customer IN :customers
-        AND d.etd >= CURDATE() AND d.etd <= DATE_ADD(CURDATE(), INTERVAL 4 WEEK)
-        AND d.remaining_quantity_to_deliver > 0 AND d.shipment_status NOT IN ('DELIVERED', 'COMPLETED')
-        AND d.customer_contact_email IS NOT NULL AND d.customer_contact_email != ''
-    GROUP BY d.customer, d.customer_contact, d.customer_contact_email
-    ORDER BY d.customer, d.customer_contact
-    """)
-    with _engine.connect() as conn:
-        return pd.read_sql(query, conn, params={'customers': tuple(customer_names)})
-
-
 # ═════════════════════════════════════════════════════════════════
 # PRIVATE HELPERS — UI Sections
 # ═════════════════════════════════════════════════════════════════
@@ -243,9 +153,9 @@ def _show_customs_summary(data_loader, weeks_ahead):
 def _render_creator_selection(data_loader, notification_type, weeks_ahead):
     """Render sales/creator selection; return (sales_df, selected_names)"""
     if notification_type == "🚨 Overdue Alerts":
-        sales_df = _get_sales_list_overdue(data_loader.engine)
+        sales_df = data_loader.get_notification_data().sales_list_overdue()
     else:
-        sales_df = _get_sales_list(data_loader.engine, weeks_ahead)
+        sales_df = data_loader.get_notification_data().sales_list(weeks_ahead)
 
     if sales_df.empty:
         st.warning("No sales with active deliveries found")
@@ -275,7 +185,7 @@ def _render_creator_selection(data_loader, notification_type, weeks_ahead):
 
 def _render_customer_selection(data_loader, weeks_ahead):
     """Two-step customer → contact selection; return list of contact dicts"""
-    cust_df = _get_customers_with_deliveries(data_loader.engine, weeks_ahead)
+    cust_df = data_loader.get_notification_data().customers(weeks_ahead)
     if cust_df.empty:
         st.warning("No customers with active deliveries found")
         return []
@@ -288,7 +198,7 @@ def _render_customer_selection(data_loader, weeks_ahead):
         st.info("Select customers to see contacts")
         return []
 
-    contacts_df = _get_customer_contacts(data_loader.engine, selected_names)
+    contacts_df = data_loader.get_notification_data().customer_contacts(selected_names, weeks_ahead)
     if contacts_df.empty:
         st.warning("No contacts found for selected customers")
         return []
@@ -462,73 +372,24 @@ def _execute_send(data_loader, email_sender, notif_type, recip_type,
                                 'Status': '✅' if ok else '❌', 'Message': msg})
             progress.progress(1.0)
 
-        elif recip_type == "customers":
-            for i, ct in enumerate(contacts):
-                progress.progress((i + 1) / len(contacts))
-                status.text(f"Sending to {ct['contact_name']}... ({i+1}/{len(contacts)})")
-                try:
-                    df = data_loader.get_customer_deliveries(ct['customer'], weeks)
-                    if not df.empty:
-                        ok, msg = email_sender.send_delivery_schedule_email(
-                            ct['email'], ct['customer'], df,
-                            cc_emails=cc_emails or None,
-                            notification_type=notif_type, weeks_ahead=weeks,
-                            contact_name=ct['contact_name'])
-                        results.append({'Recipient': f"{ct['contact_name']} ({ct['customer']})",
-                                        'Email': ct['email'],
-                                        'Status': '✅' if ok else '❌', 'Message': msg})
-                    else:
-                        results.append({'Recipient': ct['contact_name'], 'Email': ct['email'],
-                                        'Status': '⚠️ Skip', 'Message': 'No deliveries'})
-                except Exception as e:
-                    errors.append(str(e))
-                    results.append({'Recipient': ct['contact_name'], 'Email': ct['email'],
-                                    'Status': '❌', 'Message': str(e)})
-
-        elif recip_type == "custom":
-            for i, email in enumerate(custom):
-                progress.progress((i + 1) / len(custom))
-                status.text(f"Sending to {email}... ({i+1}/{len(custom)})")
-                try:
-                    name = email.split('@')[0].title()
-                    df = (data_loader.get_all_deliveries_summary(weeks) if notif_type == "📅 Delivery Schedule"
-                          else data_loader.get_all_urgent_deliveries())
-                    if not df.empty:
-                        ok, msg = email_sender.send_delivery_schedule_email(
-                            email, name, df, cc_emails=cc_emails or None,
-                            notification_type=notif_type, weeks_ahead=weeks)
-                        results.append({'Recipient': name, 'Email': email,
-                                        'Status': '✅' if ok else '❌', 'Message': msg})
-                    else:
-                        results.append({'Recipient': name, 'Email': email,
-                                        'Status': '⚠️ Skip', 'Message': 'No deliveries'})
-                except Exception as e:
-                    errors.append(str(e))
-                    results.append({'Recipient': email, 'Email': email,
-                                    'Status': '❌', 'Message': str(e)})
-
-        else:  # creators
-            for i, name in enumerate(selected):
-                progress.progress((i + 1) / len(selected))
-                status.text(f"Sending to {name}... ({i+1}/{len(selected)})")
-                try:
-                    info = sales_df[sales_df['name'] == name].iloc[0]
-                    df = (data_loader.get_sales_delivery_summary(name, weeks)
-                          if notif_type == "📅 Delivery Schedule"
-                          else data_loader.get_sales_urgent_deliveries(name))
-                    if not df.empty:
-                        ok, msg = email_sender.send_delivery_schedule_email(
-                            info['email'], name, df, cc_emails=cc_emails or None,
-                            notification_type=notif_type, weeks_ahead=weeks)
-                        results.append({'Recipient': name, 'Email': info['email'],
-                                        'Status': '✅' if ok else '❌', 'Message': msg})
-                    else:
-                        results.append({'Recipient': name, 'Email': info['email'],
-                                        'Status': '⚠️ Skip', 'Message': 'No deliveries'})
-                except Exception as e:
-                    errors.append(str(e))
-                    results.append({'Recipient': name, 'Email': 'N/A',
-                                    'Status': '❌', 'Message': str(e)})
+        else:
+            jobs, skipped = _collect_send_jobs(data_loader, notif_type, recip_type,
+                                               selected, contacts, custom, sales_df, weeks)
+            results.extend(skipped)
+
+            def _on_sent(done, total, job):
+                progress.progress(done / total)
+                status.text(f"Sent to {job['label']}... ({done}/{total})")
+
+            if jobs:
+                status.text(f"Rendering {len(jobs)} emails...")
+            for job, ok, msg in email_sender.send_delivery_schedule_batch(
+                    jobs, cc_emails=cc_emails or None, notification_type=notif_type,
+                    weeks_ahead=weeks, progress_callback=_on_sent):
+                if not ok:
+                    errors.append(f"{job['label']}: {msg}")
+                results.append({'Recipient': job['label'], 'Email': job['recipient_email'],
+                                'Status': '✅' if ok else '❌', 'Message': msg})
 
     except Exception as e:
         st.error(f"Critical error: {e}")
@@ -539,6 +400,43 @@ def _execute_send(data_loader, email_sender, notif_type, recip_type,
     return results, errors
 
 
+def _collect_send_jobs(data_loader, notif_type, recip_type,
+                       selected, contacts, custom, sales_df, weeks):
+    """Per-recipient send jobs (slices of the cached notification data) + skip rows"""
+    jobs = []
+    skipped = []
+
+    def _add(label, email, df, **extra):
+        if df.empty:
+            skipped.append({'Recipient': label, 'Email': email,
+                            'Status': '⚠️ Skip', 'Message': 'No deliveries'})
+        else:
+            jobs.append({'label': label, 'recipient_email': email, 'delivery_df': df, **extra})
+
+    if recip_type == "customers":
+        for ct in contacts:
+            df = data_loader.get_customer_deliveries(ct['customer'], weeks)
+            _add(f"{ct['contact_name']} ({ct['customer']})", ct['email'], df,
+                 recipient_name=ct['customer'], contact_name=ct['contact_name'])
+
+    elif recip_type == "custom":
+        df = (data_loader.get_all_deliveries_summary(weeks) if notif_type == "📅 Delivery Schedule"
+              else data_loader.get_all_urgent_deliveries())
+        for email in custom:
+            name = email.split('@')[0].title()
+            _add(name, email, df, recipient_name=name)
+
+    else:  # creators
+        for name in selected:
+            info = sales_df[sales_df['name'] == name].iloc[0]
+            df = (data_loader.get_sales_delivery_summary(name, weeks)
+                  if notif_type == "📅 Delivery Schedule"
+                  else data_loader.get_sales_urgent_deliveries(name))
+            _add(name, info['email'], df, recipient_name=name)
+
+    return jobs, skipped
+
+
 def _show_results(results, errors):
     if not results:
         return
@@ -12,6 +12,7 @@ import io
 import os
 from .calendar_utils import CalendarEventGenerator
 from ..config import OUTBOUND_EMAIL_CONFIG
+from ..render_pool import render_iter
 
 logger = logging.getLogger(__name__)
 
@@ -584,110 +585,18 @@ class EmailSender:
                 logger.error("Email configuration missing. Please set EMAIL_SENDER and EMAIL_PASSWORD.")
                 return False, "Email configuration missing. Please check environment variables."
             
-            # Remove duplicate columns
-            delivery_df = delivery_df.loc[:, ~delivery_df.columns.duplicated()]
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            
-            # Set subject based on notification type with dynamic weeks
-            if notification_type == "🚨 Overdue Alerts":
-                overdue_count = delivery_df[delivery_df['delivery_timeline_status'] == 'Overdue']['delivery_id'].nunique()
-                due_today_count = delivery_df[delivery_df['delivery_timeline_status'] == 'Due Today']['delivery_id'].nunique()
-                # Include contact name in urgent subject if available
-                if contact_name and contact_name != 'Unknown Contact':
-                    msg['Subject'] = f"🚨 URGENT: {overdue_count} Overdue & {due_today_count} Due Today Deliveries - {recipient_name} (Attn: {contact_name})"
-                else:
-                    msg['Subject'] = f"🚨 URGENT: {overdue_count} Overdue & {due_today_count} Due Today Deliveries - {recipient_name}"
-            else:
-                # Dynamic subject with weeks_ahead
-                week_text = f"{weeks_ahead} Week" if weeks_ahead == 1 else f"{weeks_ahead} Weeks"
-                # Include contact name in subject if available
-                if contact_name and contact_name != 'Unknown Contact':
-                    msg['Subject'] = f"Delivery Schedule - Next {week_text} - {recipient_name} (Attn: {contact_name})"
-                else:
-                    msg['Subject'] = f"Delivery Schedule - Next {week_text} - {recipient_name}"
-            
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-            
-            # Create HTML content based on notification type
-            if notification_type == "🚨 Overdue Alerts":
-                html_content = self.create_overdue_alerts_html(delivery_df, recipient_name, contact_name)
-            else:
-                html_content = self.create_delivery_schedule_html(delivery_df, recipient_name, weeks_ahead, contact_name)
-            
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Create Excel attachment
-            excel_data = self.create_excel_attachment(delivery_df, notification_type)
-            excel_part = MIMEBase('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            excel_part.set_payload(excel_data.read())
-            encoders.encode_base64(excel_part)
-            
-            # Set filename based on notification type and recipient
-            if notification_type == "🚨 Overdue Alerts":
-                if contact_name and contact_name != 'Unknown Contact':
-                    filename = f"urgent_deliveries_{recipient_name}_{contact_name}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-                else:
-                    filename = f"urgent_deliveries_{recipient_name}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-            else:
-                if contact_name and contact_name != 'Unknown Contact':
-                    filename = f"delivery_schedule_{recipient_name}_{contact_name}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-                else:
-                    filename = f"delivery_schedule_{recipient_name}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-            
-            # Clean filename
-            filename = filename.replace(' ', '_').replace('/', '_').replace('\\', '_')
-            
-            excel_part.add_header(
-                'Content-Disposition',
-                f'attachment; filename="{filename}"'
+            artifacts = render_delivery_schedule_job(
+                recipient_name, delivery_df, notification_type, weeks_ahead,
+                contact_name, self.sender_email
             )
-            msg.attach(excel_part)
-            
-            # Create ICS calendar attachment (only for delivery schedule)
-            if notification_type == "📅 Delivery Schedule":
-                try:
-                    calendar_gen = CalendarEventGenerator()
-                    ics_content = calendar_gen.create_ics_content(recipient_name, delivery_df, self.sender_email)
-                    
-                    if ics_content:
-                        ics_part = MIMEBase('text', 'calendar')
-                        ics_part.set_payload(ics_content.encode('utf-8'))
-                        encoders.encode_base64(ics_part)
-                        
-                        # Include contact name in calendar filename if available
-                        if contact_name and contact_name != 'Unknown Contact':
-                            cal_filename = f"delivery_schedule_{recipient_name}_{contact_name}_{datetime.now().strftime('%Y%m%d')}.ics"
-                        else:
-                            cal_filename = f"delivery_schedule_{recipient_name}_{datetime.now().strftime('%Y%m%d')}.ics"
-                        
-                        cal_filename = cal_filename.replace(' ', '_').replace('/', '_').replace('\\', '_')
-                        
-                        ics_part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename="{cal_filename}"'
-                        )
-                        msg.attach(ics_part)
-                except Exception as e:
-                    logger.warning(f"Error creating calendar attachment: {e}")
+            msg = self._build_delivery_schedule_message(recipient_email, cc_emails, artifacts)
             
             # Send email
             logger.info(f"Attempting to send {notification_type} email to {recipient_email}...")
             with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.sender_email, self.sender_password)
-                
-                recipients = [recipient_email]
-                if cc_emails:
-                    recipients.extend(cc_emails)
-                
-                server.sendmail(self.sender_email, recipients, msg.as_string())
+                server.sendmail(self.sender_email, [recipient_email] + list(cc_emails or []), msg.as_string())
             
             logger.info(f"Email sent successfully to {recipient_email}")
             return True, "Email sent successfully"
@@ -696,6 +605,90 @@ class EmailSender:
             logger.error(f"Error sending email: {e}", exc_info=True)
             return False, str(e)
 
+    def send_delivery_schedule_batch(self, jobs, cc_emails=None, notification_type="📅 Delivery Schedule",
+                                     weeks_ahead=4, progress_callback=None):
+        """Render all recipients' emails in the render pool and send each as it finishes.
+
+        Parameters
+        ----------
+        jobs : list of dict
+            One per recipient: recipient_email, recipient_name, delivery_df
+            (non-empty) and optional contact_name.
+        progress_callback : callable(done, total, job) — called after each send
+
+        Returns
+        -------
+        list of (job, success, message) in completion order
+        """
+        if not jobs:
+            return []
+        if not self.sender_email or not self.sender_password:
+            logger.error("Email configuration missing. Please set EMAIL_SENDER and EMAIL_PASSWORD.")
+            msg = "Email configuration missing. Please check environment variables."
+            return [(job, False, msg) for job in jobs]
+        
+        render_jobs = {
+            i: (job['recipient_name'], job['delivery_df'], notification_type, weeks_ahead,
+                job.get('contact_name'), self.sender_email)
+            for i, job in enumerate(jobs)
+        }
+        
+        results = []
+        smtp = _SMTPSession(self)
+        try:
+            for i, artifacts in render_iter(render_delivery_schedule_job, render_jobs):
+                job = jobs[i]
+                if artifacts is None:
+                    results.append((job, False, "Error rendering email content"))
+                else:
+                    try:
+                        msg = self._build_delivery_schedule_message(job['recipient_email'], cc_emails, artifacts)
+                        smtp.send([job['recipient_email']] + list(cc_emails or []), msg)
+                        logger.info(f"Email sent successfully to {job['recipient_email']}")
+                        results.append((job, True, "Email sent successfully"))
+                    except Exception as e:
+                        logger.error(f"Error sending email to {job['recipient_email']}: {e}")
+                        results.append((job, False, str(e)))
+                if progress_callback:
+                    progress_callback(len(results), len(jobs), job)
+        finally:
+            smtp.close()
+        
+        return results
+
+    def _build_delivery_schedule_message(self, recipient_email, cc_emails, artifacts):
+        """MIME message from render_delivery_schedule_job output"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = artifacts['subject']
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+        
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+        
+        msg.attach(MIMEText(artifacts['html'], 'html'))
+        
+        excel_part = MIMEBase('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        excel_part.set_payload(artifacts['excel'])
+        encoders.encode_base64(excel_part)
+        excel_part.add_header(
+            'Content-Disposition',
+            f'attachment; filename="{artifacts["excel_filename"]}"'
+        )
+        msg.attach(excel_part)
+        
+        if artifacts.get('ics'):
+            ics_part = MIMEBase('text', 'calendar')
+            ics_part.set_payload(artifacts['ics'].encode('utf-8'))
+            encoders.encode_base64(ics_part)
+            ics_part.add_header(
+                'Content-Disposition',
+                f'attachment; filename="{artifacts["ics_filename"]}"'
+            )
+            msg.attach(ics_part)
+        
+        return msg
+
     def create_excel_attachment(self, delivery_df, notification_type="📅 Delivery Schedule"):
         """Create Excel file as attachment with enhanced information"""
         output = io.BytesIO()
@@ -997,28 +990,26 @@ class EmailSender:
     
     def send_bulk_delivery_schedules(self, sales_deliveries, progress_callback=None):
         """Send delivery schedules to multiple sales people"""
-        results = []
-        total = len(sales_deliveries)
+        jobs = [
+            {'recipient_email': sales_info['email'], 'recipient_name': sales_info['name'],
+             'delivery_df': delivery_df}
+            for sales_info, delivery_df in sales_deliveries
+        ]
         
-        for idx, (sales_info, delivery_df) in enumerate(sales_deliveries):
+        def _progress(done, total, job):
             if progress_callback:
-                progress_callback(idx + 1, total, f"Sending to {sales_info['name']}...")
-            
-            success, message = self.send_delivery_schedule_email(
-                sales_info['email'],
-                sales_info['name'],
-                delivery_df
-            )
-            
-            results.append({
-                'sales': sales_info['name'],
-                'email': sales_info['email'],
+                progress_callback(done, total, f"Sent to {job['recipient_name']}...")
+        
+        return [
+            {
+                'sales': job['recipient_name'],
+                'email': job['recipient_email'],
                 'success': success,
                 'message': message,
-                'deliveries': len(delivery_df)
-            })
-        
-        return results
+                'deliveries': len(job['delivery_df'])
+            }
+            for job, success, message in self.send_delivery_schedule_batch(jobs, progress_callback=_progress)
+        ]
     
     def create_customs_clearance_html(self, delivery_df, weeks_ahead=4):
         """Create HTML content for customs clearance email"""
@@ -1862,4 +1853,109 @@ class EmailSender:
         </body>
         </html>
         """
-        return html
\ No newline at end of file
+        return html
+
+
+# ── Batch rendering (render pool workers) ────────────────────────
+
+_worker_renderer = None
+
+
+def _renderer():
+    """EmailSender used only for its create_* methods (one per process)."""
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = EmailSender()
+    return _worker_renderer
+
+
+def _clean_filename(filename):
+    return filename.replace(' ', '_').replace('/', '_').replace('\\', '_')
+
+
+def render_delivery_schedule_job(recipient_name, delivery_df, notification_type, weeks_ahead,
+                                 contact_name, organizer_email):
+    """Subject, HTML body, Excel and ICS attachments for one recipient.
+
+    Module-level so it can run in a render pool worker; everything it
+    returns is plain str / bytes.
+    """
+    renderer = _renderer()
+    
+    # Remove duplicate columns
+    delivery_df = delivery_df.loc[:, ~delivery_df.columns.duplicated()].copy()
+    
+    attn = contact_name and contact_name != 'Unknown Contact'
+    today = datetime.now().strftime('%Y%m%d')
+    
+    # Set subject based on notification type with dynamic weeks
+    if notification_type == "🚨 Overdue Alerts":
+        overdue_count = delivery_df[delivery_df['delivery_timeline_status'] == 'Overdue']['delivery_id'].nunique()
+        due_today_count = delivery_df[delivery_df['delivery_timeline_status'] == 'Due Today']['delivery_id'].nunique()
+        subject = f"🚨 URGENT: {overdue_count} Overdue & {due_today_count} Due Today Deliveries - {recipient_name}"
+        html = renderer.create_overdue_alerts_html(delivery_df, recipient_name, contact_name)
+        excel_filename = f"urgent_deliveries_{recipient_name}"
+    else:
+        week_text = f"{weeks_ahead} Week" if weeks_ahead == 1 else f"{weeks_ahead} Weeks"
+        subject = f"Delivery Schedule - Next {week_text} - {recipient_name}"
+        html = renderer.create_delivery_schedule_html(delivery_df, recipient_name, weeks_ahead, contact_name)
+        excel_filename = f"delivery_schedule_{recipient_name}"
+    
+    # Include contact name in subject / filenames if available
+    if attn:
+        subject += f" (Attn: {contact_name})"
+        excel_filename += f"_{contact_name}"
+    
+    artifacts = {
+        'subject': subject,
+        'html': html,
+        'excel': renderer.create_excel_attachment(delivery_df, notification_type).read(),
+        'excel_filename': _clean_filename(f"{excel_filename}_{today}.xlsx"),
+        'ics': None,
+        'ics_filename': None,
+    }
+    
+    # Create ICS calendar attachment (only for delivery schedule)
+    if notification_type == "📅 Delivery Schedule":
+        try:
+            artifacts['ics'] = CalendarEventGenerator.create_ics_content(
+                recipient_name, delivery_df, organizer_email)
+            cal_filename = f"delivery_schedule_{recipient_name}"
+            if attn:
+                cal_filename += f"_{contact_name}"
+            artifacts['ics_filename'] = _clean_filename(f"{cal_filename}_{today}.ics")
+        except Exception as e:
+            logger.warning(f"Error creating calendar attachment: {e}")
+    
+    return artifacts
+
+
+class _SMTPSession:
+    """One logged-in SMTP connection reused across a batch (reconnects once on drop)."""
+    
+    def __init__(self, sender):
+        self.sender = sender
+        self._server = None
+    
+    def _connect(self):
+        server = smtplib.SMTP(self.sender.smtp_host, self.sender.smtp_port)
+        server.starttls()
+        server.login(self.sender.sender_email, self.sender.sender_password)
+        self._server = server
+    
+    def send(self, recipients, msg):
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.sendmail(self.sender.sender_email, recipients, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self._server.sendmail(self.sender.sender_email, recipients, msg.as_string())
+    
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
@@ -22,11 +22,20 @@ downstream UI code (metrics, pivot, detailed list) requires NO changes:
   • gap_quantity              (line-level)
   • fulfill_rate_percent      (line-level)
   • fulfillment_status        (line-level)
+
+FulfillmentEngine produces the same columns incrementally: per-product
+aggregates are precomputed once per base load, and when filters narrow or
+widen only the products whose line membership changed are recomputed.
+calculate_fulfillment remains the reference (full) implementation and the
+fallback for frames that are not a subset of the engine's base.
 """
 
 import numpy as np
 import pandas as pd
 import logging
+import threading
+import time
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +58,33 @@ _LINE_LEVEL_COLS = [
 ]
 
 
+# Above this share of changed lines a full segment pass beats delta updates
+_FULL_RECOMPUTE_FRACTION = 0.5
+
+
 # ── Public API ───────────────────────────────────────────────────
 
+def _stock_columns(df: pd.DataFrame, include_expired: bool):
+    """(stock_all, stock_pref) inventory columns for the expired toggle."""
+    if include_expired:
+        stock_all = 'total_instock_all_warehouses'
+        stock_pref = 'total_instock_at_preferred_warehouse'
+    else:
+        stock_all = 'total_instock_all_warehouses_valid'
+        stock_pref = 'total_instock_at_preferred_warehouse_valid'
+
+    # Fallback: if _valid columns don't exist, use the regular ones
+    if stock_all not in df.columns:
+        logger.warning(
+            f"Column {stock_all!r} not found — falling back to "
+            f"'total_instock_all_warehouses'.  Run the updated SQL view."
+        )
+        stock_all = 'total_instock_all_warehouses'
+        stock_pref = 'total_instock_at_preferred_warehouse'
+
+    return stock_all, stock_pref
+
+
 def calculate_fulfillment(
     df: pd.DataFrame,
     include_expired: bool = True,
@@ -76,21 +110,7 @@ def calculate_fulfillment(
     df = df.copy()
 
     # ── Pick the right inventory columns ─────────────────────────
-    if include_expired:
-        stock_all = 'total_instock_all_warehouses'
-        stock_pref = 'total_instock_at_preferred_warehouse'
-    else:
-        stock_all = 'total_instock_all_warehouses_valid'
-        stock_pref = 'total_instock_at_preferred_warehouse_valid'
-
-    # Fallback: if _valid columns don't exist, use the regular ones
-    if stock_all not in df.columns:
-        logger.warning(
-            f"Column {stock_all!r} not found — falling back to "
-            f"'total_instock_all_warehouses'.  Run the updated SQL view."
-        )
-        stock_all = 'total_instock_all_warehouses'
-        stock_pref = 'total_instock_at_preferred_warehouse'
+    stock_all, stock_pref = _stock_columns(df, include_expired)
 
     # ── 1. Product-level aggregation from filtered data ──────────
     active_mask = (
@@ -196,6 +216,281 @@ def calculate_fulfillment(
     return df
 
 
+# ── Incremental engine ───────────────────────────────────────────
+
+def _segment_positions(starts: np.ndarray, products: np.ndarray):
+    """Concatenated sorted-line positions of the given products + segment offsets."""
+    lengths = starts[products + 1] - starts[products]
+    offsets = np.zeros(len(products), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    positions = np.repeat(starts[products] - offsets, lengths) + np.arange(lengths.sum())
+    return positions, offsets
+
+
+def _gather(arrays: Dict[str, np.ndarray], codes: np.ndarray) -> Dict[str, Any]:
+    """Per-line values of product arrays (status via the default string array)."""
+    return {
+        col: pd.Series(arr).array.take(codes) if arr.dtype == object else arr[codes]
+        for col, arr in arrays.items()
+    }
+
+
+class _State:
+    """Line membership and product aggregates for one filter."""
+
+    def __init__(self, n_lines: int, n_products: int, n_pairs: int):
+        P = n_products
+        self.member = np.zeros(n_lines, dtype=bool)
+        self.pair_counts = np.zeros(n_pairs, dtype=np.int64)
+        self.active_lines = np.zeros(P, dtype=np.int64)
+        self.demand = np.zeros(P)
+        self.stock = np.full(P, np.nan)
+        self.dn_count = np.zeros(P, dtype=np.int64)
+        # Output arrays carry one extra "no product / no active line" slot at index P
+        self.out = {
+            'product_total_remaining_demand': np.zeros(P + 1),
+            'product_active_delivery_count': np.zeros(P + 1, dtype=np.int64),
+            'product_gap_quantity': np.zeros(P + 1),
+            'product_fulfill_rate_percent': np.zeros(P + 1),
+            'product_fulfillment_status': np.full(P + 1, 'Unknown', dtype=object),
+        }
+
+
+class FulfillmentEngine:
+    """Incremental fulfillment over one cached base frame.
+
+    Built once per base load and inventory toggle:
+      • lines are sorted by product code, so every product is one contiguous
+        segment and its aggregates are segment sums / maxima
+        (np.add.reduceat / np.fmax.reduceat)
+      • line-level columns (gap, rate, status, stock-out progress) do not
+        depend on the filter and are computed for every base line up front
+      • active (product, delivery) pairs are counted, so
+        product_active_delivery_count updates exactly on each ±1
+
+    ``apply(df)`` takes a filtered subset of the base (same index labels),
+    diffs its line membership against the previous call and recomputes only
+    the products that gained or lost lines. Safe to share between sessions —
+    state changes are serialized by a lock.
+    """
+
+    def __init__(self, base: pd.DataFrame, include_expired: bool = True):
+        start = time.perf_counter()
+        self.include_expired = include_expired
+        self._base_index = base.index
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, Any] = {}
+
+        n = len(base)
+        stock_all, _ = _stock_columns(base, include_expired)
+        self.stock_col = stock_all
+
+        # ── Product segments ─────────────────────────────────────
+        codes, uniques = pd.factorize(base['product_id'])
+        P = len(uniques)
+        order = np.argsort(codes, kind='stable')
+        order = order[codes[order] >= 0]
+        self._codes = np.where(codes < 0, P, codes)     # P = "no product" slot
+        self._order = order
+        self._starts = np.searchsorted(codes[order], np.arange(P + 1))
+        self._n_products = P
+
+        # ── Line values ──────────────────────────────────────────
+        remaining_raw = base['remaining_quantity_to_deliver']
+        active = ((remaining_raw > 0) & (base['shipment_status'] != 'DELIVERED')).to_numpy()
+        remaining = remaining_raw.fillna(0).to_numpy(dtype=float)
+        stock_raw = base[stock_all].to_numpy(dtype=float)
+        self._active = active
+        self._remaining = remaining
+        self._demand_sorted = np.where(active, remaining, 0.0)[order]
+        self._stock_sorted = stock_raw[order]
+        self._delivery_ids = base['delivery_id'].to_numpy()
+
+        # Filter-independent line-level columns (same formulas as calculate_fulfillment)
+        stock = np.nan_to_num(stock_raw, nan=0.0)
+        req_qty = base['stock_out_request_quantity'].fillna(0).to_numpy(dtype=float)
+        issued_qty = base['stock_out_quantity'].fillna(0).to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._line = {
+                'gap_quantity': remaining - stock,
+                'fulfill_rate_percent': np.where(
+                    remaining > 0,
+                    np.round(stock / remaining * 100, 2),
+                    np.where(stock > 0, 100.0, 0.0),
+                ),
+                'stock_out_progress': np.where(
+                    req_qty > 0, np.round(issued_qty / req_qty * 100, 1), 0.0,
+                ),
+            }
+        # Kept as the default string array, so per-call output is a take, not a re-infer
+        self._line['fulfillment_status'] = _classify_line_status_vec(
+            base['shipment_status'], pd.Series(remaining, index=base.index),
+            pd.Series(stock, index=base.index),
+        ).array
+
+        # ── Active (product, delivery) pairs ─────────────────────
+        dcodes, d_uniques = pd.factorize(base['delivery_id'])
+        paired = active & (codes >= 0) & (dcodes >= 0)
+        combined = codes.astype(np.int64) * (len(d_uniques) + 1) + dcodes
+        pair_keys, pair_inverse = np.unique(combined[paired], return_inverse=True)
+        self._pair_of_line = np.full(n, -1, dtype=np.int64)
+        self._pair_of_line[paired] = pair_inverse
+        self._pair_product = pair_keys // (len(d_uniques) + 1)
+
+        self._state = self._new_state()
+        self._full_result: Optional[Dict[str, np.ndarray]] = None
+
+        logger.info(
+            f"[fulfillment] Engine built on {n} lines / {P} products "
+            f"in {time.perf_counter() - start:.3f}s (stock_col={stock_all})"
+        )
+
+    # ── State ────────────────────────────────────────────────────
+
+    def _new_state(self) -> '_State':
+        return _State(len(self._codes), self._n_products, len(self._pair_product))
+
+    def _recompute_products(self, state: '_State', products: np.ndarray):
+        """Segment aggregates of the given products over member lines."""
+        if not len(products):
+            return
+        positions, offsets = _segment_positions(self._starts, products)
+        lines = self._order[positions]
+        member = state.member[lines]
+        state.demand[products] = np.add.reduceat(
+            np.where(member, self._demand_sorted[positions], 0.0), offsets)
+        state.stock[products] = np.fmax.reduceat(
+            np.where(member, self._stock_sorted[positions], np.nan), offsets)
+        self._derive(state, products)
+
+    def _derive(self, state: '_State', products: np.ndarray):
+        """Product-level output columns from the raw aggregates."""
+        demand = state.demand[products]
+        stock = np.nan_to_num(state.stock[products], nan=0.0)
+        present = state.active_lines[products] > 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(
+                demand > 0, np.round(stock / demand * 100, 2),
+                np.where(stock > 0, 100.0, 0.0),
+            )
+        status = _classify_product_status_vec(pd.Series(stock), pd.Series(demand)).to_numpy()
+
+        out = state.out
+        out['product_total_remaining_demand'][products] = np.where(present, demand, 0.0)
+        out['product_active_delivery_count'][products] = np.where(present, state.dn_count[products], 0)
+        out['product_gap_quantity'][products] = np.where(present, demand - stock, 0.0)
+        out['product_fulfill_rate_percent'][products] = np.where(present, rate, 0.0)
+        out['product_fulfillment_status'][products] = np.where(present, status, 'Unknown')
+
+    def _update(self, state: '_State', member: np.ndarray) -> Dict[str, Any]:
+        """Move state to the new line membership; returns stats."""
+        changed = np.flatnonzero(member != state.member)
+        if not len(changed):
+            return {'mode': 'unchanged', 'changed_lines': 0, 'changed_products': 0}
+
+        P = self._n_products
+        if len(changed) > _FULL_RECOMPUTE_FRACTION * len(member):
+            state.member = member
+            valid = self._codes < P
+            state.active_lines = np.bincount(
+                self._codes[member & self._active & valid], minlength=P)
+            state.pair_counts = np.bincount(
+                self._pair_of_line[member & (self._pair_of_line >= 0)],
+                minlength=len(self._pair_product))
+            state.dn_count = np.bincount(
+                self._pair_product[state.pair_counts > 0], minlength=P)
+            products = np.arange(P)
+            self._recompute_products(state, products)
+            return {'mode': 'full', 'changed_lines': len(changed), 'changed_products': P}
+
+        sign = np.where(member[changed], 1, -1)
+        codes = self._codes[changed]
+        valid = codes < P
+
+        act = self._active[changed] & valid
+        np.add.at(state.active_lines, codes[act], sign[act])
+
+        pairs = self._pair_of_line[changed]
+        has_pair = pairs >= 0
+        if has_pair.any():
+            touched = np.unique(pairs[has_pair])
+            before = state.pair_counts[touched] > 0
+            np.add.at(state.pair_counts, pairs[has_pair], sign[has_pair])
+            after = state.pair_counts[touched] > 0
+            flipped = before != after
+            np.add.at(state.dn_count, self._pair_product[touched[flipped]],
+                      np.where(after[flipped], 1, -1))
+
+        state.member = member
+        products = np.unique(codes[valid])
+        self._recompute_products(state, products)
+        return {'mode': 'incremental', 'changed_lines': len(changed),
+                'changed_products': len(products)}
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fulfillment columns for *df* (a row subset of the base frame).
+
+        Returns a shallow copy of *df* with the nine fulfillment columns
+        (plus stock_out_progress) overwritten — same contract as
+        calculate_fulfillment. Frames that are not a subset of the base
+        fall back to calculate_fulfillment.
+        """
+        if df is None or df.empty:
+            return df
+
+        start = time.perf_counter()
+        lines = self._base_index.get_indexer(df.index) if self._base_index.is_unique else None
+        if (lines is None or (lines < 0).any()
+                or not np.array_equal(self._delivery_ids[lines], df['delivery_id'].to_numpy())):
+            logger.warning("[fulfillment] Frame is not a subset of the engine base — full recompute")
+            result = calculate_fulfillment(df, include_expired=self.include_expired)
+            self.last_stats = {'mode': 'fallback', 'rows': len(df),
+                               'seconds': time.perf_counter() - start}
+            return result
+
+        codes = self._codes[lines]
+        with self._lock:
+            if len(lines) == len(self._codes):
+                # Whole base (e.g. the overdue / KPI pass) — computed once
+                # — on its own state, so the incremental one keeps its filter
+                if self._full_result is None:
+                    full = self._new_state()
+                    stats = self._update(full, np.ones(len(self._codes), dtype=bool))
+                    self._full_result = full.out
+                else:
+                    stats = {'mode': 'cached', 'changed_lines': 0, 'changed_products': 0}
+                product_cols = _gather(self._full_result, codes)
+            else:
+                member = np.zeros(len(self._codes), dtype=bool)
+                member[lines] = True
+                stats = self._update(self._state, member)
+                product_cols = _gather(self._state.out, codes)
+
+        out = df.copy(deep=False)
+        for col, values in product_cols.items():
+            out[col] = values
+        for col, values in self._line.items():
+            out[col] = values.take(lines)
+
+        demand = product_cols['product_total_remaining_demand']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['delivery_demand_percentage'] = np.where(
+                demand > 0, np.round(self._remaining[lines] / demand * 100, 2), 0.0,
+            )
+
+        stats.update(rows=len(df), seconds=time.perf_counter() - start)
+        self.last_stats = stats
+        logger.info(
+            f"[fulfillment] {stats['mode']} on {len(df)} rows: "
+            f"{stats['changed_lines']} lines / {stats['changed_products']} products "
+            f"recomputed in {stats['seconds'] * 1000:.1f}ms"
+        )
+        return out
+
+
 # ── Vectorized status classifiers ────────────────────────────────
 
 def _classify_product_status_vec(stock: pd.Series, demand: pd.Series) -> pd.Series:
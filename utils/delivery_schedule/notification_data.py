@@ -0,0 +1,257 @@
+# utils/delivery_schedule/notification_data.py
+"""Notification recipient lists and per-recipient slices — built from the cached base dataset
+
+The email tab used to aggregate delivery_full_view once per list (sales,
+overdue sales, customers, contacts) and once more per recipient when
+previewing / sending. Everything it needs is already in load_base_data(),
+so NotificationData derives it client-side:
+
+    • each recipient list is one groupby over the relevant subset
+    • each per-recipient slice is a positional take from one groupby index
+    • the only query is the small employees directory (names, manager e-mail)
+
+Instances are memoized on the base store (DeliveryDataLoader.get_notification_data)
+and dropped whenever the base frame is reloaded or ETD-patched.
+"""
+
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Columns (and order) of the per-recipient frames handed to EmailSender —
+# same shape the old per-recipient queries returned.
+NOTIFICATION_COLUMNS = [
+    'delivery_date', 'customer', 'customer_code',
+    'customer_contact', 'customer_contact_email', 'customer_contact_phone',
+    'recipient_company', 'recipient_company_code', 'recipient_contact',
+    'recipient_contact_email', 'recipient_contact_phone', 'recipient_address',
+    'recipient_state_province', 'recipient_country_name',
+    'delivery_id', 'dn_number', 'sto_dr_line_id', 'oc_number', 'oc_line_id',
+    'product_pn', 'product_id', 'pt_code', 'package_size', 'brand',
+    'standard_quantity', 'selling_quantity', 'uom_conversion',
+    'remaining_quantity_to_deliver', 'total_instock_at_preferred_warehouse',
+    'total_instock_all_warehouses', 'gap_quantity', 'product_gap_quantity',
+    'product_total_remaining_demand', 'product_fulfill_rate_percent',
+    'delivery_demand_percentage', 'shipment_status', 'shipment_status_vn',
+    'fulfillment_status', 'product_fulfillment_status',
+    'delivery_timeline_status', 'days_overdue', 'preferred_warehouse',
+    'is_epe_company', 'legal_entity', 'created_by_name', 'created_by_email',
+    'created_date', 'total_quantity',
+]
+
+_CLOSED_SHIPMENT_STATUSES = ('DELIVERED', 'COMPLETED')
+_URGENT_STATUSES = ('Overdue', 'Due Today')
+
+
+@st.cache_data(ttl=300)
+def load_employee_directory(_engine) -> pd.DataFrame:
+    """Employees with their manager's e-mail (small table, no view scan)"""
+    query = text("""
+    SELECT e.id, CONCAT(e.first_name, ' ', e.last_name) AS name, e.email,
+           m.email AS manager_email
+    FROM employees e
+    LEFT JOIN employees m ON e.manager_id = m.id
+    WHERE e.email IS NOT NULL AND e.email != ''
+    """)
+    try:
+        with _engine.connect() as conn:
+            return pd.read_sql(query, conn)
+    except Exception as e:
+        logger.error(f"Error loading employee directory: {e}")
+        return pd.DataFrame(columns=['id', 'name', 'email', 'manager_email'])
+
+
+class NotificationData:
+    """Recipient lists and per-recipient delivery frames over one base frame.
+
+    `base` is the non-completed base dataset (load_base_data()). Subsets and
+    groupby indices are computed on first use and kept for the lifetime of
+    the instance.
+    """
+
+    def __init__(self, base: pd.DataFrame, employees: pd.DataFrame, today: Optional[date] = None):
+        self.today = today or date.today()
+        self.employees = employees
+        self._open = self._prepare(base)
+        self._subsets: Dict[tuple, pd.DataFrame] = {}
+        self._groups: Dict[tuple, Dict] = {}
+
+    # ── Preparation ──────────────────────────────────────────────
+
+    def _prepare(self, base: pd.DataFrame) -> pd.DataFrame:
+        """Rows with quantity left to deliver, shaped like NOTIFICATION_COLUMNS."""
+        if base.empty:
+            return pd.DataFrame(columns=NOTIFICATION_COLUMNS + ['etd_day'])
+
+        df = base[base['remaining_quantity_to_deliver'] > 0]
+        etd = pd.to_datetime(df['etd'], errors='coerce').dt.normalize()
+        df = df.assign(
+            etd_day=etd,
+            delivery_date=etd.dt.date,
+            total_quantity=df['remaining_quantity_to_deliver'],
+        )
+        for col in NOTIFICATION_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        return df[NOTIFICATION_COLUMNS + ['etd_day']]
+
+    def _window(self, weeks_ahead: int) -> pd.Series:
+        start = pd.Timestamp(self.today)
+        end = start + pd.Timedelta(weeks=weeks_ahead)
+        return self._open['etd_day'].between(start, end)
+
+    def _not_shipped(self) -> pd.Series:
+        return ~self._open['shipment_status'].isin(_CLOSED_SHIPMENT_STATUSES)
+
+    def _subset(self, kind: str, weeks_ahead: int = 0) -> pd.DataFrame:
+        """Sorted row subset for one notification kind.
+
+        • 'upcoming'  — ETD in [today, today + weeks], not yet shipped
+        • 'schedule'  — same window, any shipment status (sales schedule)
+        • 'urgent'    — Overdue / Due Today, not yet shipped
+        """
+        key = (kind, weeks_ahead)
+        if key not in self._subsets:
+            df = self._open
+            if kind == 'urgent':
+                df = df[df['delivery_timeline_status'].isin(_URGENT_STATUSES) & self._not_shipped()]
+                df = df.sort_values(
+                    ['delivery_timeline_status', 'days_overdue', 'delivery_date',
+                     'customer', 'delivery_id', 'sto_dr_line_id'],
+                    ascending=[False, False, True, True, True, True],
+                    na_position='last', kind='stable',
+                )
+            else:
+                mask = self._window(weeks_ahead)
+                if kind == 'upcoming':
+                    mask &= self._not_shipped()
+                df = df[mask].sort_values(
+                    ['delivery_date', 'customer', 'recipient_company', 'delivery_id', 'sto_dr_line_id'],
+                    na_position='last', kind='stable',
+                )
+            self._subsets[key] = df.reset_index(drop=True)
+        return self._subsets[key]
+
+    def _slice(self, kind: str, weeks_ahead: int, by: str, value) -> pd.DataFrame:
+        """Rows of one recipient — one groupby per (kind, weeks, by), then a take."""
+        df = self._subset(kind, weeks_ahead)
+        key = (kind, weeks_ahead, by)
+        if key not in self._groups:
+            self._groups[key] = df.groupby(by, sort=False).indices if not df.empty else {}
+        positions = self._groups[key].get(value)
+        if positions is None:
+            return df.iloc[:0].drop(columns='etd_day')
+        return df.take(positions).drop(columns='etd_day').reset_index(drop=True)
+
+    # ── Recipient lists ──────────────────────────────────────────
+
+    def _with_employees(self, summary: pd.DataFrame) -> pd.DataFrame:
+        """Attach id / name / manager e-mail by created_by_email (inner join)."""
+        if summary.empty or self.employees.empty:
+            return pd.DataFrame()
+        merged = self.employees.merge(
+            summary, left_on='email', right_on='created_by_email', how='inner'
+        ).drop(columns='created_by_email')
+        return merged
+
+    def sales_list(self, weeks_ahead: int = 4) -> pd.DataFrame:
+        """Sales with deliveries due in the window (one groupby)."""
+        df = self._subset('upcoming', weeks_ahead)
+        if df.empty:
+            return pd.DataFrame()
+        summary = df.assign(
+            _overdue_id=df['delivery_id'].where(df['delivery_timeline_status'] == 'Overdue'),
+        ).groupby('created_by_email').agg(
+            active_deliveries=('delivery_id', 'nunique'),
+            total_quantity=('remaining_quantity_to_deliver', 'sum'),
+            overdue_deliveries=('_overdue_id', 'nunique'),
+        ).reset_index()
+        result = self._with_employees(summary)
+        if result.empty:
+            return result
+        return result[['id', 'name', 'email', 'active_deliveries', 'total_quantity',
+                       'overdue_deliveries', 'manager_email']] \
+            .sort_values('name', kind='stable').reset_index(drop=True)
+
+    def sales_list_overdue(self) -> pd.DataFrame:
+        """Sales with overdue / due-today deliveries (one groupby)."""
+        df = self._subset('urgent')
+        if df.empty:
+            return pd.DataFrame()
+        summary = df.assign(
+            _overdue_id=df['delivery_id'].where(df['delivery_timeline_status'] == 'Overdue'),
+            _due_today_id=df['delivery_id'].where(df['delivery_timeline_status'] == 'Due Today'),
+        ).groupby('created_by_email').agg(
+            overdue_deliveries=('_overdue_id', 'nunique'),
+            due_today_deliveries=('_due_today_id', 'nunique'),
+            max_days_overdue=('days_overdue', 'max'),
+        ).reset_index()
+        result = self._with_employees(summary)
+        if result.empty:
+            return result
+        return result[['id', 'name', 'email', 'overdue_deliveries', 'due_today_deliveries',
+                       'max_days_overdue', 'manager_email']].sort_values(
+            ['overdue_deliveries', 'name'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+    def customers(self, weeks_ahead: int = 4) -> pd.DataFrame:
+        """Customers with deliveries due in the window (one groupby)."""
+        df = self._subset('upcoming', weeks_ahead)
+        if df.empty:
+            return pd.DataFrame()
+        return df.groupby(['customer', 'customer_code'], dropna=False).agg(
+            active_deliveries=('delivery_id', 'nunique'),
+            total_quantity=('remaining_quantity_to_deliver', 'sum'),
+            provinces_count=('recipient_state_province', 'nunique'),
+        ).reset_index().sort_values('customer', kind='stable').reset_index(drop=True)
+
+    def customer_contacts(self, customer_names: List[str], weeks_ahead: int = 4) -> pd.DataFrame:
+        """Contacts (with e-mail) of the selected customers (one groupby)."""
+        df = self._subset('upcoming', weeks_ahead)
+        if df.empty or not customer_names:
+            return pd.DataFrame()
+        email = df['customer_contact_email']
+        df = df[df['customer'].isin(customer_names) & email.notna() & (email != '')]
+        if df.empty:
+            return pd.DataFrame()
+        contacts = df.assign(
+            contact_name=df['customer_contact'].fillna('Unknown Contact'),
+        ).groupby(['customer', 'customer_contact', 'customer_contact_email'], dropna=False).agg(
+            contact_name=('contact_name', 'first'),
+            delivery_count=('delivery_id', 'nunique'),
+        ).reset_index().rename(columns={'customer_contact_email': 'email'})
+        contacts.insert(0, 'contact_id', (
+            contacts['customer'].fillna('') + '_' + contacts['email'] + '_'
+            + contacts['customer_contact'].fillna('Unknown')
+        ))
+        return contacts[['contact_id', 'customer', 'contact_name', 'email', 'delivery_count']] \
+            .sort_values(['customer', 'contact_name'], kind='stable').reset_index(drop=True)
+
+    # ── Per-recipient slices ─────────────────────────────────────
+
+    def sales_schedule(self, creator_name: str, weeks_ahead: int = 4) -> pd.DataFrame:
+        return self._slice('schedule', weeks_ahead, 'created_by_name', creator_name)
+
+    def sales_urgent(self, creator_name: str) -> pd.DataFrame:
+        return self._slice('urgent', 0, 'created_by_name', creator_name)
+
+    def customer_schedule(self, customer_name: str, weeks_ahead: int = 4) -> pd.DataFrame:
+        return self._slice('upcoming', weeks_ahead, 'customer', customer_name)
+
+    def all_upcoming(self, weeks_ahead: int = 4) -> pd.DataFrame:
+        return self._subset('upcoming', weeks_ahead).drop(columns='etd_day')
+
+    def all_urgent(self) -> pd.DataFrame:
+        return self._subset('urgent').drop(columns='etd_day')
+
+
+__all__ = [
+    'NOTIFICATION_COLUMNS',
+    'NotificationData',
+    'load_employee_directory',
+]
@@ -0,0 +1,405 @@
+# utils/doc_links.py
+"""
+Document Link Service — presigned S3 URLs for drill-down document lists.
+
+Shared by the Salesperson and KPI Center payment / sales-detail drill-downs
+(previously two copies of PaymentS3Client in each package's s3_utils.py).
+
+Presigning is local HMAC work, but the drill-downs used to repeat it for
+every attachment on every rerun. This service:
+- Caches signed URLs per (key, expiration) until shortly before they expire
+- Signs a whole document list in one call (unique keys, cache misses only)
+- Supports lazy signing: long lists render as buttons and only the clicked
+  document is signed (render_doc_list)
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.doc_links import generate_doc_url, generate_doc_urls, render_doc_list
+
+    url = generate_doc_url("product-file/173552558.pdf")
+    urls = generate_doc_urls(docs_df['s3_key'])          # {key: url}
+
+    # In a drill-down fragment:
+    render_doc_list(docs_df, s3_url_generator=generate_doc_url, key_prefix="ar_doc")
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+DEFAULT_EXPIRATION = 3600          # URL validity (seconds)
+REFRESH_MARGIN = 300               # re-sign when < 5 min of validity remains
+MAX_CACHED_URLS = 5000             # bound memory; oldest entries dropped first
+LAZY_THRESHOLD = 12                # lists longer than this sign on click
+
+
+# =============================================================================
+# SERVICE
+# =============================================================================
+
+class DocLinkService:
+    """
+    Read-only S3 client that signs GET URLs with a TTL cache.
+
+    Only needs s3:GetObject on the media bucket. Thread-safe: one instance is
+    shared by all sessions via get_doc_link_service().
+    """
+
+    def __init__(
+        self,
+        client=None,
+        bucket: Optional[str] = None,
+        refresh_margin: int = REFRESH_MARGIN,
+        max_entries: int = MAX_CACHED_URLS,
+    ):
+        """
+        Args:
+            client: boto3 S3 client (default: built from app config)
+            bucket: Bucket name (default: from app config)
+            refresh_margin: Seconds before expiry at which a URL is re-signed
+            max_entries: Cache size bound
+        """
+        from botocore.exceptions import ClientError
+
+        if client is None or bucket is None:
+            import boto3
+            from utils.config import config
+
+            aws_config = config.aws_config
+            required = ['access_key_id', 'secret_access_key', 'region', 'bucket_name']
+            missing = [k for k in required if not aws_config.get(k)]
+            if missing:
+                raise ValueError(f"Missing AWS config keys: {missing}")
+
+            if client is None:
+                client = boto3.client(
+                    's3',
+                    aws_access_key_id=aws_config['access_key_id'],
+                    aws_secret_access_key=aws_config['secret_access_key'],
+                    region_name=aws_config['region'],
+                )
+            bucket = bucket or aws_config['bucket_name']
+
+        self._client = client
+        self._bucket = bucket
+        self._ClientError = ClientError
+        self._refresh_margin = refresh_margin
+        self._max_entries = max_entries
+
+        # (s3_key, expiration) → (url, valid_until)
+        self._cache: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._signed = 0
+
+        logger.info(f"DocLinkService initialized (bucket: {self._bucket})")
+
+    # -------------------------------------------------------------------------
+    # Signing
+    # -------------------------------------------------------------------------
+
+    def _sign(self, s3_key: str, expiration: int) -> Optional[str]:
+        try:
+            return self._client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self._bucket, 'Key': s3_key},
+                ExpiresIn=expiration,
+            )
+        except self._ClientError as e:
+            logger.error(f"Presigned URL error for {s3_key}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error generating URL for {s3_key}: {e}")
+        return None
+
+    def peek(self, s3_key: str, expiration: int = DEFAULT_EXPIRATION) -> Optional[str]:
+        """Cached URL if still fresh, else None. Never signs."""
+        entry = self._cache.get((s3_key, expiration))
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    def urls(
+        self,
+        s3_keys: Iterable[str],
+        expiration: int = DEFAULT_EXPIRATION,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Presigned URLs for many keys: unique keys only, cached ones reused,
+        the rest signed in one pass.
+
+        Returns:
+            Dict mapping s3_key → URL (or None if signing failed)
+        """
+        keys = [k for k in dict.fromkeys(s3_keys) if isinstance(k, str) and k]
+        now = time.time()
+        result: Dict[str, Optional[str]] = {}
+        misses: List[str] = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._cache.get((key, expiration))
+                if entry and entry[1] > now:
+                    result[key] = entry[0]
+                else:
+                    misses.append(key)
+            self._hits += len(keys) - len(misses)
+
+        if not misses:
+            return result
+
+        signed = {key: self._sign(key, expiration) for key in misses}
+        valid_until = now + max(expiration - self._refresh_margin, 0)
+
+        with self._lock:
+            for key, url in signed.items():
+                if url:
+                    self._cache[(key, expiration)] = (url, valid_until)
+            self._signed += len(misses)
+            overflow = len(self._cache) - self._max_entries
+            if overflow > 0:
+                for stale in sorted(self._cache, key=lambda k: self._cache[k][1])[:overflow]:
+                    del self._cache[stale]
+
+        result.update(signed)
+        return result
+
+    def url(self, s3_key: str, expiration: int = DEFAULT_EXPIRATION) -> Optional[str]:
+        """Presigned URL for one key (cached)."""
+        if not s3_key:
+            return None
+        return self.urls([s3_key], expiration).get(s3_key)
+
+    __call__ = url
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'cached': len(self._cache), 'hits': self._hits, 'signed': self._signed}
+
+    # -------------------------------------------------------------------------
+    # PaymentS3Client compatibility
+    # -------------------------------------------------------------------------
+
+    def get_presigned_url(self, s3_key: str, expiration: int = DEFAULT_EXPIRATION) -> Optional[str]:
+        return self.url(s3_key, expiration)
+
+    def get_presigned_urls_batch(
+        self,
+        s3_keys: List[str],
+        expiration: int = DEFAULT_EXPIRATION,
+    ) -> Dict[str, Optional[str]]:
+        return self.urls(s3_keys, expiration)
+
+    def file_exists(self, s3_key: str) -> bool:
+        """Check if file exists in S3 (HEAD request)."""
+        if not s3_key:
+            return False
+        try:
+            self._client.head_object(Bucket=self._bucket, Key=s3_key)
+            return True
+        except Exception:
+            return False
+
+
+# =============================================================================
+# SINGLETON + CONVENIENCE FUNCTIONS
+# =============================================================================
+
+@st.cache_resource
+def get_doc_link_service() -> Optional[DocLinkService]:
+    """
+    Process-wide DocLinkService (st.cache_resource), so the URL cache is
+    shared across sessions. Returns None if AWS config is missing — callers
+    render document names without links.
+    """
+    try:
+        return DocLinkService()
+    except Exception as e:
+        logger.warning(f"DocLinkService unavailable: {e}")
+        return None
+
+
+def generate_doc_url(s3_key: str, expiration: int = DEFAULT_EXPIRATION) -> Optional[str]:
+    """
+    Presigned URL for one document, or None if S3 is unavailable.
+
+    Can be passed directly as the `s3_url_generator` callback of the
+    drill-down fragments.
+    """
+    service = get_doc_link_service()
+    if service is None:
+        return None
+    return service.url(s3_key, expiration)
+
+
+def generate_doc_urls(
+    s3_keys: Iterable[str],
+    expiration: int = DEFAULT_EXPIRATION,
+) -> Dict[str, Optional[str]]:
+    """Presigned URLs for many documents ({} if S3 is unavailable)."""
+    service = get_doc_link_service()
+    if service is None:
+        return {}
+    return service.urls(s3_keys, expiration)
+
+
+def _peek_doc_url(s3_key: str, expiration: int = DEFAULT_EXPIRATION) -> Optional[str]:
+    service = get_doc_link_service()
+    return service.peek(s3_key, expiration) if service is not None else None
+
+
+# Batch / cache-peek entry points discovered by resolve_doc_urls()
+generate_doc_url.batch = generate_doc_urls
+generate_doc_url.peek = _peek_doc_url
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+def file_icon(filename) -> str:
+    """Emoji icon based on file extension."""
+    name = str(filename)
+    ext = name.split('.')[-1].lower() if '.' in name else ''
+    return {'pdf': '📄', 'png': '🖼️', 'jpg': '🖼️', 'jpeg': '🖼️'}.get(ext, '📎')
+
+
+def resolve_doc_urls(
+    s3_keys: Iterable[str],
+    s3_url_generator: Optional[Callable] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Sign a list of keys with any s3_url_generator callback.
+
+    Uses the generator's `.batch` entry point when it has one (generate_doc_url,
+    DocLinkService); otherwise calls it once per unique key.
+    """
+    if s3_url_generator is None:
+        return {}
+    keys = [k for k in dict.fromkeys(s3_keys) if isinstance(k, str) and k]
+    if not keys:
+        return {}
+
+    batch = getattr(s3_url_generator, 'batch', None) or getattr(s3_url_generator, 'urls', None)
+    if batch is not None:
+        return batch(keys)
+
+    result = {}
+    for key in keys:
+        try:
+            result[key] = s3_url_generator(key)
+        except Exception as e:
+            logger.warning(f"Failed to generate URL for {key}: {e}")
+            result[key] = None
+    return result
+
+
+def render_doc_list(
+    docs_df: pd.DataFrame,
+    s3_url_generator: Optional[Callable] = None,
+    key_prefix: str = "doc",
+    show_invoice_number: bool = True,
+    lazy_threshold: Optional[int] = LAZY_THRESHOLD,
+):
+    """
+    Render invoice / payment-receipt document links for a drill-down.
+
+    Groups by doc_type ('invoice', 'payment'; anything else → "Documents").
+    All links are signed in one resolve_doc_urls() call. When the list has
+    more than lazy_threshold documents, only already-cached or clicked
+    documents are signed; the rest render as buttons.
+
+    Args:
+        docs_df: Rows with filename, s3_key and optional doc_type,
+            payment_number, invoice_number
+        s3_url_generator: Callable(s3_key) → URL (None = names only)
+        key_prefix: Widget key prefix (unique per drill-down)
+        show_invoice_number: Append "— {invoice_number}" and the S3 key fallback
+        lazy_threshold: Document count above which signing is deferred to click
+    """
+    keys = docs_df['s3_key'].tolist() if 's3_key' in docs_df.columns else []
+    lazy = (
+        s3_url_generator is not None
+        and lazy_threshold is not None
+        and len(docs_df) > lazy_threshold
+    )
+
+    if lazy:
+        revealed = st.session_state.setdefault(f"{key_prefix}_signed_keys", set())
+        peek = getattr(s3_url_generator, 'peek', None)
+        cached = {k: peek(k) for k in dict.fromkeys(keys) if peek and isinstance(k, str) and k}
+        urls = {k: u for k, u in cached.items() if u}
+        urls.update(resolve_doc_urls([k for k in keys if k in revealed and k not in urls], s3_url_generator))
+    else:
+        urls = resolve_doc_urls(keys, s3_url_generator)
+
+    def _render(doc: pd.Series, idx, extra_label: str = ""):
+        filename = doc.get('filename', 'Unknown')
+        s3_key = doc.get('s3_key', '')
+        icon = file_icon(filename)
+        suffix = f" — {doc.get('invoice_number', '')}" if show_invoice_number else ""
+
+        url = urls.get(s3_key) if s3_key else None
+        if url:
+            st.markdown(f"{icon} [{filename}]({url}){extra_label}{suffix}")
+            return
+        if lazy and s3_key and s3_key not in revealed:
+            st.button(
+                f"{icon} {filename}{extra_label}{suffix}",
+                key=f"{key_prefix}_sign_{idx}",
+                on_click=revealed.add,
+                args=(s3_key,),
+                help="Generate download link",
+            )
+            return
+        if show_invoice_number:
+            st.caption(f"{icon} {filename}{extra_label}{suffix} (S3: {s3_key})")
+        else:
+            st.caption(f"{icon} {filename}{extra_label}")
+
+    has_type = 'doc_type' in docs_df.columns
+    inv_docs = docs_df[docs_df['doc_type'] == 'invoice'] if has_type else pd.DataFrame()
+    pmt_docs = docs_df[docs_df['doc_type'] == 'payment'] if has_type else pd.DataFrame()
+
+    if not inv_docs.empty:
+        st.markdown(f"**📄 Invoice Documents** ({len(inv_docs)})")
+        for idx, doc in inv_docs.iterrows():
+            _render(doc, idx)
+
+    if not pmt_docs.empty:
+        st.markdown(f"**💳 Payment Receipts** ({len(pmt_docs)})")
+        for idx, doc in pmt_docs.iterrows():
+            pmt_label = f" ({doc['payment_number']})" if pd.notna(doc.get('payment_number')) else ""
+            _render(doc, idx, extra_label=pmt_label)
+
+    if inv_docs.empty and pmt_docs.empty:
+        st.markdown("**📎 Documents**")
+        for idx, doc in docs_df.iterrows():
+            _render(doc, idx)
+
+
+__all__: List[str] = [
+    'DEFAULT_EXPIRATION',
+    'LAZY_THRESHOLD',
+    'DocLinkService',
+    'get_doc_link_service',
+    'generate_doc_url',
+    'generate_doc_urls',
+    'file_icon',
+    'resolve_doc_urls',
+    'render_doc_list',
+]
@@ -16,6 +16,7 @@ from typing import Dict
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     build_pareto_chart, 
     build_growth_comparison_chart,
@@ -195,7 +196,7 @@ def _aggregate_dimension(sales_df: pd.DataFrame, dimension: str) -> pd.DataFrame
 # TOP PERFORMERS TAB
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def _top_performers_tab(agg_data: Dict, key_prefix: str):
     """Unified Top Performers Analysis with cached data. Uses @st.fragment for partial rerun."""
     
@@ -479,7 +480,7 @@ def _render_insights(
 # GROWTH ANALYSIS TAB
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def _growth_analysis_tab(
     sales_df: pd.DataFrame,
     prev_sales_df: pd.DataFrame = None,
@@ -2,9 +2,13 @@
 """
 Backlog Tab Charts for KPI Center Performance
 
-VERSION: 4.3.0
+VERSION: 4.4.0
 EXTRACTED FROM: charts.py v3.3.2
 
+CHANGELOG:
+- v4.4.0: Timeline chart serializes only encoded columns and records its
+          payload size (utils.chart_payload)
+
 Contains:
 - build_forecast_waterfall_chart: Invoiced + Backlog = Forecast vs Target
 - build_gap_analysis_chart: Bullet/progress chart for target comparison
@@ -20,6 +24,7 @@ import altair as alt
 
 from ..constants import COLORS, MONTH_ORDER
 from ..common.charts import empty_chart
+from utils.chart_payload import slim, record_payload
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +143,7 @@ def build_backlog_by_month_chart_multiyear(
     
     # Convert etd_year to string for color encoding
     df['year_str'] = df['etd_year'].astype(str)
+    df = slim(df, ['year_month', 'etd_year', 'year_str', revenue_col])
     
     # Get unique years for color scale
     unique_years = sorted(df['etd_year'].unique())
@@ -170,11 +176,13 @@ def build_backlog_by_month_chart_multiyear(
         text=alt.Text(f'{revenue_col}:Q', format=',.0f')
     )
     
-    return alt.layer(bars, labels).properties(
+    chart = alt.layer(bars, labels).properties(
         width='container',
         height=350,
         title=title
     )
+    
+    return record_payload('kpi_center.backlog_timeline', chart)
 
 
 def build_backlog_by_month_stacked(
@@ -27,6 +27,7 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     build_backlog_by_month_chart,
     build_backlog_by_month_chart_multiyear,
@@ -137,7 +138,7 @@ def _get_period_label(filter_values: Dict) -> str:
 # TAB-LEVEL FRAGMENT - v4.2.0
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_tab_fragment(
     backlog_df: pd.DataFrame,
     filter_values: Dict = None,
@@ -302,7 +303,7 @@ def backlog_tab_fragment(
 # BACKLOG LIST FRAGMENT - SYNCED v3.0.0 with Salesperson module
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_list_fragment(
     backlog_df: pd.DataFrame,
     filter_values: Dict = None,
@@ -566,7 +567,7 @@ def backlog_list_fragment(
 # FIX v3.0.1: Use backlog_detail_df and aggregate in fragment to fix filter bug
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_by_etd_fragment(
     backlog_detail_df: pd.DataFrame,
     current_year: int = None,
@@ -834,7 +835,7 @@ def backlog_by_etd_fragment(
 # BACKLOG RISK ANALYSIS FRAGMENT - NEW v3.0.0 (synced with Salesperson)
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_risk_analysis_fragment(
     backlog_df: pd.DataFrame,
     fragment_key: str = "kpc_backlog_risk"
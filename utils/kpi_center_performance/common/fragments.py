@@ -34,10 +34,29 @@ def clean_dataframe_for_display(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def prepare_monthly_summary(sales_df: pd.DataFrame, debug_label: str = "") -> pd.DataFrame:
-    """Prepare monthly summary from sales data."""
+def prepare_monthly_summary(
+    sales_df: pd.DataFrame,
+    debug_label: str = "",
+    monthly_cube=None
+) -> pd.DataFrame:
+    """
+    Prepare monthly summary from sales data.
+    
+    If monthly_cube (a sliced utils.monthly_cube.MonthlyCube) is given, the
+    summary is read from it and sales_df is not re-grouped.
+    """
     from ..constants import MONTH_ORDER
     
+    if monthly_cube is not None:
+        if monthly_cube.is_empty:
+            return pd.DataFrame()
+        monthly = monthly_cube.monthly_summary(fill_all_months=False)
+        monthly['gp_percent'] = monthly['gp_percent'].round(1)
+        return monthly[[
+            'month', 'revenue', 'gross_profit', 'gp1', 'orders', 'customers',
+            'gp_percent', 'month_order'
+        ]]
+    
     if sales_df.empty:
         return pd.DataFrame()
     
@@ -2,9 +2,18 @@
 """
 Unified Data Loader for KPI Center Performance
 
-VERSION: 4.1.0
+VERSION: 4.5.0
 
 CHANGELOG:
+- v4.5.0: Raw dataset loads are utils.perf spans (nested SQL, telemetry)
+          instead of DEBUG_TIMING prints
+- v4.4.0: Raw dataset loaders are single-flight (utils.single_flight)
+  - Sessions loading the same dataset at the same time share one query
+- v4.3.0: payment_raw_df carries AR snapshot columns (utils.ar_snapshot)
+  - Status codes, line keys and aging buckets computed once per load
+- v4.2.0: Build pre-aggregated MonthlyCube (utils.monthly_cube) once per load
+  - Stored as unified_cache['monthly_cube']; DataProcessor slices it per filter
+  - Monthly trend / YoY / multi-year charts no longer re-group sales lines
 - v4.1.0: Dynamic Loading for Custom periods
   - Added custom_start_date parameter to get_unified_data()
   - Extended _needs_reload() to check if custom date requires reload
@@ -31,6 +40,10 @@ import pandas as pd
 import streamlit as st
 from sqlalchemy import text
 
+from utils.monthly_cube import MonthlyCube, KPI_CENTER_CUBE
+from utils.ar_snapshot import build_ar_snapshot
+from utils.single_flight import single_flight
+from utils.perf import perf, PC
 from .constants import (
     LOOKBACK_YEARS,
     MIN_DATA_YEAR,
@@ -67,15 +80,12 @@ class UnifiedDataLoader:
             access_control: AccessControl instance for permission checks
         """
         self.access = access_control
-        self._engine = None
     
     @property
     def engine(self):
-        """Lazy load database engine."""
-        if self._engine is None:
-            from utils.db import get_db_engine
-            self._engine = get_db_engine()
-        return self._engine
+        """Read replica engine, resolved per query (read-your-writes routing)."""
+        from utils.db import get_read_engine
+        return get_read_engine()
     
     # =========================================================================
     # MAIN ENTRY POINT
@@ -187,6 +197,7 @@ class UnifiedDataLoader:
             'hierarchy_df': pd.DataFrame(),
             'kpi_types_df': pd.DataFrame(),  # NEW v5.0.0: KPI Types with default_weight
             'payment_raw_df': pd.DataFrame(),  # NEW v6.1.1: Payment/AR data
+            'monthly_cube': None,  # NEW v4.2.0: Pre-aggregated monthly cube
             '_loaded_at': None,
             '_lookback_start': None,
             '_lookback_end': None,
@@ -252,51 +263,41 @@ class UnifiedDataLoader:
             # 1. SALES RAW DATA (largest dataset)
             # =====================================================================
             progress_bar.progress(10, text="📊 Loading sales data...")
-            start = time.perf_counter()
-            data['sales_raw_df'] = self._load_sales_raw(lookback_start)
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [sales_raw]: {elapsed:.3f}s → {len(data['sales_raw_df']):,} rows")
+            with perf.track("sales_raw", PC.SQL) as t:
+                data['sales_raw_df'] = self._load_sales_raw(lookback_start)
+                t.rows = len(data['sales_raw_df'])
             
             # =====================================================================
             # 2. BACKLOG RAW DATA
             # =====================================================================
             progress_bar.progress(40, text="📦 Loading backlog data...")
-            start = time.perf_counter()
-            data['backlog_raw_df'] = self._load_backlog_raw()
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [backlog_raw]: {elapsed:.3f}s → {len(data['backlog_raw_df']):,} rows")
+            with perf.track("backlog_raw", PC.SQL) as t:
+                data['backlog_raw_df'] = self._load_backlog_raw()
+                t.rows = len(data['backlog_raw_df'])
             
             # =====================================================================
             # 3. TARGETS RAW DATA
             # =====================================================================
             progress_bar.progress(70, text="🎯 Loading KPI targets...")
-            start = time.perf_counter()
-            data['targets_raw_df'] = self._load_targets_raw(target_years)
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [targets_raw]: {elapsed:.3f}s → {len(data['targets_raw_df']):,} rows")
+            with perf.track("targets_raw", PC.SQL) as t:
+                data['targets_raw_df'] = self._load_targets_raw(target_years)
+                t.rows = len(data['targets_raw_df'])
             
             # =====================================================================
             # 4. HIERARCHY DATA
             # =====================================================================
             progress_bar.progress(85, text="🏢 Loading hierarchy...")
-            start = time.perf_counter()
-            data['hierarchy_df'] = self._load_hierarchy()
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [hierarchy]: {elapsed:.3f}s → {len(data['hierarchy_df']):,} rows")
+            with perf.track("hierarchy", PC.SQL) as t:
+                data['hierarchy_df'] = self._load_hierarchy()
+                t.rows = len(data['hierarchy_df'])
             
             # =====================================================================
             # 5. KPI TYPES DATA - NEW v5.0.0 for default_weight
             # =====================================================================
             progress_bar.progress(80, text="⚖️ Loading KPI types...")
-            start = time.perf_counter()
-            data['kpi_types_df'] = self._load_kpi_types()
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [kpi_types]: {elapsed:.3f}s → {len(data['kpi_types_df']):,} rows")
+            with perf.track("kpi_types", PC.SQL) as t:
+                data['kpi_types_df'] = self._load_kpi_types()
+                t.rows = len(data['kpi_types_df'])
             
             # =====================================================================
             # 6. PAYMENT RAW DATA — NEW v6.1.1
@@ -304,11 +305,12 @@ class UnifiedDataLoader:
             # Replaces 2 × ~90s queries with 1 × ~5s cached load
             # =====================================================================
             progress_bar.progress(85, text="💰 Loading payment data...")
-            start = time.perf_counter()
-            data['payment_raw_df'] = self._load_payment_raw()
-            elapsed = time.perf_counter() - start
-            if DEBUG_TIMING:
-                print(f"   📊 SQL [payment_raw]: {elapsed:.3f}s → {len(data['payment_raw_df']):,} rows")
+            with perf.track("payment_raw", PC.SQL) as t:
+                data['payment_raw_df'] = self._load_payment_raw()
+                t.rows = len(data['payment_raw_df'])
+            
+            with perf.track("ar_snapshot", PC.PANDAS, rows=len(data['payment_raw_df'])):
+                data['payment_raw_df'] = build_ar_snapshot(data['payment_raw_df'])
             
             progress_bar.progress(100, text="✅ Data loaded successfully!")
             
@@ -318,6 +320,13 @@ class UnifiedDataLoader:
             _time.sleep(0.3)
             progress_bar.empty()
         
+        # =====================================================================
+        # MONTHLY CUBE — NEW v4.2.0 (Pandas, built once per load)
+        # =====================================================================
+        with perf.track("monthly_cube", PC.PANDAS) as t:
+            data['monthly_cube'] = MonthlyCube.build(data['sales_raw_df'], KPI_CENTER_CUBE)
+            t.rows = len(data['monthly_cube'].cells)
+        
         # =====================================================================
         # METADATA
         # =====================================================================
@@ -347,6 +356,7 @@ class UnifiedDataLoader:
         
         return data
     
+    @single_flight('kpi_center.sales_raw')
     def _load_sales_raw(self, lookback_start: date) -> pd.DataFrame:
         """
         Load all sales data from lookback_start.
@@ -417,6 +427,7 @@ class UnifiedDataLoader:
             logger.error(f"Error loading sales_raw: {e}")
             return pd.DataFrame()
     
+    @single_flight('kpi_center.backlog_raw')
     def _load_backlog_raw(self) -> pd.DataFrame:
         """
         Load all pending backlog orders.
@@ -479,6 +490,7 @@ class UnifiedDataLoader:
             logger.error(f"Error loading backlog_raw: {e}")
             return pd.DataFrame()
     
+    @single_flight('kpi_center.targets_raw')
     def _load_targets_raw(self, years: List[int]) -> pd.DataFrame:
         """
         Load all KPI targets for specified years.
@@ -519,6 +531,7 @@ class UnifiedDataLoader:
             logger.error(f"Error loading targets_raw: {e}")
             return pd.DataFrame()
     
+    @single_flight('kpi_center.hierarchy')
     def _load_hierarchy(self) -> pd.DataFrame:
         """
         Load KPI Center hierarchy with calculated levels.
@@ -595,6 +608,7 @@ class UnifiedDataLoader:
             logger.error(f"Error loading hierarchy: {e}")
             return pd.DataFrame()
     
+    @single_flight('kpi_center.kpi_types')
     def _load_kpi_types(self) -> pd.DataFrame:
         """
         Load KPI Types with default_weight for rollup calculations.
@@ -624,6 +638,7 @@ class UnifiedDataLoader:
             logger.error(f"Error loading kpi_types: {e}")
             return pd.DataFrame()
     
+    @single_flight('kpi_center.payment_raw')
     def _load_payment_raw(self) -> pd.DataFrame:
         """
         Load ALL payment/AR data from customer_ar_by_kpi_center_view.
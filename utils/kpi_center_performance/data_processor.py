@@ -2,8 +2,12 @@
 """
 Data Processor for KPI Center Performance
 
-VERSION: 4.0.1
+VERSION: 4.1.0
 CHANGELOG:
+- v4.1.0: Monthly summary served from pre-aggregated MonthlyCube
+  - process() returns 'monthly_cube' sliced with the same filters as sales_df
+    (None when the date range is not month-aligned)
+  - prepare_monthly_summary() accepts monthly_cube to skip the line-level groupby
 - v4.0.1: BUGFIX - In-Period Backlog date range
   - Fixed: Use period boundary for backlog ETD filter (not filter date range)
   - YTD: ETD in Jan 1 - Dec 31 (full year)
@@ -58,6 +62,7 @@ class DataProcessor:
         self.targets_raw = unified_cache.get('targets_raw_df', pd.DataFrame())
         self.hierarchy = unified_cache.get('hierarchy_df', pd.DataFrame())
         self._lookback_start = unified_cache.get('_lookback_start')
+        self.monthly_cube = unified_cache.get('monthly_cube')
         
         # Pre-convert date columns for faster filtering
         self._prepare_dataframes()
@@ -210,6 +215,16 @@ class DataProcessor:
         if DEBUG_TIMING:
             print(f"   📊 [filter_sales] {time.perf_counter()-t:.3f}s → {len(result['sales_df']):,} rows")
         
+        # Same filters on the pre-aggregated monthly cube (v4.1.0)
+        result['monthly_cube'] = self._slice_monthly_cube(
+            start_date=start_date,
+            end_date=end_date,
+            kpi_center_ids=kpi_center_ids,
+            entity_ids=entity_ids,
+            kpi_type=kpi_type,
+            exclude_internal=exclude_internal
+        )
+        
         # =====================================================================
         # 2. FILTER TARGETS
         # =====================================================================
@@ -344,6 +359,35 @@ class DataProcessor:
         
         return df
     
+    def _slice_monthly_cube(
+        self,
+        start_date: date,
+        end_date: date,
+        kpi_center_ids: List[int],
+        entity_ids: List[int],
+        kpi_type: str,
+        exclude_internal: bool
+    ):
+        """
+        Slice the cached MonthlyCube with the _filter_sales() criteria.
+        
+        Returns:
+            Sliced MonthlyCube, or None if no cube / range not month-aligned
+        """
+        if self.monthly_cube is None:
+            return None
+        
+        return self.monthly_cube.slice(
+            start_date=start_date,
+            end_date=end_date,
+            filters={
+                'kpi_center_id': kpi_center_ids,
+                'legal_entity_id': entity_ids,
+                'kpi_type': [kpi_type] if kpi_type else None,
+            },
+            exclude_internal_revenue=exclude_internal
+        )
+    
     def _filter_targets(
         self,
         year: int,
@@ -615,17 +659,32 @@ class DataProcessor:
         
         return entities.sort_values('entity_name').reset_index(drop=True)
     
-    def prepare_monthly_summary(self, sales_df: pd.DataFrame = None) -> pd.DataFrame:
+    def prepare_monthly_summary(
+        self,
+        sales_df: pd.DataFrame = None,
+        monthly_cube=None
+    ) -> pd.DataFrame:
         """
         Prepare monthly summary from sales data.
         
         Args:
             sales_df: Filtered sales DataFrame (if None, uses full sales_raw)
+            monthly_cube: Optional sliced MonthlyCube (from process()); when
+                          given, sales_df is not re-grouped
             
         Returns:
             Monthly summary DataFrame with columns:
             - month, revenue, gross_profit, gp1, orders, customers, gp_percent
         """
+        if monthly_cube is not None:
+            if monthly_cube.is_empty:
+                return pd.DataFrame()
+            monthly = monthly_cube.monthly_summary(fill_all_months=False)
+            monthly['gp_percent'] = monthly['gp_percent'].round(1)
+            return monthly[[
+                'month', 'revenue', 'gross_profit', 'gp1', 'orders', 'customers', 'gp_percent'
+            ]].reset_index(drop=True)
+        
         df = sales_df if sales_df is not None else self.sales_raw
         
         if df.empty:
@@ -644,7 +703,7 @@ class DataProcessor:
             'sales_by_kpi_center_usd': 'sum',
             'gross_profit_by_kpi_center_usd': 'sum',
             'gp1_by_kpi_center_usd': 'sum',
-            'oc_number': pd.Series.nunique,
+            'inv_number': pd.Series.nunique,
             'customer_id': pd.Series.nunique
         }).reset_index()
         
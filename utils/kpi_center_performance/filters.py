@@ -33,6 +33,8 @@ import pandas as pd
 import streamlit as st
 from sqlalchemy import text
 
+from utils.db import invalidate_query_cache
+
 from .constants import PERIOD_TYPES, MONTH_ORDER
 from .access_control import AccessControl
 
@@ -846,8 +848,9 @@ def clear_data_cache():
         if key in st.session_state:
             del st.session_state[key]
     
-    # Also clear st.cache_data
+    # Also clear st.cache_data and the central query result cache
     st.cache_data.clear()
+    invalidate_query_cache()
     logger.info("Data cache cleared (v4.0.0 unified + legacy keys)")
 
 
@@ -26,6 +26,7 @@ from typing import Dict, Optional
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from ..common.fragments import format_currency, get_rank_display
 
 logger = logging.getLogger(__name__)
@@ -174,7 +175,7 @@ def build_hierarchy_groups(
 # KPI ASSIGNMENTS FRAGMENT (My KPIs Tab) - UPDATED v3.2.0
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def kpi_assignments_fragment(
     rollup_targets: Dict,
     hierarchy_df: pd.DataFrame = None,
@@ -364,7 +365,7 @@ ALL (no Revenue) → continue down
 # KPI PROGRESS FRAGMENT (Progress Tab) - UPDATED v5.3.0
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def kpi_progress_fragment(
     progress_data: Dict,
     hierarchy_df: pd.DataFrame = None,
@@ -625,7 +626,7 @@ For **EACH KPI type**, traverse hierarchy:
 # KPI CENTER RANKING FRAGMENT - UPDATED v5.3.0
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def kpi_center_ranking_fragment(
     ranking_df: pd.DataFrame,
     progress_data: Dict = None,
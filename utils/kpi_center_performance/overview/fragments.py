@@ -10,6 +10,7 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     render_kpi_cards,
     build_monthly_trend_dual_chart,
@@ -33,17 +34,20 @@ logger = logging.getLogger(__name__)
 # MONTHLY TREND FRAGMENT - UPDATED v2.4.0 to match SP page
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def monthly_trend_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
     targets_df: pd.DataFrame = None,
-    fragment_key: str = "kpc_trend"
+    fragment_key: str = "kpc_trend",
+    monthly_cube=None
 ):
     """
     Monthly trend chart with Customer/Brand/Product Excl filters.
     SYNCED with Salesperson page (Image 1 & 2).
     
+    monthly_cube: sliced MonthlyCube — used when no local filter is active.
+    
     Shows:
     - Monthly Trend: Revenue + GP bars with GP% line
     - Cumulative Performance: Cumulative Revenue + GP lines
@@ -157,7 +161,15 @@ def monthly_trend_fragment(
     # PREPARE MONTHLY DATA
     # =========================================================================
     
-    monthly_df = prepare_monthly_summary(filtered_df)
+    no_local_filter = (
+        selected_customer == 'All customers...' and
+        selected_brand == 'All brands...' and
+        selected_product == 'All products...'
+    )
+    monthly_df = prepare_monthly_summary(
+        filtered_df,
+        monthly_cube=monthly_cube if no_local_filter else None
+    )
     
     if monthly_df.empty:
         st.warning("Could not prepare monthly summary")
@@ -189,14 +201,15 @@ def monthly_trend_fragment(
 # YOY COMPARISON FRAGMENT - UPDATED v2.5.0 with Multi-Year support
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def yoy_comparison_fragment(
     queries,
     filter_values: Dict,
     current_year: int = None,
     sales_df: pd.DataFrame = None,
     raw_cached_data: dict = None,
-    fragment_key: str = "kpc_yoy"
+    fragment_key: str = "kpc_yoy",
+    monthly_cube=None
 ):
     """
     Year-over-Year / Multi-Year comparison with tabs and filters.
@@ -211,6 +224,9 @@ def yoy_comparison_fragment(
     - Summary metrics (yearly totals with YoY growth)
     - Monthly comparison charts
     - Cumulative performance charts
+    
+    Multi-year aggregates come from monthly_cube (sliced MonthlyCube) when
+    no local filter is active.
     """
     # Header with explanation
     col_header, col_help = st.columns([6, 1])
@@ -356,6 +372,12 @@ This section shows full previous year to visualize monthly patterns and seasonal
     entity_ids = filter_values.get('entity_ids', [])
     kpi_type = filter_values.get('kpi_type_filter')  # NEW: Add KPI type filter
     
+    no_local_filter = (
+        selected_customer == 'All customers...' and
+        selected_brand == 'All brands...' and
+        selected_product == 'All products...'
+    )
+    
     if len(unique_years) >= 2:
         # =================================================================
         # MULTI-YEAR COMPARISON (like Salesperson page)
@@ -363,28 +385,36 @@ This section shows full previous year to visualize monthly patterns and seasonal
         
         st.info(f"📆 Data spans {len(unique_years)} years: {', '.join(map(str, unique_years))}")
         
-        # Apply local filters
-        multi_year_df = apply_local_filters(sales_df)
-        
-        if multi_year_df.empty:
+        if monthly_cube is not None and no_local_filter:
+            # Pre-aggregated year × month (no line-level groupby)
+            monthly_by_year = monthly_cube.monthly_by_year()
+        else:
+            # Apply local filters
+            multi_year_df = apply_local_filters(sales_df)
+            
+            if multi_year_df.empty:
+                st.warning("No data matches the selected filters")
+                return
+            
+            # Ensure year column
+            multi_year_df['inv_date'] = pd.to_datetime(multi_year_df['inv_date'], errors='coerce')
+            multi_year_df['inv_year'] = multi_year_df['inv_date'].dt.year
+            multi_year_df['invoice_month'] = multi_year_df['inv_date'].dt.strftime('%b')
+            
+            # Aggregate by year and month
+            monthly_by_year = multi_year_df.groupby(['inv_year', 'invoice_month']).agg({
+                'sales_by_kpi_center_usd': 'sum',
+                'gross_profit_by_kpi_center_usd': 'sum',
+                'gp1_by_kpi_center_usd': 'sum' if 'gp1_by_kpi_center_usd' in multi_year_df.columns else 'first',
+                'inv_number': pd.Series.nunique
+            }).reset_index()
+            
+            monthly_by_year.columns = ['year', 'month', 'revenue', 'gross_profit', 'gp1', 'orders']
+        
+        if monthly_by_year.empty:
             st.warning("No data matches the selected filters")
             return
         
-        # Ensure year column
-        multi_year_df['inv_date'] = pd.to_datetime(multi_year_df['inv_date'], errors='coerce')
-        multi_year_df['inv_year'] = multi_year_df['inv_date'].dt.year
-        multi_year_df['invoice_month'] = multi_year_df['inv_date'].dt.strftime('%b')
-        
-        # Aggregate by year and month
-        monthly_by_year = multi_year_df.groupby(['inv_year', 'invoice_month']).agg({
-            'sales_by_kpi_center_usd': 'sum',
-            'gross_profit_by_kpi_center_usd': 'sum',
-            'gp1_by_kpi_center_usd': 'sum' if 'gp1_by_kpi_center_usd' in multi_year_df.columns else 'first',
-            'inv_number': pd.Series.nunique
-        }).reset_index()
-        
-        monthly_by_year.columns = ['year', 'month', 'revenue', 'gross_profit', 'gp1', 'orders']
-        
         # Add month order for sorting
         monthly_by_year['month_order'] = monthly_by_year['month'].map({m: i for i, m in enumerate(MONTH_ORDER)})
         monthly_by_year = monthly_by_year.sort_values(['year', 'month_order'])
@@ -589,7 +619,7 @@ This section shows full previous year to visualize monthly patterns and seasonal
 # EXPORT REPORT FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def export_report_fragment(
     metrics: Dict,
     complex_kpis: Dict,
@@ -943,7 +973,8 @@ def overview_tab_fragment(
         sales_df=sales_df,
         filter_values=active_filters,
         targets_df=targets_df,
-        fragment_key="kpc_trend"
+        fragment_key="kpc_trend",
+        monthly_cube=data.get('monthly_cube')
     )
     
     st.divider()
@@ -958,7 +989,8 @@ def overview_tab_fragment(
             current_year=active_filters['year'],
             sales_df=sales_df,
             raw_cached_data=unified_cache,
-            fragment_key="kpc_yoy"
+            fragment_key="kpc_yoy",
+            monthly_cube=data.get('monthly_cube')
         )
         
         st.divider()
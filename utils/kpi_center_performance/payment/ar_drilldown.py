@@ -8,7 +8,10 @@ Levels:
   Level 1: KPI Center Summary + Top Customers Overview
   (Invoice detail with click-to-select handled by fragments.py)
 
-VERSION: 1.0.0
+v1.1.0: Invoice documents rendered via utils.doc_links.render_doc_list
+        (one cached signing batch per list; long lists sign on click)
+
+VERSION: 1.1.0
 """
 
 import logging
@@ -27,6 +30,7 @@ from .payment_analysis import (
     ACTUAL_REVENUE_COL,
     _fmt_currency,
 )
+from utils.doc_links import render_doc_list
 
 logger = logging.getLogger(__name__)
 
@@ -53,11 +57,6 @@ def _fmt_days(d) -> str:
     return "due today"
 
 
-def _get_file_icon(filename: str) -> str:
-    ext = filename.split('.')[-1].lower() if '.' in filename else ''
-    return {'pdf': '📄', 'png': '🖼️', 'jpg': '🖼️', 'jpeg': '🖼️'}.get(ext, '📎')
-
-
 # =============================================================================
 # AR SUMMARY SECTION (for combined Invoice Detail tab)
 # =============================================================================
@@ -277,39 +276,5 @@ def _render_invoice_documents(
         st.caption("No documents attached to this invoice")
         return
 
-    inv_docs = docs_df[docs_df['doc_type'] == 'invoice'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-    pmt_docs = docs_df[docs_df['doc_type'] == 'payment'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-
-    if not inv_docs.empty:
-        st.markdown(f"**📄 Invoice Documents** ({len(inv_docs)})")
-        for _, doc in inv_docs.iterrows():
-            _render_doc_link(doc, s3_url_generator)
-
-    if not pmt_docs.empty:
-        st.markdown(f"**💳 Payment Receipts** ({len(pmt_docs)})")
-        for _, doc in pmt_docs.iterrows():
-            pmt_label = f" ({doc['payment_number']})" if pd.notna(doc.get('payment_number')) else ""
-            _render_doc_link(doc, s3_url_generator, extra_label=pmt_label)
-
-    if inv_docs.empty and pmt_docs.empty:
-        st.markdown("**📎 Documents**")
-        for _, doc in docs_df.iterrows():
-            _render_doc_link(doc, s3_url_generator)
-
-
-def _render_doc_link(doc: pd.Series, s3_url_generator: Callable = None, extra_label: str = ""):
-    filename = doc.get('filename', 'Unknown')
-    s3_key = doc.get('s3_key', '')
-    icon = _get_file_icon(filename)
-    inv_num = doc.get('invoice_number', '')
-
-    if s3_url_generator and s3_key:
-        try:
-            url = s3_url_generator(s3_key)
-            if url:
-                st.markdown(f"{icon} [{filename}]({url}){extra_label} — {inv_num}")
-                return
-        except Exception as e:
-            logger.warning(f"Failed to generate URL for {s3_key}: {e}")
-
-    st.caption(f"{icon} {filename}{extra_label} — {inv_num} (S3: {s3_key})")
\ No newline at end of file
+    # All links signed in one cached batch (lazy above LAZY_THRESHOLD docs)
+    render_doc_list(docs_df, s3_url_generator, key_prefix=f"{fragment_key}_{inv_number}")
@@ -11,7 +11,11 @@ DATA SOURCE:
     - Split by KPI Center (split_rate_percent)
     - All amounts derived from actual payment records (customer_payment_details)
 
-VERSION: 1.0.0
+VERSION: 1.1.0
+CHANGELOG:
+- v1.1.0: Reads AR snapshot columns built once per load (utils.ar_snapshot)
+          - _status: categorical codes instead of row-wise .apply()
+          - _calculate_aging() delegates to ar_snapshot.aging_table()
 """
 
 import logging
@@ -22,6 +26,12 @@ import numpy as np
 import streamlit as st
 import altair as alt
 
+from utils.ar_snapshot import (
+    normalize_status,
+    status_codes,
+    aging_table,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,22 +55,6 @@ LINE_OUTSTANDING_COL = 'line_outstanding_usd'
 LINE_COLLECTED_COL = 'line_collected_usd'
 ACTUAL_REVENUE_COL = 'calculated_invoiced_amount_usd'
 
-# Aging buckets based on days PAST DUE
-AGING_BUCKETS_OVERDUE = [
-    ('Not Yet Due', -999999, -1),
-    ('0-30 days overdue', 0, 30),
-    ('31-60 days overdue', 31, 60),
-    ('61-90 days overdue', 61, 90),
-    ('90+ days overdue', 91, 999999),
-]
-
-AGING_BUCKETS_BY_INV_DATE = [
-    ('Current (0-30)', 0, 30),
-    ('31-60 days', 31, 60),
-    ('61-90 days', 61, 90),
-    ('90+ days', 91, 999999),
-]
-
 # Alert thresholds
 OVERDUE_90_THRESHOLD_USD = 10000
 COLLECTION_RATE_LOW = 0.70
@@ -93,16 +87,7 @@ def _fmt_currency(value: float) -> str:
 
 
 def _normalize_status(val) -> str:
-    if pd.isna(val):
-        return 'unknown'
-    s = str(val).strip().lower()
-    if 'fully' in s or s == 'paid':
-        return 'fully_paid'
-    elif 'partial' in s:
-        return 'partially_paid'
-    elif 'unpaid' in s or 'open' in s or 'pending' in s:
-        return 'unpaid'
-    return 'unknown'
+    return normalize_status(val)
 
 
 # =============================================================================
@@ -143,7 +128,8 @@ def analyze_payments(
     if 'due_date' in df.columns:
         df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
 
-    df['_status'] = df['payment_status'].apply(_normalize_status)
+    if '_status' not in df.columns:
+        df['_status'] = status_codes(df['payment_status'])
 
     # Pre-calculated vs fallback
     has_precalc = PRECALC_OUTSTANDING_COL in df.columns
@@ -172,7 +158,7 @@ def analyze_payments(
 
     has_inv_number = 'inv_number' in df.columns
     if has_inv_number:
-        inv_status = df.groupby('inv_number')['_status'].first()
+        inv_status = df.groupby('inv_number', sort=False)['_status'].first()
         fully_paid_invoices = (inv_status == 'fully_paid').sum()
         partial_invoices = (inv_status == 'partially_paid').sum()
         unpaid_invoices = (inv_status == 'unpaid').sum()
@@ -183,7 +169,7 @@ def analyze_payments(
         unpaid_invoices = (df['_status'] == 'unpaid').sum()
         total_invoices = len(df)
 
-    status_rev = df.groupby('_status').agg(
+    status_rev = df.groupby('_status', observed=True).agg(
         invoiced=(REV_COL, 'sum'),
         collected=('_collected_usd', 'sum'),
         outstanding=('_outstanding_usd', 'sum'),
@@ -238,74 +224,7 @@ def analyze_payments(
 
 def _calculate_aging(outstanding_df: pd.DataFrame, today: date) -> pd.DataFrame:
     """Calculate aging buckets. Uses pre-calculated aging_bucket if available."""
-    if outstanding_df.empty:
-        return pd.DataFrame(columns=['bucket', 'amount', 'gp', 'count', 'share'])
-
-    df = outstanding_df.copy()
-    today_ts = pd.Timestamp(today)
-    total_outstanding = df['_outstanding_usd'].sum()
-
-    # FAST PATH: pre-calculated aging_bucket from AR view
-    if PRECALC_AGING_BUCKET_COL in df.columns and df[PRECALC_AGING_BUCKET_COL].notna().any():
-        agg_dict = {
-            'amount': ('_outstanding_usd', 'sum'),
-            'count': ('_outstanding_usd', 'count'),
-        }
-        if '_outstanding_gp' in df.columns:
-            agg_dict['gp'] = ('_outstanding_gp', 'sum')
-
-        result = df.groupby(PRECALC_AGING_BUCKET_COL).agg(**agg_dict).reset_index()
-        result.rename(columns={PRECALC_AGING_BUCKET_COL: 'bucket'}, inplace=True)
-
-        if 'gp' not in result.columns:
-            result['gp'] = 0
-
-        result['share'] = np.where(total_outstanding > 0, result['amount'] / total_outstanding, 0)
-
-        bucket_order = {
-            'Not Yet Due': (-999999, -1),
-            'No Due Date': (-999998, -1),
-            '1-30 days overdue': (1, 30),
-            '31-60 days overdue': (31, 60),
-            '61-90 days overdue': (61, 90),
-            '90+ days overdue': (91, 999999),
-        }
-        result['_order'] = result['bucket'].map({k: i for i, k in enumerate(bucket_order.keys())}).fillna(99)
-        result['min_days'] = result['bucket'].map(lambda b: bucket_order.get(b, (0, 0))[0])
-        result['max_days'] = result['bucket'].map(lambda b: bucket_order.get(b, (0, 0))[1])
-        result = result.sort_values('_order').drop(columns=['_order'])
-        result = result[result['amount'] > 0.01].reset_index(drop=True)
-        result.attrs['aging_mode'] = 'overdue'
-        return result
-
-    # FALLBACK: calculate from dates
-    has_due_date = 'due_date' in df.columns and df['due_date'].notna().any()
-    if has_due_date:
-        df['_aging_days'] = (today_ts - df['due_date']).dt.days
-        buckets = AGING_BUCKETS_OVERDUE
-        aging_mode = 'overdue'
-    else:
-        df['_aging_days'] = (today_ts - df['inv_date']).dt.days.clip(lower=0)
-        buckets = AGING_BUCKETS_BY_INV_DATE
-        aging_mode = 'invoice_age'
-
-    rows = []
-    for bucket_name, min_d, max_d in buckets:
-        mask = (df['_aging_days'] >= min_d) & (df['_aging_days'] <= max_d)
-        bucket_df = df[mask]
-        amount = bucket_df['_outstanding_usd'].sum()
-        gp = bucket_df['_outstanding_gp'].sum() if '_outstanding_gp' in bucket_df.columns else 0
-        count = len(bucket_df)
-        share = (amount / total_outstanding) if total_outstanding > 0 else 0
-        rows.append({
-            'bucket': bucket_name, 'min_days': min_d, 'max_days': max_d,
-            'amount': amount, 'gp': gp, 'count': count, 'share': share,
-        })
-
-    result = pd.DataFrame(rows)
-    result = result[result['amount'] > 0.01].reset_index(drop=True)
-    result.attrs['aging_mode'] = aging_mode
-    return result
+    return aging_table(outstanding_df, today)
 
 
 # =============================================================================
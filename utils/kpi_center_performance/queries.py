@@ -12,7 +12,7 @@ import pandas as pd
 import streamlit as st
 from sqlalchemy import text
 
-from utils.db import get_db_engine
+from utils.db import cached_query, get_read_engine
 from .constants import LOOKBACK_YEARS, CACHE_TTL_SECONDS, DEBUG_QUERY_TIMING
 from .access_control import AccessControl
 
@@ -39,14 +39,11 @@ class KPICenterQueries:
             access_control: AccessControl instance for filtering
         """
         self.access = access_control
-        self._engine = None
     
     @property
     def engine(self):
-        """Lazy load database engine."""
-        if self._engine is None:
-            self._engine = get_db_engine()
-        return self._engine
+        """Read replica engine, resolved per query (read-your-writes routing)."""
+        return get_read_engine()
     
     # =========================================================================
     # KPI CENTER HIERARCHY HELPERS
@@ -645,6 +642,7 @@ class KPICenterQueries:
     # HELPER METHODS
     # =========================================================================
     
+    @cached_query()
     def _execute_query(
         self, 
         query: str, 
@@ -14,6 +14,7 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from ..constants import MONTH_ORDER
 from ..common.fragments import format_product_display, format_oc_po
 
@@ -33,7 +34,7 @@ logger = logging.getLogger(__name__)
 # TAB-LEVEL FRAGMENT - v4.2.0
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def sales_detail_tab_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
@@ -169,7 +170,7 @@ def sales_detail_tab_fragment(
 # SALES DETAIL FRAGMENT - REFACTORED v2.6.0 (SYNCED with Salesperson)
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def sales_detail_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
@@ -462,7 +463,7 @@ def sales_detail_fragment(
 # PIVOT ANALYSIS FRAGMENT - UPDATED v2.6.0 (SYNCED with Salesperson)
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def pivot_analysis_fragment(
     sales_df: pd.DataFrame,
     fragment_key: str = "kpc_pivot"
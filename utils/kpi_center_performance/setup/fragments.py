@@ -2,6 +2,7 @@
 """
 UI Fragments for Setup Tab - KPI Center Performance
 
+v2.13.0: Tab badge stats and split-rule dropdowns load concurrently (utils.async_db)
 v2.12.0: Converted KPI Assignments and Hierarchy CRUD to dialog fashion
 v2.10.0: Integrated with permissions.py for granular CRUD control
 """
@@ -11,7 +12,9 @@ import pandas as pd
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from utils.perf import traced_fragment
 from .queries import SetupQueries
+from utils.async_db import call_all
 
 # v2.10.0: Permission system
 from ..permissions import SetupPermissions, get_permissions
@@ -48,6 +51,11 @@ KPI_ICONS = {
 # HELPER FUNCTIONS - Consistent with main page formatting
 # =============================================================================
 
+def _frame_or_empty(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """call_all gives None for a loader that raised."""
+    return df if df is not None else pd.DataFrame()
+
+
 def format_currency(value: float, decimals: int = 0) -> str:
     """Format value as USD currency - same pattern as main page."""
     if pd.isna(value) or value == 0:
@@ -194,7 +202,7 @@ def is_approved_truthy(val) -> bool:
 # MAIN SETUP TAB FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def setup_tab_fragment(
     kpi_center_ids: List[int] = None,
     active_filters: Dict = None
@@ -247,10 +255,14 @@ def setup_tab_fragment(
     current_year = active_filters.get('year', date.today().year) if active_filters else date.today().year
     
     # Get issue counts for tab badges
-    split_stats = setup_queries.get_split_summary_stats()
+    badge_data = call_all({
+        'split_stats': setup_queries.get_split_summary_stats,
+        'assignment_issues': lambda: setup_queries.get_assignment_issues_summary(current_year),
+    })
+    split_stats = badge_data['split_stats'] or {}
     split_critical = split_stats.get('over_100_count', 0)
     
-    assignment_issues = setup_queries.get_assignment_issues_summary(current_year)
+    assignment_issues = badge_data['assignment_issues'] or {}
     assign_critical = assignment_issues.get('no_assignment_count', 0) + assignment_issues.get('weight_issues_count', 0)
     
     # Dynamic tab names with badges
@@ -1553,9 +1565,14 @@ def _add_split_rule_dialog():
     # =========================================================================
     # PRE-LOAD DROPDOWN DATA (before form, so data is available inside)
     # =========================================================================
-    customers_df = setup_queries.get_customers_for_dropdown()
-    products_df = setup_queries.get_products_for_dropdown()
-    centers_df = setup_queries.get_kpi_centers_for_dropdown()
+    dropdown_data = call_all({
+        'customers': setup_queries.get_customers_for_dropdown,
+        'products': setup_queries.get_products_for_dropdown,
+        'centers': setup_queries.get_kpi_centers_for_dropdown,
+    })
+    customers_df = _frame_or_empty(dropdown_data['customers'])
+    products_df = _frame_or_empty(dropdown_data['products'])
+    centers_df = _frame_or_empty(dropdown_data['centers'])
     
     def _format_product_option(row):
         name = row['product_name'] or ''
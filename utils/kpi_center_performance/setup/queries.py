@@ -17,7 +17,7 @@ from typing import List, Optional, Dict, Tuple, Any
 import pandas as pd
 from sqlalchemy import text
 
-from utils.db import get_db_engine
+from utils.db import get_db_engine, invalidates_query_cache
 
 logger = logging.getLogger(__name__)
 
@@ -1578,6 +1578,7 @@ class SetupQueries:
         
         return self._execute_insert(query, params, "create_split_rule")
     
+    @invalidates_query_cache()
     def create_split_rules_batch(
         self,
         rules: List[Dict],
@@ -3589,6 +3590,7 @@ class SetupQueries:
             logger.error(f"Error executing {query_name}: {e}")
             return pd.DataFrame()
     
+    @invalidates_query_cache()
     def _execute_insert(
         self,
         query: str,
@@ -3619,6 +3621,7 @@ class SetupQueries:
                 'message': str(e)
             }
     
+    @invalidates_query_cache()
     def _execute_update(
         self,
         query: str,
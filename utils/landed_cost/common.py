@@ -1,7 +1,10 @@
 """
-Landed Cost - Common Utilities (v3.0)
+Landed Cost - Common Utilities (v3.1)
 Formatting, chart builders, heatmap helpers, constants, and Excel export.
 Added: Landing charges analysis charts, cost decomposition, ratio heatmaps.
+v3.1: Cost distribution box plot ships precomputed quartiles instead of every
+      row; entity heatmap capped to HEATMAP_TOP_N + "Others"; heatmaps and
+      box plot record payload size (utils.chart_payload).
 """
 
 import logging
@@ -13,6 +16,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from utils.chart_payload import OTHERS_LABEL, record_payload, top_n_with_others
+
 logger = logging.getLogger(__name__)
 
 
@@ -220,14 +225,57 @@ def build_cost_distribution_chart(
     top_brands = data.groupby("brand")["total_landed_value_usd"].sum().nlargest(12).index
     data = data[data["brand"].isin(top_brands)]
 
-    fig = px.box(
-        data, x="brand", y="average_landed_cost_usd",
-        labels={"brand": "Brand", "average_landed_cost_usd": "Avg Cost (USD)"},
-        color_discrete_sequence=[LandedCostConstants.COST_COLOR],
-    )
+    # Precompute box statistics per brand — the figure carries 5 numbers per
+    # brand plus outliers instead of every product-year row.
+    stats, outliers = _box_stats(data, "brand", "average_landed_cost_usd")
+    if stats.empty:
+        return None
+
+    C = LandedCostConstants
+    fig = go.Figure()
+    fig.add_trace(go.Box(
+        x=stats["brand"],
+        q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+        lowerfence=stats["lowerfence"], upperfence=stats["upperfence"],
+        marker_color=C.COST_COLOR,
+        name="Avg Cost (USD)",
+        boxpoints=False,
+    ))
+    if not outliers.empty:
+        fig.add_trace(go.Scatter(
+            x=outliers["brand"], y=outliers["average_landed_cost_usd"],
+            mode="markers",
+            marker=dict(color=C.COST_COLOR, size=5),
+            name="Outliers",
+            hovertemplate="%{x}<br>Avg Cost: $%{y:.4f}<extra></extra>",
+        ))
     fig = _plotly_layout_defaults(fig, height=380)
+    fig.update_layout(showlegend=False)
     fig.update_xaxes(title_text="")
-    return fig
+    fig.update_yaxes(title_text="Avg Cost (USD)")
+    return record_payload("landed_cost.cost_distribution", fig)
+
+
+def _box_stats(df: pd.DataFrame, group_col: str, value_col: str):
+    """Tukey box statistics per group + the rows outside the 1.5×IQR fences."""
+    values = df[[group_col, value_col]].dropna()
+    if values.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    grouped = values.groupby(group_col, sort=True)[value_col]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    lo = stats["q1"] - 1.5 * iqr
+    hi = stats["q3"] + 1.5 * iqr
+
+    bounds = values[group_col].map(lo), values[group_col].map(hi)
+    is_outlier = (values[value_col] < bounds[0]) | (values[value_col] > bounds[1])
+    inliers = values[~is_outlier].groupby(group_col)[value_col]
+    stats["lowerfence"] = inliers.min().reindex(stats.index).fillna(stats["q1"])
+    stats["upperfence"] = inliers.max().reindex(stats.index).fillna(stats["q3"])
+
+    return stats.reset_index(), values[is_outlier]
 
 
 def build_source_breakdown_chart(df: pd.DataFrame) -> Optional[go.Figure]:
@@ -577,7 +625,7 @@ def build_brand_year_heatmap(df: pd.DataFrame) -> Optional[go.Figure]:
     h = max(400, len(avg_pivot) * 32 + 80)
     fig = _plotly_layout_defaults(fig, height=h)
     fig.update_layout(xaxis_title="Cost Year", yaxis_title="", showlegend=False)
-    return fig
+    return record_payload("landed_cost.brand_year_heatmap", fig)
 
 
 def build_entity_year_heatmap(df: pd.DataFrame) -> Optional[go.Figure]:
@@ -585,7 +633,14 @@ def build_entity_year_heatmap(df: pd.DataFrame) -> Optional[go.Figure]:
     if df.empty or df["legal_entity"].nunique() < 2 or df["cost_year"].nunique() < 2:
         return None
 
-    pivot = df.pivot_table(
+    # Cap rows like the brand heatmap; the tail is folded into "Others"
+    agg = df.groupby(["legal_entity", "cost_year"], as_index=False)["total_landed_value_usd"].sum()
+    keep = top_n_with_others(
+        agg, "legal_entity", "total_landed_value_usd", n=LandedCostConstants.HEATMAP_TOP_N
+    )["legal_entity"]
+    agg["legal_entity"] = agg["legal_entity"].where(agg["legal_entity"].isin(keep), OTHERS_LABEL)
+
+    pivot = agg.pivot_table(
         values="total_landed_value_usd", index="legal_entity",
         columns="cost_year", aggfunc="sum", fill_value=0,
     )
@@ -605,7 +660,7 @@ def build_entity_year_heatmap(df: pd.DataFrame) -> Optional[go.Figure]:
     h = max(300, len(pivot) * 40 + 80)
     fig = _plotly_layout_defaults(fig, height=h)
     fig.update_layout(xaxis_title="Cost Year", yaxis_title="", showlegend=False)
-    return fig
+    return record_payload("landed_cost.entity_year_heatmap", fig)
 
 
 # ================================================================
@@ -650,7 +705,7 @@ def build_landing_ratio_heatmap(
     h = max(350, len(pivot) * 32 + 80)
     fig = _plotly_layout_defaults(fig, height=h)
     fig.update_layout(xaxis_title="Cost Year", yaxis_title="", showlegend=False)
-    return fig
+    return record_payload(f"landed_cost.landing_ratio_heatmap.{index_col}", fig)
 
 
 # ================================================================
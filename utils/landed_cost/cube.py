@@ -0,0 +1,142 @@
+"""
+Landed Cost - In-memory Cube (v3.2)
+One cube per (entity set, year set), shared across sessions:
+
+  - cost       avg_landed_cost_looker_view rows        (Cost Lookup, export, history)
+  - breakdown  landed_cost_breakdown_view rows         (decomposition, detail dialog)
+  - arrivals   arrival lines aggregated by product × ship method × vendor
+               (landing by ship method / vendor country, vendor → product map)
+
+Every frame is wrapped in a ProductIndex: rows are kept in query order and the
+positions of each product_id are precomputed, so product / brand filters are
+array slices instead of an isin() scan per call. Frames are shared — treat
+them as read-only; slice() returns a copy.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+ARRIVAL_SUM_COLUMNS = [
+    "total_quantity",
+    "transaction_count",
+    "total_purchase_value_usd",
+    "total_landed_value_usd",
+    "total_international_charge_usd",
+    "total_local_charge_usd",
+    "total_import_tax_usd",
+]
+
+
+class ProductIndex:
+    """Read-only frame with a product_id → row positions index."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        if self.df.empty or "product_id" not in self.df.columns:
+            self._positions: Dict[int, np.ndarray] = {}
+        else:
+            self._positions = self.df.groupby("product_id", sort=False).indices
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def positions(self, product_ids: Optional[Iterable] = None) -> np.ndarray:
+        """Row positions for product_ids (in frame order); all rows when None."""
+        if product_ids is None:
+            return np.arange(len(self.df))
+        parts = [self._positions[pid] for pid in set(product_ids) if pid in self._positions]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(parts))
+
+    def slice(
+        self,
+        product_ids: Optional[Iterable] = None,
+        brand_list: Optional[Iterable] = None,
+        **equals,
+    ) -> pd.DataFrame:
+        """Copy of the rows matching product_ids, brand_list and column == value filters."""
+        if self.df.empty:
+            return self.df.copy()
+
+        pos = self.positions(product_ids)
+        if brand_list and len(pos):
+            brands = self.df["brand"].to_numpy()[pos]
+            pos = pos[pd.Series(brands).isin(list(brand_list)).to_numpy()]
+        for col, value in equals.items():
+            if len(pos):
+                pos = pos[self.df[col].to_numpy()[pos] == value]
+
+        return self.df.take(pos).reset_index(drop=True)
+
+
+class LandedCostCube:
+    """Cost, breakdown and arrival frames for one entity/year set."""
+
+    def __init__(self, cost_df: pd.DataFrame, breakdown_df: pd.DataFrame, arrivals_df: pd.DataFrame):
+        self.cost = ProductIndex(cost_df)
+        self.breakdown = ProductIndex(breakdown_df)
+        self.arrivals = ProductIndex(arrivals_df)
+
+        # vendor → product map (arrivals with a live PO and vendor)
+        if arrivals_df.empty:
+            self.vendor_products = pd.DataFrame(columns=["vendor_id", "vendor_country_id", "product_id"])
+        else:
+            self.vendor_products = (
+                arrivals_df.loc[arrivals_df["vendor_id"].notna(),
+                                ["vendor_id", "vendor_country_id", "product_id"]]
+                .drop_duplicates()
+                .reset_index(drop=True)
+            )
+
+        logger.info(
+            f"Landed cost cube: {len(self.cost)} cost rows, {len(self.breakdown)} breakdown rows, "
+            f"{len(self.arrivals)} arrival groups, {len(self.vendor_products)} vendor-product pairs"
+        )
+
+    def product_ids_by_vendor(
+        self,
+        vendor_country_ids: Optional[Iterable] = None,
+        vendor_ids: Optional[Iterable] = None,
+    ) -> List:
+        """Products with arrivals from the given vendors / vendor countries."""
+        mapping = self.vendor_products
+        if vendor_country_ids:
+            mapping = mapping[mapping["vendor_country_id"].isin(list(vendor_country_ids))]
+        if vendor_ids:
+            mapping = mapping[mapping["vendor_id"].isin(list(vendor_ids))]
+        return mapping["product_id"].drop_duplicates().tolist()
+
+    def landing_by(
+        self,
+        dimension: str,
+        product_ids: Optional[Iterable] = None,
+        brand_list: Optional[Iterable] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Re-aggregate arrival groups by dimension (ship_method / vendor_country)."""
+        columns = columns or ARRIVAL_SUM_COLUMNS
+        arr = self.arrivals.slice(product_ids, brand_list)
+        if arr.empty:
+            return pd.DataFrame(columns=[dimension] + columns)
+
+        df = (
+            arr.groupby(dimension, sort=False)[columns]
+            .sum(min_count=1)
+            .reset_index()
+        )
+        value_cols = [c for c in columns if c not in ("total_quantity", "transaction_count")]
+        df[value_cols] = df[value_cols].round(2)
+        df["transaction_count"] = df["transaction_count"].fillna(0).astype(int)
+        return df.sort_values("total_landed_value_usd", ascending=False,
+                              kind="stable").reset_index(drop=True)
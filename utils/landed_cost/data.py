@@ -1,6 +1,10 @@
 """
-Landed Cost - Data Layer (v3.0)
+Landed Cost - Data Layer (v3.2)
 Class-based data access for cost lookup, breakdown analysis, and drill-down.
+v3.2: Cost, breakdown and arrival-group frames are loaded once per
+      entity/year set into a shared LandedCostCube (utils.landed_cost.cube);
+      brand / product / vendor filters, ship-method and vendor-country
+      aggregates and the detail-dialog lookups are in-memory slices.
 
 Source views:
   - avg_landed_cost_looker_view  → main cost data (arrivals + OB)
@@ -16,6 +20,7 @@ import streamlit as st
 from sqlalchemy import text
 
 from utils.db import get_db_engine
+from utils.landed_cost.cube import LandedCostCube, ProductIndex
 
 logger = logging.getLogger(__name__)
 
@@ -162,13 +167,53 @@ class LandedCostData:
                     "products": pd.DataFrame(),
                     "vendor_countries": pd.DataFrame(), "vendors": pd.DataFrame()}
 
+    # ================================================================
+    # Landed Cost Cube (one load per entity/year set)
+    # ================================================================
+
+    @staticmethod
+    def _cube_key(entity_ids: tuple = None, year_list: tuple = None) -> tuple:
+        """Order-insensitive cache key — (1, 2) and (2, 1) share one cube."""
+        return (
+            tuple(sorted(entity_ids)) if entity_ids else None,
+            tuple(sorted(year_list)) if year_list else None,
+        )
+
+    def _cube(self, entity_ids: tuple = None, year_list: tuple = None) -> LandedCostCube:
+        return self._load_cube(*self._cube_key(entity_ids, year_list))
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop shared cubes (Refresh button) — st.cache_data.clear() does not reach them."""
+        cls._load_cube.clear()
+        cls._load_yoy_cube.clear()
+
+    @st.cache_resource(ttl=600, max_entries=16, show_spinner=False)
+    def _load_cube(
+        _self,
+        entity_ids: tuple = None,
+        year_list: tuple = None,
+    ) -> LandedCostCube:
+        """Cost, breakdown and arrival frames for an entity/year set.
+        Brand, product and vendor filters are applied in memory on the cube.
+        """
+        try:
+            with _self.engine.connect() as conn:
+                cost_df = _self._query_landed_cost(conn, entity_ids, year_list)
+                breakdown_df = _self._query_cost_breakdown(conn, entity_ids, year_list)
+                arrivals_df = _self._query_arrival_groups(conn, entity_ids, year_list)
+        except Exception as e:
+            logger.error(f"Error loading landed cost cube: {e}")
+            cost_df, breakdown_df, arrivals_df = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+        return LandedCostCube(cost_df, breakdown_df, arrivals_df)
+
     # ================================================================
     # Vendor-based Product ID Lookup (for pre-filtering)
     # ================================================================
 
-    @st.cache_data(ttl=600, show_spinner=False)
     def get_product_ids_by_vendor(
-        _self,
+        self,
         vendor_country_ids: tuple = None,
         vendor_ids: tuple = None,
         entity_ids: tuple = None,
@@ -176,117 +221,56 @@ class LandedCostData:
     ) -> list:
         """Get product_ids that have arrivals from specified vendors/countries.
         Used to pre-filter main queries when vendor/country filters are active.
+        Answered from the cube's precomputed vendor → product map.
         """
         if not vendor_country_ids and not vendor_ids:
             return []
 
-        try:
-            conditions = [
-                "a.delete_flag = 0",
-                "COALESCE(ad.delete_flag, 0) = 0",
-                "a.status <> 'REQUEST_STATUS'",
-                "ad.landed_cost > 0",
-                "ad.arrival_quantity > 0",
-            ]
-            params = {}
-
-            if vendor_country_ids:
-                cond, p = _self._build_in_clause(
-                    "vendor.country_id", list(vendor_country_ids), "vcid")
-                conditions.append(cond)
-                params.update(p)
-
-            if vendor_ids:
-                cond, p = _self._build_in_clause(
-                    "vendor.id", list(vendor_ids), "vid")
-                conditions.append(cond)
-                params.update(p)
-
-            if entity_ids:
-                cond, p = _self._build_in_clause(
-                    "a.receiver_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-
-            if year_list:
-                cond, p = _self._build_in_clause(
-                    "YEAR(COALESCE(a.adjust_arrival_date, a.arrival_date))",
-                    list(year_list), "year")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT DISTINCT ad.product_id
-                FROM arrival_details ad
-                INNER JOIN arrivals a ON ad.arrival_id = a.id
-                INNER JOIN product_purchase_orders ppo ON ad.product_purchase_order_id = ppo.id
-                INNER JOIN purchase_orders po ON ppo.purchase_order_id = po.id AND po.delete_flag = 0
-                INNER JOIN companies vendor ON po.seller_company_id = vendor.id
-                WHERE {where_clause}
-            """
-
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-
-            return df["product_id"].tolist() if not df.empty else []
-        except Exception as e:
-            logger.error(f"Error loading product IDs by vendor: {e}")
-            return []
+        return self._cube(entity_ids, year_list).product_ids_by_vendor(
+            vendor_country_ids=vendor_country_ids,
+            vendor_ids=vendor_ids,
+        )
 
     # ================================================================
     # Main Data Query (avg_landed_cost_looker_view — arrivals + OB)
     # ================================================================
 
-    @st.cache_data(ttl=600, show_spinner=False)
-    def _get_landed_cost_base(
-        _self,
+    def _query_landed_cost(
+        self,
+        conn,
         entity_ids: tuple = None,
-        brand_list: tuple = None,
         year_list: tuple = None,
     ) -> pd.DataFrame:
-        """Base query: landed cost data WITHOUT product filter (cached longer)."""
-        try:
-            conditions = ["1=1"]
-            params = {}
-
-            if entity_ids:
-                cond, p = _self._build_in_clause("entity_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-
-            if brand_list:
-                cond, p = _self._build_in_clause("brand", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
-
-            if year_list:
-                cond, p = _self._build_in_clause("cost_year", list(year_list), "year")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    cost_year, is_current_year, entity_id, legal_entity,
-                    product_id, pt_code, product_pn, brand, standard_uom,
-                    total_landed_value_usd, total_quantity,
-                    average_landed_cost_usd, min_landed_cost_usd, max_landed_cost_usd,
-                    earliest_source_date, latest_source_date, source_count,
-                    arrival_quantity, opening_balance_quantity, transaction_count
-                FROM avg_landed_cost_looker_view
-                WHERE {where_clause}
-                ORDER BY cost_year DESC, legal_entity, pt_code
-            """
+        """Base query: landed cost data WITHOUT product/brand filter."""
+        conditions = ["1=1"]
+        params = {}
+
+        if entity_ids:
+            cond, p = self._build_in_clause("entity_id", list(entity_ids), "eid")
+            conditions.append(cond)
+            params.update(p)
+
+        if year_list:
+            cond, p = self._build_in_clause("cost_year", list(year_list), "year")
+            conditions.append(cond)
+            params.update(p)
+
+        where_clause = " AND ".join(conditions)
+
+        query = f"""
+            SELECT
+                cost_year, is_current_year, entity_id, legal_entity,
+                product_id, pt_code, product_pn, brand, standard_uom,
+                total_landed_value_usd, total_quantity,
+                average_landed_cost_usd, min_landed_cost_usd, max_landed_cost_usd,
+                earliest_source_date, latest_source_date, source_count,
+                arrival_quantity, opening_balance_quantity, transaction_count
+            FROM avg_landed_cost_looker_view
+            WHERE {where_clause}
+            ORDER BY cost_year DESC, legal_entity, pt_code
+        """
 
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error loading landed cost base data: {e}")
-            return pd.DataFrame()
+        return pd.read_sql(text(query), conn, params=params)
 
     def get_landed_cost_data(
         self,
@@ -295,89 +279,76 @@ class LandedCostData:
         year_list: tuple = None,
         product_ids: tuple = None,
     ) -> pd.DataFrame:
-        """Fetch landed cost data - uses cached base, filters product in-memory."""
-        df = self._get_landed_cost_base(entity_ids, brand_list, year_list)
-        if product_ids and not df.empty:
-            df = df[df["product_id"].isin(product_ids)].reset_index(drop=True)
-        return df
+        """Fetch landed cost data - sliced from the entity/year cube."""
+        return self._cube(entity_ids, year_list).cost.slice(product_ids, brand_list)
 
     # ================================================================
     # Cost Breakdown Data (landed_cost_breakdown_view — arrivals only)
     # ================================================================
 
-    @st.cache_data(ttl=600, show_spinner=False)
-    def _get_cost_breakdown_base(
-        _self,
+    def _query_cost_breakdown(
+        self,
+        conn,
         entity_ids: tuple = None,
-        brand_list: tuple = None,
         year_list: tuple = None,
     ) -> pd.DataFrame:
-        """Base query: cost breakdown WITHOUT product filter (cached longer)."""
-        try:
-            conditions = ["1=1"]
-            params = {}
-
-            if entity_ids:
-                cond, p = _self._build_in_clause("entity_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-            if brand_list:
-                cond, p = _self._build_in_clause("brand", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
-            if year_list:
-                cond, p = _self._build_in_clause("cost_year", list(year_list), "year")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    cost_year, entity_id, legal_entity,
-                    product_id, pt_code, product_pn, brand, standard_uom,
-                    total_quantity, transaction_count,
-                    avg_purchase_cost_usd, total_purchase_value_usd,
-                    avg_landed_cost_usd, total_landed_value_usd,
-                    total_international_charge_usd,
-                    total_local_charge_usd,
-                    total_import_tax_usd,
-                    ship_methods, vendors, vendor_countries
-                FROM landed_cost_breakdown_view
-                WHERE {where_clause}
-                ORDER BY cost_year DESC, legal_entity, pt_code
-            """
-
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
+        """Base query: cost breakdown WITHOUT product/brand filter."""
+        conditions = ["1=1"]
+        params = {}
+
+        if entity_ids:
+            cond, p = self._build_in_clause("entity_id", list(entity_ids), "eid")
+            conditions.append(cond)
+            params.update(p)
+        if year_list:
+            cond, p = self._build_in_clause("cost_year", list(year_list), "year")
+            conditions.append(cond)
+            params.update(p)
+
+        where_clause = " AND ".join(conditions)
+
+        query = f"""
+            SELECT
+                cost_year, entity_id, legal_entity,
+                product_id, pt_code, product_pn, brand, standard_uom,
+                total_quantity, transaction_count,
+                avg_purchase_cost_usd, total_purchase_value_usd,
+                avg_landed_cost_usd, total_landed_value_usd,
+                total_international_charge_usd,
+                total_local_charge_usd,
+                total_import_tax_usd,
+                ship_methods, vendors, vendor_countries
+            FROM landed_cost_breakdown_view
+            WHERE {where_clause}
+            ORDER BY cost_year DESC, legal_entity, pt_code
+        """
 
-            if not df.empty:
-                df = _self._coerce_numeric(df, [
-                    "total_quantity", "transaction_count",
-                    "avg_purchase_cost_usd", "total_purchase_value_usd",
-                    "avg_landed_cost_usd", "total_landed_value_usd",
-                    "total_international_charge_usd",
-                    "total_local_charge_usd",
-                    "total_import_tax_usd",
-                ])
-
-                df["total_landing_charges_usd"] = (
-                    df["total_landed_value_usd"].fillna(0)
-                    - df["total_purchase_value_usd"].fillna(0)
-                )
-                df["avg_landing_charge_usd"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_quantity"].replace(0, float("nan"))
-                ).round(4)
-                df["landing_ratio_pct"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
-                ).round(2)
+        df = pd.read_sql(text(query), conn, params=params)
+
+        if not df.empty:
+            df = self._coerce_numeric(df, [
+                "total_quantity", "transaction_count",
+                "avg_purchase_cost_usd", "total_purchase_value_usd",
+                "avg_landed_cost_usd", "total_landed_value_usd",
+                "total_international_charge_usd",
+                "total_local_charge_usd",
+                "total_import_tax_usd",
+            ])
+
+            df["total_landing_charges_usd"] = (
+                df["total_landed_value_usd"].fillna(0)
+                - df["total_purchase_value_usd"].fillna(0)
+            )
+            df["avg_landing_charge_usd"] = (
+                df["total_landing_charges_usd"]
+                / df["total_quantity"].replace(0, float("nan"))
+            ).round(4)
+            df["landing_ratio_pct"] = (
+                df["total_landing_charges_usd"]
+                / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
+            ).round(2)
 
-            return df
-        except Exception as e:
-            logger.error(f"Error loading cost breakdown base data: {e}")
-            return pd.DataFrame()
+        return df
 
     def get_cost_breakdown_data(
         self,
@@ -386,314 +357,230 @@ class LandedCostData:
         year_list: tuple = None,
         product_ids: tuple = None,
     ) -> pd.DataFrame:
-        """Fetch cost breakdown - uses cached base, filters product in-memory."""
-        df = self._get_cost_breakdown_base(entity_ids, brand_list, year_list)
-        if product_ids and not df.empty:
-            df = df[df["product_id"].isin(product_ids)].reset_index(drop=True)
-        return df
+        """Fetch cost breakdown - sliced from the entity/year cube."""
+        return self._cube(entity_ids, year_list).breakdown.slice(product_ids, brand_list)
 
     # ================================================================
     # Cost Breakdown for a single product (detail dialog)
     # ================================================================
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def get_product_breakdown(
-        _self,
+        self,
         product_id: int,
         entity_id: int,
         cost_year: int,
     ) -> Optional[Dict[str, Any]]:
-        """Get cost breakdown for a single product/entity/year."""
-        try:
-            query = """
-                SELECT
-                    avg_purchase_cost_usd, total_purchase_value_usd,
-                    avg_landed_cost_usd, total_landed_value_usd,
-                    total_quantity,
-                    total_international_charge_usd,
-                    total_local_charge_usd,
-                    total_import_tax_usd,
-                    ship_methods, vendors, vendor_countries
-                FROM landed_cost_breakdown_view
-                WHERE product_id = :product_id
-                  AND entity_id = :entity_id
-                  AND cost_year = :cost_year
-            """
-            params = {
-                "product_id": product_id,
-                "entity_id": entity_id,
-                "cost_year": cost_year,
-            }
-            with _self.engine.connect() as conn:
-                result = conn.execute(text(query), params)
-                row = result.fetchone()
-
-            if row:
-                d = dict(zip(result.keys(), row))
-                purchase = d.get("total_purchase_value_usd") or 0
-                landed = d.get("total_landed_value_usd") or 0
-                qty = d.get("total_quantity") or 0
-                d["total_landing_charges_usd"] = landed - purchase
-                d["avg_landing_charge_usd"] = round((landed - purchase) / qty, 4) if qty else 0
-                d["landing_ratio_pct"] = round((landed - purchase) / purchase * 100, 2) if purchase else 0
-                return d
-            return None
-        except Exception as e:
-            logger.error(f"Error loading product breakdown: {e}")
+        """Get cost breakdown for a single product/entity/year.
+        Read from the entity's all-years cube (shared with the cost history).
+        """
+        rows = self._cube((entity_id,)).breakdown.slice([product_id], cost_year=cost_year)
+        if rows.empty:
             return None
 
+        d = {k: (None if pd.isna(v) else v) for k, v in rows.iloc[0].items()}
+        d["avg_landing_charge_usd"] = d["avg_landing_charge_usd"] or 0
+        d["landing_ratio_pct"] = d["landing_ratio_pct"] or 0
+        return d
+
     # ================================================================
-    # Landing Charges by Ship Method (Analytics)
+    # Landing Charges by Ship Method / Vendor Country (Analytics)
     # ================================================================
 
-    @st.cache_data(ttl=300, show_spinner=False)
-    def get_landing_by_ship_method(
-        _self,
+    def _query_arrival_groups(
+        self,
+        conn,
         entity_ids: tuple = None,
-        brand_list: tuple = None,
         year_list: tuple = None,
-        product_ids: tuple = None,
     ) -> pd.DataFrame:
-        """Aggregate landing charges by ship method."""
-        try:
-            conditions = ["a.delete_flag = 0", "a.status <> 'REQUEST_STATUS'",
-                          "COALESCE(ad.delete_flag, 0) = 0",
-                          "ad.landed_cost > 0", "ad.arrival_quantity > 0"]
-            params = {}
-
-            if entity_ids:
-                cond, p = _self._build_in_clause("a.receiver_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-            if brand_list:
-                cond, p = _self._build_in_clause("b.brand_name", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
-            if year_list:
-                cond, p = _self._build_in_clause(
-                    "YEAR(COALESCE(a.adjust_arrival_date, a.arrival_date))",
-                    list(year_list), "year")
-                conditions.append(cond)
-                params.update(p)
-            if product_ids:
-                cond, p = _self._build_in_clause("ad.product_id", list(product_ids), "pid")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    COALESCE(a.ship_method, 'Unknown') AS ship_method,
-                    SUM(ad.arrival_quantity) AS total_quantity,
-                    COUNT(ad.id) AS transaction_count,
-
-                    ROUND(SUM(
-                        ad.arrival_quantity * ppo.unit_cost
-                        / NULLIF(po.usd_exchange_rate, 0)
-                    ), 2) AS total_purchase_value_usd,
-
-                    ROUND(SUM(
-                        ad.arrival_quantity * ad.landed_cost
-                        / NULLIF(a.usd_landed_cost_currency_exchange_rate, 0)
-                    ), 2) AS total_landed_value_usd,
-
-                    ROUND(SUM(
-                        COALESCE(a.internal_charge, 0)
-                        / NULLIF(a.usd_international_cost_currency_exchange_rate, 0)
-                        * (ad.arrival_quantity / NULLIF(arr_t.total_arrival_qty, 0))
-                    ), 2) AS total_international_charge_usd,
-
-                    ROUND(SUM(
-                        COALESCE(a.local_charge, 0)
-                        / NULLIF(a.usd_local_cost_currency_exchange_rate, 0)
-                        * (ad.arrival_quantity / NULLIF(arr_t.total_arrival_qty, 0))
-                    ), 2) AS total_local_charge_usd,
-
-                    ROUND(SUM(
-                        COALESCE(ad.import_tax, 0)
-                        / NULLIF(a.usd_landed_cost_currency_exchange_rate, 0)
-                    ), 2) AS total_import_tax_usd
+        """Arrival lines summed per year × entity × product × ship method × vendor.
+        All measures are additive, so ship method / country views and the
+        vendor → product map are re-aggregated from this in memory.
+        """
+        conditions = ["a.delete_flag = 0", "a.status <> 'REQUEST_STATUS'",
+                      "COALESCE(ad.delete_flag, 0) = 0",
+                      "ad.landed_cost > 0", "ad.arrival_quantity > 0"]
+        params = {}
+
+        if entity_ids:
+            cond, p = self._build_in_clause("a.receiver_id", list(entity_ids), "eid")
+            conditions.append(cond)
+            params.update(p)
+        if year_list:
+            cond, p = self._build_in_clause(
+                "YEAR(COALESCE(a.adjust_arrival_date, a.arrival_date))",
+                list(year_list), "year")
+            conditions.append(cond)
+            params.update(p)
+
+        where_clause = " AND ".join(conditions)
+
+        query = f"""
+            SELECT
+                YEAR(COALESCE(a.adjust_arrival_date, a.arrival_date)) AS arrival_year,
+                a.receiver_id AS entity_id,
+                ad.product_id,
+                b.brand_name AS brand,
+                COALESCE(a.ship_method, 'Unknown') AS ship_method,
+                vendor.id AS vendor_id,
+                vendor.country_id AS vendor_country_id,
+                COALESCE(vc.name, 'Unknown') AS vendor_country,
+                SUM(ad.arrival_quantity) AS total_quantity,
+                COUNT(ad.id) AS transaction_count,
+
+                SUM(
+                    ad.arrival_quantity * ppo.unit_cost
+                    / NULLIF(po.usd_exchange_rate, 0)
+                ) AS total_purchase_value_usd,
+
+                SUM(
+                    ad.arrival_quantity * ad.landed_cost
+                    / NULLIF(a.usd_landed_cost_currency_exchange_rate, 0)
+                ) AS total_landed_value_usd,
+
+                SUM(
+                    COALESCE(a.internal_charge, 0)
+                    / NULLIF(a.usd_international_cost_currency_exchange_rate, 0)
+                    * (ad.arrival_quantity / NULLIF(arr_t.total_arrival_qty, 0))
+                ) AS total_international_charge_usd,
+
+                SUM(
+                    COALESCE(a.local_charge, 0)
+                    / NULLIF(a.usd_local_cost_currency_exchange_rate, 0)
+                    * (ad.arrival_quantity / NULLIF(arr_t.total_arrival_qty, 0))
+                ) AS total_local_charge_usd,
+
+                SUM(
+                    COALESCE(ad.import_tax, 0)
+                    / NULLIF(a.usd_landed_cost_currency_exchange_rate, 0)
+                ) AS total_import_tax_usd
+
+            FROM arrival_details ad
+            INNER JOIN arrivals a ON ad.arrival_id = a.id
+            INNER JOIN products p ON ad.product_id = p.id
+            LEFT JOIN brands b ON p.brand_id = b.id
+            LEFT JOIN product_purchase_orders ppo ON ad.product_purchase_order_id = ppo.id
+            LEFT JOIN purchase_orders po ON ppo.purchase_order_id = po.id AND po.delete_flag = 0
+            LEFT JOIN companies vendor ON po.seller_company_id = vendor.id
+            LEFT JOIN countries vc ON vendor.country_id = vc.id
+            LEFT JOIN (
+                SELECT arrival_id, SUM(arrival_quantity) AS total_arrival_qty
+                FROM arrival_details WHERE COALESCE(delete_flag, 0) = 0
+                GROUP BY arrival_id
+            ) arr_t ON arr_t.arrival_id = a.id
+            WHERE {where_clause}
+            GROUP BY arrival_year, a.receiver_id, ad.product_id, b.brand_name,
+                     COALESCE(a.ship_method, 'Unknown'), vendor.id, vendor.country_id,
+                     COALESCE(vc.name, 'Unknown')
+        """
 
-                FROM arrival_details ad
-                INNER JOIN arrivals a ON ad.arrival_id = a.id
-                INNER JOIN products p ON ad.product_id = p.id
-                LEFT JOIN brands b ON p.brand_id = b.id
-                LEFT JOIN product_purchase_orders ppo ON ad.product_purchase_order_id = ppo.id
-                LEFT JOIN purchase_orders po ON ppo.purchase_order_id = po.id AND po.delete_flag = 0
-                LEFT JOIN (
-                    SELECT arrival_id, SUM(arrival_quantity) AS total_arrival_qty
-                    FROM arrival_details WHERE COALESCE(delete_flag, 0) = 0
-                    GROUP BY arrival_id
-                ) arr_t ON arr_t.arrival_id = a.id
-                WHERE {where_clause}
-                GROUP BY COALESCE(a.ship_method, 'Unknown')
-                ORDER BY total_landed_value_usd DESC
-            """
+        df = pd.read_sql(text(query), conn, params=params)
 
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
+        if not df.empty:
+            df = self._coerce_numeric(df, [
+                "total_quantity", "total_purchase_value_usd",
+                "total_landed_value_usd", "total_international_charge_usd",
+                "total_local_charge_usd", "total_import_tax_usd",
+            ])
 
-            if not df.empty:
-                df = _self._coerce_numeric(df, [
-                    "total_quantity", "total_purchase_value_usd",
-                    "total_landed_value_usd", "total_international_charge_usd",
-                    "total_local_charge_usd", "total_import_tax_usd",
-                ])
+        return df
 
-                df["total_landing_charges_usd"] = (
-                    df["total_landed_value_usd"].fillna(0)
-                    - df["total_purchase_value_usd"].fillna(0)
-                )
-                df["avg_landing_per_unit"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_quantity"].replace(0, float("nan"))
-                ).round(4)
-                df["landing_ratio_pct"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
-                ).round(2)
+    def get_landing_by_ship_method(
+        self,
+        entity_ids: tuple = None,
+        brand_list: tuple = None,
+        year_list: tuple = None,
+        product_ids: tuple = None,
+    ) -> pd.DataFrame:
+        """Aggregate landing charges by ship method."""
+        df = self._cube(entity_ids, year_list).landing_by(
+            "ship_method", product_ids=product_ids, brand_list=brand_list,
+        )
 
-            return df
-        except Exception as e:
-            logger.error(f"Error loading landing by ship method: {e}")
-            return pd.DataFrame()
+        if not df.empty:
+            df["total_landing_charges_usd"] = (
+                df["total_landed_value_usd"].fillna(0)
+                - df["total_purchase_value_usd"].fillna(0)
+            )
+            df["avg_landing_per_unit"] = (
+                df["total_landing_charges_usd"]
+                / df["total_quantity"].replace(0, float("nan"))
+            ).round(4)
+            df["landing_ratio_pct"] = (
+                df["total_landing_charges_usd"]
+                / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
+            ).round(2)
 
-    # ================================================================
-    # Landing Charges by Vendor Country (Analytics)
-    # ================================================================
+        return df
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def get_landing_by_country(
-        _self,
+        self,
         entity_ids: tuple = None,
         brand_list: tuple = None,
         year_list: tuple = None,
         product_ids: tuple = None,
     ) -> pd.DataFrame:
         """Aggregate landing charges by vendor country."""
-        try:
-            conditions = ["a.delete_flag = 0", "a.status <> 'REQUEST_STATUS'",
-                          "COALESCE(ad.delete_flag, 0) = 0",
-                          "ad.landed_cost > 0", "ad.arrival_quantity > 0"]
-            params = {}
-
-            if entity_ids:
-                cond, p = _self._build_in_clause("a.receiver_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-            if brand_list:
-                cond, p = _self._build_in_clause("b.brand_name", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
-            if year_list:
-                cond, p = _self._build_in_clause(
-                    "YEAR(COALESCE(a.adjust_arrival_date, a.arrival_date))",
-                    list(year_list), "year")
-                conditions.append(cond)
-                params.update(p)
-            if product_ids:
-                cond, p = _self._build_in_clause("ad.product_id", list(product_ids), "pid")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    COALESCE(vc.name, 'Unknown') AS vendor_country,
-                    SUM(ad.arrival_quantity) AS total_quantity,
-                    COUNT(ad.id) AS transaction_count,
-
-                    ROUND(SUM(
-                        ad.arrival_quantity * ppo.unit_cost
-                        / NULLIF(po.usd_exchange_rate, 0)
-                    ), 2) AS total_purchase_value_usd,
-
-                    ROUND(SUM(
-                        ad.arrival_quantity * ad.landed_cost
-                        / NULLIF(a.usd_landed_cost_currency_exchange_rate, 0)
-                    ), 2) AS total_landed_value_usd
-
-                FROM arrival_details ad
-                INNER JOIN arrivals a ON ad.arrival_id = a.id
-                INNER JOIN products p ON ad.product_id = p.id
-                LEFT JOIN brands b ON p.brand_id = b.id
-                LEFT JOIN product_purchase_orders ppo ON ad.product_purchase_order_id = ppo.id
-                LEFT JOIN purchase_orders po ON ppo.purchase_order_id = po.id AND po.delete_flag = 0
-                LEFT JOIN companies vendor ON po.seller_company_id = vendor.id
-                LEFT JOIN countries vc ON vendor.country_id = vc.id
-                WHERE {where_clause}
-                GROUP BY COALESCE(vc.name, 'Unknown')
-                ORDER BY total_landed_value_usd DESC
-            """
-
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-
-            if not df.empty:
-                df = _self._coerce_numeric(df, [
-                    "total_quantity", "total_purchase_value_usd",
-                    "total_landed_value_usd",
-                ])
+        df = self._cube(entity_ids, year_list).landing_by(
+            "vendor_country", product_ids=product_ids, brand_list=brand_list,
+            columns=["total_quantity", "transaction_count",
+                     "total_purchase_value_usd", "total_landed_value_usd"],
+        )
 
-                df["total_landing_charges_usd"] = (
-                    df["total_landed_value_usd"].fillna(0)
-                    - df["total_purchase_value_usd"].fillna(0)
-                )
-                df["landing_ratio_pct"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
-                ).round(2)
+        if not df.empty:
+            df["total_landing_charges_usd"] = (
+                df["total_landed_value_usd"].fillna(0)
+                - df["total_purchase_value_usd"].fillna(0)
+            )
+            df["landing_ratio_pct"] = (
+                df["total_landing_charges_usd"]
+                / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
+            ).round(2)
 
-            return df
-        except Exception as e:
-            logger.error(f"Error loading landing by country: {e}")
-            return pd.DataFrame()
+        return df
 
     # ================================================================
     # Year-over-Year Comparison (with breakdown)
     # ================================================================
 
-    @st.cache_data(ttl=600, show_spinner=False)
-    def _get_yoy_comparison_base(
+    @st.cache_resource(ttl=600, max_entries=16, show_spinner=False)
+    def _load_yoy_cube(
         _self,
         entity_ids: tuple = None,
-        brand_list: tuple = None,
-    ) -> pd.DataFrame:
-        """Base query: YoY comparison WITHOUT product filter (cached longer)."""
+    ) -> Dict[str, ProductIndex]:
+        """YoY comparison + breakdown for the last 3 years, WITHOUT product/brand filter."""
         try:
-            conditions = ["v.cost_year >= YEAR(CURDATE()) - 2"]
-            params = {}
-
-            if entity_ids:
-                cond, p = _self._build_in_clause("v.entity_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-            if brand_list:
-                cond, p = _self._build_in_clause("v.brand", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    v.cost_year, v.entity_id, v.legal_entity,
-                    v.product_id, v.pt_code, v.product_pn,
-                    v.brand, v.standard_uom, v.average_landed_cost_usd,
-                    v.total_quantity, v.total_landed_value_usd
-                FROM avg_landed_cost_looker_view v
-                WHERE {where_clause}
-                ORDER BY v.pt_code, v.cost_year DESC
-            """
-
             with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-            return df
+                comparison = _self._query_yoy_comparison(conn, entity_ids)
+                breakdown = _self._query_yoy_breakdown(conn, entity_ids)
         except Exception as e:
-            logger.error(f"Error loading YoY comparison base: {e}")
-            return pd.DataFrame()
+            logger.error(f"Error loading YoY base data: {e}")
+            comparison, breakdown = pd.DataFrame(), pd.DataFrame()
+
+        return {"comparison": ProductIndex(comparison), "breakdown": ProductIndex(breakdown)}
+
+    def _query_yoy_comparison(self, conn, entity_ids: tuple = None) -> pd.DataFrame:
+        conditions = ["v.cost_year >= YEAR(CURDATE()) - 2"]
+        params = {}
+
+        if entity_ids:
+            cond, p = self._build_in_clause("v.entity_id", list(entity_ids), "eid")
+            conditions.append(cond)
+            params.update(p)
+
+        where_clause = " AND ".join(conditions)
+
+        query = f"""
+            SELECT
+                v.cost_year, v.entity_id, v.legal_entity,
+                v.product_id, v.pt_code, v.product_pn,
+                v.brand, v.standard_uom, v.average_landed_cost_usd,
+                v.total_quantity, v.total_landed_value_usd
+            FROM avg_landed_cost_looker_view v
+            WHERE {where_clause}
+            ORDER BY v.pt_code, v.cost_year DESC
+        """
+
+        return pd.read_sql(text(query), conn, params=params)
 
     def get_yoy_comparison(
         self,
@@ -701,67 +588,50 @@ class LandedCostData:
         brand_list: tuple = None,
         product_ids: tuple = None,
     ) -> pd.DataFrame:
-        """Fetch YoY comparison - uses cached base, filters product in-memory."""
-        df = self._get_yoy_comparison_base(entity_ids, brand_list)
-        if product_ids and not df.empty:
-            df = df[df["product_id"].isin(product_ids)].reset_index(drop=True)
-        return df
-
-    @st.cache_data(ttl=600, show_spinner=False)
-    def _get_yoy_breakdown_base(
-        _self,
-        entity_ids: tuple = None,
-        brand_list: tuple = None,
-    ) -> pd.DataFrame:
-        """Base query: YoY breakdown WITHOUT product filter (cached longer)."""
-        try:
-            conditions = ["cost_year >= YEAR(CURDATE()) - 2"]
-            params = {}
+        """Fetch YoY comparison - sliced from the per-entity YoY cube."""
+        key, _ = self._cube_key(entity_ids)
+        return self._load_yoy_cube(key)["comparison"].slice(product_ids, brand_list)
+
+    def _query_yoy_breakdown(self, conn, entity_ids: tuple = None) -> pd.DataFrame:
+        conditions = ["cost_year >= YEAR(CURDATE()) - 2"]
+        params = {}
+
+        if entity_ids:
+            cond, p = self._build_in_clause("entity_id", list(entity_ids), "eid")
+            conditions.append(cond)
+            params.update(p)
+
+        where_clause = " AND ".join(conditions)
+
+        query = f"""
+            SELECT
+                cost_year, legal_entity, pt_code, product_id, entity_id, brand,
+                total_quantity,
+                avg_purchase_cost_usd, total_purchase_value_usd,
+                avg_landed_cost_usd, total_landed_value_usd
+            FROM landed_cost_breakdown_view
+            WHERE {where_clause}
+            ORDER BY pt_code, cost_year DESC
+        """
 
-            if entity_ids:
-                cond, p = _self._build_in_clause("entity_id", list(entity_ids), "eid")
-                conditions.append(cond)
-                params.update(p)
-            if brand_list:
-                cond, p = _self._build_in_clause("brand", list(brand_list), "brand")
-                conditions.append(cond)
-                params.update(p)
+        df = pd.read_sql(text(query), conn, params=params)
 
-            where_clause = " AND ".join(conditions)
+        if not df.empty:
+            df = self._coerce_numeric(df, [
+                "total_quantity", "avg_purchase_cost_usd",
+                "total_purchase_value_usd", "avg_landed_cost_usd",
+                "total_landed_value_usd",
+            ])
 
-            query = f"""
-                SELECT
-                    cost_year, legal_entity, pt_code, product_id, entity_id,
-                    total_quantity,
-                    avg_purchase_cost_usd, total_purchase_value_usd,
-                    avg_landed_cost_usd, total_landed_value_usd
-                FROM landed_cost_breakdown_view
-                WHERE {where_clause}
-                ORDER BY pt_code, cost_year DESC
-            """
+            df["avg_landing_charge_usd"] = (
+                (df["avg_landed_cost_usd"].fillna(0) - df["avg_purchase_cost_usd"].fillna(0))
+            ).round(4)
+            df["landing_ratio_pct"] = (
+                (df["total_landed_value_usd"].fillna(0) - df["total_purchase_value_usd"].fillna(0))
+                / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
+            ).round(2)
 
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-
-            if not df.empty:
-                df = _self._coerce_numeric(df, [
-                    "total_quantity", "avg_purchase_cost_usd",
-                    "total_purchase_value_usd", "avg_landed_cost_usd",
-                    "total_landed_value_usd",
-                ])
-
-                df["avg_landing_charge_usd"] = (
-                    (df["avg_landed_cost_usd"].fillna(0) - df["avg_purchase_cost_usd"].fillna(0))
-                ).round(4)
-                df["landing_ratio_pct"] = (
-                    (df["total_landed_value_usd"].fillna(0) - df["total_purchase_value_usd"].fillna(0))
-                    / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
-                ).round(2)
-
-            return df
-        except Exception as e:
-            logger.error(f"Error loading YoY breakdown base: {e}")
-            return pd.DataFrame()
+        return df
 
     def get_yoy_breakdown(
         self,
@@ -769,111 +639,47 @@ class LandedCostData:
         brand_list: tuple = None,
         product_ids: tuple = None,
     ) -> pd.DataFrame:
-        """Fetch YoY breakdown - uses cached base, filters product in-memory."""
-        df = self._get_yoy_breakdown_base(entity_ids, brand_list)
-        if product_ids and not df.empty:
-            df = df[df["product_id"].isin(product_ids)].reset_index(drop=True)
-        return df
+        """Fetch YoY breakdown - sliced from the per-entity YoY cube."""
+        key, _ = self._cube_key(entity_ids)
+        df = self._load_yoy_cube(key)["breakdown"].slice(product_ids, brand_list)
+        return df.drop(columns="brand") if "brand" in df.columns else df
 
     # ================================================================
     # Product Cost History (all years for one product)
     # ================================================================
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def get_product_cost_history(
-        _self,
+        self,
         product_id: int,
         entity_id: int = None,
     ) -> pd.DataFrame:
         """Get full cost history for a specific product across all years."""
-        try:
-            conditions = ["product_id = :product_id"]
-            params = {"product_id": product_id}
-
-            if entity_id:
-                conditions.append("entity_id = :entity_id")
-                params["entity_id"] = entity_id
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT *
-                FROM avg_landed_cost_looker_view
-                WHERE {where_clause}
-                ORDER BY cost_year ASC
-            """
-
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-            return df
-        except Exception as e:
-            logger.error(f"Error loading product cost history: {e}")
-            return pd.DataFrame()
+        df = self._cube((entity_id,) if entity_id else None).cost.slice([product_id])
+        return df.sort_values("cost_year", kind="stable").reset_index(drop=True) if not df.empty else df
 
     # ================================================================
     # Product Breakdown History (all years — breakdown view)
     # ================================================================
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def get_product_breakdown_history(
-        _self,
+        self,
         product_id: int,
         entity_id: int = None,
     ) -> pd.DataFrame:
         """Get cost breakdown history for a product across all years."""
-        try:
-            conditions = ["product_id = :product_id"]
-            params = {"product_id": product_id}
-
-            if entity_id:
-                conditions.append("entity_id = :entity_id")
-                params["entity_id"] = entity_id
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT
-                    cost_year, total_quantity,
-                    avg_purchase_cost_usd, total_purchase_value_usd,
-                    avg_landed_cost_usd, total_landed_value_usd,
-                    total_international_charge_usd,
-                    total_local_charge_usd,
-                    total_import_tax_usd
-                FROM landed_cost_breakdown_view
-                WHERE {where_clause}
-                ORDER BY cost_year ASC
-            """
-
-            with _self.engine.connect() as conn:
-                df = pd.read_sql(text(query), conn, params=params)
-
-            if not df.empty:
-                df = _self._coerce_numeric(df, [
-                    "total_quantity", "avg_purchase_cost_usd",
-                    "total_purchase_value_usd", "avg_landed_cost_usd",
-                    "total_landed_value_usd",
-                    "total_international_charge_usd",
-                    "total_local_charge_usd",
-                    "total_import_tax_usd",
-                ])
-
-                df["total_landing_charges_usd"] = (
-                    df["total_landed_value_usd"].fillna(0)
-                    - df["total_purchase_value_usd"].fillna(0)
-                )
-                df["avg_landing_charge_usd"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_quantity"].replace(0, float("nan"))
-                ).round(4)
-                df["landing_ratio_pct"] = (
-                    df["total_landing_charges_usd"]
-                    / df["total_purchase_value_usd"].replace(0, float("nan")) * 100
-                ).round(2)
-
+        df = self._cube((entity_id,) if entity_id else None).breakdown.slice([product_id])
+        if df.empty:
             return df
-        except Exception as e:
-            logger.error(f"Error loading product breakdown history: {e}")
-            return pd.DataFrame()
+
+        return df[[
+            "cost_year", "total_quantity",
+            "avg_purchase_cost_usd", "total_purchase_value_usd",
+            "avg_landed_cost_usd", "total_landed_value_usd",
+            "total_international_charge_usd",
+            "total_local_charge_usd",
+            "total_import_tax_usd",
+            "total_landing_charges_usd", "avg_landing_charge_usd", "landing_ratio_pct",
+        ]].sort_values("cost_year", kind="stable").reset_index(drop=True)
 
     # ================================================================
     # Deep-Dive: Arrival Sources (with PO cost)
@@ -13,6 +13,7 @@ from typing import Dict
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     build_pareto_chart,
     build_growth_comparison_chart,
@@ -126,7 +127,7 @@ def _aggregate_dimension(sales_df: pd.DataFrame, dimension: str) -> pd.DataFrame
 # TOP PERFORMERS TAB
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def _top_performers_tab(agg_data: Dict, key_prefix: str):
     col_tabs, col_slider = st.columns([4, 2])
     with col_slider:
@@ -295,7 +296,7 @@ def _render_insights(top_df, agg_df, dimension, dimension_label, metric, metric_
 # GROWTH ANALYSIS TAB
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def _growth_analysis_tab(
     sales_df: pd.DataFrame,
     prev_sales_df: pd.DataFrame = None,
@@ -3,7 +3,9 @@
 Backlog Tab Charts for Legal Entity Performance.
 Adapted from kpi_center_performance/backlog/charts.py
 
-VERSION: 2.0.0
+VERSION: 2.1.0
+- v2.1.0: Timeline chart serializes only encoded columns and records its
+          payload size (utils.chart_payload)
 """
 
 import logging
@@ -13,6 +15,7 @@ import altair as alt
 
 from ..constants import COLORS, MONTH_ORDER
 from ..common.charts import empty_chart
+from utils.chart_payload import slim, record_payload
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +90,7 @@ def build_backlog_by_month_chart_multiyear(
         df['year_month'] = df['etd_month'] + "'" + df['etd_year'].astype(str).str[-2:]
     
     df['year_str'] = df['etd_year'].astype(str)
+    df = slim(df, ['year_month', 'etd_year', 'year_str', revenue_col])
     unique_years = sorted(df['etd_year'].unique())
     year_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
     color_scale = alt.Scale(
@@ -113,9 +117,11 @@ def build_backlog_by_month_chart_multiyear(
         text=alt.Text(f'{revenue_col}:Q', format=',.0f')
     )
     
-    return alt.layer(bars, labels).properties(
+    chart = alt.layer(bars, labels).properties(
         width='container', height=350, title=title
     )
+    
+    return record_payload('legal_entity.backlog_timeline', chart)
 
 
 def build_backlog_by_month_stacked(
@@ -18,6 +18,7 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     build_backlog_by_month_chart,
     build_backlog_by_month_chart_multiyear,
@@ -167,7 +168,7 @@ def _analyze_in_period(backlog_df: pd.DataFrame, start_date, end_date):
 # TAB-LEVEL FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_tab_fragment(
     backlog_df: pd.DataFrame,
     filter_values: Dict = None,
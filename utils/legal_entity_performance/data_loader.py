@@ -3,7 +3,9 @@
 Unified Data Loader for Legal Entity Performance
 Aligned with kpi_center_performance/data_loader.py
 
-VERSION: 2.0.0
+VERSION: 2.2.0
+- v2.2.0: ar_outstanding_df carries AR snapshot columns (utils.ar_snapshot)
+- v2.1.0: Build MonthlyCube (utils.monthly_cube) once per raw load
 - Same "Load Once, Filter Many" pattern as KPI center
 - TTL-based cache invalidation
 - Progress bar during loading
@@ -33,6 +35,8 @@ from .constants import (
     DEBUG_TIMING,
 )
 from .queries import LegalEntityQueries
+from utils.monthly_cube import MonthlyCube, LEGAL_ENTITY_CUBE
+from utils.ar_snapshot import build_ar_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +135,7 @@ class UnifiedDataLoader:
             'sales_raw_df': pd.DataFrame(),
             'backlog_raw_df': pd.DataFrame(),
             'ar_outstanding_df': pd.DataFrame(),
+            'monthly_cube': None,
             '_loaded_at': None,
             '_lookback_start': None,
             '_lookback_end': None,
@@ -183,7 +188,7 @@ class UnifiedDataLoader:
             
             # 3. AR OUTSTANDING (all unpaid/partial, no date filter)
             progress_bar.progress(75, text="💰 Loading AR outstanding...")
-            data['ar_outstanding_df'] = self.queries.load_ar_outstanding()
+            data['ar_outstanding_df'] = build_ar_snapshot(self.queries.load_ar_outstanding())
             
             progress_bar.progress(100, text="✅ Data loaded successfully!")
             
@@ -192,6 +197,13 @@ class UnifiedDataLoader:
             _time.sleep(0.3)
             progress_bar.empty()
         
+        # Pre-aggregated month cube for trend/YoY charts
+        cube_start = time.perf_counter()
+        data['monthly_cube'] = MonthlyCube.build(data['sales_raw_df'], LEGAL_ENTITY_CUBE)
+        if DEBUG_TIMING:
+            print(f"   🧊 [monthly_cube] {len(data['monthly_cube'].cells):,} cells "
+                  f"in {time.perf_counter()-cube_start:.3f}s")
+        
         # Metadata
         data['_loaded_at'] = datetime.now()
         data['_lookback_start'] = lookback_start
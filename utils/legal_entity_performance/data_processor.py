@@ -3,7 +3,9 @@
 Data Processor for Legal Entity Performance
 Aligned with kpi_center_performance/data_processor.py
 
-VERSION: 2.0.0
+VERSION: 2.1.0
+- v2.1.0: process() returns a sliced MonthlyCube (result['monthly_cube'])
+           when no customer/product/brand/source filter is applied
 - Same "Filter Many" pattern as KPI center
 - _prepare_dataframes for pre-conversion
 - _get_backlog_period_end for correct ETD boundary
@@ -38,6 +40,7 @@ class DataProcessor:
         self.sales_raw = unified_cache.get('sales_raw_df', pd.DataFrame())
         self.backlog_raw = unified_cache.get('backlog_raw_df', pd.DataFrame())
         self._lookback_start = unified_cache.get('_lookback_start')
+        self.monthly_cube = unified_cache.get('monthly_cube')
         
         # Pre-convert date columns
         self._prepare_dataframes()
@@ -141,6 +144,8 @@ class DataProcessor:
         if DEBUG_TIMING:
             print(f"   📊 [filter_sales] {len(sales_df):,} rows in {time.perf_counter()-with_timer:.3f}s")
         
+        result['monthly_cube'] = self._slice_monthly_cube(start_date, end_date, filter_values)
+        
         # =====================================================================
         # 2. SALES DATA - Previous year (for YoY)
         # =====================================================================
@@ -283,6 +288,29 @@ class DataProcessor:
         
         return result
     
+    def _slice_monthly_cube(self, start_date: date, end_date: date, filters: dict):
+        """
+        Slice the cached MonthlyCube to the current filters.
+        
+        Returns None when the cube cannot answer the selection exactly
+        (customer/product/brand/data source filters, or a date range that is
+        not month-aligned) — callers then aggregate sales_df instead.
+        """
+        if self.monthly_cube is None:
+            return None
+        if (filters.get('customer_ids') or filters.get('product_ids')
+                or filters.get('brand_filter')):
+            return None
+        if filters.get('data_source', 'All') not in (None, 'All'):
+            return None
+        
+        customer_type = filters.get('customer_type', 'All')
+        return self.monthly_cube.slice(
+            start_date, end_date,
+            filters={'legal_entity_id': filters.get('entity_ids', [])},
+            customer_type=customer_type if customer_type != 'All' else None,
+        )
+    
     def _build_prev_year_filters(self, filters: dict) -> Optional[dict]:
         """Build filters for previous year comparison."""
         start_date = filters.get('start_date')
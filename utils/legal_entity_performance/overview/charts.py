@@ -3,8 +3,10 @@
 Overview Tab Charts for Legal Entity Performance
 Adapted from kpi_center_performance/overview/charts.py
 
-VERSION: 2.2.0
+VERSION: 2.3.0
 CHANGELOG:
+- v2.3.0: Trend/YoY/multi-year charts serialize only encoded columns and
+           record payload size (utils.chart_payload)
 - v2.2.0: Removed backlog from render_kpi_cards, replaced render_backlog_summary_section
            with KPC-style _render_backlog_forecast_section (5 metrics + waterfall + bullet, 3 tabs)
            Added build_forecast_waterfall_chart, build_gap_analysis_chart, convert_pipeline_to_backlog_metrics
@@ -30,6 +32,7 @@ import streamlit as st
 
 from ..constants import COLORS, MONTH_ORDER, CHART_WIDTH, CHART_HEIGHT
 from ..common.charts import empty_chart
+from utils.chart_payload import slim, record_payload
 
 logger = logging.getLogger(__name__)
 
@@ -173,7 +176,7 @@ def build_monthly_trend_dual_chart(
             'gp_percent': row.get('gp_percent', 0)
         })
     
-    bar_df = pd.DataFrame(bar_data)
+    bar_df = slim(pd.DataFrame(bar_data), ['month', 'metric', 'value'])
     
     color_scale = alt.Scale(
         domain=['Revenue', 'Gross Profit'],
@@ -207,7 +210,7 @@ def build_monthly_trend_dual_chart(
     chart = bars + bar_labels
     
     if show_gp_percent_line:
-        line_df = chart_df[['month', 'month_order', 'gp_percent']].copy()
+        line_df = slim(chart_df, ['month', 'gp_percent'])
         
         line = alt.Chart(line_df).mark_line(
             color=COLORS['gross_profit_percent'],
@@ -233,7 +236,8 @@ def build_monthly_trend_dual_chart(
         
         chart = alt.layer(bars + bar_labels, line + line_labels).resolve_scale(y='independent')
     
-    return chart.properties(width=CHART_WIDTH, height=CHART_HEIGHT, title="Monthly Trend")
+    chart = chart.properties(width=CHART_WIDTH, height=CHART_HEIGHT, title="Monthly Trend")
+    return record_payload('legal_entity.monthly_trend', chart)
 
 
 # =============================================================================
@@ -264,7 +268,7 @@ def build_cumulative_dual_chart(monthly_df: pd.DataFrame) -> alt.Chart:
             'metric': 'Cumulative Gross Profit', 'value': row['cumulative_gp']
         })
     
-    line_df = pd.DataFrame(line_data)
+    line_df = slim(pd.DataFrame(line_data), ['month', 'metric', 'value'])
     
     color_scale = alt.Scale(
         domain=['Cumulative Revenue', 'Cumulative Gross Profit'],
@@ -293,7 +297,8 @@ def build_cumulative_dual_chart(monthly_df: pd.DataFrame) -> alt.Chart:
         color=alt.Color('metric:N', scale=color_scale, legend=None)
     )
     
-    return (lines + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title="Cumulative Performance")
+    chart = (lines + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title="Cumulative Performance")
+    return record_payload('legal_entity.cumulative', chart)
 
 
 # =============================================================================
@@ -365,7 +370,8 @@ def build_yoy_comparison_chart(
     )
     
     title_text = f"Monthly {metric}: {current_year or 'Current'} vs {previous_year or 'Previous'}"
-    return (chart + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title=title_text)
+    chart = (chart + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title=title_text)
+    return record_payload(f'legal_entity.yoy.{value_col}', chart)
 
 
 def build_yoy_cumulative_chart(
@@ -409,7 +415,7 @@ def build_yoy_cumulative_chart(
     if not line_data:
         return empty_chart("No data")
     
-    chart_df = pd.DataFrame(line_data)
+    chart_df = slim(pd.DataFrame(line_data), ['month', 'year', 'value'])
     
     color_scale = alt.Scale(
         domain=['Current Year', 'Previous Year'],
@@ -444,7 +450,8 @@ def build_yoy_cumulative_chart(
     )
     
     cum_title = f"Cumulative {metric}: {current_year or 'Current'} vs {previous_year or 'Previous'}"
-    return (chart + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title=cum_title)
+    chart = (chart + labels).properties(width=CHART_WIDTH, height=CHART_HEIGHT, title=cum_title)
+    return record_payload(f'legal_entity.yoy_cumulative.{value_col}', chart)
 
 
 # =============================================================================
@@ -497,10 +504,11 @@ def build_multi_year_monthly_chart(
         ]
     )
     
-    return bars.properties(
+    chart = bars.properties(
         width=CHART_WIDTH, height=350,
         title=title if title else f"Monthly {metric_col.replace('_', ' ').title()} by Year"
     )
+    return record_payload(f'legal_entity.multi_year_monthly.{metric_col}', chart)
 
 
 def build_multi_year_cumulative_chart(
@@ -546,7 +554,7 @@ def build_multi_year_cumulative_chart(
     if not cumulative_data:
         return empty_chart("No data for selected years")
     
-    combined = pd.concat(cumulative_data, ignore_index=True)
+    combined = slim(pd.concat(cumulative_data, ignore_index=True), ['month', 'year', 'cumulative'])
     
     year_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
     color_scale = alt.Scale(domain=[str(y) for y in sorted(years)], range=year_colors[:len(years)])
@@ -564,10 +572,11 @@ def build_multi_year_cumulative_chart(
         ]
     )
     
-    return lines.properties(
+    chart = lines.properties(
         width=CHART_WIDTH, height=350,
         title=title if title else f"Cumulative {metric_col.replace('_', ' ').title()}"
     )
+    return record_payload(f'legal_entity.multi_year_cumulative.{metric_col}', chart)
 
 
 # =============================================================================
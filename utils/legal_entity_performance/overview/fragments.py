@@ -3,8 +3,10 @@
 Streamlit Fragments for Legal Entity Performance - Overview Tab.
 Adapted from kpi_center_performance/overview/fragments.py
 
-VERSION: 3.0.0
+VERSION: 3.1.0
 CHANGELOG:
+- v3.1.0: Trend / multi-year YoY read pre-aggregated MonthlyCube when no
+           Customer/Brand/Product filter is active
 - v3.0.0: Executive Summary at top (CEO "5-second test")
            Sections 4-7 wrapped in expanders to reduce scroll
            Layout: Summary → KPIs → New Business → Backlog → [expandable details]
@@ -18,6 +20,7 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .charts import (
     render_kpi_cards,
     render_new_business_cards,
@@ -44,9 +47,20 @@ def _prepare_monthly_summary(
     sales_df: pd.DataFrame,
     revenue_col: str = 'calculated_invoiced_amount_usd',
     gp_col: str = 'invoiced_gross_profit_usd',
-    gp1_col: str = 'invoiced_gp1_usd'
+    gp1_col: str = 'invoiced_gp1_usd',
+    monthly_cube=None
 ) -> pd.DataFrame:
-    """Prepare monthly summary from raw sales data (for fragment use)."""
+    """
+    Prepare monthly summary from raw sales data (for fragment use).
+    If monthly_cube is given, the summary is read from it instead.
+    """
+    if monthly_cube is not None:
+        if monthly_cube.is_empty:
+            return pd.DataFrame()
+        monthly = monthly_cube.monthly_summary(fill_all_months=False)
+        monthly['gp_percent'] = monthly['gp_percent'].round(1)
+        return monthly[['month', 'revenue', 'gross_profit', 'gp1', 'gp_percent']]
+    
     if sales_df.empty:
         return pd.DataFrame()
     
@@ -84,15 +98,18 @@ def _prepare_monthly_summary(
 # MONTHLY TREND FRAGMENT - Synced with KPI center
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def monthly_trend_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
-    fragment_key: str = "le_trend"
+    fragment_key: str = "le_trend",
+    monthly_cube=None
 ):
     """
     Monthly trend chart with Customer/Brand/Product Excl filters.
     Synced with KPI center monthly_trend_fragment.
+    
+    monthly_cube: sliced MonthlyCube — used when no local filter is active.
     """
     if sales_df.empty:
         st.info("No sales data for trend analysis")
@@ -180,7 +197,15 @@ def monthly_trend_fragment(
         st.warning("No data matches the selected filters")
         return
     
-    monthly_df = _prepare_monthly_summary(filtered_df)
+    no_local_filter = (
+        selected_customer == 'All customers...' and
+        selected_brand == 'All brands...' and
+        selected_product == 'All products...'
+    )
+    monthly_df = _prepare_monthly_summary(
+        filtered_df,
+        monthly_cube=monthly_cube if no_local_filter else None
+    )
     
     if monthly_df.empty:
         st.warning("Could not prepare monthly summary")
@@ -205,13 +230,14 @@ def monthly_trend_fragment(
 # YOY COMPARISON FRAGMENT - Synced with KPI center
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def yoy_comparison_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict,
     prev_sales_df: pd.DataFrame = None,
     unified_cache: dict = None,
-    fragment_key: str = "le_yoy"
+    fragment_key: str = "le_yoy",
+    monthly_cube=None
 ):
     """
     Year-over-Year / Multi-Year comparison with tabs and filters.
@@ -220,6 +246,9 @@ def yoy_comparison_fragment(
     - Detects actual years in data
     - If >= 2 years → Multi-Year Comparison (grouped bars, cumulative lines)  
     - If 0-1 years → YoY Comparison (current vs previous year)
+    
+    Multi-year aggregates come from monthly_cube (sliced MonthlyCube) when
+    no local filter is active.
     """
     col_header, col_help = st.columns([6, 1])
     with col_header:
@@ -320,30 +349,43 @@ This section shows **full year** trends for context:
         # =================================================================
         st.info(f"📆 Data spans {len(unique_years)} years: {', '.join(map(str, unique_years))}")
         
-        multi_year_df = apply_local_filters(sales_df)
-        if multi_year_df.empty:
-            st.warning("No data matches the selected filters")
-            return
-        
-        multi_year_df['inv_date'] = pd.to_datetime(multi_year_df['inv_date'], errors='coerce')
-        multi_year_df['inv_year'] = multi_year_df['inv_date'].dt.year
-        multi_year_df['invoice_month'] = multi_year_df['inv_date'].dt.strftime('%b')
-        
-        # Aggregate by year + month
-        agg_dict = {
-            'calculated_invoiced_amount_usd': 'sum',
-            'invoiced_gross_profit_usd': 'sum',
-        }
-        if 'invoiced_gp1_usd' in multi_year_df.columns:
-            agg_dict['invoiced_gp1_usd'] = 'sum'
-        agg_dict['inv_number'] = pd.Series.nunique
-        
-        monthly_by_year = multi_year_df.groupby(['inv_year', 'invoice_month']).agg(agg_dict).reset_index()
-        monthly_by_year.columns = ['year', 'month', 'revenue', 'gross_profit'] + \
-            (['gp1'] if 'invoiced_gp1_usd' in multi_year_df.columns else []) + ['orders']
+        no_local_filter = (
+            selected_customer == 'All customers...' and
+            selected_brand == 'All brands...' and
+            selected_product == 'All products...'
+        )
         
-        if 'gp1' not in monthly_by_year.columns:
-            monthly_by_year['gp1'] = 0
+        if monthly_cube is not None and no_local_filter:
+            # Pre-aggregated year × month (no line-level groupby)
+            monthly_by_year = monthly_cube.monthly_by_year()
+            if monthly_by_year.empty:
+                st.warning("No data matches the selected filters")
+                return
+        else:
+            multi_year_df = apply_local_filters(sales_df)
+            if multi_year_df.empty:
+                st.warning("No data matches the selected filters")
+                return
+            
+            multi_year_df['inv_date'] = pd.to_datetime(multi_year_df['inv_date'], errors='coerce')
+            multi_year_df['inv_year'] = multi_year_df['inv_date'].dt.year
+            multi_year_df['invoice_month'] = multi_year_df['inv_date'].dt.strftime('%b')
+            
+            # Aggregate by year + month
+            agg_dict = {
+                'calculated_invoiced_amount_usd': 'sum',
+                'invoiced_gross_profit_usd': 'sum',
+            }
+            if 'invoiced_gp1_usd' in multi_year_df.columns:
+                agg_dict['invoiced_gp1_usd'] = 'sum'
+            agg_dict['inv_number'] = pd.Series.nunique
+            
+            monthly_by_year = multi_year_df.groupby(['inv_year', 'invoice_month']).agg(agg_dict).reset_index()
+            monthly_by_year.columns = ['year', 'month', 'revenue', 'gross_profit'] + \
+                (['gp1'] if 'invoiced_gp1_usd' in multi_year_df.columns else []) + ['orders']
+            
+            if 'gp1' not in monthly_by_year.columns:
+                monthly_by_year['gp1'] = 0
         
         monthly_by_year['month_order'] = monthly_by_year['month'].map({m: i for i, m in enumerate(MONTH_ORDER)})
         monthly_by_year = monthly_by_year.sort_values(['year', 'month_order'])
@@ -474,6 +516,8 @@ def overview_tab_fragment(
     payment_data: Dict = None,
     # AR Outstanding (all unpaid/partial, no date filter)
     ar_outstanding_df: pd.DataFrame = None,
+    # Pre-aggregated month cube (sliced by DataProcessor, may be None)
+    monthly_cube=None,
 ):
     """
     Render the complete Overview tab.
@@ -588,7 +632,8 @@ def overview_tab_fragment(
         monthly_trend_fragment(
             sales_df=sales_df,
             filter_values=active_filters,
-            fragment_key="le_trend"
+            fragment_key="le_trend",
+            monthly_cube=monthly_cube
         )
     
     # =========================================================================
@@ -601,7 +646,8 @@ def overview_tab_fragment(
                 filter_values=active_filters,
                 prev_sales_df=prev_sales_df,
                 unified_cache=unified_cache,
-                fragment_key="le_yoy"
+                fragment_key="le_yoy",
+                monthly_cube=monthly_cube
             )
     
     # =========================================================================
@@ -19,6 +19,7 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 
+from utils.perf import traced_fragment
 from ..payment_analysis import analyze_payments, render_payment_section, _fmt_currency, _normalize_status
 from ..export_utils import LegalEntityExport
 
@@ -52,7 +53,7 @@ def _format_oc_po(row) -> str:
 # TAB-LEVEL FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def payment_tab_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
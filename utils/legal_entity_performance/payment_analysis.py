@@ -19,7 +19,12 @@ applies proportionally to each line item.
 NOTE: HISTORY data (2014-2024) has payment columns = NULL.
       Analysis only covers rows where payment_status IS NOT NULL.
 
-VERSION: 2.0.0
+VERSION: 2.1.0
+CHANGELOG:
+- v2.1.0: Reads AR snapshot columns built once per load (utils.ar_snapshot)
+          - _status: categorical codes instead of row-wise .apply()
+          - _calculate_aging() delegates to ar_snapshot.aging_table()
+            (date-based only — ratio-derived amounts don't match aging_bucket rows)
 """
 
 import logging
@@ -30,6 +35,12 @@ import numpy as np
 import streamlit as st
 import altair as alt
 
+from utils.ar_snapshot import (
+    normalize_status,
+    status_codes,
+    aging_table,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,24 +48,6 @@ logger = logging.getLogger(__name__)
 # CONFIGURATION
 # =============================================================================
 
-# Aging buckets based on days PAST DUE (due_date), not invoice date
-# Negative = not yet due, 0+ = overdue
-AGING_BUCKETS_OVERDUE = [
-    ('Not Yet Due', -999999, -1),
-    ('0-30 days overdue', 0, 30),
-    ('31-60 days overdue', 31, 60),
-    ('61-90 days overdue', 61, 90),
-    ('90+ days overdue', 91, 999999),
-]
-
-# Fallback: aging by invoice age (when due_date not available)
-AGING_BUCKETS_BY_INV_DATE = [
-    ('Current (0-30)', 0, 30),
-    ('31-60 days', 31, 60),
-    ('61-90 days', 61, 90),
-    ('90+ days', 91, 999999),
-]
-
 # Alert thresholds
 OVERDUE_90_THRESHOLD_USD = 10000     # Alert if 90+ overdue > $10K
 COLLECTION_RATE_LOW = 0.70           # Alert if collection rate < 70%
@@ -89,16 +82,7 @@ def _fmt_currency(value: float) -> str:
 
 def _normalize_status(val) -> str:
     """Normalize payment_status to standard category."""
-    if pd.isna(val):
-        return 'unknown'
-    s = str(val).strip().lower()
-    if 'fully' in s or s == 'paid':
-        return 'fully_paid'
-    elif 'partial' in s:
-        return 'partially_paid'
-    elif 'unpaid' in s or 'open' in s or 'pending' in s:
-        return 'unpaid'
-    return 'unknown'
+    return normalize_status(val)
 
 
 # =============================================================================
@@ -145,8 +129,9 @@ def analyze_payments(
     if 'due_date' in df.columns:
         df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
 
-    # Normalize status
-    df['_status'] = df['payment_status'].apply(_normalize_status)
+    # Normalize status (already categorical if the AR snapshot was built at load)
+    if '_status' not in df.columns:
+        df['_status'] = status_codes(df['payment_status'])
 
     # =========================================================================
     # LINE-LEVEL USD CALCULATION (using payment_ratio)
@@ -170,7 +155,7 @@ def analyze_payments(
     # Count by status (invoice-level dedup for counts)
     has_inv_number = 'inv_number' in df.columns
     if has_inv_number:
-        inv_status = df.groupby('inv_number')['_status'].first()
+        inv_status = df.groupby('inv_number', sort=False)['_status'].first()
         fully_paid_invoices = (inv_status == 'fully_paid').sum()
         partial_invoices = (inv_status == 'partially_paid').sum()
         unpaid_invoices = (inv_status == 'unpaid').sum()
@@ -182,7 +167,7 @@ def analyze_payments(
         total_invoices = len(df)
 
     # Revenue breakdown by status category
-    status_rev = df.groupby('_status').agg(
+    status_rev = df.groupby('_status', observed=True).agg(
         invoiced=(rev_col, 'sum'),
         collected=('_collected_usd', 'sum'),
         outstanding=('_outstanding_usd', 'sum'),
@@ -249,52 +234,7 @@ def _calculate_aging(
     Calculate aging buckets for outstanding amounts.
     Uses due_date (overdue days) if available, else inv_date (invoice age).
     """
-    if outstanding_df.empty:
-        return pd.DataFrame(columns=['bucket', 'amount', 'gp', 'count', 'share'])
-
-    df = outstanding_df.copy()
-    today_ts = pd.Timestamp(today)
-
-    # Determine aging mode
-    has_due_date = 'due_date' in df.columns and df['due_date'].notna().any()
-
-    if has_due_date:
-        # Days past due (positive = overdue, negative = not yet due)
-        df['_aging_days'] = (today_ts - df['due_date']).dt.days
-        buckets = AGING_BUCKETS_OVERDUE
-        aging_mode = 'overdue'
-    else:
-        # Days since invoice (always positive)
-        df['_aging_days'] = (today_ts - df['inv_date']).dt.days.clip(lower=0)
-        buckets = AGING_BUCKETS_BY_INV_DATE
-        aging_mode = 'invoice_age'
-
-    total_outstanding = df['_outstanding_usd'].sum()
-    rows = []
-
-    for bucket_name, min_d, max_d in buckets:
-        mask = (df['_aging_days'] >= min_d) & (df['_aging_days'] <= max_d)
-        bucket_df = df[mask]
-        amount = bucket_df['_outstanding_usd'].sum()
-        gp = bucket_df['_outstanding_gp'].sum() if '_outstanding_gp' in bucket_df.columns else 0
-        count = len(bucket_df)
-        share = (amount / total_outstanding) if total_outstanding > 0 else 0
-
-        rows.append({
-            'bucket': bucket_name,
-            'min_days': min_d,
-            'max_days': max_d,
-            'amount': amount,
-            'gp': gp,
-            'count': count,
-            'share': share,
-        })
-
-    result = pd.DataFrame(rows)
-    # Remove empty buckets for cleaner display
-    result = result[result['amount'] > 0.01].reset_index(drop=True)
-    result.attrs['aging_mode'] = aging_mode
-    return result
+    return aging_table(outstanding_df, today, use_precalc=False)
 
 
 # =============================================================================
@@ -7,9 +7,10 @@ Data sources:
   - Sales: unified_sales_by_legal_entity_view (V2)
   - Backlog: backlog_by_legal_entity_view (V2)
 
-VERSION: 2.0.0
+VERSION: 2.1.0
 - Uses sqlalchemy engine + text() (synced with KPI center)
 - Lazy engine loading pattern
+- v2.1.0: Raw loaders are single-flight — concurrent sessions share one query
 """
 
 import logging
@@ -19,7 +20,8 @@ from typing import List, Optional
 import pandas as pd
 from sqlalchemy import text
 
-from utils.db import get_db_engine
+from utils.db import get_read_engine
+from utils.single_flight import single_flight
 from .constants import DEBUG_QUERY_TIMING
 
 logger = logging.getLogger(__name__)
@@ -35,20 +37,16 @@ class LegalEntityQueries:
         backlog_df = queries.load_backlog_raw()
     """
     
-    def __init__(self):
-        self._engine = None
-    
     @property
     def engine(self):
-        """Lazy load database engine."""
-        if self._engine is None:
-            self._engine = get_db_engine()
-        return self._engine
+        """Read replica engine, resolved per query (read-your-writes routing)."""
+        return get_read_engine()
     
     # =========================================================================
     # SALES RAW DATA
     # =========================================================================
     
+    @single_flight('legal_entity.sales_raw')
     def load_sales_raw(self, lookback_start: date) -> pd.DataFrame:
         """
         Load all sales data from lookback_start.
@@ -83,6 +81,7 @@ class LegalEntityQueries:
     # AR OUTSTANDING (all unpaid/partial invoices, NO date filter)
     # =========================================================================
     
+    @single_flight('legal_entity.ar_outstanding')
     def load_ar_outstanding(self) -> pd.DataFrame:
         """
         Load ALL invoices with outstanding balance — not filtered by date.
@@ -124,6 +123,7 @@ class LegalEntityQueries:
     # BACKLOG RAW DATA
     # =========================================================================
     
+    @single_flight('legal_entity.backlog_raw')
     def load_backlog_raw(self) -> pd.DataFrame:
         """
         Load all pending backlog orders.
@@ -17,6 +17,7 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 
+from utils.perf import traced_fragment
 from ..constants import MONTH_ORDER
 from ..export_utils import LegalEntityExport
 
@@ -52,7 +53,7 @@ def _format_oc_po(row) -> str:
 # TAB-LEVEL FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def sales_detail_tab_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
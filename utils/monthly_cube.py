@@ -0,0 +1,398 @@
+# utils/monthly_cube.py
+"""
+Pre-aggregated Monthly Sales Cube
+
+Shared by the Salesperson, KPI Center and Legal Entity performance pages.
+
+Monthly trend, cumulative, YoY and multi-year charts used to re-group the
+raw invoice-line frame on every render (one groupby per chart, per metric
+tab, per rerun). The cube is built ONCE per data load and answers all of
+those questions from a few thousand rows:
+
+    year × month × <dimension(s)> × customer_type
+        → revenue, gross_profit, gp1, line_count
+
+Distinct counts (invoices/orders, customers) are not additive across
+cells, so the cube also keeps a de-duplicated key frame at
+(cell, customer_id, order key) grain. It is still far smaller than the
+invoice-line frame and gives exact counts for any slice.
+
+A slice is only valid when the requested date range is month-aligned
+(or ends on/after the last invoice date in the cube). Otherwise callers
+fall back to the line-level frame — see MonthlyCube.covers().
+
+Usage:
+    from utils.monthly_cube import MonthlyCube, SALESPERSON_CUBE
+
+    cube = MonthlyCube.build(sales_df, SALESPERSON_CUBE)       # once per load
+    sliced = cube.slice(
+        start_date=date(2025, 1, 1), end_date=date(2025, 12, 31),
+        filters={'sales_id': [12, 15]},
+        exclude_internal_revenue=True,
+    )
+    if sliced is not None:
+        monthly_df = sliced.monthly_summary()
+        by_year = sliced.monthly_by_year()
+
+VERSION: 1.0.0
+"""
+
+import calendar
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MONTH_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+MEASURES = ('revenue', 'gross_profit', 'gp1')
+
+
+# =============================================================================
+# SCHEMAS — one per dashboard
+# =============================================================================
+
+@dataclass(frozen=True)
+class CubeSchema:
+    """Column mapping from a dashboard's sales frame to cube measures/dims."""
+    name: str
+    dims: Tuple[str, ...]              # dimension columns kept in the grain
+    revenue_col: str
+    gp_col: str
+    gp1_col: str
+    order_col: str                     # distinct-count column for "orders"
+    date_col: str = 'inv_date'
+    customer_col: str = 'customer_id'
+    customer_type_col: str = 'customer_type'
+
+
+SALESPERSON_CUBE = CubeSchema(
+    name='salesperson',
+    dims=('sales_id', 'legal_entity_id'),
+    revenue_col='sales_by_split_usd',
+    gp_col='gross_profit_by_split_usd',
+    gp1_col='gp1_by_split_usd',
+    order_col='inv_number',
+)
+
+KPI_CENTER_CUBE = CubeSchema(
+    name='kpi_center',
+    dims=('kpi_center_id', 'legal_entity_id', 'kpi_type'),
+    revenue_col='sales_by_kpi_center_usd',
+    gp_col='gross_profit_by_kpi_center_usd',
+    gp1_col='gp1_by_kpi_center_usd',
+    order_col='inv_number',
+)
+
+LEGAL_ENTITY_CUBE = CubeSchema(
+    name='legal_entity',
+    dims=('legal_entity_id',),
+    revenue_col='calculated_invoiced_amount_usd',
+    gp_col='invoiced_gross_profit_usd',
+    gp1_col='invoiced_gp1_usd',
+    order_col='inv_number',
+)
+
+
+# =============================================================================
+# CUBE
+# =============================================================================
+
+class MonthlyCube:
+    """
+    Immutable monthly aggregate of a sales frame.
+
+    Attributes:
+        cells: year, month_num, <dims>, customer_type, revenue, gross_profit,
+               gp1, line_count
+        keys:  year, month_num, <dims>, customer_type, customer_id, order_key
+               (unique rows — used for exact distinct counts)
+        max_date: Latest invoice date in the source frame
+    """
+
+    def __init__(
+        self,
+        cells: pd.DataFrame,
+        keys: pd.DataFrame,
+        schema: CubeSchema,
+        max_date: Optional[pd.Timestamp] = None,
+    ):
+        self.cells = cells
+        self.keys = keys
+        self.schema = schema
+        self.max_date = max_date
+
+    # =========================================================================
+    # BUILD
+    # =========================================================================
+
+    @classmethod
+    def build(cls, sales_df: pd.DataFrame, schema: CubeSchema) -> 'MonthlyCube':
+        """
+        Aggregate an invoice-line frame into a cube.
+
+        Missing measure columns are treated as 0; missing dimension columns
+        are dropped from the grain (slices on them are then ignored).
+        """
+        if sales_df is None or sales_df.empty or schema.date_col not in sales_df.columns:
+            return cls.empty(schema)
+
+        dims = [d for d in schema.dims if d in sales_df.columns]
+        inv_date = pd.to_datetime(sales_df[schema.date_col], errors='coerce')
+        valid = inv_date.notna().to_numpy()
+
+        # Positional (numpy) assembly — immune to duplicate/unsorted indexes
+        columns = {
+            'year': inv_date.dt.year.to_numpy()[valid].astype(int),
+            'month_num': inv_date.dt.month.to_numpy()[valid].astype(int),
+        }
+        for d in dims:
+            columns[d] = sales_df[d].to_numpy()[valid]
+        if schema.customer_type_col in sales_df.columns:
+            columns['customer_type'] = sales_df[schema.customer_type_col].fillna('').to_numpy()[valid]
+        else:
+            columns['customer_type'] = np.full(int(valid.sum()), '', dtype=object)
+
+        for measure, col in zip(MEASURES, (schema.revenue_col, schema.gp_col, schema.gp1_col)):
+            if col in sales_df.columns:
+                values = pd.to_numeric(sales_df[col], errors='coerce').fillna(0).to_numpy()
+                columns[measure] = values[valid]
+            else:
+                columns[measure] = np.zeros(int(valid.sum()))
+
+        base = pd.DataFrame(columns)
+        grain = ['year', 'month_num'] + dims + ['customer_type']
+
+        cells = base.groupby(grain, dropna=False, sort=False, observed=True).agg(
+            revenue=('revenue', 'sum'),
+            gross_profit=('gross_profit', 'sum'),
+            gp1=('gp1', 'sum'),
+            line_count=('revenue', 'size'),
+        ).reset_index()
+
+        keys = base[grain].copy()
+        if schema.customer_col in sales_df.columns:
+            keys['customer_id'] = sales_df[schema.customer_col].to_numpy()[valid]
+        if schema.order_col in sales_df.columns:
+            keys['order_key'] = sales_df[schema.order_col].to_numpy()[valid]
+        keys = keys.drop_duplicates(ignore_index=True)
+
+        cube = cls(
+            cells=cells,
+            keys=keys,
+            schema=schema,
+            max_date=inv_date.max(),
+        )
+        logger.info(
+            f"MonthlyCube[{schema.name}] built: {len(sales_df):,} lines → "
+            f"{len(cells):,} cells, {len(keys):,} keys"
+        )
+        return cube
+
+    @classmethod
+    def empty(cls, schema: CubeSchema) -> 'MonthlyCube':
+        grain = ['year', 'month_num'] + list(schema.dims) + ['customer_type']
+        cells = pd.DataFrame(columns=grain + list(MEASURES) + ['line_count'])
+        keys = pd.DataFrame(columns=grain + ['customer_id', 'order_key'])
+        return cls(cells=cells, keys=keys, schema=schema, max_date=None)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.cells.empty
+
+    # =========================================================================
+    # SLICING
+    # =========================================================================
+
+    def covers(self, start_date: Optional[date], end_date: Optional[date]) -> bool:
+        """
+        Whether [start_date, end_date] can be answered at month granularity.
+
+        Start must be the 1st of a month; end must be a month end or on/after
+        the latest invoice in the cube (YTD/QTD/MTD periods end "today").
+        """
+        if start_date is not None and start_date.day != 1:
+            return False
+        if end_date is not None:
+            month_end = calendar.monthrange(end_date.year, end_date.month)[1]
+            if end_date.day != month_end:
+                if self.max_date is None or pd.isna(self.max_date):
+                    return True
+                if pd.Timestamp(end_date) < self.max_date.normalize():
+                    return False
+        return True
+
+    def slice(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        filters: Optional[Dict[str, Iterable]] = None,
+        customer_type: Optional[str] = None,
+        exclude_internal_revenue: bool = False,
+    ) -> Optional['MonthlyCube']:
+        """
+        Slice the cube by date range and dimension members.
+
+        Args:
+            start_date/end_date: Inclusive range (must satisfy covers())
+            filters: {dim_column: allowed values}; empty/None values are ignored
+            customer_type: Keep only this customer_type (e.g. 'External')
+            exclude_internal_revenue: Zero revenue (not GP/GP1) for internal
+                customers — same rule as the pages' client-side filters
+
+        Returns:
+            New MonthlyCube, or None if the date range is not month-aligned.
+        """
+        if not self.covers(start_date, end_date):
+            return None
+
+        cell_mask = self._mask(self.cells, start_date, end_date, filters, customer_type)
+        key_mask = self._mask(self.keys, start_date, end_date, filters, customer_type)
+
+        cells = self.cells[cell_mask]
+        if exclude_internal_revenue and not cells.empty:
+            is_internal = cells['customer_type'].astype(str).str.lower() == 'internal'
+            if is_internal.any():
+                cells = cells.copy()
+                cells.loc[is_internal, 'revenue'] = 0
+
+        return MonthlyCube(
+            cells=cells,
+            keys=self.keys[key_mask],
+            schema=self.schema,
+            max_date=self.max_date,
+        )
+
+    @staticmethod
+    def _mask(
+        df: pd.DataFrame,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        filters: Optional[Dict[str, Iterable]],
+        customer_type: Optional[str],
+    ) -> np.ndarray:
+        mask = np.ones(len(df), dtype=bool)
+        if df.empty:
+            return mask
+
+        period = df['year'].to_numpy() * 100 + df['month_num'].to_numpy()
+        if start_date is not None:
+            mask &= period >= start_date.year * 100 + start_date.month
+        if end_date is not None:
+            mask &= period <= end_date.year * 100 + end_date.month
+
+        for col, values in (filters or {}).items():
+            if values is None or col not in df.columns:
+                continue
+            values = list(values)
+            if values:
+                mask &= df[col].isin(values).to_numpy()
+
+        if customer_type and customer_type != 'All':
+            mask &= (df['customer_type'] == customer_type).to_numpy()
+
+        return mask
+
+    # =========================================================================
+    # READ-OUTS
+    # =========================================================================
+
+    def years(self) -> List[int]:
+        """Years that have at least one invoice line in the (sliced) cube."""
+        if self.cells.empty:
+            return []
+        return sorted(int(y) for y in self.cells['year'].unique())
+
+    def totals(self) -> Dict[str, float]:
+        """Grand totals for KPI cards."""
+        out = {m: float(self.cells[m].sum()) if not self.cells.empty else 0.0 for m in MEASURES}
+        out['orders'] = int(self.keys['order_key'].nunique()) if 'order_key' in self.keys.columns else 0
+        out['customers'] = int(self.keys['customer_id'].nunique()) if 'customer_id' in self.keys.columns else 0
+        return out
+
+    def monthly_by_year(self) -> pd.DataFrame:
+        """
+        Year × month aggregates (only months with data).
+
+        Columns: year, month, month_order, revenue, gross_profit, gp1,
+                 orders, customers
+        """
+        cols = ['year', 'month', 'month_order'] + list(MEASURES) + ['orders', 'customers']
+        if self.cells.empty:
+            return pd.DataFrame(columns=cols)
+
+        agg = self.cells.groupby(['year', 'month_num'], sort=True)[list(MEASURES)].sum()
+        agg = agg.join(self._distinct_counts(['year', 'month_num'])).fillna(0).reset_index()
+
+        agg['month_order'] = agg['month_num'] - 1
+        agg['month'] = agg['month_order'].map(dict(enumerate(MONTH_ORDER)))
+        agg['year'] = agg['year'].astype(int)
+        return agg[cols].reset_index(drop=True)
+
+    def monthly_summary(self, fill_all_months: bool = True) -> pd.DataFrame:
+        """
+        Month-of-year aggregates across every year in the slice.
+
+        Columns: month, month_order, revenue, gross_profit, gp1, orders,
+                 customers, gp_percent, gp1_percent, cumulative_revenue,
+                 cumulative_gp, cumulative_gp1
+        """
+        if self.cells.empty:
+            monthly = pd.DataFrame({'month_num': range(1, 13)})
+            for col in list(MEASURES) + ['orders', 'customers']:
+                monthly[col] = 0
+            if not fill_all_months:
+                monthly = monthly.iloc[0:0]
+        else:
+            monthly = self.cells.groupby('month_num', sort=True)[list(MEASURES)].sum()
+            monthly = monthly.join(self._distinct_counts(['month_num']))
+            if fill_all_months:
+                monthly = monthly.reindex(range(1, 13))
+            monthly = monthly.fillna(0).reset_index().rename(columns={'index': 'month_num'})
+
+        monthly['month_order'] = monthly['month_num'] - 1
+        monthly['month'] = monthly['month_order'].map(dict(enumerate(MONTH_ORDER)))
+
+        revenue = monthly['revenue'].replace(0, np.nan)
+        monthly['gp_percent'] = (monthly['gross_profit'] / revenue * 100).fillna(0).round(2)
+        monthly['gp1_percent'] = (monthly['gp1'] / revenue * 100).fillna(0).round(2)
+
+        monthly['cumulative_revenue'] = monthly['revenue'].cumsum()
+        monthly['cumulative_gp'] = monthly['gross_profit'].cumsum()
+        monthly['cumulative_gp1'] = monthly['gp1'].cumsum()
+
+        return monthly.drop(columns=['month_num']).reset_index(drop=True)
+
+    def yearly_totals(self, metric: str = 'revenue') -> pd.Series:
+        """Series indexed by year with the total of one measure."""
+        if self.cells.empty:
+            return pd.Series(dtype=float)
+        return self.cells.groupby('year')[metric].sum().sort_index()
+
+    def _distinct_counts(self, by: List[str]) -> pd.DataFrame:
+        """Exact distinct orders/customers from the key frame."""
+        if self.keys.empty:
+            return pd.DataFrame(columns=['orders', 'customers'])
+        agg = {}
+        if 'order_key' in self.keys.columns:
+            agg['orders'] = ('order_key', 'nunique')
+        if 'customer_id' in self.keys.columns:
+            agg['customers'] = ('customer_id', 'nunique')
+        if not agg:
+            return pd.DataFrame(columns=['orders', 'customers'])
+        return self.keys.groupby(by, sort=True).agg(**agg)
+
+
+__all__ = [
+    'CubeSchema',
+    'MonthlyCube',
+    'SALESPERSON_CUBE',
+    'KPI_CENTER_CUBE',
+    'LEGAL_ENTITY_CUBE',
+]
@@ -6,6 +6,7 @@ Data Loader for GAP Analysis - Production Ready with All Fixes
 - Fixed missing avg_daily_demand column issue
 - Fixed SQLAlchemy execute() syntax
 - Added expired inventory support
+- Load-once snapshots (shared snapshot service) with in-memory entity/product/brand/PO/expiry filters
 """
 
 import pandas as pd
@@ -28,6 +29,7 @@ project_root = os.environ.get('PROJECT_ROOT', Path(__file__).parent.parent.paren
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 from utils.db import get_db_engine
+from utils.supply_demand_snapshot import get_snapshot_service
 
 logger = logging.getLogger(__name__)
 
@@ -713,7 +715,226 @@ class GAPDataLoader:
             batch_str = batch_str[:max_length] + "..."
         
         return batch_str
-    
+
+    # ==================== SNAPSHOT METHODS (LOAD ONCE, FILTER IN MEMORY) ====================
+    #
+    # The load_* methods above push product/brand/PO filters into SQL, so every
+    # filter tweak is a new cache key and a new full query. Snapshots come from
+    # the shared supply/demand snapshot service (one extraction of each unified
+    # view for all sessions); entity and the remaining filters are applied as
+    # masks with the same semantics as _build_supply_query / _build_demand_query.
+
+    def _entity_scope(
+        self,
+        df: pd.DataFrame,
+        entity_name: Optional[str],
+        exclude_entity: bool
+    ) -> pd.DataFrame:
+        """Rows for entity_name (or all other entities if exclude_entity)"""
+        if not entity_name or df.empty:
+            return df
+        # NULL entity matches neither = nor != in SQL
+        has_entity = df['entity_name'] != ''
+        is_entity = df['entity_name'] == entity_name.strip()
+        return df[has_entity & (~is_entity if exclude_entity else is_entity)]
+
+    def load_supply_snapshot(
+        self,
+        entity_name: Optional[str] = None,
+        exclude_entity: bool = False
+    ) -> pd.DataFrame:
+        """ALL supply rows for an entity scope (incl. expired, all PO statuses/types)"""
+        self._validate_entity_name(entity_name)
+        try:
+            df = get_snapshot_service().get('unified_supply')
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading supply snapshot: {e}", exc_info=True)
+            raise DataLoadError(f"Failed to load supply data: {str(e)}")
+
+        if df.empty:
+            logger.warning("No supply data found in snapshot")
+            return self._get_empty_supply_dataframe()
+
+        return self._entity_scope(df, entity_name, exclude_entity)
+
+    def load_demand_snapshot(
+        self,
+        entity_name: Optional[str] = None,
+        exclude_entity: bool = False
+    ) -> pd.DataFrame:
+        """ALL demand rows for an entity scope"""
+        self._validate_entity_name(entity_name)
+        try:
+            df = get_snapshot_service().get('unified_demand')
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading demand snapshot: {e}", exc_info=True)
+            raise DataLoadError(f"Failed to load demand data: {str(e)}")
+
+        if df.empty:
+            logger.warning("No demand data found in snapshot")
+            return self._get_empty_demand_dataframe()
+
+        return self._entity_scope(df, entity_name, exclude_entity)
+
+    def load_safety_stock_snapshot(
+        self,
+        entity_name: Optional[str] = None,
+        exclude_entity: bool = False
+    ) -> pd.DataFrame:
+        """Load ALL safety stock rules for an entity scope"""
+        return self.load_safety_stock_data(entity_name, exclude_entity, None)
+
+    def _product_brand_mask(
+        self,
+        df: pd.DataFrame,
+        product_ids: Optional[Tuple[int, ...]],
+        brands: Optional[Tuple[str, ...]],
+        exclude_products: bool,
+        exclude_brands: bool
+    ) -> pd.Series:
+        """Row mask equivalent to the product/brand IN / NOT IN SQL filters"""
+        mask = pd.Series(True, index=df.index)
+
+        if product_ids and 'product_id' in df.columns:
+            in_products = df['product_id'].isin(list(product_ids))
+            mask &= ~in_products if exclude_products else in_products
+
+        if brands and 'brand' in df.columns:
+            # df.brand is normalized on load; MySQL compares case-insensitively
+            brand_set = {_b for _b in (self._normalize_text_field(b, 'brand') for b in brands) if _b}
+            in_brands = df['brand'].isin(brand_set)
+            mask &= ~in_brands if exclude_brands else in_brands
+
+        return mask
+
+    def filter_supply_data(
+        self,
+        supply_snapshot: pd.DataFrame,
+        product_ids: Optional[Tuple[int, ...]] = None,
+        brands: Optional[Tuple[str, ...]] = None,
+        exclude_products: bool = False,
+        exclude_brands: bool = False,
+        exclude_expired: bool = True,
+        po_approval_statuses: Optional[Tuple[str, ...]] = ('APPROVED',),
+        po_order_types: Optional[Tuple[str, ...]] = ('REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER'),
+    ) -> pd.DataFrame:
+        """In-memory equivalent of load_supply_data on a supply snapshot"""
+        df = supply_snapshot
+        if df.empty:
+            return df
+
+        mask = self._product_brand_mask(df, product_ids, brands, exclude_products, exclude_brands)
+
+        if exclude_expired and 'expiry_date' in df.columns:
+            today = pd.Timestamp.today().normalize()
+            mask &= df['expiry_date'].isna() | (df['expiry_date'] >= today)
+
+        # PO-specific filters: only apply to PURCHASE_ORDER rows
+        is_po = df['supply_source'] == 'PURCHASE_ORDER'
+
+        if po_approval_statuses and 'approval_status' in df.columns:
+            mask &= ~is_po | df['approval_status'].isin(list(po_approval_statuses))
+
+        if po_order_types and 'purchase_order_type' in df.columns:
+            mask &= (
+                ~is_po
+                | df['purchase_order_type'].isin(list(po_order_types))
+                | df['purchase_order_type'].isna()
+            )
+
+        result = df[mask]
+
+        logger.info(
+            f"Filtered supply: {len(result)}/{len(df)} records | "
+            f"Products: {len(product_ids) if product_ids else 'All'} | "
+            f"Exclude expired: {exclude_expired}"
+        )
+        return result
+
+    def filter_demand_data(
+        self,
+        demand_snapshot: pd.DataFrame,
+        product_ids: Optional[Tuple[int, ...]] = None,
+        brands: Optional[Tuple[str, ...]] = None,
+        exclude_products: bool = False,
+        exclude_brands: bool = False
+    ) -> pd.DataFrame:
+        """In-memory equivalent of load_demand_data on a demand snapshot"""
+        df = demand_snapshot
+        if df.empty:
+            return df
+
+        result = df[self._product_brand_mask(df, product_ids, brands, exclude_products, exclude_brands)]
+
+        logger.info(
+            f"Filtered demand: {len(result)}/{len(df)} records | "
+            f"Products: {len(product_ids) if product_ids else 'All'}"
+        )
+        return result
+
+    def filter_safety_stock_data(
+        self,
+        safety_snapshot: pd.DataFrame,
+        product_ids: Optional[Tuple[int, ...]] = None
+    ) -> pd.DataFrame:
+        """In-memory equivalent of load_safety_stock_data (product IN filter only)"""
+        if safety_snapshot is None or safety_snapshot.empty or not product_ids:
+            return safety_snapshot
+        return safety_snapshot[safety_snapshot['product_id'].isin(list(product_ids))]
+
+    def expired_inventory_from_snapshot(
+        self,
+        supply_snapshot: pd.DataFrame,
+        product_ids: Optional[Tuple[int, ...]] = None,
+        brands: Optional[Tuple[str, ...]] = None,
+        exclude_products: bool = False,
+        exclude_brands: bool = False
+    ) -> pd.DataFrame:
+        """
+        In-memory equivalent of load_expired_inventory_details: the supply
+        snapshot already holds every expired INVENTORY batch.
+        """
+        df = supply_snapshot
+        if df.empty or 'expiry_date' not in df.columns:
+            return pd.DataFrame()
+
+        today = pd.Timestamp.today().normalize()
+        mask = (
+            (df['supply_source'] == 'INVENTORY')
+            & (df['expiry_date'] < today)
+            & (df['available_quantity'] > 0)
+            & self._product_brand_mask(df, product_ids, brands, exclude_products, exclude_brands)
+        )
+        expired = df[mask]
+
+        if expired.empty:
+            logger.info("No expired inventory found for given filters")
+            return pd.DataFrame()
+
+        batch_info = (
+            'Batch: ' + expired['batch_number'].fillna('N/A').astype(str)
+            + ' | Exp: ' + expired['expiry_date'].dt.strftime('%Y-%m-%d')
+            + ' | Qty: ' + expired['available_quantity'].map('{:g}'.format)
+            + ' | WH: ' + expired['warehouse_name'].fillna('N/A').astype(str)
+        )
+
+        result = (
+            expired.assign(expired_batches_info=batch_info)
+            .groupby('product_id', sort=True)
+            .agg(
+                pt_code=('pt_code', 'min'),
+                product_name=('product_name', 'min'),
+                brand=('brand', 'min'),
+                expired_quantity=('available_quantity', 'sum'),
+                expired_batches_info=('expired_batches_info', '; '.join),
+            )
+            .reset_index()
+        )
+        result['expired_batches_info'] = result['expired_batches_info'].apply(self._format_batch_info)
+
+        logger.info(f"Derived expired inventory for {len(result)} products (unique)")
+        return result
+
     # ==================== DATE RANGE METHODS ====================
     
     @st.cache_data(ttl=CACHE_TTL['reference'])
@@ -810,7 +1031,9 @@ class GAPDataLoader:
                 total_value_usd,
                 supply_reference_id,
                 supplier_name,
-                completion_percentage
+                completion_percentage,
+                purchase_order_type,
+                approval_status
             FROM unified_supply_view
             WHERE 1=1
         """]
@@ -0,0 +1,71 @@
+# utils/perf/__init__.py
+"""
+Shared performance tracing
+
+One tracer for every page (promoted from the Salesperson module's
+perf_logger): nested spans, automatic SQL spans via SQLAlchemy events,
+fragment render timing, a per-rerun waterfall and Chrome trace export.
+Finished runs go to the telemetry store (utils.perf_telemetry).
+
+VERSION: 2.0.0
+
+Usage:
+    from utils.perf import perf, PerfCategory as PC, traced_fragment, render_trace_view
+
+    perf.reset(page="legal_entity_performance")
+    with perf.track("Load data", PC.SQL):
+        ...
+    perf.finish()
+    render_trace_view()
+"""
+
+from .tracer import (
+    PERF_ENABLED,
+    PERF_VERBOSE,
+    PERF_SQL_DETAIL,
+    PERF_SUMMARY,
+    SLOW_THRESHOLD,
+    VERY_SLOW_THRESHOLD,
+    PerfCategory,
+    PC,
+    PerfRecord,
+    CacheEvent,
+    PerformanceLogger,
+    perf,
+    get_tracer,
+    current_tracer,
+    traced_fragment,
+)
+from .sql import instrument_engine, query_hint
+from .trace_view import (
+    PERF_TRACE_VIEW,
+    trace_frame,
+    to_chrome_trace,
+    trace_view_enabled,
+    render_trace_view,
+)
+
+__all__ = [
+    'PERF_ENABLED',
+    'PERF_VERBOSE',
+    'PERF_SQL_DETAIL',
+    'PERF_SUMMARY',
+    'SLOW_THRESHOLD',
+    'VERY_SLOW_THRESHOLD',
+    'PerfCategory',
+    'PC',
+    'PerfRecord',
+    'CacheEvent',
+    'PerformanceLogger',
+    'perf',
+    'get_tracer',
+    'current_tracer',
+    'traced_fragment',
+    'instrument_engine',
+    'query_hint',
+    'PERF_TRACE_VIEW',
+    'trace_frame',
+    'to_chrome_trace',
+    'trace_view_enabled',
+    'render_trace_view',
+]
@@ -0,0 +1,118 @@
+# utils/perf/sql.py
+"""
+SQLAlchemy instrumentation for the span tracer
+
+instrument_engine() attaches engine event listeners so every statement —
+pd.read_sql, conn.execute, execute_query_df, cached_query misses — shows up
+as an SQL span under whatever span is open in the calling thread, without
+wrapping each call site:
+
+- before/after_cursor_execute  → one span per statement (query hint = first
+                                 table read or written, rows = cursor rowcount)
+- handle_error                 → the failed statement, flagged error=True
+- do_connect / pool connect    → time spent opening a new DBAPI connection
+
+Listeners only record while the thread's tracer has an active run
+(perf.reset() … perf.finish()), so background threads and scripts cost one
+thread-local lookup per statement.
+
+VERSION: 1.0.0
+
+Usage:
+    engine = create_engine(...)
+    instrument_engine(engine)      # done once in utils.db._create_engine
+"""
+
+import logging
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from .tracer import current_tracer
+
+logger = logging.getLogger(__name__)
+
+_HINT_RE = re.compile(
+    r'\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)`?(?:\.`?(\w+)`?)?', re.IGNORECASE
+)
+_T0_KEY = '_perf_t0'
+_CONNECT_T0_KEY = '_perf_connect_t0'
+
+
+def query_hint(statement: str) -> Optional[str]:
+    """First table/view a statement reads or writes (schema prefix dropped)."""
+    match = _HINT_RE.search(statement or '')
+    if not match:
+        return None
+    return match.group(2) or match.group(1)
+
+
+# =============================================================================
+# LISTENERS
+# =============================================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_tracer() is None:
+        return
+    conn.info.setdefault(_T0_KEY, []).append(time.perf_counter())
+
+
+def _pop_start(conn) -> Optional[float]:
+    starts = conn.info.get(_T0_KEY)
+    return starts.pop() if starts else None
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = _pop_start(conn)
+    tracer = current_tracer()
+    if start is None or tracer is None:
+        return
+    rowcount = getattr(cursor, 'rowcount', -1)
+    metadata = {'executemany': True} if executemany else {}
+    tracer.log_statement(query_hint(statement), start, time.perf_counter() - start,
+                         rows=rowcount if rowcount is not None and rowcount >= 0 else None,
+                         **metadata)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    start = _pop_start(conn) if conn is not None else None
+    tracer = current_tracer()
+    if start is None or tracer is None:
+        return
+    tracer.log_statement(query_hint(exception_context.statement), start,
+                         time.perf_counter() - start, error=True)
+
+
+def _do_connect(dialect, conn_rec, cargs, cparams):
+    if current_tracer() is not None:
+        conn_rec.info[_CONNECT_T0_KEY] = time.perf_counter()
+
+
+def _pool_connect(dbapi_connection, connection_record):
+    start = connection_record.info.pop(_CONNECT_T0_KEY, None)
+    tracer = current_tracer()
+    if start is None or tracer is None:
+        return
+    tracer.log_statement('connect', start, time.perf_counter() - start, label="db connect")
+
+
+_LISTENERS = (
+    ('before_cursor_execute', _before_cursor_execute),
+    ('after_cursor_execute', _after_cursor_execute),
+    ('handle_error', _handle_error),
+    ('do_connect', _do_connect),
+)
+
+
+def instrument_engine(engine):
+    """Attach the tracer listeners to an engine (idempotent)."""
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return engine
+    for name, fn in _LISTENERS:
+        event.listen(engine, name, fn)
+    event.listen(engine.pool, 'connect', _pool_connect)
+    logger.debug("Perf tracer hooked into the database engine")
+    return engine
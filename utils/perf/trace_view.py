@@ -0,0 +1,162 @@
+# utils/perf/trace_view.py
+"""
+Per-rerun trace view — waterfall chart and Chrome trace export
+
+Every page that runs under the span tracer can call render_trace_view()
+at the end of its script. When tracing is switched on (PERF_TRACE_VIEW=1
+or ?trace=1 in the URL) it adds a collapsed "⏱️ Trace" expander with:
+
+- a waterfall of this rerun's spans (indented by nesting, coloured by
+  category, hover shows rows / query hint)
+- the span table (duration, self time, rows)
+- a download of the same spans as Chrome trace-event JSON, which opens in
+  chrome://tracing or https://ui.perfetto.dev for offline analysis
+
+to_chrome_trace() works on any tracer, so scripts can dump traces too.
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.perf import perf, render_trace_view
+
+    perf.finish()
+    render_trace_view()
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .tracer import PerformanceLogger, get_tracer
+
+logger = logging.getLogger(__name__)
+
+PERF_TRACE_VIEW = os.getenv('PERF_TRACE_VIEW', '0') == '1'
+
+_CATEGORY_COLORS = {
+    'INIT': '#94a3b8', 'SQL': '#ef4444', 'PANDAS': '#3b82f6', 'CACHE': '#22c55e',
+    'METRICS': '#a855f7', 'RENDER': '#f59e0b', 'FILTER': '#06b6d4',
+    'EXPORT': '#ec4899', 'OTHER': '#64748b',
+}
+
+
+# =============================================================================
+# DATA
+# =============================================================================
+
+def trace_frame(tracer: Optional[PerformanceLogger] = None) -> pd.DataFrame:
+    """Spans of one run as a frame (start offset, duration and self time in ms)."""
+    tracer = tracer or get_tracer()
+    records = tracer.export()
+    if not records:
+        return pd.DataFrame()
+    own = tracer.self_times()
+    df = pd.DataFrame(records)
+    df['start_ms'] = df['offset'] * 1000
+    df['duration_ms'] = df['duration'] * 1000
+    df['self_ms'] = df['span_id'].map(own).fillna(0) * 1000
+    df['end_ms'] = df['start_ms'] + df['duration_ms']
+    # Row label: start order + indentation (unique, so repeated labels get their own bar)
+    df['span'] = [f"{i + 1:>3}. {'· ' * d}{label}"
+                  for i, (d, label) in enumerate(zip(df['depth'], df['label']))]
+    return df
+
+
+def to_chrome_trace(tracer: Optional[PerformanceLogger] = None) -> Dict[str, Any]:
+    """Chrome trace-event JSON ('X' complete events, microseconds)."""
+    tracer = tracer or get_tracer()
+    events: List[Dict[str, Any]] = [{
+        'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1,
+        'args': {'name': tracer.page or 'page'},
+    }]
+    for r in tracer.export():
+        args = {k: v for k, v in r.items()
+                if k not in ('label', 'category', 'duration', 'offset', 'wall_time',
+                             'is_slow', 'is_very_slow') and v is not None}
+        events.append({
+            'name': r['label'],
+            'cat': r['category'],
+            'ph': 'X',
+            'ts': round(r['offset'] * 1e6, 1),
+            'dur': round(r['duration'] * 1e6, 1),
+            'pid': 1,
+            'tid': 1,
+            'args': args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+# =============================================================================
+# STREAMLIT VIEW
+# =============================================================================
+
+def trace_view_enabled() -> bool:
+    if PERF_TRACE_VIEW:
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get('trace') == '1'
+    except Exception:
+        return False
+
+
+def _waterfall(df: pd.DataFrame):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for category, group in df.groupby('category', sort=False):
+        fig.add_trace(go.Bar(
+            name=category,
+            y=group['span'],
+            x=group['duration_ms'],
+            base=group['start_ms'],
+            orientation='h',
+            marker_color=_CATEGORY_COLORS.get(category, '#64748b'),
+            customdata=group[['self_ms', 'rows', 'query_hint']].astype(object).where(
+                group[['self_ms', 'rows', 'query_hint']].notna(), ''),
+            hovertemplate=('%{y}<br>start %{base:.0f} ms · %{x:.1f} ms'
+                           '<br>self %{customdata[0]:.1f} ms · rows %{customdata[1]}'
+                           '<br>%{customdata[2]}<extra>%{fullData.name}</extra>'),
+        ))
+    fig.update_layout(
+        barmode='overlay',
+        height=max(240, 22 * len(df) + 80),
+        margin=dict(l=10, r=10, t=30, b=10),
+        xaxis_title='ms since rerun start',
+        yaxis=dict(autorange='reversed', categoryorder='array', categoryarray=list(df['span'])),
+        legend=dict(orientation='h', y=1.02, x=0),
+    )
+    return fig
+
+
+def render_trace_view(tracer: Optional[PerformanceLogger] = None, force: bool = False):
+    """Collapsed trace expander for this rerun (no-op unless tracing is on)."""
+    if not (force or trace_view_enabled()):
+        return
+    import streamlit as st
+
+    tracer = tracer or get_tracer()
+    df = trace_frame(tracer)
+    if df.empty:
+        return
+
+    with st.expander(f"⏱️ Trace — {tracer.total_duration:.2f}s tracked, "
+                     f"{len(df)} spans, SQL {tracer.sql_duration:.2f}s", expanded=False):
+        try:
+            st.plotly_chart(_waterfall(df), use_container_width=True)
+        except Exception as e:
+            logger.warning(f"Trace waterfall failed: {e}")
+        st.dataframe(
+            df[['span', 'category', 'start_ms', 'duration_ms', 'self_ms', 'rows', 'query_hint']].round(1),
+            use_container_width=True, hide_index=True,
+        )
+        st.download_button(
+            "⬇️ Chrome trace (JSON)",
+            data=json.dumps(to_chrome_trace(tracer), default=str),
+            file_name=f"trace_{tracer.page or 'page'}.json",
+            mime="application/json",
+            key=f"_perf_trace_download_{tracer.page}",
+        )
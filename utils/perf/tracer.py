@@ -0,0 +1,699 @@
+# utils/perf/tracer.py
+"""
+Span Tracer — nested performance spans for every page
+
+Promoted from utils/salesperson_performance/perf_logger.py (v1.1.0), which
+stays as a re-export shim. Same API (track / start / stop / log_sql /
+log_cache_hit / log_cache_miss / log_event / summary / export / persist),
+plus:
+
+- Nested spans: track() blocks opened inside another track() block record
+  their parent, so the summary, the waterfall and the Chrome trace show
+  a tree instead of a flat list. Category totals use self time
+  (duration minus children), so nesting never double counts.
+- Per-thread tracers: Streamlit runs every session's script in its own
+  thread, so `perf` resolves to the calling thread's tracer instead of one
+  module-global list shared (and mixed up) by all sessions.
+- Automatic SQL spans: utils.perf.sql hooks the SQLAlchemy engine; every
+  statement executed while a run is active becomes an SQL child of the
+  open span. A log_sql() record adopts the statements it covers.
+- traced_fragment: st.fragment plus a RENDER span; a fragment rerun on its
+  own is recorded as a run of its own.
+
+VERSION: 2.0.1
+
+Usage:
+    from utils.perf import perf, PerfCategory as PC, traced_fragment
+
+    perf.reset(page="kpi_center_performance")
+    with perf.track("Load unified raw data", PC.SQL) as t:
+        data = loader.get_unified_data()
+        t.rows = len(data['sales_raw_df'])
+    ...
+    perf.finish()     # summary + telemetry; stop collecting
+
+    @traced_fragment
+    def monthly_trend_fragment(...): ...
+"""
+
+import functools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONFIGURATION — THE ONLY PLACE TO CHANGE
+# =============================================================================
+
+# Master switch: enable/disable all performance tracking
+PERF_ENABLED = True
+
+# Verbose mode: print each step as it happens (noisy but useful for debugging)
+PERF_VERBOSE = False
+
+# SQL detail: print SQL query hints and row counts
+PERF_SQL_DETAIL = True
+
+# Summary at page end: print the waterfall summary table
+PERF_SUMMARY = True
+
+# Slow threshold (seconds): highlight steps slower than this
+SLOW_THRESHOLD = 1.0
+
+# Very slow threshold (seconds): flag as critical
+VERY_SLOW_THRESHOLD = 3.0
+
+
+# =============================================================================
+# CATEGORIES
+# =============================================================================
+
+class PerfCategory(str, Enum):
+    """Categories for performance tracking entries."""
+    INIT = "INIT"          # Initialization (auth, access control, DB check)
+    SQL = "SQL"            # Database queries
+    PANDAS = "PANDAS"      # In-memory Pandas operations
+    CACHE = "CACHE"        # Cache operations (hit/miss/clear)
+    METRICS = "METRICS"    # KPI & metrics calculations
+    RENDER = "RENDER"      # UI rendering & fragment execution
+    FILTER = "FILTER"      # Client-side filtering
+    EXPORT = "EXPORT"      # Report generation
+    OTHER = "OTHER"        # Anything else
+
+
+# Short aliases for compact usage
+PC = PerfCategory
+
+
+def _now_wall() -> str:
+    return datetime.now().strftime("%H:%M:%S.%f")[:-3]
+
+
+# =============================================================================
+# DATA STRUCTURES
+# =============================================================================
+
+@dataclass
+class PerfRecord:
+    """Single performance measurement (span)."""
+    label: str
+    category: PerfCategory
+    duration: float                    # seconds
+    timestamp: float                   # time.perf_counter() at start
+    wall_time: str                     # human-readable wall clock time
+    rows: Optional[int] = None         # row count (for SQL/Pandas results)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # For SQL tracking
+    query_hint: Optional[str] = None   # table/view name for SQL queries
+    # Span tree
+    span_id: int = 0
+    parent_id: Optional[int] = None
+    depth: int = 0
+    auto: bool = False                 # recorded by the SQLAlchemy hooks
+
+    @property
+    def is_slow(self) -> bool:
+        return self.duration >= SLOW_THRESHOLD
+
+    @property
+    def is_very_slow(self) -> bool:
+        return self.duration >= VERY_SLOW_THRESHOLD
+
+    @property
+    def severity_icon(self) -> str:
+        if self.is_very_slow:
+            return "🔴"
+        elif self.is_slow:
+            return "🟡"
+        return "🟢"
+
+
+@dataclass
+class CacheEvent:
+    """Cache hit/miss event."""
+    key: str
+    hit: bool
+    timestamp: float
+    wall_time: str
+    reason: Optional[str] = None   # for misses: why
+
+
+# =============================================================================
+# MAIN PERFORMANCE LOGGER CLASS
+# =============================================================================
+
+class PerformanceLogger:
+    """
+    Span tracer for one script thread.
+
+    Use the `perf` proxy rather than instantiating this directly — it
+    resolves to the calling thread's instance. Call reset() at the start of
+    each page load and finish() at the end. Outside reset() … finish()
+    nothing is recorded, so threads that never run a page (prefetch pool,
+    async executor, loaders) do not accumulate records.
+    """
+
+    def __init__(self):
+        self._records: List[PerfRecord] = []
+        self._cache_events: List[CacheEvent] = []
+        self._page_start: Optional[float] = None
+        self._page_start_wall: Optional[str] = None
+        self._active_tokens: Dict[int, tuple] = {}  # token_id → (start, label, category, wall, parent)
+        self._next_token: int = 0
+        self._stack: List[PerfRecord] = []          # open track() spans (placeholders)
+        self._next_span: int = 1
+        self.page: Optional[str] = None
+        self.active: bool = False
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def reset(self, page: Optional[str] = None):
+        """Reset all records and start collecting. Call at the start of each page load."""
+        self._records.clear()
+        self._cache_events.clear()
+        self._page_start = time.perf_counter()
+        self._page_start_wall = _now_wall()
+        self._active_tokens.clear()
+        self._next_token = 0
+        self._stack.clear()
+        self._next_span = 1
+        if page is not None:
+            self.page = page
+        self.active = PERF_ENABLED
+        if PERF_ENABLED and PERF_VERBOSE:
+            print(f"\n{'='*70}")
+            print(f"⏱️  PERF LOGGER RESET @ {self._page_start_wall}")
+            print(f"{'='*70}")
+
+    def finish(self, page: Optional[str] = None, print_summary: bool = True) -> Optional[str]:
+        """
+        End the run: print the summary, queue it for the telemetry store and
+        stop collecting (SQL hooks go quiet until the next reset()).
+
+        Returns the telemetry run_id (None when nothing was recorded).
+        """
+        if print_summary:
+            self.summary()
+        run_id = self.persist(page or self.page or "unknown")
+        self.active = False
+        return run_id
+
+    @property
+    def page_elapsed(self) -> Optional[float]:
+        return (time.perf_counter() - self._page_start) if self._page_start else None
+
+    # =========================================================================
+    # SPAN TREE
+    # =========================================================================
+
+    def _new_span_id(self) -> int:
+        span_id = self._next_span
+        self._next_span += 1
+        return span_id
+
+    def _parent(self):
+        """(parent_id, depth) for a span opened now."""
+        if self._stack:
+            top = self._stack[-1]
+            return top.span_id, top.depth + 1
+        return None, 0
+
+    def _append(self, record: PerfRecord):
+        self._records.append(record)
+        if PERF_VERBOSE:
+            self._print_record(record)
+
+    # =========================================================================
+    # CONTEXT MANAGER — Primary API
+    # =========================================================================
+
+    @contextmanager
+    def track(
+        self,
+        label: str,
+        category: PerfCategory = PerfCategory.OTHER,
+        rows: Optional[int] = None,
+        query_hint: Optional[str] = None,
+        **metadata
+    ):
+        """
+        Context manager for timing a code block (a span).
+
+        Usage:
+            with perf.track("get_sales_raw", PC.SQL) as t:
+                df = queries.get_sales_raw(...)
+            # optionally set rows after: t.rows = len(df)
+
+        Or with rows known upfront:
+            with perf.track("filter_sales", PC.PANDAS, rows=len(df)):
+                ...
+
+        Spans opened (and SQL executed) inside the block become its children.
+        """
+        if not PERF_ENABLED or not self.active:
+            yield _TrackContext()
+            return
+
+        ctx = _TrackContext()
+        parent_id, depth = self._parent()
+        record = PerfRecord(
+            label=label, category=category, duration=0.0,
+            timestamp=time.perf_counter(), wall_time=_now_wall(),
+            span_id=self._new_span_id(), parent_id=parent_id, depth=depth,
+        )
+        self._stack.append(record)
+
+        try:
+            yield ctx
+        finally:
+            record.duration = time.perf_counter() - record.timestamp
+            if self._stack and self._stack[-1] is record:
+                self._stack.pop()
+            elif record in self._stack:
+                self._stack.remove(record)
+            record.rows = ctx.rows if ctx.rows is not None else rows
+            record.query_hint = ctx.query_hint or query_hint
+            record.metadata = {**metadata, **ctx.metadata}
+            self._append(record)
+
+    # =========================================================================
+    # MANUAL START/STOP — For conditional paths
+    # =========================================================================
+
+    def start(self, label: str, category: PerfCategory = PerfCategory.OTHER) -> int:
+        """Start timing. Returns a token to pass to stop().
+
+        Manual spans get a parent but do not become one — they may stop in
+        any order.
+        """
+        if not PERF_ENABLED or not self.active:
+            return -1
+        token = self._next_token
+        self._next_token += 1
+        self._active_tokens[token] = (time.perf_counter(), label, category,
+                                      _now_wall(), self._parent())
+        return token
+
+    def stop(self, token: int, rows: Optional[int] = None, **metadata):
+        """Stop timing for the given token."""
+        if not PERF_ENABLED or not self.active or token < 0 or token not in self._active_tokens:
+            return
+        start_time, label, category, wall, (parent_id, depth) = self._active_tokens.pop(token)
+        self._append(PerfRecord(
+            label=label, category=category, duration=time.perf_counter() - start_time,
+            timestamp=start_time, wall_time=wall, rows=rows, metadata=metadata,
+            span_id=self._new_span_id(), parent_id=parent_id, depth=depth,
+        ))
+
+    # =========================================================================
+    # SPECIALIZED LOGGERS
+    # =========================================================================
+
+    def log_sql(
+        self,
+        query_name: str,
+        elapsed: float,
+        rows: int = 0,
+        query_hint: str = None,
+    ):
+        """
+        Log a SQL query execution (called from _execute_query).
+
+        Statements the SQLAlchemy hooks recorded during the last `elapsed`
+        seconds under the same parent are re-parented under this record.
+
+        Args:
+            query_name: Identifier for the query (e.g., "sales_data", "backlog_detail")
+            elapsed: Duration in seconds
+            rows: Number of rows returned
+            query_hint: Table/view name (e.g., "unified_sales_by_salesperson_view")
+        """
+        if not PERF_ENABLED or not self.active:
+            return
+        parent_id, depth = self._parent()
+        record = PerfRecord(
+            label=f"SQL: {query_name}",
+            category=PerfCategory.SQL,
+            duration=elapsed,
+            timestamp=time.perf_counter() - elapsed,
+            wall_time=_now_wall(),
+            rows=rows,
+            query_hint=query_hint,
+            span_id=self._new_span_id(), parent_id=parent_id, depth=depth,
+        )
+        for r in reversed(self._records):
+            if r.timestamp < record.timestamp:
+                break
+            if r.auto and r.parent_id == parent_id:
+                r.parent_id, r.depth = record.span_id, depth + 1
+        self._records.append(record)
+        if PERF_VERBOSE or PERF_SQL_DETAIL:
+            self._print_record(record)
+
+    def log_statement(self, query_hint: Optional[str], start: float, elapsed: float,
+                      rows: Optional[int] = None, label: Optional[str] = None, **metadata):
+        """Record one SQL statement / connect (called by the SQLAlchemy hooks)."""
+        if not PERF_ENABLED or not self.active:
+            return
+        parent_id, depth = self._parent()
+        self._append(PerfRecord(
+            label=label or f"sql {query_hint or 'statement'}",
+            category=PerfCategory.SQL,
+            duration=elapsed,
+            timestamp=start,
+            wall_time=_now_wall(),
+            rows=rows,
+            query_hint=query_hint,
+            metadata=metadata,
+            span_id=self._new_span_id(), parent_id=parent_id, depth=depth,
+            auto=True,
+        ))
+
+    def log_cache_hit(self, key: str):
+        """Log a cache hit event."""
+        if not PERF_ENABLED or not self.active:
+            return
+        self._cache_events.append(CacheEvent(
+            key=key, hit=True,
+            timestamp=time.perf_counter(),
+            wall_time=_now_wall(),
+        ))
+        if PERF_VERBOSE:
+            print(f"   ♻️  CACHE HIT: {key}")
+
+    def log_cache_miss(self, key: str, reason: str = None):
+        """Log a cache miss event."""
+        if not PERF_ENABLED or not self.active:
+            return
+        self._cache_events.append(CacheEvent(
+            key=key, hit=False,
+            timestamp=time.perf_counter(),
+            wall_time=_now_wall(),
+            reason=reason,
+        ))
+        if PERF_VERBOSE:
+            msg = f"   💾  CACHE MISS: {key}"
+            if reason:
+                msg += f" ({reason})"
+            print(msg)
+
+    def log_event(self, label: str, category: PerfCategory = PerfCategory.OTHER, **metadata):
+        """Log a zero-duration event (milestone marker)."""
+        if not PERF_ENABLED or not self.active:
+            return
+        parent_id, depth = self._parent()
+        self._records.append(PerfRecord(
+            label=label, category=category, duration=0.0,
+            timestamp=time.perf_counter(),
+            wall_time=_now_wall(),
+            metadata=metadata,
+            span_id=self._new_span_id(), parent_id=parent_id, depth=depth,
+        ))
+        if PERF_VERBOSE:
+            print(f"   📌  {label}")
+
+    # =========================================================================
+    # SUMMARY OUTPUT
+    # =========================================================================
+
+    def spans(self) -> List[PerfRecord]:
+        """Finished spans in start order (parents before their children)."""
+        return sorted(self._records, key=lambda r: (r.timestamp, r.depth))
+
+    def self_times(self) -> Dict[int, float]:
+        """span_id → duration minus the duration of its direct children."""
+        child_total: Dict[int, float] = {}
+        for r in self._records:
+            if r.parent_id is not None:
+                child_total[r.parent_id] = child_total.get(r.parent_id, 0.0) + r.duration
+        return {r.span_id: max(0.0, r.duration - child_total.get(r.span_id, 0.0))
+                for r in self._records}
+
+    def summary(self):
+        """Print formatted performance summary (indented span tree)."""
+        if not PERF_ENABLED or not PERF_SUMMARY:
+            return
+        if not self._records:
+            return
+
+        # Separate timed records from zero-duration event markers
+        timed = [r for r in self.spans() if r.duration > 0.001]
+        if not timed:
+            return
+
+        total = self.total_duration
+        page_elapsed = self.page_elapsed or total
+        own = self.self_times()
+
+        # Header
+        sql_count = sum(1 for r in timed if r.category == PerfCategory.SQL)
+        print(f"\n{'='*90}")
+        print(f"📊 PERFORMANCE SUMMARY  |  Page: {page_elapsed:.2f}s  |  "
+              f"Tracked: {total:.2f}s  |  "
+              f"{len(timed)} steps ({sql_count} SQL)")
+        print(f"{'='*90}")
+
+        # Column headers
+        hdr = (f"{'':3} {'Cat':<7} {'Label':<42} "
+               f"{'Time':>7} {'%':>5} {'Rows':>9} {'Note'}")
+        print(hdr)
+        print(f"{'─'*90}")
+
+        # Span tree in start order
+        for r in timed:
+            pct = (r.duration / total * 100) if total > 0 else 0
+            rows_str = f"{r.rows:>9,}" if r.rows is not None else f"{'':>9}"
+            note = r.query_hint or ""
+            if r.is_very_slow:
+                note = f"🔴 SLOW  {note}"
+            elif r.is_slow:
+                note = f"🟡 slow  {note}"
+            cat_str = r.category.value[:7].ljust(7)
+            label = ("  " * r.depth + r.label)[:42]
+
+            print(f"{r.severity_icon:3} {cat_str} {label:<42} "
+                  f"{r.duration:>6.3f}s {pct:>4.1f}% {rows_str} {note}")
+
+        # Totals by category (self time — nested spans are not counted twice)
+        print(f"{'─'*90}")
+
+        cat_totals = {}
+        for r in timed:
+            cat = r.category.value
+            cat_totals[cat] = cat_totals.get(cat, 0.0) + own[r.span_id]
+
+        for cat, dur in sorted(cat_totals.items(), key=lambda x: -x[1]):
+            pct = (dur / total * 100) if total > 0 else 0
+            bar = "█" * int(pct / 2.5) + "░" * (40 - int(pct / 2.5))
+            print(f"    {cat:<8} {dur:>7.3f}s ({pct:>5.1f}%)  {bar}")
+
+        print(f"{'─'*90}")
+        print(f"    {'TOTAL':<8} {total:>7.3f}s  |  "
+              f"Overhead (untracked): {max(0, page_elapsed - total):.2f}s")
+
+        # Cache summary
+        if self._cache_events:
+            hits = sum(1 for e in self._cache_events if e.hit)
+            misses = sum(1 for e in self._cache_events if not e.hit)
+            print(f"\n    Cache: {hits} hits, {misses} misses")
+            for e in self._cache_events:
+                if not e.hit:
+                    reason_str = f" — {e.reason}" if e.reason else ""
+                    print(f"      💾 MISS: {e.key}{reason_str}")
+
+        # SQL query reference (outermost SQL spans only)
+        sql_records = self._outer_sql(timed)
+        if sql_records:
+            sql_total = sum(r.duration for r in sql_records)
+            print(f"\n    SQL Queries ({len(sql_records)}, {sql_total:.2f}s):")
+            for r in sorted(sql_records, key=lambda x: -x.duration):
+                rows_str = f"{r.rows:,}" if r.rows is not None else "?"
+                hint = f"  [{r.query_hint}]" if r.query_hint else ""
+                print(f"      {r.severity_icon} {r.duration:.3f}s  {rows_str:>10} rows  "
+                      f"{r.label}{hint}")
+
+        print(f"{'='*90}\n")
+
+    def _outer_sql(self, records: List[PerfRecord]) -> List[PerfRecord]:
+        sql_ids = {r.span_id for r in self._records if r.category == PerfCategory.SQL}
+        return [r for r in records
+                if r.category == PerfCategory.SQL and r.parent_id not in sql_ids]
+
+    # =========================================================================
+    # EXPORT — Structured data for analysis
+    # =========================================================================
+
+    def export(self) -> List[Dict]:
+        """
+        Export all records as list of dicts for further analysis.
+
+        Can be used to:
+        - Store in session_state for UI display
+        - Write to JSON file for trend analysis
+        - Feed into a monitoring dashboard
+        """
+        origin = self._page_start
+        if origin is None and self._records:
+            origin = min(r.timestamp for r in self._records)
+        return [
+            {
+                "label": r.label,
+                "category": r.category.value,
+                "duration": round(r.duration, 4),
+                "wall_time": r.wall_time,
+                "rows": r.rows,
+                "query_hint": r.query_hint,
+                "is_slow": r.is_slow,
+                "is_very_slow": r.is_very_slow,
+                "span_id": r.span_id,
+                "parent_id": r.parent_id,
+                "depth": r.depth,
+                "offset": round(r.timestamp - origin, 4),
+                **({"auto": True} if r.auto else {}),
+                **r.metadata,
+            }
+            for r in self.spans()
+        ]
+
+    def export_cache_events(self) -> List[Dict]:
+        """Export cache events as list of dicts."""
+        return [
+            {
+                "key": e.key,
+                "hit": e.hit,
+                "wall_time": e.wall_time,
+                "reason": e.reason,
+            }
+            for e in self._cache_events
+        ]
+
+    def persist(self, page: Optional[str] = None) -> Optional[str]:
+        """Queue this run's records and cache events for the telemetry store."""
+        if not PERF_ENABLED or not self._records:
+            return None
+        from ..perf_telemetry import record_run
+
+        return record_run(page or self.page or "unknown", self.export(),
+                          self.export_cache_events(), page_duration=self.page_elapsed)
+
+    @property
+    def total_duration(self) -> float:
+        """Total tracked duration in seconds (root spans only)."""
+        return sum(r.duration for r in self._records
+                   if r.parent_id is None and r.duration > 0.001)
+
+    @property
+    def sql_duration(self) -> float:
+        """Total SQL query duration in seconds (outermost SQL spans)."""
+        return sum(r.duration for r in self._outer_sql(self._records) if r.duration > 0.001)
+
+    @property
+    def record_count(self) -> int:
+        """Number of timed records (excludes zero-duration events)."""
+        return sum(1 for r in self._records if r.duration > 0.001)
+
+    # =========================================================================
+    # INTERNALS
+    # =========================================================================
+
+    def _print_record(self, r: PerfRecord):
+        """Print a single record in verbose mode."""
+        rows_str = f" → {r.rows:,} rows" if r.rows is not None else ""
+        hint_str = f"  [{r.query_hint}]" if r.query_hint else ""
+        indent = "  " * r.depth
+        print(f"   {r.severity_icon} [{r.category.value:<6}] {indent}{r.label:<40} "
+              f"{r.duration:.3f}s{rows_str}{hint_str}")
+
+
+class _TrackContext:
+    """Mutable context returned by track() for post-hoc metadata."""
+    def __init__(self):
+        self.rows: Optional[int] = None
+        self.query_hint: Optional[str] = None
+        self.metadata: Dict[str, Any] = {}
+
+
+# =============================================================================
+# PER-THREAD TRACER
+# =============================================================================
+
+_local = threading.local()
+
+
+def get_tracer() -> PerformanceLogger:
+    """The calling thread's tracer (created on first use)."""
+    tracer = getattr(_local, 'tracer', None)
+    if tracer is None:
+        tracer = _local.tracer = PerformanceLogger()
+    return tracer
+
+
+def current_tracer() -> Optional[PerformanceLogger]:
+    """The calling thread's tracer if a run is being collected, else None."""
+    tracer = getattr(_local, 'tracer', None)
+    return tracer if tracer is not None and tracer.active else None
+
+
+class _PerfProxy:
+    """Module-level `perf`: forwards every call to the calling thread's tracer."""
+
+    def __getattr__(self, name):
+        return getattr(get_tracer(), name)
+
+    def __repr__(self):
+        return f"<perf proxy → {get_tracer()!r}>"
+
+
+perf = _PerfProxy()
+"""Module-level entry point. Import and use directly:
+    from utils.perf import perf, PerfCategory as PC
+"""
+
+
+# =============================================================================
+# FRAGMENTS
+# =============================================================================
+
+def traced_fragment(func: Optional[Callable] = None, *, label: Optional[str] = None, **fragment_kwargs):
+    """
+    st.fragment with a RENDER span around every execution
+
+    Usable bare (@traced_fragment) or with st.fragment arguments
+    (@traced_fragment(run_every="30s")). During a full page run the span
+    nests under whatever is open; a fragment-only rerun has no active run,
+    so it is collected and persisted as a run of its own
+    ('<page>.fragment').
+    """
+    def decorator(fn):
+        import streamlit as st
+
+        name = label or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            standalone = PERF_ENABLED and not tracer.active
+            if standalone:
+                tracer.reset()
+            try:
+                with tracer.track(f"fragment: {name}", PerfCategory.RENDER, fragment=name):
+                    return fn(*args, **kwargs)
+            finally:
+                if standalone:
+                    tracer.finish(page=f"{tracer.page or 'unknown'}.fragment", print_summary=PERF_VERBOSE)
+
+        return st.fragment(wrapper, **fragment_kwargs)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
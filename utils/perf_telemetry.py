@@ -0,0 +1,421 @@
+# utils/perf_telemetry.py
+"""
+Performance Telemetry Store
+
+Pages already measure themselves (perf_logger records, the KPI / Legal Entity
+timing lists, Credit Control's _perf log, the Delivery Schedule perf log) but
+only print the result. This module persists every page run to a local
+rolling SQLite file so regressions show up over time and across deploys.
+Every page ends its run with utils.perf's perf.finish(), which calls
+record_run() — Legal Entity, Salesperson, KPI Center, Delivery Schedule,
+Credit Control, Net GAP, Period GAP, Allocation Plan, Safety Stock,
+Landed Cost, Inventory Quality and Materialization Manager:
+
+- runs          one row per page run (page, user, session, deploy, totals)
+- records       one row per timed step (category, label, query hint, rows)
+- cache_events  one row per cache hit / miss
+
+Writes go through a process-wide queue drained by one background thread
+(batched inserts, WAL mode), so a page never waits on disk I/O. Rows older
+than PERF_TELEMETRY_RETENTION_DAYS are pruned by the writer. The Performance
+Telemetry page reads the same file.
+
+Tags:
+    page        given by the caller ('salesperson_performance', 'net_gap', ...);
+                fragment-only reruns are stored as '<page>.fragment'
+    user        st.session_state.username
+    session_id  Streamlit session id
+    deploy      APP_VERSION / DEPLOY_TAG env, else the git short SHA
+
+VERSION: 1.1.1
+
+Usage:
+    from utils.perf_telemetry import record_run, timings_to_records
+
+    record_run('kpi_center_performance',
+               timings_to_records(st.session_state[CACHE_KEY_TIMING]))
+
+    # utils.perf tracer: perf.finish() / perf.persist('salesperson_performance')
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+PERF_TELEMETRY_ENABLED = os.getenv('PERF_TELEMETRY_ENABLED', '1') != '0'
+PERF_TELEMETRY_PATH = os.getenv(
+    'PERF_TELEMETRY_PATH',
+    str(Path(__file__).resolve().parent.parent / '.perf' / 'telemetry.sqlite'),
+)
+PERF_TELEMETRY_RETENTION_DAYS = int(os.getenv('PERF_TELEMETRY_RETENTION_DAYS', '30'))
+
+_PRUNE_INTERVAL_SECONDS = 3600
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    page TEXT NOT NULL,
+    user TEXT,
+    session_id TEXT,
+    deploy TEXT,
+    page_s REAL,
+    tracked_s REAL,
+    sql_s REAL,
+    steps INTEGER,
+    cache_hits INTEGER,
+    cache_misses INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_runs_ts ON runs (ts);
+
+CREATE TABLE IF NOT EXISTS records (
+    run_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    page TEXT NOT NULL,
+    category TEXT,
+    label TEXT,
+    query_hint TEXT,
+    duration REAL,
+    rows INTEGER,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_records_ts ON records (ts);
+
+CREATE TABLE IF NOT EXISTS cache_events (
+    run_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    page TEXT NOT NULL,
+    key TEXT,
+    hit INTEGER,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_cache_events_ts ON cache_events (ts);
+"""
+
+
+# =============================================================================
+# TAGS
+# =============================================================================
+
+_deploy_tag: Optional[str] = None
+
+
+def get_deploy_tag() -> str:
+    """Deploy identifier: APP_VERSION / DEPLOY_TAG env, else git short SHA."""
+    global _deploy_tag
+    if _deploy_tag is None:
+        tag = os.getenv('APP_VERSION') or os.getenv('DEPLOY_TAG')
+        if not tag:
+            try:
+                tag = subprocess.run(
+                    ['git', 'rev-parse', '--short', 'HEAD'],
+                    cwd=Path(__file__).resolve().parent, capture_output=True,
+                    text=True, timeout=2,
+                ).stdout.strip()
+            except Exception:
+                tag = ''
+        _deploy_tag = tag or 'unknown'
+    return _deploy_tag
+
+
+def _session_tags() -> Dict[str, Optional[str]]:
+    """user / session_id of the current Streamlit session (None outside one)."""
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        return {
+            'user': st.session_state.get('username') if ctx else None,
+            'session_id': ctx.session_id if ctx else None,
+        }
+    except Exception:
+        return {'user': None, 'session_id': None}
+
+
+# =============================================================================
+# WRITER (process-wide background thread)
+# =============================================================================
+
+class _TelemetryWriter:
+    """Drains queued runs into SQLite in batches."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._last_prune = 0.0
+        self._thread = threading.Thread(target=self._run, name="perf-telemetry", daemon=True)
+        self._thread.start()
+
+    def submit(self, run: Dict[str, Any]):
+        self._queue.put(run)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued run is written (tests / shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None:
+                    conn = self._connect()
+                self._write(conn, batch)
+                if time.time() - self._last_prune > _PRUNE_INTERVAL_SECONDS:
+                    self._prune(conn)
+            except Exception as e:
+                logger.warning(f"Perf telemetry write failed ({len(batch)} runs): {e}")
+                conn = None
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, batch: List[Dict[str, Any]]):
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO runs VALUES (:run_id, :ts, :page, :user, :session_id, :deploy, "
+                ":page_s, :tracked_s, :sql_s, :steps, :cache_hits, :cache_misses)",
+                [run['run'] for run in batch],
+            )
+            conn.executemany(
+                "INSERT INTO records VALUES (:run_id, :ts, :page, :category, :label, :query_hint, "
+                ":duration, :rows, :metadata)",
+                [r for run in batch for r in run['records']],
+            )
+            conn.executemany(
+                "INSERT INTO cache_events VALUES (:run_id, :ts, :page, :key, :hit, :reason)",
+                [e for run in batch for e in run['cache_events']],
+            )
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = time.time() - PERF_TELEMETRY_RETENTION_DAYS * 86400
+        with conn:
+            for table in ('runs', 'records', 'cache_events'):
+                conn.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff,))
+        self._last_prune = time.time()
+
+
+_writer: Optional[_TelemetryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _TelemetryWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _TelemetryWriter(PERF_TELEMETRY_PATH)
+                logger.info(f"Perf telemetry writing to {PERF_TELEMETRY_PATH}")
+    return _writer
+
+
+def flush_telemetry(timeout: float = 5.0) -> bool:
+    """Block until queued runs are on disk."""
+    return _writer.flush(timeout) if _writer is not None else True
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+def timings_to_records(timings: Iterable, category: str = 'OTHER') -> List[Dict[str, Any]]:
+    """
+    Normalize the pages' ad-hoc timing logs into perf_logger.export() dicts
+
+    Accepts {'name', 'time'[s], ...extra} dicts (KPI Center / Legal Entity /
+    Delivery Schedule) and (label, ms) tuples (Credit Control).
+    """
+    records = []
+    for item in timings:
+        if isinstance(item, dict):
+            extra = {k: v for k, v in item.items() if k not in ('name', 'time')}
+            records.append({'label': item['name'], 'category': category,
+                            'duration': item['time'], **extra})
+        else:
+            label, ms = item
+            records.append({'label': label, 'category': category, 'duration': ms / 1000})
+    return records
+
+
+_RECORD_KEYS = ('label', 'category', 'duration', 'rows', 'query_hint',
+                'wall_time', 'is_slow', 'is_very_slow')
+
+
+def record_run(
+    page: str,
+    records: List[Dict[str, Any]],
+    cache_events: Optional[List[Dict[str, Any]]] = None,
+    page_duration: Optional[float] = None,
+    **tags,
+) -> Optional[str]:
+    """
+    Queue one page run for the telemetry store
+
+    Args:
+        page: Page / module name
+        records: perf_logger.export()-style dicts (label, category, duration[s],
+                 rows, query_hint; other keys are kept as metadata)
+        cache_events: perf_logger.export_cache_events()-style dicts (key, hit, reason)
+        page_duration: Wall time of the whole run in seconds (default: sum of records)
+        **tags: Override user / session_id / deploy
+
+    Returns:
+        run_id, or None when telemetry is disabled or there is nothing to record
+    """
+    if not PERF_TELEMETRY_ENABLED or not records:
+        return None
+
+    try:
+        run_id = uuid.uuid4().hex
+        ts = time.time()
+        base_tags = {**_session_tags(), 'deploy': get_deploy_tag(), **tags}
+        cache_events = cache_events or []
+
+        rows = []
+        for r in records:
+            metadata = {k: v for k, v in r.items() if k not in _RECORD_KEYS}
+            rows.append({
+                'run_id': run_id, 'ts': ts, 'page': page,
+                'category': str(r.get('category') or 'OTHER'),
+                'label': str(r.get('label')),
+                'query_hint': r.get('query_hint'),
+                'duration': float(r.get('duration') or 0.0),
+                'rows': int(r['rows']) if r.get('rows') is not None else None,
+                'metadata': json.dumps(metadata, default=str) if metadata else None,
+            })
+
+        # Nested spans (utils.perf) carry span_id / parent_id: count root spans
+        # and outermost SQL spans only, so children are not added twice.
+        sql_ids = {r.get('span_id') for r in records
+                   if r.get('span_id') is not None and str(r.get('category')) == 'SQL'}
+        roots = [row for r, row in zip(records, rows) if r.get('parent_id') is None]
+        outer_sql = [row for r, row in zip(records, rows)
+                     if row['category'] == 'SQL' and r.get('parent_id') not in sql_ids]
+        tracked = sum(row['duration'] for row in roots)
+        run = {
+            'run_id': run_id, 'ts': ts, 'page': page,
+            'user': base_tags.get('user'),
+            'session_id': base_tags.get('session_id'),
+            'deploy': base_tags.get('deploy'),
+            'page_s': page_duration if page_duration is not None else tracked,
+            'tracked_s': tracked,
+            'sql_s': sum(row['duration'] for row in outer_sql),
+            'steps': len(rows),
+            'cache_hits': sum(1 for e in cache_events if e.get('hit')),
+            'cache_misses': sum(1 for e in cache_events if not e.get('hit')),
+        }
+        events = [
+            {'run_id': run_id, 'ts': ts, 'page': page, 'key': e.get('key'),
+             'hit': int(bool(e.get('hit'))), 'reason': e.get('reason')}
+            for e in cache_events
+        ]
+
+        _get_writer().submit({'run': run, 'records': rows, 'cache_events': events})
+        return run_id
+
+    except Exception as e:
+        logger.warning(f"Perf telemetry: could not record run for {page}: {e}")
+        return None
+
+
+# =============================================================================
+# READING (dashboard)
+# =============================================================================
+
+def _read(query: str, params=()) -> pd.DataFrame:
+    if not Path(PERF_TELEMETRY_PATH).exists():
+        return pd.DataFrame()
+    conn = sqlite3.connect(PERF_TELEMETRY_PATH, timeout=10)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        logger.error(f"Error reading perf telemetry: {e}")
+        return pd.DataFrame()
+    finally:
+        conn.close()
+
+
+def _since_clause(since_days: float, page: Optional[str], alias: str = ''):
+    prefix = f"{alias}." if alias else ''
+    clause = f"{prefix}ts >= ?"
+    params = [time.time() - since_days * 86400]
+    if page:
+        clause += f" AND {prefix}page = ?"
+        params.append(page)
+    return clause, params
+
+
+def load_runs(since_days: float = 7, page: Optional[str] = None) -> pd.DataFrame:
+    clause, params = _since_clause(since_days, page)
+    df = _read(f"SELECT * FROM runs WHERE {clause} ORDER BY ts", params)
+    if not df.empty:
+        df['time'] = pd.to_datetime(df['ts'], unit='s')
+    return df
+
+
+def load_records(since_days: float = 7, page: Optional[str] = None) -> pd.DataFrame:
+    clause, params = _since_clause(since_days, page, alias='r')
+    df = _read(
+        f"SELECT r.*, u.deploy, u.user FROM records r LEFT JOIN runs u USING (run_id) "
+        f"WHERE {clause} ORDER BY r.ts",
+        params,
+    )
+    if not df.empty:
+        df['time'] = pd.to_datetime(df['ts'], unit='s')
+    return df
+
+
+def load_cache_events(since_days: float = 7, page: Optional[str] = None) -> pd.DataFrame:
+    clause, params = _since_clause(since_days, page)
+    df = _read(f"SELECT * FROM cache_events WHERE {clause} ORDER BY ts", params)
+    if not df.empty:
+        df['time'] = pd.to_datetime(df['ts'], unit='s')
+    return df
+
+
+__all__ = [
+    'PERF_TELEMETRY_ENABLED',
+    'PERF_TELEMETRY_PATH',
+    'get_deploy_tag',
+    'record_run',
+    'timings_to_records',
+    'flush_telemetry',
+    'load_runs',
+    'load_records',
+    'load_cache_events',
+]
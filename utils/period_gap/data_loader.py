@@ -3,6 +3,7 @@
 Simplified Data Loader for Period GAP Analysis
 With numeric safety and proper data handling
 Version 2.0 - Added ETA/ETD selection support for OC
+Version 2.1 - Source views read from the shared supply/demand snapshot service
 """
 
 import streamlit as st
@@ -10,13 +11,12 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Optional
 import logging
-from sqlalchemy import text
 
 # Import only shared core modules
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.db import get_db_engine
+from utils.supply_demand_snapshot import get_snapshot_service, filter_po
 
 logger = logging.getLogger(__name__)
 
@@ -27,100 +27,45 @@ class PeriodGAPDataLoader:
         self._cache = {}
     
     # === CORE LOADING METHODS ===
+    # Source views come from the shared supply/demand snapshot service
+    # (explicit projection, normalized numerics/dates, scheduled refresh).
+    # Returned frames are shared: copy before adding columns.
     
-    @st.cache_data(ttl=1800)
-    def load_demand_oc(_self):
+    def load_demand_oc(self):
         """Load OC (Order Confirmation) pending delivery data"""
-        engine = get_db_engine()
-        query = "SELECT * FROM prostechvn.outbound_oc_pending_delivery_view;"
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'selling_quantity', 'standard_quantity', 
-            'pending_selling_delivery_quantity', 'pending_standard_delivery_quantity',
-            'total_amount_usd', 'outstanding_amount_usd', 'uom_conversion'
-        ])
-        
+        df = get_snapshot_service().get('oc_pending')
         logger.info(f"Loaded {len(df)} OC pending delivery records")
         return df
 
-    @st.cache_data(ttl=1800)
-    def load_demand_forecast(_self):
+    def load_demand_forecast(self):
         """Load customer demand forecast data"""
-        engine = get_db_engine()
-        query = "SELECT * FROM prostechvn.customer_demand_forecast_full_view;"
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'selling_quantity', 'standard_quantity',
-            'total_amount_usd', 'standard_unit_price_usd'
-        ])
-        
+        df = get_snapshot_service().get('forecast')
         logger.info(f"Loaded {len(df)} forecast records")
         return df
     
-    @st.cache_data(ttl=1800)
-    def load_inventory(_self):
+    def load_inventory(self):
         """Load current inventory data"""
-        engine = get_db_engine()
-        query = "SELECT * FROM prostechvn.inventory_detailed_view"
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'remaining_quantity', 'inventory_value_usd'
-        ])
-        
+        df = get_snapshot_service().get('inventory')
         logger.info(f"Loaded {len(df)} inventory records")
         return df
 
-    @st.cache_data(ttl=1800)
-    def load_pending_can(_self):
+    def load_pending_can(self):
         """Load pending CAN (Container Arrival Note) data"""
-        engine = get_db_engine()
-        query = "SELECT * FROM prostechvn.can_pending_stockin_view"
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'pending_quantity', 'pending_value_usd'
-        ])
-        
+        df = get_snapshot_service().get('pending_can')
         logger.info(f"Loaded {len(df)} pending CAN records")
         return df
 
-    @st.cache_data(ttl=1800)
     def load_pending_po(
-        _self,
+        self,
         po_approval_statuses: tuple = ('APPROVED',),
         po_order_types: tuple = ('REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER'),
     ):
         """Load pending PO data with optional approval_status and order_type filters"""
-        engine = get_db_engine()
-        
-        # Build WHERE clauses for PO filters
-        conditions = ["pending_standard_arrival_quantity > 0"]
-        
-        if po_approval_statuses:
-            placeholders = ', '.join(f"'{s}'" for s in po_approval_statuses)
-            conditions.append(f"approval_status IN ({placeholders})")
-        
-        if po_order_types:
-            placeholders = ', '.join(f"'{t}'" for t in po_order_types)
-            conditions.append(f"(purchase_order_type IN ({placeholders}) OR purchase_order_type IS NULL)")
-        
-        where_clause = ' AND '.join(conditions)
-        query = f"SELECT * FROM prostechvn.purchase_order_full_view WHERE {where_clause}"
-        
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'pending_standard_arrival_quantity', 'outstanding_arrival_amount_usd',
-            'buying_quantity', 'purchase_unit_cost'
-        ])
+        df = filter_po(
+            get_snapshot_service().get('purchase_order'),
+            po_approval_statuses=po_approval_statuses,
+            po_order_types=po_order_types,
+        )
         
         logger.info(
             f"Loaded {len(df)} pending PO records "
@@ -128,21 +73,9 @@ class PeriodGAPDataLoader:
         )
         return df
 
-    @st.cache_data(ttl=1800)
-    def load_pending_wh_transfer(_self):
+    def load_pending_wh_transfer(self):
         """Load pending Warehouse Transfer data"""
-        engine = get_db_engine()
-        query = """
-        SELECT * FROM prostechvn.warehouse_transfer_details_view wtdv
-        WHERE wtdv.is_completed = 0
-        """
-        df = pd.read_sql(text(query), engine)
-        
-        # Ensure numeric columns
-        df = _self._ensure_numeric_columns(df, [
-            'transfer_quantity', 'warehouse_transfer_value_usd'
-        ])
-        
+        df = get_snapshot_service().get('wh_transfer')
         logger.info(f"Loaded {len(df)} pending WH transfer records")
         return df
     
@@ -456,14 +389,14 @@ class PeriodGAPDataLoader:
         if "OC" in sources:
             df_oc = self.load_demand_oc()
             if not df_oc.empty:
-                df_oc["source_type"] = "OC"
+                df_oc = df_oc.assign(source_type="OC")
                 df_oc = self._standardize_demand_df(df_oc, is_forecast=False, oc_date_field=oc_date_field)
                 df_parts.append(df_oc)
         
         if "Forecast" in sources:
             df_fc = self.load_demand_forecast()
             if not df_fc.empty:
-                df_fc["source_type"] = "Forecast"
+                df_fc = df_fc.assign(source_type="Forecast")
                 standardized_fc = self._standardize_demand_df(df_fc, is_forecast=True)
                 
                 if not include_converted and 'is_converted_to_oc' in standardized_fc.columns:
@@ -550,4 +483,5 @@ class PeriodGAPDataLoader:
     def clear_cache(self):
         """Clear data cache"""
         self._cache.clear()
+        get_snapshot_service().invalidate()
         st.cache_data.clear()
\ No newline at end of file
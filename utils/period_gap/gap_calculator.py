@@ -4,6 +4,7 @@ GAP Calculation with Carry Forward Logic
 Core calculation engine for Period GAP Analysis
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 import logging
@@ -30,7 +31,6 @@ def calculate_gap_with_carry_forward(
         DataFrame with GAP analysis by product and period
     """
     from .period_processor import PeriodBasedGAPProcessor
-    from .period_helpers import parse_week_period, parse_month_period
     
     # Early return if both empty
     if df_demand.empty and df_supply.empty:
@@ -48,127 +48,98 @@ def calculate_gap_with_carry_forward(
         st.warning("No valid period data for GAP calculation")
         return pd.DataFrame()
     
-    # Apply carry forward logic with proper backlog tracking
-    results = []
-    products = period_data['pt_code'].unique()
-    
-    for product in products:
-        product_data = period_data[period_data['pt_code'] == product].copy()
-        
-        # Sort by period BEFORE any processing
-        if period_type == "Weekly":
-            product_data['sort_key'] = product_data['period'].apply(parse_week_period)
-        elif period_type == "Monthly":
-            product_data['sort_key'] = product_data['period'].apply(parse_month_period)
-        else:
-            product_data['sort_key'] = pd.to_datetime(product_data['period'], errors='coerce')
+    # period_data is sorted by (pt_code, period_key): walk it once, resetting
+    # the running balances at each product boundary
+    pt_codes = period_data['pt_code'].to_numpy()
+    supply_qty = period_data['supply_quantity'].to_numpy(dtype=float)
+    demand_qty = period_data['demand_quantity'].to_numpy(dtype=float)
+    n = len(period_data)
+    
+    begin_inv = np.zeros(n)
+    total_avail = np.zeros(n)
+    gaps = np.zeros(n)
+    fill_rates = np.zeros(n)
+    backlog_prev = np.zeros(n)
+    effective = np.zeros(n)
+    backlog_next = np.zeros(n)
+    
+    carry_forward = 0  # Positive inventory carried forward
+    backlog = 0        # Negative balance (unfulfilled demand) from previous period
+    
+    for i in range(n):
+        if i == 0 or pt_codes[i] != pt_codes[i - 1]:
+            carry_forward = 0
+            backlog = 0
         
-        # Sort by the sort key
-        product_data = product_data.sort_values('sort_key')
-        product_data = product_data.drop(columns=['sort_key'])
+        supply = supply_qty[i]
+        demand = demand_qty[i]
+        begin_inv[i] = carry_forward
         
-        # Initialize tracking variables
-        carry_forward = 0  # Positive inventory carried forward
-        backlog = 0        # Negative balance (unfulfilled demand) from previous period
-        
-        for idx, (_, row) in enumerate(product_data.iterrows()):
-            # Store values at beginning of period
-            begin_inventory = carry_forward
-            backlog_from_previous = backlog
+        if track_backlog:
+            # ENHANCED LOGIC: Track both positive and negative balances
+            backlog_prev[i] = backlog
             
-            if track_backlog:
-                # ENHANCED LOGIC: Track both positive and negative balances
-                
-                # Calculate effective demand (current demand + backlog from previous)
-                effective_demand = row['demand_quantity'] + backlog
-                
-                # Total available = current supply + carried forward inventory
-                total_available = row['supply_quantity'] + carry_forward
-                
-                # Calculate gap
-                gap = total_available - effective_demand
-                
-                # Update tracking variables for NEXT period
-                if gap >= 0:
-                    # Surplus: clear backlog, set carry forward
-                    carry_forward = gap
-                    backlog = 0
-                else:
-                    # Shortage: clear carry forward, set backlog to negative gap
-                    carry_forward = 0
-                    backlog = abs(gap)
-                
-                # Calculate fulfillment rate based on effective demand
-                if effective_demand > 0:
-                    fulfillment_rate = min(100, (total_available / effective_demand * 100))
-                else:
-                    fulfillment_rate = 100 if total_available > 0 else 0
-                
-            else:
-                # ORIGINAL LOGIC: Only positive carry forward
-                total_available = row['supply_quantity'] + carry_forward
-                gap = total_available - row['demand_quantity']
-                
-                if row['demand_quantity'] > 0:
-                    fulfillment_rate = min(100, (total_available / row['demand_quantity'] * 100))
-                else:
-                    fulfillment_rate = 100 if total_available > 0 else 0
-                
-                # Update carry forward (original logic)
-                carry_forward = max(0, gap)
-                
-                # No backlog tracking
-                effective_demand = row['demand_quantity']
-                backlog_from_previous = 0
+            # Effective demand = current demand + backlog from previous
+            eff = demand + backlog
+            # Total available = current supply + carried forward inventory
+            total = supply + carry_forward
+            gap = total - eff
             
-            # Determine status
+            # Update tracking variables for NEXT period
             if gap >= 0:
-                status = "✅ Fulfilled"
+                carry_forward = gap
+                backlog = 0
             else:
-                status = "❌ Shortage"
+                carry_forward = 0
+                backlog = abs(gap)
             
-            # Build result row
-            result_row = {
-                'pt_code': row['pt_code'],
-                'brand': row.get('brand', ''),
-                'product_name': row.get('product_name', ''),
-                'package_size': row.get('package_size', ''),
-                'standard_uom': row.get('standard_uom', ''),
-                'period': row['period'],  # Keep clean period format
-                'begin_inventory': begin_inventory,
-                'supply_in_period': row['supply_quantity'],
-                'total_available': total_available,
-                'total_demand_qty': row['demand_quantity'],
-                'gap_quantity': gap,
-                'fulfillment_rate_percent': fulfillment_rate,
-                'fulfillment_status': status
-            }
-            
-            # Add backlog info if tracking
-            if track_backlog:
-                result_row['backlog_qty'] = backlog_from_previous
-                result_row['effective_demand'] = effective_demand
-                result_row['backlog_to_next'] = backlog
+            if eff > 0:
+                fill_rates[i] = min(100, (total / eff * 100))
+            else:
+                fill_rates[i] = 100 if total > 0 else 0
             
-            results.append(result_row)
-    
-    gap_df = pd.DataFrame(results)
-    
-    # Sort the entire result dataframe by product and period
-    if not gap_df.empty:
-        if period_type == "Weekly":
-            gap_df['_sort_product'] = gap_df['pt_code']
-            gap_df['_sort_period'] = gap_df['period'].apply(parse_week_period)
-        elif period_type == "Monthly":
-            gap_df['_sort_product'] = gap_df['pt_code']
-            gap_df['_sort_period'] = gap_df['period'].apply(parse_month_period)
+            effective[i] = eff
+            backlog_next[i] = backlog
         else:
-            gap_df['_sort_product'] = gap_df['pt_code']
-            gap_df['_sort_period'] = pd.to_datetime(gap_df['period'], errors='coerce')
+            # ORIGINAL LOGIC: Only positive carry forward
+            total = supply + carry_forward
+            gap = total - demand
+            
+            if demand > 0:
+                fill_rates[i] = min(100, (total / demand * 100))
+            else:
+                fill_rates[i] = 100 if total > 0 else 0
+            
+            carry_forward = max(0, gap)
         
-        gap_df = gap_df.sort_values(['_sort_product', '_sort_period'])
-        gap_df = gap_df.drop(columns=['_sort_product', '_sort_period'])
-        gap_df = gap_df.reset_index(drop=True)
+        total_avail[i] = total
+        gaps[i] = gap
+    
+    def _info(col):
+        return period_data[col].to_numpy() if col in period_data.columns else ''
+    
+    gap_df = pd.DataFrame({
+        'pt_code': pt_codes,
+        'brand': _info('brand'),
+        'product_name': _info('product_name'),
+        'package_size': _info('package_size'),
+        'standard_uom': _info('standard_uom'),
+        'period': period_data['period'].to_numpy(),  # Label for display
+        'period_key': period_data['period_key'].to_numpy(),
+        'begin_inventory': begin_inv,
+        'supply_in_period': supply_qty,
+        'total_available': total_avail,
+        'total_demand_qty': demand_qty,
+        'gap_quantity': gaps,
+        'fulfillment_rate_percent': fill_rates,
+        'fulfillment_status': np.where(gaps >= 0, "✅ Fulfilled", "❌ Shortage"),
+    })
+    
+    # Add backlog info if tracking
+    if track_backlog:
+        gap_df['backlog_qty'] = backlog_prev
+        gap_df['effective_demand'] = effective
+        gap_df['backlog_to_next'] = backlog_next
     
     logger.info(f"GAP calculation complete: {len(gap_df)} rows, {gap_df['pt_code'].nunique()} products")
     
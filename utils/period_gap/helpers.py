@@ -10,8 +10,15 @@ Version 3.0 - Enhanced Excel Export with:
   - Pivot View sheet
   - Action Items sheet
   - Past period indicator
+Version 3.1 - Product/Period summary and Action Items sheets built from the
+  shared shortage_analyzer summaries instead of per-product filtering
+Version 3.2 - Periods are ordered by the integer period_key of the GAP
+  result; labels are only parsed for frames that do not carry one
+Version 3.3 - The GAP export builds the product summary once (or takes the
+  page's product_summary) and hands it to every sheet
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from io import BytesIO
@@ -302,7 +309,8 @@ def create_metadata_sheet(
     gap_df: pd.DataFrame,
     display_filters: Dict[str, Any],
     df_demand_filtered: pd.DataFrame,
-    df_supply_filtered: pd.DataFrame
+    df_supply_filtered: pd.DataFrame,
+    product_summary: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Create Export_Info metadata sheet with analysis parameters and summary statistics
@@ -379,7 +387,7 @@ def create_metadata_sheet(
         metadata_rows.append(['', ''])
         
         # Shortage & Surplus categorization
-        categorization = categorize_products(gap_df)
+        categorization = categorize_products(gap_df, product_summary)
         
         metadata_rows.append(['CATEGORIZATION', ''])
         metadata_rows.append(['🚨 Net Shortage Products', len(categorization['net_shortage'])])
@@ -454,7 +462,8 @@ def export_gap_with_metadata(
     display_filters: Dict[str, Any],
     calc_options: Dict[str, Any],
     df_demand_filtered: pd.DataFrame,
-    df_supply_filtered: pd.DataFrame
+    df_supply_filtered: pd.DataFrame,
+    product_summary: Optional[pd.DataFrame] = None
 ) -> bytes:
     """
     Export GAP analysis with metadata sheet and enhanced formatting
@@ -467,9 +476,12 @@ def export_gap_with_metadata(
     - Pivot View sheet
     - Action Items sheet
     - Past period indicator
+    
+    product_summary is the build_product_summary(gap_df) result the page
+    already holds; it is built here when omitted.
     """
     from .period_helpers import format_period_with_dates, is_past_period
-    from .shortage_analyzer import categorize_products
+    from .shortage_analyzer import build_product_summary
     
     if gap_df.empty:
         logger.warning("Empty GAP dataframe for export")
@@ -477,10 +489,13 @@ def export_gap_with_metadata(
     
     period_type = calc_options.get('period_type', 'Weekly')
     
+    if product_summary is None:
+        product_summary = build_product_summary(gap_df)
+    
     # === PREPARE GAP DETAIL DATA ===
     export_df = _prepare_gap_export_df(
         gap_df, df_demand_filtered, df_supply_filtered, 
-        period_type, calc_options
+        period_type, calc_options, product_summary
     )
     
     # === CREATE ALL SHEETS ===
@@ -492,11 +507,12 @@ def export_gap_with_metadata(
         gap_df=gap_df,
         display_filters=display_filters,
         df_demand_filtered=df_demand_filtered,
-        df_supply_filtered=df_supply_filtered
+        df_supply_filtered=df_supply_filtered,
+        product_summary=product_summary
     )
     
     # 2. Product summary sheet
-    summary_df = create_product_summary(gap_df, calc_options)
+    summary_df = create_product_summary(gap_df, calc_options, product_summary)
     
     # 3. Period summary sheet (NEW)
     period_summary_df = create_period_summary(gap_df, period_type)
@@ -505,7 +521,7 @@ def export_gap_with_metadata(
     pivot_df = create_pivot_view(gap_df, period_type)
     
     # 5. Action items sheet (NEW)
-    action_df = create_action_items(gap_df, df_supply_filtered, calc_options)
+    action_df = create_action_items(gap_df, df_supply_filtered, calc_options, product_summary)
     
     # Prepare sheets dictionary
     sheets_dict = {
@@ -551,32 +567,26 @@ def _prepare_gap_export_df(
     df_demand_filtered: pd.DataFrame,
     df_supply_filtered: pd.DataFrame,
     period_type: str,
-    calc_options: Dict[str, Any]
+    calc_options: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """Prepare GAP dataframe for export with all enhancements"""
     from .period_helpers import format_period_with_dates, is_past_period
-    from .shortage_analyzer import categorize_products
+    from .shortage_analyzer import build_product_summary
     
     export_df = gap_df.copy()
     
-    # Get categorization
-    categorization = categorize_products(gap_df)
-    
     # Build product lookup sets
     demand_products = set(df_demand_filtered['pt_code'].unique()) if not df_demand_filtered.empty else set()
     supply_products = set(df_supply_filtered['pt_code'].unique()) if not df_supply_filtered.empty else set()
     
     # === ADD CATEGORY COLUMN ===
-    def get_category(pt_code):
-        if pt_code in categorization['net_shortage']:
-            return f"{CATEGORY_ICONS['Net Shortage']} Net Shortage"
-        elif pt_code in categorization['net_surplus']:
-            return f"{CATEGORY_ICONS['Net Surplus']} Net Surplus"
-        elif pt_code in categorization['balanced']:
-            return f"{CATEGORY_ICONS['Balanced']} Balanced"
-        return f"{CATEGORY_ICONS['Unknown']} Unknown"
-    
-    export_df['category'] = export_df['pt_code'].apply(get_category)
+    if product_summary is None:
+        product_summary = build_product_summary(gap_df)
+    category_labels = _category_labels(product_summary['category'])
+    export_df['category'] = export_df['pt_code'].map(category_labels).fillna(
+        f"{CATEGORY_ICONS['Unknown']} Unknown"
+    )
     
     # === ADD PRODUCT TYPE COLUMN ===
     def get_product_type(pt_code):
@@ -666,96 +676,65 @@ def _prepare_gap_export_df(
 
 # === PRODUCT SUMMARY SHEET ===
 
-def create_product_summary(gap_df: pd.DataFrame, calc_options: Dict[str, Any]) -> pd.DataFrame:
+def _category_labels(category: pd.Series) -> pd.Series:
+    """Main category names -> icon-prefixed labels"""
+    return category.map(lambda name: f"{CATEGORY_ICONS.get(name, CATEGORY_ICONS['Unknown'])} {name}")
+
+
+def create_product_summary(
+    gap_df: pd.DataFrame,
+    calc_options: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """Create product-level summary for export with category icons"""
-    from .shortage_analyzer import categorize_products
+    from .shortage_analyzer import build_product_summary
     
     if gap_df.empty:
         return pd.DataFrame()
     
-    # Get categorization
-    categorization = categorize_products(gap_df)
+    summary = build_product_summary(gap_df) if product_summary is None else product_summary
     
-    summary_data = []
+    # Timing flags
+    timing_shortage = summary['timing_shortage']
+    timing_surplus = summary['timing_surplus']
+    timing_flags = np.select(
+        [timing_shortage & timing_surplus, timing_shortage, timing_surplus],
+        ["⚠️ Timing Shortage | ⏰ Timing Surplus", "⚠️ Timing Shortage", "⏰ Timing Surplus"],
+        default="None"
+    )
     
-    for pt_code in gap_df['pt_code'].unique():
-        product_df = gap_df[gap_df['pt_code'] == pt_code]
-        
-        # Basic info
-        product_name = product_df['product_name'].iloc[0] if 'product_name' in product_df.columns else ''
-        brand = product_df['brand'].iloc[0] if 'brand' in product_df.columns else ''
-        package_size = product_df['package_size'].iloc[0] if 'package_size' in product_df.columns else ''
-        standard_uom = product_df['standard_uom'].iloc[0] if 'standard_uom' in product_df.columns else ''
-        
-        # Totals
-        total_demand = product_df['total_demand_qty'].sum()
-        total_supply = product_df['supply_in_period'].sum()
-        net_position = total_supply - total_demand
-        
-        # Period counts
-        total_periods = len(product_df)
-        shortage_periods = (product_df['gap_quantity'] < 0).sum()
-        surplus_periods = (product_df['gap_quantity'] > 0).sum()
-        balanced_periods = total_periods - shortage_periods - surplus_periods
-        
-        # Max shortage/surplus
-        max_shortage = abs(product_df[product_df['gap_quantity'] < 0]['gap_quantity'].min()) if shortage_periods > 0 else 0
-        max_surplus = product_df[product_df['gap_quantity'] > 0]['gap_quantity'].max() if surplus_periods > 0 else 0
-        
-        # Main categorization with icons
-        if pt_code in categorization['net_shortage']:
-            category = f"{CATEGORY_ICONS['Net Shortage']} Net Shortage"
-        elif pt_code in categorization['net_surplus']:
-            category = f"{CATEGORY_ICONS['Net Surplus']} Net Surplus"
-        elif pt_code in categorization['balanced']:
-            category = f"{CATEGORY_ICONS['Balanced']} Balanced"
-        else:
-            category = f"{CATEGORY_ICONS['Unknown']} Unknown"
-        
-        # Timing flags
-        timing_flags = []
-        if pt_code in categorization['timing_shortage']:
-            timing_flags.append("⚠️ Timing Shortage")
-        if pt_code in categorization['timing_surplus']:
-            timing_flags.append("⏰ Timing Surplus")
-        timing_flag_str = " | ".join(timing_flags) if timing_flags else "None"
-        
-        # Fill rate
-        fill_rate = min(100, (total_supply / total_demand * 100)) if total_demand > 0 else 100
-        
-        # Backlog info
-        if calc_options.get('track_backlog', True) and 'backlog_to_next' in product_df.columns:
-            final_backlog = product_df['backlog_to_next'].iloc[-1] if not product_df.empty else 0
-        else:
-            final_backlog = 0
-        
-        # First shortage period
-        shortage_mask = product_df['gap_quantity'] < 0
-        first_shortage = product_df[shortage_mask]['period'].iloc[0] if shortage_mask.any() else ""
-        
-        summary_data.append({
-            'PT Code': pt_code,
-            'Product': product_name,
-            'Brand': brand,
-            'Pack Size': package_size,
-            'UOM': standard_uom,
-            'Category': category,
-            'Timing Flags': timing_flag_str,
-            'Total Demand': total_demand,
-            'Total Supply': total_supply,
-            'Net Position': net_position,
-            'Fill Rate %': round(fill_rate, 1),
-            'Total Periods': total_periods,
-            'Shortage Periods': shortage_periods,
-            'Surplus Periods': surplus_periods,
-            'Balanced Periods': balanced_periods,
-            'Max Shortage': max_shortage,
-            'Max Surplus': max_surplus,
-            'Final Backlog': final_backlog,
-            'First Shortage': first_shortage
-        })
+    # Fill rate
+    total_demand = summary['total_demand']
+    total_supply = summary['total_supply']
+    fill_rate = (total_supply / total_demand.where(total_demand > 0) * 100).clip(upper=100).fillna(100)
     
-    summary_df = pd.DataFrame(summary_data)
+    # Backlog info
+    if calc_options.get('track_backlog', True) and 'backlog_to_next' in gap_df.columns:
+        final_backlog = summary['final_backlog']
+    else:
+        final_backlog = pd.Series(0, index=summary.index)
+    
+    summary_df = pd.DataFrame({
+        'PT Code': summary.index,
+        'Product': summary['product_name'].to_numpy(),
+        'Brand': summary['brand'].to_numpy(),
+        'Pack Size': summary['package_size'].to_numpy(),
+        'UOM': summary['standard_uom'].to_numpy(),
+        'Category': _category_labels(summary['category']).to_numpy(),
+        'Timing Flags': timing_flags,
+        'Total Demand': total_demand.to_numpy(),
+        'Total Supply': total_supply.to_numpy(),
+        'Net Position': summary['net_position'].to_numpy(),
+        'Fill Rate %': fill_rate.round(1).to_numpy(),
+        'Total Periods': summary['total_periods'].to_numpy(),
+        'Shortage Periods': summary['shortage_periods'].to_numpy(),
+        'Surplus Periods': summary['surplus_periods'].to_numpy(),
+        'Balanced Periods': (summary['total_periods'] - summary['shortage_periods'] - summary['surplus_periods']).to_numpy(),
+        'Max Shortage': summary['max_shortage'].to_numpy(),
+        'Max Surplus': summary['max_surplus'].to_numpy(),
+        'Final Backlog': final_backlog.to_numpy(),
+        'First Shortage': summary['first_shortage_period'].fillna("").to_numpy()
+    })
     
     # Sort by category priority and net position
     category_order = {
@@ -773,6 +752,29 @@ def create_product_summary(gap_df: pd.DataFrame, calc_options: Dict[str, Any]) -
     return summary_df
 
 
+# === PERIOD ORDERING ===
+
+def sort_period_labels(df: pd.DataFrame, labels: List[Any], period_type: str,
+                       period_col: str = 'period') -> List[Any]:
+    """
+    Period labels of df in chronological order
+    
+    Uses df's integer period_key (the GAP result carries one per label);
+    only frames without it fall back to parsing the labels.
+    """
+    if 'period_key' in df.columns:
+        keys = df.drop_duplicates(period_col).set_index(period_col)['period_key']
+        return sorted(labels, key=lambda p: keys[p])
+    
+    from .period_helpers import parse_week_period, parse_month_period
+    
+    if period_type == "Weekly":
+        return sorted(labels, key=parse_week_period)
+    elif period_type == "Monthly":
+        return sorted(labels, key=parse_month_period)
+    return sorted(labels)
+
+
 # === PERIOD SUMMARY SHEET (NEW) ===
 
 def create_period_summary(gap_df: pd.DataFrame, period_type: str) -> pd.DataFrame:
@@ -781,31 +783,23 @@ def create_period_summary(gap_df: pd.DataFrame, period_type: str) -> pd.DataFram
     
     One row per period with aggregated metrics
     """
-    from .period_helpers import format_period_with_dates, is_past_period, parse_week_period, parse_month_period
+    from .period_helpers import format_period_with_dates, is_past_period
+    from .shortage_analyzer import build_period_summary
     
     if gap_df.empty:
         return pd.DataFrame()
     
+    period_summary = build_period_summary(gap_df)
+    period_summary = period_summary.loc[sort_period_labels(gap_df, list(period_summary.index), period_type)]
+    
     summary_data = []
     
-    for period in gap_df['period'].unique():
-        period_df = gap_df[gap_df['period'] == period]
-        
-        # Basic metrics
-        total_products = period_df['pt_code'].nunique()
-        total_demand = period_df['total_demand_qty'].sum()
-        total_supply = period_df['supply_in_period'].sum()
-        total_available = period_df['total_available'].sum()
-        net_gap = period_df['gap_quantity'].sum()
-        
-        # Product counts by status
-        shortage_products = (period_df['gap_quantity'] < 0).sum()
-        surplus_products = (period_df['gap_quantity'] > 0).sum()
-        balanced_products = total_products - shortage_products - surplus_products
-        
-        # Quantities
-        shortage_qty = abs(period_df[period_df['gap_quantity'] < 0]['gap_quantity'].sum())
-        surplus_qty = period_df[period_df['gap_quantity'] > 0]['gap_quantity'].sum()
+    for row in period_summary.itertuples():
+        period = row.Index
+        total_demand = row.total_demand
+        total_supply = row.total_supply
+        total_products = row.products_count
+        balanced_products = total_products - row.shortage_products - row.surplus_products
         
         # Fill rate
         fill_rate = min(100, (total_supply / total_demand * 100)) if total_demand > 0 else 100
@@ -826,37 +820,17 @@ def create_period_summary(gap_df: pd.DataFrame, period_type: str) -> pd.DataFram
             'Total Products': total_products,
             'Total Demand': total_demand,
             'Total Supply': total_supply,
-            'Total Available': total_available,
-            'Net GAP': net_gap,
+            'Total Available': row.total_available,
+            'Net GAP': row.net_gap,
             'Fill Rate %': round(fill_rate, 1),
-            '🚨 Shortage Products': shortage_products,
-            '📈 Surplus Products': surplus_products,
+            '🚨 Shortage Products': row.shortage_products,
+            '📈 Surplus Products': row.surplus_products,
             '✅ Balanced Products': balanced_products,
-            'Shortage Qty': shortage_qty,
-            'Surplus Qty': surplus_qty,
-            '_period_raw': period  # For sorting
+            'Shortage Qty': row.shortage_qty,
+            'Surplus Qty': row.surplus_qty,
         })
     
-    summary_df = pd.DataFrame(summary_data)
-    
-    # Sort by period
-    if not summary_df.empty:
-        try:
-            if period_type == "Weekly":
-                summary_df['_sort_key'] = summary_df['_period_raw'].apply(parse_week_period)
-            elif period_type == "Monthly":
-                summary_df['_sort_key'] = summary_df['_period_raw'].apply(parse_month_period)
-            else:
-                summary_df['_sort_key'] = summary_df['_period_raw']
-            
-            summary_df = summary_df.sort_values('_sort_key')
-        except Exception as e:
-            logger.warning(f"Could not sort periods: {e}")
-        
-        # Remove helper columns
-        summary_df = summary_df.drop(columns=['_period_raw', '_sort_key'], errors='ignore')
-    
-    return summary_df
+    return pd.DataFrame(summary_data)
 
 
 # === PIVOT VIEW SHEET (NEW) ===
@@ -867,7 +841,7 @@ def create_pivot_view(gap_df: pd.DataFrame, period_type: str) -> pd.DataFrame:
     
     Shows GAP values for each product-period combination
     """
-    from .period_helpers import parse_week_period, parse_month_period, format_period_with_dates
+    from .period_helpers import format_period_with_dates
     
     if gap_df.empty:
         return pd.DataFrame()
@@ -888,13 +862,9 @@ def create_pivot_view(gap_df: pd.DataFrame, period_type: str) -> pd.DataFrame:
         
         # Sort period columns
         try:
-            if period_type == "Weekly":
-                sorted_periods = sorted(period_cols, key=parse_week_period)
-            elif period_type == "Monthly":
-                sorted_periods = sorted(period_cols, key=parse_month_period)
-            else:
-                sorted_periods = sorted(period_cols)
-        except:
+            sorted_periods = sort_period_labels(gap_df, period_cols, period_type)
+        except Exception as e:
+            logger.warning(f"Could not sort periods: {e}")
             sorted_periods = period_cols
         
         # Reorder columns
@@ -937,7 +907,8 @@ def create_pivot_view(gap_df: pd.DataFrame, period_type: str) -> pd.DataFrame:
 def create_action_items(
     gap_df: pd.DataFrame,
     df_supply_filtered: pd.DataFrame,
-    calc_options: Dict[str, Any]
+    calc_options: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Create Action Items sheet with recommendations
@@ -947,19 +918,21 @@ def create_action_items(
     - Products needing expedite
     - Products with excess to review
     """
-    from .shortage_analyzer import categorize_products, calculate_order_requirements, identify_expedite_candidates
+    from .shortage_analyzer import build_product_summary, calculate_order_requirements, identify_expedite_candidates
     from .period_helpers import is_past_period
     
     if gap_df.empty:
         return pd.DataFrame()
     
     period_type = calc_options.get('period_type', 'Weekly')
-    categorization = categorize_products(gap_df)
+    
+    if product_summary is None:
+        product_summary = build_product_summary(gap_df)
     
     action_items = []
     
     # === NEW PO REQUIREMENTS ===
-    order_requirements_df = calculate_order_requirements(gap_df)
+    order_requirements_df = calculate_order_requirements(gap_df, product_summary)
     
     if not order_requirements_df.empty:
         for _, row in order_requirements_df.iterrows():
@@ -978,7 +951,7 @@ def create_action_items(
             })
     
     # === EXPEDITE CANDIDATES ===
-    expedite_candidates_df = identify_expedite_candidates(gap_df, df_supply_filtered)
+    expedite_candidates_df = identify_expedite_candidates(gap_df, df_supply_filtered, product_summary)
     
     if not expedite_candidates_df.empty:
         for _, row in expedite_candidates_df.iterrows():
@@ -996,14 +969,11 @@ def create_action_items(
             })
     
     # === SURPLUS TO REVIEW ===
-    for pt_code in categorization['net_surplus']:
-        product_df = gap_df[gap_df['pt_code'] == pt_code]
-        
-        if product_df.empty:
-            continue
-        
-        total_surplus = product_df[product_df['gap_quantity'] > 0]['gap_quantity'].sum()
-        total_demand = product_df['total_demand_qty'].sum()
+    surplus_products = product_summary[product_summary['category'] == 'Net Surplus']
+    
+    for pt_code, row in zip(surplus_products.index, surplus_products.itertuples(index=False)):
+        total_surplus = row.surplus_qty
+        total_demand = row.total_demand
         
         # Only flag significant surplus (> 50% of demand)
         if total_demand > 0 and total_surplus > total_demand * 0.5:
@@ -1013,11 +983,11 @@ def create_action_items(
                 'Priority': '🔵 Low',
                 'Action Type': '📈 Review Excess',
                 'PT Code': pt_code,
-                'Product': product_df['product_name'].iloc[0] if 'product_name' in product_df.columns else '',
-                'Brand': product_df['brand'].iloc[0] if 'brand' in product_df.columns else '',
+                'Product': row.product_name,
+                'Brand': row.brand,
                 'Required Qty': total_surplus,
                 'First Need Date': '',
-                'Periods Affected': (product_df['gap_quantity'] > 0).sum(),
+                'Periods Affected': row.surplus_periods,
                 'Details': f"Excess of {total_surplus:,.0f} units ({surplus_pct:.0f}% of demand). Consider deferring orders.",
                 'Status': 'Pending'
             })
@@ -1071,7 +1041,6 @@ def create_period_pivot(
     fill_value: Any = 0
 ) -> pd.DataFrame:
     """Create standardized pivot table for any analysis page"""
-    from .period_helpers import parse_week_period, parse_month_period
     
     if df.empty:
         return pd.DataFrame()
@@ -1104,12 +1073,7 @@ def create_period_pivot(
                             if pd.notna(col) and str(col).strip() != "" and str(col) != "nan"]
         
         try:
-            if period_type == "Weekly":
-                sorted_periods = sorted(valid_period_cols, key=parse_week_period)
-            elif period_type == "Monthly":
-                sorted_periods = sorted(valid_period_cols, key=parse_month_period)
-            else:
-                sorted_periods = sorted(valid_period_cols)
+            sorted_periods = sort_period_labels(df, valid_period_cols, period_type, period_col)
         except Exception as e:
             logger.error(f"Error sorting period columns: {e}")
             sorted_periods = valid_period_cols
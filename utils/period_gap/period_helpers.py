@@ -49,6 +49,58 @@ def convert_to_period(date_value, period_type: str) -> Optional[str]:
         logger.debug(f"Error converting date to period: {e}")
         return None
 
+# === INTEGER PERIOD KEYS ===
+# Weekly: iso_year*100 + iso_week, Monthly: year*100 + month,
+# Daily: year*10000 + month*100 + day. Keys sort chronologically, so the
+# GAP pipeline groups/merges/sorts on them and only builds label strings
+# (convert_to_period format) for the distinct keys it returns.
+
+def to_period_keys(dates: pd.Series, period_type: str) -> pd.Series:
+    """
+    Vectorized period key for a date series (Int64, <NA> for invalid dates)
+    """
+    dt = pd.to_datetime(dates, errors='coerce')
+    if not isinstance(dt, pd.Series):
+        dt = pd.Series(dt, index=getattr(dates, 'index', None))
+
+    if period_type == "Weekly":
+        iso = dt.dt.isocalendar()
+        keys = iso['year'].astype('Int64') * 100 + iso['week'].astype('Int64')
+    elif period_type == "Monthly":
+        keys = dt.dt.year.astype('Int64') * 100 + dt.dt.month.astype('Int64')
+    else:
+        if period_type != "Daily":
+            logger.warning(f"Unknown period type '{period_type}', using daily keys")
+        keys = (
+            dt.dt.year.astype('Int64') * 10000
+            + dt.dt.month.astype('Int64') * 100
+            + dt.dt.day.astype('Int64')
+        )
+    return keys
+
+
+def period_key_to_label(key, period_type: str) -> Optional[str]:
+    """Display label for one period key (same format as convert_to_period)"""
+    if pd.isna(key):
+        return None
+    key = int(key)
+
+    if period_type == "Weekly":
+        return f"Week {key % 100} - {key // 100}"
+    elif period_type == "Monthly":
+        return pd.Timestamp(year=key // 100, month=key % 100, day=1).strftime('%b %Y')
+    return pd.Timestamp(
+        year=key // 10000, month=(key // 100) % 100, day=key % 100
+    ).strftime('%Y-%m-%d')
+
+
+def period_key_labels(keys: pd.Series, period_type: str) -> pd.Series:
+    """Labels for a key series — each distinct key is formatted once"""
+    uniques = pd.unique(keys.dropna())
+    lookup = {k: period_key_to_label(k, period_type) for k in uniques}
+    return keys.map(lookup)
+
+
 def parse_week_period(period_str: str) -> Tuple[int, int]:
     """
     Parse week period string for sorting
@@ -3,8 +3,10 @@
 Period-based GAP Processor
 Processes demand and supply data by period for GAP calculation
 Version 2.0 - Support unified demand_date field for ETD/ETA selection
+Version 2.1 - Integer period keys (vectorized bucketing, merge and sort)
 """
 
+import numpy as np
 import pandas as pd
 import logging
 from typing import Optional
@@ -22,10 +24,13 @@ class PeriodBasedGAPProcessor:
                        supply_df: pd.DataFrame) -> pd.DataFrame:
         """
         Process all data by period for GAP calculation - NO ALLOCATION NEEDED
+        
+        Returns one row per (pt_code, period_key) sorted by product and period;
+        the 'period' label is added only for the distinct keys at the end.
         """
-        from .period_helpers import convert_to_period
+        from .period_helpers import period_key_labels
         
-        # Step 1: Add period column to all dataframes
+        # Step 1: Add integer period key to all dataframes
         demand_with_period = self._add_period_column(
             demand_df, 
             date_col='demand_date',  # Changed from 'etd' to unified field
@@ -45,27 +50,44 @@ class PeriodBasedGAPProcessor:
         # Step 3: Merge data (NO ALLOCATION)
         period_data = self._merge_period_data(demand_grouped, supply_grouped)
         
+        if period_data.empty:
+            return period_data
+        
         # Step 4: Calculate net values (SIMPLIFIED)
         period_data = self._calculate_net_values(period_data)
         
+        # Step 5: Sort once by product + period, then label the periods
+        period_data = period_data.sort_values(
+            ['pt_code', 'period_key'], kind='stable'
+        ).reset_index(drop=True)
+        period_data['period'] = period_key_labels(period_data['period_key'], self.period_type)
+        
         return period_data
     
-    def _get_supply_date_column(self, row: pd.Series) -> str:
-        """Get appropriate supply date column based on source type"""
-        date_mapping = {
-            'Inventory': 'date_ref',
-            'Pending CAN': 'arrival_date',
-            'Pending PO': 'eta',
-            'Pending WH Transfer': 'transfer_date'
-        }
+    # Supply date column by source type
+    SUPPLY_DATE_COLUMNS = {
+        'Inventory': 'date_ref',
+        'Pending CAN': 'arrival_date',
+        'Pending PO': 'eta',
+        'Pending WH Transfer': 'transfer_date'
+    }
+    
+    def _supply_dates(self, df: pd.DataFrame) -> pd.Series:
+        """Per-row supply date picked by source_type (vectorized)"""
+        mapped = df['source_type'].map(self.SUPPLY_DATE_COLUMNS).fillna('date_ref')
+        dates = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        
+        for col in mapped.unique():
+            if col in df.columns:
+                rows = mapped == col
+                dates[rows] = pd.to_datetime(df.loc[rows, col], errors='coerce')
         
-        base_col = date_mapping.get(row['source_type'], 'date_ref')
-        return base_col
+        return dates
     
     def _add_period_column(self, df: pd.DataFrame, date_col: Optional[str], 
                           df_type: str) -> pd.DataFrame:
-        """Add period column based on date column and type"""
-        from .period_helpers import convert_to_period
+        """Add integer period_key column based on date column and type"""
+        from .period_helpers import to_period_keys
         
         if df.empty:
             return df
@@ -74,51 +96,31 @@ class PeriodBasedGAPProcessor:
         
         # Handle different date columns for supply types
         if df_type == 'supply' and 'source_type' in df.columns:
-            df['period'] = df.apply(
-                lambda row: self._get_supply_period(row),
-                axis=1
-            )
+            df['period_key'] = to_period_keys(self._supply_dates(df), self.period_type)
         else:
             if date_col and date_col in df.columns:
-                df['period'] = df[date_col].apply(
-                    lambda x: convert_to_period(x, self.period_type)
-                )
+                df['period_key'] = to_period_keys(df[date_col], self.period_type)
             else:
                 # Fallback for backward compatibility
                 if df_type == 'demand':
                     # Try different possible date columns
                     if 'demand_date' in df.columns:
-                        df['period'] = df['demand_date'].apply(
-                            lambda x: convert_to_period(x, self.period_type)
-                        )
+                        df['period_key'] = to_period_keys(df['demand_date'], self.period_type)
                     elif 'etd' in df.columns:
                         logger.warning("Using 'etd' as fallback for demand date column")
-                        df['period'] = df['etd'].apply(
-                            lambda x: convert_to_period(x, self.period_type)
-                        )
+                        df['period_key'] = to_period_keys(df['etd'], self.period_type)
                     else:
                         logger.warning(f"No suitable date column found in {df_type} dataframe")
-                        df['period'] = None
+                        df['period_key'] = pd.NA
                 else:
                     logger.warning(f"Date column {date_col} not found in {df_type} dataframe")
-                    df['period'] = None
+                    df['period_key'] = pd.NA
         
         # Remove invalid periods
-        df = df[df['period'].notna() & (df['period'] != 'nan')]
+        df = df[df['period_key'].notna()].astype({'period_key': 'int64'})
         
         return df
     
-    def _get_supply_period(self, row: pd.Series) -> Optional[str]:
-        """Get period for supply based on source type"""
-        from .period_helpers import convert_to_period
-        
-        date_col = self._get_supply_date_column(row)
-        
-        if date_col in row and pd.notna(row[date_col]):
-            return convert_to_period(row[date_col], self.period_type)
-        
-        return None
-    
     def _group_demand_by_period(self, demand_df: pd.DataFrame) -> pd.DataFrame:
         """Group demand by product + period - SIMPLIFIED"""
         if demand_df.empty:
@@ -133,7 +135,7 @@ class PeriodBasedGAPProcessor:
             'standard_uom': 'first'
         }
         
-        return demand_df.groupby(['pt_code', 'period']).agg(agg_dict).reset_index()
+        return demand_df.groupby(['pt_code', 'period_key'], sort=False).agg(agg_dict).reset_index()
     
     def _group_supply_by_period(self, supply_df: pd.DataFrame) -> pd.DataFrame:
         """Group supply by product + period"""
@@ -148,7 +150,7 @@ class PeriodBasedGAPProcessor:
             'standard_uom': 'first'
         }
         
-        result_df = supply_df.groupby(['pt_code', 'period']).agg(agg_dict).reset_index()
+        result_df = supply_df.groupby(['pt_code', 'period_key'], sort=False).agg(agg_dict).reset_index()
         result_df = result_df.rename(columns={'quantity': 'supply_quantity'})
         
         return result_df
@@ -157,18 +159,17 @@ class PeriodBasedGAPProcessor:
                           supply_df: pd.DataFrame) -> pd.DataFrame:
         """Merge period data - SIMPLIFIED without allocation"""
         # Get all unique product-period combinations
-        all_keys = set()
+        key_frames = [
+            df[['pt_code', 'period_key']]
+            for df in [demand_df, supply_df]
+            if not df.empty and 'pt_code' in df.columns and 'period_key' in df.columns
+        ]
         
-        for df in [demand_df, supply_df]:
-            if not df.empty and 'pt_code' in df.columns and 'period' in df.columns:
-                keys = df[['pt_code', 'period']].apply(tuple, axis=1)
-                all_keys.update(keys)
-        
-        if not all_keys:
+        if not key_frames:
             return pd.DataFrame()
         
         # Create base dataframe
-        base_data = pd.DataFrame(list(all_keys), columns=['pt_code', 'period'])
+        base_data = pd.concat(key_frames, ignore_index=True).drop_duplicates(ignore_index=True)
         
         # Get product info from BOTH demand and supply
         product_info_list = []
@@ -206,7 +207,7 @@ class PeriodBasedGAPProcessor:
                           if col not in ['brand','product_name', 'package_size', 'standard_uom']]
             base_data = base_data.merge(
                 demand_df[demand_cols],
-                on=['pt_code', 'period'],
+                on=['pt_code', 'period_key'],
                 how='left'
             )
         
@@ -216,7 +217,7 @@ class PeriodBasedGAPProcessor:
                           if col not in ['brand','product_name', 'package_size', 'standard_uom']]
             base_data = base_data.merge(
                 supply_df[supply_cols],
-                on=['pt_code', 'period'],
+                on=['pt_code', 'period_key'],
                 how='left'
             )
         
@@ -240,11 +241,12 @@ class PeriodBasedGAPProcessor:
         df['gap_quantity'] = df['supply_quantity'] - df['demand_quantity']
         
         # Calculate fulfillment rate
-        df['fulfillment_rate'] = df.apply(
-            lambda row: min(100, (row['supply_quantity'] / row['demand_quantity'] * 100))
-            if row['demand_quantity'] > 0 else 100,
-            axis=1
-        )
+        demand = df['demand_quantity'].to_numpy(dtype=float)
+        supply = df['supply_quantity'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['fulfillment_rate'] = np.where(
+                demand > 0, np.minimum(100, supply / demand * 100), 100
+            )
         
         # For carry forward logic, we need these columns
         df['available_supply'] = df['supply_quantity']
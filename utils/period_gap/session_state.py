@@ -52,6 +52,7 @@ def initialize_session_state():
         
         # GAP calculation cache
         'pgap_gap_df': None,
+        'pgap_product_summary': None,
         'pgap_result_cache_key': None,
         
         # Exclude filter states
@@ -159,6 +160,7 @@ def clear_period_gap_cache():
         'period_gap_analysis_data',
         'period_gap_result',
         'pgap_gap_df',
+        'pgap_product_summary',
         'pgap_result_cache_key'
     ]
     
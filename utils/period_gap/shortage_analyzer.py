@@ -2,18 +2,183 @@
 """
 Shortage & Surplus Analyzer Module
 Version 3.0 - Refactored with mutually exclusive main categories
+Version 3.1 - Single-pass product/period summary engine: every categorizer,
+              action list and export summary reads one grouped summary of
+              gap_df instead of re-filtering gap_df per product
+Version 3.2 - The product summary is passed in explicitly (summary=...)
+              by callers that render several views of one GAP result
 Main Categories: Net Shortage, Net Surplus, Balanced (based on total supply vs demand)
 Sub-Categories: Timing Shortage, Timing Surplus (cross-cutting, based on period variations)
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def categorize_main_category(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
+# =============================================================================
+# SUMMARY ENGINE
+# =============================================================================
+
+PRODUCT_INFO_COLUMNS = ['product_name', 'brand', 'package_size', 'standard_uom']
+
+
+def _first_per_product(df: pd.DataFrame, columns, keep: str = 'first') -> pd.DataFrame:
+    """Row values at the first (or last) row of each pt_code, NaNs included"""
+    return df.drop_duplicates('pt_code', keep=keep).set_index('pt_code')[columns]
+
+
+def _compute_product_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
+    gap = gap_df['gap_quantity']
+    is_shortage = gap < 0
+    is_surplus = gap > 0
+    
+    work = pd.DataFrame({
+        'pt_code': gap_df['pt_code'],
+        'total_demand': gap_df['total_demand_qty'],
+        'total_supply': gap_df['supply_in_period'],
+        'total_periods': 1,
+        'shortage_periods': is_shortage.astype('int64'),
+        'surplus_periods': is_surplus.astype('int64'),
+        'shortage_qty': gap.where(is_shortage, 0),
+        'surplus_qty': gap.where(is_surplus, 0),
+        'max_shortage': gap.where(is_shortage),
+        'max_surplus': gap.where(is_surplus),
+        'avg_surplus_per_period': gap.where(is_surplus),
+        'avg_fill_pct': gap_df['fulfillment_rate_percent'] if 'fulfillment_rate_percent' in gap_df.columns else np.nan,
+    })
+    
+    summary = work.groupby('pt_code', sort=False).agg({
+        'total_demand': 'sum',
+        'total_supply': 'sum',
+        'total_periods': 'sum',
+        'shortage_periods': 'sum',
+        'surplus_periods': 'sum',
+        'shortage_qty': 'sum',
+        'surplus_qty': 'sum',
+        'max_shortage': 'min',
+        'max_surplus': 'max',
+        'avg_surplus_per_period': 'mean',
+        'avg_fill_pct': 'mean',
+    })
+    summary['net_position'] = summary['total_supply'] - summary['total_demand']
+    summary['shortage_qty'] = summary['shortage_qty'].abs()
+    summary['max_shortage'] = summary['max_shortage'].abs().fillna(0)
+    summary['max_surplus'] = summary['max_surplus'].fillna(0)
+    summary['avg_surplus_per_period'] = summary['avg_surplus_per_period'].fillna(0)
+    
+    # Product info from each product's first row
+    info_cols = [c for c in PRODUCT_INFO_COLUMNS if c in gap_df.columns]
+    info = _first_per_product(gap_df, info_cols).reindex(summary.index)
+    for col in PRODUCT_INFO_COLUMNS:
+        summary[col] = info[col] if col in info_cols else ''
+    
+    # Final carried-forward backlog (last row per product)
+    if 'backlog_to_next' in gap_df.columns:
+        summary['final_backlog'] = _first_per_product(gap_df, 'backlog_to_next', keep='last').reindex(summary.index)
+    else:
+        summary['final_backlog'] = 0
+    
+    # First shortage period (gap_df is ordered by product, then period)
+    first_shortage = _first_per_product(gap_df[is_shortage], ['period', 'gap_quantity']).reindex(summary.index)
+    summary['first_shortage_period'] = first_shortage['period'].astype(object).where(first_shortage['period'].notna(), None)
+    summary['first_shortage_qty'] = first_shortage['gap_quantity'].abs().fillna(0)
+    
+    # Categories
+    summary['category'] = np.select(
+        [summary['total_supply'] < summary['total_demand'],
+         summary['total_supply'] > summary['total_demand']],
+        ['Net Shortage', 'Net Surplus'],
+        default='Balanced'
+    )
+    summary['timing_shortage'] = summary['shortage_periods'] > 0
+    summary['timing_surplus'] = summary['surplus_periods'] > 0
+    
+    return summary
+
+
+def build_product_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-product summary of a GAP result, computed in one grouped pass
+    
+    Indexed by pt_code in first-appearance order (same as gap_df['pt_code'].unique()),
+    with columns:
+        - product_name, brand, package_size, standard_uom (first row of the product)
+        - total_demand, total_supply, net_position, total_periods
+        - shortage_periods, surplus_periods, shortage_qty, surplus_qty
+        - max_shortage, max_surplus, avg_surplus_per_period, avg_fill_pct
+        - final_backlog, first_shortage_period, first_shortage_qty
+        - category ('Net Shortage' / 'Net Surplus' / 'Balanced')
+        - timing_shortage, timing_surplus (bool)
+    
+    Callers that show several views of one GAP result build it once and pass
+    it to the functions below as summary=...; those build it themselves when
+    it is omitted. Treat it as read-only.
+    """
+    
+    if gap_df.empty:
+        return pd.DataFrame()
+    
+    return _compute_product_summary(gap_df)
+
+
+def _resolve_summary(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """The caller's product summary, or a fresh one for gap_df"""
+    return build_product_summary(gap_df) if summary is None else summary
+
+
+def build_period_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-period aggregates of a GAP result, computed in one grouped pass
+    
+    Indexed by period label in first-appearance order, with columns:
+    products_count, total_demand, total_supply, total_available, net_gap,
+    avg_fill_pct, shortage_products, surplus_products, shortage_qty, surplus_qty
+    """
+    
+    gap = gap_df['gap_quantity']
+    is_shortage = gap < 0
+    is_surplus = gap > 0
+    
+    work = pd.DataFrame({
+        'period': gap_df['period'],
+        'total_demand': gap_df['total_demand_qty'],
+        'total_supply': gap_df['supply_in_period'],
+        'total_available': gap_df['total_available'] if 'total_available' in gap_df.columns else np.nan,
+        'net_gap': gap,
+        'avg_fill_pct': gap_df['fulfillment_rate_percent'] if 'fulfillment_rate_percent' in gap_df.columns else np.nan,
+        'shortage_products': is_shortage.astype('int64'),
+        'surplus_products': is_surplus.astype('int64'),
+        'shortage_qty': gap.where(is_shortage, 0),
+        'surplus_qty': gap.where(is_surplus, 0),
+    })
+    
+    grouped = work.groupby('period', sort=False)
+    summary = grouped.agg({
+        'total_demand': 'sum',
+        'total_supply': 'sum',
+        'total_available': 'sum',
+        'net_gap': 'sum',
+        'avg_fill_pct': 'mean',
+        'shortage_products': 'sum',
+        'surplus_products': 'sum',
+        'shortage_qty': 'sum',
+        'surplus_qty': 'sum',
+    })
+    summary.insert(0, 'products_count', gap_df.groupby('period', sort=False)['pt_code'].nunique())
+    summary['shortage_qty'] = summary['shortage_qty'].abs()
+    
+    return summary
+
+
+# =============================================================================
+# CATEGORIZATION
+# =============================================================================
+
+def categorize_main_category(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> Dict[str, Set[str]]:
     """
     Categorize products into MUTUALLY EXCLUSIVE main categories based on net position:
     - Net Shortage: Total supply < Total demand
@@ -25,6 +190,7 @@ def categorize_main_category(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
                 - pt_code: Product code
                 - total_demand_qty: Demand quantity per period
                 - supply_in_period: Supply quantity per period
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dictionary with three keys (mutually exclusive):
@@ -36,26 +202,11 @@ def categorize_main_category(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     if gap_df.empty:
         return {'net_shortage': set(), 'net_surplus': set(), 'balanced': set()}
     
-    net_shortage_products = set()
-    net_surplus_products = set()
-    balanced_products = set()
-    
-    # Group by product
-    for pt_code in gap_df['pt_code'].unique():
-        product_df = gap_df[gap_df['pt_code'] == pt_code].copy()
-        
-        # Calculate totals
-        total_demand = product_df['total_demand_qty'].sum()
-        total_supply = product_df['supply_in_period'].sum()
-        
-        # Categorize based on net position (mutually exclusive)
-        if total_supply < total_demand:
-            net_shortage_products.add(pt_code)
-        elif total_supply > total_demand:
-            net_surplus_products.add(pt_code)
-        else:
-            # Exactly equal (balanced)
-            balanced_products.add(pt_code)
+    category = _resolve_summary(gap_df, summary)['category']
+    
+    net_shortage_products = set(category.index[category == 'Net Shortage'])
+    net_surplus_products = set(category.index[category == 'Net Surplus'])
+    balanced_products = set(category.index[category == 'Balanced'])
     
     logger.info(f"Main categorization: {len(net_shortage_products)} net shortage, "
                 f"{len(net_surplus_products)} net surplus, {len(balanced_products)} balanced")
@@ -67,7 +218,7 @@ def categorize_main_category(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     }
 
 
-def categorize_timing_issues(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
+def categorize_timing_issues(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> Dict[str, Set[str]]:
     """
     Categorize products with TIMING ISSUES (cross-cutting, not mutually exclusive):
     - Timing Shortage: Has at least one period with shortage (gap_quantity < 0)
@@ -79,6 +230,7 @@ def categorize_timing_issues(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
         gap_df: GAP analysis dataframe with columns:
                 - pt_code: Product code
                 - gap_quantity: GAP amount for each period
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dictionary with two keys (NOT mutually exclusive):
@@ -89,22 +241,10 @@ def categorize_timing_issues(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     if gap_df.empty:
         return {'timing_shortage': set(), 'timing_surplus': set()}
     
-    timing_shortage_products = set()
-    timing_surplus_products = set()
-    
-    # Group by product
-    for pt_code in gap_df['pt_code'].unique():
-        product_df = gap_df[gap_df['pt_code'] == pt_code].copy()
-        
-        # Check for timing issues
-        has_shortage_periods = (product_df['gap_quantity'] < 0).any()
-        has_surplus_periods = (product_df['gap_quantity'] > 0).any()
-        
-        if has_shortage_periods:
-            timing_shortage_products.add(pt_code)
-        
-        if has_surplus_periods:
-            timing_surplus_products.add(pt_code)
+    summary = _resolve_summary(gap_df, summary)
+    
+    timing_shortage_products = set(summary.index[summary['timing_shortage']])
+    timing_surplus_products = set(summary.index[summary['timing_surplus']])
     
     logger.info(f"Timing categorization: {len(timing_shortage_products)} with timing shortage, "
                 f"{len(timing_surplus_products)} with timing surplus")
@@ -115,7 +255,7 @@ def categorize_timing_issues(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     }
 
 
-def categorize_products(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
+def categorize_products(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> Dict[str, Set[str]]:
     """
     Unified categorization function that combines main categories and timing issues
     
@@ -129,6 +269,7 @@ def categorize_products(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
                 - total_demand_qty: Demand quantity per period
                 - supply_in_period: Supply quantity per period
                 - gap_quantity: GAP amount for each period
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dictionary with 5 keys:
@@ -148,11 +289,13 @@ def categorize_products(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
             'timing_surplus': set()
         }
     
+    summary = _resolve_summary(gap_df, summary)
+    
     # Get main categorization (mutually exclusive)
-    main_cats = categorize_main_category(gap_df)
+    main_cats = categorize_main_category(gap_df, summary)
     
     # Get timing categorization (cross-cutting)
-    timing_cats = categorize_timing_issues(gap_df)
+    timing_cats = categorize_timing_issues(gap_df, summary)
     
     # Combine results
     result = {
@@ -170,7 +313,7 @@ def categorize_products(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     return result
 
 
-def categorize_shortage_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
+def categorize_shortage_type(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> Dict[str, Set[str]]:
     """
     Legacy function for backward compatibility
     Maps old logic to new main category logic
@@ -180,8 +323,10 @@ def categorize_shortage_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
         - 'net_shortage': Products with net shortage
         - 'timing_gap': Products with timing shortage (but not net shortage)
     """
-    main_cats = categorize_main_category(gap_df)
-    timing_cats = categorize_timing_issues(gap_df)
+    if not gap_df.empty:
+        summary = _resolve_summary(gap_df, summary)
+    main_cats = categorize_main_category(gap_df, summary)
+    timing_cats = categorize_timing_issues(gap_df, summary)
     
     # Timing Gap = Has timing shortage but NOT net shortage
     timing_gap_products = timing_cats['timing_shortage'] - main_cats['net_shortage']
@@ -192,7 +337,7 @@ def categorize_shortage_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     }
 
 
-def categorize_surplus_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
+def categorize_surplus_type(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> Dict[str, Set[str]]:
     """
     Legacy function for backward compatibility
     Maps old logic to new main category logic
@@ -202,8 +347,10 @@ def categorize_surplus_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
         - 'net_surplus': Products with net surplus
         - 'timing_surplus': Products with timing surplus (but not net surplus)
     """
-    main_cats = categorize_main_category(gap_df)
-    timing_cats = categorize_timing_issues(gap_df)
+    if not gap_df.empty:
+        summary = _resolve_summary(gap_df, summary)
+    main_cats = categorize_main_category(gap_df, summary)
+    timing_cats = categorize_timing_issues(gap_df, summary)
     
     # Timing Surplus (for old logic) = Has timing surplus but NOT net surplus
     timing_surplus_products = timing_cats['timing_surplus'] - main_cats['net_surplus']
@@ -214,18 +361,20 @@ def categorize_surplus_type(gap_df: pd.DataFrame) -> Dict[str, Set[str]]:
     }
 
 
-def get_product_main_category(pt_code: str, gap_df: pd.DataFrame) -> str:
+def get_product_main_category(pt_code: str, gap_df: pd.DataFrame,
+                              summary: Optional[pd.DataFrame] = None) -> str:
     """
     Get the main category for a single product
     
     Args:
         pt_code: Product code
         gap_df: GAP analysis dataframe
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Main category: "Net Shortage", "Net Surplus", or "Balanced"
     """
-    main_cats = categorize_main_category(gap_df)
+    main_cats = categorize_main_category(gap_df, summary)
     
     if pt_code in main_cats['net_shortage']:
         return "Net Shortage"
@@ -235,12 +384,13 @@ def get_product_main_category(pt_code: str, gap_df: pd.DataFrame) -> str:
         return "Balanced"
 
 
-def get_shortage_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
+def get_shortage_summary(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Get summary of categorization with actionable insights
     
     Args:
         gap_df: GAP analysis dataframe
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Summary dataframe with categorization and recommended actions
@@ -249,68 +399,34 @@ def get_shortage_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
     if gap_df.empty:
         return pd.DataFrame()
     
-    main_categorization = categorize_main_category(gap_df)
-    timing_categorization = categorize_timing_issues(gap_df)
-    summary_data = []
-    
-    for pt_code in gap_df['pt_code'].unique():
-        product_df = gap_df[gap_df['pt_code'] == pt_code]
-        
-        # Basic info
-        product_name = product_df['product_name'].iloc[0] if 'product_name' in product_df.columns else ''
-        brand = product_df['brand'].iloc[0] if 'brand' in product_df.columns else ''
-        
-        # Calculate metrics
-        total_demand = product_df['total_demand_qty'].sum()
-        total_supply = product_df['supply_in_period'].sum()
-        net_position = total_supply - total_demand
-        
-        # Count shortage and surplus periods
-        shortage_periods = (product_df['gap_quantity'] < 0).sum()
-        surplus_periods = (product_df['gap_quantity'] > 0).sum()
-        total_periods = len(product_df)
-        
-        # Maximum shortage and surplus in any period
-        max_shortage = abs(product_df[product_df['gap_quantity'] < 0]['gap_quantity'].min()) if shortage_periods > 0 else 0
-        max_surplus = product_df[product_df['gap_quantity'] > 0]['gap_quantity'].max() if surplus_periods > 0 else 0
-        
-        # Determine main category
-        if pt_code in main_categorization['net_shortage']:
-            category = "Net Shortage"
-            action = "Place New Order"
-            priority = "High"
-        elif pt_code in main_categorization['net_surplus']:
-            category = "Net Surplus"
-            action = "Review Excess Stock"
-            priority = "Low"
-        else:
-            category = "Balanced"
-            # Check if has timing issues
-            if pt_code in timing_categorization['timing_shortage']:
-                action = "Expedite/Reschedule"
-                priority = "Medium"
-            else:
-                action = "Monitor"
-                priority = "Low"
-        
-        summary_data.append({
-            'pt_code': pt_code,
-            'product_name': product_name,
-            'brand': brand,
-            'category': category,
-            'total_demand': total_demand,
-            'total_supply': total_supply,
-            'net_position': net_position,
-            'shortage_periods': shortage_periods,
-            'surplus_periods': surplus_periods,
-            'total_periods': total_periods,
-            'max_shortage': max_shortage,
-            'max_surplus': max_surplus,
-            'recommended_action': action,
-            'priority': priority
-        })
-    
-    summary_df = pd.DataFrame(summary_data)
+    summary = _resolve_summary(gap_df, summary)
+    category = summary['category']
+    
+    # Main category first; Balanced products with timing shortages get expedited
+    conditions = [
+        category == 'Net Shortage',
+        category == 'Net Surplus',
+        summary['timing_shortage']
+    ]
+    action = np.select(conditions, ['Place New Order', 'Review Excess Stock', 'Expedite/Reschedule'], default='Monitor')
+    priority = np.select(conditions, ['High', 'Low', 'Medium'], default='Low')
+    
+    summary_df = pd.DataFrame({
+        'pt_code': summary.index,
+        'product_name': summary['product_name'].to_numpy(),
+        'brand': summary['brand'].to_numpy(),
+        'category': category.to_numpy(),
+        'total_demand': summary['total_demand'].to_numpy(),
+        'total_supply': summary['total_supply'].to_numpy(),
+        'net_position': summary['net_position'].to_numpy(),
+        'shortage_periods': summary['shortage_periods'].to_numpy(),
+        'surplus_periods': summary['surplus_periods'].to_numpy(),
+        'total_periods': summary['total_periods'].to_numpy(),
+        'max_shortage': summary['max_shortage'].to_numpy(),
+        'max_surplus': summary['max_surplus'].to_numpy(),
+        'recommended_action': action,
+        'priority': priority
+    })
     
     # Sort by priority and net position
     priority_order = {'High': 1, 'Medium': 2, 'Low': 3}
@@ -322,188 +438,170 @@ def get_shortage_summary(gap_df: pd.DataFrame) -> pd.DataFrame:
 
 
 def identify_expedite_candidates(gap_df: pd.DataFrame, 
-                                supply_df: pd.DataFrame = None) -> pd.DataFrame:
+                                supply_df: pd.DataFrame = None,
+                                summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Identify which supply orders could be expedited to resolve timing shortages
     
     Args:
         gap_df: GAP analysis dataframe
         supply_df: Optional supply dataframe with order details
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dataframe of expedite candidates with recommended actions
     """
     
-    timing_categorization = categorize_timing_issues(gap_df)
-    timing_shortage_products = timing_categorization['timing_shortage']
+    if gap_df.empty or supply_df is None or supply_df.empty:
+        return pd.DataFrame()
+    
+    summary = _resolve_summary(gap_df, summary)
+    shortage_products = summary[summary['timing_shortage']]
     
-    if not timing_shortage_products or supply_df is None or supply_df.empty:
+    if shortage_products.empty:
         return pd.DataFrame()
     
-    expedite_candidates = []
-    
-    for pt_code in timing_shortage_products:
-        # Get product GAP data
-        product_gap = gap_df[gap_df['pt_code'] == pt_code].copy()
-        
-        # Find first shortage period
-        shortage_periods = product_gap[product_gap['gap_quantity'] < 0]
-        if shortage_periods.empty:
-            continue
-            
-        first_shortage_period = shortage_periods.iloc[0]['period']
-        shortage_amount = abs(shortage_periods.iloc[0]['gap_quantity'])
-        
-        # Find supply that could be expedited
-        product_supply = supply_df[supply_df['pt_code'] == pt_code].copy()
-        
-        # Look for supply arriving after the shortage period
-        future_supply = product_supply[product_supply['source_type'].isin(['Pending PO', 'Pending CAN'])]
-        
-        if not future_supply.empty:
-            for _, supply_row in future_supply.iterrows():
-                expedite_candidates.append({
-                    'pt_code': pt_code,
-                    'product_name': product_gap['product_name'].iloc[0] if 'product_name' in product_gap.columns else '',
-                    'shortage_period': first_shortage_period,
-                    'shortage_qty': shortage_amount,
-                    'supply_source': supply_row.get('source_type', ''),
-                    'supply_number': supply_row.get('supply_number', ''),
-                    'supply_qty': supply_row.get('quantity', 0),
-                    'current_eta': supply_row.get('date_ref', ''),
-                    'action': 'Expedite delivery to before ' + str(first_shortage_period)
-                })
-    
-    return pd.DataFrame(expedite_candidates)
-
-
-def calculate_order_requirements(gap_df: pd.DataFrame) -> pd.DataFrame:
+    # Pending supply of those products, grouped by product in GAP order
+    future_supply = supply_df[
+        supply_df['source_type'].isin(['Pending PO', 'Pending CAN']) &
+        supply_df['pt_code'].isin(shortage_products.index)
+    ]
+    if future_supply.empty:
+        return pd.DataFrame()
+    
+    product_order = pd.Series(np.arange(len(shortage_products)), index=shortage_products.index)
+    future_supply = future_supply.iloc[
+        np.argsort(product_order.reindex(future_supply['pt_code']).to_numpy(), kind='stable')
+    ]
+    product_info = shortage_products.reindex(future_supply['pt_code'])
+    shortage_period = product_info['first_shortage_period'].to_numpy()
+    
+    def _supply_column(col: str, default):
+        return future_supply[col].to_numpy() if col in future_supply.columns else default
+    
+    return pd.DataFrame({
+        'pt_code': future_supply['pt_code'].to_numpy(),
+        'product_name': product_info['product_name'].to_numpy(),
+        'shortage_period': shortage_period,
+        'shortage_qty': product_info['first_shortage_qty'].to_numpy(),
+        'supply_source': _supply_column('source_type', ''),
+        'supply_number': _supply_column('supply_number', ''),
+        'supply_qty': _supply_column('quantity', 0),
+        'current_eta': _supply_column('date_ref', ''),
+        'action': ['Expedite delivery to before ' + str(period) for period in shortage_period]
+    })
+
+
+def calculate_order_requirements(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Calculate new order requirements for products with net shortage
     
     Args:
         gap_df: GAP analysis dataframe
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dataframe with order requirements for each product
     """
     
-    main_categorization = categorize_main_category(gap_df)
-    net_shortage_products = main_categorization['net_shortage']
+    if gap_df.empty:
+        return pd.DataFrame()
     
-    if not net_shortage_products:
+    summary = _resolve_summary(gap_df, summary)
+    products = summary[summary['category'] == 'Net Shortage']
+    
+    if products.empty:
         return pd.DataFrame()
     
-    order_requirements = []
-    
-    for pt_code in net_shortage_products:
-        product_gap = gap_df[gap_df['pt_code'] == pt_code]
-        
-        # Calculate total shortage
-        total_demand = product_gap['total_demand_qty'].sum()
-        total_supply = product_gap['supply_in_period'].sum()
-        net_shortage = total_demand - total_supply
-        
-        # Find when shortage starts
-        shortage_periods = product_gap[product_gap['gap_quantity'] < 0]
-        first_shortage_period = shortage_periods.iloc[0]['period'] if not shortage_periods.empty else None
-        
-        # Check if using backlog tracking
-        if 'backlog_to_next' in product_gap.columns:
-            final_backlog = product_gap['backlog_to_next'].iloc[-1] if not product_gap.empty else 0
-            order_qty = max(net_shortage, final_backlog)
-        else:
-            order_qty = net_shortage
-        
-        order_requirements.append({
-            'pt_code': pt_code,
-            'product_name': product_gap['product_name'].iloc[0] if 'product_name' in product_gap.columns else '',
-            'brand': product_gap['brand'].iloc[0] if 'brand' in product_gap.columns else '',
-            'package_size': product_gap['package_size'].iloc[0] if 'package_size' in product_gap.columns else '',
-            'standard_uom': product_gap['standard_uom'].iloc[0] if 'standard_uom' in product_gap.columns else '',
-            'order_quantity': order_qty,
-            'first_shortage_period': first_shortage_period,
-            'total_demand': total_demand,
-            'total_supply': total_supply,
-            'coverage_periods': len(product_gap),
-            'urgency': 'Immediate' if first_shortage_period else 'Plan'
-        })
-    
-    order_df = pd.DataFrame(order_requirements)
+    net_shortage = products['total_demand'] - products['total_supply']
+    
+    # With backlog tracking, cover whichever is larger: net shortage or final backlog
+    if 'backlog_to_next' in gap_df.columns:
+        final_backlog = products['final_backlog']
+        order_qty = final_backlog.where(final_backlog > net_shortage, net_shortage)
+    else:
+        order_qty = net_shortage
+    
+    first_shortage_period = products['first_shortage_period']
+    
+    order_df = pd.DataFrame({
+        'pt_code': products.index,
+        'product_name': products['product_name'].to_numpy(),
+        'brand': products['brand'].to_numpy(),
+        'package_size': products['package_size'].to_numpy(),
+        'standard_uom': products['standard_uom'].to_numpy(),
+        'order_quantity': order_qty.to_numpy(),
+        'first_shortage_period': first_shortage_period.to_numpy(),
+        'total_demand': products['total_demand'].to_numpy(),
+        'total_supply': products['total_supply'].to_numpy(),
+        'coverage_periods': products['total_periods'].to_numpy(),
+        'urgency': np.where(first_shortage_period.notna(), 'Immediate', 'Plan')
+    })
     
     # Sort by order quantity descending
-    if not order_df.empty:
-        order_df = order_df.sort_values('order_quantity', ascending=False)
+    order_df = order_df.sort_values('order_quantity', ascending=False)
     
     return order_df
 
 
-def calculate_surplus_review(gap_df: pd.DataFrame) -> pd.DataFrame:
+def calculate_surplus_review(gap_df: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Calculate surplus review for products with net surplus
     
     Args:
         gap_df: GAP analysis dataframe
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dataframe with surplus review information for each product
     """
     
-    main_categorization = categorize_main_category(gap_df)
-    net_surplus_products = main_categorization['net_surplus']
+    if gap_df.empty:
+        return pd.DataFrame()
     
-    if not net_surplus_products:
+    summary = _resolve_summary(gap_df, summary)
+    products = summary[summary['category'] == 'Net Surplus']
+    
+    if products.empty:
         return pd.DataFrame()
     
-    surplus_review = []
-    
-    for pt_code in net_surplus_products:
-        product_gap = gap_df[gap_df['pt_code'] == pt_code]
-        
-        # Calculate total surplus
-        total_demand = product_gap['total_demand_qty'].sum()
-        total_supply = product_gap['supply_in_period'].sum()
-        net_surplus = total_supply - total_demand
-        
-        # Find surplus distribution
-        surplus_periods = product_gap[product_gap['gap_quantity'] > 0]
-        avg_surplus_per_period = surplus_periods['gap_quantity'].mean() if not surplus_periods.empty else 0
-        
-        # Calculate inventory holding implications
-        surplus_percentage = (net_surplus / total_demand * 100) if total_demand > 0 else 0
-        
-        surplus_review.append({
-            'pt_code': pt_code,
-            'product_name': product_gap['product_name'].iloc[0] if 'product_name' in product_gap.columns else '',
-            'brand': product_gap['brand'].iloc[0] if 'brand' in product_gap.columns else '',
-            'package_size': product_gap['package_size'].iloc[0] if 'package_size' in product_gap.columns else '',
-            'standard_uom': product_gap['standard_uom'].iloc[0] if 'standard_uom' in product_gap.columns else '',
-            'surplus_quantity': net_surplus,
-            'total_demand': total_demand,
-            'total_supply': total_supply,
-            'surplus_percentage': surplus_percentage,
-            'surplus_periods': len(surplus_periods),
-            'total_periods': len(product_gap),
-            'avg_surplus_per_period': avg_surplus_per_period,
-            'recommendation': 'Review excess stock' if surplus_percentage > 50 else 'Monitor'
-        })
-    
-    surplus_df = pd.DataFrame(surplus_review)
+    total_demand = products['total_demand']
+    net_surplus = products['total_supply'] - total_demand
+    
+    # Calculate inventory holding implications
+    surplus_percentage = (net_surplus / total_demand.where(total_demand > 0) * 100).fillna(0)
+    
+    surplus_df = pd.DataFrame({
+        'pt_code': products.index,
+        'product_name': products['product_name'].to_numpy(),
+        'brand': products['brand'].to_numpy(),
+        'package_size': products['package_size'].to_numpy(),
+        'standard_uom': products['standard_uom'].to_numpy(),
+        'surplus_quantity': net_surplus.to_numpy(),
+        'total_demand': total_demand.to_numpy(),
+        'total_supply': products['total_supply'].to_numpy(),
+        'surplus_percentage': surplus_percentage.to_numpy(),
+        'surplus_periods': products['surplus_periods'].to_numpy(),
+        'total_periods': products['total_periods'].to_numpy(),
+        'avg_surplus_per_period': products['avg_surplus_per_period'].to_numpy(),
+        'recommendation': np.where(surplus_percentage > 50, 'Review excess stock', 'Monitor')
+    })
     
     # Sort by surplus quantity descending
-    if not surplus_df.empty:
-        surplus_df = surplus_df.sort_values('surplus_quantity', ascending=False)
+    surplus_df = surplus_df.sort_values('surplus_quantity', ascending=False)
     
     return surplus_df
 
 
-def get_action_summary(gap_df: pd.DataFrame, supply_df: pd.DataFrame = None) -> Dict[str, pd.DataFrame]:
+def get_action_summary(gap_df: pd.DataFrame, supply_df: pd.DataFrame = None,
+                       summary: Optional[pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
     """
     Get comprehensive action summary for all categories
     
     Args:
         gap_df: GAP analysis dataframe
         supply_df: Optional supply dataframe
+        summary: Optional build_product_summary(gap_df) to reuse
     
     Returns:
         Dictionary with action summaries:
@@ -513,9 +611,12 @@ def get_action_summary(gap_df: pd.DataFrame, supply_df: pd.DataFrame = None) ->
         - 'surplus_review': Surplus products to review
     """
     
+    if not gap_df.empty:
+        summary = _resolve_summary(gap_df, summary)
+    
     return {
-        'overview': get_shortage_summary(gap_df),
-        'order_requirements': calculate_order_requirements(gap_df),
-        'expedite_candidates': identify_expedite_candidates(gap_df, supply_df),
-        'surplus_review': calculate_surplus_review(gap_df)
+        'overview': get_shortage_summary(gap_df, summary),
+        'order_requirements': calculate_order_requirements(gap_df, summary),
+        'expedite_candidates': identify_expedite_candidates(gap_df, supply_df, summary),
+        'surplus_review': calculate_surplus_review(gap_df, summary)
     }
\ No newline at end of file
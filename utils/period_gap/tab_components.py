@@ -7,9 +7,14 @@ Version 4.0 - Redesigned UI with 4 tabs matching Excel export structure
 - Tab 3: Period Summary (matches Period_Summary sheet) with charts
 - Tab 4: Pivot View (matches Pivot_View sheet)
 - Action Items Expander (matches Action_Items sheet)
+Version 4.1 - Product/Period summary tables built from the shared
+  shortage_analyzer summaries (one grouped pass per GAP result)
+Version 4.2 - Renderers accept the page's product_summary so one GAP
+  result is summarized once per run
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Set
@@ -26,7 +31,8 @@ def render_gap_detail_tab(
     gap_df: pd.DataFrame,
     display_filters: Dict[str, Any],
     df_demand_filtered: Optional[pd.DataFrame] = None,
-    df_supply_filtered: Optional[pd.DataFrame] = None
+    df_supply_filtered: Optional[pd.DataFrame] = None,
+    product_summary: Optional[pd.DataFrame] = None
 ):
     """
     Render GAP Detail tab - matches GAP_Analysis Excel sheet
@@ -41,7 +47,7 @@ def render_gap_detail_tab(
         return
     
     # Get categorization for filtering
-    categorization = categorize_products(gap_df)
+    categorization = categorize_products(gap_df, product_summary)
     
     # --- Display Filters Section ---
     st.markdown("##### 🔍 Display Filters")
@@ -161,99 +167,61 @@ def render_gap_detail_tab(
 # TAB 2: PRODUCT SUMMARY
 # =============================================================================
 
-def create_product_summary_df(gap_df: pd.DataFrame, track_backlog: bool = True) -> pd.DataFrame:
+def create_product_summary_df(
+    gap_df: pd.DataFrame,
+    track_backlog: bool = True,
+    product_summary: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """
     Create product summary dataframe - one row per product
     Matches Product_Summary Excel sheet
     """
-    from .shortage_analyzer import categorize_products
+    from .shortage_analyzer import build_product_summary
     
     if gap_df.empty:
         return pd.DataFrame()
     
-    categorization = categorize_products(gap_df)
+    summary = build_product_summary(gap_df) if product_summary is None else product_summary
     
-    summary_rows = []
+    category = summary['category']
+    is_net_shortage = category == 'Net Shortage'
+    is_net_surplus = category == 'Net Surplus'
     
-    for pt_code in gap_df['pt_code'].unique():
-        product_df = gap_df[gap_df['pt_code'] == pt_code].copy()
-        
-        # Get product info
-        brand = product_df['brand'].iloc[0] if 'brand' in product_df.columns else ''
-        product_name = product_df['product_name'].iloc[0] if 'product_name' in product_df.columns else ''
-        package_size = product_df['package_size'].iloc[0] if 'package_size' in product_df.columns else ''
-        uom = product_df['standard_uom'].iloc[0] if 'standard_uom' in product_df.columns else ''
-        
-        # Calculate totals
-        total_demand = product_df['total_demand_qty'].sum()
-        total_supply = product_df['supply_in_period'].sum()
-        net_position = total_supply - total_demand
-        
-        # Calculate averages
-        avg_fill = product_df['fulfillment_rate_percent'].mean()
-        
-        # Shortage/Surplus quantities
-        shortage_qty = abs(product_df[product_df['gap_quantity'] < 0]['gap_quantity'].sum())
-        surplus_qty = product_df[product_df['gap_quantity'] > 0]['gap_quantity'].sum()
-        
-        # Period counts
-        shortage_periods = (product_df['gap_quantity'] < 0).sum()
-        surplus_periods = (product_df['gap_quantity'] > 0).sum()
-        total_periods = len(product_df)
-        
-        # Final backlog
+    # Final backlog
+    if track_backlog and 'backlog_to_next' in gap_df.columns:
+        final_backlog = summary['final_backlog'].to_numpy()
+    else:
         final_backlog = 0
-        if track_backlog and 'backlog_to_next' in product_df.columns:
-            final_backlog = product_df['backlog_to_next'].iloc[-1] if not product_df.empty else 0
-        
-        # Determine category
-        if pt_code in categorization['net_shortage']:
-            category = "🚨 Net Shortage"
-            category_sort = 1
-        elif pt_code in categorization['net_surplus']:
-            category = "📈 Net Surplus"
-            category_sort = 3
-        else:
-            category = "✅ Balanced"
-            category_sort = 2
-        
-        # Timing issue flag
-        has_timing_issue = (shortage_periods > 0 and surplus_periods > 0)
-        timing_flag = "⚠️" if has_timing_issue else ""
-        
-        # Recommended action
-        if pt_code in categorization['net_shortage']:
-            action = "New Order"
-        elif pt_code in categorization['timing_shortage'] and pt_code not in categorization['net_shortage']:
-            action = "Expedite"
-        elif pt_code in categorization['net_surplus']:
-            action = "Review Stock"
-        else:
-            action = "Monitor"
-        
-        summary_rows.append({
-            'category': category,
-            'category_sort': category_sort,
-            'pt_code': pt_code,
-            'brand': brand,
-            'product_name': product_name,
-            'package_size': package_size,
-            'uom': uom,
-            'total_demand': total_demand,
-            'total_supply': total_supply,
-            'net_position': net_position,
-            'avg_fill_pct': avg_fill,
-            'shortage_qty': shortage_qty,
-            'surplus_qty': surplus_qty,
-            'shortage_periods': shortage_periods,
-            'surplus_periods': surplus_periods,
-            'total_periods': total_periods,
-            'final_backlog': final_backlog,
-            'timing_issue': timing_flag,
-            'action': action
-        })
     
-    summary_df = pd.DataFrame(summary_rows)
+    # Timing issue flag: both shortage and surplus periods
+    has_timing_issue = summary['timing_shortage'] & summary['timing_surplus']
+    
+    summary_df = pd.DataFrame({
+        'category': np.select([is_net_shortage, is_net_surplus], ["🚨 Net Shortage", "📈 Net Surplus"], default="✅ Balanced"),
+        'category_sort': np.select([is_net_shortage, is_net_surplus], [1, 3], default=2),
+        'pt_code': summary.index,
+        'brand': summary['brand'].to_numpy(),
+        'product_name': summary['product_name'].to_numpy(),
+        'package_size': summary['package_size'].to_numpy(),
+        'uom': summary['standard_uom'].to_numpy(),
+        'total_demand': summary['total_demand'].to_numpy(),
+        'total_supply': summary['total_supply'].to_numpy(),
+        'net_position': summary['net_position'].to_numpy(),
+        'avg_fill_pct': summary['avg_fill_pct'].to_numpy(),
+        'shortage_qty': summary['shortage_qty'].to_numpy(),
+        'surplus_qty': summary['surplus_qty'].to_numpy(),
+        'shortage_periods': summary['shortage_periods'].to_numpy(),
+        'surplus_periods': summary['surplus_periods'].to_numpy(),
+        'total_periods': summary['total_periods'].to_numpy(),
+        'final_backlog': final_backlog,
+        'timing_issue': np.where(has_timing_issue, "⚠️", ""),
+        # Recommended action
+        'action': np.select(
+            [is_net_shortage, summary['timing_shortage'], is_net_surplus],
+            ["New Order", "Expedite", "Review Stock"],
+            default="Monitor"
+        )
+    })
     
     # Sort by category then by net position
     if not summary_df.empty:
@@ -265,29 +233,33 @@ def create_product_summary_df(gap_df: pd.DataFrame, track_backlog: bool = True)
 
 def render_product_summary_tab(
     gap_df: pd.DataFrame,
-    display_filters: Dict[str, Any]
+    display_filters: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
 ):
     """
     Render Product Summary tab - matches Product_Summary Excel sheet
     Shows one row per product with totals and categorization
     """
     from .formatters import format_number, format_percentage
-    from .shortage_analyzer import categorize_products
+    from .shortage_analyzer import build_product_summary, categorize_products
     
     if gap_df.empty:
         st.info("📭 No data available.")
         return
     
+    if product_summary is None:
+        product_summary = build_product_summary(gap_df)
+    
     # Create summary dataframe
     track_backlog = display_filters.get('track_backlog', True)
-    summary_df = create_product_summary_df(gap_df, track_backlog)
+    summary_df = create_product_summary_df(gap_df, track_backlog, product_summary)
     
     if summary_df.empty:
         st.warning("⚠️ Could not create product summary.")
         return
     
     # Get categorization for counts
-    categorization = categorize_products(gap_df)
+    categorization = categorize_products(gap_df, product_summary)
     
     # --- Filters ---
     st.markdown("##### 🔍 Filters")
@@ -398,34 +370,26 @@ def create_period_summary_df(gap_df: pd.DataFrame, period_type: str = "Weekly")
     Create period summary dataframe - one row per period
     Matches Period_Summary Excel sheet
     """
-    from .period_helpers import is_past_period, parse_week_period, parse_month_period
+    from .helpers import sort_period_labels
+    from .period_helpers import is_past_period
+    from .shortage_analyzer import build_period_summary
     
     if gap_df.empty:
         return pd.DataFrame()
     
+    period_summary = build_period_summary(gap_df)
+    period_summary = period_summary.loc[sort_period_labels(gap_df, list(period_summary.index), period_type)]
+    
     summary_rows = []
     
-    for period in gap_df['period'].unique():
-        period_df = gap_df[gap_df['period'] == period].copy()
+    for row in period_summary.itertuples():
+        period = row.Index
         
         # Check if past period
         is_past = is_past_period(str(period), period_type)
         status = "🔴" if is_past else ""
         
-        # Calculate metrics
-        products_count = period_df['pt_code'].nunique()
-        total_demand = period_df['total_demand_qty'].sum()
-        total_supply = period_df['supply_in_period'].sum()
-        net_gap = total_supply - total_demand
-        avg_fill = period_df['fulfillment_rate_percent'].mean()
-        
-        # Products with shortage/surplus
-        products_shortage = (period_df['gap_quantity'] < 0).sum()
-        products_surplus = (period_df['gap_quantity'] > 0).sum()
-        
-        # Total shortage/surplus quantities
-        total_shortage_qty = abs(period_df[period_df['gap_quantity'] < 0]['gap_quantity'].sum())
-        total_surplus_qty = period_df[period_df['gap_quantity'] > 0]['gap_quantity'].sum()
+        avg_fill = row.avg_fill_pct
         
         # Period health
         if avg_fill >= 95:
@@ -435,38 +399,22 @@ def create_period_summary_df(gap_df: pd.DataFrame, period_type: str = "Weekly")
         else:
             health = "🔴"
         
-        # Sort key
-        if period_type == "Weekly":
-            sort_key = parse_week_period(str(period))
-        elif period_type == "Monthly":
-            sort_key = parse_month_period(str(period))
-        else:
-            sort_key = (0, 0)
-        
         summary_rows.append({
             'status': status,
             'period': period,
-            'sort_key': sort_key,
-            'products_count': products_count,
-            'total_demand': total_demand,
-            'total_supply': total_supply,
-            'net_gap': net_gap,
+            'products_count': row.products_count,
+            'total_demand': row.total_demand,
+            'total_supply': row.total_supply,
+            'net_gap': row.total_supply - row.total_demand,
             'avg_fill_pct': avg_fill,
-            'products_shortage': products_shortage,
-            'products_surplus': products_surplus,
-            'total_shortage_qty': total_shortage_qty,
-            'total_surplus_qty': total_surplus_qty,
+            'products_shortage': row.shortage_products,
+            'products_surplus': row.surplus_products,
+            'total_shortage_qty': row.shortage_qty,
+            'total_surplus_qty': row.surplus_qty,
             'health': health
         })
     
-    summary_df = pd.DataFrame(summary_rows)
-    
-    # Sort by period
-    if not summary_df.empty:
-        summary_df = summary_df.sort_values('sort_key')
-        summary_df = summary_df.drop(columns=['sort_key'])
-    
-    return summary_df
+    return pd.DataFrame(summary_rows)
 
 
 def render_period_summary_tab(
@@ -591,7 +539,8 @@ def render_period_summary_tab(
 
 def render_pivot_view_tab(
     gap_df: pd.DataFrame,
-    display_filters: Dict[str, Any]
+    display_filters: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
 ):
     """
     Render Pivot View tab - matches Pivot_View Excel sheet
@@ -607,7 +556,7 @@ def render_pivot_view_tab(
         return
     
     period_type = display_filters.get('period_type', 'Weekly')
-    categorization = categorize_products(gap_df)
+    categorization = categorize_products(gap_df, product_summary)
     
     # --- Options ---
     st.markdown("##### ⚙️ Options")
@@ -709,7 +658,8 @@ def render_pivot_view_tab(
 
 def create_action_items_df(
     gap_df: pd.DataFrame,
-    supply_df: Optional[pd.DataFrame] = None
+    supply_df: Optional[pd.DataFrame] = None,
+    product_summary: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Create action items dataframe - matches Action_Items Excel sheet
@@ -719,7 +669,7 @@ def create_action_items_df(
     if gap_df.empty:
         return pd.DataFrame()
     
-    categorization = categorize_products(gap_df)
+    categorization = categorize_products(gap_df, product_summary)
     
     action_items = []
     
@@ -821,7 +771,8 @@ def create_action_items_df(
 
 def render_action_items_expander(
     gap_df: pd.DataFrame,
-    supply_df: Optional[pd.DataFrame] = None
+    supply_df: Optional[pd.DataFrame] = None,
+    product_summary: Optional[pd.DataFrame] = None
 ):
     """
     Render Action Items as collapsible expander
@@ -833,7 +784,7 @@ def render_action_items_expander(
         return
     
     # Create action items
-    action_df = create_action_items_df(gap_df, supply_df)
+    action_df = create_action_items_df(gap_df, supply_df, product_summary)
     
     if action_df.empty:
         with st.expander("🎯 Action Items (0 items)", expanded=False):
@@ -895,7 +846,8 @@ def render_action_items_expander(
 
 def render_overview_section(
     gap_df: pd.DataFrame,
-    display_options: Dict[str, Any]
+    display_options: Dict[str, Any],
+    product_summary: Optional[pd.DataFrame] = None
 ):
     """
     Render Overview section - always visible above tabs
@@ -909,7 +861,7 @@ def render_overview_section(
         return
     
     # Get categorization
-    categorization = categorize_products(gap_df)
+    categorization = categorize_products(gap_df, product_summary)
     
     # Calculate metrics
     total_products = gap_df['pt_code'].nunique()
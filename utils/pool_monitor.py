@@ -0,0 +1,527 @@
+# utils/pool_monitor.py
+"""
+Connection Pool Monitor
+
+get_connection_pool_status() only ever showed a point-in-time snapshot, so
+pool-timeout errors at peak load came with no history: how long sessions
+waited, who held connections and for how long, whether any were never
+returned. PoolMonitor records that continuously for the engine's QueuePool:
+
+- checkout wait     histogram of time spent waiting for a connection
+                    (MonitoredQueuePool — the pool has no "before checkout"
+                    event, so the wait is timed around QueuePool._do_get)
+- hold time         histogram overall + per call site (first frame outside
+                    SQLAlchemy / pandas / utils.db), from checkout/checkin events
+- concurrency       connections in use + sessions waiting, sampled at every
+                    checkout over a rolling window (POOL_MONITOR_WINDOW_SECONDS)
+- leaks             checkouts held longer than POOL_LEAK_SECONDS, logged once
+                    with their call site and thread
+- timeouts, invalidations, new connections
+
+Sizing:
+    recommend() sizes pool_size from the p95 of observed demand and
+    max_overflow from its peak (plus headroom), capped at
+    DB_POOL_MAX_CONNECTIONS. DB_POOL_AUTOTUNE selects what the background
+    sampler does with it every POOL_AUTOTUNE_INTERVAL seconds:
+        off        (default) nothing — recommend() is still available
+        recommend  log the recommendation when it differs from the pool
+        apply      resize the pool (never below the configured size) via
+                   the resize callback utils.db registers
+
+VERSION: 1.0.1
+
+Usage:
+    from utils.pool_monitor import get_pool_monitor, MonitoredQueuePool
+
+    engine = create_engine(url, poolclass=MonitoredQueuePool, ...)
+    get_pool_monitor().attach(engine)
+
+    stats = get_pool_monitor().stats()          # histograms, sites, leaks
+    rec = get_pool_monitor().recommend(pool_size=5, max_overflow=10)
+
+Stress test: python -m utils.pool_stress --help
+"""
+
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+POOL_MONITOR_ENABLED = os.getenv('POOL_MONITOR_ENABLED', '1') != '0'
+POOL_MONITOR_WINDOW_SECONDS = int(os.getenv('POOL_MONITOR_WINDOW_SECONDS', '900'))
+POOL_MONITOR_INTERVAL = int(os.getenv('POOL_MONITOR_INTERVAL', '30'))
+POOL_LEAK_SECONDS = int(os.getenv('POOL_LEAK_SECONDS', '300'))
+
+DB_POOL_AUTOTUNE = os.getenv('DB_POOL_AUTOTUNE', 'off').lower()
+POOL_AUTOTUNE_INTERVAL = int(os.getenv('POOL_AUTOTUNE_INTERVAL', '300'))
+POOL_AUTOTUNE_MIN_SAMPLES = int(os.getenv('POOL_AUTOTUNE_MIN_SAMPLES', '200'))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', '40'))
+
+# Histogram bucket upper bounds (ms)
+_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf)
+
+# Frames from these paths are skipped when looking for the call site
+_SKIP_PATHS = tuple(
+    os.path.normpath(p) for p in (
+        os.path.join('sqlalchemy', ''),
+        os.path.join('pandas', ''),
+        os.path.join('utils', 'db.py'),
+        os.path.join('utils', 'pool_monitor.py'),
+        os.path.join('utils', 'single_flight.py'),
+        os.path.join('utils', 'perf', ''),
+    )
+)
+_SKIP_MODULES = ('contextlib', 'threading', 'functools')
+
+
+# =============================================================================
+# HISTOGRAM
+# =============================================================================
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    def __init__(self):
+        self.counts = [0] * len(_BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(_BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (max for the last)."""
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(_BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 2),
+            'buckets': {('inf' if math.isinf(b) else f'<={b}ms'): n
+                        for b, n in zip(_BUCKETS_MS, self.counts) if n},
+        }
+
+
+class _Site:
+    __slots__ = ('checkouts', 'hold', 'wait_ms')
+
+    def __init__(self):
+        self.checkouts = 0
+        self.hold = Histogram()
+        self.wait_ms = 0.0
+
+
+def _call_site() -> str:
+    """file:line (function) of the first frame outside the DB plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = os.path.normpath(frame.f_code.co_filename)
+        module = frame.f_globals.get('__name__', '')
+        if not (any(p in path for p in _SKIP_PATHS) or module.split('.')[0] in _SKIP_MODULES):
+            parts = path.split(os.sep)
+            short = os.sep.join(parts[-2:])
+            return f"{short}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return 'unknown'
+
+
+# =============================================================================
+# MONITOR
+# =============================================================================
+
+class PoolMonitor:
+    """Pool event recorder + sizing advisor (one per process, see get_pool_monitor)."""
+
+    def __init__(self, window_seconds: int = POOL_MONITOR_WINDOW_SECONDS,
+                 leak_seconds: int = POOL_LEAK_SECONDS):
+        self.window_seconds = window_seconds
+        self.leak_seconds = leak_seconds
+        self._lock = threading.Lock()
+        self._resize: Optional[Callable[[int, int], None]] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._last_autotune = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded data (configuration and attachments stay)."""
+        with self._lock:
+            self.wait = Histogram()
+            self.hold = Histogram()
+            self._sites: Dict[str, _Site] = {}
+            self._outstanding: Dict[int, Tuple[float, str, str]] = {}
+            self._warned: set = set()
+            self._demand: deque = deque(maxlen=100_000)   # (monotonic ts, in_use + waiting)
+            self._timeouts: deque = deque(maxlen=10_000)  # monotonic ts
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.invalidations = 0
+            self.new_connections = 0
+            self.in_use = 0
+            self.waiting = 0
+            self.peak_in_use = 0
+            self.peak_waiting = 0
+
+    # ── Wiring ───────────────────────────────────────────────────
+
+    def attach(self, engine, resize: Optional[Callable[[int, int], None]] = None):
+        """Listen to the engine's pool events (idempotent per engine)."""
+        if resize is not None:
+            self._resize = resize
+        if not POOL_MONITOR_ENABLED:
+            return engine
+        if not event.contains(engine, 'checkout', self._on_checkout):
+            event.listen(engine, 'checkout', self._on_checkout)
+            event.listen(engine, 'checkin', self._on_checkin)
+            event.listen(engine, 'connect', self._on_connect)
+            event.listen(engine, 'invalidate', self._on_invalidate)
+        self._start_sampler()
+        return engine
+
+    # ── Wait (called by MonitoredQueuePool) ──────────────────────
+
+    def _begin_wait(self):
+        with self._lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def _end_wait(self, started: float, timed_out: bool):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.waiting -= 1
+            self.wait.observe(elapsed_ms)
+            if timed_out:
+                self.timeouts += 1
+                self._timeouts.append(time.monotonic())
+        return elapsed_ms
+
+    # ── Pool events ──────────────────────────────────────────────
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        site = _call_site()
+        now = time.perf_counter()
+        wait_ms = connection_record.info.pop('_pm_wait_ms', 0.0)
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self._demand.append((time.monotonic(), self.in_use + self.waiting))
+            stats = self._sites.get(site)
+            if stats is None:
+                stats = self._sites[site] = _Site()
+            stats.checkouts += 1
+            stats.wait_ms += wait_ms
+            self._outstanding[id(connection_record)] = (now, site, threading.current_thread().name)
+        connection_record.info['_pm_checkout'] = (now, site)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checkout = connection_record.info.pop('_pm_checkout', None)
+        if checkout is None:
+            return
+        started, site = checkout
+        hold_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.checkins += 1
+            self.in_use = max(0, self.in_use - 1)
+            self.hold.observe(hold_ms)
+            stats = self._sites.get(site)
+            if stats is not None:
+                stats.hold.observe(hold_ms)
+            self._outstanding.pop(id(connection_record), None)
+            self._warned.discard(id(connection_record))
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.new_connections += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    # ── Leaks ────────────────────────────────────────────────────
+
+    def leaks(self, older_than: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Connections checked out longer than older_than seconds (default POOL_LEAK_SECONDS)."""
+        limit = self.leak_seconds if older_than is None else older_than
+        now = time.perf_counter()
+        with self._lock:
+            items = list(self._outstanding.items())
+        return sorted(
+            ({'key': key, 'site': site, 'thread': thread, 'age_s': round(now - started, 1)}
+             for key, (started, site, thread) in items if now - started >= limit),
+            key=lambda leak: -leak['age_s'],
+        )
+
+    def _warn_leaks(self):
+        for leak in self.leaks():
+            if leak['key'] in self._warned:
+                continue
+            self._warned.add(leak['key'])
+            logger.warning(f"Pool: connection held {leak['age_s']:.0f}s without check-in — "
+                           f"{leak['site']} [thread {leak['thread']}]")
+
+    # ── Stats ────────────────────────────────────────────────────
+
+    def _window_demand(self) -> List[int]:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            return [d for ts, d in self._demand if ts >= cutoff]
+
+    def _window_timeouts(self) -> int:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            return sum(1 for ts in self._timeouts if ts >= cutoff)
+
+    def sites(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Call sites by total hold time."""
+        with self._lock:
+            rows = [
+                {
+                    'site': site,
+                    'checkouts': s.checkouts,
+                    'hold_total_s': round(s.hold.total_ms / 1000, 3),
+                    'hold_avg_ms': round(s.hold.total_ms / s.hold.count, 1) if s.hold.count else 0.0,
+                    'hold_p95_ms': s.hold.percentile(95),
+                    'hold_max_ms': round(s.hold.max_ms, 1),
+                    'wait_total_ms': round(s.wait_ms, 1),
+                }
+                for site, s in self._sites.items()
+            ]
+        return sorted(rows, key=lambda r: -r['hold_total_s'])[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        demand = self._window_demand()
+        with self._lock:
+            counters = {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'new_connections': self.new_connections,
+                'in_use': self.in_use,
+                'waiting': self.waiting,
+                'peak_in_use': self.peak_in_use,
+                'peak_waiting': self.peak_waiting,
+                'wait': self.wait.summary(),
+                'hold': self.hold.summary(),
+            }
+        counters.update({
+            'window_s': self.window_seconds,
+            'window_checkouts': len(demand),
+            'demand_p95': _percentile(demand, 95),
+            'demand_peak': max(demand) if demand else 0,
+            'window_timeouts': self._window_timeouts(),
+            'sites': self.sites(),
+            'leaks': self.leaks(),
+        })
+        return counters
+
+    # ── Sizing ───────────────────────────────────────────────────
+
+    def recommend(self, pool_size: int, max_overflow: int,
+                  max_connections: int = DB_POOL_MAX_CONNECTIONS,
+                  min_samples: int = POOL_AUTOTUNE_MIN_SAMPLES) -> Dict[str, Any]:
+        """
+        Pool sizing from observed demand (in use + waiting, per checkout)
+
+        pool_size     ≈ 1.25 × p95 demand (steady state stays in the pool)
+        max_overflow  ≈ 1.25 × peak demand − pool_size (bursts), at least 2
+        Timeouts or a p95 wait over 250 ms add 50 % to the overflow.
+        Both are capped so pool_size + max_overflow ≤ max_connections.
+        """
+        demand = self._window_demand()
+        current = {'pool_size': pool_size, 'max_overflow': max_overflow}
+        if len(demand) < min_samples:
+            return {'status': 'insufficient_data', 'samples': len(demand), 'current': current,
+                    'pool_size': pool_size, 'max_overflow': max_overflow,
+                    'reason': f"{len(demand)} checkouts in window (< {min_samples})"}
+
+        p95 = _percentile(demand, 95)
+        peak = max(demand)
+        timeouts = self._window_timeouts()
+        wait_p95 = self.wait.percentile(95)
+
+        size = max(2, math.ceil(p95 * 1.25))
+        overflow = max(2, math.ceil(peak * 1.25) - size)
+        reasons = [f"demand p95={p95}, peak={peak}"]
+        if timeouts or wait_p95 > 250:
+            overflow = math.ceil(overflow * 1.5)
+            reasons.append(f"{timeouts} timeouts, wait p95={wait_p95:.0f}ms")
+
+        size = min(size, max_connections)
+        overflow = max(0, min(overflow, max_connections - size))
+        changed = (size, overflow) != (pool_size, max_overflow)
+        return {
+            'status': 'change' if changed else 'ok',
+            'samples': len(demand),
+            'current': current,
+            'pool_size': size,
+            'max_overflow': overflow,
+            'reason': '; '.join(reasons),
+        }
+
+    def autotune(self, pool_size: int, max_overflow: int,
+                 base_size: int, base_overflow: int, mode: str = DB_POOL_AUTOTUNE) -> Optional[Dict]:
+        """
+        Apply the recommendation according to mode ('off' / 'recommend' / 'apply')
+
+        'apply' never goes below the configured (base) sizes and skips changes
+        of less than 2 connections, so the pool is not resized for noise.
+        """
+        if mode not in ('recommend', 'apply'):
+            return None
+        rec = self.recommend(pool_size, max_overflow)
+        if rec['status'] != 'change':
+            return rec
+
+        size = max(rec['pool_size'], base_size)
+        overflow = max(rec['max_overflow'], base_overflow)
+        if mode == 'recommend' or self._resize is None:
+            logger.info(f"Pool sizing recommendation: pool_size {pool_size}→{rec['pool_size']}, "
+                        f"max_overflow {max_overflow}→{rec['max_overflow']} ({rec['reason']})")
+            return rec
+        if abs(size - pool_size) + abs(overflow - max_overflow) < 2:
+            return rec
+
+        logger.warning(f"Pool auto-tune: pool_size {pool_size}→{size}, "
+                       f"max_overflow {max_overflow}→{overflow} ({rec['reason']})")
+        self._resize(size, overflow)
+        return {**rec, 'applied': {'pool_size': size, 'max_overflow': overflow}}
+
+    # ── Background sampler ───────────────────────────────────────
+
+    def _start_sampler(self):
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        self._sampler = threading.Thread(target=self._run_sampler, name='pool-monitor', daemon=True)
+        self._sampler.start()
+
+    def _run_sampler(self):
+        while True:
+            time.sleep(POOL_MONITOR_INTERVAL)
+            try:
+                self._warn_leaks()
+                if DB_POOL_AUTOTUNE != 'off' and \
+                        time.monotonic() - self._last_autotune >= POOL_AUTOTUNE_INTERVAL:
+                    self._last_autotune = time.monotonic()
+                    from .db import autotune_pool
+                    autotune_pool()
+            except Exception as e:
+                logger.warning(f"Pool monitor sampler error: {e}")
+
+
+def _percentile(values: List[int], q: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+# =============================================================================
+# POOL CLASS
+# =============================================================================
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that reports checkout wait time and timeouts to the monitor."""
+
+    _retired = False
+
+    def retire(self):
+        """
+        Take the pool out of service after utils.db swapped in a resized one:
+        idle connections close now, checked-out ones close on return instead
+        of idling here (so the old and new pools never add up).
+        """
+        self._retired = True
+        self.dispose()
+
+    def _do_return_conn(self, record):
+        if not self._retired:
+            return super()._do_return_conn(record)
+        try:
+            record.close()
+        finally:
+            self._dec_overflow()
+
+    def _do_get(self):
+        if not POOL_MONITOR_ENABLED:
+            return super()._do_get()
+        monitor = _monitor
+        started = time.perf_counter()
+        monitor._begin_wait()
+        timed_out = False
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            wait_ms = monitor._end_wait(started, timed_out)
+        record.info['_pm_wait_ms'] = wait_ms
+        if wait_ms >= 1.0:
+            from .perf import current_tracer
+            tracer = current_tracer()
+            if tracer is not None:
+                tracer.log_statement('pool', started, wait_ms / 1000, label="pool checkout wait")
+        return record
+
+
+# =============================================================================
+# PROCESS-WIDE MONITOR
+# =============================================================================
+
+_monitor = PoolMonitor()
+
+
+def get_pool_monitor() -> PoolMonitor:
+    """Process-wide monitor (MonitoredQueuePool reports here)"""
+    return _monitor
+
+
+def get_pool_monitor_stats() -> Dict[str, Any]:
+    return _monitor.stats()
+
+
+__all__ = [
+    'DB_POOL_AUTOTUNE',
+    'DB_POOL_MAX_CONNECTIONS',
+    'Histogram',
+    'PoolMonitor',
+    'MonitoredQueuePool',
+    'get_pool_monitor',
+    'get_pool_monitor_stats',
+]
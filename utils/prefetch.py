@@ -0,0 +1,245 @@
+# utils/prefetch.py
+"""
+Background Prefetch for Drill-Down Loaders
+
+The tabbed dashboards fetch drill-down data (payment transactions, invoice
+documents, order / delivery details) only when a row is clicked, so every
+click waits on a query. PrefetchScheduler warms the likely-next keys — e.g.
+the largest outstanding invoices, the most recent orders — on a background
+worker right after the Overview tab renders, in ONE batched query per
+loader, and hands the rows over when a fragment asks for them.
+
+Connection budget:
+    All sessions share one worker pool of PREFETCH_MAX_CONNECTIONS threads,
+    so prefetch never holds more than that many DB connections at once.
+    Set env PREFETCH_MAX_CONNECTIONS=0 to disable prefetching.
+
+Worker threads only run the query callables (pandas.read_sql on the shared
+engine) — they never touch st.* or session state.
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.prefetch import get_prefetcher, top_keys
+
+    pf = get_prefetcher("salesperson")
+    txn_loader = pf.loader('payment_txn', queries.get_payment_transactions, 'sale_invoice_number')
+
+    # after the Overview tab:
+    pf.schedule('payment_txn', queries.get_payment_transactions,
+                top_keys(ar_df, 'inv_number', 'outstanding_by_split_usd'),
+                key_col='sale_invoice_number')
+
+    payment_tab_fragment(..., payment_txn_loader=txn_loader)
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+PREFETCH_MAX_CONNECTIONS = int(os.getenv('PREFETCH_MAX_CONNECTIONS', '2'))
+PREFETCH_TOP_N = 25              # keys warmed per loader
+PREFETCH_TTL_SECONDS = 300       # prefetched rows older than this are refetched
+PREFETCH_WAIT_SECONDS = 15       # max wait on an in-flight prefetch before querying directly
+
+
+# =============================================================================
+# WORKER POOL (process-wide)
+# =============================================================================
+
+@st.cache_resource
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Shared worker pool — its size is the prefetch connection budget."""
+    logger.info(f"Prefetch pool started ({max_workers} workers)")
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+
+
+# =============================================================================
+# SCHEDULER (per session)
+# =============================================================================
+
+@dataclass
+class _PrefetchEntry:
+    keys: FrozenSet
+    key_col: str
+    future: Future
+    created: float = field(default_factory=time.time)
+
+    def fresh(self, ttl: float) -> bool:
+        return time.time() - self.created < ttl
+
+
+class PrefetchScheduler:
+    """
+    Per-session registry of in-flight / completed prefetch batches.
+
+    schedule() submits one batched fetch per loader; loader() wraps a query
+    function so requests fully covered by a fresh batch are answered from it
+    (waiting for it if still running) and everything else queries directly.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_connections: int = PREFETCH_MAX_CONNECTIONS,
+        ttl: float = PREFETCH_TTL_SECONDS,
+        wait_seconds: float = PREFETCH_WAIT_SECONDS,
+    ):
+        self.namespace = namespace
+        self.max_connections = max_connections
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self._entries: Dict[str, List[_PrefetchEntry]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_connections > 0
+
+    def _live(self, name: str) -> List[_PrefetchEntry]:
+        entries = [e for e in self._entries.get(name, []) if e.fresh(self.ttl)]
+        self._entries[name] = entries
+        return entries
+
+    def schedule(
+        self,
+        name: str,
+        fetch_fn: Callable[[list], pd.DataFrame],
+        keys: Iterable,
+        key_col: str,
+    ) -> bool:
+        """
+        Warm fetch_fn(keys) in the background.
+
+        Keys already covered by a fresh batch are skipped. Returns True if a
+        batch was submitted.
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            covered = set()
+            for entry in self._live(name):
+                covered |= entry.keys
+            new_keys = frozenset(k for k in keys if pd.notna(k) and k != '') - covered
+            if not new_keys:
+                return False
+
+            executor = _get_executor(self.max_connections)
+            future = executor.submit(fetch_fn, sorted(new_keys))
+            self._entries.setdefault(name, []).append(
+                _PrefetchEntry(keys=new_keys, key_col=key_col, future=future)
+            )
+
+        logger.debug(f"[{self.namespace}] prefetch '{name}': {len(new_keys)} keys")
+        return True
+
+    def get(self, name: str, keys: Iterable) -> Optional[pd.DataFrame]:
+        """Rows for keys from a fresh batch covering all of them, else None."""
+        wanted = set(keys)
+        if not wanted:
+            return None
+
+        with self._lock:
+            entry = next((e for e in self._live(name) if wanted <= e.keys), None)
+        if entry is None:
+            return None
+
+        try:
+            df = entry.future.result(timeout=self.wait_seconds)
+        except FutureTimeout:
+            logger.debug(f"[{self.namespace}] prefetch '{name}' still running — querying directly")
+            return None
+        except Exception as e:
+            logger.warning(f"[{self.namespace}] prefetch '{name}' failed: {e}")
+            return None
+
+        # Empty batch is indistinguishable from a swallowed query error
+        if df is None or df.empty or entry.key_col not in df.columns:
+            return None
+        return df[df[entry.key_col].isin(wanted)].reset_index(drop=True)
+
+    def loader(
+        self,
+        name: str,
+        fetch_fn: Callable[[list], pd.DataFrame],
+        key_col: str,
+    ) -> Callable[[list], pd.DataFrame]:
+        """
+        Wrap fetch_fn as a drill-down loader served from prefetched batches.
+
+        Signature unchanged: loader(keys) → DataFrame.
+        """
+        def _load(keys: list) -> pd.DataFrame:
+            df = self.get(name, keys)
+            if df is not None:
+                self._hits += 1
+                return df
+            self._misses += 1
+            return fetch_fn(keys)
+
+        return _load
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = sum(
+                1 for entries in self._entries.values() for e in entries if not e.future.done()
+            )
+        return {'hits': self._hits, 'misses': self._misses, 'pending': pending}
+
+
+def get_prefetcher(namespace: str) -> PrefetchScheduler:
+    """Session-scoped PrefetchScheduler for a dashboard page."""
+    state_key = f"_prefetcher_{namespace}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = PrefetchScheduler(namespace)
+    return st.session_state[state_key]
+
+
+# =============================================================================
+# KEY SELECTION
+# =============================================================================
+
+def top_keys(
+    df: pd.DataFrame,
+    key_col: str,
+    sort_col: Optional[str] = None,
+    n: int = PREFETCH_TOP_N,
+) -> List:
+    """
+    The n keys a user is most likely to drill into: largest (or most recent)
+    by sort_col, else first in display order.
+    """
+    if df is None or df.empty or key_col not in df.columns:
+        return []
+    ordered = df
+    if sort_col and sort_col in df.columns:
+        ordered = df.sort_values(sort_col, ascending=False, na_position='last')
+    keys = ordered[key_col].dropna()
+    keys = keys[keys.astype(str) != '']
+    return keys.drop_duplicates().head(n).tolist()
+
+
+__all__: List[str] = [
+    'PREFETCH_MAX_CONNECTIONS',
+    'PREFETCH_TOP_N',
+    'PrefetchScheduler',
+    'get_prefetcher',
+    'top_keys',
+]
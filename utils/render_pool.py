@@ -0,0 +1,172 @@
+# utils/render_pool.py
+"""
+Rendering Worker Pool
+
+Notification batches build one HTML body (and often an .xlsx / .ics
+attachment) per recipient. That is pure-Python string and openpyxl work —
+GIL-bound — so running it in the Streamlit script thread keeps one core busy
+while the rest of the machine idles. RenderPool farms those jobs out to a
+process-wide ProcessPoolExecutor and yields results as they finish, so the
+sender can start on the first email while the rest are still rendering.
+
+- Workers are started with the 'forkserver' method (never fork a threaded
+  Streamlit server); the first batch pays the worker start-up cost.
+- Render functions must be module-level and their arguments picklable
+  (dicts, DataFrames, dates).
+- Small batches (< RENDER_POOL_MIN_BATCH) and RENDER_POOL_WORKERS=0 render
+  inline in the calling thread — same API, same results.
+- A job that raises yields None (logged); a broken pool is discarded and the
+  remaining jobs render inline.
+
+VERSION: 1.0.0
+
+Usage:
+    from utils.render_pool import render_iter
+
+    jobs = {eid: (bulletin, filters) for eid, bulletin in bulletins.items()}
+    for eid, rendered in render_iter(_render_bulletin_job, jobs):
+        if rendered is None:
+            ...  # failed
+        svc.send(..., html=rendered['html'])
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+RENDER_POOL_WORKERS = int(os.getenv('RENDER_POOL_WORKERS', str(min(4, os.cpu_count() or 1))))
+RENDER_POOL_MIN_BATCH = int(os.getenv('RENDER_POOL_MIN_BATCH', '4'))
+
+# Imported once in the fork server so each worker starts warm
+_PRELOAD_MODULES = ['pandas', 'openpyxl']
+
+
+# =============================================================================
+# POOL (process-wide)
+# =============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared process pool (double-checked locking), None when disabled."""
+    global _pool
+
+    if RENDER_POOL_WORKERS <= 0:
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                ctx = multiprocessing.get_context('forkserver')
+                ctx.set_forkserver_preload(_PRELOAD_MODULES)
+                _pool = ProcessPoolExecutor(max_workers=RENDER_POOL_WORKERS, mp_context=ctx)
+                logger.info(f"Render pool started ({RENDER_POOL_WORKERS} workers)")
+
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_render_pool():
+    """Stop the worker processes (they are restarted on the next batch)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+def _render_inline(fn: Callable, key: Hashable, args: Tuple) -> Any:
+    try:
+        return fn(*args)
+    except Exception as e:
+        logger.error(f"Error rendering {key!r}: {e}")
+        return None
+
+
+def _as_args(args) -> Tuple:
+    return args if isinstance(args, tuple) else (args,)
+
+
+def render_iter(
+    fn: Callable[..., Any],
+    jobs: Dict[Hashable, Any],
+) -> Iterator[Tuple[Hashable, Any]]:
+    """
+    Run fn(*args) for every {key: args} job, yielding (key, result) as each finishes
+
+    args is a tuple of positional arguments (a non-tuple is a single argument).
+    Completion order is not input order. A failed job yields (key, None).
+    """
+    if not jobs:
+        return
+
+    start = time.perf_counter()
+    pool = _get_pool() if len(jobs) >= RENDER_POOL_MIN_BATCH else None
+
+    if pool is None:
+        for key, args in jobs.items():
+            yield key, _render_inline(fn, key, _as_args(args))
+        logger.debug(f"Rendered {len(jobs)} jobs inline in {time.perf_counter() - start:.2f}s")
+        return
+
+    pending = dict(jobs)
+    try:
+        futures = {pool.submit(fn, *_as_args(args)): key for key, args in jobs.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logger.error(f"Error rendering {key!r}: {e}")
+                result = None
+            pending.pop(key, None)
+            yield key, result
+    except BrokenProcessPool as e:
+        logger.warning(f"Render pool broken ({e}) — rendering {len(pending)} remaining jobs inline")
+        _discard_pool(pool)
+        for key, args in pending.items():
+            yield key, _render_inline(fn, key, _as_args(args))
+
+    logger.debug(f"Rendered {len(jobs)} jobs in {time.perf_counter() - start:.2f}s "
+                 f"({RENDER_POOL_WORKERS} workers)")
+
+
+def render_all(fn: Callable[..., Any], jobs: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+    """render_iter collected into {key: result} in the input order"""
+    results = dict(render_iter(fn, jobs))
+    return {key: results.get(key) for key in jobs}
+
+
+__all__ = [
+    'RENDER_POOL_WORKERS',
+    'render_iter',
+    'render_all',
+    'shutdown_render_pool',
+]
@@ -3,6 +3,7 @@
 Analysis Section for Safety Stock Management.
 Renders a deep-dive analytics panel with 4 tabs:
   📋 Review History | 📈 SS Trend | ⚖️ Coverage Analysis | 🔍 Rule Health
+Rule Health also hosts the bulk recalculation of stale rules.
 
 Usage:
     from utils.safety_stock.analysis import render_analysis_section
@@ -342,6 +343,99 @@ def _render_rule_health(entity_id):
     with issue_tabs[2]:
         _show_issue_table('_stale_60d', 'stale >60d')
 
+    _render_bulk_recalculation(entity_id, health_df)
+
+
+def _render_bulk_recalculation(entity_id, health_df: pd.DataFrame):
+    from .crud import bulk_apply_recalculation
+    from .permissions import has_permission, get_permission_message
+    from .recalculation import (
+        build_recalculation_plan, select_stale_rules, applicable_rows,
+        STALE_AFTER_DAYS, STATUS_CHANGED
+    )
+
+    st.markdown("#### ♻️ Bulk Recalculation")
+    st.caption("Recompute SS / ROP from delivery history for many rules at once. "
+               "Nothing is saved until you apply the reviewed changes.")
+
+    plan_key = f"_ss_recalc_plan_{entity_id}"
+
+    with st.form("ss_recalc_form", border=True):
+        fc1, fc2, fc3, fc4 = st.columns(4)
+        scope = fc1.radio("Rules", [f"Stale >{STALE_AFTER_DAYS}d", "All active"],
+                          horizontal=True, key="recalc_scope")
+        days_back = fc2.number_input("Analyze last N days", min_value=30, max_value=365,
+                                     value=180, step=30, key="recalc_days")
+        exclude_pending = fc3.checkbox("Exclude pending deliveries", value=True,
+                                       key="recalc_excl_pending")
+        use_lt = fc4.checkbox("Use historical lead time", value=True, key="recalc_use_lt")
+        preview = st.form_submit_button("🔍 Preview Recalculation", width="stretch")
+
+    if preview:
+        rules = health_df if scope == "All active" else select_stale_rules(health_df)
+        with st.spinner(f"Recalculating {len(rules)} rules..."):
+            st.session_state[plan_key] = build_recalculation_plan(
+                rules, days_back=int(days_back),
+                exclude_pending=bool(exclude_pending),
+                use_estimated_lead_time=bool(use_lt)
+            )
+
+    plan_df = st.session_state.get(plan_key)
+    if plan_df is None:
+        return
+    if plan_df.empty:
+        st.success("✅ No rules to recalculate.")
+        return
+
+    counts = plan_df['status'].value_counts()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Rules", len(plan_df))
+    m2.metric("Changed", int(counts.get('CHANGED', 0)))
+    m3.metric("Unchanged", int(counts.get('UNCHANGED', 0)))
+    m4.metric("Skipped", int(len(plan_df) - counts.get('CHANGED', 0) - counts.get('UNCHANGED', 0)),
+              help="No demand history or missing method parameters — kept as is")
+
+    review_df = plan_df.copy()
+    review_df.insert(0, 'apply', review_df['status'] == STATUS_CHANGED)
+    edited = st.data_editor(
+        review_df[['apply', 'status', 'pt_code', 'product_name', 'entity_code', 'customer_code',
+                   'calculation_method', 'suggested_method', 'data_points', 'avg_daily_demand',
+                   'cv_percent', 'lead_time_days', 'current_ss', 'proposed_ss', 'ss_change_pct',
+                   'current_rop', 'proposed_rop', 'note']],
+        column_config={
+            'apply': st.column_config.CheckboxColumn("Apply"),
+            'status': 'Status', 'pt_code': 'PT Code', 'product_name': 'Product',
+            'entity_code': 'Entity', 'customer_code': 'Customer',
+            'calculation_method': 'Method', 'suggested_method': 'Suggested',
+            'data_points': 'Data Pts', 'avg_daily_demand': 'Avg/Day', 'cv_percent': 'CV %',
+            'lead_time_days': 'LT Days', 'current_ss': 'SS Now', 'proposed_ss': 'SS New',
+            'ss_change_pct': 'Δ SS %', 'current_rop': 'ROP Now', 'proposed_rop': 'ROP New',
+            'note': 'Note'
+        },
+        disabled=[c for c in review_df.columns if c != 'apply'],
+        width="stretch", hide_index=True, key=f"recalc_editor_{entity_id}"
+    )
+
+    selected = plan_df[edited['apply'].to_numpy()]
+    rows = applicable_rows(selected)
+
+    if not has_permission('edit'):
+        st.info(get_permission_message('edit'))
+        return
+
+    if st.button(f"✅ Apply {len(rows)} selected", type="primary",
+                 disabled=not rows, key="recalc_apply"):
+        with st.spinner("Saving..."):
+            success, message, _ = bulk_apply_recalculation(
+                rows, st.session_state.get('username', 'unknown')
+            )
+        if success:
+            st.session_state.pop(plan_key, None)
+            st.cache_data.clear()
+            st.success(f"✅ {message}")
+        else:
+            st.error(f"⚠️ Error: {message}")
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Public entry point — called from main page as a @st.fragment
@@ -2,6 +2,8 @@
 """
 CRUD operations for Safety Stock Management
 Version 2.2 - Updated to remove reorder_qty field
+Version 2.3 - bulk_apply_recalculation for fleet-wide recalculation write-back
+Version 2.4 - bulk_create_safety_stock inserts in chunked executemany batches
 """
 
 import pandas as pd
@@ -237,6 +239,39 @@ def get_safety_stock_by_id(safety_stock_id: int) -> Optional[Dict]:
 
 # ==================== CREATE Operations ====================
 
+_INSERT_LEVEL_QUERY = """
+INSERT INTO safety_stock_levels (
+    product_id, entity_id, customer_id,
+    safety_stock_qty, reorder_point,
+    effective_from, effective_to, is_active,
+    priority_level, business_notes,
+    created_by, updated_by
+) VALUES (
+    :product_id, :entity_id, :customer_id,
+    :safety_stock_qty, :reorder_point,
+    :effective_from, :effective_to, :is_active,
+    :priority_level, :business_notes,
+    :created_by, :updated_by
+)
+"""
+
+_INSERT_PARAMETERS_QUERY = """
+INSERT INTO safety_stock_parameters (
+    safety_stock_level_id, calculation_method,
+    lead_time_days, safety_days,
+    demand_std_deviation, avg_daily_demand,
+    service_level_percent, formula_used,
+    last_calculated_date
+) VALUES (
+    :safety_stock_level_id, :calculation_method,
+    :lead_time_days, :safety_days,
+    :demand_std_deviation, :avg_daily_demand,
+    :service_level_percent, :formula_used,
+    NOW()
+)
+"""
+
+
 def create_safety_stock(data: Dict, created_by: str) -> Tuple[bool, str]:
     """
     Create new safety stock record with parameters
@@ -253,21 +288,7 @@ def create_safety_stock(data: Dict, created_by: str) -> Tuple[bool, str]:
         
         with engine.begin() as conn:
             # Insert main record - removed reorder_qty
-            insert_query = text("""
-            INSERT INTO safety_stock_levels (
-                product_id, entity_id, customer_id,
-                safety_stock_qty, reorder_point,
-                effective_from, effective_to, is_active,
-                priority_level, business_notes,
-                created_by, updated_by
-            ) VALUES (
-                :product_id, :entity_id, :customer_id,
-                :safety_stock_qty, :reorder_point,
-                :effective_from, :effective_to, :is_active,
-                :priority_level, :business_notes,
-                :created_by, :updated_by
-            )
-            """)
+            insert_query = text(_INSERT_LEVEL_QUERY)
             
             result = conn.execute(insert_query, {
                 'product_id': data['product_id'],
@@ -303,21 +324,7 @@ def create_safety_stock(data: Dict, created_by: str) -> Tuple[bool, str]:
 
 def _insert_parameters(conn, safety_stock_id: int, data: Dict):
     """Helper to insert calculation parameters"""
-    params_query = text("""
-    INSERT INTO safety_stock_parameters (
-        safety_stock_level_id, calculation_method,
-        lead_time_days, safety_days,
-        demand_std_deviation, avg_daily_demand,
-        service_level_percent, formula_used,
-        last_calculated_date
-    ) VALUES (
-        :safety_stock_level_id, :calculation_method,
-        :lead_time_days, :safety_days,
-        :demand_std_deviation, :avg_daily_demand,
-        :service_level_percent, :formula_used,
-        NOW()
-    )
-    """)
+    params_query = text(_INSERT_PARAMETERS_QUERY)
     
     conn.execute(params_query, {
         'safety_stock_level_id': safety_stock_id,
@@ -481,6 +488,30 @@ def delete_safety_stock(safety_stock_id: int, deleted_by: str) -> Tuple[bool, st
 
 # ==================== BULK Operations ====================
 
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def _db_value(value):
+    """NaN/NaT → None, numpy scalars → Python, Timestamp → date"""
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.date()
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        return value
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _rule_key(product_id, entity_id, customer_id, effective_from) -> Tuple:
+    customer_id = _db_value(customer_id)
+    return (int(product_id), int(entity_id),
+            int(customer_id) if customer_id is not None else None,
+            str(_db_value(effective_from))[:10])
+
+
 def bulk_create_safety_stock(
     data_list: List[Dict], 
     created_by: str
@@ -488,74 +519,121 @@ def bulk_create_safety_stock(
     """
     Bulk create safety stock records
     
+    Rows are expected to be pre-validated (validations.validate_bulk_frame).
+    Levels are inserted with multi-row executemany in chunks of
+    BULK_INSERT_CHUNK_SIZE inside one transaction; a chunk the database
+    rejects is retried row by row (under savepoints) so every failing row
+    is reported. Parameters rows follow in chunks once the new level IDs
+    are known.
+    
     Args:
-        data_list: List of safety stock data dictionaries
+        data_list: List of safety stock data dictionaries (optional 'row_num'
+                   is used in error messages)
         created_by: Username creating the records
     
     Returns:
-        Tuple of (success: bool, message: str, results: dict)
+        Tuple of (success: bool, message: str, results: dict) where results
+        has 'created', 'failed' and 'errors' (every failing row)
     """
     results = {'created': 0, 'failed': 0, 'errors': []}
     
     if not data_list:
         return False, "No data to import", results
     
+    today = datetime.now().date()
+    rows = []
+    for idx, data in enumerate(data_list, 1):
+        data = {k: _db_value(v) for k, v in data.items()}
+        priority_level = data.get('priority_level')
+        is_active = data.get('is_active')
+        rows.append({
+            'row_num': data.get('row_num') or idx,
+            'data': data,
+            'level': {
+                'product_id': data['product_id'],
+                'entity_id': data['entity_id'],
+                'customer_id': data.get('customer_id'),
+                'safety_stock_qty': data['safety_stock_qty'],
+                'reorder_point': data.get('reorder_point'),
+                'effective_from': data.get('effective_from') or today,
+                'effective_to': data.get('effective_to'),
+                'is_active': 1 if is_active is None else is_active,
+                'priority_level': 100 if priority_level is None else priority_level,
+                'business_notes': data.get('business_notes'),
+                'created_by': created_by,
+                'updated_by': created_by
+            }
+        })
+    
+    insert_level = text(_INSERT_LEVEL_QUERY)
+    
     try:
         engine = get_db_engine()
         
         with engine.begin() as conn:
-            for idx, data in enumerate(data_list, 1):
+            max_id_before = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM safety_stock_levels")).scalar()
+            created_rows = []
+            
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
                 try:
-                    # Prepare data with defaults - removed reorder_qty
-                    insert_data = {
-                        'product_id': data['product_id'],
-                        'entity_id': data['entity_id'],
-                        'customer_id': data.get('customer_id'),
-                        'safety_stock_qty': data['safety_stock_qty'],
-                        'reorder_point': data.get('reorder_point'),
-                        'effective_from': data.get('effective_from', datetime.now().date()),
-                        'effective_to': data.get('effective_to'),
-                        'is_active': data.get('is_active', 1),
-                        'priority_level': data.get('priority_level', 100),
-                        'business_notes': data.get('business_notes'),
-                        'created_by': created_by,
-                        'updated_by': created_by
-                    }
-                    
-                    insert_query = text("""
-                    INSERT INTO safety_stock_levels (
-                        product_id, entity_id, customer_id,
-                        safety_stock_qty, reorder_point,
-                        effective_from, effective_to, is_active,
-                        priority_level, business_notes,
-                        created_by, updated_by
-                    ) VALUES (
-                        :product_id, :entity_id, :customer_id,
-                        :safety_stock_qty, :reorder_point,
-                        :effective_from, :effective_to, :is_active,
-                        :priority_level, :business_notes,
-                        :created_by, :updated_by
-                    )
-                    """)
-                    
-                    result = conn.execute(insert_query, insert_data)
-                    
-                    # Add calculation parameters if provided
-                    if data.get('calculation_method'):
-                        safety_stock_id = result.lastrowid
-                        _insert_parameters(conn, safety_stock_id, data)
-                    
-                    results['created'] += 1
-                    
+                    with conn.begin_nested():
+                        conn.execute(insert_level, [row['level'] for row in chunk])
+                    created_rows.extend(chunk)
+                    continue
                 except Exception as e:
-                    results['failed'] += 1
-                    error_msg = f"Row {idx}: {str(e)}"
-                    results['errors'].append(error_msg)
-                    logger.error(error_msg)
-                    
-                    if len(results['errors']) >= 50:
-                        results['errors'].append("... additional errors truncated")
-                        break
+                    logger.warning(f"Bulk insert chunk at row {chunk[0]['row_num']} failed, retrying per row: {e}")
+                
+                for row in chunk:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(insert_level, row['level'])
+                        created_rows.append(row)
+                    except Exception as e:
+                        results['failed'] += 1
+                        error_msg = f"Row {row['row_num']}: {str(e)}"
+                        results['errors'].append(error_msg)
+                        logger.error(error_msg)
+            
+            # Map new level IDs back to rows by their natural key
+            param_rows = [row for row in created_rows if row['data'].get('calculation_method')]
+            if param_rows:
+                new_levels = conn.execute(text("""
+                SELECT id, product_id, entity_id, customer_id, effective_from
+                FROM safety_stock_levels
+                WHERE id > :max_id AND created_by = :created_by AND delete_flag = 0
+                """), {'max_id': max_id_before, 'created_by': created_by}).fetchall()
+                level_ids = {
+                    _rule_key(r.product_id, r.entity_id, r.customer_id, r.effective_from): r.id
+                    for r in new_levels
+                }
+                
+                params_list = []
+                for row in param_rows:
+                    level = row['level']
+                    data = row['data']
+                    level_id = level_ids.get(_rule_key(
+                        level['product_id'], level['entity_id'], level['customer_id'], level['effective_from']
+                    ))
+                    if level_id is None:
+                        logger.warning(f"Row {row['row_num']}: created level not found, parameters skipped")
+                        continue
+                    params_list.append({
+                        'safety_stock_level_id': level_id,
+                        'calculation_method': data.get('calculation_method', 'FIXED'),
+                        'lead_time_days': data.get('lead_time_days'),
+                        'safety_days': data.get('safety_days'),
+                        'demand_std_deviation': data.get('demand_std_deviation'),
+                        'avg_daily_demand': data.get('avg_daily_demand'),
+                        'service_level_percent': data.get('service_level_percent'),
+                        'formula_used': data.get('formula_used')
+                    })
+                
+                insert_params = text(_INSERT_PARAMETERS_QUERY)
+                for start in range(0, len(params_list), BULK_INSERT_CHUNK_SIZE):
+                    conn.execute(insert_params, params_list[start:start + BULK_INSERT_CHUNK_SIZE])
+            
+            results['created'] = len(created_rows)
         
         if results['created'] > 0:
             # Log the action
@@ -568,6 +646,133 @@ def bulk_create_safety_stock(
             
     except Exception as e:
         logger.error(f"Error in bulk create by {created_by}: {e}")
+        results['created'] = 0
+        return False, str(e), results
+
+
+def bulk_apply_recalculation(
+    plan_rows: List[Dict],
+    updated_by: str
+) -> Tuple[bool, str, Dict]:
+    """
+    Write accepted recalculation results back in one transaction
+    
+    Per row: new safety_stock_qty / reorder_point on safety_stock_levels,
+    refreshed demand/lead-time inputs + last_calculated_date on
+    safety_stock_parameters (inserted for rules that had none), and a
+    PERIODIC review record documenting old → new quantity.
+    
+    Args:
+        plan_rows: Rows from recalculation.build_recalculation_plan
+        updated_by: Username applying the changes
+    
+    Returns:
+        Tuple of (success: bool, message: str, results: dict)
+    """
+    results = {'updated': 0, 'reviewed': 0}
+    
+    if not plan_rows:
+        return False, "No rows to apply", results
+    
+    level_params = []
+    param_updates = []
+    param_inserts = []
+    review_params = []
+    today = datetime.now().date()
+    
+    for row in plan_rows:
+        old_qty = row['current_ss']
+        new_qty = row['proposed_ss']
+        
+        level_params.append({
+            'id': row['id'],
+            'safety_stock_qty': new_qty,
+            'reorder_point': row['proposed_rop'],
+            'updated_by': updated_by
+        })
+        
+        param_data = {
+            'safety_stock_level_id': row['id'],
+            'calculation_method': row['calculation_method'],
+            'lead_time_days': row['lead_time_days'],
+            'safety_days': row.get('safety_days'),
+            'demand_std_deviation': row['demand_std_dev'],
+            'avg_daily_demand': row['avg_daily_demand'],
+            'service_level_percent': row.get('service_level_percent'),
+            'formula_used': row['formula_used']
+        }
+        (param_updates if row['has_parameters'] else param_inserts).append(param_data)
+        
+        if new_qty > old_qty:
+            action = 'INCREASED'
+        elif new_qty < old_qty:
+            action = 'DECREASED'
+        else:
+            action = 'NO_CHANGE'
+        
+        review_params.append({
+            'safety_stock_level_id': row['id'],
+            'review_date': today,
+            'review_type': 'PERIODIC',
+            'old_safety_stock_qty': old_qty,
+            'new_safety_stock_qty': new_qty,
+            'action_taken': action,
+            'action_reason': 'Bulk recalculation from delivery history',
+            'review_notes': row['formula_used'],
+            'reviewed_by': updated_by,
+            'approved_by': None
+        })
+    
+    try:
+        engine = get_db_engine()
+        
+        with engine.begin() as conn:
+            result = conn.execute(text("""
+            UPDATE safety_stock_levels 
+            SET safety_stock_qty = :safety_stock_qty,
+                reorder_point = :reorder_point,
+                updated_by = :updated_by,
+                updated_date = NOW()
+            WHERE id = :id AND delete_flag = 0
+            """), level_params)
+            results['updated'] = result.rowcount
+            
+            if param_updates:
+                conn.execute(text("""
+                UPDATE safety_stock_parameters 
+                SET lead_time_days = :lead_time_days,
+                    demand_std_deviation = :demand_std_deviation,
+                    avg_daily_demand = :avg_daily_demand,
+                    formula_used = :formula_used,
+                    last_calculated_date = NOW()
+                WHERE safety_stock_level_id = :safety_stock_level_id
+                """), param_updates)
+            
+            if param_inserts:
+                conn.execute(text(_INSERT_PARAMETERS_QUERY), param_inserts)
+            
+            conn.execute(text("""
+            INSERT INTO safety_stock_reviews (
+                safety_stock_level_id, review_date, review_type,
+                old_safety_stock_qty, new_safety_stock_qty,
+                action_taken, action_reason, review_notes,
+                reviewed_by, approved_by
+            ) VALUES (
+                :safety_stock_level_id, :review_date, :review_type,
+                :old_safety_stock_qty, :new_safety_stock_qty,
+                :action_taken, :action_reason, :review_notes,
+                :reviewed_by, :approved_by
+            )
+            """), review_params)
+            results['reviewed'] = len(review_params)
+        
+        log_action('BULK_RECALCULATE', f"Recalculated {len(plan_rows)} records")
+        logger.info(f"Bulk recalculation applied to {len(plan_rows)} safety stock records by {updated_by}")
+        
+        return True, f"Applied recalculation to {len(plan_rows)} records", results
+        
+    except Exception as e:
+        logger.error(f"Error applying bulk recalculation by {updated_by}: {e}")
         return False, str(e), results
 
 
@@ -3,6 +3,10 @@
 Demand Analysis Module for Safety Stock Management
 Fetches and analyzes historical demand from delivery_full_view
 Provides reference data for safety stock calculations
+
+Single-rule fetchers (fetch_demand_stats, get_lead_time_estimate) back the
+edit dialog; the bulk fetchers answer every rule of a recalculation run
+with one grouped query each.
 """
 
 import pandas as pd
@@ -250,6 +254,193 @@ def get_lead_time_estimate(
     }
 
 
+# ==================== BULK (set-based) ====================
+
+DEMAND_STAT_COLUMNS = [
+    'avg_daily_demand', 'demand_std_dev', 'max_daily_demand',
+    'min_daily_demand', 'data_points', 'cv_percent'
+]
+
+
+def _rule_keys(rules_df: pd.DataFrame) -> Dict:
+    """IN-list parameters covering every (product, entity) of the rules"""
+    return {
+        'product_ids': tuple(int(x) for x in rules_df['product_id'].dropna().unique()),
+        'entity_ids': tuple(int(x) for x in rules_df['entity_id'].dropna().unique()),
+    }
+
+
+def _daily_demand_stats(daily: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """Same aggregates as fetch_demand_stats (MySQL STDDEV = population std)"""
+    stats = daily.groupby(keys)['daily_quantity'].agg(
+        avg_daily_demand='mean',
+        demand_std_dev=lambda q: q.std(ddof=0),
+        max_daily_demand='max',
+        min_daily_demand='min',
+        data_points='count'
+    )
+    avg = stats['avg_daily_demand']
+    stats['cv_percent'] = (stats['demand_std_dev'] / avg.where(avg > 0) * 100).fillna(0)
+    return stats.reset_index()
+
+
+def fetch_bulk_demand_stats(
+    rules_df: pd.DataFrame,
+    days_back: int = 90,
+    exclude_pending: bool = True
+) -> pd.DataFrame:
+    """
+    Demand statistics for many safety stock rules in ONE query.
+    
+    Pulls daily demand per (product, entity, customer) for every product /
+    entity in rules_df, then aggregates in pandas exactly as fetch_demand_stats
+    does per rule: customer-specific rules see their customer's deliveries,
+    general rules (customer_id NULL) see all customers.
+    
+    Args:
+        rules_df: Rules with columns id, product_id, entity_id, customer_id
+        days_back: Number of days to analyze
+        exclude_pending: Exclude deliveries with PENDING status
+        
+    Returns:
+        One row per rule (rules_df order): id + DEMAND_STAT_COLUMNS +
+        'suggested_method' (rules without history get zeros / FIXED)
+    """
+    result = rules_df[['id']].copy()
+    for col in DEMAND_STAT_COLUMNS:
+        result[col] = 0.0
+    result['data_points'] = 0
+    result['suggested_method'] = 'FIXED'
+    
+    if rules_df.empty:
+        return result
+    
+    try:
+        engine = get_db_engine()
+        
+        conditions = [
+            "sodrd.product_id IN :product_ids",
+            "sod.seller_company_id IN :entity_ids",
+            "sodrd.delete_flag = 0",
+            "sod.delete_flag = 0",
+            "COALESCE(sod.adjust_etd_date, sod.etd_date) >= DATE_SUB(CURRENT_DATE(), INTERVAL :days_back DAY)",
+            "COALESCE(sod.adjust_etd_date, sod.etd_date) IS NOT NULL",
+            "sodrd.stock_out_request_quantity > 0"
+        ]
+        if exclude_pending:
+            conditions.append("sod.shipment_status != 'PENDING'")
+        
+        query = text(f"""
+        SELECT 
+            sodrd.product_id,
+            sod.seller_company_id                              AS entity_id,
+            sod.buyer_company_id                               AS customer_id,
+            DATE(COALESCE(sod.adjust_etd_date, sod.etd_date))  AS demand_date,
+            SUM(sodrd.stock_out_request_quantity)              AS daily_quantity
+        FROM stock_out_delivery_request_details sodrd
+        JOIN stock_out_delivery sod ON sodrd.delivery_id = sod.id
+        WHERE {" AND ".join(conditions)}
+        GROUP BY sodrd.product_id, sod.seller_company_id, sod.buyer_company_id,
+                 DATE(COALESCE(sod.adjust_etd_date, sod.etd_date))
+        """)
+        
+        params = {**_rule_keys(rules_df), 'days_back': days_back}
+        
+        with engine.connect() as conn:
+            daily = pd.read_sql(query, conn, params=params)
+    except Exception as e:
+        logger.error(f"Error fetching bulk demand stats: {e}")
+        return result
+    
+    if daily.empty:
+        return result
+    
+    daily['daily_quantity'] = daily['daily_quantity'].astype(float)
+    
+    # General rules: all customers summed per day
+    general_daily = daily.groupby(['product_id', 'entity_id', 'demand_date'], as_index=False)['daily_quantity'].sum()
+    general_stats = _daily_demand_stats(general_daily, ['product_id', 'entity_id'])
+    customer_stats = _daily_demand_stats(daily.dropna(subset=['customer_id']), ['product_id', 'entity_id', 'customer_id'])
+    
+    rules = rules_df[['id', 'product_id', 'entity_id', 'customer_id']]
+    is_general = rules['customer_id'].isna()
+    stats = pd.concat([
+        rules[is_general].merge(general_stats, on=['product_id', 'entity_id'], how='inner'),
+        rules[~is_general].merge(customer_stats, on=['product_id', 'entity_id', 'customer_id'], how='inner'),
+    ], ignore_index=True)
+    
+    # Round for display, as fetch_demand_stats does
+    result = rules[['id']].merge(stats[['id'] + DEMAND_STAT_COLUMNS], on='id', how='left').fillna(0)
+    result['avg_daily_demand'] = result['avg_daily_demand'].round(2)
+    result['demand_std_dev'] = result['demand_std_dev'].round(2)
+    result['cv_percent'] = result['cv_percent'].round(1)
+    result['data_points'] = result['data_points'].astype(int)
+    
+    result['suggested_method'] = [
+        suggest_calculation_method(cv, n)
+        for cv, n in zip(result['cv_percent'], result['data_points'])
+    ]
+    
+    logger.info(f"Bulk demand stats: {int((result['data_points'] > 0).sum())}/{len(result)} rules with history "
+                f"({len(daily)} daily rows, {days_back} days)")
+    return result
+
+
+def fetch_bulk_lead_time_estimates(rules_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Lead time estimates for every (product, entity) of rules_df in ONE query.
+    
+    Same basis as get_lead_time_estimate (OC date to date_delivered, customer
+    not considered).
+    
+    Returns:
+        DataFrame with product_id, entity_id, avg_lead_time_days,
+        min_lead_time_days, max_lead_time_days, sample_size
+    """
+    columns = ['product_id', 'entity_id', 'avg_lead_time_days',
+               'min_lead_time_days', 'max_lead_time_days', 'sample_size']
+    
+    if rules_df.empty:
+        return pd.DataFrame(columns=columns)
+    
+    try:
+        engine = get_db_engine()
+        
+        query = text("""
+        SELECT 
+            sodrd.product_id,
+            sod.seller_company_id                             AS entity_id,
+            AVG(DATEDIFF(sod.date_delivered, oc.oc_date))    AS avg_lead_time_days,
+            MIN(DATEDIFF(sod.date_delivered, oc.oc_date))    AS min_lead_time_days,
+            MAX(DATEDIFF(sod.date_delivered, oc.oc_date))    AS max_lead_time_days,
+            COUNT(DISTINCT sod.id)                            AS sample_size
+        FROM stock_out_delivery sod
+        JOIN stock_out_delivery_request_details sodrd
+            ON sodrd.delivery_id = sod.id AND sodrd.delete_flag = 0
+        JOIN order_confirmations oc
+            ON sodrd.order_confirmation_id = oc.id AND oc.delete_flag = 0
+        WHERE sod.seller_company_id  IN :entity_ids
+            AND sodrd.product_id     IN :product_ids
+            AND sod.shipment_status  = 'DELIVERED'
+            AND sod.date_delivered   IS NOT NULL
+            AND oc.oc_date           IS NOT NULL
+            AND sod.delete_flag      = 0
+            AND DATEDIFF(sod.date_delivered, oc.oc_date) > 0
+            AND DATEDIFF(sod.date_delivered, oc.oc_date) < 365
+        GROUP BY sodrd.product_id, sod.seller_company_id
+        """)
+        
+        with engine.connect() as conn:
+            df = pd.read_sql(query, conn, params=_rule_keys(rules_df))
+    except Exception as e:
+        logger.error(f"Error estimating bulk lead times: {e}")
+        return pd.DataFrame(columns=columns)
+    
+    df['avg_lead_time_days'] = df['avg_lead_time_days'].astype(float).round(0)
+    df['sample_size'] = df['sample_size'].fillna(0).astype(int)
+    return df[columns]
+
+
 def format_demand_summary(stats: Dict) -> str:
     """
     Format demand statistics for display (simplified version)
@@ -0,0 +1,222 @@
+# utils/safety_stock/recalculation.py
+"""
+Fleet-wide Safety Stock Recalculation
+Recomputes safety stock / reorder point for many rules at once:
+  1. one grouped query for delivery demand of every rule (demand_analysis.fetch_bulk_demand_stats)
+  2. one grouped query for OC→delivery lead times (demand_analysis.fetch_bulk_lead_time_estimates)
+  3. each rule's own method via calculate_safety_stock (FIXED / DAYS_OF_SUPPLY / LEAD_TIME_BASED)
+The result is a review diff (current vs proposed); accepted rows are written
+back with crud.bulk_apply_recalculation.
+
+Usage:
+    from utils.safety_stock.recalculation import build_recalculation_plan, select_stale_rules
+
+    rules = select_stale_rules(get_safety_stock_levels(entity_id=eid, status='active'))
+    plan = build_recalculation_plan(rules, days_back=180)
+"""
+
+import pandas as pd
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .calculations import calculate_safety_stock
+from .demand_analysis import fetch_bulk_demand_stats, fetch_bulk_lead_time_estimates
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER_DAYS = 60
+DEFAULT_LEAD_TIME_DAYS = 7
+
+# Plan statuses — only CHANGED / UNCHANGED rows can be applied
+STATUS_CHANGED = 'CHANGED'
+STATUS_UNCHANGED = 'UNCHANGED'
+STATUS_NO_DATA = 'NO_DATA'
+STATUS_MISSING_PARAMS = 'MISSING_PARAMS'
+STATUS_ERROR = 'ERROR'
+APPLICABLE_STATUSES = (STATUS_CHANGED, STATUS_UNCHANGED)
+
+PLAN_COLUMNS = [
+    'id', 'pt_code', 'product_name', 'entity_code', 'customer_code',
+    'calculation_method', 'suggested_method',
+    'data_points', 'avg_daily_demand', 'demand_std_dev', 'cv_percent',
+    'lead_time_days', 'lead_time_source',
+    'current_ss', 'proposed_ss', 'ss_change', 'ss_change_pct',
+    'current_rop', 'proposed_rop',
+    'formula_used', 'has_parameters', 'last_calculated_date',
+    'status', 'note'
+]
+
+
+def select_stale_rules(rules_df: pd.DataFrame, days: int = STALE_AFTER_DAYS) -> pd.DataFrame:
+    """Rules never calculated or last calculated more than `days` ago"""
+    if rules_df.empty or 'last_calculated_date' not in rules_df.columns:
+        return rules_df
+
+    last_calc = pd.to_datetime(rules_df['last_calculated_date'], errors='coerce')
+    cutoff = pd.Timestamp.now() - pd.Timedelta(days=days)
+    return rules_df[last_calc.isna() | (last_calc < cutoff)]
+
+
+def _optional(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+def _resolve_lead_time(rule, estimate, use_estimated: bool) -> Tuple[int, str]:
+    """History estimate if available (as the edit dialog does), else the rule's own value"""
+    if use_estimated and estimate is not None and estimate['sample_size'] > 0:
+        return int(estimate['avg_lead_time_days']), 'history'
+
+    rule_lt = _optional(rule.get('lead_time_days'))
+    if rule_lt:
+        return int(rule_lt), 'rule'
+    return DEFAULT_LEAD_TIME_DAYS, 'default'
+
+
+def _method_params(method: str, rule, demand, lead_time_days: int) -> Optional[Dict]:
+    """calculate_safety_stock kwargs for the rule's method, None if a required input is missing"""
+    avg = float(demand['avg_daily_demand'])
+
+    if method == 'DAYS_OF_SUPPLY':
+        safety_days = _optional(rule.get('safety_days'))
+        if safety_days is None:
+            return None
+        return {'safety_days': int(safety_days), 'avg_daily_demand': avg, 'lead_time_days': lead_time_days}
+
+    if method == 'LEAD_TIME_BASED':
+        service_level = _optional(rule.get('service_level_percent'))
+        if service_level is None:
+            return None
+        return {
+            'lead_time_days': lead_time_days,
+            'service_level_percent': service_level,
+            'demand_std_deviation': float(demand['demand_std_dev']),
+            'avg_daily_demand': avg
+        }
+
+    # FIXED: quantity stays manual; reorder point is only derived when missing
+    return {
+        'safety_stock_qty': _optional(rule.get('safety_stock_qty')) or 0,
+        'reorder_point': _optional(rule.get('reorder_point')),
+        'avg_daily_demand': avg,
+        'lead_time_days': lead_time_days
+    }
+
+
+def build_recalculation_plan(
+    rules_df: pd.DataFrame,
+    days_back: int = 90,
+    exclude_pending: bool = True,
+    use_estimated_lead_time: bool = True
+) -> pd.DataFrame:
+    """
+    Propose new safety stock / reorder point for every rule in rules_df
+
+    Args:
+        rules_df: Rules as returned by crud.get_safety_stock_levels
+        days_back: Demand history window
+        exclude_pending: Exclude PENDING deliveries from demand
+        use_estimated_lead_time: Replace the rule's lead time with the
+            historical OC→delivery estimate when one exists
+
+    Returns:
+        Review diff with PLAN_COLUMNS, one row per rule. Calculated methods
+        without demand history are NO_DATA and keep their current values.
+    """
+    if rules_df.empty:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    demand_df = fetch_bulk_demand_stats(rules_df, days_back=days_back, exclude_pending=exclude_pending)
+    demand_by_id = demand_df.set_index('id')
+
+    lead_times = fetch_bulk_lead_time_estimates(rules_df) if use_estimated_lead_time else pd.DataFrame()
+    lead_time_by_key = {
+        (row['product_id'], row['entity_id']): row
+        for row in lead_times.to_dict('records')
+    }
+
+    plan_rows = []
+
+    for rule in rules_df.to_dict('records'):
+        method = rule.get('calculation_method')
+        method = method if isinstance(method, str) and method else 'FIXED'
+        demand = demand_by_id.loc[rule['id']]
+        lead_time_days, lead_time_source = _resolve_lead_time(
+            rule, lead_time_by_key.get((rule['product_id'], rule['entity_id'])), use_estimated_lead_time
+        )
+
+        current_ss = _optional(rule.get('safety_stock_qty')) or 0.0
+        current_rop = _optional(rule.get('reorder_point'))
+
+        row = {
+            'id': rule['id'],
+            'pt_code': rule.get('pt_code'),
+            'product_name': rule.get('product_name'),
+            'entity_code': rule.get('entity_code'),
+            'customer_code': rule.get('customer_code'),
+            'calculation_method': method,
+            'suggested_method': demand['suggested_method'],
+            'data_points': int(demand['data_points']),
+            'avg_daily_demand': demand['avg_daily_demand'],
+            'demand_std_dev': demand['demand_std_dev'],
+            'cv_percent': demand['cv_percent'],
+            'lead_time_days': lead_time_days,
+            'lead_time_source': lead_time_source,
+            'current_ss': current_ss,
+            'proposed_ss': current_ss,
+            'current_rop': current_rop,
+            'proposed_rop': current_rop,
+            'formula_used': None,
+            'has_parameters': isinstance(rule.get('calculation_method'), str),
+            'last_calculated_date': rule.get('last_calculated_date'),
+            'status': STATUS_UNCHANGED,
+            'note': ''
+        }
+
+        if method != 'FIXED' and row['data_points'] == 0:
+            row['status'] = STATUS_NO_DATA
+            row['note'] = f'No deliveries in the last {days_back} days'
+            plan_rows.append(row)
+            continue
+
+        params = _method_params(method, rule, demand, lead_time_days)
+        if params is None:
+            row['status'] = STATUS_MISSING_PARAMS
+            row['note'] = 'Safety days missing' if method == 'DAYS_OF_SUPPLY' else 'Service level missing'
+            plan_rows.append(row)
+            continue
+
+        result = calculate_safety_stock(method, **params)
+        if 'error' in result:
+            row['status'] = STATUS_ERROR
+            row['note'] = result['error']
+            plan_rows.append(row)
+            continue
+
+        row['proposed_ss'] = round(float(result['safety_stock_qty']), 2)
+        row['proposed_rop'] = round(float(result['reorder_point']), 2) if result.get('reorder_point') is not None else None
+        row['formula_used'] = result.get('formula_used')
+
+        ss_changed = abs(row['proposed_ss'] - current_ss) >= 0.01
+        rop_changed = (row['proposed_rop'] is None) != (current_rop is None) or (
+            current_rop is not None and abs(row['proposed_rop'] - current_rop) >= 0.01
+        )
+        if ss_changed or rop_changed:
+            row['status'] = STATUS_CHANGED
+
+        plan_rows.append(row)
+
+    plan_df = pd.DataFrame(plan_rows, columns=PLAN_COLUMNS)
+    plan_df['ss_change'] = plan_df['proposed_ss'] - plan_df['current_ss']
+    plan_df['ss_change_pct'] = (
+        plan_df['ss_change'] / plan_df['current_ss'].where(plan_df['current_ss'] > 0) * 100
+    ).round(1)
+
+    logger.info(f"Recalculation plan: {len(plan_df)} rules — "
+                f"{plan_df['status'].value_counts().to_dict()}")
+    return plan_df
+
+
+def applicable_rows(plan_df: pd.DataFrame) -> List[Dict]:
+    """Plan rows that can be written back, as DB-ready dicts (NaN → None, Python scalars)"""
+    rows = plan_df[plan_df['status'].isin(APPLICABLE_STATUSES)].astype(object)
+    return rows.where(rows.notna(), None).to_dict('records')
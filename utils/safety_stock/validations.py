@@ -2,8 +2,10 @@
 """
 Validation functions for Safety Stock Management
 Version 3.0 - Updated for merged calculation/stock levels with reorder point validation
+Version 3.1 - Vectorized bulk validation (validate_bulk_frame) with a full per-row error report
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, date
@@ -275,6 +277,265 @@ def check_for_duplicates(data: Dict, exclude_id: Optional[int] = None) -> List[s
     return errors
 
 
+# ==================== BULK (vectorized) ====================
+
+BULK_REQUIRED_COLUMNS = ['product_id', 'entity_id', 'safety_stock_qty', 'effective_from']
+BULK_NUMERIC_COLUMNS = [
+    'product_id', 'entity_id', 'customer_id',
+    'safety_stock_qty', 'reorder_point',
+    'lead_time_days', 'safety_days', 'service_level_percent',
+    'demand_std_deviation', 'avg_daily_demand', 'priority_level'
+]
+BULK_DATE_COLUMNS = ['effective_from', 'effective_to']
+BULK_TEXT_COLUMNS = ['calculation_method', 'business_notes']
+MIN_EFFECTIVE_DATE = date(2020, 1, 1)
+
+
+def _blank(series: pd.Series) -> pd.Series:
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def _normalize_bulk_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Tuple[pd.Series, object]]]:
+    """Coerce upload columns to typed values; returns (frame, format errors)"""
+    norm = pd.DataFrame(index=df.index)
+    format_errors = []
+    
+    for col in BULK_NUMERIC_COLUMNS:
+        raw = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        norm[col] = pd.to_numeric(raw.where(~_blank(raw)), errors='coerce')
+        format_errors.append((~_blank(raw) & norm[col].isna(), f"Invalid number in {col}"))
+    
+    for col in BULK_DATE_COLUMNS:
+        raw = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        norm[col] = pd.to_datetime(raw.where(~_blank(raw)), errors='coerce', format='%Y-%m-%d').dt.normalize()
+        format_errors.append((~_blank(raw) & norm[col].isna(), f"Invalid {col} date format (use YYYY-MM-DD)"))
+    
+    for col in BULK_TEXT_COLUMNS:
+        raw = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        norm[col] = raw.where(~_blank(raw)).astype(object).map(lambda v: v if pd.isna(v) else str(v).strip())
+    norm['calculation_method'] = norm['calculation_method'].map(lambda v: v if pd.isna(v) else v.upper())
+    
+    norm['row_num'] = np.arange(len(df)) + 2  # +1 for 0-index, +1 for header row
+    return norm, format_errors
+
+
+def _fetch_existing_ids(table: str, ids: pd.Series) -> Optional[set]:
+    """IDs from `ids` that exist (not deleted) in table; None if the lookup failed"""
+    id_tuple = tuple(int(x) for x in ids.dropna().unique())
+    if not id_tuple:
+        return set()
+    try:
+        engine = get_db_engine()
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(f"SELECT id FROM {table} WHERE id IN :ids AND delete_flag = 0"),
+                {'ids': id_tuple}
+            ).fetchall()
+        return {row.id for row in rows}
+    except Exception as e:
+        logger.error(f"Error checking {table} IDs: {e}")
+        return None
+
+
+def _existing_rule_conflicts(norm: pd.DataFrame, candidates: pd.Series) -> pd.Series:
+    """
+    Per-row duplicate / overlap message against active rules in the DB
+    (same semantics as check_for_duplicates, one query for the whole file)
+    """
+    messages = pd.Series('', index=norm.index)
+    rows = norm[candidates]
+    if rows.empty:
+        return messages
+    
+    try:
+        engine = get_db_engine()
+        query = text("""
+        SELECT id, product_id, entity_id, customer_id, effective_from, effective_to
+        FROM safety_stock_levels
+        WHERE product_id IN :product_ids
+        AND entity_id IN :entity_ids
+        AND delete_flag = 0
+        AND is_active = 1
+        """)
+        params = {
+            'product_ids': tuple(int(x) for x in rows['product_id'].unique()),
+            'entity_ids': tuple(int(x) for x in rows['entity_id'].unique()),
+        }
+        with engine.connect() as conn:
+            existing = pd.read_sql(query, conn, params=params)
+    except Exception as e:
+        logger.error(f"Error checking existing rules: {e}")
+        # Don't block on validation error, just log it
+        return messages
+    
+    if existing.empty:
+        return messages
+    
+    existing['effective_from'] = pd.to_datetime(existing['effective_from'])
+    existing['effective_to'] = pd.to_datetime(existing['effective_to'])
+    existing['_customer_key'] = existing['customer_id'].fillna(-1).astype('int64')
+    
+    new = rows[['product_id', 'entity_id', 'customer_id', 'effective_from', 'effective_to']].copy()
+    new['_customer_key'] = new['customer_id'].fillna(-1).astype('int64')
+    new['_row'] = new.index
+    
+    pairs = new.merge(existing, on=['product_id', 'entity_id', '_customer_key'], suffixes=('', '_ex'))
+    if pairs.empty:
+        return messages
+    
+    ex_to_open_or_after = pairs['effective_to_ex'].isna() | (pairs['effective_to_ex'] >= pairs['effective_from'])
+    overlaps = np.where(
+        pairs['effective_to'].isna(),
+        ex_to_open_or_after,
+        (pairs['effective_from_ex'] <= pairs['effective_to']) & ex_to_open_or_after
+    )
+    exact = pairs['effective_from_ex'] == pairs['effective_from']
+    
+    exact_rows = set(pairs.loc[exact, '_row'])
+    for row_idx in exact_rows:
+        messages.at[row_idx] = "A safety stock rule already exists for this product/entity/customer/date combination"
+    
+    overlap_pairs = pairs[overlaps & ~pairs['_row'].isin(exact_rows)].sort_values(['_row', 'id'])
+    for row_idx, group in overlap_pairs.groupby('_row').head(3).groupby('_row'):
+        overlap_info = [
+            f"ID {r.id} ({r.effective_from_ex.date()} to {r.effective_to_ex.date() if pd.notna(r.effective_to_ex) else 'ongoing'})"
+            for r in group.itertuples()
+        ]
+        messages.at[row_idx] = f"Date range overlaps with existing rules: {'; '.join(overlap_info)}"
+    
+    return messages
+
+
+def validate_bulk_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate a whole bulk upload at once
+    
+    Applies the validate_safety_stock_data rules column-wise, plus product /
+    entity / customer existence, duplicates within the file and overlaps with
+    existing active rules — with a fixed number of queries regardless of
+    file size.
+    
+    Args:
+        df: Uploaded DataFrame (template columns)
+    
+    Returns:
+        Tuple of (valid_df, error_report):
+        - valid_df: typed rows that passed, with row_num (Excel row)
+        - error_report: one row per failing upload row with row_num,
+          product_id, entity_id, customer_id, effective_from, errors
+    """
+    report_columns = ['row_num', 'product_id', 'entity_id', 'customer_id', 'effective_from', 'errors']
+    
+    missing_columns = [col for col in BULK_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        report = pd.DataFrame([{
+            'row_num': None, 'errors': f"Missing required columns: {', '.join(missing_columns)}"
+        }], columns=report_columns)
+        return df.iloc[0:0], report
+    
+    norm, checks = _normalize_bulk_frame(df)
+    
+    ss = norm['safety_stock_qty']
+    rop = norm['reorder_point']
+    lead_time = norm['lead_time_days']
+    avg_demand = norm['avg_daily_demand']
+    method = norm['calculation_method']
+    eff_from = norm['effective_from']
+    eff_to = norm['effective_to']
+    priority = norm['priority_level']
+    is_dos = method == 'DAYS_OF_SUPPLY'
+    is_ltb = method == 'LEAD_TIME_BASED'
+    
+    # 1. Required fields
+    for field in BULK_REQUIRED_COLUMNS:
+        checks.append((norm[field].isna() & _blank(df[field]), f"Missing required field: {field}"))
+    
+    # 2-3. Quantities and reorder point
+    checks += [
+        (ss < 0, "Safety stock quantity cannot be negative"),
+        (ss > 999999, "Safety stock quantity is unreasonably large (max: 999,999)"),
+        (rop < 0, "Reorder point cannot be negative"),
+    ]
+    
+    # 4. Dates
+    checks += [
+        (eff_from < pd.Timestamp(MIN_EFFECTIVE_DATE), f"Effective from date cannot be before {MIN_EFFECTIVE_DATE}"),
+        (eff_to <= eff_from, "Effective to date must be after effective from date"),
+    ]
+    
+    # 5. Priority
+    checks += [
+        (priority < 1, "Priority level must be at least 1"),
+        (priority > 9999, "Priority level cannot exceed 9999"),
+        (norm['customer_id'].notna() & (priority > 500),
+         "Customer-specific rules should have priority level 500 or lower"),
+    ]
+    
+    # 6. Calculation method parameters
+    checks += [
+        (method.notna() & ~method.isin(['FIXED', 'DAYS_OF_SUPPLY', 'LEAD_TIME_BASED']),
+         "Invalid calculation method: " + method.fillna('')),
+        (is_dos & (norm['safety_days'] <= 0), "Safety days must be positive for DAYS_OF_SUPPLY method"),
+        (is_dos & (norm['safety_days'] > 365), "Safety days seems too high (>365 days)"),
+        (is_dos & (avg_demand < 0), "Average daily demand cannot be negative"),
+        (is_dos & (avg_demand > 999999), "Average daily demand seems unreasonably high"),
+        (is_dos & (lead_time <= 0), "Lead time must be positive"),
+        (is_dos & (lead_time > 365), "Lead time seems too long (>365 days)"),
+        (is_ltb & (lead_time <= 0), "Lead time must be positive for LEAD_TIME_BASED method"),
+        (is_ltb & (lead_time > 365), "Lead time seems too long (>365 days)"),
+        (is_ltb & ((norm['service_level_percent'] < 50) | (norm['service_level_percent'] > 99.9)),
+         "Service level must be between 50% and 99.9%"),
+        (is_ltb & (norm['demand_std_deviation'] < 0), "Demand standard deviation cannot be negative"),
+        (is_ltb & (norm['demand_std_deviation'] > 99999), "Demand standard deviation seems unreasonably high"),
+        (is_ltb & (avg_demand < 0), "Average daily demand cannot be negative"),
+    ]
+    
+    # 7. Referenced master data exists
+    for col, table, label in [('product_id', 'products', 'Product'),
+                              ('entity_id', 'companies', 'Entity'),
+                              ('customer_id', 'companies', 'Customer')]:
+        existing_ids = _fetch_existing_ids(table, norm[col])
+        if existing_ids is not None:
+            unknown = norm[col].notna() & ~norm[col].isin(existing_ids)
+            id_text = norm[col].map(lambda v: '' if pd.isna(v) else f"{v:g}")
+            checks.append((unknown, f"{label} ID " + id_text + " not found"))
+    
+    # 8. Duplicates within the file
+    dup_keys = ['product_id', 'entity_id', 'customer_id', 'effective_from']
+    checks.append((norm.duplicated(subset=dup_keys, keep=False) & norm['product_id'].notna(),
+                   "Duplicate product/entity/customer/date row within the file"))
+    
+    # Collect per-row messages so far, then check DB overlaps only for otherwise-valid rows
+    def _collect(check_list) -> pd.Series:
+        parts = []
+        for mask, message in check_list:
+            mask = pd.Series(mask, index=norm.index).fillna(False).astype(bool)
+            if mask.any():
+                text_part = message if isinstance(message, pd.Series) else pd.Series(message, index=norm.index)
+                parts.append(text_part.where(mask, ''))
+        if not parts:
+            return pd.Series('', index=norm.index)
+        return pd.Series(['; '.join(m for m in row if m) for row in zip(*parts)], index=norm.index)
+    
+    row_errors = _collect(checks)
+    conflicts = _existing_rule_conflicts(norm, row_errors == '')
+    row_errors = _collect([(row_errors != '', row_errors), (conflicts != '', conflicts)])
+    
+    failed = row_errors != ''
+    report = norm.loc[failed, report_columns[:-1]].copy()
+    report['effective_from'] = report['effective_from'].dt.date
+    report['errors'] = row_errors[failed]
+    
+    valid_df = norm[~failed].copy()
+    for col in BULK_DATE_COLUMNS:
+        valid_df[col] = valid_df[col].dt.date
+    for col in ['product_id', 'entity_id', 'customer_id']:
+        valid_df[col] = valid_df[col].astype('Int64')
+    
+    logger.info(f"Bulk validation: {len(valid_df)} valid, {int(failed.sum())} invalid of {len(norm)} rows")
+    return valid_df, report.reset_index(drop=True)
+
+
 def validate_bulk_data(df: pd.DataFrame) -> Tuple[bool, pd.DataFrame, List[str]]:
     """
     Validate bulk upload data
@@ -285,56 +546,21 @@ def validate_bulk_data(df: pd.DataFrame) -> Tuple[bool, pd.DataFrame, List[str]]
     Returns:
         Tuple of (is_valid, cleaned_dataframe, error_list)
     """
-    errors = []
-    validated_df = df.copy()
-    
-    # Check required columns
-    required_columns = ['product_id', 'entity_id', 'safety_stock_qty', 'effective_from']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    validated_df, report = validate_bulk_frame(df)
     
-    if missing_columns:
-        errors.append(f"Missing required columns: {', '.join(missing_columns)}")
-        return False, df, errors
-    
-    # Clean and validate each row
-    row_errors = []
-    rows_to_drop = []
+    if report.empty:
+        return True, validated_df, []
     
-    for idx, row in validated_df.iterrows():
-        row_dict = row.to_dict()
-        
-        # Remove NaN values
-        row_dict = {k: v for k, v in row_dict.items() if pd.notna(v)}
-        
-        # Validate row
-        is_valid, row_error_list = validate_safety_stock_data(row_dict, mode='create')
-        
-        if not is_valid:
-            row_num = idx + 2  # +1 for 0-index, +1 for header row
-            row_errors.append(f"Row {row_num}: {'; '.join(row_error_list)}")
-            rows_to_drop.append(idx)
-    
-    # Add row errors to main error list
-    if row_errors:
-        errors.extend(row_errors[:20])  # Limit to first 20 errors
-        if len(row_errors) > 20:
-            errors.append(f"... and {len(row_errors) - 20} more errors")
-    
-    # Check for duplicates within the file
-    if 'product_id' in df.columns and 'entity_id' in df.columns:
-        dup_columns = ['product_id', 'entity_id', 'customer_id', 'effective_from']
-        dup_columns = [col for col in dup_columns if col in df.columns]
-        
-        duplicates = validated_df[validated_df.duplicated(subset=dup_columns, keep=False)]
-        if not duplicates.empty:
-            errors.append(f"Found {len(duplicates)} duplicate rows within the file")
+    if report['row_num'].isna().all():
+        return False, df, report['errors'].tolist()
     
-    # Drop invalid rows if requested
-    if rows_to_drop:
-        validated_df = validated_df.drop(rows_to_drop)
-        errors.append(f"Removed {len(rows_to_drop)} invalid rows")
+    row_errors = [f"Row {int(r.row_num)}: {r.errors}" for r in report.itertuples()]
+    errors = row_errors[:20]  # Limit to first 20 errors
+    if len(row_errors) > 20:
+        errors.append(f"... and {len(row_errors) - 20} more errors")
+    errors.append(f"Removed {len(row_errors)} invalid rows")
     
-    return len(errors) == 0, validated_df, errors
+    return False, validated_df, errors
 
 
 def get_validation_summary(errors: List[str]) -> str:
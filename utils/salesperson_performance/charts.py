@@ -12,6 +12,14 @@ All visualization components using Altair:
 - Pipeline & Forecast section with tabs
 
 CHANGELOG:
+- v1.6.0: Chart payload trimming (utils.chart_payload)
+          - Top customers/brands Pareto: top-N + "Others" bar (max_bars),
+            explicit x order, only encoded columns serialized
+          - Multi-year backlog timeline: only encoded columns serialized
+          - Builders register payload bytes via record_payload()
+- v1.5.0: Multi-year monthly/cumulative charts and summary table accept a
+          pre-aggregated monthly_by_year frame (utils.monthly_cube) so the
+          YoY section no longer re-groups invoice lines per metric tab
 - v1.4.0: FIXED charts not visible when invoiced=0 and forecast << target
           - build_forecast_waterfall_chart(): Added value labels on bars, 
             achievement % text, ensures visibility even when values are small
@@ -52,6 +60,7 @@ import altair as alt
 import streamlit as st
 
 from .constants import COLORS, MONTH_ORDER, CHART_WIDTH, CHART_HEIGHT
+from utils.chart_payload import DEFAULT_TOP_N, top_n_with_others, slim, record_payload
 
 logger = logging.getLogger(__name__)
 
@@ -1258,7 +1267,8 @@ class SalespersonCharts:
     def build_top_customers_chart(
         top_df: pd.DataFrame,
         metric: str = 'gross_profit',
-        title: str = ""
+        title: str = "",
+        max_bars: int = DEFAULT_TOP_N
     ) -> alt.Chart:
         """
         Build Pareto chart (bar + cumulative line) for top customers.
@@ -1300,15 +1310,18 @@ class SalespersonCharts:
         if metric not in df.columns:
             return SalespersonCharts._empty_chart(f"No {metric} data available")
         
+        df, x_order = SalespersonCharts._pareto_payload(df, 'customer', metric, max_bars)
+        
         # Bar chart
         bars = alt.Chart(df).mark_bar().encode(
-            x=alt.X('customer:N', sort='-y', title='Customer'),
+            x=alt.X('customer:N', sort=x_order, title='Customer'),
             y=alt.Y(f'{metric}:Q', title=f'{metric_label} (USD)', axis=alt.Axis(format='~s')),
             color=alt.value(bar_color),
             tooltip=[
                 alt.Tooltip('customer:N', title='Customer'),
                 alt.Tooltip(f'{metric}:Q', title=metric_label, format=',.0f'),
-                alt.Tooltip('percent_contribution:Q', title='% of Total', format='.2f')
+                alt.Tooltip('percent_contribution:Q', title='% of Total', format='.2f'),
+                alt.Tooltip('item_count:Q', title='Customers in bar')
             ]
         )
         
@@ -1316,7 +1329,7 @@ class SalespersonCharts:
         bar_text = alt.Chart(df).mark_text(
             align='center', baseline='bottom', dy=-5, fontSize=10
         ).encode(
-            x=alt.X('customer:N', sort='-y'),
+            x=alt.X('customer:N', sort=x_order),
             y=alt.Y(f'{metric}:Q'),
             text=alt.Text(f'{metric}:Q', format=',.0f'),
             color=alt.value(COLORS['text_dark'])
@@ -1328,7 +1341,7 @@ class SalespersonCharts:
             color=COLORS['gross_profit_percent'],
             strokeWidth=2
         ).encode(
-            x=alt.X('customer:N', sort='-y'),
+            x=alt.X('customer:N', sort=x_order),
             y=alt.Y('cumulative_percent:Q', title='Cumulative %', axis=alt.Axis(format='.0%')),
             tooltip=[
                 alt.Tooltip('customer:N', title='Customer'),
@@ -1341,7 +1354,7 @@ class SalespersonCharts:
             align='center', baseline='bottom', dy=-8, fontSize=10,
             color=COLORS['gross_profit_percent']
         ).encode(
-            x=alt.X('customer:N', sort='-y'),
+            x=alt.X('customer:N', sort=x_order),
             y=alt.Y('cumulative_percent:Q'),
             text=alt.Text('cumulative_percent:Q', format='.1%')
         )
@@ -1355,13 +1368,14 @@ class SalespersonCharts:
             title=title
         )
         
-        return chart
+        return record_payload(f'salesperson.top_customers.{metric}', chart)
     
     @staticmethod
     def build_top_brands_chart(
         top_df: pd.DataFrame,
         metric: str = 'gross_profit',
-        title: str = ""
+        title: str = "",
+        max_bars: int = DEFAULT_TOP_N
     ) -> alt.Chart:
         """
         Build Pareto chart for top brands.
@@ -1400,22 +1414,25 @@ class SalespersonCharts:
         if metric not in df.columns:
             return SalespersonCharts._empty_chart(f"No {metric} data available")
         
+        df, x_order = SalespersonCharts._pareto_payload(df, 'brand', metric, max_bars)
+        
         # Bar chart
         bars = alt.Chart(df).mark_bar().encode(
-            x=alt.X('brand:N', sort='-y', title='Brand'),
+            x=alt.X('brand:N', sort=x_order, title='Brand'),
             y=alt.Y(f'{metric}:Q', title=f'{metric_label} (USD)', axis=alt.Axis(format='~s')),
             color=alt.value(bar_color),
             tooltip=[
                 alt.Tooltip('brand:N', title='Brand'),
                 alt.Tooltip(f'{metric}:Q', title=metric_label, format=',.0f'),
-                alt.Tooltip('percent_contribution:Q', title='% of Total', format='.2f')
+                alt.Tooltip('percent_contribution:Q', title='% of Total', format='.2f'),
+                alt.Tooltip('item_count:Q', title='Brands in bar')
             ]
         )
         
         bar_text = alt.Chart(df).mark_text(
             align='center', baseline='bottom', dy=-5, fontSize=10
         ).encode(
-            x=alt.X('brand:N', sort='-y'),
+            x=alt.X('brand:N', sort=x_order),
             y=alt.Y(f'{metric}:Q'),
             text=alt.Text(f'{metric}:Q', format=',.0f'),
             color=alt.value(COLORS['text_dark'])
@@ -1427,7 +1444,7 @@ class SalespersonCharts:
             color=COLORS['gross_profit_percent'],
             strokeWidth=2
         ).encode(
-            x=alt.X('brand:N', sort='-y'),
+            x=alt.X('brand:N', sort=x_order),
             y=alt.Y('cumulative_percent:Q', title='Cumulative %', axis=alt.Axis(format='.0%')),
             tooltip=[
                 alt.Tooltip('brand:N', title='Brand'),
@@ -1439,7 +1456,7 @@ class SalespersonCharts:
             align='center', baseline='bottom', dy=-8, fontSize=10,
             color=COLORS['gross_profit_percent']
         ).encode(
-            x=alt.X('brand:N', sort='-y'),
+            x=alt.X('brand:N', sort=x_order),
             y=alt.Y('cumulative_percent:Q'),
             text=alt.Text('cumulative_percent:Q', format='.1%')
         )
@@ -1452,12 +1469,37 @@ class SalespersonCharts:
             title=title
         )
         
-        return chart
+        return record_payload(f'salesperson.top_brands.{metric}', chart)
     
     # =========================================================================
     # HELPER METHODS
     # =========================================================================
     
+    @staticmethod
+    def _pareto_payload(
+        top_df: pd.DataFrame,
+        label_col: str,
+        metric: str,
+        max_bars: int = DEFAULT_TOP_N
+    ) -> tuple:
+        """
+        Reduce a Pareto frame to the bars actually drawn.
+        
+        Folds everything past (max_bars - 1) into an "Others" bar, recomputes
+        cumulative_percent on the folded rows and keeps only encoded columns.
+        
+        Returns:
+            (chart_df, x_order) — x_order keeps "Others" as the last bar
+        """
+        df = top_n_with_others(
+            top_df, label_col, metric, n=max_bars,
+            sum_cols=['percent_contribution']
+        )
+        df['cumulative_percent'] = df['percent_contribution'].cumsum() / 100
+        df = slim(df, [label_col, metric, 'percent_contribution',
+                       'cumulative_percent', 'item_count'], decimals=4)
+        return df, df[label_col].tolist()
+    
     @staticmethod
     def _empty_chart(message: str = "No data available") -> alt.Chart:
         """Create an empty chart with a message."""
@@ -1796,6 +1838,10 @@ class SalespersonCharts:
         # Convert etd_year to string for color encoding
         df['year_str'] = df['etd_year'].astype(int).astype(str)
         
+        # Only encoded columns go into the Vega-Lite payload
+        df = slim(df, ['year_month', 'etd_year', 'etd_month', 'year_str',
+                       'backlog_revenue', 'backlog_gp', 'order_count'])
+        
         # Define year colors (cycling through a palette)
         year_colors = {
             '2024': '#aec7e8',  # Light blue (past)
@@ -1902,7 +1948,7 @@ class SalespersonCharts:
             )
         )
         
-        return chart
+        return record_payload('salesperson.backlog_by_month_multiyear', chart)
 
 
     @staticmethod
@@ -2167,12 +2213,49 @@ class SalespersonCharts:
     # MULTI-YEAR COMPARISON CHARTS
     # =========================================================================
     
+    @staticmethod
+    def _monthly_amount_by_year(
+        sales_df: pd.DataFrame,
+        metric: str,
+        monthly_by_year: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """
+        Year × month totals of one metric as [year, month, amount].
+        
+        NEW v1.5.0: Uses pre-aggregated MonthlyCube.monthly_by_year() output
+        when provided, otherwise groups the invoice-line frame.
+        """
+        if monthly_by_year is not None:
+            if monthly_by_year.empty:
+                return pd.DataFrame(columns=['year', 'month', 'amount'])
+            monthly = monthly_by_year[['year', 'month', metric]].copy()
+            monthly.columns = ['year', 'month', 'amount']
+            return monthly
+        
+        metric_map = {
+            'revenue': 'sales_by_split_usd',
+            'gross_profit': 'gross_profit_by_split_usd',
+            'gp1': 'gp1_by_split_usd'
+        }
+        col = metric_map.get(metric, 'sales_by_split_usd')
+        
+        if sales_df.empty:
+            return pd.DataFrame(columns=['year', 'month', 'amount'])
+        
+        df = sales_df.copy()
+        df['year'] = pd.to_datetime(df['inv_date']).dt.year
+        
+        monthly = df.groupby(['year', 'invoice_month'])[col].sum().reset_index()
+        monthly.columns = ['year', 'month', 'amount']
+        return monthly
+    
     @staticmethod
     def build_multi_year_monthly_chart(
         sales_df: pd.DataFrame,
         years: List[int],
         metric: str = 'revenue',
-        title: str = ""
+        title: str = "",
+        monthly_by_year: pd.DataFrame = None
     ) -> alt.Chart:
         """
         Build grouped bar chart comparing multiple years by month.
@@ -2182,27 +2265,17 @@ class SalespersonCharts:
             years: List of years to compare [2023, 2024, 2025]
             metric: 'revenue', 'gross_profit', or 'gp1'
             title: Chart title
+            monthly_by_year: Optional pre-aggregated MonthlyCube.monthly_by_year()
+                             (sales_df is ignored when given)
             
         Returns:
             Altair grouped bar chart
         """
-        metric_map = {
-            'revenue': 'sales_by_split_usd',
-            'gross_profit': 'gross_profit_by_split_usd',
-            'gp1': 'gp1_by_split_usd'
-        }
-        
-        col = metric_map.get(metric, 'sales_by_split_usd')
-        
-        if sales_df.empty:
+        if monthly_by_year is None and sales_df.empty:
             return SalespersonCharts._empty_chart("No data available")
         
         # Aggregate by year and month
-        df = sales_df.copy()
-        df['year'] = pd.to_datetime(df['inv_date']).dt.year
-        
-        monthly = df.groupby(['year', 'invoice_month'])[col].sum().reset_index()
-        monthly.columns = ['year', 'month', 'amount']
+        monthly = SalespersonCharts._monthly_amount_by_year(sales_df, metric, monthly_by_year)
         
         # Filter to selected years
         monthly = monthly[monthly['year'].isin(years)]
@@ -2246,7 +2319,8 @@ class SalespersonCharts:
         sales_df: pd.DataFrame,
         years: List[int],
         metric: str = 'revenue',
-        title: str = ""
+        title: str = "",
+        monthly_by_year: pd.DataFrame = None
     ) -> alt.Chart:
         """
         Build cumulative line chart comparing multiple years.
@@ -2256,35 +2330,27 @@ class SalespersonCharts:
             years: List of years to compare [2023, 2024, 2025]
             metric: 'revenue', 'gross_profit', or 'gp1'
             title: Chart title
+            monthly_by_year: Optional pre-aggregated MonthlyCube.monthly_by_year()
+                             (sales_df is ignored when given)
             
         Returns:
             Altair line chart with multiple lines (one per year)
         """
-        metric_map = {
-            'revenue': 'sales_by_split_usd',
-            'gross_profit': 'gross_profit_by_split_usd',
-            'gp1': 'gp1_by_split_usd'
-        }
-        
-        col = metric_map.get(metric, 'sales_by_split_usd')
-        
-        if sales_df.empty:
+        if monthly_by_year is None and sales_df.empty:
             return SalespersonCharts._empty_chart("No data available")
         
-        df = sales_df.copy()
-        df['year'] = pd.to_datetime(df['inv_date']).dt.year
+        by_year = SalespersonCharts._monthly_amount_by_year(sales_df, metric, monthly_by_year)
         
         # Calculate cumulative for each year
         cumulative_data = []
         
         for year in sorted(years):
-            year_df = df[df['year'] == year]
-            if year_df.empty:
+            year_monthly = by_year[by_year['year'] == year]
+            if year_monthly.empty:
                 continue
             
             # Aggregate by month
-            monthly = year_df.groupby('invoice_month')[col].sum().reset_index()
-            monthly.columns = ['month', 'amount']
+            monthly = year_monthly.groupby('month')['amount'].sum().reset_index()
             
             # Ensure all months present
             all_months = pd.DataFrame({'month': MONTH_ORDER})
@@ -2372,7 +2438,8 @@ class SalespersonCharts:
     def build_multi_year_summary_table(
         sales_df: pd.DataFrame,
         years: List[int],
-        metric: str = 'revenue'
+        metric: str = 'revenue',
+        monthly_by_year: pd.DataFrame = None
     ) -> pd.DataFrame:
         """
         Build summary table for multi-year comparison.
@@ -2381,26 +2448,21 @@ class SalespersonCharts:
             sales_df: Sales data containing multiple years
             years: List of years to compare
             metric: 'revenue', 'gross_profit', or 'gp1'
+            monthly_by_year: Optional pre-aggregated MonthlyCube.monthly_by_year()
+                             (sales_df is ignored when given)
             
         Returns:
             DataFrame with yearly totals and YoY growth
         """
-        metric_map = {
-            'revenue': 'sales_by_split_usd',
-            'gross_profit': 'gross_profit_by_split_usd',
-            'gp1': 'gp1_by_split_usd'
-        }
-        
-        col = metric_map.get(metric, 'sales_by_split_usd')
-        
-        if sales_df.empty:
+        if monthly_by_year is None and sales_df.empty:
             return pd.DataFrame()
         
-        df = sales_df.copy()
-        df['year'] = pd.to_datetime(df['inv_date']).dt.year
+        by_year = SalespersonCharts._monthly_amount_by_year(sales_df, metric, monthly_by_year)
+        if by_year.empty:
+            return pd.DataFrame()
         
         # Aggregate by year
-        yearly = df.groupby('year')[col].sum().reset_index()
+        yearly = by_year.groupby('year')['amount'].sum().reset_index()
         yearly.columns = ['Year', 'Total']
         yearly = yearly[yearly['Year'].isin(years)].sort_values('Year')
         
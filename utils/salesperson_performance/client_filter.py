@@ -0,0 +1,207 @@
+# utils/salesperson_performance/client_filter.py
+"""
+Client-side filtering of the cached salesperson dataset
+
+Moved out of the Salesperson Performance page so the filter can be
+imported without running the page (benchmarks in utils/bench, other
+pages). Behaviour is unchanged: date range (sales / complex KPI keys
+only), salesperson, legal entity and target year filters, internal
+revenue exclusion, then a Complex KPI recalculation for the selection.
+
+VERSION: 1.0.0
+"""
+
+import logging
+import time
+
+import pandas as pd
+
+from .perf_logger import perf, PerfCategory as PC
+
+logger = logging.getLogger(__name__)
+
+
+def filter_data_client_side(raw_data: dict, filter_values: dict) -> dict:
+    """
+    Filter cached data client-side based on ALL filters.
+    This is instant - no DB query needed.
+    
+    UPDATED v1.1.0: Added exclude_internal_revenue handling
+    - Uses customer_type column from unified_sales_by_salesperson_view
+    - When True: Sets revenue to 0 for Internal customers, keeps GP intact
+    - Purpose: Evaluate sales performance with real (external) customers only
+    
+    UPDATED v1.8.0: Extended exclude_internal_revenue to backlog data
+    - Backlog detail still shows internal orders (for display)
+    - Backlog aggregates (total_backlog, in_period_backlog) zero internal revenue
+    
+    UPDATED v2.4.0: Handle empty employee_ids (is_empty_selection)
+    - When employee_ids is empty list [], return empty DataFrames
+    - Allows page to render with $0 values instead of blocking
+    """
+    filter_start = time.perf_counter()
+    start_date = filter_values['start_date']
+    end_date = filter_values['end_date']
+    employee_ids = filter_values['employee_ids']
+    entity_ids = filter_values['entity_ids']
+    year = filter_values['year']
+    exclude_internal_revenue = filter_values.get('exclude_internal_revenue', True)  # NEW
+    is_empty_selection = filter_values.get('is_empty_selection', False)  # NEW v2.4.0
+    
+    filtered = {}
+    
+    # NEW v2.4.0: If empty selection, return empty DataFrames for data tables
+    # This allows page to render with $0 values instead of blocking
+    if is_empty_selection:
+        for key, df in raw_data.items():
+            if key.startswith('_'):
+                continue
+            if isinstance(df, pd.DataFrame):
+                # Return empty DataFrame with same structure
+                filtered[key] = df.head(0)
+            else:
+                filtered[key] = df
+        return filtered
+    
+    # FIXED v2.11.0: Backlog data should NOT be filtered by date range
+    # Backlog represents ALL pending orders - date range only applies to Sales data
+    # In-Period backlog is calculated separately using ETD field in metrics.py
+    # NEW v3.5.0: AR outstanding also NOT filtered by date range
+    backlog_keys = {'total_backlog', 'in_period_backlog', 'backlog_by_month', 'backlog_detail', 'ar_outstanding', 'period_payment'}
+    
+    for key, df in raw_data.items():
+        # Skip metadata
+        if key.startswith('_'):
+            continue
+            
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            filtered[key] = df
+            continue
+        
+        df_filtered = df.copy()
+        
+        # FIXED v2.11.0: Skip date filtering for backlog data
+        # Backlog is future orders - should not be filtered by invoice/OC date range
+        if key not in backlog_keys:
+            # Filter by date range - only for sales and complex KPI data
+            date_cols = [
+                'inv_date',              # sales data
+                'first_invoice_date',    # new_customers
+                'first_sale_date',       # new_products
+                'first_combo_date',      # new_business_detail
+            ]
+            for date_col in date_cols:
+                if date_col in df_filtered.columns:
+                    df_filtered[date_col] = pd.to_datetime(df_filtered[date_col], errors='coerce')
+                    df_filtered = df_filtered[
+                        (df_filtered[date_col] >= pd.Timestamp(start_date)) & 
+                        (df_filtered[date_col] <= pd.Timestamp(end_date))
+                    ]
+                    break
+        
+        # Filter by employee_ids (salesperson)
+        if employee_ids:
+            emp_ids_set = set(employee_ids)
+            if 'sales_id' in df_filtered.columns:
+                # FIX v3.8.0: For AR/Payment data, keep unassigned rows
+                # (sales_id IS NULL) alongside filtered employees.
+                # Unassigned invoices have no split assignment and should
+                # be visible to ALL roles for AR tracking purposes.
+                if key in ('ar_outstanding', 'period_payment'):
+                    _assigned_mask = df_filtered['sales_id'].isin(emp_ids_set)
+                    _unassigned_mask = df_filtered['sales_id'].isna()
+                    if 'is_unassigned' in df_filtered.columns:
+                        _unassigned_mask = _unassigned_mask | (df_filtered['is_unassigned'] == 1)
+                    df_filtered = df_filtered[_assigned_mask | _unassigned_mask]
+                else:
+                    df_filtered = df_filtered[df_filtered['sales_id'].isin(emp_ids_set)]
+            elif 'employee_id' in df_filtered.columns:
+                df_filtered = df_filtered[df_filtered['employee_id'].isin(emp_ids_set)]
+        
+        # Filter by entity_ids
+        if entity_ids:
+            entity_ids_set = set(entity_ids)
+            if 'entity_id' in df_filtered.columns:
+                df_filtered = df_filtered[df_filtered['entity_id'].isin(entity_ids_set)]
+            elif 'legal_entity_id' in df_filtered.columns:
+                df_filtered = df_filtered[df_filtered['legal_entity_id'].isin(entity_ids_set)]
+        
+        # Special handling for targets - filter by year
+        if key == 'targets' and 'year' in df_filtered.columns:
+            df_filtered = df_filtered[df_filtered['year'] == year]
+        
+        # =====================================================================
+        # NEW: Exclude Internal Revenue (but keep GP)
+        # Uses customer_type column from unified_sales_by_salesperson_view
+        # customer_type = 'Internal' for internal companies
+        # =====================================================================
+        if exclude_internal_revenue and key == 'sales':
+            if 'customer_type' in df_filtered.columns and 'sales_by_split_usd' in df_filtered.columns:
+                # Create mask for internal customers
+                is_internal = df_filtered['customer_type'].str.lower() == 'internal'
+                
+                # Log for debugging
+                internal_count = is_internal.sum()
+                if internal_count > 0:
+                    internal_revenue = df_filtered.loc[is_internal, 'sales_by_split_usd'].sum()
+                    logger.info(
+                        f"Excluding internal revenue: {internal_count} rows, "
+                        f"${internal_revenue:,.0f} revenue zeroed (GP kept intact)"
+                    )
+                
+                # Zero out ONLY revenue for internal customers
+                # GP columns (gross_profit_by_split_usd, gp1_by_split_usd) are kept intact
+                # This allows evaluation of sales performance with real customers
+                df_filtered.loc[is_internal, 'sales_by_split_usd'] = 0
+        
+        # =====================================================================
+        # NEW v1.8.0: Exclude Internal Revenue from Backlog (for Pipeline & Forecast)
+        # Backlog detail shows all orders (including internal) for display
+        # But aggregates (total_backlog, in_period_backlog) exclude internal revenue
+        # =====================================================================
+        if exclude_internal_revenue and key == 'backlog_detail':
+            if 'customer_type' in df_filtered.columns and 'backlog_sales_by_split_usd' in df_filtered.columns:
+                # Create mask for internal customers
+                is_internal = df_filtered['customer_type'].str.lower() == 'internal'
+                
+                # Log for debugging
+                internal_count = is_internal.sum()
+                if internal_count > 0:
+                    internal_backlog = df_filtered.loc[is_internal, 'backlog_sales_by_split_usd'].sum()
+                    logger.info(
+                        f"Excluding internal backlog revenue: {internal_count} rows, "
+                        f"${internal_backlog:,.0f} backlog revenue zeroed (GP kept intact)"
+                    )
+                
+                # Zero out ONLY revenue for internal customers
+                # GP columns (backlog_gp_by_split_usd) are kept intact
+                df_filtered.loc[is_internal, 'backlog_sales_by_split_usd'] = 0
+        
+        filtered[key] = df_filtered
+    
+    # =========================================================================
+    # NEW v3.0.0: Recalculate Complex KPIs with Pandas when filters change
+    # This is instant (<0.3s) since data is already in memory
+    # =========================================================================
+    if '_complex_kpi_calculator' in raw_data and raw_data['_complex_kpi_calculator'] is not None:
+        calc = raw_data['_complex_kpi_calculator']
+        
+        with perf.track("Pandas: recalc_complex_kpis", PC.PANDAS):
+            # Recalculate with current filters (employee_ids)
+            complex_kpis_result = calc.calculate_all(
+                start_date=start_date,
+                end_date=end_date,
+                employee_ids=employee_ids if employee_ids else None
+            )
+        
+        # Update filtered data with recalculated Complex KPIs
+        filtered['new_customers'] = complex_kpis_result['new_customers']
+        filtered['new_products'] = complex_kpis_result['new_products']
+        filtered['new_combos_detail'] = complex_kpis_result['new_combos_detail']  # NEW v1.1.0
+        filtered['new_business'] = complex_kpis_result['new_business']
+        filtered['new_business_detail'] = complex_kpis_result['new_business_detail']
+    
+    # Print timing
+    filter_elapsed = time.perf_counter() - filter_start
+    perf.log_event(f"Client-side filter: {filter_elapsed:.3f}s", PC.FILTER)
+    return filtered
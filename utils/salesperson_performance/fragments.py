@@ -6,9 +6,16 @@ Uses @st.fragment to enable partial reruns for filter-heavy sections.
 Each fragment only reruns when its internal widgets change,
 NOT when sidebar filters or other sections change.
 
-VERSION: 4.1.0 - Sales Detail drill-down (Order → Delivery → Payment → Docs)
+VERSION: 4.3.0 - Drill-down documents signed in one cached batch
 
 CHANGELOG:
+- v4.3.0: Sales Detail documents tab renders via utils.doc_links.render_doc_list
+          (cached batch signing, sign-on-click for long lists)
+- v4.2.0: monthly_trend_fragment and yoy_comparison_fragment accept a sliced
+          utils.monthly_cube.MonthlyCube. With no Customer/Brand/Product
+          drill-down active, monthly summary, multi-year charts and yearly
+          cards read the cube (thousands of rows) instead of re-grouping
+          the invoice-line frame for every metric tab on every rerun
 - v4.1.0: NEW Sales Detail drill-down panel
           - Click any row in Sales List → 4-tab detail panel expands below
           - 📦 Order: OC lines from order_confirmation_full_looker_view
@@ -85,10 +92,12 @@ import pandas as pd
 from datetime import datetime, date
 from typing import Dict, List, Optional, Any
 
+from utils.perf import traced_fragment
 from .metrics import SalespersonMetrics
 from .charts import SalespersonCharts
 from .export import SalespersonExport
 from .constants import MONTH_ORDER
+from utils.doc_links import render_doc_list
 
 from .filters import (
     render_multiselect_filter,
@@ -118,16 +127,21 @@ def _safe_date_str(val, fmt: str = '%Y-%m-%d', default: str = '—') -> str:
 # Lines 645-732 from original file - 100% code preserved
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def monthly_trend_fragment(
     sales_df: pd.DataFrame,
     targets_df: pd.DataFrame,
-    fragment_key: str = "trend"
+    fragment_key: str = "trend",
+    monthly_cube=None  # NEW v4.2.0: sliced utils.monthly_cube.MonthlyCube
 ):
     """
     Fragment for Monthly Trend & Cumulative charts with drill-down filters.
     
     100% code from original file lines 645-732.
+    
+    When monthly_cube is given and no drill-down filter is active, the
+    monthly summary is read from the pre-aggregated cube instead of
+    re-grouping invoice lines.
     """
     # ==========================================================================
     # MONTHLY TREND + CUMULATIVE - WITH DRILL-DOWN FILTERS
@@ -195,8 +209,12 @@ def monthly_trend_fragment(
         st.caption(f"🔍 Filters: {' | '.join(trend_active_filters)}")
     
     # Calculate monthly summary with filtered data
-    trend_metrics_calc = SalespersonMetrics(trend_sales_df, targets_df)
-    monthly_summary = trend_metrics_calc.prepare_monthly_summary()
+    # NEW v4.2.0: No drill-down active → serve from pre-aggregated cube
+    if monthly_cube is not None and not trend_active_filters:
+        monthly_summary = SalespersonMetrics.monthly_summary_from_cube(monthly_cube)
+    else:
+        trend_metrics_calc = SalespersonMetrics(trend_sales_df, targets_df)
+        monthly_summary = trend_metrics_calc.prepare_monthly_summary()
     
     # Monthly charts
     col1, col2 = st.columns(2)
@@ -224,20 +242,24 @@ def monthly_trend_fragment(
 # Lines 742-1122 from original file - 100% code preserved
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def yoy_comparison_fragment(
     sales_df: pd.DataFrame,
     queries,  # SalespersonQueries instance
     filter_values: Dict,
     raw_cached_sales_df: pd.DataFrame = None,  # OPTIMIZATION v3.4.0: cached raw data for prev year extraction
     cached_year_range: tuple = None,  # OPTIMIZATION v3.4.0: (start_year, end_year) of cached data
-    fragment_key: str = "yoy"
+    fragment_key: str = "yoy",
+    monthly_cube=None  # NEW v4.2.0: sliced utils.monthly_cube.MonthlyCube
 ):
     """
     Fragment for Year-over-Year comparison with drill-down filters.
     
     100% code from original file lines 742-1122.
     Includes both multi-year and single-year comparison logic.
+    
+    Multi-year charts and yearly cards are served from monthly_cube when it
+    is given and no drill-down filter is active.
     """
     # --- Header with help ---
     col_yc_header, col_yc_help = st.columns([6, 1])
@@ -302,8 +324,15 @@ def yoy_comparison_fragment(
     if yoy_active_filters:
         st.caption(f"🔍 Filters: {' | '.join(yoy_active_filters)}")
     
+    # NEW v4.2.0: Pre-aggregated year × month frame when no drill-down is active
+    monthly_by_year = None
+    if monthly_cube is not None and not yoy_active_filters:
+        monthly_by_year = monthly_cube.monthly_by_year()
+    
     # Get years that actually have sales data (not just from date range)
-    if not yoy_sales_df.empty and 'invoice_year' in yoy_sales_df.columns:
+    if monthly_by_year is not None:
+        actual_years = monthly_cube.years()
+    elif not yoy_sales_df.empty and 'invoice_year' in yoy_sales_df.columns:
         actual_years = sorted(yoy_sales_df['invoice_year'].dropna().unique().astype(int).tolist())
     else:
         actual_years = []
@@ -326,7 +355,8 @@ def yoy_comparison_fragment(
             summary_df = SalespersonCharts.build_multi_year_summary_table(
                 sales_df=yoy_sales_df,
                 years=actual_years,
-                metric='revenue'
+                metric='revenue',
+                monthly_by_year=monthly_by_year
             )
             
             if not summary_df.empty:
@@ -351,6 +381,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='revenue',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(monthly_chart, width="stretch")
@@ -361,6 +392,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='revenue',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(cum_chart, width="stretch")
@@ -370,7 +402,8 @@ def yoy_comparison_fragment(
             summary_df = SalespersonCharts.build_multi_year_summary_table(
                 sales_df=yoy_sales_df,
                 years=actual_years,
-                metric='gross_profit'
+                metric='gross_profit',
+                monthly_by_year=monthly_by_year
             )
             
             if not summary_df.empty:
@@ -393,6 +426,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='gross_profit',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(monthly_chart, width="stretch")
@@ -403,6 +437,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='gross_profit',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(cum_chart, width="stretch")
@@ -412,7 +447,8 @@ def yoy_comparison_fragment(
             summary_df = SalespersonCharts.build_multi_year_summary_table(
                 sales_df=yoy_sales_df,
                 years=actual_years,
-                metric='gp1'
+                metric='gp1',
+                monthly_by_year=monthly_by_year
             )
             
             if not summary_df.empty:
@@ -435,6 +471,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='gp1',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(monthly_chart, width="stretch")
@@ -445,6 +482,7 @@ def yoy_comparison_fragment(
                     sales_df=yoy_sales_df,
                     years=actual_years,
                     metric='gp1',
+                    monthly_by_year=monthly_by_year,
                     title=""
                 )
                 st.altair_chart(cum_chart, width="stretch")
@@ -675,7 +713,7 @@ def yoy_comparison_fragment(
 # UPDATED v2.3.0: Added summary metrics cards for consistency with Backlog List
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def sales_detail_fragment(
     sales_df: pd.DataFrame,
     overview_metrics: Dict,
@@ -1096,7 +1134,7 @@ def sales_detail_fragment(
 # Lines 1883-1928 from original file - 100% code preserved
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def pivot_analysis_fragment(
     sales_df: pd.DataFrame,
     fragment_key: str = "pivot"
@@ -1162,7 +1200,7 @@ def pivot_analysis_fragment(
 # Lines 1969-2237 from original file - 100% code preserved
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_list_fragment(
     backlog_df: pd.DataFrame,
     in_period_backlog_analysis: Dict,
@@ -1509,7 +1547,7 @@ def backlog_list_fragment(
 # Multi-year view with Timeline/Stacked/Single Year modes
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_by_etd_fragment(
     backlog_by_month_df: pd.DataFrame,
     metrics_calc,  # SalespersonMetrics instance
@@ -1689,7 +1727,7 @@ def backlog_by_etd_fragment(
 # - v2.4.0: Initial fragment version
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def export_report_fragment(
     # Metrics data
     overview_metrics: Dict,
@@ -1896,7 +1934,7 @@ def export_report_fragment(
 # Prevents page rerun when changing ranking dropdown
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def team_ranking_fragment(
     salesperson_summary_df: pd.DataFrame,
     fragment_key: str = "ranking"
@@ -2094,7 +2132,7 @@ def _get_rank_emoji(rank: int) -> str:
         return f"#{rank}"
 
 
-@st.fragment
+@traced_fragment
 def kpi_progress_fragment(
     # Data
     targets_df: pd.DataFrame,
@@ -2559,7 +2597,7 @@ def kpi_progress_fragment(
 # NEW v3.4.0: Filters above sub-tabs - all sub-tabs share same filtered data
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def sales_detail_tab_fragment(
     sales_df: pd.DataFrame,
     overview_metrics: Dict,
@@ -3286,45 +3324,12 @@ def _render_documents_tab(inv_number: str, loader, s3_url_generator=None, fragme
         st.caption("No documents attached to this invoice")
         return
     
-    # Group by doc_type
-    inv_docs = docs_df[docs_df['doc_type'] == 'invoice'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-    pmt_docs = docs_df[docs_df['doc_type'] == 'payment'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-    
-    def _get_file_icon(filename: str) -> str:
-        ext = filename.split('.')[-1].lower() if '.' in str(filename) else ''
-        return {'pdf': '📄', 'png': '🖼️', 'jpg': '🖼️', 'jpeg': '🖼️'}.get(ext, '📎')
-    
-    def _render_doc_link(doc, extra_label=""):
-        filename = doc.get('filename', 'Unknown')
-        s3_key = doc.get('s3_key', '')
-        icon = _get_file_icon(str(filename))
-        
-        if s3_url_generator and s3_key:
-            try:
-                url = s3_url_generator(s3_key)
-                if url:
-                    st.markdown(f"{icon} [{filename}]({url}){extra_label}")
-                    return
-            except Exception:
-                pass
-        # Fallback
-        st.caption(f"{icon} {filename}{extra_label}")
-    
-    if not inv_docs.empty:
-        st.markdown(f"**📄 Invoice Documents** ({len(inv_docs)})")
-        for _, doc in inv_docs.iterrows():
-            _render_doc_link(doc)
-    
-    if not pmt_docs.empty:
-        st.markdown(f"**💳 Payment Receipts** ({len(pmt_docs)})")
-        for _, doc in pmt_docs.iterrows():
-            pmt_label = f" ({doc['payment_number']})" if pd.notna(doc.get('payment_number')) else ""
-            _render_doc_link(doc, extra_label=pmt_label)
-    
-    if inv_docs.empty and pmt_docs.empty:
-        st.markdown("**📎 Documents**")
-        for _, doc in docs_df.iterrows():
-            _render_doc_link(doc)
+    # All links signed in one cached batch (lazy above LAZY_THRESHOLD docs)
+    render_doc_list(
+        docs_df, s3_url_generator,
+        key_prefix=f"{fragment_key}_{inv_number}",
+        show_invoice_number=False,
+    )
 
 
 def _render_pivot_content(filtered_df: pd.DataFrame, key_prefix: str):
@@ -3381,7 +3386,7 @@ def _render_pivot_content(filtered_df: pd.DataFrame, key_prefix: str):
 # NEW v3.4.0: Filters above sub-tabs - all sub-tabs share same filtered data
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def backlog_tab_fragment(
     backlog_df: pd.DataFrame,
     in_period_backlog_analysis: Dict,
@@ -10,6 +10,9 @@ Handles all metric calculations:
 - Data aggregations by salesperson/period
 
 CHANGELOG:
+- v2.11.0: ADDED monthly_summary_from_cube() — monthly trend/cumulative served
+          from the pre-aggregated utils.monthly_cube.MonthlyCube (built once per
+          data load) instead of re-grouping invoice lines on every rerun
 - v2.9.4: FIXED KPI name mismatch bug causing Individual Overall Achievement to be wrong
           - Bug 1: Database stores "Gross Profit 1" but code expects "gross_profit_1"
             * Root cause: .lower() produces "gross profit 1" (space) but kpi_column_map 
@@ -1968,6 +1971,30 @@ class SalespersonMetrics:
         
         return monthly
     
+    @staticmethod
+    def monthly_summary_from_cube(cube) -> pd.DataFrame:
+        """
+        Same shape as prepare_monthly_summary(), served from a sliced MonthlyCube.
+        
+        NEW v2.11.0: Avoids re-grouping the invoice-line frame on every rerun.
+        
+        Args:
+            cube: utils.monthly_cube.MonthlyCube already sliced to the active filters
+            
+        Returns:
+            DataFrame with monthly aggregated data including cumulative values
+        """
+        monthly = cube.monthly_summary(fill_all_months=True)
+        monthly = monthly.rename(columns={
+            'month': 'invoice_month',
+            'customers': 'customer_count',
+        })
+        return monthly[[
+            'invoice_month', 'revenue', 'gross_profit', 'gp1', 'customer_count',
+            'gp_percent', 'gp1_percent', 'month_order',
+            'cumulative_revenue', 'cumulative_gp', 'cumulative_gp1',
+        ]]
+    
     def _get_empty_monthly_summary(self) -> pd.DataFrame:
         """Return empty monthly summary."""
         return pd.DataFrame({
@@ -25,7 +25,8 @@ Usage:
         active_filters=active_filters,
     )
 
-VERSION: 2.0.0 — Added collect_warning_data(), collect_recipients_warning_summary()
+VERSION: 2.2.0 — collect_recipients_warning_summary() uses bulletin_batch
+  (frames partitioned once by sales_id; see bulletin_batch.py for batch sends)
 """
 
 import logging
@@ -95,7 +96,7 @@ def _find_co_split_salespeople(
     related = full_ar_df[mask].drop_duplicates('sales_id')
     
     result = []
-    for _, row in related.iterrows():
+    for row in related.to_dict('records'):
         eid = int(row['sales_id'])
         if exclude_employee_id and eid == exclude_employee_id:
             continue
@@ -698,6 +699,8 @@ def _build_customers_at_risk(
     - Uses line_outstanding_usd (actual, deduped) instead of split amounts
     - Shows both LC and USD amounts  
     - Includes co-split salespeople from full_ar_df
+
+    UPDATED v2.2.0: Co-split lookup only for the top 10 customers returned
     """
     if ar_df.empty or 'customer' not in ar_df.columns:
         return []
@@ -753,13 +756,6 @@ def _build_customers_at_risk(
         
         customer_id = cust_df['customer_id'].iloc[0] if 'customer_id' in cust_df.columns else None
 
-        # Find co-split salespeople from full AR data
-        co_split = []
-        if full_ar_df is not None and customer_id is not None:
-            co_split = _find_co_split_salespeople(
-                [customer_id], full_ar_df, exclude_employee_id=employee_id
-            )
-
         customers.append({
             'customer': customer,
             'customer_id': customer_id,
@@ -773,11 +769,21 @@ def _build_customers_at_risk(
             'invoice_count': len(invoices),
             'max_days_overdue': max_days,
             'aging_bucket': aging,
-            'co_split_salespeople': co_split,
+            'co_split_salespeople': [],
         })
 
     customers.sort(key=lambda x: x['outstanding'], reverse=True)
-    return customers[:10]
+    customers = customers[:10]
+
+    # Find co-split salespeople from full AR data (only for the customers shown)
+    if full_ar_df is not None:
+        for cust in customers:
+            if cust['customer_id'] is not None:
+                cust['co_split_salespeople'] = _find_co_split_salespeople(
+                    [cust['customer_id']], full_ar_df, exclude_employee_id=employee_id
+                )
+
+    return customers
 
 
 # =============================================================================
@@ -799,45 +805,46 @@ def collect_recipients_warning_summary(
     Returns DataFrame with one row per employee:
         employee_id, name, overdue_amount, customer_count,
         worst_aging, worst_icon, alert_count, enabled
+
+    UPDATED v2.2.0: Frames are partitioned once and alert counts come from
+    bulletin_batch.build_bulletins (grouped passes, no per-employee rescans).
     """
+    from .bulletin_batch import (
+        EmployeePartitions, build_bulletins, employee_name_map, overdue_customer_counts,
+    )
+
     rows = []
 
-    # Get names from sales_df
-    name_map = {}
-    if not sales_df.empty and 'sales_id' in sales_df.columns and 'sales_name' in sales_df.columns:
-        name_map = sales_df.drop_duplicates('sales_id').set_index('sales_id')['sales_name'].to_dict()
+    # Partition once, then count alerts for everyone in grouped passes
+    partitions = EmployeePartitions(sales_df, backlog_detail_df, ar_outstanding_df, targets_df)
+    name_map = employee_name_map(sales_df)
+    names = {eid: name_map.get(eid, f"Employee #{eid}") for eid in employee_ids}
+
+    try:
+        bulletins = build_bulletins(partitions, names, active_filters)
+    except Exception as e:
+        logger.warning(f"Could not build bulletins for recipient summary: {e}")
+        bulletins = {}
+
+    customer_counts = overdue_customer_counts(ar_outstanding_df)
+
+    # Worst aging icon
+    icon_map = {
+        '90+ days overdue': '🔴', '61-90 days overdue': '🟠',
+        '31-60 days overdue': '🟡', '1-30 days overdue': '🟢',
+        'Not Yet Due': '✅', 'OK': '✅',
+    }
 
     for eid in employee_ids:
-        name = name_map.get(eid, f"Employee #{eid}")
+        name = names[eid]
 
         # AR summary
         ar_summary = {'total_overdue': 0, 'worst_bucket': 'OK', 'overdue_invoice_count': 0}
-        if not ar_outstanding_df.empty and 'sales_id' in ar_outstanding_df.columns:
-            my_ar = ar_outstanding_df[ar_outstanding_df['sales_id'] == eid]
-            if not my_ar.empty:
-                ar_summary = _build_ar_aging_summary(my_ar)
+        my_ar = partitions.get('ar', eid)
+        if not my_ar.empty:
+            ar_summary = _build_ar_aging_summary(my_ar)
 
-        # Alert count (lightweight — just count, don't build full bulletin)
-        alert_count = 0
-        try:
-            bulletin, _ = collect_per_employee_bulletin(
-                employee_id=eid, employee_name=name,
-                sales_df=sales_df, backlog_detail_df=backlog_detail_df,
-                ar_outstanding_df=ar_outstanding_df, targets_df=targets_df,
-                active_filters=active_filters,
-            )
-            alert_count = bulletin.get('alert_count', 0)
-        except Exception:
-            pass
-
-        # Customer count at risk
-        customer_count = 0
-        if not ar_outstanding_df.empty and 'sales_id' in ar_outstanding_df.columns:
-            my_ar = ar_outstanding_df[ar_outstanding_df['sales_id'] == eid]
-            if not my_ar.empty and 'days_overdue' in my_ar.columns:
-                my_ar_overdue = my_ar[pd.to_numeric(my_ar['days_overdue'], errors='coerce').fillna(0) > 0]
-                if 'customer' in my_ar_overdue.columns:
-                    customer_count = my_ar_overdue['customer'].nunique()
+        alert_count = bulletins[eid][0].get('alert_count', 0) if eid in bulletins else 0
 
         # Preferences
         enabled = True
@@ -845,19 +852,13 @@ def collect_recipients_warning_summary(
             master = prefs_cache.get(eid, {}).get('all', {})
             enabled = master.get('enabled', True)
 
-        # Worst aging icon
-        icon_map = {
-            '90+ days overdue': '🔴', '61-90 days overdue': '🟠',
-            '31-60 days overdue': '🟡', '1-30 days overdue': '🟢',
-            'Not Yet Due': '✅', 'OK': '✅',
-        }
         worst = ar_summary.get('worst_bucket', 'OK')
 
         rows.append({
             'employee_id': eid,
             'name': name,
             'overdue_amount': ar_summary.get('total_overdue', 0),
-            'customer_count': customer_count,
+            'customer_count': customer_counts.get(eid, 0),
             'worst_aging': worst,
             'worst_icon': icon_map.get(worst, '✅'),
             'alert_count': alert_count,
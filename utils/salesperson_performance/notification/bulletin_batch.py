@@ -0,0 +1,494 @@
+# utils/salesperson_performance/notification/bulletin_batch.py
+"""
+Batch Bulletin Builder — every salesperson's bulletin in one pass.
+
+collect_per_employee_bulletin() re-filters the full sales / backlog / AR /
+targets frames for each employee, so a 200-person send scans every frame
+800+ times. This module partitions the four frames ONCE by employee id
+(groupby indices) and computes overview metrics and every alert check as
+grouped, vectorized passes over the whole team. Results are identical to the
+per-employee collector (same thresholds, messages and ordering).
+
+Rendering (build_bulletin_email / build_warning_email / generate_warning_excel)
+is farmed out to utils.render_pool via the module-level _render_*_job
+functions.
+
+Zero SQL — pure Pandas on data already in memory.
+
+Usage:
+    from utils.salesperson_performance.notification.bulletin_batch import (
+        EmployeePartitions, build_bulletins,
+    )
+
+    parts = EmployeePartitions(sales_df, backlog_detail_df, ar_outstanding_df, targets_df)
+    bulletins = build_bulletins(parts, {42: 'Quy Ngo', 55: 'Minh Tran'}, active_filters)
+    bulletin, metrics = bulletins[42]
+
+VERSION: 1.0.0
+"""
+
+import logging
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .alert_data_collector import (
+    AR_OVERDUE_90_THRESHOLD,
+    AR_OVERDUE_THRESHOLD,
+    BACKLOG_OVERDUE_MIN_VALUE,
+    COMING_DUE_DAYS,
+    KPI_CRITICAL_RATIO,
+    KPI_WARNING_RATIO,
+    _build_ar_aging_summary,
+    _build_customers_at_risk,
+    _build_headline,
+    _build_period_label,
+    _fmt,
+    _fmt_precise,
+    _get_elapsed_ratio,
+)
+
+logger = logging.getLogger(__name__)
+
+
+_KPI_COLUMNS = {
+    'revenue': 'sales_by_split_usd',
+    'gross_profit': 'gross_profit_by_split_usd',
+    'gross_profit_1': 'gp1_by_split_usd',
+}
+
+_EMPTY_METRICS = {
+    'total_revenue': 0, 'total_gp': 0, 'total_gp1': 0,
+    'gp_percent': 0, 'total_invoices': 0, 'total_customers': 0,
+}
+
+
+# =============================================================================
+# PARTITIONS
+# =============================================================================
+
+class EmployeePartitions:
+    """
+    The four notification frames, each split once by employee id.
+
+    get() returns the same rows (and index) as _filter_by_employee, as a copy.
+    """
+
+    _ID_COLUMNS = {
+        'sales': 'sales_id',
+        'backlog': 'sales_id',
+        'ar': 'sales_id',
+        'targets': 'employee_id',
+    }
+
+    def __init__(
+        self,
+        sales_df: Optional[pd.DataFrame] = None,
+        backlog_detail_df: Optional[pd.DataFrame] = None,
+        ar_outstanding_df: Optional[pd.DataFrame] = None,
+        targets_df: Optional[pd.DataFrame] = None,
+    ):
+        sources = {
+            'sales': sales_df,
+            'backlog': backlog_detail_df,
+            'ar': ar_outstanding_df,
+            'targets': targets_df,
+        }
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self._positions: Dict[str, Dict] = {}
+
+        for name, df in sources.items():
+            id_col = self._ID_COLUMNS[name]
+            if df is None or df.empty or id_col not in df.columns:
+                self.frames[name] = pd.DataFrame()
+                self._positions[name] = {}
+            else:
+                self.frames[name] = df
+                self._positions[name] = df.groupby(id_col, sort=False).indices
+
+    def get(self, name: str, employee_id: int) -> pd.DataFrame:
+        """One employee's rows of frame `name` (empty frame if none)."""
+        df = self.frames[name]
+        if df.empty:
+            return pd.DataFrame()
+        pos = self._positions[name].get(employee_id)
+        if pos is None:
+            return df.iloc[:0].copy()
+        return df.take(pos)
+
+    def employee_ids(self, name: str) -> List:
+        return list(self._positions[name])
+
+
+# =============================================================================
+# GROUPED METRICS
+# =============================================================================
+
+def _overview_by_employee(sales: pd.DataFrame) -> Dict[int, Dict]:
+    """_calc_overview for every salesperson at once."""
+    if sales.empty:
+        return {}
+
+    g = sales.groupby('sales_id', sort=False)
+    table = pd.DataFrame(index=g.size().index)
+    for key, col in (('total_revenue', 'sales_by_split_usd'),
+                     ('total_gp', 'gross_profit_by_split_usd'),
+                     ('total_gp1', 'gp1_by_split_usd')):
+        table[key] = g[col].sum() if col in sales.columns else 0
+    table['total_invoices'] = g['inv_number'].nunique() if 'inv_number' in sales.columns else 0
+    table['total_customers'] = g['customer_id'].nunique() if 'customer_id' in sales.columns else 0
+
+    overview = {}
+    for eid, row in zip(table.index, table.to_dict('records')):
+        rev, gp = row['total_revenue'], row['total_gp']
+        row['gp_percent'] = (gp / rev * 100) if rev > 0 else 0
+        overview[eid] = row
+    return overview
+
+
+def _backlog_past_etd_alerts(backlog: pd.DataFrame) -> Dict[int, Dict]:
+    """_check_backlog_past_etd for every salesperson."""
+    if backlog.empty or 'etd' not in backlog.columns:
+        return {}
+
+    etd = pd.to_datetime(backlog['etd'], errors='coerce')
+    overdue = backlog[etd < pd.Timestamp(date.today())]
+    if overdue.empty:
+        return {}
+
+    g = overdue.groupby('sales_id', sort=False)
+    count = g['oc_number'].nunique() if 'oc_number' in overdue.columns else g.size()
+    if 'backlog_sales_by_split_usd' in overdue.columns:
+        value = g['backlog_sales_by_split_usd'].sum()
+    else:
+        value = pd.Series(0, index=count.index)
+
+    alerts = {}
+    for eid, n, v in zip(count.index, count.to_numpy(), value.reindex(count.index).to_numpy()):
+        if v < BACKLOG_OVERDUE_MIN_VALUE:
+            continue
+        alerts[eid] = {
+            'severity': 'high', 'icon': '🔴', 'category': 'backlog',
+            'message': f"{n} orders past ETD, total value {_fmt(v)} — follow up on delivery",
+        }
+    return alerts
+
+
+def _ar_window_totals(ar: pd.DataFrame, mask: pd.Series) -> pd.DataFrame:
+    """
+    Per-employee (amount, invoice count) of AR rows in mask — actual line
+    amounts, deduped within each employee exactly like _dedup_ar_lines.
+    """
+    window = ar[mask]
+    if window.empty:
+        return pd.DataFrame(columns=['amount', 'count'])
+
+    if 'unified_line_id' in window.columns:
+        window = window.drop_duplicates(subset=['sales_id', 'unified_line_id'], keep='first')
+    elif 'inv_number' in window.columns and 'product_pn' in window.columns:
+        window = window.drop_duplicates(subset=['sales_id', 'inv_number', 'product_pn'], keep='first')
+
+    g = window.groupby('sales_id', sort=False)
+    out_col = 'line_outstanding_usd' if 'line_outstanding_usd' in window.columns else 'outstanding_by_split_usd'
+    if out_col in window.columns:
+        amount = pd.to_numeric(window[out_col], errors='coerce').fillna(0).groupby(window['sales_id'], sort=False).sum()
+    else:
+        amount = g.size() * 0
+    count = g['inv_number'].nunique() if 'inv_number' in window.columns else g.size()
+    return pd.DataFrame({'amount': amount, 'count': count})
+
+
+def _ar_alerts(ar: pd.DataFrame) -> Tuple[Dict, Dict, Dict]:
+    """(_check_ar_overdue_90, _check_ar_overdue, _check_coming_due) for every salesperson."""
+    if ar.empty or 'due_date' not in ar.columns:
+        return {}, {}, {}
+
+    due = pd.to_datetime(ar['due_date'], errors='coerce')
+    today = pd.Timestamp(date.today())
+
+    overdue_90, overdue, coming_due = {}, {}, {}
+
+    totals = _ar_window_totals(ar, due < today - pd.Timedelta(days=90))
+    for eid, amount, count in totals.itertuples():
+        if amount >= AR_OVERDUE_90_THRESHOLD:
+            overdue_90[eid] = {
+                'severity': 'high', 'icon': '🔴', 'category': 'ar',
+                'message': f"{count} invoices overdue 90+ days, total {_fmt_precise(amount)} — escalate collection",
+            }
+
+    totals = _ar_window_totals(ar, due < today)
+    for eid, amount, count in totals.itertuples():
+        if amount >= AR_OVERDUE_THRESHOLD:
+            overdue[eid] = {
+                'severity': 'medium', 'icon': '🟡', 'category': 'ar',
+                'message': f"{count} overdue invoices, total {_fmt_precise(amount)} outstanding",
+            }
+
+    totals = _ar_window_totals(ar, (due >= today) & (due <= today + pd.Timedelta(days=COMING_DUE_DAYS)))
+    for eid, amount, count in totals.itertuples():
+        if amount > 0:
+            coming_due[eid] = {
+                'severity': 'low', 'icon': '🔵', 'category': 'payment_coming_due',
+                'message': f"{count} invoices ({_fmt_precise(amount)}) due within {COMING_DUE_DAYS} days — follow up on payment",
+            }
+
+    return overdue_90, overdue, coming_due
+
+
+def _kpi_alerts(
+    sales: pd.DataFrame,
+    targets: pd.DataFrame,
+    employee_ids: Iterable,
+    filters: Dict,
+) -> Dict[int, List[Dict]]:
+    """_check_kpi_behind for every salesperson (max 3 alerts each)."""
+    if targets.empty or sales.empty:
+        return {}
+
+    elapsed = _get_elapsed_ratio(filters)
+    if elapsed is None or elapsed < 0.15:
+        return {}
+    expected_pct = elapsed * 100
+
+    t = targets[targets['employee_id'].isin(list(employee_ids))]
+    if t.empty:
+        return {}
+
+    kpi_name = (t['kpi_name'].astype(str) if 'kpi_name' in t.columns
+                else pd.Series('', index=t.index)).str.lower().str.replace(' ', '_')
+    if 'annual_target_value_numeric' in t.columns:
+        annual = pd.to_numeric(t['annual_target_value_numeric'], errors='coerce')
+    else:
+        annual = pd.Series(0.0, index=t.index)
+
+    # Employees with no sales rows still count (actual = 0), as in the per-employee path
+    actual = pd.Series(float('nan'), index=t.index)
+    for key, col in _KPI_COLUMNS.items():
+        if col not in sales.columns:
+            continue
+        rows = kpi_name == key
+        if rows.any():
+            by_emp = sales.groupby('sales_id', sort=False)[col].sum()
+            actual[rows] = t.loc[rows, 'employee_id'].map(by_emp).fillna(0).to_numpy()
+
+    prorated = annual * elapsed
+    achievement = actual / prorated * 100
+    flagged = (annual > 0) & actual.notna() & (prorated > 0) & (achievement < KPI_WARNING_RATIO * 100)
+    if not flagged.any():
+        return {}
+
+    alerts: Dict[int, List[Dict]] = {}
+    for idx in t.index[flagged.to_numpy()]:
+        eid = t.at[idx, 'employee_id']
+        emp_alerts = alerts.setdefault(eid, [])
+        if len(emp_alerts) >= 3:
+            continue
+        display = kpi_name[idx].replace('_', ' ').title()
+        ach = achievement[idx]
+        if ach < KPI_CRITICAL_RATIO * 100:
+            message = (
+                f"{display}: {_fmt(actual[idx])} vs target {_fmt(prorated[idx])} "
+                f"({ach:.0f}% — expected ~{expected_pct:.0f}%)"
+            )
+        else:
+            message = f"{display} at {ach:.0f}% of prorated target"
+        emp_alerts.append({'severity': 'medium', 'icon': '🟡', 'category': 'kpi', 'message': message})
+    return alerts
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+
+def employee_name_map(sales_df: Optional[pd.DataFrame]) -> Dict[int, str]:
+    """sales_id → sales_name from the sales frame."""
+    if sales_df is None or sales_df.empty or 'sales_id' not in sales_df.columns or 'sales_name' not in sales_df.columns:
+        return {}
+    return sales_df.drop_duplicates('sales_id').set_index('sales_id')['sales_name'].to_dict()
+
+
+def build_bulletins(
+    partitions: EmployeePartitions,
+    employee_names: Dict[int, str],
+    active_filters: Dict,
+) -> Dict[int, Tuple[Dict, Dict]]:
+    """
+    collect_per_employee_bulletin() for every employee in employee_names
+
+    Returns:
+        {employee_id: (bulletin, overview_metrics)} in employee_names order
+    """
+    start = time.perf_counter()
+    sales = partitions.frames['sales']
+
+    overview = _overview_by_employee(sales)
+    backlog_alerts = _backlog_past_etd_alerts(partitions.frames['backlog'])
+    ar_90, ar_overdue, ar_coming = _ar_alerts(partitions.frames['ar'])
+    kpi_alerts = _kpi_alerts(sales, partitions.frames['targets'], employee_names, active_filters)
+    period_label = _build_period_label(active_filters)
+
+    results = {}
+    for eid, name in employee_names.items():
+        metrics = dict(overview.get(eid, _EMPTY_METRICS))
+
+        alerts: List[Dict] = []
+        # 🔴 Critical
+        if eid in backlog_alerts:
+            alerts.append(dict(backlog_alerts[eid]))
+        if eid in ar_90:
+            alerts.append(dict(ar_90[eid]))
+        # 🟡 Warning
+        alerts.extend(dict(a) for a in kpi_alerts.get(eid, []))
+        if eid in ar_overdue:
+            alerts.append(dict(ar_overdue[eid]))
+        # 🔵 Info
+        if eid in ar_coming:
+            alerts.append(dict(ar_coming[eid]))
+
+        bulletin = {
+            'headline': _build_headline(metrics, name),
+            'alerts': alerts,
+            'alert_count': len(alerts),
+            'has_critical': any(a['severity'] == 'high' for a in alerts),
+            'period_label': period_label,
+            'employee_id': eid,
+            'employee_name': name,
+        }
+        results[eid] = (bulletin, metrics)
+
+    logger.info(f"Built {len(results)} bulletins in {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def co_split_index(full_ar_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    One row per (customer, salesperson) of the full AR frame
+
+    _find_co_split_salespeople gives the same answer on this frame as on the
+    full one, without rescanning every AR line for every at-risk customer.
+    """
+    if full_ar_df is None or full_ar_df.empty or 'customer_id' not in full_ar_df.columns:
+        return full_ar_df
+    mask = full_ar_df['sales_id'].notna()
+    if 'is_unassigned' in full_ar_df.columns:
+        mask = mask & (full_ar_df['is_unassigned'] != 1)
+    return full_ar_df[mask].drop_duplicates(['customer_id', 'sales_id'])
+
+
+def build_warning_data(
+    partitions: EmployeePartitions,
+    bulletins: Dict[int, Tuple[Dict, Dict]],
+    full_ar_index: Optional[pd.DataFrame] = None,
+) -> Dict[int, Dict]:
+    """
+    collect_warning_data() for every employee in bulletins
+
+    Args:
+        partitions:    EmployeePartitions of the warning frames
+        bulletins:     Output of build_bulletins()
+        full_ar_index: co_split_index() of the full AR frame
+    """
+    start = time.perf_counter()
+    results = {}
+
+    for eid, (bulletin, metrics) in bulletins.items():
+        my_ar = partitions.get('ar', eid)
+        customers_at_risk = _build_customers_at_risk(my_ar, full_ar_df=full_ar_index, employee_id=eid)
+
+        all_co_split = {}
+        for cust in customers_at_risk:
+            for sp in cust.get('co_split_salespeople', []):
+                all_co_split.setdefault(sp['employee_id'], sp)
+
+        results[eid] = {
+            'bulletin': bulletin,
+            'metrics': metrics,
+            'ar_summary': _build_ar_aging_summary(my_ar),
+            'customers_at_risk': customers_at_risk,
+            'co_split_employees': list(all_co_split.values()),
+            # Raw filtered DataFrames (for Excel attachment)
+            'ar_df': my_ar,
+            'backlog_df': partitions.get('backlog', eid),
+            'sales_df': partitions.get('sales', eid),
+            'targets_df': partitions.get('targets', eid),
+        }
+
+    logger.info(f"Built {len(results)} warning datasets in {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def overdue_customer_counts(ar_df: Optional[pd.DataFrame]) -> Dict[int, int]:
+    """Distinct overdue customers per salesperson (days_overdue > 0)."""
+    if ar_df is None or ar_df.empty or not {'sales_id', 'days_overdue', 'customer'} <= set(ar_df.columns):
+        return {}
+    overdue = ar_df[pd.to_numeric(ar_df['days_overdue'], errors='coerce').fillna(0) > 0]
+    return overdue.groupby('sales_id', sort=False)['customer'].nunique().to_dict()
+
+
+# =============================================================================
+# RENDER JOBS (run in utils.render_pool workers — module-level, picklable args)
+# =============================================================================
+
+def _render_bulletin_job(
+    bulletin: Dict,
+    active_filters: Dict,
+    metrics: Optional[Dict],
+    sender_name: str,
+    dashboard_url: str,
+    cc_note: str,
+) -> Dict:
+    from .email_builder import build_bulletin_email, build_bulletin_plain_text
+
+    subject, html_body = build_bulletin_email(
+        bulletin=bulletin,
+        active_filters=active_filters,
+        overview_metrics=metrics,
+        sender_name=sender_name,
+        dashboard_url=dashboard_url,
+        cc_note=cc_note,
+    )
+    return {
+        'subject': subject,
+        'html': html_body,
+        'plain_text': build_bulletin_plain_text(bulletin),
+    }
+
+
+def _render_warning_job(
+    warning_data: Dict,
+    active_filters: Dict,
+    sender_name: str,
+    dashboard_url: str,
+    cc_note: str,
+    consequences: Optional[List[tuple]],
+    deadline_days: int,
+    lang: str,
+) -> Dict:
+    from .alert_data_collector import generate_warning_excel
+    from .email_builder import build_warning_email, build_warning_plain_text
+
+    excel_path = None
+    try:
+        excel_path = generate_warning_excel(warning_data=warning_data, active_filters=active_filters, lang=lang)
+    except Exception as e:
+        logger.warning(f"Excel generation failed for {warning_data.get('bulletin', {}).get('employee_name')}: {e}")
+
+    subject, html_body = build_warning_email(
+        warning_data=warning_data,
+        active_filters=active_filters,
+        sender_name=sender_name,
+        dashboard_url=dashboard_url,
+        cc_note=cc_note,
+        consequences=consequences,
+        deadline_days=deadline_days,
+        lang=lang,
+        has_attachment=bool(excel_path),
+    )
+    return {
+        'subject': subject,
+        'html': html_body,
+        'plain_text': build_warning_plain_text(warning_data, deadline_days, lang=lang),
+        'excel_path': excel_path,
+    }
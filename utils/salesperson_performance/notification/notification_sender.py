@@ -31,7 +31,8 @@ Usage:
     else:
         st.error(result.message)
 
-VERSION: 2.0.0 — Added send_warning_to_selected()
+VERSION: 2.1.0 — Bulletins / warning data built in one pass (bulletin_batch),
+  emails + Excel rendered in utils.render_pool and sent as they finish
 """
 
 import logging
@@ -106,11 +107,11 @@ def send_bulletin_to_team(
         NotificationResult with per-recipient details
     """
     import time
-    import pandas as pd
 
     # Lazy imports
+    from utils.render_pool import render_iter
     from .email_service import EmailService
-    from .email_builder import build_bulletin_email, build_bulletin_plain_text
+    from .bulletin_batch import _render_bulletin_job
     from .recipient_resolver import resolve_recipients_batch
 
     start = time.perf_counter()
@@ -159,14 +160,12 @@ def send_bulletin_to_team(
         sales_df is not None and not sales_df.empty
     )
 
-    if has_per_employee_data:
-        from .alert_data_collector import collect_per_employee_bulletin
-
-    # --- 5. Send per-salesperson ---
+    # --- 5. Resolve who gets an email (skips recorded up front) ---
     details = []
     sent_count = 0
     failed_count = 0
     skipped_count = 0
+    eligible = {}
 
     for eid in employee_ids:
         info = recipients_map.get(eid)
@@ -203,22 +202,26 @@ def send_bulletin_to_team(
                 skipped_count += 1
                 continue
 
-        # ─── Build per-employee content ───
-        if has_per_employee_data:
-            # INDIVIDUALIZED: filter data for this employee
-            emp_bulletin, emp_metrics = collect_per_employee_bulletin(
-                employee_id=eid,
-                employee_name=info.sales_name,
-                sales_df=sales_df,
-                backlog_detail_df=backlog_detail_df if backlog_detail_df is not None else pd.DataFrame(),
-                ar_outstanding_df=ar_outstanding_df if ar_outstanding_df is not None else pd.DataFrame(),
-                targets_df=targets_df if targets_df is not None else pd.DataFrame(),
-                active_filters=active_filters,
-            )
-        else:
-            # FALLBACK: team-level bulletin
-            emp_bulletin = bulletin
-            emp_metrics = overview_metrics
+        eligible[eid] = info
+
+    # --- 6. Build per-employee content (one partition pass for everyone) ---
+    if has_per_employee_data and eligible:
+        from .bulletin_batch import EmployeePartitions, build_bulletins
+
+        # INDIVIDUALIZED: each salesperson's own data
+        partitions = EmployeePartitions(sales_df, backlog_detail_df, ar_outstanding_df, targets_df)
+        content = build_bulletins(
+            partitions, {eid: info.sales_name for eid, info in eligible.items()}, active_filters,
+        )
+    else:
+        # FALLBACK: team-level bulletin
+        content = {eid: (bulletin, overview_metrics) for eid in eligible}
+
+    # --- 7. Render emails in the worker pool ---
+    jobs = {}
+    cc_lists = {}
+    for eid, info in eligible.items():
+        emp_bulletin, emp_metrics = content[eid]
 
         # ─── CC note for manager ───
         cc_note = ""
@@ -239,26 +242,34 @@ def send_bulletin_to_team(
                 cc_list.append(mcc)
                 cc_list_named.append(mcc)
 
-        # ─── Build HTML email ───
-        subject, html_body = build_bulletin_email(
-            bulletin=emp_bulletin,
-            active_filters=active_filters,
-            overview_metrics=emp_metrics,
-            sender_name=sender_name,
-            dashboard_url=dashboard_url,
-            cc_note=cc_note,
-        )
-        plain_text = build_bulletin_plain_text(emp_bulletin)
+        cc_lists[eid] = (cc_list, cc_list_named)
+        jobs[eid] = (emp_bulletin, active_filters, emp_metrics, sender_name, dashboard_url, cc_note)
+
+    # --- 8. Send each email as soon as it is rendered ---
+    for eid, rendered in render_iter(_render_bulletin_job, jobs):
+        info = eligible[eid]
+        cc_list, cc_list_named = cc_lists[eid]
+
+        if rendered is None:
+            failed_count += 1
+            details.append({
+                "employee_id": eid,
+                "name": info.sales_name,
+                "status": "failed",
+                "to": info.sales_email,
+                "error": "Could not build email",
+            })
+            continue
 
         # Append employee name to subject
-        personal_subject = f"{subject} — {info.sales_name}"
+        personal_subject = f"{rendered['subject']} — {info.sales_name}"
 
         # ─── Send ───
         result = svc.send(
             to=info.to_list,
             subject=personal_subject,
-            html=html_body,
-            plain_text=plain_text,
+            html=rendered['html'],
+            plain_text=rendered['plain_text'],
             cc=cc_list,
             to_display=info.to_list_named,
             cc_display=cc_list_named if cc_list else None,
@@ -266,7 +277,7 @@ def send_bulletin_to_team(
 
         if result.success:
             sent_count += 1
-            alert_count = emp_bulletin.get('alert_count', 0)
+            alert_count = content[eid][0].get('alert_count', 0)
             details.append({
                 "employee_id": eid,
                 "name": info.sales_name,
@@ -293,7 +304,7 @@ def send_bulletin_to_team(
 
     elapsed = round(time.perf_counter() - start, 2)
 
-    # --- 5b. Write to notification_log (non-blocking) ---
+    # --- 9. Write to notification_log (non-blocking) ---
     try:
         from .send_log import log_send_batch
         triggered_by_id = None
@@ -306,7 +317,7 @@ def send_bulletin_to_team(
     except Exception as e:
         logger.debug(f"Could not write send log: {e}")
 
-    # --- 6. Build summary ---
+    # --- 10. Build summary ---
     mode = "individualized" if has_per_employee_data else "team bulletin"
     if sent_count > 0 and failed_count == 0:
         success = True
@@ -379,12 +390,14 @@ def send_warning_to_selected(
     """
     import os
     import time
-    import pandas as pd
 
+    from utils.render_pool import render_iter
     from .email_service import EmailService
-    from .email_builder import build_warning_email, build_warning_plain_text
     from .recipient_resolver import resolve_recipients_batch
-    from .alert_data_collector import collect_warning_data, generate_warning_excel
+    from .bulletin_batch import (
+        EmployeePartitions, build_bulletins, build_warning_data, co_split_index,
+        _render_warning_job,
+    )
 
     start = time.perf_counter()
 
@@ -426,12 +439,13 @@ def send_warning_to_selected(
         (additional_cc or []) + (external_cc or [])
     ))
 
-    # --- 6. Send per-salesperson ---
+    # --- 6. Resolve who gets an email (skips recorded up front) ---
     details = []
     sent_count = 0
     failed_count = 0
     skipped_count = 0
     temp_files = []  # Track temp Excel files for cleanup
+    eligible = {}
 
     for eid in employee_ids:
         info = recipients_map.get(eid)
@@ -463,36 +477,25 @@ def send_warning_to_selected(
                 skipped_count += 1
                 continue
 
+        eligible[eid] = info
+
+    # --- 7. Collect warning data for everyone (frames partitioned once) ---
+    partitions = EmployeePartitions(sales_df, backlog_detail_df, ar_outstanding_df, targets_df)
+    bulletins = build_bulletins(
+        partitions, {eid: info.sales_name for eid, info in eligible.items()}, active_filters,
+    )
+    # Full AR (reduced to customer × salesperson) for co-split lookup
+    warning_data_map = build_warning_data(partitions, bulletins, co_split_index(ar_outstanding_df))
+
+    # --- 8. Render emails + Excel attachments in the worker pool ---
+    jobs = {}
+    emails = {}
+    for eid, info in eligible.items():
         # ─── Resolve language (preference > default) ───
         emp_lang = default_lang
         if prefs_cache and eid in prefs_cache:
             emp_lang = prefs_cache[eid].get('all', {}).get('language', default_lang) or default_lang
 
-        # ─── Collect warning data (with full AR for co-split lookup) ───
-        warning_data = collect_warning_data(
-            employee_id=eid,
-            employee_name=info.sales_name,
-            sales_df=sales_df if sales_df is not None else pd.DataFrame(),
-            backlog_detail_df=backlog_detail_df if backlog_detail_df is not None else pd.DataFrame(),
-            ar_outstanding_df=ar_outstanding_df if ar_outstanding_df is not None else pd.DataFrame(),
-            targets_df=targets_df if targets_df is not None else pd.DataFrame(),
-            active_filters=active_filters,
-            full_ar_df=ar_outstanding_df,  # Full AR for co-split lookup
-        )
-
-        # ─── Generate Excel attachment ───
-        excel_path = None
-        try:
-            excel_path = generate_warning_excel(
-                warning_data=warning_data,
-                active_filters=active_filters,
-                lang=emp_lang,
-            )
-            if excel_path:
-                temp_files.append(excel_path)
-        except Exception as e:
-            logger.warning(f"Excel generation failed for {info.sales_name}: {e}")
-
         # ─── TO/CC: Single recipient per email ───
         # Each salesperson gets their own email. Co-split info is shown in
         # the email body (customers_at_risk.co_split_salespeople) so they
@@ -527,27 +530,38 @@ def send_warning_to_selected(
         if combined_extra_cc:
             cc_note += f" + {len(combined_extra_cc)} additional"
 
-        # ─── Build email (bilingual) ───
-        subject, html_body = build_warning_email(
-            warning_data=warning_data,
-            active_filters=active_filters,
-            sender_name=sender_name,
-            dashboard_url=dashboard_url,
-            cc_note=cc_note,
-            consequences=consequences,
-            deadline_days=deadline_days,
-            lang=emp_lang,
-            has_attachment=bool(excel_path),
+        emails[eid] = (emp_lang, cc_list, cc_display_list)
+        jobs[eid] = (
+            warning_data_map[eid], active_filters, sender_name, dashboard_url, cc_note,
+            consequences, deadline_days, emp_lang,
         )
-        plain_text = build_warning_plain_text(warning_data, deadline_days, lang=emp_lang)
+
+    # --- 9. Send each email as soon as it is rendered ---
+    for eid, rendered in render_iter(_render_warning_job, jobs):
+        info = eligible[eid]
+        emp_lang, cc_list, cc_display_list = emails[eid]
+        warning_data = warning_data_map[eid]
+
+        if rendered is None:
+            failed_count += 1
+            details.append({
+                "employee_id": eid, "name": info.sales_name,
+                "status": "failed", "to": info.sales_email,
+                "error": "Could not build email",
+            })
+            continue
+
+        excel_path = rendered['excel_path']
+        if excel_path:
+            temp_files.append(excel_path)
 
         # ─── Send (with Excel attachment if available) ───
         attachments = [excel_path] if excel_path else None
         result = svc.send(
             to=info.to_list,
-            subject=subject,
-            html=html_body,
-            plain_text=plain_text,
+            subject=rendered['subject'],
+            html=rendered['html'],
+            plain_text=rendered['plain_text'],
             cc=cc_list,
             attachments=attachments,
             to_display=info.to_list_named,
@@ -564,7 +578,7 @@ def send_warning_to_selected(
                 "status": "sent", "to": info.sales_email,
                 "cc": ", ".join(cc_list) if cc_list else None,
                 "alerts": alert_count, "overdue": overdue,
-                "subject": subject, "lang": emp_lang,
+                "subject": rendered['subject'], "lang": emp_lang,
                 "has_excel": bool(excel_path),
                 "elapsed": result.elapsed_seconds,
             })
@@ -582,7 +596,7 @@ def send_warning_to_selected(
 
     elapsed = round(time.perf_counter() - start, 2)
 
-    # --- 7. Cleanup temp Excel files + temp dirs ---
+    # --- 10. Cleanup temp Excel files + temp dirs ---
     for tmp_path in temp_files:
         try:
             tmp_dir = os.path.dirname(tmp_path)
@@ -591,7 +605,7 @@ def send_warning_to_selected(
         except Exception:
             pass
 
-    # --- 8. Audit log ---
+    # --- 11. Audit log ---
     try:
         from .send_log import log_send_batch
         triggered_by_id = None
@@ -607,7 +621,7 @@ def send_warning_to_selected(
     except Exception as e:
         logger.debug(f"Could not write send log: {e}")
 
-    # --- 9. Summary ---
+    # --- 12. Summary ---
     if sent_count > 0 and failed_count == 0:
         msg = f"✅ Warning sent to {sent_count} salesperson(s)"
         if skipped_count:
@@ -38,7 +38,16 @@ v3.1 CHANGES:
   (e.g. 'Ánh Phan [INACTIVE]'), not 'Unassigned'. Name-based check missed them.
 - Affects: Level 1 salesperson summary + Level 2 drill-down categorization
 
-VERSION: 4.0.0
+v4.1 CHANGES:
+- ar_summary_section: one groupby over salespeople instead of a boolean
+  mask + sums per salesperson
+- _dedup_for_actual_amounts: uses the AR snapshot _line_key when present
+
+v4.2 CHANGES:
+- Invoice documents rendered via utils.doc_links.render_doc_list: all links
+  signed in one cached batch; long lists sign on click
+
+VERSION: 4.2.0
 """
 
 import logging
@@ -57,6 +66,7 @@ from .payment_analysis import (
     ACTUAL_REVENUE_COL,
     _fmt_currency,
 )
+from utils.doc_links import render_doc_list
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +83,8 @@ def _dedup_for_actual_amounts(df: pd.DataFrame) -> pd.DataFrame:
     invoices have duplicate rows (1 per split) with the same actual amount.
     Summing without dedup would double-count.
     """
+    if '_line_key' in df.columns:
+        return df.drop_duplicates(subset='_line_key', keep='first')
     if 'si_line_id' in df.columns:
         return df.drop_duplicates(subset='si_line_id', keep='first')
     elif 'unified_line_id' in df.columns:
@@ -92,12 +104,6 @@ def _fmt_days(d) -> str:
     return "due today"
 
 
-def _get_file_icon(filename: str) -> str:
-    """Get emoji icon based on file type."""
-    ext = filename.split('.')[-1].lower() if '.' in filename else ''
-    return {'pdf': '📄', 'png': '🖼️', 'jpg': '🖼️', 'jpeg': '🖼️'}.get(ext, '📎')
-
-
 # =============================================================================
 # LEVEL 1 ONLY: AR SUMMARY (for combined Invoice Detail tab)
 # =============================================================================
@@ -127,61 +133,55 @@ def ar_summary_section(
     line_out_col = LINE_OUTSTANDING_COL if has_line_outstanding else out_col
     today = pd.Timestamp(date.today())
 
-    has_unassigned_col = 'is_unassigned' in pay_df.columns
-    sp_list = sorted(pay_df['sales_name'].unique().tolist())
-
-    assigned_metrics = []
-    unassigned_metrics = []
-
-    for sp_name in sp_list:
-        sp_data = pay_df[pay_df['sales_name'] == sp_name]
-
-        if has_unassigned_col:
-            is_unassigned = sp_data['is_unassigned'].max() == 1
-        else:
-            is_unassigned = sp_name == 'Unassigned'
-
-        outstanding = sp_data[line_out_col].sum() if is_unassigned else sp_data[out_col].sum()
-        collected = sp_data['collected_usd'].sum() if not is_unassigned else 0
-        invoiced = sp_data[REV_COL].sum() if not is_unassigned else sp_data[line_out_col].sum()
-
-        n_customers = sp_data['customer'].nunique()
-        n_invoices = sp_data['inv_number'].nunique() if 'inv_number' in sp_data.columns else len(sp_data)
-
-        if 'due_date' in sp_data.columns:
-            use_col = out_col if not is_unassigned else line_out_col
-            overdue_mask = (
-                sp_data['due_date'].notna() &
-                (sp_data['due_date'] < today) &
-                (sp_data[use_col] > 0.01)
-            )
-            overdue_amount = sp_data.loc[overdue_mask, use_col].sum()
-        else:
-            overdue_amount = 0
-
-        collection_rate = None if is_unassigned else (collected / invoiced if invoiced > 0 else 0)
-
-        row = {
-            'sales_name': sp_name,
-            'outstanding': outstanding,
-            'collected': collected,
-            'invoiced': invoiced,
-            'collection_rate': collection_rate,
-            'overdue': overdue_amount,
-            'customers': n_customers,
-            'invoices': n_invoices,
-            'is_unassigned': is_unassigned,
-        }
-
-        if is_unassigned:
-            unassigned_metrics.append(row)
-        else:
-            assigned_metrics.append(row)
-
-    sp_summary = pd.DataFrame(assigned_metrics + unassigned_metrics)
+    # v4.1: single grouped pass — per-salesperson sums for both the split
+    # and the actual-line amount columns, then pick per row by is_unassigned
+    work = pd.DataFrame({
+        'sales_name': pay_df['sales_name'],
+        'out': pay_df[out_col],
+        'line_out': pay_df[line_out_col],
+        'collected': pay_df['collected_usd'],
+        'rev': pay_df[REV_COL],
+        'customer': pay_df['customer'],
+    })
+    if 'is_unassigned' in pay_df.columns:
+        work['ua'] = pay_df['is_unassigned'].fillna(0) == 1
+    else:
+        work['ua'] = pay_df['sales_name'] == 'Unassigned'
+    if 'due_date' in pay_df.columns:
+        due = pd.to_datetime(pay_df['due_date'], errors='coerce')
+        past_due = due.notna() & (due < today)
+        work['overdue_out'] = work['out'].where(past_due & (work['out'] > 0.01), 0)
+        work['overdue_line'] = work['line_out'].where(past_due & (work['line_out'] > 0.01), 0)
+    else:
+        work['overdue_out'] = 0
+        work['overdue_line'] = 0
+
+    grouped = work.groupby('sales_name', sort=True)
+    agg = grouped[['out', 'line_out', 'collected', 'rev', 'overdue_out', 'overdue_line']].sum()
+    agg['is_unassigned'] = grouped['ua'].max()
+    agg['customers'] = grouped['customer'].nunique()
+    if 'inv_number' in pay_df.columns:
+        agg['invoices'] = pay_df.groupby('sales_name', sort=True)['inv_number'].nunique()
+    else:
+        agg['invoices'] = grouped.size()
+
+    ua = agg['is_unassigned']
+    sp_summary = pd.DataFrame({
+        'sales_name': agg.index,
+        'outstanding': np.where(ua, agg['line_out'], agg['out']),
+        'collected': np.where(ua, 0, agg['collected']),
+        'invoiced': np.where(ua, agg['line_out'], agg['rev']),
+        'overdue': np.where(ua, agg['overdue_line'], agg['overdue_out']),
+        'customers': agg['customers'].to_numpy(),
+        'invoices': agg['invoices'].to_numpy(),
+        'is_unassigned': ua.to_numpy(dtype=bool),
+    })
     if sp_summary.empty:
         return
 
+    rate = (sp_summary['collected'] / sp_summary['invoiced'].where(sp_summary['invoiced'] > 0)).fillna(0)
+    sp_summary['collection_rate'] = rate.astype(object).where(~sp_summary['is_unassigned'], None)
+
     sp_summary = sp_summary.sort_values('outstanding', ascending=False).reset_index(drop=True)
 
     # --- Assigned Salesperson Table ---
@@ -891,48 +891,5 @@ def _render_invoice_documents(
         st.caption("No documents attached to this invoice")
         return
 
-    # Group by doc_type
-    inv_docs = docs_df[docs_df['doc_type'] == 'invoice'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-    pmt_docs = docs_df[docs_df['doc_type'] == 'payment'] if 'doc_type' in docs_df.columns else pd.DataFrame()
-
-    # Render invoice documents
-    if not inv_docs.empty:
-        st.markdown(f"**📄 Invoice Documents** ({len(inv_docs)})")
-        for _, doc in inv_docs.iterrows():
-            _render_doc_link(doc, s3_url_generator)
-
-    # Render payment receipt documents
-    if not pmt_docs.empty:
-        st.markdown(f"**💳 Payment Receipts** ({len(pmt_docs)})")
-        for _, doc in pmt_docs.iterrows():
-            pmt_label = f" ({doc['payment_number']})" if pd.notna(doc.get('payment_number')) else ""
-            _render_doc_link(doc, s3_url_generator, extra_label=pmt_label)
-
-    if inv_docs.empty and pmt_docs.empty:
-        st.markdown("**📎 Documents**")
-        for _, doc in docs_df.iterrows():
-            _render_doc_link(doc, s3_url_generator)
-
-
-def _render_doc_link(doc: pd.Series, s3_url_generator: Callable = None, extra_label: str = ""):
-    """Render a single document link with icon and presigned URL."""
-    filename = doc.get('filename', 'Unknown')
-    s3_key = doc.get('s3_key', '')
-    icon = _get_file_icon(filename)
-    inv_num = doc.get('invoice_number', '')
-
-    if s3_url_generator and s3_key:
-        try:
-            url = s3_url_generator(s3_key)
-            if url:
-                st.markdown(
-                    f"{icon} [{filename}]({url}){extra_label} "
-                    f"— {inv_num}",
-                    unsafe_allow_html=False,
-                )
-                return
-        except Exception as e:
-            logger.warning(f"Failed to generate URL for {s3_key}: {e}")
-
-    # Fallback: show filename without link
-    st.caption(f"{icon} {filename}{extra_label} — {inv_num} (S3: {s3_key})")
\ No newline at end of file
+    # All links signed in one cached batch (lazy above LAZY_THRESHOLD docs)
+    render_doc_list(docs_df, s3_url_generator, key_prefix=f"{fragment_key}_{inv_number}")
@@ -55,6 +55,7 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 
+from utils.perf import traced_fragment
 from .payment_analysis import (
     analyze_payments,
     render_payment_section,
@@ -187,7 +188,7 @@ def _group_by_invoice(df: pd.DataFrame) -> pd.DataFrame:
 # TAB-LEVEL FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def payment_tab_fragment(
     sales_df: pd.DataFrame,
     filter_values: Dict = None,
@@ -18,8 +18,12 @@ DATA SOURCE (v2.0):
   Fallback proxy (revenue × ratio) is only triggered if pre-calculated columns
   are missing — this should only happen with legacy callers.
 
-VERSION: 2.1.0
+VERSION: 2.2.0
 CHANGELOG:
+- v2.2.0: Reads AR snapshot columns built once per load (utils.ar_snapshot)
+          - _status: categorical codes instead of row-wise .apply()
+          - deduplicate_ar_lines() drops on the precomputed _line_key
+          - _calculate_aging() delegates to ar_snapshot.aging_table()
 - v2.1.0: FIXED AR overcount when viewing multiple salespeople
           - Added deduplicate_ar_lines() utility function
           - analyze_payments() now accepts selected_employee_ids parameter
@@ -36,6 +40,12 @@ import numpy as np
 import streamlit as st
 import altair as alt
 
+from utils.ar_snapshot import (
+    normalize_status,
+    status_codes,
+    aging_table,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,24 +70,6 @@ LINE_OUTSTANDING_COL = 'line_outstanding_usd'
 LINE_COLLECTED_COL = 'line_collected_usd'
 ACTUAL_REVENUE_COL = 'calculated_invoiced_amount_usd'
 
-# Aging buckets based on days PAST DUE (due_date), not invoice date
-# Negative = not yet due, 0+ = overdue
-AGING_BUCKETS_OVERDUE = [
-    ('Not Yet Due', -999999, -1),
-    ('0-30 days overdue', 0, 30),
-    ('31-60 days overdue', 31, 60),
-    ('61-90 days overdue', 61, 90),
-    ('90+ days overdue', 91, 999999),
-]
-
-# Fallback: aging by invoice age (when due_date not available)
-AGING_BUCKETS_BY_INV_DATE = [
-    ('Current (0-30)', 0, 30),
-    ('31-60 days', 31, 60),
-    ('61-90 days', 61, 90),
-    ('90+ days', 91, 999999),
-]
-
 # Alert thresholds
 OVERDUE_90_THRESHOLD_USD = 10000     # Alert if 90+ overdue > $10K
 COLLECTION_RATE_LOW = 0.70           # Alert if collection rate < 70%
@@ -112,16 +104,7 @@ def _fmt_currency(value: float) -> str:
 
 def _normalize_status(val) -> str:
     """Normalize payment_status to standard category."""
-    if pd.isna(val):
-        return 'unknown'
-    s = str(val).strip().lower()
-    if 'fully' in s or s == 'paid':
-        return 'fully_paid'
-    elif 'partial' in s:
-        return 'partially_paid'
-    elif 'unpaid' in s or 'open' in s or 'pending' in s:
-        return 'unpaid'
-    return 'unknown'
+    return normalize_status(val)
 
 
 # =============================================================================
@@ -152,8 +135,10 @@ def deduplicate_ar_lines(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
 
-    # --- pick dedup key ---
-    if 'unified_line_id' in df.columns:
+    # --- pick dedup key (v2.2.0: precomputed by build_ar_snapshot) ---
+    if '_line_key' in df.columns:
+        key = '_line_key'
+    elif 'unified_line_id' in df.columns:
         key = 'unified_line_id'
     elif 'si_line_id' in df.columns:
         key = 'si_line_id'
@@ -251,8 +236,9 @@ def analyze_payments(
     if 'due_date' in df.columns:
         df['due_date'] = pd.to_datetime(df['due_date'], errors='coerce')
 
-    # Normalize status
-    df['_status'] = df['payment_status'].apply(_normalize_status)
+    # Normalize status (already categorical if the AR snapshot was built at load)
+    if '_status' not in df.columns:
+        df['_status'] = status_codes(df['payment_status'])
 
     # =========================================================================
     # LINE-LEVEL USD CALCULATION
@@ -327,7 +313,7 @@ def analyze_payments(
     # Count by status (invoice-level dedup for counts)
     has_inv_number = 'inv_number' in df_company.columns
     if has_inv_number:
-        inv_status = df_company.groupby('inv_number')['_status'].first()
+        inv_status = df_company.groupby('inv_number', sort=False)['_status'].first()
         fully_paid_invoices = (inv_status == 'fully_paid').sum()
         partial_invoices = (inv_status == 'partially_paid').sum()
         unpaid_invoices = (inv_status == 'unpaid').sum()
@@ -339,7 +325,7 @@ def analyze_payments(
         total_invoices = len(df_company)
 
     # Revenue breakdown by status category
-    status_rev = df_company.groupby('_status').agg(
+    status_rev = df_company.groupby('_status', observed=True).agg(
         invoiced=(REV_COL, 'sum'),
         collected=('_collected_usd', 'sum'),
         outstanding=('_outstanding_usd', 'sum'),
@@ -413,100 +399,9 @@ def _calculate_aging(
     v2.0: If pre-calculated aging_bucket column exists (from AR view),
     use it directly. Otherwise fall back to computing from dates.
     Uses due_date (overdue days) if available, else inv_date (invoice age).
+    v2.2.0: Vectorized in ar_snapshot.aging_table() (bincount on bucket codes).
     """
-    if outstanding_df.empty:
-        return pd.DataFrame(columns=['bucket', 'amount', 'gp', 'count', 'share'])
-
-    df = outstanding_df.copy()
-    today_ts = pd.Timestamp(today)
-    total_outstanding = df['_outstanding_usd'].sum()
-
-    # -----------------------------------------------------------------
-    # FAST PATH: Use pre-calculated aging_bucket from AR view
-    # -----------------------------------------------------------------
-    if PRECALC_AGING_BUCKET_COL in df.columns and df[PRECALC_AGING_BUCKET_COL].notna().any():
-        # Use SQL-calculated aging buckets directly
-        agg_dict = {
-            'amount': ('_outstanding_usd', 'sum'),
-            'count': ('_outstanding_usd', 'count'),
-        }
-        if '_outstanding_gp' in df.columns:
-            agg_dict['gp'] = ('_outstanding_gp', 'sum')
-
-        result = df.groupby(PRECALC_AGING_BUCKET_COL).agg(**agg_dict).reset_index()
-        result.rename(columns={PRECALC_AGING_BUCKET_COL: 'bucket'}, inplace=True)
-
-        if 'gp' not in result.columns:
-            result['gp'] = 0
-
-        result['share'] = np.where(
-            total_outstanding > 0,
-            result['amount'] / total_outstanding,
-            0
-        )
-
-        # Define display order and min_days for downstream compatibility
-        bucket_order = {
-            'Not Yet Due': (-999999, -1),
-            'No Due Date': (-999998, -1),
-            '1-30 days overdue': (1, 30),
-            '31-60 days overdue': (31, 60),
-            '61-90 days overdue': (61, 90),
-            '90+ days overdue': (91, 999999),
-        }
-        result['_order'] = result['bucket'].map(
-            {k: i for i, k in enumerate(bucket_order.keys())}
-        ).fillna(99)
-        result['min_days'] = result['bucket'].map(
-            lambda b: bucket_order.get(b, (0, 0))[0]
-        )
-        result['max_days'] = result['bucket'].map(
-            lambda b: bucket_order.get(b, (0, 0))[1]
-        )
-
-        result = result.sort_values('_order').drop(columns=['_order'])
-        result = result[result['amount'] > 0.01].reset_index(drop=True)
-        result.attrs['aging_mode'] = 'overdue'
-        return result
-
-    # -----------------------------------------------------------------
-    # FALLBACK: Calculate aging from date columns (period mode)
-    # -----------------------------------------------------------------
-    has_due_date = 'due_date' in df.columns and df['due_date'].notna().any()
-
-    if has_due_date:
-        df['_aging_days'] = (today_ts - df['due_date']).dt.days
-        buckets = AGING_BUCKETS_OVERDUE
-        aging_mode = 'overdue'
-    else:
-        df['_aging_days'] = (today_ts - df['inv_date']).dt.days.clip(lower=0)
-        buckets = AGING_BUCKETS_BY_INV_DATE
-        aging_mode = 'invoice_age'
-
-    rows = []
-
-    for bucket_name, min_d, max_d in buckets:
-        mask = (df['_aging_days'] >= min_d) & (df['_aging_days'] <= max_d)
-        bucket_df = df[mask]
-        amount = bucket_df['_outstanding_usd'].sum()
-        gp = bucket_df['_outstanding_gp'].sum() if '_outstanding_gp' in bucket_df.columns else 0
-        count = len(bucket_df)
-        share = (amount / total_outstanding) if total_outstanding > 0 else 0
-
-        rows.append({
-            'bucket': bucket_name,
-            'min_days': min_d,
-            'max_days': max_d,
-            'amount': amount,
-            'gp': gp,
-            'count': count,
-            'share': share,
-        })
-
-    result = pd.DataFrame(rows)
-    result = result[result['amount'] > 0.01].reset_index(drop=True)
-    result.attrs['aging_mode'] = aging_mode
-    return result
+    return aging_table(outstanding_df, today)
 
 
 # =============================================================================
@@ -99,7 +99,7 @@ import streamlit as st
 from sqlalchemy import text
 import time
 
-from utils.db import get_db_engine
+from utils.db import cached_query, get_read_engine
 from .constants import CACHE_TTL_SECONDS
 from .access_control import AccessControl
 
@@ -244,14 +244,11 @@ class SalespersonQueries:
             access_control: AccessControl instance for filtering
         """
         self.access = access_control
-        self._engine = None
     
     @property
     def engine(self):
-        """Lazy load database engine."""
-        if self._engine is None:
-            self._engine = get_db_engine()
-        return self._engine
+        """Read replica engine, resolved per query (read-your-writes routing)."""
+        return get_read_engine()
     
     # =========================================================================
     # CORE SALES DATA
@@ -1354,6 +1351,7 @@ class SalespersonQueries:
     # HELPER METHODS
     # =========================================================================
     
+    @cached_query()
     def _execute_query(
         self, 
         query: str, 
@@ -1415,7 +1413,7 @@ def _get_sales_data_cached(
     Note: Uses tuple for cache key compatibility.
     """
     start_time = time.perf_counter()
-    engine = get_db_engine()
+    engine = get_read_engine()
     
     query = """
         SELECT 
@@ -1517,7 +1515,7 @@ def get_kpi_type_weights_cached() -> Dict[str, int]:
         Dict mapping kpi_name (lowercase) to default_weight
     """
     start_time = time.perf_counter()
-    engine = get_db_engine()
+    engine = get_read_engine()
     
     query = """
         SELECT 
@@ -7,6 +7,9 @@ UI Fragments for Setup Tab - Salesperson Performance
 2. KPI Assignments - CRUD for sales_employee_kpi_assignments
 3. Salespeople - List/manage salespeople
 
+v2.3.0: Independent reads run concurrently through utils.async_db.call_all:
+        - Split Rules filters: years + 6 dropdowns in one batch
+        - Tab badges: split stats + assignment issues in one batch
 v2.2.1: FIX - Edit Split Rule dialog shows wrong salesperson:
         - Streamlit persists selectbox values by key in session_state
         - Opening Edit for rule A then rule B would show rule A's salesperson
@@ -30,7 +33,9 @@ import pandas as pd
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from utils.perf import traced_fragment
 from .queries import SalespersonSetupQueries
+from utils.async_db import call_all
 
 
 # =============================================================================
@@ -464,6 +469,11 @@ def _render_authorization_info(current_role: str):
         """)
 
 
+def _frame_or_empty(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """call_all gives None for a loader that raised."""
+    return df if df is not None else pd.DataFrame()
+
+
 def format_currency(value: float, decimals: int = 0) -> str:
     """Format value as USD currency."""
     if pd.isna(value) or value == 0:
@@ -515,7 +525,7 @@ def get_period_warning(valid_to) -> tuple:
 # MAIN SETUP TAB FRAGMENT
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def setup_tab_fragment(
     sales_split_df: pd.DataFrame = None,  # DEPRECATED v1.9.0 - data fetched internally
     sales_df: pd.DataFrame = None,         # DEPRECATED v1.9.0 - not used
@@ -643,16 +653,20 @@ def setup_tab_fragment(
     can_approve = user_role_lower in ['admin', 'sales_manager']
     
     # Get issue counts for tab badges (using accessible scope)
-    split_stats = setup_queries.get_split_summary_stats(
-        employee_ids=accessible_employee_ids
-    )
+    # FIX v1.3.1: Pass accessible_employee_ids to filter by team scope
+    badge_data = call_all({
+        'split_stats': lambda: setup_queries.get_split_summary_stats(
+            employee_ids=accessible_employee_ids
+        ),
+        'assignment_issues': lambda: setup_queries.get_assignment_issues_summary(
+            current_year,
+            employee_ids=accessible_employee_ids
+        ),
+    })
+    split_stats = badge_data['split_stats'] or {}
     split_critical = split_stats.get('over_100_count', 0)
     
-    # FIX v1.3.1: Pass accessible_employee_ids to filter by team scope
-    assignment_issues = setup_queries.get_assignment_issues_summary(
-        current_year,
-        employee_ids=accessible_employee_ids
-    )
+    assignment_issues = badge_data['assignment_issues'] or {}
     assign_critical = assignment_issues.get('no_assignment_count', 0) + assignment_issues.get('weight_issues_count', 0)
     
     # =========================================================================
@@ -712,7 +726,7 @@ def setup_tab_fragment(
 # SPLIT RULES SECTION (v1.1.0 - Added Audit Trail Filters)
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def split_rules_section(
     setup_queries: SalespersonSetupQueries,
     accessible_employee_ids: List[int] = None,
@@ -870,6 +884,17 @@ def split_rules_section(
     # =========================================================================
     # FILTERS (v1.1.0 - 5 Filter Groups like KPI Center)
     # =========================================================================
+    # v2.3.0: Independent dropdown reads issued concurrently (utils.async_db)
+    filter_data = call_all({
+        'years': setup_queries.get_split_rule_years,
+        'salespeople': lambda: setup_queries.get_salespeople_for_dropdown(include_inactive=True),
+        'brands': setup_queries.get_brands_for_dropdown,
+        'customers': lambda: setup_queries.get_customers_with_splits(employee_ids=accessible_employee_ids),
+        'products': lambda: setup_queries.get_products_with_splits(employee_ids=accessible_employee_ids),
+        'creators': setup_queries.get_creators_for_dropdown,
+        'approvers': setup_queries.get_approvers_for_dropdown,
+    })
+    
     with st.expander("🔍 Filters", expanded=True):
         
         # ROW 1: Period Filters
@@ -878,7 +903,7 @@ def split_rules_section(
         p_col1, p_col2, p_col3, p_col4 = st.columns([1, 1, 1, 1])
         
         with p_col1:
-            available_years = setup_queries.get_split_rule_years()
+            available_years = filter_data['years'] or [date.today().year]
             current_year = date.today().year
             
             period_year = st.selectbox(
@@ -931,7 +956,7 @@ def split_rules_section(
         # v1.2.0: Salesperson filter - Setup tab's own filter
         with e_col1:
             # Get salespeople within accessible scope
-            salespeople_df = setup_queries.get_salespeople_for_dropdown(include_inactive=True)
+            salespeople_df = _frame_or_empty(filter_data['salespeople'])
             
             # Filter to accessible scope if restricted
             if accessible_employee_ids is not None:
@@ -964,7 +989,7 @@ def split_rules_section(
                 st.info("No salespeople available")
         
         with e_col2:
-            brands_df = setup_queries.get_brands_for_dropdown()
+            brands_df = _frame_or_empty(filter_data['brands'])
             brand_options = brands_df['brand_id'].tolist() if not brands_df.empty else []
             
             brand_filter = st.multiselect(
@@ -977,9 +1002,7 @@ def split_rules_section(
         
         # v1.5.2: Customer multiselect (only customers with split rules)
         with e_col3:
-            customers_df = setup_queries.get_customers_with_splits(
-                employee_ids=accessible_employee_ids
-            )
+            customers_df = _frame_or_empty(filter_data['customers'])
             
             if not customers_df.empty:
                 customer_options = customers_df['customer_id'].tolist()
@@ -996,9 +1019,7 @@ def split_rules_section(
         
         # v1.5.2: Product multiselect (only products with split rules)
         with e_col4:
-            products_df = setup_queries.get_products_with_splits(
-                employee_ids=accessible_employee_ids
-            )
+            products_df = _frame_or_empty(filter_data['products'])
             
             if not products_df.empty:
                 product_options = products_df['product_id'].tolist()
@@ -1076,7 +1097,7 @@ def split_rules_section(
         
         with a_col1:
             # Created By dropdown (v1.4.2: Fixed - uses employees via keycloak_id)
-            creators_df = setup_queries.get_creators_for_dropdown()
+            creators_df = _frame_or_empty(filter_data['creators'])
             creator_options = [(-1, "All Creators")] + [
                 (row['employee_id'], row['employee_name']) 
                 for _, row in creators_df.iterrows()
@@ -1091,7 +1112,7 @@ def split_rules_section(
         
         with a_col2:
             # Approved By dropdown
-            approvers_df = setup_queries.get_approvers_for_dropdown()
+            approvers_df = _frame_or_empty(filter_data['approvers'])
             approver_options = [(-1, "All Approvers")] + [
                 (row['employee_id'], row['employee_name']) 
                 for _, row in approvers_df.iterrows()
@@ -1303,7 +1324,7 @@ def split_rules_section(
     )
 
 
-@st.fragment
+@traced_fragment
 def _render_split_data_table(
     setup_queries: SalespersonSetupQueries,
     query_params: Dict,
@@ -3340,7 +3361,7 @@ def _delete_kpi_assignment_dialog(assignment_id: int, assignment_info: dict):
 # KPI ASSIGNMENTS SECTION (v2.0.0 - Refactored with Modal Pattern)
 # =============================================================================
 
-@st.fragment
+@traced_fragment
 def kpi_assignments_section(
     setup_queries: SalespersonSetupQueries,
     employee_ids: List[int] = None,
@@ -3744,7 +3765,7 @@ def _render_kpi_assignment_row(
 # SALESPEOPLE SECTION
 # =============================================================================
 
-@st.fragment  
+@traced_fragment
 def salespeople_section(
     setup_queries: SalespersonSetupQueries,
     employee_ids: List[int] = None,  # FIX v1.3.1: Filter by team scope
@@ -16,7 +16,7 @@ from typing import List, Optional, Dict, Tuple, Any
 import pandas as pd
 from sqlalchemy import text
 
-from utils.db import get_db_engine
+from utils.db import get_db_engine, invalidates_query_cache
 
 logger = logging.getLogger(__name__)
 
@@ -2570,6 +2570,7 @@ class SalespersonSetupQueries:
             logger.error(f"Error executing {query_name}: {e}")
             return pd.DataFrame()
     
+    @invalidates_query_cache()
     def _execute_insert(
         self,
         query: str,
@@ -2599,6 +2600,7 @@ class SalespersonSetupQueries:
                 'message': str(e)
             }
     
+    @invalidates_query_cache()
     def _execute_update(
         self,
         query: str,
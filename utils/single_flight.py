@@ -0,0 +1,249 @@
+# utils/single_flight.py
+"""
+Single-Flight Load De-duplication
+
+When many sessions open the same page at once, each one fires the same
+multi-second dataset query (sales_raw, backlog_raw, payment_raw, ...) and the
+connection pool (pool_size=5, max_overflow=10) runs dry. SingleFlight keeps a
+process-wide registry of loads in flight: the first caller for a key runs the
+load, every concurrent caller for the same key waits on it and gets the same
+result. MySQL sees one query instead of thirty.
+
+- Results are handed out as shallow copies when copy-on-write is active
+  (pandas ≥ 3, or mode.copy_on_write on pandas 2) and as deep copies
+  otherwise, so one session mutating its frame never affects another.
+- A failed load re-raises the leader's exception in every waiter.
+- A waiter gives up after SINGLE_FLIGHT_WAIT_SECONDS and runs the load
+  itself, so a hung query cannot block the process forever.
+- Nothing is cached after the flight lands — pair with st.cache_data /
+  utils.db.cached_query for reuse over time.
+
+Metrics (get_single_flight_stats): calls, executions, shared (deduplicated)
+calls, timeouts, loads in flight, current and peak waiters, total / max wait.
+
+VERSION: 1.0.1
+
+Usage:
+    from utils.single_flight import single_flight, run_single_flight
+
+    class UnifiedDataLoader:
+        @single_flight('kpc.sales_raw')
+        def _load_sales_raw(self, lookback_start): ...
+
+    df = run_single_flight(('sales_raw', lookback_start), lambda: load(lookback_start))
+"""
+
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', '1') != '0'
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', '300'))
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+    waiters: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+
+def _copy_on_write() -> bool:
+    """True when pandas copy-on-write is in effect (always on from pandas 3)."""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.get_option('mode.copy_on_write') is True
+
+
+def _share(result):
+    """Per-caller view of a shared result (shallow under copy-on-write, else deep)."""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy(deep=not _copy_on_write())
+    if isinstance(result, dict):
+        return {k: _share(v) for k, v in result.items()}
+    if isinstance(result, list):
+        return [_share(v) for v in result]
+    return result
+
+
+class SingleFlight:
+    """Process-wide registry of in-flight loads keyed by dataset key."""
+
+    def __init__(self, wait_seconds: float = SINGLE_FLIGHT_WAIT_SECONDS):
+        self.wait_seconds = wait_seconds
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._executions = 0
+        self._shared = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._waiting = 0
+        self._peak_waiting = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical load already running."""
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                leader = True
+            else:
+                flight.waiters += 1
+                self._waiting += 1
+                self._peak_waiting = max(self._peak_waiting, self._waiting)
+                leader = False
+
+        if leader:
+            return self._lead(key, flight, fn)
+        return self._follow(key, flight, fn)
+
+    def _lead(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._executions += 1
+                if flight.error is not None:
+                    self._errors += 1
+                self._flights.pop(key, None)
+            flight.done.set()
+            if flight.waiters:
+                logger.info(f"Single-flight {key!r}: 1 load served {flight.waiters + 1} callers "
+                            f"in {time.perf_counter() - flight.started:.2f}s")
+        return _share(flight.result)
+
+    def _follow(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        wait_start = time.perf_counter()
+        landed = flight.done.wait(self.wait_seconds)
+        waited = time.perf_counter() - wait_start
+
+        with self._lock:
+            self._waiting -= 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if landed:
+                self._shared += 1
+            else:
+                self._timeouts += 1
+
+        if not landed:
+            logger.warning(f"Single-flight {key!r}: waited {waited:.0f}s, loading independently")
+            with self._lock:
+                self._executions += 1
+            return fn()
+
+        if flight.error is not None:
+            raise flight.error
+        return _share(flight.result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "executions": self._executions,
+                "shared": self._shared,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+                "in_flight": len(self._flights),
+                "in_flight_keys": [repr(k) for k in self._flights],
+                "waiting": self._waiting,
+                "peak_waiting": self._peak_waiting,
+                "wait_total_s": round(self._wait_total, 3),
+                "wait_max_s": round(self._wait_max, 3),
+                "wait_avg_s": round(self._wait_total / self._shared, 3) if self._shared else 0.0,
+            }
+
+
+_registry = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide registry"""
+    return _registry
+
+
+def get_single_flight_stats() -> Dict[str, Any]:
+    return _registry.stats()
+
+
+def run_single_flight(key: Hashable, fn: Callable[[], Any]) -> Any:
+    """Run fn once for all concurrent callers with the same key"""
+    if not SINGLE_FLIGHT_ENABLED:
+        return fn()
+    return _registry.do(key, fn)
+
+
+def _freeze(value) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def single_flight(name: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Decorator: de-duplicate concurrent calls with equal arguments
+
+    The key is name + the bound arguments (self / _self excluded), unless a
+    key function taking the same arguments is given — use one when the
+    instance carries state that changes the result (e.g. access scope).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                flight_key = (name, _freeze(key(*args, **kwargs)))
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                flight_key = (name,) + tuple(
+                    (arg, _freeze(value)) for arg, value in bound.arguments.items()
+                    if arg not in ('self', '_self')
+                )
+            return run_single_flight(flight_key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    'SingleFlight',
+    'get_single_flight',
+    'get_single_flight_stats',
+    'run_single_flight',
+    'single_flight',
+]
@@ -0,0 +1,435 @@
+# utils/supply_demand_snapshot.py
+"""
+Supply / Demand Snapshot Service
+
+Net GAP (unified_supply_view / unified_demand_view), Period GAP (SELECT * from
+the inventory, CAN, PO, WH-transfer, OC and forecast views) and the allocation
+supply tables (per-product queries on the same views) each extracted the same
+planning data on their own TTLs with their own transforms. This service owns
+that extraction:
+
+- Explicit projection: every view is read through a DatasetSpec column list
+  (intersected with INFORMATION_SCHEMA, so optional columns may be absent).
+- One normalization: numeric → float (NaN = 0), dates → datetime64, text
+  stripped (upper-cased where the spec says so), flags → bool.
+- Scheduled refresh: snapshots are process-wide and refreshed every
+  SNAPSHOT_REFRESH_SECONDS. A stale snapshot keeps being served while ONE
+  background refresh runs; only a missing snapshot blocks the caller.
+
+Frames returned by get() are shared between sessions — treat them as
+read-only and filter (which copies) before adding columns.
+
+VERSION: 1.0.1
+
+Usage:
+    from utils.supply_demand_snapshot import get_snapshot_service
+
+    snapshots = get_snapshot_service()
+    inv_df = snapshots.get('inventory')
+    po_df = snapshots.get('purchase_order')
+    snapshots.invalidate()                    # after a write or a manual "refresh data"
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from .db import get_db_engine
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+SNAPSHOT_REFRESH_SECONDS = int(os.getenv('SNAPSHOT_REFRESH_SECONDS', '300'))
+
+_BOOL_MAP = {
+    'Yes': True, 'No': False,
+    1: True, 0: False,
+    True: True, False: False,
+}
+
+
+# =============================================================================
+# DATASET SPECS
+# =============================================================================
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """How one view is extracted and normalized."""
+    view: str
+    columns: Tuple[str, ...]
+    where: str = ''
+    order_by: str = ''
+    numeric: Tuple[str, ...] = ()
+    dates: Tuple[str, ...] = ()
+    text: Tuple[str, ...] = ()            # strip, NaN → ''
+    upper: Tuple[str, ...] = ()           # strip + upper, NaN → ''
+    flags: Tuple[str, ...] = ()           # Yes/No/1/0 → bool
+
+
+_PRODUCT_COLUMNS = (
+    'product_id', 'product_name', 'pt_code', 'brand', 'package_size', 'standard_uom',
+)
+
+DATASETS: Dict[str, DatasetSpec] = {
+    # ----- Unified views (Net GAP) ------------------------------------------
+    'unified_supply': DatasetSpec(
+        view='unified_supply_view',
+        columns=(
+            'supply_source', *_PRODUCT_COLUMNS,
+            'batch_number', 'expiry_date', 'days_to_expiry',
+            'available_quantity', 'availability_date', 'days_to_available',
+            'availability_status', 'warehouse_name', 'to_location', 'entity_name',
+            'unit_cost_usd', 'total_value_usd', 'supply_reference_id',
+            'supplier_name', 'completion_percentage',
+            'purchase_order_type', 'approval_status',
+        ),
+        order_by='product_id, supply_priority, days_to_available',
+        numeric=(
+            'product_id', 'available_quantity', 'days_to_available',
+            'days_to_expiry', 'unit_cost_usd', 'total_value_usd',
+            'completion_percentage',
+        ),
+        dates=('availability_date', 'expiry_date'),
+        text=('entity_name',),
+        upper=('pt_code', 'product_name', 'brand', 'standard_uom'),
+    ),
+    'unified_demand': DatasetSpec(
+        view='unified_demand_view',
+        columns=(
+            'demand_source', *_PRODUCT_COLUMNS,
+            'customer', 'customer_code', 'customer_po_number',
+            'required_quantity', 'required_date', 'days_to_required',
+            'demand_status', 'urgency_level', 'is_allocated',
+            'allocated_quantity', 'unallocated_quantity',
+            'selling_unit_price', 'total_value_usd', 'demand_reference_id',
+            'entity_name',
+        ),
+        order_by='product_id, demand_priority, days_to_required',
+        numeric=(
+            'product_id', 'required_quantity', 'allocated_quantity',
+            'unallocated_quantity', 'days_to_required', 'selling_unit_price',
+            'total_value_usd',
+        ),
+        dates=('required_date',),
+        text=('customer', 'customer_code', 'entity_name'),
+        upper=('pt_code', 'product_name', 'brand', 'standard_uom'),
+        flags=('is_allocated',),
+    ),
+
+    # ----- Source views (Period GAP, allocation) ----------------------------
+    'inventory': DatasetSpec(
+        view='inventory_detailed_view',
+        columns=(
+            'inventory_history_id', *_PRODUCT_COLUMNS,
+            'batch_number', 'remaining_quantity', 'inventory_value_usd',
+            'expiry_date', 'days_since_arrival', 'warehouse_name', 'location',
+            'owning_company_name',
+        ),
+        numeric=('remaining_quantity', 'inventory_value_usd'),
+        dates=('expiry_date',),
+    ),
+    'pending_can': DatasetSpec(
+        view='can_pending_stockin_view',
+        columns=(
+            'can_line_id', *_PRODUCT_COLUMNS,
+            'arrival_note_number', 'pending_quantity', 'pending_value_usd',
+            'buying_quantity', 'buying_uom', 'uom_conversion', 'arrival_date',
+            'days_since_arrival', 'vendor', 'po_number', 'consignee',
+        ),
+        numeric=('pending_quantity', 'pending_value_usd'),
+        dates=('arrival_date',),
+    ),
+    'purchase_order': DatasetSpec(
+        view='purchase_order_full_view',
+        columns=(
+            'po_line_id', 'po_number', *_PRODUCT_COLUMNS,
+            'pending_standard_arrival_quantity', 'pending_buying_invoiced_quantity',
+            'outstanding_arrival_amount_usd', 'buying_quantity', 'buying_uom',
+            'uom_conversion', 'purchase_unit_cost', 'etd', 'eta',
+            'vendor_name', 'legal_entity', 'approval_status', 'purchase_order_type',
+        ),
+        where='pending_standard_arrival_quantity > 0',
+        numeric=(
+            'pending_standard_arrival_quantity', 'outstanding_arrival_amount_usd',
+            'buying_quantity', 'purchase_unit_cost',
+        ),
+        dates=('etd', 'eta'),
+    ),
+    'wh_transfer': DatasetSpec(
+        view='warehouse_transfer_details_view',
+        columns=(
+            'warehouse_transfer_line_id', *_PRODUCT_COLUMNS,
+            'batch_number', 'transfer_quantity', 'warehouse_transfer_value_usd',
+            'transfer_date', 'expiry_date', 'from_warehouse', 'to_warehouse',
+            'owning_company_name', 'is_completed',
+        ),
+        where='is_completed = 0',
+        numeric=('transfer_quantity', 'warehouse_transfer_value_usd'),
+        dates=('transfer_date', 'expiry_date'),
+    ),
+    'oc_pending': DatasetSpec(
+        view='outbound_oc_pending_delivery_view',
+        columns=(
+            'ocd_id', 'oc_number', 'oc_date', *_PRODUCT_COLUMNS,
+            'customer', 'customer_code', 'legal_entity', 'etd', 'eta',
+            'selling_quantity', 'standard_quantity',
+            'pending_selling_delivery_quantity', 'pending_standard_delivery_quantity',
+            'undelivered_allocated_qty_standard',
+            'total_amount_usd', 'outstanding_amount_usd', 'uom_conversion',
+        ),
+        numeric=(
+            'selling_quantity', 'standard_quantity',
+            'pending_selling_delivery_quantity', 'pending_standard_delivery_quantity',
+            'total_amount_usd', 'outstanding_amount_usd', 'uom_conversion',
+        ),
+    ),
+    'forecast': DatasetSpec(
+        view='customer_demand_forecast_full_view',
+        columns=(
+            'forecast_line_id', 'forecast_number', *_PRODUCT_COLUMNS,
+            'customer', 'legal_entity', 'etd',
+            'selling_quantity', 'standard_quantity', 'total_amount_usd',
+            'standard_unit_price_usd', 'is_converted_to_oc',
+        ),
+        numeric=(
+            'selling_quantity', 'standard_quantity',
+            'total_amount_usd', 'standard_unit_price_usd',
+        ),
+    ),
+}
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+
+def _view_columns(conn, view: str) -> List[str]:
+    result = conn.execute(
+        text(
+            "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :view"
+        ),
+        {'view': view},
+    )
+    return [row[0] for row in result]
+
+
+def build_query(spec: DatasetSpec, available: Optional[List[str]] = None) -> str:
+    """SELECT with the spec's projection (limited to available columns if given)."""
+    columns = list(spec.columns)
+    if available:
+        missing = [c for c in columns if c not in available]
+        if missing:
+            logger.debug(f"{spec.view}: columns not in view, skipped: {missing}")
+        columns = [c for c in columns if c in available]
+
+    query = f"SELECT {', '.join(columns)} FROM {spec.view}"
+    if spec.where:
+        query += f" WHERE {spec.where}"
+    if spec.order_by:
+        query += f" ORDER BY {spec.order_by}"
+    return query
+
+
+def _clean_text(values: pd.Series, upper: bool) -> pd.Series:
+    cleaned = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+    return cleaned.str.upper() if upper else cleaned
+
+
+def normalize(df: pd.DataFrame, spec: DatasetSpec) -> pd.DataFrame:
+    """Apply the spec's numeric / date / text / flag normalization in place."""
+    for col in spec.dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in spec.numeric:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    for col in spec.text:
+        if col in df.columns:
+            df[col] = _clean_text(df[col], upper=False)
+    for col in spec.upper:
+        if col in df.columns:
+            df[col] = _clean_text(df[col], upper=True)
+    for col in spec.flags:
+        if col in df.columns:
+            df[col] = df[col].map(_BOOL_MAP).fillna(False).astype(bool)
+    return df
+
+
+def extract(spec: DatasetSpec, engine=None) -> pd.DataFrame:
+    """Run one projected extraction and normalize the result."""
+    engine = engine or get_db_engine()
+    with engine.connect() as conn:
+        available = _view_columns(conn, spec.view)
+        df = pd.read_sql(text(build_query(spec, available)), conn)
+    return normalize(df, spec)
+
+
+# =============================================================================
+# SERVICE
+# =============================================================================
+
+@dataclass
+class _Snapshot:
+    df: Optional[pd.DataFrame] = None
+    loaded_at: float = 0.0
+    refreshing: bool = False
+    generation: int = 0        # bumped by invalidate(); stale background loads are dropped
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SupplyDemandSnapshotService:
+    """Process-wide, scheduled-refresh snapshots of the planning views."""
+
+    def __init__(
+        self,
+        datasets: Optional[Dict[str, DatasetSpec]] = None,
+        refresh_seconds: float = SNAPSHOT_REFRESH_SECONDS,
+    ):
+        self.datasets = dict(datasets or DATASETS)
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: Dict[str, _Snapshot] = {name: _Snapshot() for name in self.datasets}
+
+    def _load(self, name: str, snap: _Snapshot):
+        """Synchronous load; the caller holds snap.lock."""
+        start = time.time()
+        try:
+            df = extract(self.datasets[name])
+            snap.df, snap.loaded_at = df, time.time()
+            logger.info(f"Snapshot '{name}' loaded: {len(df):,} rows in {time.time() - start:.2f}s")
+        finally:
+            snap.refreshing = False
+
+    def _refresh_in_background(self, name: str, snap: _Snapshot, generation: int):
+        def _run():
+            start = time.time()
+            try:
+                df = extract(self.datasets[name])
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logger.warning(f"Snapshot '{name}' background refresh failed: {e}")
+                df = None
+            with snap.lock:
+                if snap.generation != generation:
+                    # invalidate() ran while we were extracting: our rows may predate
+                    # the write that triggered it, so they must not replace its reload
+                    logger.info(f"Snapshot '{name}' background refresh discarded (invalidated)")
+                    return
+                snap.refreshing = False
+                if df is not None:
+                    snap.df, snap.loaded_at = df, time.time()
+                    logger.info(f"Snapshot '{name}' refreshed: {len(df):,} rows "
+                                f"in {time.time() - start:.2f}s")
+        threading.Thread(target=_run, name=f"snapshot-{name}", daemon=True).start()
+
+    def get(self, name: str) -> pd.DataFrame:
+        """Current snapshot of a dataset (read-only, shared across sessions)."""
+        if name not in self._snapshots:
+            raise KeyError(f"Unknown snapshot dataset: {name}")
+        snap = self._snapshots[name]
+
+        with snap.lock:
+            if snap.df is None:
+                # First load blocks; concurrent callers wait on the lock
+                snap.refreshing = True
+                self._load(name, snap)
+                return snap.df
+
+            stale = time.time() - snap.loaded_at >= self.refresh_seconds
+            if stale and not snap.refreshing:
+                snap.refreshing = True
+                self._refresh_in_background(name, snap, snap.generation)
+            return snap.df
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the dataset was loaded (None if never loaded)."""
+        snap = self._snapshots.get(name)
+        if snap is None or snap.df is None:
+            return None
+        return time.time() - snap.loaded_at
+
+    def invalidate(self, name: Optional[str] = None):
+        """
+        Drop one (or every) snapshot; the next get() reloads synchronously.
+        A background refresh already in flight is discarded when it lands.
+        """
+        names = [name] if name else list(self._snapshots)
+        for n in names:
+            snap = self._snapshots.get(n)
+            if snap is not None:
+                with snap.lock:
+                    snap.df, snap.loaded_at = None, 0.0
+                    snap.generation += 1
+                    snap.refreshing = False
+
+    def stats(self) -> pd.DataFrame:
+        rows = []
+        for name, snap in self._snapshots.items():
+            rows.append({
+                'dataset': name,
+                'view': self.datasets[name].view,
+                'rows': 0 if snap.df is None else len(snap.df),
+                'age_s': None if snap.df is None else round(time.time() - snap.loaded_at, 1),
+                'refreshing': snap.refreshing,
+            })
+        return pd.DataFrame(rows)
+
+
+@st.cache_resource
+def get_snapshot_service() -> SupplyDemandSnapshotService:
+    """Process-wide snapshot service (shared by every session and page)."""
+    return SupplyDemandSnapshotService()
+
+
+# =============================================================================
+# COMMON FILTERS
+# =============================================================================
+
+def filter_po(
+    po_df: pd.DataFrame,
+    po_approval_statuses: Optional[Tuple[str, ...]] = ('APPROVED',),
+    po_order_types: Optional[Tuple[str, ...]] = ('REGULAR_ORDER', 'SAMPLE_ORDER', 'MIXED_ORDER'),
+) -> pd.DataFrame:
+    """PO approval-status / order-type filter (NULL order type always passes)."""
+    if po_df.empty:
+        return po_df
+    mask = pd.Series(True, index=po_df.index)
+    if po_approval_statuses and 'approval_status' in po_df.columns:
+        mask &= po_df['approval_status'].isin(list(po_approval_statuses))
+    if po_order_types and 'purchase_order_type' in po_df.columns:
+        mask &= (
+            po_df['purchase_order_type'].isin(list(po_order_types))
+            | po_df['purchase_order_type'].isna()
+        )
+    return po_df[mask]
+
+
+def rows_for_product(df: pd.DataFrame, product_id: int) -> pd.DataFrame:
+    if df.empty or 'product_id' not in df.columns:
+        return df.iloc[0:0]
+    return df[df['product_id'] == product_id]
+
+
+__all__: List[str] = [
+    'SNAPSHOT_REFRESH_SECONDS',
+    'DatasetSpec',
+    'DATASETS',
+    'build_query',
+    'normalize',
+    'extract',
+    'SupplyDemandSnapshotService',
+    'get_snapshot_service',
+    'filter_po',
+    'rows_for_product',
+]